@@ -147,7 +147,7 @@ ADMIN_TAB_KEYS_DEFINITION_GLOBAL = [
     "admin_tab_general_settings", "admin_tab_price_matrix", "admin_tab_tariff_management", "admin_tab_pdf_design",
     "admin_tab_pdf_title_images", "admin_tab_pdf_offer_titles", "admin_tab_pdf_cover_letters",
     "admin_tab_visualization_settings",
-    "admin_tab_advanced"
+    "admin_tab_advanced", "admin_tab_performance_traces"
 ]
 
 def get_text_local(key: str, fallback_text: str) -> str:
@@ -1519,6 +1519,8 @@ def render_advanced_settings(load_admin_setting_func: Callable, save_admin_setti
             st.success(get_text_local("admin_debug_settings_saved_success", "Debugging-Einstellungen gespeichert.")); 
             st.session_state.selected_page_key_sui = "admin"; st.rerun()
         else: st.error(get_text_local("admin_debug_settings_save_error", "Fehler beim Speichern der Debugging-Einstellungen."))
+    st.markdown("---"); render_backup_settings(load_admin_setting_func, save_admin_setting_func)
+    st.markdown("---"); render_document_store_maintenance()
     st.markdown("---"); st.subheader(get_text_local("admin_reset_data_header", "Daten zurücksetzen"))
     if st.checkbox(get_text_local("admin_show_reset_options_label", "Optionen zum Zurücksetzen anzeigen..."), key=f"show_reset_options_final{WIDGET_KEY_SUFFIX}"):
         st.warning(get_text_local("admin_reset_warning_text", "ACHTUNG: Das Zurücksetzen...nicht rückgängig...")); confirm_text_reset = "ALLES ENDGÜLTIG LÖSCHEN"
@@ -1538,6 +1540,72 @@ def render_advanced_settings(load_admin_setting_func: Callable, save_admin_setti
                 except Exception as e_reset_final_exc: st.error(f"Fehler beim Zurücksetzen der Daten: {e_reset_final_exc}")
             else: st.error(f"Falscher Bestätigungstext...")
     
+def render_backup_settings(load_admin_setting_func: Callable, save_admin_setting_func: Callable):
+    st.subheader(get_text_local("admin_backup_header", "Datensicherung (Snapshots)"))
+    try:
+        import db_backup
+    except Exception as e_backup_import:
+        st.error(f"Backup-Modul nicht verfügbar: {e_backup_import}"); return
+    current_backup_settings = load_admin_setting_func('backup_settings', None)
+    if not isinstance(current_backup_settings, dict): current_backup_settings = {}
+    cfg = {**db_backup.DEFAULT_BACKUP_SETTINGS, **current_backup_settings}
+    with st.form(f"backup_settings_form{WIDGET_KEY_SUFFIX}"):
+        enabled = st.checkbox(get_text_local("admin_backup_enabled_label", "Automatische Snapshots aktivieren"), value=bool(cfg["enabled"]))
+        interval_hours = st.number_input(get_text_local("admin_backup_interval_label", "Intervall (Stunden)"), min_value=1, max_value=24 * 30, value=int(cfg["interval_hours"]))
+        keep_last = st.number_input(get_text_local("admin_backup_keep_last_label", "Anzahl aufbewahrter Snapshots"), min_value=1, max_value=365, value=int(cfg["keep_last"]))
+        compress = st.checkbox(get_text_local("admin_backup_compress_label", "Datenbank komprimieren (gzip)"), value=bool(cfg["compress"]))
+        include_documents = st.checkbox(get_text_local("admin_backup_include_docs_label", "Firmen- und Kundendokumente sichern (inkrementell)"), value=bool(cfg["include_documents"]))
+        submitted_backup_form = st.form_submit_button(get_text_local("admin_backup_save_button", "Sicherungseinstellungen speichern"))
+    if submitted_backup_form:
+        new_cfg = {"enabled": enabled, "interval_hours": int(interval_hours), "keep_last": int(keep_last), "compress": compress, "include_documents": include_documents}
+        if save_admin_setting_func('backup_settings', new_cfg):
+            db_backup.start_backup_scheduler(new_cfg)
+            st.success(get_text_local("admin_backup_saved", "Sicherungseinstellungen gespeichert."))
+        else: st.error(get_text_local("admin_backup_save_error", "Fehler beim Speichern der Sicherungseinstellungen."))
+    if st.button(get_text_local("admin_backup_now_button", "Snapshot jetzt erstellen"), key=f"backup_now_btn{WIDGET_KEY_SUFFIX}"):
+        snapshot_info = db_backup.create_snapshot(compress=bool(cfg["compress"]), include_documents=bool(cfg["include_documents"]), keep_last=int(cfg["keep_last"]))
+        if snapshot_info and snapshot_info.get("db_quick_check"): st.success(f"Snapshot '{snapshot_info['name']}' erstellt ({snapshot_info.get('duration_s', 0)} s).")
+        elif snapshot_info: st.warning(f"Snapshot '{snapshot_info['name']}' erstellt, quick_check meldet jedoch Fehler.")
+        else: st.error(get_text_local("admin_backup_failed", "Snapshot konnte nicht erstellt werden."))
+    snapshots = db_backup.list_snapshots()
+    if snapshots:
+        st.dataframe(pd.DataFrame([{k: v for k, v in s.items() if k != "path"} for s in snapshots]), use_container_width=True, hide_index=True)
+        selected_snapshot = st.selectbox(get_text_local("admin_backup_restore_select", "Snapshot wiederherstellen"), options=[s["name"] for s in snapshots], key=f"backup_restore_select{WIDGET_KEY_SUFFIX}")
+        restore_docs = st.checkbox(get_text_local("admin_backup_restore_docs", "Dokumente ebenfalls wiederherstellen"), key=f"backup_restore_docs{WIDGET_KEY_SUFFIX}")
+        if st.button(get_text_local("admin_backup_restore_button", "Wiederherstellen"), key=f"backup_restore_btn{WIDGET_KEY_SUFFIX}"):
+            if db_backup.restore_snapshot(selected_snapshot, restore_documents=restore_docs): st.success(get_text_local("admin_backup_restore_success", "Snapshot wiederhergestellt."))
+            else: st.error(get_text_local("admin_backup_restore_error", "Wiederherstellung fehlgeschlagen."))
+    else: st.caption(get_text_local("admin_backup_no_snapshots", "Noch keine Snapshots vorhanden."))
+
+def render_document_store_maintenance():
+    st.subheader(get_text_local("admin_docstore_header", "Dokumentenablage (Manifest & Deduplizierung)"))
+    try:
+        import database as _db_mod
+        import document_store
+    except Exception as e_docstore_import:
+        st.error(f"Dokumentenablage nicht verfügbar: {e_docstore_import}"); return
+    conn = _db_mod.get_db_connection()
+    if conn is None:
+        st.error(get_text_local("db_connection_unavailable", "Datenbankverbindung nicht verfügbar.")); return
+    try:
+        col_index, col_cleanup, col_verify = st.columns(3)
+        if col_index.button(get_text_local("admin_docstore_index_button", "Bestand indexieren & deduplizieren"), key=f"docstore_index_btn{WIDGET_KEY_SUFFIX}"):
+            stats = document_store.index_existing_files(conn, [_db_mod.COMPANY_DOCS_BASE_DIR, _db_mod.CUSTOMER_DOCS_BASE_DIR], _db_mod.DATA_DIR)
+            st.success(f"{stats['files_seen']} Dateien geprüft, {stats['files_hashed']} neu gehasht, {stats['files_deduplicated']} dedupliziert.")
+        if col_cleanup.button(get_text_local("admin_docstore_cleanup_button", "Verwaiste Dateien entfernen"), key=f"docstore_cleanup_btn{WIDGET_KEY_SUFFIX}"):
+            cleanup = _db_mod.cleanup_orphaned_files()
+            st.info(f"{cleanup['files_removed']} von {cleanup['files_checked']} Dateien entfernt.")
+            for err in cleanup["errors"]: st.error(err)
+        if col_verify.button(get_text_local("admin_docstore_verify_button", "Integrität prüfen (SHA-256)"), key=f"docstore_verify_btn{WIDGET_KEY_SUFFIX}"):
+            check = document_store.verify_manifest(conn, _db_mod.DATA_DIR, rehash=True)
+            if any(check.values()): st.warning(check)
+            else: st.success(get_text_local("admin_docstore_verify_ok", "Alle Dokumente unverändert."))
+        duplicates = document_store.find_duplicates(conn)
+        if duplicates:
+            st.caption(f"{len(duplicates)} Inhalte mehrfach referenziert, {sum(d['bytes_saved'] for d in duplicates) / 1e6:.1f} MB eingespart.")
+    finally:
+        conn.close()
+
 def render_pdf_design_settings(load_admin_setting_func: Callable, save_admin_setting_func: Callable):
     st.subheader(get_text_local("admin_pdf_company_branding_expander", "Firmen-Branding für PDF-Dokumente"))
     active_company_id = load_admin_setting_func('active_company_id', None)
@@ -1575,6 +1643,57 @@ def render_pdf_design_settings(load_admin_setting_func: Callable, save_admin_set
           st.success(get_text_local("admin_pdf_design_settings_saved_success", "PDF Design gespeichert.")); 
           st.session_state.selected_page_key_sui = "admin"; st.rerun()
         else: st.error(get_text_local("admin_pdf_design_settings_save_error", "Fehler Speichern PDF Design."))
+    st.markdown("---"); render_pdf_output_optimization_settings(load_admin_setting_func, save_admin_setting_func, active_company_id)
+
+def render_pdf_output_optimization_settings(load_admin_setting_func: Callable, save_admin_setting_func: Callable, active_company_id: Optional[Any]):
+    st.subheader(get_text_local("admin_pdf_optimization_header", "Kompakte PDF-Ausgabe"))
+    try:
+        from pdf_compactor import PDF_OPTIMIZATION_SETTING_KEY, optimization_settings_for_company
+    except Exception as e_compactor_import:
+        st.error(f"PDF-Optimierung nicht verfügbar: {e_compactor_import}"); return
+    company_key = str(active_company_id) if active_company_id else None
+    current = optimization_settings_for_company(load_admin_setting_func, active_company_id if company_key else None)
+    st.caption(get_text_local("admin_pdf_optimization_info", "Dedupliziert Bilder/Fonts, rechnet Bilder auf die Ziel-DPI herunter und aktiviert Objekt-Streams. Gilt für die aktive Firma."))
+    with st.form(f"pdf_optimization_form{WIDGET_KEY_SUFFIX}"):
+        enabled = st.checkbox(get_text_local("admin_pdf_optimization_enabled", "Kompakte Ausgabe aktivieren"), value=bool(current.get("enabled")), key=f"pdf_opt_enabled{WIDGET_KEY_SUFFIX}")
+        target_dpi = st.number_input(get_text_local("admin_pdf_optimization_dpi", "Ziel-DPI für Bilder (0 = nicht herunterrechnen)"), min_value=0, max_value=600, step=10, value=int(current.get("target_dpi") or 0), key=f"pdf_opt_dpi{WIDGET_KEY_SUFFIX}")
+        jpeg_quality = st.slider(get_text_local("admin_pdf_optimization_quality", "JPEG-Qualität"), min_value=30, max_value=95, value=int(current.get("jpeg_quality") or 80), key=f"pdf_opt_quality{WIDGET_KEY_SUFFIX}")
+        subset_fonts = st.checkbox(get_text_local("admin_pdf_optimization_subset_fonts", "Fonts auf verwendete Zeichen reduzieren"), value=bool(current.get("subset_fonts", True)), key=f"pdf_opt_subset{WIDGET_KEY_SUFFIX}")
+        submitted_opt = st.form_submit_button(get_text_local("admin_pdf_optimization_save", "Ausgabe-Einstellungen speichern"))
+    if submitted_opt:
+        stored = load_admin_setting_func(PDF_OPTIMIZATION_SETTING_KEY, {}) or {}
+        if not isinstance(stored, dict): stored = {}
+        values = {"enabled": enabled, "target_dpi": int(target_dpi), "jpeg_quality": int(jpeg_quality), "subset_fonts": subset_fonts}
+        if company_key: stored.setdefault("companies", {})[company_key] = values
+        else: stored["default"] = values
+        if save_admin_setting_func(PDF_OPTIMIZATION_SETTING_KEY, stored): st.success(get_text_local("admin_pdf_optimization_saved", "Ausgabe-Einstellungen gespeichert."))
+        else: st.error(get_text_local("admin_pdf_optimization_save_error", "Fehler beim Speichern der Ausgabe-Einstellungen."))
+
+def render_offer_trace_panel():
+    st.subheader(get_text_local("admin_traces_header", "Laufzeiten der Angebotserstellung"))
+    try:
+        import offer_trace
+    except Exception as e_trace_import:
+        st.error(f"Tracing nicht verfügbar: {e_trace_import}"); return
+    if not offer_trace.is_enabled(): st.info(get_text_local("admin_traces_disabled", "Tracing ist deaktiviert (Umgebungsvariable OFFER_TRACE=0)."))
+    source = st.radio(get_text_local("admin_traces_source", "Quelle"), [get_text_local("admin_traces_source_process", "Dieser Prozess"), get_text_local("admin_traces_source_log", "Log-Datei")], horizontal=True, key=f"traces_source{WIDGET_KEY_SUFFIX}")
+    from_log = source != get_text_local("admin_traces_source_process", "Dieser Prozess")
+    traces = offer_trace.load_logged_traces(limit=500) if from_log else offer_trace.recent_traces()
+    root_names = sorted({t.get("name", "") for t in traces})
+    selected_roots = st.multiselect(get_text_local("admin_traces_filter", "Einstiegspunkte"), root_names, default=[n for n in root_names if "pdf" in n] or root_names, key=f"traces_roots{WIDGET_KEY_SUFFIX}")
+    traces = [t for t in traces if t.get("name") in selected_roots]
+    if not traces:
+        st.caption(get_text_local("admin_traces_empty", "Noch keine Traces vorhanden.")); return
+    st.caption(f"{len(traces)} Traces, Log: {offer_trace.TRACE_LOG_PATH or 'aus (OFFER_TRACE_LOG=0)'}")
+    st.dataframe(pd.DataFrame(offer_trace.summarize_stages(traces)), use_container_width=True, hide_index=True)
+    labels = [f"{t.get('timestamp', '?')} · {t.get('name')} · {t.get('duration_ms', 0):.0f} ms" for t in traces]
+    selected_idx = st.selectbox(get_text_local("admin_traces_single", "Einzelner Trace"), range(len(traces)), format_func=lambda i: labels[i], key=f"traces_single{WIDGET_KEY_SUFFIX}")
+    rows = offer_trace.flatten_trace(traces[selected_idx])
+    for row in rows: row["stage"] = "\u2003" * row.pop("depth") + row["stage"].rsplit("/", 1)[-1]
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    if from_log and offer_trace.TRACE_LOG_PATH and os.path.exists(offer_trace.TRACE_LOG_PATH):
+        with open(offer_trace.TRACE_LOG_PATH, "rb") as fh:
+            st.download_button(get_text_local("admin_traces_download", "Trace-Log herunterladen (JSONL)"), fh.read(), file_name="offer_traces.jsonl", mime="application/jsonl", key=f"traces_download{WIDGET_KEY_SUFFIX}")
 
 def manage_templates_local(template_type_key: str, template_list_setting_key: str, item_name_label_key: str, item_content_label_key: Optional[str] = None, is_image_template: bool = False ):
     st.subheader(get_text_local(f"admin_{template_type_key}_header", f"{template_type_key.replace('_', ' ').title()} Vorlagen"))
@@ -1814,6 +1933,7 @@ def render_admin_panel(
         "admin_tab_pdf_cover_letters": lambda: manage_templates_local("pdf_cover_letter", "pdf_cover_letter_templates", "admin_template_name_label_text", item_content_label_key="admin_template_content_label_cover_letter"),
         "admin_tab_visualization_settings": lambda: render_visualization_settings(load_admin_setting_func, save_admin_setting_func),
         "admin_tab_advanced": lambda: render_advanced_settings(load_admin_setting_func, save_admin_setting_func),
+        "admin_tab_performance_traces": lambda: render_offer_trace_panel(),
     }
 
     for i, tab_key_loop in enumerate(admin_tab_keys_definition): 
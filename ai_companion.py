@@ -6,9 +6,43 @@ Schwebendes Fenster mit DeepSeek-Integration
 import streamlit as st
 import requests
 import json
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 import time
 from datetime import datetime
+from functools import lru_cache
+
+from ai_http_client import ChatCompletionError, get_chat_client, response_cache_key
+
+CHAT_MODEL = "deepseek-chat"
+CHAT_PARAMS = {"max_tokens": 500, "temperature": 0.7}
+
+
+@lru_cache(maxsize=4)
+def _solar_context_for_day(day: str) -> str:
+    """System-Kontext; nur das Datum ändert sich, daher Aufbau (und Kontext-Hash) einmal pro Tag"""
+    return f"""
+Du bist ein AI-Assistent für eine Solar-Angebotsapp. Das aktuelle Datum ist {day}.
+
+DEINE ROLLE:
+- Hilf dem Nutzer bei Solar-/PV-Anlagen Fragen
+- Unterstütze bei der Angebotserstellung
+- Erkläre technische Begriffe einfach
+- Gib praktische Tipps für Verkaufsgespräche
+
+KONTEXT DER APP:
+- Solar-Angebotsapp für PV-Anlagen
+- Kann Multi-Firmen Angebote erstellen
+- Unterstützt Kunden-Management (CRM)
+- Berechnet Wirtschaftlichkeit und ROI
+- Erstellt professionelle PDF-Angebote
+
+ANTWORTE IMMER:
+- Kurz und präzise (max. 3-4 Sätze)
+- Hilfreich und praktisch
+- Auf Deutsch
+- Solar-/PV-fokussiert
+"""
+
 
 class DeepSeekCompanion:
     """AI-Begleiter mit DeepSeek-Integration"""
@@ -16,6 +50,7 @@ class DeepSeekCompanion:
     def __init__(self):
         self.api_key = None
         self.api_base_url = "https://api.deepseek.com/v1"
+        self.client = get_chat_client(self.api_base_url)
         self.conversation_history = []
         self.is_visible = False
         
@@ -36,96 +71,82 @@ class DeepSeekCompanion:
         st.session_state.ai_companion_api_key = api_key
         
     def get_solar_context(self) -> str:
-        """Erstellt Kontext über die aktuelle Solar-App Situation"""
-        context = f"""
-Du bist ein AI-Assistent für eine Solar-Angebotsapp. Die aktuelle Zeit ist {datetime.now().strftime('%d.%m.%Y %H:%M')}.
+        """Erstellt Kontext über die aktuelle Solar-App Situation (einmal pro Tag aufgebaut)"""
+        return _solar_context_for_day(datetime.now().strftime('%d.%m.%Y'))
 
-DEINE ROLLE:
-- Hilf dem Nutzer bei Solar-/PV-Anlagen Fragen
-- Unterstütze bei der Angebotserstellung
-- Erkläre technische Begriffe einfach
-- Gib praktische Tipps für Verkaufsgespräche
+    def _build_messages(self, message: str) -> List[Dict[str, str]]:
+        """System-Kontext, die letzten Gesprächsrunden und die aktuelle Frage"""
+        messages = [
+            {"role": "system", "content": self.get_solar_context()}
+        ]
 
-KONTEXT DER APP:
-- Solar-Angebotsapp für PV-Anlagen
-- Kann Multi-Firmen Angebote erstellen
-- Unterstützt Kunden-Management (CRM)
-- Berechnet Wirtschaftlichkeit und ROI
-- Erstellt professionelle PDF-Angebote
+        # Letzte 10 Einträge aus der History hinzufügen
+        recent_history = st.session_state.get("ai_companion_history", [])[-10:]
+        for entry in recent_history:
+            messages.append({"role": "user", "content": entry["user"]})
+            messages.append({"role": "assistant", "content": entry["assistant"]})
+
+        # Aktuelle Nachricht hinzufügen
+        messages.append({"role": "user", "content": message})
+        return messages
+
+    @staticmethod
+    def _cache_key(messages: List[Dict[str, str]]) -> str:
+        """Schlüssel über Frage, System-Kontext und die mitgesendeten Gesprächsrunden"""
+        return response_cache_key(messages[-1]["content"], messages[0]["content"], CHAT_MODEL,
+                                  history=messages[1:-1], **CHAT_PARAMS)
+
+    def _remember(self, message: str, ai_response: str):
+        """Zur History hinzufügen"""
+        st.session_state.setdefault("ai_companion_history", []).append({
+            "timestamp": datetime.now().strftime('%H:%M'),
+            "user": message,
+            "assistant": ai_response
+        })
+
+    @staticmethod
+    def _error_text(error: Exception) -> str:
+        if isinstance(error, ChatCompletionError):
+            return f" {error}"
+        if isinstance(error, requests.exceptions.Timeout):
+            return "⏱ Timeout - DeepSeek antwortet nicht"
+        if isinstance(error, requests.exceptions.ConnectionError):
+            return " Verbindungsfehler zu DeepSeek"
+        return f" Fehler: {str(error)}"
 
-ANTWORTE IMMER:
-- Kurz und präzise (max. 3-4 Sätze)
-- Hilfreich und praktisch
-- Auf Deutsch
-- Solar-/PV-fokussiert
-"""
-        return context
-        
     def call_deepseek_api(self, message: str) -> Optional[str]:
-        """Ruft die DeepSeek API auf"""
+        """Ruft die DeepSeek API auf (wiederholte Fragen kommen aus dem Antwort-Cache)"""
         if not self.api_key:
             return " Bitte erst DeepSeek API-Key eingeben!"
-            
+
+        messages = self._build_messages(message)
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            # Conversation History mit Kontext aufbauen
-            messages = [
-                {"role": "system", "content": self.get_solar_context()}
-            ]
-            
-            # Letzte 5 Nachrichten aus der History hinzufügen
-            recent_history = st.session_state.ai_companion_history[-10:] if st.session_state.ai_companion_history else []
-            for entry in recent_history:
-                messages.append({"role": "user", "content": entry["user"]})
-                messages.append({"role": "assistant", "content": entry["assistant"]})
-                
-            # Aktuelle Nachricht hinzufügen
-            messages.append({"role": "user", "content": message})
-            
-            payload = {
-                "model": "deepseek-chat", 
-                "messages": messages,
-                "max_tokens": 500,
-                "temperature": 0.7,
-                "stream": False
-            }
-            
-            response = requests.post(
-                f"{self.api_base_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                if 'choices' in result and len(result['choices']) > 0:
-                    ai_response = result['choices'][0]['message']['content']
-                    
-                    # Zur History hinzufügen
-                    st.session_state.ai_companion_history.append({
-                        "timestamp": datetime.now().strftime('%H:%M'),
-                        "user": message,
-                        "assistant": ai_response
-                    })
-                    
-                    return ai_response
-                else:
-                    return " Unerwartete API-Antwort"
-            else:
-                return f" API-Fehler: {response.status_code} - {response.text}"
-                
-        except requests.exceptions.Timeout:
-            return "⏱ Timeout - DeepSeek antwortet nicht"
-        except requests.exceptions.ConnectionError:
-            return " Verbindungsfehler zu DeepSeek"
+            ai_response = self.client.complete(self.api_key, messages, CHAT_MODEL,
+                                               cache_key=self._cache_key(messages), **CHAT_PARAMS)
         except Exception as e:
-            return f" Fehler: {str(e)}"
-            
+            return self._error_text(e)
+        self._remember(message, ai_response)
+        return ai_response
+
+    def stream_deepseek_api(self, message: str) -> Iterator[str]:
+        """Wie call_deepseek_api, liefert die Antwort aber stückweise, sobald sie eintrifft"""
+        if not self.api_key:
+            yield " Bitte erst DeepSeek API-Key eingeben!"
+            return
+
+        parts: List[str] = []
+        messages = self._build_messages(message)
+        try:
+            for chunk in self.client.stream(self.api_key, messages, CHAT_MODEL,
+                                            cache_key=self._cache_key(messages), **CHAT_PARAMS):
+                parts.append(chunk)
+                yield chunk
+        except Exception as e:
+            yield self._error_text(e)
+            return
+        if parts:
+            self._remember(message, "".join(parts))
+
     def render_floating_window(self):
         """Rendert das schwebende AI-Begleiter Fenster"""
         self.initialize_session_state()
@@ -281,8 +302,14 @@ ANTWORTE IMMER:
                     
     def process_message(self, message: str):
         """Verarbeitet eine Nachricht"""
-        with st.spinner("🤖 AI denkt nach..."):
-            response = self.call_deepseek_api(message)
+        if not self.api_key:
+            self.api_key = st.session_state.get("ai_companion_api_key") or None
+        if hasattr(st, "write_stream"):
+            # Tokens erscheinen im Chat, sobald sie ankommen
+            response = st.write_stream(self.stream_deepseek_api(message))
+        else:
+            with st.spinner("🤖 AI denkt nach..."):
+                response = self.call_deepseek_api(message)
             
         if response:
             # Input wird beim nächsten Rerun automatisch geleert
@@ -0,0 +1,212 @@
+# ai_http_client.py
+"""
+Gemeinsamer HTTP-Client für Chat-Completions (DeepSeek / OpenAI-kompatibel).
+
+- Eine `requests.Session` je Basis-URL: Keep-Alive und Verbindungspool statt eines neuen
+  TCP/TLS-Aufbaus pro Frage; Wiederholung mit Backoff bei Verbindungsfehlern und
+  429/5xx (urllib3 Retry).
+- Streaming (`stream`): liest die Server-Sent-Events (`data: {...}`) und liefert die
+  Text-Stücke, sobald sie ankommen.
+- Antwort-Cache: LRU mit TTL, Schlüssel aus Frage + Hash des System-Kontexts
+  (`response_cache_key`). Treffer werden ohne Netzwerkzugriff beantwortet, auch im
+  Streaming-Modus.
+
+Die Basis-URL ist frei wählbar, Tests laufen gegen einen lokalen Stub-Server.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    _REQUESTS_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    requests = None  # type: ignore
+    HTTPAdapter = None  # type: ignore
+    Retry = None  # type: ignore
+    _REQUESTS_AVAILABLE = False
+
+DEFAULT_TIMEOUT: Tuple[float, float] = (5.0, 30.0)  # (Verbindungsaufbau, Lesen je Block)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+CACHE_MAX_ENTRIES = 256
+CACHE_TTL_S = 24 * 3600.0
+
+
+class ChatCompletionError(Exception):
+    """Fehlerhafte Antwort der API (HTTP-Status != 200 oder unerwartetes Format)."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def context_hash(context: str) -> str:
+    return hashlib.sha256((context or "").encode("utf-8")).hexdigest()
+
+
+def response_cache_key(prompt: str, context: str, model: str = "",
+                       history: Sequence[Dict[str, str]] = (), **params: Any) -> str:
+    """
+    Cache-Schlüssel aus normalisierter Frage, Kontext-Hash, Gesprächsverlauf, Modell und Sampling-Parametern.
+    history: die mitgesendeten Vorgänger-Nachrichten; Rückfragen wie "Und warum?" treffen so nur
+    Antworten aus demselben Gesprächsverlauf.
+    """
+    payload = {
+        "prompt": " ".join(str(prompt or "").split()).lower(),
+        "context": context_hash(context),
+        "history": context_hash(json.dumps(list(history), sort_keys=True, ensure_ascii=False)) if history else "",
+        "model": model,
+        "params": {k: params[k] for k in sorted(params)},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Threadsicherer LRU-Cache mit Ablaufzeit für fertige Antworten."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl_s: float = CACHE_TTL_S):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_s:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _build_session(max_retries: int, backoff_factor: float, pool_size: int) -> "requests.Session":
+    retry = Retry(
+        total=max_retries, connect=max_retries, read=max_retries, status=max_retries,
+        backoff_factor=backoff_factor, status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"POST"}), raise_on_status=False, respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class ChatCompletionClient:
+    """Chat-Completions über eine gepoolte Session, mit Streaming und Antwort-Cache."""
+
+    def __init__(self, base_url: str, max_retries: int = 3, backoff_factor: float = 0.5, pool_size: int = 4,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT, cache: Optional[ResponseCache] = None):
+        if not _REQUESTS_AVAILABLE:  # pragma: no cover
+            raise ImportError("requests ist nicht installiert")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache = cache if cache is not None else ResponseCache()
+        self.session = _build_session(max_retries, backoff_factor, pool_size)
+        self.requests_sent = 0
+
+    def _post(self, api_key: str, payload: Dict[str, Any], stream: bool) -> "requests.Response":
+        self.requests_sent += 1
+        response = self.session.post(
+            f"{self.base_url}/chat/completions",
+            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+            json=payload, timeout=self.timeout, stream=stream,
+        )
+        if response.status_code != 200:
+            text = response.text
+            response.close()
+            raise ChatCompletionError(f"API-Fehler: {response.status_code} - {text}", response.status_code)
+        return response
+
+    def complete(self, api_key: str, messages: List[Dict[str, str]], model: str = "deepseek-chat",
+                 cache_key: Optional[str] = None, **params: Any) -> str:
+        """Vollständige Antwort; bei Cache-Treffer ohne Anfrage."""
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        payload = dict(params, model=model, messages=messages, stream=False)
+        result = self._post(api_key, payload, stream=False).json()
+        try:
+            text = result["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            raise ChatCompletionError("Unerwartete API-Antwort")
+        if cache_key:
+            self.cache.put(cache_key, text)
+        return text
+
+    def stream(self, api_key: str, messages: List[Dict[str, str]], model: str = "deepseek-chat",
+               cache_key: Optional[str] = None, **params: Any) -> Iterator[str]:
+        """Liefert Text-Stücke, sobald sie ankommen; die vollständige Antwort wird anschließend gecacht."""
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        payload = dict(params, model=model, messages=messages, stream=True)
+        response = self._post(api_key, payload, stream=True)
+        parts: List[str] = []
+        completed = False
+        try:
+            # SSE ist per Definition UTF-8; ohne charset im Content-Type würde requests ISO-8859-1 annehmen
+            for raw_line in response.iter_lines():
+                line = raw_line.decode("utf-8", "replace")
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    completed = True
+                    break
+                try:
+                    delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                except (ValueError, KeyError, IndexError, TypeError):
+                    continue
+                if delta:
+                    parts.append(delta)
+                    yield delta
+            else:
+                completed = True
+        finally:
+            response.close()
+        if completed and cache_key and parts:
+            self.cache.put(cache_key, "".join(parts))
+
+
+_clients: Dict[str, ChatCompletionClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_chat_client(base_url: str) -> ChatCompletionClient:
+    """Prozessweiter Client je Basis-URL (Session und Cache überdauern Streamlit-Reruns)."""
+    key = base_url.rstrip("/")
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = ChatCompletionClient(key)
+        return client
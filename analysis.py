@@ -17,7 +17,8 @@ import math
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Callable
+from dataclasses import dataclass, field
 import os
 import time  # Für Timestamp-Funktionalität
 from reportlab.lib import colors  # Für HexColor Zugriff
@@ -1012,6 +1013,38 @@ def _get_visualization_settings() -> Dict[str, Any]:
 
 # === NEUE UNIVERSELLE 2D-DIAGRAMM-FUNKTIONEN ===
 
+UNIVERSAL_CHART_TYPES: List[str] = ["Balken", "Säulen", "Kreis", "Donut", "Strich"]
+
+# Farbpaletten der Diagramm-Umschalter (UI und headless PDF-Export)
+CHART_COLOR_PALETTES: Dict[str, List[str]] = {
+    "Standard": ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b"],
+    "Grün-Töne": ["#2d5016", "#4a7c59", "#6fa866", "#95d473", "#bcf5bc", "#e8f5e8"],
+    "Blau-Töne": ["#0f3460", "#16537e", "#1e6091", "#266ba0", "#2e86ab", "#37a0b4"],
+    "Warm": ["#ff6b35", "#f7931e", "#ffd23f", "#ff8c42", "#ff6b6b", "#ff4757"],
+    "Kalt": ["#00d2d3", "#0abdc6", "#009ffd", "#2196f3", "#4fc3f7", "#81d4fa"],
+    "Bunt": ["#e74c3c", "#f39c12", "#f1c40f", "#27ae60", "#3498db", "#9b59b6"],
+}
+
+
+def build_universal_2d_figure(
+    data: Dict[str, Any],
+    title: str,
+    chart_type: str = "Balken",
+    color_scheme: str = "Standard",
+    x_label: str = "",
+    y_label: str = "",
+    default_colors: List[str] = None,
+) -> go.Figure:
+    """Universelles 2D-Diagramm ohne Streamlit-Widgets (auch für PDF/Batch nutzbar)."""
+    colors = CHART_COLOR_PALETTES.get(
+        color_scheme, default_colors or CHART_COLOR_PALETTES["Standard"]
+    )
+    fig = _create_chart_by_type(data, chart_type, colors, title, x_label, y_label)
+
+    # Shadcn-ähnliches Theme anwenden (ohne Farbvorgaben zu überschreiben)
+    _apply_shadcn_like_theme(fig)
+    return fig
+
 
 def create_universal_2d_chart(
     data: Dict[str, Any],
@@ -1025,16 +1058,6 @@ def create_universal_2d_chart(
     """
     Universelle Funktion für 2D-Diagramme mit Typ- und Farbwahl
     """
-    if default_colors is None:
-        default_colors = [
-            "#1f77b4",
-            "#ff7f0e",
-            "#2ca02c",
-            "#d62728",
-            "#9467bd",
-            "#8c564b",
-        ]
-
     try:
         # Diagramm-Konfiguration in Spalten
         col1, col2, col3 = st.columns([2, 1, 1])
@@ -1045,18 +1068,11 @@ def create_universal_2d_chart(
         with col2:
             chart_type = st.selectbox(
                 "Diagrammtyp:",
-                ["Balken", "Säulen", "Kreis", "Donut", "Strich"],
+                UNIVERSAL_CHART_TYPES,
                 index=(
-                    0
-                    if default_chart_type == "Balken"
-                    else (
-                        ["Balken", "Säulen", "Kreis", "Donut", "Strich"].index(
-                            default_chart_type
-                        )
-                        if default_chart_type
-                        in ["Balken", "Säulen", "Kreis", "Donut", "Strich"]
-                        else 0
-                    )
+                    UNIVERSAL_CHART_TYPES.index(default_chart_type)
+                    if default_chart_type in UNIVERSAL_CHART_TYPES
+                    else 0
                 ),
                 key=f"{chart_key}_type",
             )
@@ -1064,48 +1080,13 @@ def create_universal_2d_chart(
         with col3:
             color_scheme = st.selectbox(
                 "Farbschema:",
-                ["Standard", "Grün-Töne", "Blau-Töne", "Warm", "Kalt", "Bunt"],
+                list(CHART_COLOR_PALETTES),
                 key=f"{chart_key}_colors",
             )
 
-        # Farbpaletten definieren
-        color_palettes = {
-            "Standard": [
-                "#1f77b4",
-                "#ff7f0e",
-                "#2ca02c",
-                "#d62728",
-                "#9467bd",
-                "#8c564b",
-            ],
-            "Grün-Töne": [
-                "#2d5016",
-                "#4a7c59",
-                "#6fa866",
-                "#95d473",
-                "#bcf5bc",
-                "#e8f5e8",
-            ],
-            "Blau-Töne": [
-                "#0f3460",
-                "#16537e",
-                "#1e6091",
-                "#266ba0",
-                "#2e86ab",
-                "#37a0b4",
-            ],
-            "Warm": ["#ff6b35", "#f7931e", "#ffd23f", "#ff8c42", "#ff6b6b", "#ff4757"],
-            "Kalt": ["#00d2d3", "#0abdc6", "#009ffd", "#2196f3", "#4fc3f7", "#81d4fa"],
-            "Bunt": ["#e74c3c", "#f39c12", "#f1c40f", "#27ae60", "#3498db", "#9b59b6"],
-        }
-
-        colors = color_palettes.get(color_scheme, default_colors)
-
-        fig = _create_chart_by_type(data, chart_type, colors, title, x_label, y_label)
-
-        # Shadcn-ähnliches Theme anwenden (ohne Farbvorgaben zu überschreiben)
-        _apply_shadcn_like_theme(fig)
-        return fig
+        return build_universal_2d_figure(
+            data, title, chart_type, color_scheme, x_label, y_label, default_colors
+        )
 
     except Exception as e:
         # Fallback: Erstelle ein einfaches Fehler-Diagramm
@@ -1362,6 +1343,163 @@ def create_four_type_chart(
         return fig
 
 
+def build_multi_series_2d_figure(
+    data: Dict[str, Any],
+    title: str,
+    chart_type: str = "Säulen",
+    color_scheme: str = "Standard",
+    x_label: str = "",
+    y_label: str = "",
+) -> go.Figure:
+    """Mehrreihiges 2D-Diagramm ohne Streamlit-Widgets (auch für PDF/Batch nutzbar)."""
+    colors = CHART_COLOR_PALETTES.get(color_scheme, ["#1f77b4", "#ff7f0e", "#2ca02c"])
+
+    if isinstance(data, dict) and "categories" in data and "series" in data:
+        # Format: {'categories': ['Cat1', 'Cat2'], 'series': [{'name': 'Series1', 'data': [1, 2]}, ...]}
+        categories = data["categories"]
+        series_data = data["series"]
+
+        # DataFrame für Multi-Series erstellen
+        df_data = {"Kategorie": categories}
+        for i, series in enumerate(series_data):
+            series_name = series.get("name", f"Serie {i+1}")
+            series_values = series.get("data", [])
+            df_data[series_name] = series_values
+
+        df = pd.DataFrame(df_data)
+
+        if chart_type == "Säulen":
+            fig = px.bar(
+                df,
+                x="Kategorie",
+                y=df.columns[1:],
+                color_discrete_sequence=colors,
+                title=title,
+                labels={"value": y_label, "variable": "Datenreihe"},
+            )
+            fig.update_layout(barmode="group")
+        elif chart_type == "Balken":
+            fig = px.bar(
+                df,
+                y="Kategorie",
+                x=df.columns[1:],
+                orientation="h",
+                color_discrete_sequence=colors,
+                title=title,
+                labels={"value": y_label, "variable": "Datenreihe"},
+            )
+            fig.update_layout(barmode="group")
+        elif chart_type == "Strich":
+            fig = px.line(
+                df,
+                x="Kategorie",
+                y=df.columns[1:],
+                color_discrete_sequence=colors,
+                title=title,
+                labels={"value": y_label, "variable": "Datenreihe"},
+            )
+        elif chart_type in ("Kreis", "Donut"):
+            # Aggregation: Summe je Datenreihe über alle Kategorien
+            agg_values = {}
+            for col in df.columns[1:]:
+                agg_values[col] = df[col].sum()
+            pie_df = pd.DataFrame({"Reihe": list(agg_values.keys()), "Wert": list(agg_values.values())})
+            hole = 0.4 if chart_type == "Donut" else 0
+            fig = px.pie(
+                pie_df,
+                names="Reihe",
+                values="Wert",
+                color_discrete_sequence=colors,
+                title=title,
+                hole=hole,
+            )
+
+    elif isinstance(data, pd.DataFrame):
+        # DataFrame direkt verwenden
+        if chart_type == "Säulen":
+            fig = px.bar(
+                data,
+                x=data.columns[0],
+                y=data.columns[1:],
+                color_discrete_sequence=colors,
+                title=title,
+            )
+            fig.update_layout(barmode="group")
+        elif chart_type == "Balken":
+            fig = px.bar(
+                data,
+                y=data.columns[0],
+                x=data.columns[1:],
+                orientation="h",
+                color_discrete_sequence=colors,
+                title=title,
+            )
+            fig.update_layout(barmode="group")
+        elif chart_type == "Strich":
+            fig = px.line(
+                data,
+                x=data.columns[0],
+                y=data.columns[1:],
+                color_discrete_sequence=colors,
+                title=title,
+            )
+        elif chart_type in ("Kreis", "Donut"):
+            agg_values = {col: data[col].sum() for col in data.columns[1:]}
+            pie_df = pd.DataFrame({"Reihe": list(agg_values.keys()), "Wert": list(agg_values.values())})
+            hole = 0.4 if chart_type == "Donut" else 0
+            fig = px.pie(
+                pie_df,
+                names="Reihe",
+                values="Wert",
+                color_discrete_sequence=colors,
+                title=title,
+                hole=hole,
+            )
+    else:
+        # Fallback: Erstelle ein einfaches Fallback-Diagramm
+        import plotly.graph_objects as go
+
+        fig = go.Figure()
+        fig.add_annotation(
+            text="Datenformat nicht unterstützt für Multi-Series Diagramm",
+            xref="paper",
+            yref="paper",
+            x=0.5,
+            y=0.5,
+            xanchor="center",
+            yanchor="middle",
+            showarrow=False,
+            font=dict(size=16, color="red"),
+        )
+        fig.update_layout(
+            title=title, height=400, margin=dict(l=50, r=50, t=80, b=50)
+        )
+        st.error("Datenformat nicht unterstützt für Multi-Series Diagramm")
+        return fig
+
+    # Interne Plotly-Titel unterdrücken – die Überschrift steht bereits über dem Chart
+    try:
+        fig.update_layout(title_text="")
+    except Exception:
+        pass
+
+    # Layout anpassen und shadcn-ähnliches Theme anwenden
+    fig.update_layout(
+        template="plotly_white",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        font=dict(size=12),
+        height=400,
+        margin=dict(l=40, r=30, t=60, b=40),
+        legend=dict(
+            orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1
+        ),
+    )
+    _apply_shadcn_like_theme(fig)
+
+    return fig
+
+
 def create_multi_series_2d_chart(
     data: Dict[str, Any],
     title: str,
@@ -1373,6 +1511,7 @@ def create_multi_series_2d_chart(
     """
     Erstellt 2D-Diagramme für mehrere Datenreihen
     """
+    chart_types = ["Säulen", "Balken", "Strich", "Kreis", "Donut"]
     # Diagramm-Konfiguration in Spalten
     col1, col2, col3 = st.columns([2, 1, 1])
 
@@ -1382,15 +1521,11 @@ def create_multi_series_2d_chart(
     with col2:
         chart_type = st.selectbox(
             "Diagrammtyp:",
-            ["Säulen", "Balken", "Strich", "Kreis", "Donut"],
+            chart_types,
             index=(
-                0
-                if default_chart_type == "Säulen"
-                else (
-                    ["Säulen", "Balken", "Strich", "Kreis", "Donut"].index(default_chart_type)
-                    if default_chart_type in ["Säulen", "Balken", "Strich", "Kreis", "Donut"]
-                    else 0
-                )
+                chart_types.index(default_chart_type)
+                if default_chart_type in chart_types
+                else 0
             ),
             key=f"{chart_key}_multi_type",
         )
@@ -1398,168 +1533,14 @@ def create_multi_series_2d_chart(
     with col3:
         color_scheme = st.selectbox(
             "Farbschema:",
-            ["Standard", "Grün-Töne", "Blau-Töne", "Warm", "Kalt", "Bunt"],
+            list(CHART_COLOR_PALETTES),
             key=f"{chart_key}_multi_colors",
         )
 
-    # Farbpaletten definieren
-    color_palettes = {
-        "Standard": ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b"],
-        "Grün-Töne": ["#2d5016", "#4a7c59", "#6fa866", "#95d473", "#bcf5bc", "#e8f5e8"],
-        "Blau-Töne": ["#0f3460", "#16537e", "#1e6091", "#266ba0", "#2e86ab", "#37a0b4"],
-        "Warm": ["#ff6b35", "#f7931e", "#ffd23f", "#ff8c42", "#ff6b6b", "#ff4757"],
-        "Kalt": ["#00d2d3", "#0abdc6", "#009ffd", "#2196f3", "#4fc3f7", "#81d4fa"],
-        "Bunt": ["#e74c3c", "#f39c12", "#f1c40f", "#27ae60", "#3498db", "#9b59b6"],
-    }
-
-    colors = color_palettes.get(color_scheme, ["#1f77b4", "#ff7f0e", "#2ca02c"])
-
-    # Multi-Series Chart erstellen
     try:
-        if isinstance(data, dict) and "categories" in data and "series" in data:
-            # Format: {'categories': ['Cat1', 'Cat2'], 'series': [{'name': 'Series1', 'data': [1, 2]}, ...]}
-            categories = data["categories"]
-            series_data = data["series"]
-
-            # DataFrame für Multi-Series erstellen
-            df_data = {"Kategorie": categories}
-            for i, series in enumerate(series_data):
-                series_name = series.get("name", f"Serie {i+1}")
-                series_values = series.get("data", [])
-                df_data[series_name] = series_values
-
-            df = pd.DataFrame(df_data)
-
-            if chart_type == "Säulen":
-                fig = px.bar(
-                    df,
-                    x="Kategorie",
-                    y=df.columns[1:],
-                    color_discrete_sequence=colors,
-                    title=title,
-                    labels={"value": y_label, "variable": "Datenreihe"},
-                )
-                fig.update_layout(barmode="group")
-            elif chart_type == "Balken":
-                fig = px.bar(
-                    df,
-                    y="Kategorie",
-                    x=df.columns[1:],
-                    orientation="h",
-                    color_discrete_sequence=colors,
-                    title=title,
-                    labels={"value": y_label, "variable": "Datenreihe"},
-                )
-                fig.update_layout(barmode="group")
-            elif chart_type == "Strich":
-                fig = px.line(
-                    df,
-                    x="Kategorie",
-                    y=df.columns[1:],
-                    color_discrete_sequence=colors,
-                    title=title,
-                    labels={"value": y_label, "variable": "Datenreihe"},
-                )
-            elif chart_type in ("Kreis", "Donut"):
-                # Aggregation: Summe je Datenreihe über alle Kategorien
-                agg_values = {}
-                for col in df.columns[1:]:
-                    agg_values[col] = df[col].sum()
-                pie_df = pd.DataFrame({"Reihe": list(agg_values.keys()), "Wert": list(agg_values.values())})
-                hole = 0.4 if chart_type == "Donut" else 0
-                fig = px.pie(
-                    pie_df,
-                    names="Reihe",
-                    values="Wert",
-                    color_discrete_sequence=colors,
-                    title=title,
-                    hole=hole,
-                )
-
-        elif isinstance(data, pd.DataFrame):
-            # DataFrame direkt verwenden
-            if chart_type == "Säulen":
-                fig = px.bar(
-                    data,
-                    x=data.columns[0],
-                    y=data.columns[1:],
-                    color_discrete_sequence=colors,
-                    title=title,
-                )
-                fig.update_layout(barmode="group")
-            elif chart_type == "Balken":
-                fig = px.bar(
-                    data,
-                    y=data.columns[0],
-                    x=data.columns[1:],
-                    orientation="h",
-                    color_discrete_sequence=colors,
-                    title=title,
-                )
-                fig.update_layout(barmode="group")
-            elif chart_type == "Strich":
-                fig = px.line(
-                    data,
-                    x=data.columns[0],
-                    y=data.columns[1:],
-                    color_discrete_sequence=colors,
-                    title=title,
-                )
-            elif chart_type in ("Kreis", "Donut"):
-                agg_values = {col: data[col].sum() for col in data.columns[1:]}
-                pie_df = pd.DataFrame({"Reihe": list(agg_values.keys()), "Wert": list(agg_values.values())})
-                hole = 0.4 if chart_type == "Donut" else 0
-                fig = px.pie(
-                    pie_df,
-                    names="Reihe",
-                    values="Wert",
-                    color_discrete_sequence=colors,
-                    title=title,
-                    hole=hole,
-                )
-        else:
-            # Fallback: Erstelle ein einfaches Fallback-Diagramm
-            import plotly.graph_objects as go
-
-            fig = go.Figure()
-            fig.add_annotation(
-                text="Datenformat nicht unterstützt für Multi-Series Diagramm",
-                xref="paper",
-                yref="paper",
-                x=0.5,
-                y=0.5,
-                xanchor="center",
-                yanchor="middle",
-                showarrow=False,
-                font=dict(size=16, color="red"),
-            )
-            fig.update_layout(
-                title=title, height=400, margin=dict(l=50, r=50, t=80, b=50)
-            )
-            st.error("Datenformat nicht unterstützt für Multi-Series Diagramm")
-            return fig
-
-        # Interne Plotly-Titel unterdrücken – die Überschrift steht bereits über dem Chart
-        try:
-            fig.update_layout(title_text="")
-        except Exception:
-            pass
-
-        # Layout anpassen und shadcn-ähnliches Theme anwenden
-        fig.update_layout(
-            template="plotly_white",
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            font=dict(size=12),
-            height=400,
-            margin=dict(l=40, r=30, t=60, b=40),
-            legend=dict(
-                orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1
-            ),
+        return build_multi_series_2d_figure(
+            data, title, chart_type, color_scheme, x_label, y_label
         )
-        _apply_shadcn_like_theme(fig)
-
-        return fig
 
     except Exception as e:
         # Fallback: Erstelle ein einfaches Fehler-Diagramm
@@ -2023,13 +2004,99 @@ def _add_chart_controls(
             st.session_state[key_secondary_color] = new_secondary_color
     st.markdown("---")
 
-def render_daily_production_switcher(
+@dataclass
+class SwitcherChartSpec:
+    """Aufbereitete Daten eines Diagramm-Umschalters – gemeinsam für UI und headless PDF-Export.
+
+    data ist None, wenn das Diagramm nicht erstellt werden kann; notice enthält dann den Grund
+    (bzw. bei simulierten Ersatzdaten einen Hinweis).
+    """
+    title: str
+    data: Optional[Dict[str, Any]] = None
+    x_label: str = ""
+    y_label: str = ""
+    default_chart_type: str = "Balken"
+    multi_series: bool = False
+    style_key: Optional[str] = None
+    notice: Optional[str] = None
+    extras: Dict[str, Any] = field(default_factory=dict)
+
+
+def _month_labels(texts: Dict[str, str]) -> List[str]:
+    month_labels = get_text(
+        texts,
+        "month_names_short_list",
+        "Jan,Feb,Mrz,Apr,Mai,Jun,Jul,Aug,Sep,Okt,Nov,Dez",
+    ).split(",")
+    if len(month_labels) != 12:
+        month_labels = "Jan,Feb,Mrz,Apr,Mai,Jun,Jul,Aug,Sep,Okt,Nov,Dez".split(",")
+    return month_labels
+
+
+def _finite_floats(values: Any) -> List[float]:
+    """Liste als float-Werte; NaN/Inf und Nicht-Zahlen werden zu 0.0."""
+    return [
+        (
+            float(v)
+            if isinstance(v, (int, float)) and not math.isnan(v) and not math.isinf(v)
+            else 0.0
+        )
+        for v in values
+    ]
+
+
+# Typische monatliche Verteilung der PV-Produktion in Deutschland
+_MONTHLY_PV_FACTORS = [0.03, 0.05, 0.08, 0.11, 0.13, 0.14, 0.13, 0.12, 0.09, 0.06, 0.04, 0.02]
+
+
+def build_switcher_figure(
+    spec: SwitcherChartSpec,
+    viz_settings: Dict[str, Any],
+    chart_type: Optional[str] = None,
+    color_scheme: str = "Standard",
+) -> Optional[go.Figure]:
+    """Figure eines Diagramm-Umschalters ohne Streamlit (None, wenn keine Daten)."""
+    if spec.data is None:
+        return None
+    builder = build_multi_series_2d_figure if spec.multi_series else build_universal_2d_figure
+    fig = builder(
+        spec.data,
+        spec.title,
+        chart_type or spec.default_chart_type,
+        color_scheme,
+        spec.x_label,
+        spec.y_label,
+    )
+    if spec.style_key:
+        _apply_custom_style_to_fig(fig, viz_settings, spec.style_key)
+    return fig
+
+
+def _create_switcher_chart(
+    spec: SwitcherChartSpec, chart_key: str, viz_settings: Dict[str, Any]
+) -> Optional[go.Figure]:
+    """UI-Variante von build_switcher_figure mit Auswahl von Diagrammtyp und Farbschema."""
+    create = create_multi_series_2d_chart if spec.multi_series else create_universal_2d_chart
+    fig = create(
+        spec.data,
+        title=spec.title,
+        chart_key=chart_key,
+        x_label=spec.x_label,
+        y_label=spec.y_label,
+        default_chart_type=spec.default_chart_type,
+    )
+    if fig is not None and spec.style_key:
+        _apply_custom_style_to_fig(fig, viz_settings, spec.style_key)
+    return fig
+
+
+def build_daily_production_figure(
     analysis_results: Dict[str, Any],
     texts: Dict[str, str],
     viz_settings: Dict[str, Any],
-):
-    """Moderne 2D-Darstellung der Tagesproduktion mit Diagramm- und Farbwahl"""
-    # Daten vorbereiten
+    chart_type: str = "Säulen",
+) -> go.Figure:
+    """Tagesproduktion (simuliert) als Figure – ohne Streamlit, auch für PDF/Batch nutzbar."""
     hours = list(range(24))
     anlage_kwp_val = analysis_results.get("anlage_kwp", 0.0)
     if not isinstance(anlage_kwp_val, (int, float)) or anlage_kwp_val <= 0:
@@ -2043,17 +2110,6 @@ def render_daily_production_switcher(
         * 0.9
     ]
 
-    df_day = pd.DataFrame({
-        "Stunde": hours,
-        get_text(texts, "pv_power_label_switcher", "Photovoltaik-Leistung (kW)"): power,
-    })
-
-    chart_type = st.selectbox(
-        get_text(texts, "daily_prod_chart_type_label", "Diagrammtyp"),
-        ["Säulen", "Balken", "Strich", "Kreis", "Donut"],
-        key="daily_prod_chart_type_switcher",
-    )
-
     title = get_text(
         texts,
         "viz_daily_production_title_switcher",
@@ -2092,6 +2148,26 @@ def render_daily_production_switcher(
             template="plotly_white",
         )
     _apply_custom_style_to_fig(fig, viz_settings, "daily_production_switcher")
+    return fig
+
+
+def render_daily_production_switcher(
+    analysis_results: Dict[str, Any],
+    texts: Dict[str, str],
+    viz_settings: Dict[str, Any],
+):
+    """Moderne 2D-Darstellung der Tagesproduktion mit Diagramm- und Farbwahl"""
+    chart_type = st.selectbox(
+        get_text(texts, "daily_prod_chart_type_label", "Diagrammtyp"),
+        ["Säulen", "Balken", "Strich", "Kreis", "Donut"],
+        key="daily_prod_chart_type_switcher",
+    )
+    fig = build_daily_production_figure(analysis_results, texts, viz_settings, chart_type)
+    title = get_text(
+        texts,
+        "viz_daily_production_title_switcher",
+        "Tagesproduktion (simuliert)",
+    )
     with st.expander(title, expanded=False):
         st.plotly_chart(fig, use_container_width=True, key="analysis_daily_prod_switcher_key_v7_2d")
     analysis_results["daily_production_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(fig, texts)
@@ -2142,14 +2218,9 @@ def render_tariff_cube_switcher(
         st.error("Fehler beim Erstellen des Tagesproduktions-Diagramms")
 
 
-def render_weekly_production_switcher(
-    analysis_results: Dict[str, Any],
-    texts: Dict[str, str],
-    viz_settings: Dict[str, Any],
-):
-    """Moderne 2D-Darstellung der Wochenproduktion mit Diagramm- und Farbwahl"""
-
-    # Daten vorbereiten
+def _weekly_production_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
     days = get_text(
         texts, "day_names_short_list_switcher", "Mo,Di,Mi,Do,Fr,Sa,So"
     ).split(",")
@@ -2160,132 +2231,92 @@ def render_weekly_production_switcher(
     if not isinstance(anlage_kwp_val, (int, float)) or anlage_kwp_val <= 0:
         anlage_kwp_val = 5.0
 
-    # Wöchentliche Produktionssummen simulieren
+    # Wöchentliche Produktionssummen simulieren (fester Seed: UI und PDF zeigen dieselben Werte)
+    noise = np.random.default_rng(7).normal(0, 1, 7)
     weekly_production = []
     for day_idx in range(7):
         # Leichte Variation je Tag (Sa/So weniger, Mi-Fr mehr)
         day_factor = [0.9, 1.0, 1.1, 1.1, 1.0, 0.8, 0.7][day_idx]
-        daily_sum = anlage_kwp_val * 8.5 * day_factor + np.random.normal(0, 1)
-        weekly_production.append(max(0, round(daily_sum, 2)))
-
-    # Daten für universelle Diagrammfunktion
-    chart_data = {"labels": days, "values": weekly_production}
+        daily_sum = anlage_kwp_val * 8.5 * day_factor + noise[day_idx]
+        weekly_production.append(max(0, round(float(daily_sum), 2)))
 
-    # Universelles 2D-Diagramm erstellen
-    weekly_title = get_text(
-        texts, "viz_weekly_prod_title_switcher", "Wochenproduktion (simuliert)"
-    )
-    fig = create_universal_2d_chart(
-        data=chart_data,
-        title=weekly_title,
-        chart_key="weekly_production",
+    return SwitcherChartSpec(
+        title=get_text(
+            texts, "viz_weekly_prod_title_switcher", "Wochenproduktion (simuliert)"
+        ),
+        data={"labels": days, "values": weekly_production},
         x_label="Wochentag",
         y_label="Produktion (kWh)",
         default_chart_type="Säulen",
     )
 
-    if fig:
-        with st.expander(weekly_title, expanded=False):
-            st.plotly_chart(
-                fig, use_container_width=True, key="analysis_weekly_prod_switcher_key_v7_2d"
-            )
-        analysis_results["weekly_production_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(fig, texts)
-    else:
-        st.error("Fehler beim Erstellen des Wochenproduktions-Diagramms")
-
 
-def render_yearly_production_switcher(
+def render_weekly_production_switcher(
     analysis_results: Dict[str, Any],
     texts: Dict[str, str],
     viz_settings: Dict[str, Any],
 ):
-    """Moderne 2D-Darstellung der Jahresproduktion mit Diagramm- und Farbwahl"""
+    """Moderne 2D-Darstellung der Wochenproduktion mit Diagramm- und Farbwahl"""
+    spec = _weekly_production_chart_spec(analysis_results, texts)
+    fig = _create_switcher_chart(spec, "weekly_production", viz_settings)
 
-    # Daten vorbereiten
-    month_labels = get_text(
-        texts,
-        "month_names_short_list",
-        "Jan,Feb,Mrz,Apr,Mai,Jun,Jul,Aug,Sep,Okt,Nov,Dez",
-    ).split(",")
-    if len(month_labels) != 12:
-        month_labels = [
-            "Jan",
-            "Feb",
-            "Mrz",
-            "Apr",
-            "Mai",
-            "Jun",
-            "Jul",
-            "Aug",
-            "Sep",
-            "Okt",
-            "Nov",
-            "Dez",
-        ]
+    if fig:
+        with st.expander(spec.title, expanded=False):
+            st.plotly_chart(
+                fig, use_container_width=True, key="analysis_weekly_prod_switcher_key_v7_2d"
+            )
+        analysis_results["weekly_production_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(fig, texts)
+    else:
+        st.error("Fehler beim Erstellen des Wochenproduktions-Diagramms")
 
+
+def _yearly_production_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
     production_data_raw = analysis_results.get("monthly_productions_sim", [])
+    notice = None
 
     # Fallback wenn keine Daten vorhanden
     if not isinstance(production_data_raw, list) or len(production_data_raw) != 12:
-        st.warning(
-            get_text(
-                texts,
-                "viz_data_missing_monthly_prod_switcher",
-                "Monatliche Produktionsdaten für Jahresdiagramm nicht verfügbar.",
-            )
+        notice = get_text(
+            texts,
+            "viz_data_missing_monthly_prod_switcher",
+            "Monatliche Produktionsdaten für Jahresdiagramm nicht verfügbar.",
         )
-
         # Simuliere realistische Monatsdaten
         anlage_kwp_val = analysis_results.get("anlage_kwp", 5.0)
-        # Typische monatliche Verteilung für Deutschland
-        monthly_factors = [
-            0.03,
-            0.05,
-            0.08,
-            0.11,
-            0.13,
-            0.14,
-            0.13,
-            0.12,
-            0.09,
-            0.06,
-            0.04,
-            0.02,
-        ]
         yearly_total = anlage_kwp_val * 1000  # ca. 1000 kWh pro kWp
-        production_data = [yearly_total * factor for factor in monthly_factors]
+        production_data = [yearly_total * factor for factor in _MONTHLY_PV_FACTORS]
     else:
-        production_data = [
-            (
-                float(v)
-                if isinstance(v, (int, float))
-                and not math.isnan(v)
-                and not math.isinf(v)
-                else 0.0
-            )
-            for v in production_data_raw
-        ]
-
-    # Daten für universelle Diagrammfunktion
-    chart_data = {"labels": month_labels, "values": production_data}
+        production_data = _finite_floats(production_data_raw)
 
-    # Universelles 2D-Diagramm erstellen
-    yearly_title = get_text(
-        texts,
-        "viz_yearly_prod_bar3d_title_switcher",
-        "Jährliche Photovoltaik-Produktion nach Monaten",
-    )
-    fig = create_universal_2d_chart(
-        data=chart_data,
-        title=yearly_title,
-        chart_key="yearly_production",
+    return SwitcherChartSpec(
+        title=get_text(
+            texts,
+            "viz_yearly_prod_bar3d_title_switcher",
+            "Jährliche Photovoltaik-Produktion nach Monaten",
+        ),
+        data={"labels": _month_labels(texts), "values": production_data},
         x_label="Monat",
         y_label="Produktion (kWh)",
         default_chart_type="Säulen",
+        notice=notice,
     )
 
+
+def render_yearly_production_switcher(
+    analysis_results: Dict[str, Any],
+    texts: Dict[str, str],
+    viz_settings: Dict[str, Any],
+):
+    """Moderne 2D-Darstellung der Jahresproduktion mit Diagramm- und Farbwahl"""
+    spec = _yearly_production_chart_spec(analysis_results, texts)
+    if spec.notice:
+        st.warning(spec.notice)
+    fig = _create_switcher_chart(spec, "yearly_production", viz_settings)
+
     if fig:
-        with st.expander(yearly_title, expanded=False):
+        with st.expander(spec.title, expanded=False):
             st.plotly_chart(
                 fig, use_container_width=True, key="analysis_yearly_prod_switcher_key_v7_2d"
             )
@@ -2294,14 +2325,9 @@ def render_yearly_production_switcher(
         st.error("Fehler beim Erstellen des Jahresproduktions-Diagramms")
 
 
-def render_project_roi_matrix_switcher(
-    analysis_results: Dict[str, Any],
-    texts: Dict[str, str],
-    viz_settings: Dict[str, Any],
-):
-    """Moderne 2D-Darstellung der Projektrendite mit Diagramm- und Farbwahl"""
-
-    # Daten vorbereiten
+def _project_roi_matrix_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
     total_investment_netto_val = analysis_results.get("total_investment_netto", 0.0)
     if (
         not isinstance(total_investment_netto_val, (int, float))
@@ -2322,45 +2348,38 @@ def render_project_roi_matrix_switcher(
     scenarios = ["Konservativ", "Realistisch", "Optimistisch"]
     factors = [0.8, 1.0, 1.2]
     roi_values = []
-
     for factor in factors:
         adjusted_benefit = annual_financial_benefit_year1_val * factor
-        years_to_break_even = (
-            total_investment_netto_val / adjusted_benefit
-            if adjusted_benefit > 0
-            else 999
-        )
         roi_20_years = (
-            (
-                (adjusted_benefit * 20 - total_investment_netto_val)
-                / total_investment_netto_val
-            )
-            * 100
-            if total_investment_netto_val > 0
-            else 0
-        )
+            (adjusted_benefit * 20 - total_investment_netto_val)
+            / total_investment_netto_val
+        ) * 100
         roi_values.append(max(0, roi_20_years))
 
-    # Daten für universelle Diagrammfunktion
-    chart_data = {"labels": scenarios, "values": roi_values}
-
-    # Universelles 2D-Diagramm erstellen
-    proj_title = get_text(
-        texts,
-        "viz_project_roi_matrix_title_switcher",
-        "Projektrendite-Szenarien (20 Jahre)",
-    )
-    fig = create_universal_2d_chart(
-        data=chart_data,
-        title=proj_title,
-        chart_key="project_roi_matrix",
+    return SwitcherChartSpec(
+        title=get_text(
+            texts,
+            "viz_project_roi_matrix_title_switcher",
+            "Projektrendite-Szenarien (20 Jahre)",
+        ),
+        data={"labels": scenarios, "values": roi_values},
         x_label="Szenario",
         y_label="ROI (%)",
         default_chart_type="Säulen",
     )
 
+
+def render_project_roi_matrix_switcher(
+    analysis_results: Dict[str, Any],
+    texts: Dict[str, str],
+    viz_settings: Dict[str, Any],
+):
+    """Moderne 2D-Darstellung der Projektrendite mit Diagramm- und Farbwahl"""
+    spec = _project_roi_matrix_chart_spec(analysis_results, texts)
+    fig = _create_switcher_chart(spec, "project_roi_matrix", viz_settings)
+
     if fig:
-        with st.expander(proj_title, expanded=False):
+        with st.expander(spec.title, expanded=False):
             st.plotly_chart(
                 fig,
                 use_container_width=True,
@@ -2371,81 +2390,31 @@ def render_project_roi_matrix_switcher(
         st.error("Fehler beim Erstellen des ROI-Diagramms")
 
 
-def render_feed_in_revenue_switcher(
-    analysis_results: Dict[str, Any],
-    texts: Dict[str, str],
-    viz_settings: Dict[str, Any],
-):
-    """Moderne 2D-Darstellung der Einspeisevergütung mit Diagramm- und Farbwahl"""
-
-    # Daten vorbereiten
-    month_labels = get_text(
-        texts,
-        "month_names_short_list",
-        "Jan,Feb,Mrz,Apr,Mai,Jun,Jul,Aug,Sep,Okt,Nov,Dez",
-    ).split(",")
-    if len(month_labels) != 12:
-        month_labels = [
-            "Jan",
-            "Feb",
-            "Mrz",
-            "Apr",
-            "Mai",
-            "Jun",
-            "Jul",
-            "Aug",
-            "Sep",
-            "Okt",
-            "Nov",
-            "Dez",
-        ]
-
+def _feed_in_revenue_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
     monthly_feed_in_kwh_raw = analysis_results.get("monthly_feed_in_kwh", [])
     feed_in_tariff_eur_kwh_raw = analysis_results.get(
         "einspeiseverguetung_eur_per_kwh", 0.081
     )
+    notice = None
 
     # Fallback wenn keine Daten vorhanden
     if (
         not isinstance(monthly_feed_in_kwh_raw, list)
         or len(monthly_feed_in_kwh_raw) != 12
     ):
-        st.warning(
-            get_text(
-                texts,
-                "viz_data_missing_feed_in_revenue_switcher",
-                "Monatliche Einspeisedaten nicht verfügbar.",
-            )
+        notice = get_text(
+            texts,
+            "viz_data_missing_feed_in_revenue_switcher",
+            "Monatliche Einspeisedaten nicht verfügbar.",
         )
         # Simuliere realistische Einspeisedaten
         anlage_kwp_val = analysis_results.get("anlage_kwp", 5.0)
-        monthly_factors = [
-            0.03,
-            0.05,
-            0.08,
-            0.11,
-            0.13,
-            0.14,
-            0.13,
-            0.12,
-            0.09,
-            0.06,
-            0.04,
-            0.02,
-        ]
         yearly_feed_in = anlage_kwp_val * 600  # ca. 60% Einspeisung
-        monthly_feed_in_kwh = [yearly_feed_in * factor for factor in monthly_factors]
+        monthly_feed_in_kwh = [yearly_feed_in * factor for factor in _MONTHLY_PV_FACTORS]
     else:
-        monthly_feed_in_kwh = [
-            (
-                float(v)
-                if isinstance(v, (int, float))
-                and not math.isnan(v)
-                and not math.isinf(v)
-                else 0.0
-            )
-            for v in monthly_feed_in_kwh_raw
-        ]
+        monthly_feed_in_kwh = _finite_floats(monthly_feed_in_kwh_raw)
 
     feed_in_tariff_eur_kwh = (
         float(feed_in_tariff_eur_kwh_raw)
@@ -2458,26 +2427,33 @@ def render_feed_in_revenue_switcher(
     # Einnahmen berechnen
     einnahmen = [kwh * feed_in_tariff_eur_kwh for kwh in monthly_feed_in_kwh]
 
-    # Daten für universelle Diagrammfunktion
-    chart_data = {"labels": month_labels, "values": einnahmen}
-
-    # Universelles 2D-Diagramm erstellen
-    feedin_title = get_text(
-        texts,
-        "viz_feed_in_revenue_title_switcher",
-        f"Monatliche Einspeisevergütung (Tarif: {feed_in_tariff_eur_kwh*100:.2f} ct/kWh)",
-    )
-    fig = create_universal_2d_chart(
-        data=chart_data,
-        title=feedin_title,
-        chart_key="feed_in_revenue",
+    return SwitcherChartSpec(
+        title=get_text(
+            texts,
+            "viz_feed_in_revenue_title_switcher",
+            f"Monatliche Einspeisevergütung (Tarif: {feed_in_tariff_eur_kwh*100:.2f} ct/kWh)",
+        ),
+        data={"labels": _month_labels(texts), "values": einnahmen},
         x_label="Monat",
         y_label="Einnahmen (€)",
         default_chart_type="Säulen",
+        notice=notice,
     )
 
+
+def render_feed_in_revenue_switcher(
+    analysis_results: Dict[str, Any],
+    texts: Dict[str, str],
+    viz_settings: Dict[str, Any],
+):
+    """Moderne 2D-Darstellung der Einspeisevergütung mit Diagramm- und Farbwahl"""
+    spec = _feed_in_revenue_chart_spec(analysis_results, texts)
+    if spec.notice:
+        st.warning(spec.notice)
+    fig = _create_switcher_chart(spec, "feed_in_revenue", viz_settings)
+
     if fig:
-        with st.expander(feedin_title, expanded=False):
+        with st.expander(spec.title, expanded=False):
             st.plotly_chart(
                 fig,
                 use_container_width=True,
@@ -2488,37 +2464,12 @@ def render_feed_in_revenue_switcher(
         st.error("Fehler beim Erstellen des Einspeisevergütungs-Diagramms")
 
 
-def render_production_vs_consumption_switcher(
-    analysis_results: Dict[str, Any],
-    texts: Dict[str, str],
-    viz_settings: Dict[str, Any],
-):
-    """Moderne 2D-Darstellung Verbrauch vs. Produktion mit Diagramm- und Farbwahl"""
-
-    # Daten vorbereiten
-    month_labels = get_text(
-        texts,
-        "month_names_short_list",
-        "Jan,Feb,Mrz,Apr,Mai,Jun,Jul,Aug,Sep,Okt,Nov,Dez",
-    ).split(",")
-    if len(month_labels) != 12:
-        month_labels = [
-            "Jan",
-            "Feb",
-            "Mrz",
-            "Apr",
-            "Mai",
-            "Jun",
-            "Jul",
-            "Aug",
-            "Sep",
-            "Okt",
-            "Nov",
-            "Dez",
-        ]
-
+def _production_vs_consumption_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
     verbrauch_raw = analysis_results.get("monthly_consumption_sim", [])
     produktion_raw = analysis_results.get("monthly_productions_sim", [])
+    notice = None
 
     # Fallback wenn keine Daten vorhanden
     if not (
@@ -2527,87 +2478,122 @@ def render_production_vs_consumption_switcher(
         and isinstance(produktion_raw, list)
         and len(produktion_raw) == 12
     ):
-        st.warning(
-            get_text(
-                texts,
-                "viz_data_missing_prod_cons_switcher",
-                "Monatliche Verbrauchs- oder Produktionsdaten nicht verfügbar.",
-            )
+        notice = get_text(
+            texts,
+            "viz_data_missing_prod_cons_switcher",
+            "Monatliche Verbrauchs- oder Produktionsdaten nicht verfügbar.",
         )
 
         # Simuliere realistische Daten
         anlage_kwp_val = analysis_results.get("anlage_kwp", 5.0)
-        monthly_prod_factors = [
-            0.03,
-            0.05,
-            0.08,
-            0.11,
-            0.13,
-            0.14,
-            0.13,
-            0.12,
-            0.09,
-            0.06,
-            0.04,
-            0.02,
-        ]
         monthly_cons_factors = [
-            0.10,
-            0.09,
-            0.08,
-            0.07,
-            0.06,
-            0.06,
-            0.06,
-            0.07,
-            0.08,
-            0.09,
-            0.10,
-            0.11,
+            0.10, 0.09, 0.08, 0.07, 0.06, 0.06, 0.06, 0.07, 0.08, 0.09, 0.10, 0.11,
         ]  # Mehr im Winter
 
         yearly_production = anlage_kwp_val * 1000
         yearly_consumption = yearly_production * 0.8  # 80% des Produktionswertes
 
-        produktion = [yearly_production * factor for factor in monthly_prod_factors]
+        produktion = [yearly_production * factor for factor in _MONTHLY_PV_FACTORS]
         verbrauch = [yearly_consumption * factor for factor in monthly_cons_factors]
     else:
-        verbrauch = [
-            (
-                float(v)
-                if isinstance(v, (int, float))
-                and not math.isnan(v)
-                and not math.isinf(v)
-                else 0.0
-            )
-            for v in verbrauch_raw
-        ]
-        produktion = [
-            (
-                float(p)
-                if isinstance(p, (int, float))
-                and not math.isnan(p)
-                and not math.isinf(p)
-                else 0.0
-            )
-            for p in produktion_raw
-        ]
+        verbrauch = _finite_floats(verbrauch_raw)
+        produktion = _finite_floats(produktion_raw)
+
+    return SwitcherChartSpec(
+        title="Verbrauch vs. Produktion (Jahr 1)",
+        data={
+            "categories": _month_labels(texts),
+            "series": [
+                {"name": "Verbrauch (kWh)", "data": verbrauch},
+                {"name": "Produktion (kWh)", "data": produktion},
+            ],
+        },
+        x_label="Monat",
+        y_label="Energie (kWh)",
+        default_chart_type="Säulen",
+        multi_series=True,
+        style_key="prod_vs_cons_switcher",
+        notice=notice,
+    )
 
-    # DataFrame für Multi-Serien-Diagramm erstellen
-    df_comparison = pd.DataFrame(
-        {
-            "Monat": month_labels,
-            "Verbrauch (kWh)": verbrauch,
-            "Produktion (kWh)": produktion,
-        }
+
+# Farbpaletten für Vergleichsdiagramme (zwei Datenreihen)
+PROD_VS_CONS_COLOR_PALETTES: Dict[str, List[str]] = {
+    "Standard": ["#1f77b4", "#ff7f0e"],
+    "Grün-Blau": ["#2ca02c", "#1f77b4"],
+    "Rot-Grün": ["#d62728", "#2ca02c"],
+    "Warm": ["#ff6b35", "#f7931e"],
+    "Kalt": ["#00d2d3", "#0abdc6"],
+}
+
+
+def build_production_vs_consumption_figure(
+    spec: SwitcherChartSpec,
+    viz_settings: Dict[str, Any],
+    chart_type: str = "Säulen",
+    color_scheme: str = "Standard",
+) -> go.Figure:
+    """Verbrauch vs. Produktion als gruppiertes Diagramm – ohne Streamlit, auch für PDF/Batch nutzbar."""
+    df_comparison = pd.DataFrame({"Monat": spec.data["categories"]})
+    series_names = []
+    for series in spec.data["series"]:
+        df_comparison[series["name"]] = series["data"]
+        series_names.append(series["name"])
+    colors = PROD_VS_CONS_COLOR_PALETTES.get(color_scheme, ["#1f77b4", "#ff7f0e"])
+
+    if chart_type == "Säulen":
+        fig = px.bar(
+            df_comparison,
+            x="Monat",
+            y=series_names,
+            barmode="group",
+            title=spec.title,
+            color_discrete_sequence=colors,
+        )
+    elif chart_type == "Strich":
+        fig = px.line(
+            df_comparison,
+            x="Monat",
+            y=series_names,
+            title=spec.title,
+            color_discrete_sequence=colors,
+        )
+    else:  # Balken horizontal
+        fig = px.bar(
+            df_comparison,
+            y="Monat",
+            x=series_names,
+            barmode="group",
+            orientation="h",
+            title=spec.title,
+            color_discrete_sequence=colors,
+        )
+
+    fig.update_layout(
+        xaxis_title=spec.x_label,
+        yaxis_title=spec.y_label,
+        legend_title="Kategorie",
+        template="plotly_white",
     )
+    _apply_custom_style_to_fig(fig, viz_settings, spec.style_key)
+    return fig
+
+
+def render_production_vs_consumption_switcher(
+    analysis_results: Dict[str, Any],
+    texts: Dict[str, str],
+    viz_settings: Dict[str, Any],
+):
+    """Moderne 2D-Darstellung Verbrauch vs. Produktion mit Diagramm- und Farbwahl"""
+    spec = _production_vs_consumption_chart_spec(analysis_results, texts)
+    if spec.notice:
+        st.warning(spec.notice)
 
-    # Diagramm-Konfiguration
-    with st.expander("Verbrauch vs. Produktion (Jahr 1)", expanded=False):
+    with st.expander(spec.title, expanded=False):
         col1, col2, col3 = st.columns([2, 1, 1])
 
         with col1:
-            st.markdown("### Verbrauch vs. Produktion (Jahr 1)")
+            st.markdown(f"### {spec.title}")
 
         with col2:
             chart_type = st.selectbox(
@@ -2617,119 +2603,22 @@ def render_production_vs_consumption_switcher(
         with col3:
             color_scheme = st.selectbox(
                 "Farbschema:",
-                ["Standard", "Grün-Blau", "Rot-Grün", "Warm", "Kalt"],
+                list(PROD_VS_CONS_COLOR_PALETTES),
                 key="prod_vs_cons_colors",
             )
 
-    # Farbpaletten für Vergleichsdiagramme
-    color_palettes = {
-        "Standard": ["#1f77b4", "#ff7f0e"],
-        "Grün-Blau": ["#2ca02c", "#1f77b4"],
-        "Rot-Grün": ["#d62728", "#2ca02c"],
-        "Warm": ["#ff6b35", "#f7931e"],
-        "Kalt": ["#00d2d3", "#0abdc6"],
-    }
-
-    colors = color_palettes.get(color_scheme, ["#1f77b4", "#ff7f0e"])
-
-    # Diagramm erstellen
-    if chart_type == "Säulen":
-        fig = go.Figure()
-        fig.add_trace(
-            go.Bar(
-                x=month_labels,
-                y=verbrauch,
-                name="Verbrauch (kWh)",
-                marker_color=colors[0],
-            )
-        )
-        fig.add_trace(
-            go.Bar(
-                x=month_labels,
-                y=produktion,
-                name="Produktion (kWh)",
-                marker_color=colors[1],
-            )
-        )
-    elif chart_type == "Strich":
-        fig = go.Figure()
-        fig.add_trace(
-            go.Scatter(
-                x=month_labels,
-                y=verbrauch,
-                mode="lines+markers",
-                name="Verbrauch (kWh)",
-                line=dict(color=colors[0]),
-            )
-        )
-        fig.add_trace(
-            go.Scatter(
-                x=month_labels,
-                y=produktion,
-                mode="lines+markers",
-                name="Produktion (kWh)",
-                line=dict(color=colors[1]),
-            )
-        )
-        if chart_type == "Säulen":
-            fig = px.bar(
-                df_comparison,
-                x="Monat",
-                y=["Verbrauch (kWh)", "Produktion (kWh)"],
-                barmode="group",
-                title="Verbrauch vs. Produktion (Jahr 1)",
-                color_discrete_sequence=colors,
-            )
-        elif chart_type == "Strich":
-            fig = px.line(
-                df_comparison,
-                x="Monat",
-                y=["Verbrauch (kWh)", "Produktion (kWh)"],
-                title="Verbrauch vs. Produktion (Jahr 1)",
-                color_discrete_sequence=colors,
-            )
-        else:  # Balken horizontal
-            fig = px.bar(
-                df_comparison,
-                y="Monat",
-                x=["Verbrauch (kWh)", "Produktion (kWh)"],
-                barmode="group",
-                orientation="h",
-                title="Verbrauch vs. Produktion (Jahr 1)",
-                color_discrete_sequence=colors,
-            )
-
-        fig.update_layout(
-            xaxis_title="Monat",
-            yaxis_title="Energie (kWh)",
-            legend_title="Kategorie",
-            template="plotly_white",
+        fig = build_production_vs_consumption_figure(
+            spec, viz_settings, chart_type, color_scheme
         )
-        _apply_custom_style_to_fig(fig, viz_settings, "prod_vs_cons_switcher")
-
         st.plotly_chart(
             fig, use_container_width=True, key="analysis_prod_vs_cons_switcher_key_v7_2d"
         )
-        analysis_results["prod_vs_cons_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-            fig, texts
-        )
-        
-def render_tariff_cube_switcher(
-    analysis_results: Dict[str, Any],
-    texts: Dict[str, str],
-    viz_settings: Dict[str, Any],
-):
-    """Tarifvergleich verschiedener Anbieter (Jahreskosten) als 2D Chart.
-
-    Zeigt aktuellen Tarif, berechnete Photovoltaik-Gestehungskosten (LCOE) sowie zwei
-    alternative Szenarien. Ergebnisse werden in analysis_results als Bytes
-    für PDF-Export abgelegt.
-    """
-    title = get_text(
-        texts, "viz_tariff_cube_switcher", "Tarifvergleich - Anbieter (2D Diagramm)"
+    analysis_results["prod_vs_cons_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
+        fig, texts
     )
-
-    # Daten vorbereiten
+def _tariff_cube_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
     anbieter = ["Aktuell", "Photovoltaik-Strom", "Alternativ A", "Alternativ B"]
     aktueller_preis_kwh = float(
         analysis_results.get("aktueller_strompreis_fuer_hochrechnung_euro_kwh", 0.30)
@@ -2755,59 +2644,44 @@ def render_tariff_cube_switcher(
     ]
     gesamt = [g + a * jahresverbrauch for g, a in zip(grundgebuehr, arbeitspreis)]
 
-    chart_data = {
-        "categories": anbieter,
-        "series": [
-            {
-                "name": get_text(texts, "annual_costs_label_switcher", "Jahreskosten (€)"),
-                "data": gesamt,
-            }
-        ],
-    }
-
-    fig = create_multi_series_2d_chart(
-        chart_data,
-        title=title,
-        x_label=get_text(texts, "provider_label_switcher", "Anbieter"),
-        y_label=get_text(texts, "costs_label_switcher", "Kosten (€)"),
-        chart_key="analysis_tariff_cube_switcher_key_v6_final",
+    return SwitcherChartSpec(
+        title=get_text(
+            texts,
+            "viz_tariff_cube_title_switcher",
+            f"Tarifvergleich bei {jahresverbrauch:.2f} kWh/Jahr",
+        ),
+        data={
+            "x": anbieter,
+            "y": gesamt,
+            "labels": [
+                f"{name} ({arbeitspreis[i]:.2f}€/kWh + {grundgebuehr[i]}€ GG)"
+                for i, name in enumerate(anbieter)
+            ],
+        },
+        x_label="Anbieter",
+        y_label="Gesamtkosten €/Jahr",
+        style_key="tariff_cube_switcher",
     )
-    _apply_custom_style_to_fig(fig, viz_settings, "tariff_cube_switcher")
-    with st.expander(title, expanded=False):
-        st.plotly_chart(
-            fig,
-            use_container_width=True,
-            key="analysis_tariff_cube_switcher_plot_key_v6_final",
-        )
-    analysis_results["tariff_cube_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(fig, texts)
 
-    # Chart-Daten für universelle Funktion vorbereiten
-    chart_data = {
-        "x": anbieter,
-        "y": gesamt,
-        "labels": [
-            f"{name} ({arbeitspreis[i]:.2f}€/kWh + {grundgebuehr[i]}€ GG)"
-            for i, name in enumerate(anbieter)
-        ],
-    }
 
-    title = get_text(
-        texts,
-        "viz_tariff_cube_title_switcher",
-        f"Tarifvergleich bei {jahresverbrauch:.2f} kWh/Jahr",
-    )
+def render_tariff_cube_switcher(
+    analysis_results: Dict[str, Any],
+    texts: Dict[str, str],
+    viz_settings: Dict[str, Any],
+):
+    """Tarifvergleich verschiedener Anbieter (Jahreskosten) als 2D Chart.
 
-    fig = create_universal_2d_chart(
-        chart_data,
-        title=title,
-        x_label="Anbieter",
-        y_label="Gesamtkosten €/Jahr",
-        chart_key="analysis_tariff_cube_switcher_key_v6_final",
+    Zeigt aktuellen Tarif, berechnete Photovoltaik-Gestehungskosten (LCOE) sowie zwei
+    alternative Szenarien. Ergebnisse werden in analysis_results als Bytes
+    für PDF-Export abgelegt.
+    """
+    spec = _tariff_cube_chart_spec(analysis_results, texts)
+    fig = _create_switcher_chart(
+        spec, "analysis_tariff_cube_switcher_key_v6_final", viz_settings
     )
 
     if fig:
-        _apply_custom_style_to_fig(fig, viz_settings, "tariff_cube_switcher")
-        with st.expander(title, expanded=False):
+        with st.expander(spec.title, expanded=False):
             st.plotly_chart(fig, use_container_width=True, key="analysis_tariff_cube_switcher_plot")
         analysis_results["tariff_cube_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(fig, texts)
     else:
@@ -3526,32 +3400,24 @@ def render_extended_calculations_dashboard(
 #                           - Batterieoptimierung
 
 
-def render_co2_savings_value_switcher(
-    analysis_results: Dict[str, Any],
-    texts: Dict[str, str],
-    viz_settings: Dict[str, Any],
-):
-    st.subheader(
-        get_text(
-            texts,
-            "viz_co2_savings_value_switcher",
-            "CO₂-Ersparnis vs. Monetärer Wert (Simuliert)",
-        )
+def _co2_savings_value_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
+    title = get_text(
+        texts,
+        "viz_co2_savings_value_title_switcher",
+        "CO₂-Einsparung und monetärer Wert über Zeit",
     )
-
-    # Moderne 2D-Visualisierung statt 3D-Kinderzeichnung
-
     years_effective = int(analysis_results.get("simulation_period_years_effective", 0))
     if years_effective <= 0:
-        st.warning(
-            get_text(
+        return SwitcherChartSpec(
+            title=title,
+            notice=get_text(
                 texts,
                 "viz_data_invalid_years_co2_switcher_v2",
                 "Ungültige Simulationsdauer für CO2-Diagramm.",
-            )
+            ),
         )
-        analysis_results["co2_savings_value_switcher_chart_bytes"] = None
-        return
 
     jahre_axis = np.arange(1, years_effective + 1)
     annual_prod_sim_raw = analysis_results.get("annual_productions_sim", [])
@@ -3559,24 +3425,16 @@ def render_co2_savings_value_switcher(
         isinstance(annual_prod_sim_raw, list)
         and len(annual_prod_sim_raw) == years_effective
     ):
-        st.warning(
-            get_text(
+        return SwitcherChartSpec(
+            title=title,
+            notice=get_text(
                 texts,
-                "viz_data_missing_co2_prod_switcher_v2",
-                "CO2: Jährl. Produktionsdaten unvollständig.",
-            )
-        )
-        analysis_results["co2_savings_value_switcher_chart_bytes"] = None
-        return
-
-    annual_prod_sim = [
-        (
-            float(p)
-            if isinstance(p, (int, float)) and not math.isnan(p) and not math.isinf(p)
-            else 0.0
+                "viz_data_missing_co2_prod_switcher_v2",
+                "CO2: Jährl. Produktionsdaten unvollständig.",
+            ),
         )
-        for p in annual_prod_sim_raw
-    ]
+
+    annual_prod_sim = _finite_floats(annual_prod_sim_raw)
     gc = load_admin_setting("global_constants", {})
     co2_factor = float(gc.get("co2_emission_factor_kg_per_kwh", 0.474))
     co2_savings_tonnes_per_year = [
@@ -3591,44 +3449,56 @@ def render_co2_savings_value_switcher(
     ]
 
     if any(math.isnan(v) or math.isinf(v) for v in wert_co2_eur_per_year):
-        st.warning(
-            get_text(
+        return SwitcherChartSpec(
+            title=title,
+            notice=get_text(
                 texts,
                 "viz_data_nan_inf_co2_switcher_v2",
                 "CO2: Ungültige Werte (NaN/Inf) in Diagrammdaten.",
-            )
+            ),
         )
-        analysis_results["co2_savings_value_switcher_chart_bytes"] = None
-        return
-
-    import plotly.graph_objects as go
-    import plotly.express as px
-
-    #  MODERNE 2D SHADCN CHART STATT 3D KINDERZEICHNUNG 
-    # Daten für 2D Chart vorbereiten (korrigiert)
-    chart_data = {
-        "values": co2_savings_tonnes_per_year,
-        "labels": [f"Jahr {year}" for year in jahre_axis],
-        "x": jahre_axis,
-        "y": co2_savings_tonnes_per_year,
-    }
-
-    title = get_text(
-        texts,
-        "viz_co2_savings_value_title_switcher",
-        "CO₂-Einsparung und monetärer Wert über Zeit",
-    )
 
-    fig = create_universal_2d_chart(
-        chart_data,
+    return SwitcherChartSpec(
         title=title,
+        data={
+            "values": co2_savings_tonnes_per_year,
+            "labels": [f"Jahr {year}" for year in jahre_axis],
+            "x": jahre_axis,
+            "y": co2_savings_tonnes_per_year,
+        },
         x_label="Jahr",
         y_label="Werte",
-        chart_key="co2_savings_modern_2d_chart",
+        extras={
+            "co2_savings_tonnes_per_year": co2_savings_tonnes_per_year,
+            "wert_co2_eur_per_year": wert_co2_eur_per_year,
+        },
+    )
+
+
+def render_co2_savings_value_switcher(
+    analysis_results: Dict[str, Any],
+    texts: Dict[str, str],
+    viz_settings: Dict[str, Any],
+):
+    st.subheader(
+        get_text(
+            texts,
+            "viz_co2_savings_value_switcher",
+            "CO₂-Ersparnis vs. Monetärer Wert (Simuliert)",
+        )
     )
 
+    # Moderne 2D-Visualisierung statt 3D-Kinderzeichnung
+    spec = _co2_savings_value_chart_spec(analysis_results, texts)
+    if spec.data is None:
+        st.warning(spec.notice)
+        analysis_results["co2_savings_value_switcher_chart_bytes"] = None
+        return
+
+    fig = _create_switcher_chart(spec, "co2_savings_modern_2d_chart", viz_settings)
+
     if fig:
-        with st.expander(title, expanded=False):
+        with st.expander(spec.title, expanded=False):
             st.plotly_chart(
                 fig,
                 use_container_width=True,
@@ -3641,6 +3511,8 @@ def render_co2_savings_value_switcher(
         st.warning("CO₂-Diagramm konnte nicht erstellt werden.")
         analysis_results["co2_savings_value_switcher_chart_bytes"] = None
 
+    co2_savings_tonnes_per_year = spec.extras["co2_savings_tonnes_per_year"]
+    years_effective = len(co2_savings_tonnes_per_year)
     col1, col2, col3 = st.columns(3)
     with col1:
         total_co2_savings = sum(co2_savings_tonnes_per_year)
@@ -3650,7 +3522,7 @@ def render_co2_savings_value_switcher(
             help=f"Über {years_effective} Jahre hinweg",
         )
     with col2:
-        total_co2_value = sum(wert_co2_eur_per_year)
+        total_co2_value = sum(spec.extras["wert_co2_eur_per_year"])
         st.metric(
             label="Gesamtwert CO₂-Einsparung",
             value=f"{total_co2_value:.2f} €",
@@ -3667,17 +3539,13 @@ def render_co2_savings_value_switcher(
         )
 
 
-def render_investment_value_switcher(
-    analysis_results: Dict[str, Any],
-    texts: Dict[str, str],
-    viz_settings: Dict[str, Any],
-):
-    st.subheader(
-        get_text(
-            texts,
-            "viz_investment_value_subheader_switcher",
-            "Investitionsnutzwert – Wirkung von Maßnahmen (Illustrativ)",
-        )
+def _investment_value_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
+    title = get_text(
+        texts,
+        "viz_investment_value_title_switcher",
+        "Illustrativer Investitionsnutzwert",
     )
     base_investment_raw = analysis_results.get("total_investment_netto")
     annual_benefits_sim_raw = analysis_results.get("annual_benefits_sim")
@@ -3686,11 +3554,10 @@ def render_investment_value_switcher(
         "cost_storage_aufpreis_product_db_netto"
     )
     if not isinstance(base_investment_raw, (int, float)) or base_investment_raw <= 0:
-        st.info(
-            f"Investitionsnutzwert: Ungültige Basisinvestition ({base_investment_raw})."
+        return SwitcherChartSpec(
+            title=title,
+            notice=f"Investitionsnutzwert: Ungültige Basisinvestition ({base_investment_raw}).",
         )
-        analysis_results["investment_value_switcher_chart_bytes"] = None
-        return
     base_investment = float(base_investment_raw)
     if not isinstance(annual_benefits_sim_raw, list) or not annual_benefits_sim_raw:
         simulation_period = int(
@@ -3736,7 +3603,7 @@ def render_investment_value_switcher(
         (n - k) / k * 100 if k != 0 else 0
         for k, n in zip(kosten_abs, nutzwert_simuliert_abs)
     ]
-    #  PROFESSIONELLER 2D INVESTITIONSNUTZWERT 
+    #  PROFESSIONELLER 2D INVESTITIONSNUTZWERT
     chart_data = {
         "x": massnahmen_labels,
         "y": effizienz_roi,
@@ -3755,27 +3622,16 @@ def render_investment_value_switcher(
             }
         ],
     }
-
-    title = get_text(
-        texts,
-        "viz_investment_value_title_switcher",
-        "Illustrativer Investitionsnutzwert",
-    )
-
-    fig = create_universal_2d_chart(
-        chart_data,
+    return SwitcherChartSpec(
         title=title,
+        data=chart_data,
         x_label="Maßnahme",
         y_label="Gesamtrendite (%)",
-        chart_key="investment_value_modern_2d_chart",
+        style_key="investment_value_switcher",
     )
-    _apply_custom_style_to_fig(fig, viz_settings, "investment_value_switcher")
-    with st.expander(title, expanded=False):
-        st.plotly_chart(fig, use_container_width=True, key="analysis_investment_value_switcher_plot")
-    analysis_results["investment_value_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(fig, texts)
 
 
-def render_storage_effect_switcher(
+def render_investment_value_switcher(
     analysis_results: Dict[str, Any],
     texts: Dict[str, str],
     viz_settings: Dict[str, Any],
@@ -3783,10 +3639,25 @@ def render_storage_effect_switcher(
     st.subheader(
         get_text(
             texts,
-            "viz_storage_effect_subheader_switcher",
-            "Speicherwirkung – Kapazität vs. Nutzen (Illustrativ)",
+            "viz_investment_value_subheader_switcher",
+            "Investitionsnutzwert – Wirkung von Maßnahmen (Illustrativ)",
         )
     )
+    spec = _investment_value_chart_spec(analysis_results, texts)
+    if spec.data is None:
+        st.info(spec.notice)
+        analysis_results["investment_value_switcher_chart_bytes"] = None
+        return
+
+    fig = _create_switcher_chart(spec, "investment_value_modern_2d_chart", viz_settings)
+    with st.expander(spec.title, expanded=False):
+        st.plotly_chart(fig, use_container_width=True, key="analysis_investment_value_switcher_plot")
+    analysis_results["investment_value_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(fig, texts)
+
+
+def _storage_effect_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
     current_storage_cap_kwh_raw = analysis_results.get(
         "selected_storage_storage_power_kw"
     )
@@ -3829,7 +3700,7 @@ def render_storage_effect_switcher(
     nutzwert_illustrativ_eur = np.nan_to_num(
         nutzwert_illustrativ_eur, nan=0.0, posinf=0.0, neginf=0.0
     )
-    #  MODERNES 2D SHADCN CHART FÜR SPEICHERWIRKUNG 
+    #  MODERNES 2D SHADCN CHART FÜR SPEICHERWIRKUNG
     chart_data = {
         "x": [f"{cap:.2f} kWh" for cap in kapazitaet_range_kwh],
         "y": nutzwert_illustrativ_eur.tolist(),
@@ -3860,24 +3731,18 @@ def render_storage_effect_switcher(
             }
         )
 
-    title = get_text(
-        texts, "viz_storage_effect_title_switcher", "Illustrative Speicherwirkung"
-    )
-
-    fig = create_universal_2d_chart(
-        chart_data,
-        title=title,
+    return SwitcherChartSpec(
+        title=get_text(
+            texts, "viz_storage_effect_title_switcher", "Illustrative Speicherwirkung"
+        ),
+        data=chart_data,
         x_label="Speicherkapazität (kWh)",
         y_label="Jährl. Einsparpotenzial (€)",
-        chart_key="storage_effect_modern_2d_chart",
+        style_key="storage_effect_switcher",
     )
-    _apply_custom_style_to_fig(fig, viz_settings, "storage_effect_switcher")
-    with st.expander(title, expanded=False):
-        st.plotly_chart(fig, use_container_width=True, key="analysis_storage_effect_switcher_plot")
-    analysis_results["storage_effect_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(fig, texts)
 
 
-def render_selfuse_stack_switcher(
+def render_storage_effect_switcher(
     analysis_results: Dict[str, Any],
     texts: Dict[str, str],
     viz_settings: Dict[str, Any],
@@ -3885,21 +3750,35 @@ def render_selfuse_stack_switcher(
     st.subheader(
         get_text(
             texts,
-            "viz_selfuse_stack_subheader_switcher",
-            "Eigenverbrauch vs. Einspeisung - Jährlicher Vergleich",
+            "viz_storage_effect_subheader_switcher",
+            "Speicherwirkung – Kapazität vs. Nutzen (Illustrativ)",
         )
     )
+    spec = _storage_effect_chart_spec(analysis_results, texts)
+    fig = _create_switcher_chart(spec, "storage_effect_modern_2d_chart", viz_settings)
+    with st.expander(spec.title, expanded=False):
+        st.plotly_chart(fig, use_container_width=True, key="analysis_storage_effect_switcher_plot")
+    analysis_results["storage_effect_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(fig, texts)
+
+
+def _selfuse_stack_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
+    title = get_text(
+        texts,
+        "viz_selfuse_stack_title_switcher",
+        "Jährlicher Eigenverbrauch vs. Einspeisung (Simuliert)",
+    )
     years_effective = int(analysis_results.get("simulation_period_years_effective", 0))
     if years_effective <= 0:
-        st.info(
-            get_text(
+        return SwitcherChartSpec(
+            title=title,
+            notice=get_text(
                 texts,
                 "viz_data_insufficient_selfuse_stack",
                 "Simulationsdauer 0, Eigenverbrauchs-Stack nicht anzeigbar.",
-            )
+            ),
         )
-        analysis_results["selfuse_stack_switcher_chart_bytes"] = None
-        return
 
     jahre_sim_labels = [f"Jahr {i}" for i in range(1, years_effective + 1)]
     annual_prod_sim_raw = analysis_results.get("annual_productions_sim", [])
@@ -3910,34 +3789,23 @@ def render_selfuse_stack_switcher(
     ]
 
     if not (annual_prod_sim and len(annual_prod_sim) == years_effective):
-        st.info(
-            get_text(
+        return SwitcherChartSpec(
+            title=title,
+            notice=get_text(
                 texts,
                 "viz_data_insufficient_selfuse_stack_prod",
                 "Daten für 'annual_productions_sim' unvollständig.",
-            )
+            ),
         )
-        analysis_results["selfuse_stack_switcher_chart_bytes"] = None
-        return
 
     # Berechnungen aus Jahr 1
-    monthly_direct_sc_yr1_sum = sum(
-        float(v)
-        for v in analysis_results.get("monthly_direct_self_consumption_kwh", [])
-        if isinstance(v, (int, float)) and not math.isnan(v) and not math.isinf(v)
-    )
-    monthly_storage_discharge_sc_yr1_sum = sum(
-        float(v)
-        for v in analysis_results.get("monthly_storage_discharge_for_sc_kwh", [])
-        if isinstance(v, (int, float)) and not math.isnan(v) and not math.isinf(v)
-    )
-    eigenverbrauch_yr1_kwh = (
-        monthly_direct_sc_yr1_sum + monthly_storage_discharge_sc_yr1_sum
+    eigenverbrauch_yr1_kwh = sum(
+        _finite_floats(analysis_results.get("monthly_direct_self_consumption_kwh", []))
+    ) + sum(
+        _finite_floats(analysis_results.get("monthly_storage_discharge_for_sc_kwh", []))
     )
     einspeisung_yr1_kwh = sum(
-        float(v)
-        for v in analysis_results.get("monthly_feed_in_kwh", [])
-        if isinstance(v, (int, float)) and not math.isnan(v) and not math.isinf(v)
+        _finite_floats(analysis_results.get("monthly_feed_in_kwh", []))
     )
 
     produktion_yr1_kwh_raw = analysis_results.get("annual_pv_production_kwh")
@@ -3953,31 +3821,45 @@ def render_selfuse_stack_switcher(
     eigen_sim_kwh = [prod * anteil_eigenverbrauch_yr1 for prod in annual_prod_sim]
     einspeisung_sim_kwh = [prod * anteil_einspeisung_yr1 for prod in annual_prod_sim]
 
-    # Chart-Daten für Multi-Series Chart vorbereiten
-    chart_data = {
-        "categories": jahre_sim_labels,
-        "series": [
-            {"name": "Eigenverbrauch (kWh)", "data": eigen_sim_kwh},
-            {"name": "Einspeisung (kWh)", "data": einspeisung_sim_kwh},
-        ],
-    }
-
-    title = get_text(
-        texts,
-        "viz_selfuse_stack_title_switcher",
-        "Jährlicher Eigenverbrauch vs. Einspeisung (Simuliert)",
-    )
-
-    fig = create_multi_series_2d_chart(
-        chart_data,
+    return SwitcherChartSpec(
         title=title,
+        data={
+            "categories": jahre_sim_labels,
+            "series": [
+                {"name": "Eigenverbrauch (kWh)", "data": eigen_sim_kwh},
+                {"name": "Einspeisung (kWh)", "data": einspeisung_sim_kwh},
+            ],
+        },
         x_label="Simulationsjahr",
         y_label="Energie (kWh)",
-        chart_key="analysis_selfuse_stack_switcher_key_v6_final",
+        default_chart_type="Säulen",
+        multi_series=True,
+        style_key="selfuse_stack_switcher",
     )
 
-    _apply_custom_style_to_fig(fig, viz_settings, "selfuse_stack_switcher")
-    with st.expander(title, expanded=False):
+
+def render_selfuse_stack_switcher(
+    analysis_results: Dict[str, Any],
+    texts: Dict[str, str],
+    viz_settings: Dict[str, Any],
+):
+    st.subheader(
+        get_text(
+            texts,
+            "viz_selfuse_stack_subheader_switcher",
+            "Eigenverbrauch vs. Einspeisung - Jährlicher Vergleich",
+        )
+    )
+    spec = _selfuse_stack_chart_spec(analysis_results, texts)
+    if spec.data is None:
+        st.info(spec.notice)
+        analysis_results["selfuse_stack_switcher_chart_bytes"] = None
+        return
+
+    fig = _create_switcher_chart(
+        spec, "analysis_selfuse_stack_switcher_key_v6_final", viz_settings
+    )
+    with st.expander(spec.title, expanded=False):
         st.plotly_chart(
             fig,
             use_container_width=True,
@@ -3986,23 +3868,22 @@ def render_selfuse_stack_switcher(
     analysis_results["selfuse_stack_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(fig, texts)
 
 
-def render_cost_growth_switcher(
-    analysis_results: Dict[str, Any],
-    texts: Dict[str, str],
-    viz_settings: Dict[str, Any],
-):
-    cost_growth_subheader = get_text(
+def _cost_growth_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
+    title = get_text(
         texts,
-        "viz_cost_growth_subheader_switcher",
-        "Stromkostensteigerung - 2D Szenarien",
+        "viz_cost_growth_title_switcher",
+        "Entwicklung Strompreis pro kWh (Szenarien)",
     )
     years_effective = int(analysis_results.get("simulation_period_years_effective", 0))
     if years_effective <= 0:
-        st.info(
-            get_text(texts, "viz_data_insufficient_cost_growth", "Simulationsdauer 0.")
+        return SwitcherChartSpec(
+            title=title,
+            notice=get_text(
+                texts, "viz_data_insufficient_cost_growth", "Simulationsdauer 0."
+            ),
         )
-        analysis_results["cost_growth_switcher_chart_bytes"] = None
-        return
 
     jahre_axis = np.arange(1, years_effective + 1)
     basispreis_kwh = float(
@@ -4012,21 +3893,18 @@ def render_cost_growth_switcher(
         analysis_results.get("electricity_price_increase_rate_effective_percent", 3.0)
     )
     szenarien_prozent_vals = sorted(
-        list(
-            set(
-                round(s, 1)
-                for s in [
-                    max(0, current_increase_rate_percent - 1.5),
-                    current_increase_rate_percent,
-                    current_increase_rate_percent + 1.5,
-                ]
-            )
+        set(
+            round(s, 1)
+            for s in [
+                max(0, current_increase_rate_percent - 1.5),
+                current_increase_rate_percent,
+                current_increase_rate_percent + 1.5,
+            ]
         )
     )
 
     # Daten für Multi-Series Chart vorbereiten
     chart_data = {"categories": [f"Jahr {jahr}" for jahr in jahre_axis], "series": []}
-
     for s_percent in szenarien_prozent_vals:
         s_rate = s_percent / 100.0
         kosten_kwh_pro_jahr = [
@@ -4036,125 +3914,105 @@ def render_cost_growth_switcher(
             {"name": f"{s_percent:.2f}% p.a.", "data": kosten_kwh_pro_jahr}
         )
 
-    title = get_text(
-        texts,
-        "viz_cost_growth_title_switcher",
-        "Entwicklung Strompreis pro kWh (Szenarien)",
-    )
-
-    fig = create_multi_series_2d_chart(
-        chart_data,
+    return SwitcherChartSpec(
         title=title,
+        data=chart_data,
         x_label="Simulationsjahr",
         y_label="Strompreis (€/kWh)",
-        chart_key="analysis_cost_growth_switcher_key_v6_final",
-    )
-
-    _apply_custom_style_to_fig(fig, viz_settings, "cost_growth_switcher")
-    with st.expander(cost_growth_subheader, expanded=False):
-        st.plotly_chart(
-            fig,
-            use_container_width=True,
-            key="analysis_cost_growth_switcher_key_v6_final",
-        )
-    analysis_results["cost_growth_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-        fig, texts
+        default_chart_type="Säulen",
+        multi_series=True,
+        style_key="cost_growth_switcher",
     )
 
 
-def render_selfuse_ratio_switcher(
+def render_cost_growth_switcher(
     analysis_results: Dict[str, Any],
     texts: Dict[str, str],
     viz_settings: Dict[str, Any],
 ):
-    selfuse_ratio_subheader = get_text(
+    cost_growth_subheader = get_text(
         texts,
-        "viz_selfuse_ratio_subheader_switcher",
-        "Eigenverbrauchsgrad – Monatliche Bubble View (Jahr 1)",
+        "viz_cost_growth_subheader_switcher",
+        "Stromkostensteigerung - 2D Szenarien",
     )
-    month_labels = get_text(
-        texts,
-        "month_names_short_list",
-        "Jan,Feb,Mrz,Apr,Mai,Jun,Jul,Aug,Sep,Okt,Nov,Dez",
-    ).split(",")
-    if len(month_labels) != 12:
-        month_labels = [
-            "Jan",
-            "Feb",
-            "Mrz",
-            "Apr",
-            "Mai",
-            "Jun",
-            "Jul",
-            "Aug",
-            "Sep",
-            "Okt",
-            "Nov",
-            "Dez",
-        ]
-    m_total_cons_raw = analysis_results.get("monthly_consumption_sim", [])
-    m_direct_sc_raw = analysis_results.get("monthly_direct_self_consumption_kwh", [])
-    m_storage_sc_raw = analysis_results.get("monthly_storage_discharge_for_sc_kwh", [])
-    m_total_cons = [
-        (
-            float(v)
-            if isinstance(v, (int, float)) and not math.isnan(v) and not math.isinf(v)
-            else 0.0
-        )
-        for v in m_total_cons_raw
-    ]
-    m_direct_sc = [
-        (
-            float(v)
-            if isinstance(v, (int, float)) and not math.isnan(v) and not math.isinf(v)
-            else 0.0
-        )
-        for v in m_direct_sc_raw
-    ]
-    m_storage_sc = [
-        (
-            float(v)
-            if isinstance(v, (int, float)) and not math.isnan(v) and not math.isinf(v)
-            else 0.0
+    spec = _cost_growth_chart_spec(analysis_results, texts)
+    if spec.data is None:
+        st.info(spec.notice)
+        analysis_results["cost_growth_switcher_chart_bytes"] = None
+        return
+
+    fig = _create_switcher_chart(
+        spec, "analysis_cost_growth_switcher_key_v6_final", viz_settings
+    )
+    with st.expander(cost_growth_subheader, expanded=False):
+        st.plotly_chart(
+            fig,
+            use_container_width=True,
+            key="analysis_cost_growth_switcher_key_v6_final",
         )
-        for v in m_storage_sc_raw
-    ]
+    analysis_results["cost_growth_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
+        fig, texts
+    )
+
+
+def _selfuse_ratio_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
+    title = get_text(
+        texts,
+        "viz_selfuse_ratio_title_switcher",
+        "Monatlicher Eigenversorgungsgrad (Autarkiegrad des Monats) - Jahr 1",
+    )
+    m_total_cons = _finite_floats(analysis_results.get("monthly_consumption_sim", []))
+    m_direct_sc = _finite_floats(
+        analysis_results.get("monthly_direct_self_consumption_kwh", [])
+    )
+    m_storage_sc = _finite_floats(
+        analysis_results.get("monthly_storage_discharge_for_sc_kwh", [])
+    )
     if not (
         len(m_total_cons) == 12 and len(m_direct_sc) == 12 and len(m_storage_sc) == 12
     ):
-        st.info(
-            get_text(
+        return SwitcherChartSpec(
+            title=title,
+            notice=get_text(
                 texts,
                 "viz_data_insufficient_selfuse_ratio",
                 "Daten für monatl. Eigenverbrauchsgrad unvollständig.",
-            )
+            ),
         )
-        analysis_results["selfuse_ratio_switcher_chart_bytes"] = None
-        return
-    ev_monat_kwh = [(d or 0) + (s or 0) for d, s in zip(m_direct_sc, m_storage_sc)]
+    ev_monat_kwh = [d + s for d, s in zip(m_direct_sc, m_storage_sc)]
     ev_monat_grad = [
         (ekwh / (c_tot if c_tot > 0 else 1) * 100)
         for ekwh, c_tot in zip(ev_monat_kwh, m_total_cons)
     ]
-    max_ev_kwh = max(ev_monat_kwh) if any(ev_monat_kwh) else 1.0
-    bubble_sizes = [(v / max_ev_kwh * 30) + 10 for v in ev_monat_kwh]
-    #  PROFESSIONELLES 2D SHADCN CHART FÜR EIGENVERBRAUCH 
-    chart_data = {"x": month_labels, "y": ev_monat_grad}
-
-    title = get_text(
-        texts,
-        "viz_selfuse_ratio_title_switcher",
-        "Monatlicher Eigenversorgungsgrad (Autarkiegrad des Monats) - Jahr 1",
-    )
-
-    fig = create_universal_2d_chart(
-        chart_data,
+    #  PROFESSIONELLES 2D SHADCN CHART FÜR EIGENVERBRAUCH
+    return SwitcherChartSpec(
         title=title,
+        data={"x": _month_labels(texts), "y": ev_monat_grad},
         x_label="Monat",
         y_label="Eigenversorgungsgrad (%)",
-        chart_key="selfuse_ratio_modern_2d_chart",
+        style_key="selfuse_ratio_switcher",
+    )
+
+
+def render_selfuse_ratio_switcher(
+    analysis_results: Dict[str, Any],
+    texts: Dict[str, str],
+    viz_settings: Dict[str, Any],
+):
+    selfuse_ratio_subheader = get_text(
+        texts,
+        "viz_selfuse_ratio_subheader_switcher",
+        "Eigenverbrauchsgrad – Monatliche Bubble View (Jahr 1)",
     )
-    _apply_custom_style_to_fig(fig, viz_settings, "selfuse_ratio_switcher")
+    spec = _selfuse_ratio_chart_spec(analysis_results, texts)
+    if spec.data is None:
+        st.info(spec.notice)
+        analysis_results["selfuse_ratio_switcher_chart_bytes"] = None
+        return
+
+    fig = _create_switcher_chart(spec, "selfuse_ratio_modern_2d_chart", viz_settings)
     with st.expander(selfuse_ratio_subheader, expanded=False):
         st.plotly_chart(
             fig,
@@ -4166,18 +4024,9 @@ def render_selfuse_ratio_switcher(
     )
 
 
-def render_roi_comparison_switcher(
-    analysis_results: Dict[str, Any],
-    texts: Dict[str, str],
-    viz_settings: Dict[str, Any],
-):
-    st.subheader(
-        get_text(
-            texts,
-            "viz_roi_comparison_subheader_switcher",
-            "ROI-Vergleich – Investitionen in 3D (Illustrativ)",
-        )
-    )
+def _roi_comparison_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
     curr_proj_name = get_text(
         texts, "current_project_label_switcher", "Aktuelles Projekt"
     )
@@ -4197,7 +4046,7 @@ def render_roi_comparison_switcher(
     roi_opts = [
         (b / i * 100) if i > 0 else 0 for i, b in zip(invest_opts, benefit_opts)
     ]
-    #  MODERNES 2D ROI VERGLEICHS-CHART 
+    #  MODERNES 2D ROI VERGLEICHS-CHART
     chart_data = {
         "x": labels,
         "y": roi_opts,
@@ -4214,22 +4063,34 @@ def render_roi_comparison_switcher(
             }
         ],
     }
-
-    title = get_text(
-        texts,
-        "viz_roi_comparison_title_switcher",
-        "ROI-Vergleich – Investitionen (Illustrativ)",
-    )
-
-    fig = create_universal_2d_chart(
-        chart_data,
-        title=title,
+    return SwitcherChartSpec(
+        title=get_text(
+            texts,
+            "viz_roi_comparison_title_switcher",
+            "ROI-Vergleich – Investitionen (Illustrativ)",
+        ),
+        data=chart_data,
         x_label="Projekt",
         y_label="Jährlicher ROI (%)",
-        chart_key="roi_comparison_modern_2d_chart",
     )
 
-    with st.expander(title, expanded=False):
+
+def render_roi_comparison_switcher(
+    analysis_results: Dict[str, Any],
+    texts: Dict[str, str],
+    viz_settings: Dict[str, Any],
+):
+    st.subheader(
+        get_text(
+            texts,
+            "viz_roi_comparison_subheader_switcher",
+            "ROI-Vergleich – Investitionen in 3D (Illustrativ)",
+        )
+    )
+    spec = _roi_comparison_chart_spec(analysis_results, texts)
+    fig = _create_switcher_chart(spec, "roi_comparison_modern_2d_chart", viz_settings)
+
+    with st.expander(spec.title, expanded=False):
         st.plotly_chart(
             fig,
             use_container_width=True,
@@ -4240,16 +4101,9 @@ def render_roi_comparison_switcher(
     )
 
 
-def render_scenario_comparison_switcher(
-    analysis_results: Dict[str, Any],
-    texts: Dict[str, str],
-    viz_settings: Dict[str, Any],
-):
-    scenario_comp_subheader = get_text(
-        texts,
-        "viz_scenario_comp_subheader_switcher",
-        "Szenarienvergleich – Invest/Ertrag/Bonus (Illustrativ)",
-    )
+def _scenario_comparison_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
     base_invest_raw = analysis_results.get("total_investment_netto")
     benefits_raw = analysis_results.get("annual_benefits_sim", [])
     bonus_raw = analysis_results.get("one_time_bonus_eur")
@@ -4273,45 +4127,47 @@ def render_scenario_comparison_switcher(
         get_text(texts, "scenario_optimistic_switcher", "Optimistisch"),
         get_text(texts, "scenario_pessimistic_switcher", "Pessimistisch"),
     ]
-    invest_opts = [base_invest, base_invest * 0.9, base_invest * 1.1]
-    ertrag_opts = [
-        base_ertrag_total,
-        base_ertrag_total * 1.15,
-        base_ertrag_total * 0.85,
-    ]
-    bonus_opts = [base_bonus, base_bonus + 500, max(0, base_bonus - 500)]
-    #  PROFESSIONELLER 2D SZENARIENVERGLEICH 
-    # Kategorien und Daten definieren
-    cat_names = ["Investition", "Gesamtertrag", "Einmalbonus"]
+    #  PROFESSIONELLER 2D SZENARIENVERGLEICH
     cat_data = {
-        "Investition": invest_opts,
-        "Gesamtertrag": ertrag_opts,
-        "Einmalbonus": bonus_opts,
-    }
-
-    # Datenformat für create_multi_series_2d_chart anpassen
-    chart_data = {
-        "categories": labels,  # ['Basis', 'Optimistisch', 'Pessimistisch']
-        "series": [],
+        "Investition": [base_invest, base_invest * 0.9, base_invest * 1.1],
+        "Gesamtertrag": [
+            base_ertrag_total,
+            base_ertrag_total * 1.15,
+            base_ertrag_total * 0.85,
+        ],
+        "Einmalbonus": [base_bonus, base_bonus + 500, max(0, base_bonus - 500)],
     }
-
-    for cat_name in cat_names:
-        cat_vals = cat_data[cat_name]
-        chart_data["series"].append({"name": cat_name, "data": cat_vals})
-
-    title = get_text(
-        texts, "viz_scenario_comp_title_switcher", "Illustrativer Szenarienvergleich"
-    )
-
-    fig = create_multi_series_2d_chart(
-        chart_data,
-        title=title,
+    return SwitcherChartSpec(
+        title=get_text(
+            texts, "viz_scenario_comp_title_switcher", "Illustrativer Szenarienvergleich"
+        ),
+        data={
+            "categories": labels,  # ['Basis', 'Optimistisch', 'Pessimistisch']
+            "series": [
+                {"name": cat_name, "data": cat_vals}
+                for cat_name, cat_vals in cat_data.items()
+            ],
+        },
         x_label="Szenario",
         y_label="Betrag (€)",
-        chart_key="scenario_comparison_modern_2d_chart",
+        default_chart_type="Säulen",
+        multi_series=True,
+        style_key="scenario_comparison_switcher",
     )
 
-    _apply_custom_style_to_fig(fig, viz_settings, "scenario_comparison_switcher")
+
+def render_scenario_comparison_switcher(
+    analysis_results: Dict[str, Any],
+    texts: Dict[str, str],
+    viz_settings: Dict[str, Any],
+):
+    scenario_comp_subheader = get_text(
+        texts,
+        "viz_scenario_comp_subheader_switcher",
+        "Szenarienvergleich – Invest/Ertrag/Bonus (Illustrativ)",
+    )
+    spec = _scenario_comparison_chart_spec(analysis_results, texts)
+    fig = _create_switcher_chart(spec, "scenario_comparison_modern_2d_chart", viz_settings)
     with st.expander(scenario_comp_subheader, expanded=False):
         st.plotly_chart(
             fig,
@@ -4323,57 +4179,19 @@ def render_scenario_comparison_switcher(
     )
 
 
-def render_tariff_comparison_switcher(
-    analysis_results: Dict[str, Any],
-    texts: Dict[str, str],
-    viz_settings: Dict[str, Any],
-):
-    tariff_comp_subheader = get_text(
+def _tariff_comparison_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
+    title = get_text(
         texts,
-        "viz_tariff_comp_subheader_switcher",
-        "Vorher/Nachher – Monatliche Stromkosten (Jahr 1)",
+        "viz_tariff_comp_title_switcher",
+        "Monatliche Stromkosten: Vorher vs. Nachher (Jahr 1)",
     )
-    month_labels = get_text(
-        texts,
-        "month_names_short_list",
-        "Jan,Feb,Mrz,Apr,Mai,Jun,Jul,Aug,Sep,Okt,Nov,Dez",
-    ).split(",")
-    if len(month_labels) != 12:
-        month_labels = [
-            "Jan",
-            "Feb",
-            "Mrz",
-            "Apr",
-            "Mai",
-            "Jun",
-            "Jul",
-            "Aug",
-            "Sep",
-            "Okt",
-            "Nov",
-            "Dez",
-        ]
-    m_total_cons_raw = analysis_results.get("monthly_consumption_sim", [])
-    m_grid_draw_raw = analysis_results.get("monthly_grid_bezug_kwh", [])
+    m_total_cons = _finite_floats(analysis_results.get("monthly_consumption_sim", []))
+    m_grid_draw = _finite_floats(analysis_results.get("monthly_grid_bezug_kwh", []))
     elec_price_raw = analysis_results.get(
         "aktueller_strompreis_fuer_hochrechnung_euro_kwh"
     )
-    m_total_cons = [
-        (
-            float(v)
-            if isinstance(v, (int, float)) and not math.isnan(v) and not math.isinf(v)
-            else 0.0
-        )
-        for v in m_total_cons_raw
-    ]
-    m_grid_draw = [
-        (
-            float(v)
-            if isinstance(v, (int, float)) and not math.isnan(v) and not math.isinf(v)
-            else 0.0
-        )
-        for v in m_grid_draw_raw
-    ]
     elec_price = float(
         elec_price_raw
         if isinstance(elec_price_raw, (int, float))
@@ -4382,15 +4200,14 @@ def render_tariff_comparison_switcher(
         else 0.30
     )
     if not (len(m_total_cons) == 12 and len(m_grid_draw) == 12):
-        st.info(
-            get_text(
+        return SwitcherChartSpec(
+            title=title,
+            notice=get_text(
                 texts,
                 "viz_data_insufficient_tariff_comp",
                 "Daten für Vorher/Nachher-Stromkosten unvollständig.",
-            )
+            ),
         )
-        analysis_results["tariff_comparison_switcher_chart_bytes"] = None
-        return
 
     # Stromkosten berechnen
     kosten_vorher = [m_cons * elec_price for m_cons in m_total_cons]  # Kosten ohne Photovoltaik
@@ -4398,30 +4215,41 @@ def render_tariff_comparison_switcher(
         m_grid * elec_price for m_grid in m_grid_draw
     ]  # Kosten mit Photovoltaik (nur Netzbezug)
 
-    #  MODERNE 2D STROMKOSTEN VORHER/NACHHER 
-    chart_data = {
-        "categories": month_labels,
-        "series": [
-            {"name": "Kosten Vorher (ohne Photovoltaik)", "data": kosten_vorher},
-            {"name": "Kosten Nachher (mit Photovoltaik)", "data": kosten_nachher},
-        ],
-    }
-
-    title = get_text(
-        texts,
-        "viz_tariff_comp_title_switcher",
-        "Monatliche Stromkosten: Vorher vs. Nachher (Jahr 1)",
-    )
-
-    fig = create_multi_series_2d_chart(
-        chart_data,
+    #  MODERNE 2D STROMKOSTEN VORHER/NACHHER
+    return SwitcherChartSpec(
         title=title,
+        data={
+            "categories": _month_labels(texts),
+            "series": [
+                {"name": "Kosten Vorher (ohne Photovoltaik)", "data": kosten_vorher},
+                {"name": "Kosten Nachher (mit Photovoltaik)", "data": kosten_nachher},
+            ],
+        },
         x_label="Monat",
         y_label="Stromkosten (€)",
-        chart_key="tariff_comparison_modern_2d_chart",
+        default_chart_type="Säulen",
+        multi_series=True,
+        style_key="tariff_comparison_switcher",
+    )
+
+
+def render_tariff_comparison_switcher(
+    analysis_results: Dict[str, Any],
+    texts: Dict[str, str],
+    viz_settings: Dict[str, Any],
+):
+    tariff_comp_subheader = get_text(
+        texts,
+        "viz_tariff_comp_subheader_switcher",
+        "Vorher/Nachher – Monatliche Stromkosten (Jahr 1)",
     )
+    spec = _tariff_comparison_chart_spec(analysis_results, texts)
+    if spec.data is None:
+        st.info(spec.notice)
+        analysis_results["tariff_comparison_switcher_chart_bytes"] = None
+        return
 
-    _apply_custom_style_to_fig(fig, viz_settings, "tariff_comparison_switcher")
+    fig = _create_switcher_chart(spec, "tariff_comparison_modern_2d_chart", viz_settings)
     with st.expander(tariff_comp_subheader, expanded=False):
         st.plotly_chart(
             fig,
@@ -4433,23 +4261,22 @@ def render_tariff_comparison_switcher(
     )
 
 
-def render_income_projection_switcher(
-    analysis_results: Dict[str, Any],
-    texts: Dict[str, str],
-    viz_settings: Dict[str, Any],
-):
-    income_proj_subheader = get_text(
+def _income_projection_chart_spec(
+    analysis_results: Dict[str, Any], texts: Dict[str, str]
+) -> SwitcherChartSpec:
+    title = get_text(
         texts,
-        "viz_income_proj_subheader_switcher",
-        " Einnahmen/Ersparnisprognose – Dynamischer Verlauf",
+        "viz_income_proj_title_switcher",
+        "Prognose: Kumulierte Einnahmen & Ersparnisse",
     )
     years_effective = int(analysis_results.get("simulation_period_years_effective", 0))
     if years_effective <= 0:
-        st.info(
-            get_text(texts, "viz_data_insufficient_income_proj", "Simulationsdauer 0.")
+        return SwitcherChartSpec(
+            title=title,
+            notice=get_text(
+                texts, "viz_data_insufficient_income_proj", "Simulationsdauer 0."
+            ),
         )
-        analysis_results["income_projection_switcher_chart_bytes"] = None
-        return
     jahre_axis = np.arange(0, years_effective + 1)
     annual_benefits_raw = analysis_results.get("annual_benefits_sim", [])
     annual_benefits = [
@@ -4458,15 +4285,14 @@ def render_income_projection_switcher(
         if isinstance(b, (int, float)) and not math.isnan(b) and not math.isinf(b)
     ]
     if not (annual_benefits and len(annual_benefits) == years_effective):
-        st.info(
-            get_text(
+        return SwitcherChartSpec(
+            title=title,
+            notice=get_text(
                 texts,
                 "viz_data_insufficient_income_proj_benefits",
-                f"Daten für 'annual_benefits_sim' unvollständig.",
-            )
+                "Daten für 'annual_benefits_sim' unvollständig.",
+            ),
         )
-        analysis_results["income_projection_switcher_chart_bytes"] = None
-        return
 
     # Kumulierte Vorteile berechnen (Jahr 0 = 0, dann aufsummiert)
     kum_vorteile = [0.0]  # Jahr 0 startet bei 0
@@ -4475,23 +4301,33 @@ def render_income_projection_switcher(
         running_total += benefit
         kum_vorteile.append(running_total)
 
-    #  PROFESSIONELLE 2D EINNAHMENPROGNOSE 
-    chart_data = {"x": [f"Jahr {int(year)}" for year in jahre_axis], "y": kum_vorteile}
-
-    title = get_text(
-        texts,
-        "viz_income_proj_title_switcher",
-        "Prognose: Kumulierte Einnahmen & Ersparnisse",
-    )
-
-    fig = create_universal_2d_chart(
-        chart_data,
+    #  PROFESSIONELLE 2D EINNAHMENPROGNOSE
+    return SwitcherChartSpec(
         title=title,
+        data={"x": [f"Jahr {int(year)}" for year in jahre_axis], "y": kum_vorteile},
         x_label="Simulationsjahr",
         y_label="Kumulierte Vorteile (€)",
-        chart_key="income_projection_modern_2d_chart",
+        style_key="income_projection_switcher",
+    )
+
+
+def render_income_projection_switcher(
+    analysis_results: Dict[str, Any],
+    texts: Dict[str, str],
+    viz_settings: Dict[str, Any],
+):
+    income_proj_subheader = get_text(
+        texts,
+        "viz_income_proj_subheader_switcher",
+        " Einnahmen/Ersparnisprognose – Dynamischer Verlauf",
     )
-    _apply_custom_style_to_fig(fig, viz_settings, "income_projection_switcher")
+    spec = _income_projection_chart_spec(analysis_results, texts)
+    if spec.data is None:
+        st.info(spec.notice)
+        analysis_results["income_projection_switcher_chart_bytes"] = None
+        return
+
+    fig = _create_switcher_chart(spec, "income_projection_modern_2d_chart", viz_settings)
     with st.expander(income_proj_subheader, expanded=False):
         st.plotly_chart(
             fig,
@@ -4503,6 +4339,48 @@ def render_income_projection_switcher(
     )
 
 
+# Headless Figure-Builder der Diagramm-Umschalter, Schlüssel = Bytes-Schlüssel in analysis_results
+# (genutzt von pdf_chart_registry für PDF/Batch ohne UI-Durchlauf)
+SWITCHER_CHART_SPECS: Dict[str, Callable[[Dict[str, Any], Dict[str, str]], SwitcherChartSpec]] = {
+    "weekly_production_switcher_chart_bytes": _weekly_production_chart_spec,
+    "yearly_production_switcher_chart_bytes": _yearly_production_chart_spec,
+    "project_roi_matrix_switcher_chart_bytes": _project_roi_matrix_chart_spec,
+    "feed_in_revenue_switcher_chart_bytes": _feed_in_revenue_chart_spec,
+    "prod_vs_cons_switcher_chart_bytes": _production_vs_consumption_chart_spec,
+    "tariff_cube_switcher_chart_bytes": _tariff_cube_chart_spec,
+    "co2_savings_value_switcher_chart_bytes": _co2_savings_value_chart_spec,
+    "investment_value_switcher_chart_bytes": _investment_value_chart_spec,
+    "storage_effect_switcher_chart_bytes": _storage_effect_chart_spec,
+    "selfuse_stack_switcher_chart_bytes": _selfuse_stack_chart_spec,
+    "cost_growth_switcher_chart_bytes": _cost_growth_chart_spec,
+    "selfuse_ratio_switcher_chart_bytes": _selfuse_ratio_chart_spec,
+    "roi_comparison_switcher_chart_bytes": _roi_comparison_chart_spec,
+    "scenario_comparison_switcher_chart_bytes": _scenario_comparison_chart_spec,
+    "tariff_comparison_switcher_chart_bytes": _tariff_comparison_chart_spec,
+    "income_projection_switcher_chart_bytes": _income_projection_chart_spec,
+}
+
+
+def build_switcher_chart_figure(
+    chart_key: str,
+    analysis_results: Dict[str, Any],
+    texts: Dict[str, str],
+    viz_settings: Dict[str, Any],
+) -> Optional[go.Figure]:
+    """Figure für einen Switcher-Bytes-Schlüssel ohne Streamlit (Standard-Diagrammtyp und -Farbschema)."""
+    if chart_key == "daily_production_switcher_chart_bytes":
+        return build_daily_production_figure(analysis_results, texts, viz_settings)
+    spec_builder = SWITCHER_CHART_SPECS.get(chart_key)
+    if spec_builder is None:
+        return None
+    spec = spec_builder(analysis_results, texts)
+    if spec.data is None:
+        return None
+    if chart_key == "prod_vs_cons_switcher_chart_bytes":
+        return build_production_vs_consumption_figure(spec, viz_settings)
+    return build_switcher_figure(spec, viz_settings)
+
+
 def _create_monthly_production_consumption_chart(
     analysis_results_local: Dict,
     texts_local: Dict,
@@ -18,7 +18,7 @@ except ImportError as e:
     print(f"brand_logo_db.py: Database nicht verfügbar: {e}")
 
 def create_brand_logos_table(conn: sqlite3.Connection):
-    """Erstellt die Tabelle für Marken-Logos"""
+    """Erstellt die Tabelle für Marken-Logos (einmalig über database.SCHEMA_MIGRATIONS, v16)"""
     cursor = conn.cursor()
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS brand_logos (
@@ -37,7 +37,6 @@ def create_brand_logos_table(conn: sqlite3.Connection):
         )
     """)
     conn.commit()
-    print("Tabelle 'brand_logos' erstellt oder bereits vorhanden.")
 
 def add_brand_logo(brand_name: str, logo_base64: str, logo_format: str = "PNG", 
                   file_size_bytes: int = 0, position_x: float = 0, position_y: float = 0,
@@ -53,9 +52,6 @@ def add_brand_logo(brand_name: str, logo_base64: str, logo_format: str = "PNG",
             print("Keine Datenbankverbindung möglich")
             return False
         
-        # Tabelle erstellen falls sie nicht existiert
-        create_brand_logos_table(conn)
-        
         cursor = conn.cursor()
         
         # Prüfen ob Logo bereits existiert
@@ -102,9 +98,6 @@ def get_brand_logo(brand_name: str) -> Optional[Dict[str, Any]]:
         if not conn:
             return None
         
-        # Tabelle erstellen falls sie nicht existiert
-        create_brand_logos_table(conn)
-        
         cursor = conn.cursor()
         cursor.execute("""
             SELECT brand_name, logo_base64, logo_format, file_size_bytes,
@@ -148,9 +141,6 @@ def list_all_brand_logos() -> List[Dict[str, Any]]:
         if not conn:
             return []
         
-        # Tabelle erstellen falls sie nicht existiert
-        create_brand_logos_table(conn)
-        
         cursor = conn.cursor()
         cursor.execute("""
             SELECT id, brand_name, logo_format, file_size_bytes,
@@ -295,9 +285,6 @@ def get_logos_for_brands(brand_names: List[str]) -> Dict[str, Dict[str, Any]]:
         if not conn:
             return {}
         
-        # Tabelle erstellen falls sie nicht existiert
-        create_brand_logos_table(conn)
-        
         cursor = conn.cursor()
         
         # Placeholder für IN-Klausel erstellen
@@ -14,6 +14,7 @@ from typing import Dict, Any, List, Optional, Union, Tuple
 from datetime import datetime
 import traceback
 import requests  # Für HTTP-Anfragen an PVGIS
+from offer_trace import traced
 
 def build_project_data(*parts, drop_none=True, drop_empty_str=True, normalize=True, keymap=None):
     out = {}
@@ -266,6 +267,12 @@ def Dummy_get_product_by_model_name_calc(model_name):
     return None
 
 
+try:
+    from energy_dispatch import coupled_dispatch_for_project
+    _ENERGY_DISPATCH_AVAILABLE = True
+except ImportError:
+    _ENERGY_DISPATCH_AVAILABLE = False
+
 _DATABASE_AVAILABLE = False
 try:
     from database import load_admin_setting as real_load_admin_setting
@@ -2339,6 +2346,7 @@ def get_pvgis_data(
     return None
 
 
+@traced()
 def perform_calculations(
     project_data: Dict[str, Any],
     texts: Dict[str, str],
@@ -3860,6 +3868,24 @@ def perform_calculations(
         else 0.0
     )  # Anteil Speichernutzung an PV-Produktion
 
+    # Gekoppelte Stundenbilanz PV + Haushalt + Wärmepumpe + Speicher (ergänzt die Monatsbilanz oben)
+    results["coupled_dispatch"] = None
+    if _ENERGY_DISPATCH_AVAILABLE:
+        try:
+            coupled = coupled_dispatch_for_project(
+                project_data, results, round_trip_efficiency=storage_efficiency
+            )
+        except Exception as e_dispatch:
+            coupled = None
+            print(f"CALC: Gekoppelte Stundenbilanz fehlgeschlagen: {e_dispatch}")
+        if coupled:
+            results["coupled_dispatch"] = coupled
+            results["coupled_self_consumption_rate_percent"] = coupled["self_consumption_rate_percent"]
+            results["coupled_autarky_percent"] = coupled["autarky_percent"]
+            results["coupled_grid_import_kwh"] = coupled["grid_import_kwh"]
+            results["coupled_feed_in_kwh"] = coupled["feed_in_kwh"]
+            results["hp_pv_coverage_percent"] = coupled["heatpump_pv_share_percent"]
+
     # Speicherbezogene Kennzahlen
     if include_storage and selected_storage_capacity_kwh > 0:
         # Speichergrad / Deckungsgrad durch Speicher (Anteil des Gesamtverbrauchs, der aus dem Speicher gedeckt wird)
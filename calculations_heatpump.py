@@ -47,11 +47,14 @@ def recommend_heat_pump(heat_load_kw: float, available_pumps: List[Dict]) -> Dic
     
     Args:
         heat_load_kw (float): Die benötigte Heizlast.
-        available_pumps (List[Dict]): Liste der verfügbaren Pumpen aus der DB.
+        available_pumps (List[Dict]): Liste der verfügbaren Pumpen aus der DB
+            oder ein heatpump_catalog.HeatPumpCatalog (Bereichsabfrage statt Scan).
 
     Returns:
         Dict: Die Daten der empfohlenen Wärmepumpe oder None.
     """
+    if hasattr(available_pumps, "smallest_sufficient"):
+        return available_pumps.smallest_sufficient(heat_load_kw)
     suitable_pumps = [p for p in available_pumps if p['heating_output_kw'] >= heat_load_kw]
     if not suitable_pumps:
         return None
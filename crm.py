@@ -33,118 +33,34 @@ try:
         add_customer_document as _add_customer_document_db,
         list_customer_documents as _list_customer_documents_db,
         delete_customer_document as _delete_customer_document_db,
-        ensure_customer_documents_table as _ensure_customer_documents_table,
         get_customer_document_file_path as _get_customer_document_file_path,
     )
 except Exception:
     _add_customer_document_db = None
     _list_customer_documents_db = None
     _delete_customer_document_db = None
-    _ensure_customer_documents_table = lambda: None  # type: ignore
     _get_customer_document_file_path = None
 
+try:
+    from crm_search import search_crm
+except Exception:
+    search_crm = None
+
+try:
+    from database import apply_schema_migrations
+except Exception:
+    apply_schema_migrations = None
+
 def get_text_crm(texts_dict: Dict[str, str], key: str, fallback_text: Optional[str] = None) -> str:
     return texts_dict.get(key, fallback_text if fallback_text is not None else key.replace("_", " ").title())
 
 def create_tables_crm(conn: sqlite3.Connection):
-    cursor = conn.cursor()
-    # KORREKTUR: Alle Spalten in der CREATE TABLE Anweisung definieren.
-    # ALTER TABLE wird verwendet, um fehlende Spalten HINZUZUFÜGEN,
-    # falls die Tabelle bereits ohne sie existiert.
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS customers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            salutation TEXT,
-            title TEXT,
-            first_name TEXT NOT NULL,
-            last_name TEXT NOT NULL,
-            company_name TEXT,
-            address TEXT,
-            house_number TEXT,
-            zip_code TEXT,
-            city TEXT,
-            state TEXT,
-            region TEXT,
-            email TEXT,
-            phone_landline TEXT,
-            phone_mobile TEXT,
-            income_tax_rate_percent REAL DEFAULT 0.0,
-            creation_date TEXT,
-            last_updated TEXT
-        )
-    """)
-    conn.commit() # Commit changes before attempting ALTER TABLE
-
-    # KORREKTUR: Migrationslogik für fehlende Spalten nach der initialen Erstellung
-    # Dies ist eine gängige Methode, um das Schema zu aktualisieren, ohne Daten zu verlieren.
-    # Wir versuchen, jede Spalte hinzuzufügen und fangen den Fehler ab, wenn sie bereits existiert.
-    current_customer_columns = [col[1] for col in conn.execute("PRAGMA table_info(customers)").fetchall()]
-    
-    columns_to_add = {
-        "state": "TEXT",
-        "region": "TEXT",
-        "email": "TEXT",
-        "phone_landline": "TEXT",
-        "phone_mobile": "TEXT",
-        "income_tax_rate_percent": "REAL DEFAULT 0.0",
-        "creation_date": "TEXT",
-        "last_updated": "TEXT"
-    }
-
-    for col_name, col_type in columns_to_add.items():
-        if col_name not in current_customer_columns:
-            try:
-                cursor.execute(f"ALTER TABLE customers ADD COLUMN {col_name} {col_type}")
-                conn.commit()
-                print(f"CRM DB: Spalte '{col_name}' zur Tabelle 'customers' hinzugefügt.")
-            except sqlite3.OperationalError as e:
-                # Dies sollte nur bei "duplicate column name" passieren, was ok ist.
-                print(f"CRM DB migration warning: Konnte Spalte '{col_name}' nicht hinzufügen, da sie bereits existiert oder ein anderer Fehler auftrat: {e}")
-            except Exception as e:
-                print(f"CRM DB migration ERROR adding column '{col_name}': {e}")
-    
-    conn.commit() # Sicherstellen, dass alle ALTER TABLEs committed sind
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS projects (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            customer_id INTEGER NOT NULL,
-            project_name TEXT NOT NULL,
-            project_status TEXT,
-            roof_type TEXT,
-            roof_covering_type TEXT,
-            free_roof_area_sqm REAL,
-            roof_orientation TEXT,
-            roof_inclination_deg INTEGER,
-            building_height_gt_7m INTEGER,
-            annual_consumption_kwh REAL,
-            costs_household_euro_mo REAL,
-            annual_heating_kwh REAL,
-            costs_heating_euro_mo REAL,
-            anlage_type TEXT,
-            feed_in_type TEXT,
-            module_quantity INTEGER,
-            selected_module_id INTEGER,
-            selected_inverter_id INTEGER,
-            include_storage INTEGER,
-            selected_storage_id INTEGER,
-            selected_storage_storage_power_kw REAL,
-            include_additional_components INTEGER,
-            selected_wallbox_id INTEGER,
-            selected_ems_id INTEGER,
-            selected_optimizer_id INTEGER,
-            selected_carport_id INTEGER,
-            selected_notstrom_id INTEGER,
-            selected_tierabwehr_id INTEGER,
-            visualize_roof_in_pdf INTEGER,
-            latitude REAL,
-            longitude REAL,
-            creation_date TEXT,
-            last_updated TEXT,
-            FOREIGN KEY (customer_id) REFERENCES customers(id)
-        )
-    """)
-    conn.commit()
+    """
+    Kompatibilitäts-Wrapper: Das CRM-Schema wird über die versionierten Migrationen in
+    database.py gepflegt (einmalig pro user_version, nicht mehr bei jedem Aufruf).
+    """
+    if callable(apply_schema_migrations):
+        apply_schema_migrations(conn)
 
 def save_customer(conn: sqlite3.Connection, customer_data: Dict[str, Any]) -> Optional[int]:
     cursor = conn.cursor()
@@ -255,8 +171,6 @@ def render_crm(texts: Dict[str, str], get_db_connection_func: Callable[[], Optio
         st.error(get_text_crm(texts, "db_connection_unavailable", "Datenbankverbindung nicht verfügbar. CRM-Funktionen eingeschränkt."))
         return
 
-    create_tables_crm(conn) # Erstellt die Tabellen (inkl. neuer Spalten) oder fügt Spalten hinzu
-
     view_mode = st.session_state.get('crm_view_mode', 'customer_list')
     selected_customer_id = st.session_state.get('selected_customer_id', None)
     selected_project_id = st.session_state.get('selected_project_id', None)
@@ -270,6 +184,27 @@ def render_crm(texts: Dict[str, str], get_db_connection_func: Callable[[], Optio
             st.session_state['selected_project_id'] = None
             st.rerun()
 
+        search_query = st.text_input(
+            get_text_crm(texts, "crm_search_label", "Suche (Name, Straße, E-Mail, Projekt, Dokument)"),
+            key="crm_search_query",
+        )
+        if search_query.strip() and callable(search_crm):
+            hits = search_crm(conn, search_query, limit=100)
+            if hits:
+                st.dataframe(pd.DataFrame(hits), use_container_width=True, hide_index=True)
+                for hit in hits:
+                    if hit.get("customer_id") and st.button(
+                        f"{hit['label']} ({hit['entity_type']})",
+                        key=f"crm_search_hit_{hit['entity_type']}_{hit['entity_id']}",
+                    ):
+                        st.session_state['selected_customer_id'] = hit['customer_id']
+                        st.session_state['crm_view_mode'] = 'view_customer'
+                        st.rerun()
+            else:
+                st.info(get_text_crm(texts, "crm_search_no_results", "Keine Treffer."))
+            conn.close()
+            return
+
         customers = load_all_customers(conn)
         if customers:
             df_customers = pd.DataFrame(customers)
@@ -461,7 +396,6 @@ def render_crm(texts: Dict[str, str], get_db_connection_func: Callable[[], Optio
         # Kundenakte: Dateien & Dokumente
         st.markdown("---")
         with st.expander(get_text_crm(texts, "crm_customer_filevault_header", "Kundenakte: Dateien & Dokumente"), expanded=False):
-            _ensure_customer_documents_table()
             # Upload-Bereich
             uploaded_files = st.file_uploader(
                 get_text_crm(texts, "crm_filevault_upload_label", "Dateien zur Kundenakte hinzufügen"),
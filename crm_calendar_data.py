@@ -0,0 +1,144 @@
+# crm_calendar_data.py
+# Datenschicht für den CRM-Kalender: indizierte Bereichsabfrage auf crm_appointments.appointment_date,
+# Einsortieren nach Tagen in einem Durchlauf und LRU-Cache pro Monat für schnelle Navigation.
+
+import calendar
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+MONTH_CACHE_SIZE = 24
+
+_APPOINTMENT_COLUMNS = (
+    "a.id, a.title, a.type, a.appointment_date, a.duration_minutes, a.customer_id, a.location, a.notes, "
+    "a.reminder_minutes, a.status, a.created_at, a.updated_at, c.first_name, c.last_name"
+)
+
+
+def month_bounds(year: int, month: int) -> Tuple[datetime, datetime]:
+    """Halboffenes Intervall [Monatserster, Erster des Folgemonats)."""
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+def week_bounds(day: date) -> Tuple[datetime, datetime]:
+    """Halboffenes Intervall [Montag 00:00, folgender Montag 00:00) der Woche von `day`."""
+    start = datetime.combine(day - timedelta(days=day.weekday()), datetime.min.time())
+    return start, start + timedelta(days=7)
+
+
+def _row_to_appointment(row: sqlite3.Row) -> Dict[str, Any]:
+    first_name, last_name = row[12], row[13]
+    return {
+        'id': row[0],
+        'title': row[1],
+        'type': row[2],
+        'appointment_date': datetime.fromisoformat(row[3]),
+        'duration_minutes': row[4],
+        'customer_id': row[5],
+        'location': row[6],
+        'notes': row[7],
+        'reminder_minutes': row[8],
+        'status': row[9],
+        'created_at': row[10],
+        'updated_at': row[11],
+        'customer_name': f"{first_name or ''} {last_name or ''}".strip() if first_name or last_name else None,
+    }
+
+
+def fetch_appointments(conn: sqlite3.Connection, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                       appointment_type: Optional[str] = None, status: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Lädt Termine im Intervall [start, end) sortiert nach Datum. Die Grenzen werden im selben
+    ISO-Format wie die gespeicherten Werte übergeben, damit der Index auf appointment_date greift.
+    """
+    query = f"SELECT {_APPOINTMENT_COLUMNS} FROM crm_appointments a LEFT JOIN crm_customers c ON a.customer_id = c.id WHERE 1=1"
+    params: List[Any] = []
+    if start is not None:
+        query += " AND a.appointment_date >= ?"
+        params.append(start.isoformat())
+    if end is not None:
+        query += " AND a.appointment_date < ?"
+        params.append(end.isoformat())
+    if appointment_type:
+        query += " AND a.type = ?"
+        params.append(appointment_type)
+    if status:
+        query += " AND a.status = ?"
+        params.append(status)
+    query += " ORDER BY a.appointment_date"
+    return [_row_to_appointment(row) for row in conn.execute(query, params).fetchall()]
+
+
+def bucket_by_day(appointments: List[Dict[str, Any]]) -> Dict[date, List[Dict[str, Any]]]:
+    """Sortiert (bereits nach Datum geordnete) Termine in einem Durchlauf nach Kalendertag ein."""
+    buckets: Dict[date, List[Dict[str, Any]]] = {}
+    for appointment in appointments:
+        buckets.setdefault(appointment['appointment_date'].date(), []).append(appointment)
+    return buckets
+
+
+class AppointmentCalendarStore:
+    """
+    Monatsweise gecachte Termine (LRU). Monats-, Wochen- und Tagesansicht lesen aus den
+    Tages-Buckets; Schreibzugriffe invalidieren gezielt den betroffenen Monat.
+    """
+
+    def __init__(self, get_connection: Callable[[], Optional[sqlite3.Connection]], max_months: int = MONTH_CACHE_SIZE):
+        self._get_connection = get_connection
+        self._max_months = max(1, int(max_months))
+        self._months: "OrderedDict[Tuple[int, int], Dict[date, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def month(self, year: int, month: int) -> Dict[date, List[Dict[str, Any]]]:
+        """Tag -> Termine für einen Monat (eine Bereichsabfrage, danach aus dem Cache)."""
+        key = (int(year), int(month))
+        with self._lock:
+            if key in self._months:
+                self._months.move_to_end(key)
+                self.hits += 1
+                return self._months[key]
+            self.misses += 1
+        conn = self._get_connection()
+        if conn is None:
+            return {}
+        try:
+            buckets = bucket_by_day(fetch_appointments(conn, *month_bounds(*key)))
+        finally:
+            conn.close()
+        with self._lock:
+            self._months[key] = buckets
+            self._months.move_to_end(key)
+            while len(self._months) > self._max_months:
+                self._months.popitem(last=False)
+        return buckets
+
+    def day(self, day: date) -> List[Dict[str, Any]]:
+        return list(self.month(day.year, day.month).get(day, []))
+
+    def week(self, day: date) -> Dict[date, List[Dict[str, Any]]]:
+        """Montag..Sonntag der Woche von `day`; Wochen über Monatsgrenzen nutzen beide Monats-Caches."""
+        start = week_bounds(day)[0].date()
+        days = [start + timedelta(days=i) for i in range(7)]
+        return {d: list(self.month(d.year, d.month).get(d, [])) for d in days}
+
+    def month_grid(self, year: int, month: int) -> List[List[Tuple[int, List[Dict[str, Any]]]]]:
+        """Wochenzeilen wie calendar.monthcalendar, jede Zelle als (Tag, Termine); Tag 0 = leer."""
+        buckets = self.month(year, month)
+        return [
+            [(d, buckets.get(date(year, month, d), []) if d else []) for d in week]
+            for week in calendar.monthcalendar(year, month)
+        ]
+
+    def invalidate(self, when: Optional[datetime] = None) -> None:
+        """Verwirft den Cache des Monats von `when` (oder alles, wenn None)."""
+        with self._lock:
+            if when is None:
+                self._months.clear()
+            else:
+                self._months.pop((when.year, when.month), None)
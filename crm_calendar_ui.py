@@ -11,11 +11,18 @@ import calendar
 import json
 
 try:
-    from database import execute_query, get_db_connection
+    from database import get_db_connection
     DATABASE_AVAILABLE = True
 except ImportError:
     DATABASE_AVAILABLE = False
 
+from crm_calendar_data import AppointmentCalendarStore, fetch_appointments, month_bounds, week_bounds
+
+# Prozessweiter Monats-Cache (überlebt Streamlit-Reruns, wird bei Schreibzugriffen invalidiert)
+_calendar_store: Optional[AppointmentCalendarStore] = (
+    AppointmentCalendarStore(get_db_connection) if DATABASE_AVAILABLE else None
+)
+
 class CRMCalendar:
     """CRM Kalender für Termine und Erinnerungen"""
     
@@ -51,6 +58,13 @@ class CRMCalendar:
     
     def _render_calendar_view(self):
         """Rendert die Kalenderansicht"""
+        view_mode = st.radio("Ansicht", ["Monat", "Woche", "Tag"], horizontal=True, key="calendar_view_mode")
+        if view_mode == "Woche":
+            self._render_week_view()
+            return
+        if view_mode == "Tag":
+            self._render_day_view()
+            return
         st.subheader(" Monatsansicht")
         
         # Datum-Navigation
@@ -105,8 +119,8 @@ class CRMCalendar:
     
     def _render_calendar_grid(self, current_date: datetime):
         """Rendert das Kalender-Grid"""
-        # Termine für den Monat laden
-        appointments = self._get_appointments_for_month(current_date.year, current_date.month)
+        # Termine des Monats: eine Bereichsabfrage, nach Tagen vorsortiert (Monats-Cache)
+        month_grid = _calendar_store.month_grid(current_date.year, current_date.month)
         
         # Kalender-Header
         weekdays = ['Mo', 'Di', 'Mi', 'Do', 'Fr', 'Sa', 'So']
@@ -115,22 +129,13 @@ class CRMCalendar:
             cols[i].markdown(f"**{day}**")
         
         # Kalender-Tage
-        cal = calendar.monthcalendar(current_date.year, current_date.month)
-        
-        for week in cal:
+        for week in month_grid:
             cols = st.columns(7)
-            for i, day in enumerate(week):
+            for i, (day, day_appointments) in enumerate(week):
                 with cols[i]:
                     if day == 0:
                         st.markdown("&nbsp;")
                     else:
-                        # Tag anzeigen
-                        day_date = datetime(current_date.year, current_date.month, day)
-                        day_appointments = [
-                            apt for apt in appointments 
-                            if apt['appointment_date'].date() == day_date.date()
-                        ]
-                        
                         # Tag-Container
                         if day_appointments:
                             apt_count = len(day_appointments)
@@ -155,6 +160,31 @@ class CRMCalendar:
                                 </div>
                             """, unsafe_allow_html=True)
     
+    def _render_week_view(self):
+        """Rendert die Wochenansicht (Mo-So) aus den Monats-Caches"""
+        st.subheader(" Wochenansicht")
+        selected_day = st.date_input("Woche mit Datum", value=datetime.now().date(), key="calendar_week_day")
+        week_start = week_bounds(selected_day)[0]
+        st.caption(f"KW {week_start.isocalendar()[1]}: {week_start.strftime('%d.%m.%Y')} - {(week_start + timedelta(days=6)).strftime('%d.%m.%Y')}")
+        week = _calendar_store.week(selected_day)
+        cols = st.columns(7)
+        for i, (day, day_appointments) in enumerate(week.items()):
+            with cols[i]:
+                st.markdown(f"**{['Mo', 'Di', 'Mi', 'Do', 'Fr', 'Sa', 'So'][i]} {day.strftime('%d.%m.')}**")
+                for apt in day_appointments:
+                    apt_type = self.appointment_types.get(apt['type'], self.appointment_types['consultation'])
+                    st.markdown(f"<small>{apt['appointment_date'].strftime('%H:%M')} {apt_type['icon']} {apt['title'][:20]}</small>", unsafe_allow_html=True)
+    
+    def _render_day_view(self):
+        """Rendert die Tagesansicht mit Terminkarten"""
+        st.subheader(" Tagesansicht")
+        selected_day = st.date_input("Datum", value=datetime.now().date(), key="calendar_day_view_day")
+        day_appointments = _calendar_store.day(selected_day)
+        if not day_appointments:
+            st.info("Keine Termine an diesem Tag")
+        for appointment in day_appointments:
+            self._render_appointment_card(appointment)
+    
     def _render_new_appointment_form(self):
         """Rendert das Formular für neue Termine"""
         st.subheader(" Neuen Termin erstellen")
@@ -351,65 +381,8 @@ class CRMCalendar:
     def _get_appointments_for_month(self, year: int, month: int) -> List[Dict[str, Any]]:
         """Lädt Termine für einen bestimmten Monat"""
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Tabelle erstellen falls sie nicht existiert
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS crm_appointments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    type TEXT NOT NULL,
-                    appointment_date TIMESTAMP NOT NULL,
-                    duration_minutes INTEGER DEFAULT 60,
-                    customer_id INTEGER,
-                    location TEXT,
-                    notes TEXT,
-                    reminder_minutes INTEGER DEFAULT 60,
-                    status TEXT DEFAULT 'scheduled',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (customer_id) REFERENCES crm_customers (id)
-                )
-            ''')
-            
-            # Termine für den Monat abfragen
-            start_date = datetime(year, month, 1)
-            if month == 12:
-                end_date = datetime(year + 1, 1, 1)
-            else:
-                end_date = datetime(year, month + 1, 1)
-            
-            cursor.execute('''
-                SELECT a.*, c.first_name, c.last_name
-                FROM crm_appointments a
-                LEFT JOIN crm_customers c ON a.customer_id = c.id
-                WHERE a.appointment_date >= ? AND a.appointment_date < ?
-                ORDER BY a.appointment_date
-            ''', (start_date, end_date))
-            
-            appointments = []
-            for row in cursor.fetchall():
-                appointment = {
-                    'id': row[0],
-                    'title': row[1],
-                    'type': row[2],
-                    'appointment_date': datetime.fromisoformat(row[3]),
-                    'duration_minutes': row[4],
-                    'customer_id': row[5],
-                    'location': row[6],
-                    'notes': row[7],
-                    'reminder_minutes': row[8],
-                    'status': row[9],
-                    'created_at': row[10],
-                    'updated_at': row[11],
-                    'customer_name': f"{row[12] or ''} {row[13] or ''}".strip() if row[12] or row[13] else None
-                }
-                appointments.append(appointment)
-            
-            conn.close()
-            return appointments
-            
+            buckets = _calendar_store.month(year, month)
+            return [apt for day in sorted(buckets) for apt in buckets[day]]
         except Exception as e:
             print(f"Fehler beim Laden der Monats-Termine: {e}")
             return []
@@ -417,78 +390,28 @@ class CRMCalendar:
     def _get_filtered_appointments(self, filter_type: str, filter_period: str, filter_status: str) -> List[Dict[str, Any]]:
         """Lädt gefilterte Termine"""
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Basis-Query
-            query = '''
-                SELECT a.*, c.first_name, c.last_name
-                FROM crm_appointments a
-                LEFT JOIN crm_customers c ON a.customer_id = c.id
-                WHERE 1=1
-            '''
-            params = []
-            
-            # Typ-Filter
-            if filter_type != 'all':
-                query += ' AND a.type = ?'
-                params.append(filter_type)
-            
-            # Status-Filter
-            if filter_status != 'all':
-                query += ' AND a.status = ?'
-                params.append(filter_status)
-            
-            # Zeitraum-Filter
+            # Zeitraum-Filter als halboffenes Intervall auf dem indizierten appointment_date
             now = datetime.now()
+            start, end = None, None
             if filter_period == 'today':
-                start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                end_of_day = start_of_day + timedelta(days=1)
-                query += ' AND a.appointment_date >= ? AND a.appointment_date < ?'
-                params.extend([start_of_day, end_of_day])
+                start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+                end = start + timedelta(days=1)
             elif filter_period == 'upcoming':
-                query += ' AND a.appointment_date >= ?'
-                params.append(now)
+                start = now
             elif filter_period == 'this_week':
-                start_of_week = now - timedelta(days=now.weekday())
-                start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-                end_of_week = start_of_week + timedelta(days=7)
-                query += ' AND a.appointment_date >= ? AND a.appointment_date < ?'
-                params.extend([start_of_week, end_of_week])
+                start, end = week_bounds(now.date())
             elif filter_period == 'this_month':
-                start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                if now.month == 12:
-                    end_of_month = start_of_month.replace(year=now.year + 1, month=1)
-                else:
-                    end_of_month = start_of_month.replace(month=now.month + 1)
-                query += ' AND a.appointment_date >= ? AND a.appointment_date < ?'
-                params.extend([start_of_month, end_of_month])
-            
-            query += ' ORDER BY a.appointment_date'
+                start, end = month_bounds(now.year, now.month)
             
-            cursor.execute(query, params)
-            
-            appointments = []
-            for row in cursor.fetchall():
-                appointment = {
-                    'id': row[0],
-                    'title': row[1],
-                    'type': row[2],
-                    'appointment_date': datetime.fromisoformat(row[3]),
-                    'duration_minutes': row[4],
-                    'customer_id': row[5],
-                    'location': row[6],
-                    'notes': row[7],
-                    'reminder_minutes': row[8],
-                    'status': row[9],
-                    'created_at': row[10],
-                    'updated_at': row[11],
-                    'customer_name': f"{row[12] or ''} {row[13] or ''}".strip() if row[12] or row[13] else None
-                }
-                appointments.append(appointment)
-            
-            conn.close()
-            return appointments
+            conn = get_db_connection()
+            try:
+                return fetch_appointments(
+                    conn, start, end,
+                    appointment_type=None if filter_type == 'all' else filter_type,
+                    status=None if filter_status == 'all' else filter_status,
+                )
+            finally:
+                conn.close()
             
         except Exception as e:
             print(f"Fehler beim Laden der gefilterten Termine: {e}")
@@ -518,6 +441,7 @@ class CRMCalendar:
             
             conn.commit()
             conn.close()
+            _calendar_store.invalidate(appointment_data['appointment_date'])
             return True
             
         except Exception as e:
@@ -534,6 +458,7 @@ class CRMCalendar:
             
             conn.commit()
             conn.close()
+            _calendar_store.invalidate()
             return True
             
         except Exception as e:
@@ -553,3 +478,4 @@ def render_crm_calendar(texts: Dict[str, str], module_name: Optional[str] = None
 #                           - Termin-Erstellung und -Verwaltung
 #                           - Kunde-Termin-Verknüpfung
 #                           - Filter- und Suchfunktionen
+# Kalender-Datenschicht (crm_calendar_data): indizierte Bereichsabfrage, Tages-Buckets, Monats-LRU-Cache, Wochen-/Tagesansicht
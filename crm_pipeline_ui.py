@@ -561,27 +561,6 @@ class CRMPipeline:
             conn = get_db_connection()
             cursor = conn.cursor()
             
-            # Tabelle erstellen falls sie nicht existiert
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS crm_leads (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    company_name TEXT NOT NULL,
-                    contact_person TEXT NOT NULL,
-                    email TEXT,
-                    phone TEXT,
-                    address TEXT,
-                    lead_source TEXT,
-                    estimated_value REAL DEFAULT 0,
-                    probability INTEGER DEFAULT 50,
-                    expected_close_date DATE,
-                    stage TEXT DEFAULT 'lead',
-                    stage_changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    notes TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
             cursor.execute('''
                 SELECT * FROM crm_leads 
                 WHERE stage = ? 
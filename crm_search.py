@@ -0,0 +1,223 @@
+# crm_search.py
+# Volltextsuche (SQLite FTS5) über Kunden, Projekte, Leads, Termine und Kundendokumente
+
+import re
+import sqlite3
+from typing import Dict, List, Optional, Any, Iterable
+
+# Deutsche Umlaute werden beim Indexieren UND bei der Suche identisch gefaltet
+# ("Müller" == "Mueller"), weitere Diakritika entfernt der unicode61-Tokenizer.
+_UMLAUT_FOLDING = (
+    ("ä", "ae"), ("ö", "oe"), ("ü", "ue"),
+    ("Ä", "ae"), ("Ö", "oe"), ("Ü", "ue"),
+    ("ß", "ss"), ("ẞ", "ss"),
+)
+
+_FTS_TOKENIZE = "unicode61 remove_diacritics 2"
+_FTS_PREFIX = "2 3 4"
+
+# Quelle -> (Basistabelle, FTS-Tabelle, indexierte Spalten, Spalte mit Kunden-ID, Label-Ausdruck)
+SEARCH_SOURCES: Dict[str, Dict[str, Any]] = {
+    "customer": {
+        "table": "customers",
+        "fts_table": "crm_fts_customers",
+        "columns": ["first_name", "last_name", "company_name", "address", "house_number",
+                    "zip_code", "city", "email", "phone_landline", "phone_mobile"],
+        "customer_id_column": "id",
+        "label_sql": "TRIM(COALESCE(b.first_name, '') || ' ' || COALESCE(b.last_name, ''))",
+    },
+    "project": {
+        "table": "projects",
+        "fts_table": "crm_fts_projects",
+        "columns": ["project_name", "project_status", "anlage_type", "roof_type"],
+        "customer_id_column": "customer_id",
+        "label_sql": "b.project_name",
+    },
+    "lead": {
+        "table": "crm_leads",
+        "fts_table": "crm_fts_leads",
+        "columns": ["company_name", "contact_person", "email", "phone", "address", "notes"],
+        "customer_id_column": None,
+        "label_sql": "TRIM(COALESCE(b.contact_person, '') || ' (' || COALESCE(b.company_name, '') || ')')",
+    },
+    "appointment": {
+        "table": "crm_appointments",
+        "fts_table": "crm_fts_appointments",
+        "columns": ["title", "location", "notes"],
+        # crm_appointments.customer_id verweist auf crm_customers, nicht auf customers -> kein Kundensprung
+        "customer_id_column": None,
+        "label_sql": "b.title",
+    },
+    "document": {
+        "table": "customer_documents",
+        "fts_table": "crm_fts_documents",
+        "columns": ["display_name", "file_name"],
+        "customer_id_column": "customer_id",
+        "label_sql": "COALESCE(b.display_name, b.file_name)",
+    },
+}
+
+
+def fold_search_text(text: Optional[str]) -> str:
+    """Faltet Umlaute/ß und wandelt in Kleinbuchstaben – identisch zur Trigger-Logik."""
+    if not text:
+        return ""
+    folded = str(text)
+    for src, dst in _UMLAUT_FOLDING:
+        folded = folded.replace(src, dst)
+    return folded.lower()
+
+
+def _sql_fold(expr: str) -> str:
+    """SQL-Gegenstück zu fold_search_text (SQLite lower() kennt nur ASCII)."""
+    sql = f"COALESCE({expr}, '')"
+    for src, dst in _UMLAUT_FOLDING:
+        sql = f"REPLACE({sql}, '{src}', '{dst}')"
+    return f"LOWER({sql})"
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def _existing_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [r[1] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _create_source_index(conn: sqlite3.Connection, source: Dict[str, Any]) -> None:
+    """Legt FTS-Tabelle + Sync-Trigger für eine Quelle an und befüllt sie initial."""
+    table = source["table"]
+    fts = source["fts_table"]
+    base_columns = set(_existing_columns(conn, table))
+    columns = source["columns"]
+    cursor = conn.cursor()
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"{', '.join(columns)}, tokenize = '{_FTS_TOKENIZE}', prefix = '{_FTS_PREFIX}')"
+    )
+
+    def _values(alias: str) -> str:
+        # Spalten, die es in Altbeständen (noch) nicht gibt, werden leer indexiert
+        return ", ".join(
+            _sql_fold(f"{alias}.{col}") if col in base_columns else "''" for col in columns
+        )
+
+    col_list = ", ".join(columns)
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.id, {_values('new')}); END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"DELETE FROM {fts} WHERE rowid = old.id; END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+        f"DELETE FROM {fts} WHERE rowid = old.id; "
+        f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.id, {_values('new')}); END"
+    )
+    cursor.execute(
+        f"INSERT INTO {fts}(rowid, {col_list}) SELECT b.id, {_values('b')} FROM {table} b"
+    )
+
+
+def ensure_search_index(conn: sqlite3.Connection) -> List[str]:
+    """
+    Stellt sicher, dass für jede vorhandene CRM-Tabelle ein FTS5-Index samt Triggern existiert.
+    Tabellen, die (noch) nicht angelegt sind, werden beim nächsten Aufruf nachgezogen.
+
+    Returns:
+        Liste der in diesem Aufruf neu angelegten FTS-Tabellen.
+    """
+    created: List[str] = []
+    try:
+        for source in SEARCH_SOURCES.values():
+            if not _table_exists(conn, source["table"]) or _table_exists(conn, source["fts_table"]):
+                continue
+            _create_source_index(conn, source)
+            created.append(source["fts_table"])
+        if created:
+            conn.commit()
+            print(f"CRM Suche: FTS-Index angelegt für {', '.join(created)}")
+    except sqlite3.Error as e:
+        print(f"CRM Suche: FEHLER beim Anlegen des Suchindex: {e}")
+        conn.rollback()
+    return created
+
+
+def rebuild_search_index(conn: sqlite3.Connection) -> bool:
+    """Verwirft alle FTS-Tabellen und baut sie aus den Basistabellen neu auf."""
+    try:
+        for source in SEARCH_SOURCES.values():
+            fts = source["fts_table"]
+            for suffix in ("ai", "ad", "au"):
+                conn.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            conn.execute(f"DROP TABLE IF EXISTS {fts}")
+        conn.commit()
+        ensure_search_index(conn)
+        return True
+    except sqlite3.Error as e:
+        print(f"CRM Suche: FEHLER beim Neuaufbau des Suchindex: {e}")
+        conn.rollback()
+        return False
+
+
+def build_match_query(query: str) -> str:
+    """Übersetzt eine Benutzereingabe in einen FTS5-Ausdruck mit Präfixsuche je Begriff."""
+    terms = re.findall(r"\w+", fold_search_text(query))
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_crm(conn: sqlite3.Connection, query: str, entity_types: Optional[Iterable[str]] = None,
+               limit: int = 50) -> List[Dict[str, Any]]:
+    """
+    Rangierte Volltextsuche (bm25) über alle indexierten CRM-Quellen.
+
+    Args:
+        conn: Offene SQLite-Verbindung.
+        query: Freitext, z.B. "müll hauptstr" oder "max@exa".
+        entity_types: Optionale Einschränkung auf Schlüssel aus SEARCH_SOURCES.
+        limit: Maximale Trefferzahl insgesamt.
+
+    Returns:
+        Trefferliste (bester Treffer zuerst) mit entity_type, entity_id, customer_id, label, rank.
+    """
+    match = build_match_query(query)
+    if not match or limit <= 0:
+        return []
+    wanted = set(entity_types) if entity_types else set(SEARCH_SOURCES)
+    hits: List[Dict[str, Any]] = []
+    for entity_type, source in SEARCH_SOURCES.items():
+        if entity_type not in wanted or not _table_exists(conn, source["fts_table"]):
+            continue
+        customer_col = source["customer_id_column"]
+        customer_sql = f"b.{customer_col}" if customer_col else "NULL"
+        try:
+            rows = conn.execute(
+                f"""
+                SELECT f.rowid, bm25({source['fts_table']}) AS rank,
+                       {customer_sql} AS customer_id, {source['label_sql']} AS label
+                FROM {source['fts_table']} f
+                JOIN {source['table']} b ON b.id = f.rowid
+                WHERE {source['fts_table']} MATCH ?
+                ORDER BY rank
+                LIMIT ?
+                """,
+                (match, limit),
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"CRM Suche: FEHLER bei Suche in '{entity_type}': {e}")
+            continue
+        for row in rows:
+            hits.append({
+                "entity_type": entity_type,
+                "entity_id": row[0],
+                "rank": row[1],
+                "customer_id": row[2],
+                "label": row[3] or "",
+            })
+    hits.sort(key=lambda h: h["rank"])
+    return hits[:limit]
@@ -9,9 +9,10 @@ from typing import Dict, Any, Optional, List, Callable, Tuple
 import json
 import traceback
 from datetime import datetime
-import requests
 import base64
 
+from geo_cache import get_geo_cache, static_map_url
+
 # Import streamlit_shadcn_ui with fallback
 try:
     import streamlit_shadcn_ui as sui
@@ -107,28 +108,9 @@ def get_coordinates_from_address_google(address: str, city: str, zip_code: str,
     if not address or not city:
         # st.warning(get_text_di(texts, "geocode_missing_address_city", "Für Geocoding werden Straße und Ort benötigt.")) # Nur bei Bedarf im UI
         return None
-    full_query_address = f"{address}, {zip_code} {city}"
-    base_url = "https://maps.googleapis.com/maps/api/geocode/json"
-    params = {"address": full_query_address, "key": api_key}
+    # Persistenter Cache je normalisierter Adresse (TTL, Tageskontingent, Offline-Modus)
     try:
-        response = requests.get(base_url, params=params, timeout=10)
-        response.raise_for_status() 
-        data = response.json()
-        if data.get("status") == "OK" and data.get("results"):
-            location = data["results"][0].get("geometry", {}).get("location", {})
-            lat, lng = location.get("lat"), location.get("lng")
-            if lat is not None and lng is not None:
-                # st.success(get_text_di(texts, "geolocation_success_google_api", f"Koordinaten via Google API: Lat {lat:.6f}, Lon {lng:.6f}")) # Nur bei Bedarf im UI
-                return {"latitude": float(lat), "longitude": float(lng)}
-            # else: st.warning(get_text_di(texts, "geolocation_google_api_no_coords", "Google API: Keine Koordinaten in der Antwort gefunden.")) # Nur bei Bedarf
-        # else: st.warning(get_text_di(texts, "geolocation_google_api_status_error", f"Google API Fehler: {data.get('status')} - {data.get('error_message', '')}")) # Nur bei Bedarf
-        return None
-    except requests.exceptions.Timeout:
-        # st.error(get_text_di(texts, "geolocation_google_api_timeout", "Google Geocoding API Zeitüberschreitung.")) # Nur bei Bedarf
-        return None
-    except requests.exceptions.RequestException as e:
-        # st.error(get_text_di(texts, "geolocation_google_api_request_error", f"Google Geocoding API Anfragefehler: {e}")) # Nur bei Bedarf
-        return None
+        return get_geo_cache().geocode(address, city, zip_code, api_key)
     except Exception as e:
         # st.error(f"{get_text_di(texts, 'geolocation_api_unknown_error', 'Unbekannter Fehler beim Geocoding:')} {e}") # Nur bei Bedarf
         return None
@@ -142,11 +124,14 @@ def get_Maps_satellite_image_url(latitude: float, longitude: float, api_key: Opt
     if abs(latitude) < 1e-9 and abs(longitude) < 1e-9 and not st.session_state.get("allow_zero_coords_map_di", False):
          # st.info(get_text_di(texts, "map_default_coords_info", "Standardkoordinaten (0,0) werden verwendet. Bitte gültige Koordinaten eingeben oder Adresse parsen, um ein spezifisches Satellitenbild zu laden.")) # Nur bei Bedarf
          return None 
-    base_url = "https://maps.googleapis.com/maps/api/staticmap?"
-    params = { "center": f"{latitude},{longitude}", "zoom": str(zoom), "size": f"{width}x{height}", "maptype": "satellite", "key": api_key }
-    url_parts = [f"{k}={v}" for k, v in params.items()]
-    full_url = base_url + "&".join(url_parts)
-    return full_url
+    return static_map_url(latitude, longitude, api_key, zoom=zoom, width=width, height=height)
+
+def get_Maps_satellite_image_bytes(latitude: float, longitude: float, api_key: Optional[str], zoom: int = 20, width: int = 600, height: int = 400) -> Optional[bytes]:
+    """Satellitenbild aus dem Geo-Cache (lat/lon/zoom/Größe); nur bei Cache-Fehlschlag wird die API angefragt."""
+    try:
+        return get_geo_cache().static_map(latitude, longitude, api_key, zoom=zoom, width=width, height=height)
+    except Exception:
+        return None
 
 # KORREKTUR: `render_data_input` modifiziert `st.session_state.project_data` direkt und gibt es nicht mehr zurück.
 def render_data_input(texts: Dict[str, str]) -> None: 
@@ -323,7 +308,8 @@ def render_data_input(texts: Dict[str, str]) -> None:
             if st.session_state.get('satellite_image_url_di'): 
                 # st.markdown(f"Generierte Bild-URL (für Vorschau):"); st.code(st.session_state.satellite_image_url_di) # Für Debugging
                 try:
-                    st.image(st.session_state.satellite_image_url_di, caption=get_text_di(texts, "satellite_image_caption", "Satellitenansicht"))
+                    satellite_bytes = get_Maps_satellite_image_bytes(current_lat, current_lon, EFFECTIVE_GOOGLE_API_KEY)
+                    st.image(satellite_bytes or st.session_state.satellite_image_url_di, caption=get_text_di(texts, "satellite_image_caption", "Satellitenansicht"))
                     default_visualize_satellite = inputs['project_details'].get('visualize_roof_in_pdf_satellite', False)
                     inputs['project_details']['visualize_roof_in_pdf_satellite'] = st.checkbox(get_text_di(texts, "visualize_satellite_in_pdf_label", "Satellitenbild in PDF anzeigen"), value=default_visualize_satellite, key="visualize_satellite_in_pdf_di_val_v6_final_exp_stable" )
                     if inputs['project_details'].get('visualize_roof_in_pdf_satellite') and st.session_state.satellite_image_url_di:
@@ -331,9 +317,9 @@ def render_data_input(texts: Dict[str, str]) -> None:
                            inputs['project_details'].get('satellite_image_for_pdf_url_source') != st.session_state.satellite_image_url_di:
                             try:
                                 with st.spinner("Lade Satellitenbild für PDF..."): # Spinner ist gut für UI-Feedback
-                                    response = requests.get(st.session_state.satellite_image_url_di, timeout=15)
-                                    response.raise_for_status()
-                                    inputs['project_details']['satellite_image_base64_data'] = base64.b64encode(response.content).decode('utf-8')
+                                    if not satellite_bytes:
+                                        raise ValueError("Satellitenbild nicht verfügbar")
+                                    inputs['project_details']['satellite_image_base64_data'] = base64.b64encode(satellite_bytes).decode('utf-8')
                                     inputs['project_details']['satellite_image_for_pdf_url_source'] = st.session_state.satellite_image_url_di
                                     # st.success("Satellitenbild für PDF vorbereitet.") # Optional
                             except Exception as e_sat_download:
@@ -1,13 +1,20 @@
-# database.py (Schema Version 14 - Spaltennamen und last_modified korrigiert)
+# database.py (Schema Version 20 - versionierte Migrationen über PRAGMA user_version)
 import sqlite3
 import os
+import threading
 import traceback
 import json
 from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
 import io
 
-DB_SCHEMA_VERSION = 14
+try:
+    import offer_trace
+    _OFFER_TRACE_AVAILABLE = True
+except ImportError:
+    _OFFER_TRACE_AVAILABLE = False
+
+DB_SCHEMA_VERSION = 21
 print(f"DATABASE.PY TOP LEVEL: DB_SCHEMA_VERSION ist auf {DB_SCHEMA_VERSION} gesetzt.")
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -68,8 +75,6 @@ def add_customer_document(customer_id: int, file_bytes: bytes, display_name: str
         conn = get_db_connection()
         if not conn:
             return None
-        _create_customer_documents_table(conn)
-
         # Sichere Dateinamenserstellung
         safe_name = suggested_filename or f"{display_name or 'dokument'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.bin"
         safe_name = safe_name.replace("/", "_").replace("\\", "_")
@@ -77,8 +82,8 @@ def add_customer_document(customer_id: int, file_bytes: bytes, display_name: str
         customer_dir = os.path.join(CUSTOMER_DOCS_BASE_DIR, f"customer_{customer_id}")
         os.makedirs(customer_dir, exist_ok=True)
         abs_path = os.path.join(customer_dir, safe_name)
-        with open(abs_path, "wb") as f:
-            f.write(file_bytes)
+        from document_store import store_file
+        store_file(conn, bytes(file_bytes), abs_path, DATA_DIR)
 
         cur = conn.cursor()
         cur.execute(
@@ -101,7 +106,6 @@ def list_customer_documents(customer_id: int, project_id: Optional[int] = None)
         conn = get_db_connection()
         if not conn:
             return []
-        _create_customer_documents_table(conn)
         cur = conn.cursor()
         if project_id is not None:
             cur.execute(
@@ -163,8 +167,8 @@ def delete_customer_document(document_id: int) -> bool:
         rel_path = row[0]
         abs_path = os.path.join(DATA_DIR, rel_path)
         try:
-            if os.path.exists(abs_path):
-                os.remove(abs_path)
+            from document_store import release_file
+            release_file(conn, abs_path, DATA_DIR)
         except Exception as e_rm:
             print(f"DB Warnung: Datei konnte nicht gelöscht werden ({abs_path}): {e_rm}")
         cur.execute("DELETE FROM customer_documents WHERE id = ?", (document_id,))
@@ -269,6 +273,11 @@ def get_db_connection() -> Optional[sqlite3.Connection]:
         if not os.path.exists(DATA_DIR): os.makedirs(DATA_DIR)
         conn = sqlite3.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
+        if _OFFER_TRACE_AVAILABLE and offer_trace.is_enabled():
+            # Abfragen dem aktiven Trace-Span zurechnen
+            conn.set_trace_callback(offer_trace.count_db_query)
+        if DB_PATH not in _schema_checked_db_paths:
+            _ensure_schema_current_once(conn)
         return conn
     except sqlite3.Error as e: print(f"FATAL DB Error: {e}"); traceback.print_exc(); return None
 
@@ -289,11 +298,23 @@ def get_pdf_template_by_name(template_type: str, name: str) -> Optional[Dict[str
         if conn: 
             conn.close()
 
+def _sqlite_online_copy(source_path: str, dest_path: str, pages: int = 1024) -> None:
+    """Kopiert eine SQLite-DB seitenweise über die Backup-API (konsistent, inkl. WAL-Inhalt)."""
+    src = sqlite3.connect(source_path)
+    try:
+        dst = sqlite3.connect(dest_path)
+        try:
+            # In Schritten kopieren, damit schreibende Verbindungen zwischendurch nicht blockiert werden
+            src.backup(dst, pages=pages)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+
 def backup_database(backup_path: str) -> bool:
     try:
-        import shutil
         if os.path.exists(DB_PATH):
-            shutil.copy2(DB_PATH, backup_path)
+            _sqlite_online_copy(DB_PATH, backup_path)
             print(f"DB: Backup erfolgreich erstellt: {backup_path}")
             return True
         else:
@@ -305,9 +326,9 @@ def backup_database(backup_path: str) -> bool:
 
 def restore_database(backup_path: str) -> bool:
     try:
-        import shutil
         if os.path.exists(backup_path):
-            shutil.copy2(backup_path, DB_PATH)
+            # Über die Backup-API in die Live-DB schreiben, damit offene WAL-Dateien konsistent bleiben
+            _sqlite_online_copy(backup_path, DB_PATH)
             print(f"DB: Wiederherstellung erfolgreich von: {backup_path}")
             return True
         else:
@@ -550,6 +571,18 @@ def validate_database_integrity() -> Dict[str, Any]:
             for doc in orphaned_docs:
                 validation_results["warnings"].append(f"Verwaistes Dokument: ID {doc['id']}, Name '{doc['display_name']}'")
         
+        # Check 3b: Dokumentenablage laut Manifest (fehlende oder veränderte Dateien)
+        validation_results["checks_performed"].append("Dokument-Manifest")
+        try:
+            from document_store import verify_manifest
+            manifest_check = verify_manifest(conn, DATA_DIR)
+            for missing_path in manifest_check["missing"]:
+                validation_results["warnings"].append(f"Dokumentdatei fehlt: '{missing_path}'")
+            for modified_path in manifest_check["modified"]:
+                validation_results["warnings"].append(f"Dokumentdatei verändert: '{modified_path}'")
+        except Exception as e_manifest:
+            validation_results["warnings"].append(f"Manifest-Prüfung nicht möglich: {e_manifest}")
+        
         # Check 4: Duplikate in Produktnamen
         validation_results["checks_performed"].append("Produkt-Duplikate")
         cursor.execute("""
@@ -653,6 +686,11 @@ def delete_heat_pump(conn, id):
 #     ...
 
 def cleanup_orphaned_files() -> Dict[str, Any]:
+    """
+    Entfernt Dateien aus company_docs/customer_docs, die von keinem DB-Datensatz mehr
+    referenziert werden. Grundlage ist das Datei-Manifest (document_store), kein Verzeichnis-Scan;
+    Bestandsdateien ohne Manifest-Eintrag werden über document_store.index_existing_files aufgenommen.
+    """
     cleanup_results = {
         "files_checked": 0,
         "files_removed": 0,
@@ -660,54 +698,50 @@ def cleanup_orphaned_files() -> Dict[str, Any]:
         "removed_files": []
     }
     
+    conn = get_db_connection()
+    if not conn:
+        cleanup_results["errors"].append("Keine Datenbankverbindung")
+        return cleanup_results
     try:
-        # Company Documents Verzeichnis prüfen
-        if not os.path.exists(COMPANY_DOCS_BASE_DIR):
-            return cleanup_results
-        
-        # Alle Dateien in DB abrufen
-        conn = get_db_connection()
-        if not conn:
-            cleanup_results["errors"].append("Keine Datenbankverbindung")
-            return cleanup_results
-        
+        from document_store import ensure_document_store_tables, find_orphaned_entries, release_file
+        ensure_document_store_tables(conn)
         cursor = conn.cursor()
-        cursor.execute("SELECT absolute_file_path FROM company_documents")
-        db_files = set(row['absolute_file_path'] for row in cursor.fetchall())
-        conn.close()
-        
-        # Alle physischen Dateien durchgehen
-        for root, dirs, files in os.walk(COMPANY_DOCS_BASE_DIR):
-            for file in files:
-                cleanup_results["files_checked"] += 1
-                full_path = os.path.join(root, file)
-                relative_path = os.path.relpath(full_path, COMPANY_DOCS_BASE_DIR)
-                
-                if relative_path not in db_files:
-                    try:
-                        os.remove(full_path)
-                        cleanup_results["files_removed"] += 1
-                        cleanup_results["removed_files"].append(relative_path)
-                        print(f"DB Cleanup: Verwaiste Datei entfernt: {relative_path}")
-                    except Exception as e:
-                        cleanup_results["errors"].append(f"Fehler beim Löschen von {relative_path}: {str(e)}")
-        
-        # Leere Verzeichnisse entfernen
-        for root, dirs, files in os.walk(COMPANY_DOCS_BASE_DIR, topdown=False):
-            for dir_name in dirs:
-                dir_path = os.path.join(root, dir_name)
-                try:
-                    if not os.listdir(dir_path):
-                        os.rmdir(dir_path)
-                        print(f"DB Cleanup: Leeres Verzeichnis entfernt: {dir_path}")
-                except Exception as e:
-                    cleanup_results["errors"].append(f"Fehler beim Entfernen des Verzeichnisses {dir_path}: {str(e)}")
-        
+        referenced: List[str] = []
+        company_prefix = os.path.relpath(COMPANY_DOCS_BASE_DIR, DATA_DIR)
+        for table, column in (("company_documents", "absolute_file_path"), ("company_image_templates", "file_path")):
+            try:
+                cursor.execute(f"SELECT {column} FROM {table}")
+                referenced.extend(os.path.join(company_prefix, row[0]) for row in cursor.fetchall() if row[0])
+            except sqlite3.OperationalError:
+                pass  # Tabelle (noch) nicht vorhanden
+        try:
+            cursor.execute("SELECT absolute_file_path FROM customer_documents")
+            referenced.extend(row[0] for row in cursor.fetchall() if row[0])
+        except sqlite3.OperationalError:
+            pass
+
+        prefixes = [company_prefix, os.path.relpath(CUSTOMER_DOCS_BASE_DIR, DATA_DIR)]
+        cursor.execute("SELECT COUNT(*) FROM file_manifest")
+        cleanup_results["files_checked"] = cursor.fetchone()[0]
+        for relative_path in find_orphaned_entries(conn, referenced, [p.replace(os.sep, "/") for p in prefixes]):
+            full_path = os.path.join(DATA_DIR, *relative_path.split("/"))
+            try:
+                release_file(conn, full_path, DATA_DIR)
+                cleanup_results["files_removed"] += 1
+                cleanup_results["removed_files"].append(relative_path)
+                print(f"DB Cleanup: Verwaiste Datei entfernt: {relative_path}")
+                parent_dir = os.path.dirname(full_path)
+                if os.path.isdir(parent_dir) and not os.listdir(parent_dir):
+                    os.rmdir(parent_dir)
+            except Exception as e:
+                cleanup_results["errors"].append(f"Fehler beim Löschen von {relative_path}: {str(e)}")
         return cleanup_results
         
     except Exception as e:
         cleanup_results["errors"].append(f"Allgemeiner Fehler beim Cleanup: {str(e)}")
         return cleanup_results
+    finally:
+        conn.close()
 
 def reset_database() -> bool:
     try:
@@ -716,11 +750,20 @@ def reset_database() -> bool:
             os.remove(DB_PATH)
             print(f"DB: Datenbankdatei {DB_PATH} gelöscht")
         
-        # Company Documents Verzeichnis löschen
-        if os.path.exists(COMPANY_DOCS_BASE_DIR):
-            import shutil
-            shutil.rmtree(COMPANY_DOCS_BASE_DIR)
-            print(f"DB: Company Documents Verzeichnis {COMPANY_DOCS_BASE_DIR} gelöscht")
+        # Dokumentenablage löschen: Firmen-/Kundendokumente und die Blobs des Document Stores
+        # (content_blobs/file_manifest liegen in der gelöschten DB)
+        import shutil
+        import stat
+        from document_store import BLOBS_DIR_NAME
+
+        def _remove_read_only(func, path, _exc_info):
+            os.chmod(path, stat.S_IREAD | stat.S_IWRITE)  # Blobs sind schreibgeschützt (Windows)
+            func(path)
+
+        for docs_dir in (COMPANY_DOCS_BASE_DIR, CUSTOMER_DOCS_BASE_DIR, os.path.join(DATA_DIR, BLOBS_DIR_NAME)):
+            if os.path.exists(docs_dir):
+                shutil.rmtree(docs_dir, onerror=_remove_read_only)
+                print(f"DB: Verzeichnis {docs_dir} gelöscht")
         
         # Datenbank neu initialisieren
         init_db()
@@ -732,13 +775,14 @@ def reset_database() -> bool:
     return False
 import sqlite3
 import os
+import threading
 import traceback
 import json
 from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
 import io
 
-DB_SCHEMA_VERSION = 14
+DB_SCHEMA_VERSION = 21
 print(f"DATABASE.PY TOP LEVEL: DB_SCHEMA_VERSION ist auf {DB_SCHEMA_VERSION} gesetzt.")
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -958,6 +1002,144 @@ def _add_company_id_to_products_table(conn: sqlite3.Connection):
         else:
             raise
 
+# --- Versionierte Migrationen ab v15 ---
+# Jede Migration läuft genau einmal (gesteuert über PRAGMA user_version). Datenzugriffs-
+# Funktionen gehen danach von einem aktuellen Schema aus und prüfen es nicht mehr pro Aufruf.
+
+def _create_crm_core_tables_v15(conn: sqlite3.Connection):
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS customers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, salutation TEXT, title TEXT,
+            first_name TEXT NOT NULL, last_name TEXT NOT NULL, company_name TEXT,
+            address TEXT, house_number TEXT, zip_code TEXT, city TEXT, state TEXT, region TEXT,
+            email TEXT, phone_landline TEXT, phone_mobile TEXT,
+            income_tax_rate_percent REAL DEFAULT 0.0, creation_date TEXT, last_updated TEXT
+        );""")
+    for col in ["state", "region", "email", "phone_landline", "phone_mobile", "creation_date", "last_updated"]:
+        _ensure_column_exists(conn, "customers", col, "TEXT")
+    _ensure_column_exists(conn, "customers", "income_tax_rate_percent", "REAL DEFAULT 0.0")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, customer_id INTEGER NOT NULL,
+            project_name TEXT NOT NULL, project_status TEXT, roof_type TEXT, roof_covering_type TEXT,
+            free_roof_area_sqm REAL, roof_orientation TEXT, roof_inclination_deg INTEGER,
+            building_height_gt_7m INTEGER, annual_consumption_kwh REAL, costs_household_euro_mo REAL,
+            annual_heating_kwh REAL, costs_heating_euro_mo REAL, anlage_type TEXT, feed_in_type TEXT,
+            module_quantity INTEGER, selected_module_id INTEGER, selected_inverter_id INTEGER,
+            include_storage INTEGER, selected_storage_id INTEGER, selected_storage_storage_power_kw REAL,
+            include_additional_components INTEGER, selected_wallbox_id INTEGER, selected_ems_id INTEGER,
+            selected_optimizer_id INTEGER, selected_carport_id INTEGER, selected_notstrom_id INTEGER,
+            selected_tierabwehr_id INTEGER, visualize_roof_in_pdf INTEGER, latitude REAL, longitude REAL,
+            creation_date TEXT, last_updated TEXT,
+            FOREIGN KEY (customer_id) REFERENCES customers(id)
+        );""")
+    _create_customer_documents_table(conn)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS crm_customers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, first_name TEXT, last_name TEXT, email TEXT,
+            phone TEXT, address TEXT, status TEXT DEFAULT 'active',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            notes TEXT, project_data TEXT
+        );""")
+    print("DB Schema v15: CRM-Tabellen (customers, projects, customer_documents, crm_customers) OK.")
+
+def _migrate_product_tables_v16(conn: sqlite3.Connection):
+    # Produktnahe Tabellen gehören fachlich zu ihren Modulen; deren DDL wird hier einmalig ausgeführt.
+    from product_db import create_product_table
+    from brand_logo_db import create_brand_logos_table
+    from product_attributes import create_product_attributes_table
+    create_product_table(conn)
+    _ensure_column_exists(conn, "products", "company_id", "INTEGER")
+    create_brand_logos_table(conn)
+    create_product_attributes_table(conn)
+    print("DB Schema v16: Tabellen 'products' (Spalten-Migration), 'brand_logos', 'product_attributes' OK.")
+
+def _create_crm_pipeline_tables_v17(conn: sqlite3.Connection):
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS crm_leads (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, company_name TEXT NOT NULL, contact_person TEXT NOT NULL,
+            email TEXT, phone TEXT, address TEXT, lead_source TEXT, estimated_value REAL DEFAULT 0,
+            probability INTEGER DEFAULT 50, expected_close_date DATE, stage TEXT DEFAULT 'lead',
+            stage_changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );""")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS crm_appointments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, type TEXT NOT NULL,
+            appointment_date TIMESTAMP NOT NULL, duration_minutes INTEGER DEFAULT 60, customer_id INTEGER,
+            location TEXT, notes TEXT, reminder_minutes INTEGER DEFAULT 60, status TEXT DEFAULT 'scheduled',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (customer_id) REFERENCES crm_customers (id)
+        );""")
+    print("DB Schema v17: Tabellen 'crm_leads' und 'crm_appointments' OK.")
+
+def _create_document_store_and_search_v18(conn: sqlite3.Connection):
+    from document_store import ensure_document_store_tables
+    from crm_search import ensure_search_index
+    ensure_document_store_tables(conn)
+    ensure_search_index(conn)
+    print("DB Schema v18: Dokument-Manifest und CRM-Volltextindex OK.")
+
+def _create_lookup_indexes_v19(conn: sqlite3.Connection):
+    cursor = conn.cursor()
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_projects_customer_id ON projects (customer_id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_customer_documents_customer_id ON customer_documents (customer_id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crm_leads_stage ON crm_leads (stage);")
+    print("DB Schema v19: Indizes für projects.customer_id, customer_documents.customer_id, crm_leads.stage OK.")
+
+def _create_appointment_date_index_v20(conn: sqlite3.Connection):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_crm_appointments_date ON crm_appointments (appointment_date);")
+    print("DB Schema v20: Index für crm_appointments.appointment_date OK.")
+
+def _create_geo_cache_tables_v21(conn: sqlite3.Connection):
+    from geo_cache import ensure_geo_cache_tables
+    ensure_geo_cache_tables(conn)
+    print("DB Schema v21: Geo-Cache (Geocoding, Static Maps, API-Kontingent) OK.")
+
+SCHEMA_MIGRATIONS: List[tuple] = [
+    (15, "CRM-Kern-Tabellen", _create_crm_core_tables_v15),
+    (16, "Produkt-Tabellen", _migrate_product_tables_v16),
+    (17, "CRM Pipeline & Kalender", _create_crm_pipeline_tables_v17),
+    (18, "Dokument-Manifest & Volltextsuche", _create_document_store_and_search_v18),
+    (19, "Lookup-Indizes", _create_lookup_indexes_v19),
+    (20, "Kalender-Datumsindex", _create_appointment_date_index_v20),
+    (21, "Geo-Cache", _create_geo_cache_tables_v21),
+]
+
+def apply_schema_migrations(conn: sqlite3.Connection) -> int:
+    """
+    Wendet alle ausstehenden Migrationen aus SCHEMA_MIGRATIONS in Reihenfolge an.
+    Nach jeder Migration wird user_version fortgeschrieben, ein Abbruch setzt also beim
+    nächsten Start an der fehlgeschlagenen Migration wieder auf.
+
+    Returns:
+        Die danach gültige user_version.
+    """
+    current_version = conn.execute("PRAGMA user_version;").fetchone()[0]
+    for version, description, migration in SCHEMA_MIGRATIONS:
+        if version <= current_version:
+            continue
+        migration(conn)
+        conn.execute(f"PRAGMA user_version = {int(version)};")
+        conn.commit()
+        current_version = version
+        print(f"DB: Migration v{version} ({description}) angewendet.")
+    return current_version
+
+_schema_checked_db_paths: set = set()
+_schema_check_lock = threading.Lock()
+
+def _ensure_schema_current_once(conn: sqlite3.Connection) -> None:
+    """Prüft pro Prozess und DB-Datei einmal die user_version und migriert bei Bedarf."""
+    with _schema_check_lock:
+        if DB_PATH in _schema_checked_db_paths:
+            return
+        _schema_checked_db_paths.add(DB_PATH)
+    if conn.execute("PRAGMA user_version;").fetchone()[0] < DB_SCHEMA_VERSION:
+        init_db()
+
 def init_db():
     conn = get_db_connection()
     if conn is None: print("DB FEHLER: init_db() kann DB-Verbindung nicht herstellen."); return
@@ -1068,6 +1250,8 @@ def init_db():
                 pass
             current_db_version = 14; print("DB: Schema v14 angewendet (Firmenspezifische Angebotsvorlagen).")
 
+        current_db_version = apply_schema_migrations(conn)
+
         # Stelle sicher, dass die SQLite user_version am Ende exakt dem Code-Schema entspricht
         try:
             cursor.execute(f"PRAGMA user_version = {DB_SCHEMA_VERSION};")
@@ -1455,7 +1639,8 @@ def add_company_document(company_id: int, display_name: str, document_type: str,
     relative_path_for_db = os.path.join(str(company_id), final_safe_filename)
     absolute_path_on_disk = os.path.join(company_specific_docs_dir, final_safe_filename)
     try:
-        with open(absolute_path_on_disk, "wb") as f: f.write(file_content_bytes)
+        from document_store import store_file
+        store_file(conn, file_content_bytes, absolute_path_on_disk, DATA_DIR)
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO company_documents (company_id, document_type, display_name, file_name, absolute_file_path, uploaded_at)
@@ -1522,9 +1707,9 @@ def add_company_image_template(company_id: int, name: str, image_data: bytes, te
     absolute_path_on_disk = os.path.join(company_images_dir, final_safe_filename)
     
     try:
-        # Bild auf Festplatte speichern
-        with open(absolute_path_on_disk, "wb") as f:
-            f.write(image_data)
+        # Bild auf Festplatte speichern (inhaltsadressiert, Duplikate nur einmal)
+        from document_store import store_file
+        store_file(conn, image_data, absolute_path_on_disk, DATA_DIR)
         
         # Datenbankeneintrag
         cursor = conn.cursor()
@@ -1657,12 +1842,12 @@ def delete_company_image_template(template_id: int) -> bool:
         row = cursor.fetchone()
         if row:
             file_path = os.path.join(COMPANY_DOCS_BASE_DIR, row['file_path'])
-            # Datei löschen
-            if os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                except OSError as e_os:
-                    print(f"DB Fehler beim Löschen der Bilddatei {file_path}: {e_os}")
+            # Datei löschen und Blob-Referenz freigeben
+            try:
+                from document_store import release_file
+                release_file(conn, file_path, DATA_DIR)
+            except OSError as e_os:
+                print(f"DB Fehler beim Löschen der Bilddatei {file_path}: {e_os}")
         
         # Datenbankeintrag löschen
         cursor.execute("DELETE FROM company_image_templates WHERE id = ?", (template_id,))
@@ -1744,9 +1929,10 @@ def delete_company_document(document_id: int) -> bool:
     actual_absolute_path_to_delete_on_disk = os.path.join(COMPANY_DOCS_BASE_DIR, relative_path_from_db)
     try:
         cursor.execute("DELETE FROM company_documents WHERE id = ?", (document_id,))
-        if os.path.exists(actual_absolute_path_to_delete_on_disk):
+        if os.path.lexists(actual_absolute_path_to_delete_on_disk):
             try:
-                os.remove(actual_absolute_path_to_delete_on_disk)
+                from document_store import release_file
+                release_file(conn, actual_absolute_path_to_delete_on_disk, DATA_DIR)
                 parent_dir = os.path.dirname(actual_absolute_path_to_delete_on_disk)
                 if os.path.exists(parent_dir) and not os.listdir(parent_dir): os.rmdir(parent_dir)
             except OSError as e_os: print(f"DB Fehler Löschen Datei {actual_absolute_path_to_delete_on_disk}: {e_os}")
@@ -1805,26 +1991,11 @@ def get_company_documents(company_id: int, doc_type: Optional[str] = None) -> Li
 def get_all_active_customers() -> List[Dict[str, Any]]:
     """Gibt alle aktiven Kunden aus der CRM-Datenbank zurück"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_db_connection()
+        if not conn:
+            return []
         cursor = conn.cursor()
         
-        # Versuche zuerst die Tabelle zu erstellen falls sie nicht existiert
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS crm_customers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                first_name TEXT,
-                last_name TEXT,
-                email TEXT,
-                phone TEXT,
-                address TEXT,
-                status TEXT DEFAULT 'active',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                notes TEXT,
-                project_data TEXT
-            )
-        ''')
-        
         cursor.execute('''
             SELECT id, first_name, last_name, email, phone, address, status, 
                    created_at, updated_at, notes, project_data
@@ -1862,26 +2033,11 @@ def get_all_active_customers() -> List[Dict[str, Any]]:
 def create_customer(customer_data: Dict[str, Any]) -> bool:
     """Erstellt einen neuen Kunden in der CRM-Datenbank"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_db_connection()
+        if not conn:
+            return False
         cursor = conn.cursor()
         
-        # Tabelle erstellen falls sie nicht existiert
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS crm_customers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                first_name TEXT,
-                last_name TEXT,
-                email TEXT,
-                phone TEXT,
-                address TEXT,
-                status TEXT DEFAULT 'active',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                notes TEXT,
-                project_data TEXT
-            )
-        ''')
-        
         cursor.execute('''
             INSERT INTO crm_customers (first_name, last_name, email, phone, address, notes, project_data)
             VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -1958,26 +2114,11 @@ def update_customer(customer_id: int, customer_data: Dict[str, Any]) -> bool:
 def get_customer_by_id(customer_id: int) -> Optional[Dict[str, Any]]:
     """Gibt einen spezifischen Kunden basierend auf der ID zurück"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_db_connection()
+        if not conn:
+            return None
         cursor = conn.cursor()
         
-        # Versuche zuerst die Tabelle zu erstellen falls sie nicht existiert
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS crm_customers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                first_name TEXT,
-                last_name TEXT,
-                email TEXT,
-                phone TEXT,
-                address TEXT,
-                status TEXT DEFAULT 'active',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                notes TEXT,
-                project_data TEXT
-            )
-        ''')
-        
         cursor.execute('''
             SELECT id, first_name, last_name, email, phone, address, status, 
                    created_at, updated_at, notes, project_data
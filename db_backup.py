@@ -0,0 +1,276 @@
+# db_backup.py
+# Online-Backups der SQLite-DB (Backup-API) und inkrementelle Snapshots der Dokumentenablage
+
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+from database import DATA_DIR, DB_PATH, COMPANY_DOCS_BASE_DIR, CUSTOMER_DOCS_BASE_DIR, _sqlite_online_copy
+from document_store import copy_replace
+
+BACKUP_BASE_DIR = os.path.join(DATA_DIR, "backups")
+SNAPSHOT_PREFIX = "snapshot_"
+MANIFEST_NAME = "manifest.json"
+DB_SNAPSHOT_NAME = "app_data.db"
+
+# Dokumentenbäume, die in Snapshots gesichert werden (Name im Snapshot -> Quellverzeichnis)
+DOCUMENT_TREES: Dict[str, str] = {
+    "company_docs": COMPANY_DOCS_BASE_DIR,
+    "customer_docs": CUSTOMER_DOCS_BASE_DIR,
+}
+
+DEFAULT_BACKUP_SETTINGS: Dict[str, Any] = {
+    "enabled": False,
+    "interval_hours": 24,
+    "keep_last": 7,
+    "compress": True,
+    "include_documents": True,
+}
+
+_scheduler_lock = threading.Lock()
+_scheduler_thread: Optional[threading.Thread] = None
+_scheduler_wakeup = threading.Event()
+# Aktuelle Einstellungen des laufenden Schedulers (werden vor jedem Durchlauf neu gelesen)
+_scheduler_config: Dict[str, Any] = {}
+
+
+def verify_database_file(db_path: str) -> bool:
+    """Schnelle Konsistenzprüfung einer DB-Datei via PRAGMA quick_check."""
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            row = conn.execute("PRAGMA quick_check").fetchone()
+            return bool(row) and row[0] == "ok"
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"DB Backup: quick_check für {db_path} fehlgeschlagen: {e}")
+        return False
+
+
+def list_snapshots(backup_dir: str = BACKUP_BASE_DIR) -> List[Dict[str, Any]]:
+    """Liefert alle Snapshots (neuester zuerst) inkl. Manifest-Metadaten."""
+    if not os.path.isdir(backup_dir):
+        return []
+    snapshots: List[Dict[str, Any]] = []
+    for name in sorted(os.listdir(backup_dir), reverse=True):
+        snapshot_path = os.path.join(backup_dir, name)
+        manifest_path = os.path.join(snapshot_path, MANIFEST_NAME)
+        if not name.startswith(SNAPSHOT_PREFIX) or not os.path.isfile(manifest_path):
+            continue
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"DB Backup: Manifest {manifest_path} nicht lesbar: {e}")
+            continue
+        snapshots.append({"name": name, "path": snapshot_path, **{k: v for k, v in manifest.items() if k != "files"}})
+    return snapshots
+
+
+def _load_manifest_files(snapshot_path: str) -> Dict[str, List[int]]:
+    try:
+        with open(os.path.join(snapshot_path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f).get("files", {})
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _snapshot_database(snapshot_path: str, compress: bool) -> Dict[str, Any]:
+    """Sichert die Live-DB per Backup-API, prüft sie und komprimiert sie optional."""
+    raw_path = os.path.join(snapshot_path, DB_SNAPSHOT_NAME)
+    _sqlite_online_copy(DB_PATH, raw_path)
+    quick_check_ok = verify_database_file(raw_path)
+    db_file = DB_SNAPSHOT_NAME
+    if compress:
+        with open(raw_path, "rb") as src, gzip.open(raw_path + ".gz", "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.remove(raw_path)
+        db_file = DB_SNAPSHOT_NAME + ".gz"
+    return {
+        "db_file": db_file,
+        "db_quick_check": quick_check_ok,
+        "db_bytes": os.path.getsize(os.path.join(snapshot_path, db_file)),
+    }
+
+
+def _snapshot_documents(snapshot_path: str, previous_snapshot: Optional[str]) -> Dict[str, Any]:
+    """
+    Inkrementeller Snapshot der Dokumentenbäume: unveränderte Dateien (Größe + mtime laut
+    Manifest des Vorgänger-Snapshots) werden per Hardlink übernommen, nur neue/geänderte kopiert.
+    """
+    previous_files = _load_manifest_files(previous_snapshot) if previous_snapshot else {}
+    files: Dict[str, List[int]] = {}
+    stats = {"files_total": 0, "files_linked": 0, "files_copied": 0, "bytes_copied": 0}
+    for tree_name, source_root in DOCUMENT_TREES.items():
+        if not os.path.isdir(source_root):
+            continue
+        for root, _dirs, file_names in os.walk(source_root):
+            for file_name in file_names:
+                source_file = os.path.join(root, file_name)
+                rel_path = os.path.join(tree_name, os.path.relpath(source_file, source_root)).replace(os.sep, "/")
+                try:
+                    st_src = os.stat(source_file)
+                except OSError as e:
+                    print(f"DB Backup: Datei {source_file} übersprungen: {e}")
+                    continue
+                signature = [st_src.st_size, st_src.st_mtime_ns]
+                target_file = os.path.join(snapshot_path, "files", *rel_path.split("/"))
+                os.makedirs(os.path.dirname(target_file), exist_ok=True)
+                linked = False
+                if previous_snapshot and previous_files.get(rel_path) == signature:
+                    previous_file = os.path.join(previous_snapshot, "files", *rel_path.split("/"))
+                    try:
+                        os.link(previous_file, target_file)
+                        linked = True
+                    except OSError:
+                        linked = False  # z.B. Dateisystem ohne Hardlinks -> normal kopieren
+                if linked:
+                    stats["files_linked"] += 1
+                else:
+                    shutil.copy2(source_file, target_file)
+                    stats["files_copied"] += 1
+                    stats["bytes_copied"] += st_src.st_size
+                files[rel_path] = signature
+                stats["files_total"] += 1
+    return {"files": files, "document_stats": stats}
+
+
+def create_snapshot(backup_dir: str = BACKUP_BASE_DIR, compress: bool = True,
+                    include_documents: bool = True, keep_last: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Erstellt einen Point-in-Time-Snapshot (DB + optional Dokumente) und wendet die Aufbewahrung an.
+
+    Returns:
+        Snapshot-Metadaten oder None bei Fehler.
+    """
+    if not os.path.exists(DB_PATH):
+        print(f"DB Backup: Quelldatei {DB_PATH} existiert nicht.")
+        return None
+    started = time.perf_counter()
+    previous = list_snapshots(backup_dir)
+    name = SNAPSHOT_PREFIX + datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    snapshot_path = os.path.join(backup_dir, name)
+    try:
+        os.makedirs(snapshot_path, exist_ok=False)
+        manifest: Dict[str, Any] = {"created_at": datetime.now().isoformat()}
+        manifest.update(_snapshot_database(snapshot_path, compress))
+        if include_documents:
+            manifest.update(_snapshot_documents(snapshot_path, previous[0]["path"] if previous else None))
+        manifest["duration_s"] = round(time.perf_counter() - started, 3)
+        # Manifest zuletzt schreiben: nur vollständige Snapshots tauchen in list_snapshots auf
+        with open(os.path.join(snapshot_path, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        print(f"DB Backup: Snapshot '{name}' erstellt ({manifest['duration_s']} s).")
+    except Exception as e:
+        print(f"DB Fehler create_snapshot: {e}")
+        shutil.rmtree(snapshot_path, ignore_errors=True)
+        return None
+    if keep_last:
+        apply_retention(backup_dir, keep_last)
+    return {"name": name, "path": snapshot_path, **{k: v for k, v in manifest.items() if k != "files"}}
+
+
+def apply_retention(backup_dir: str = BACKUP_BASE_DIR, keep_last: int = 7) -> List[str]:
+    """Löscht alle bis auf die neuesten `keep_last` Snapshots (Hardlinks bleiben in neueren erhalten)."""
+    removed: List[str] = []
+    for snapshot in list_snapshots(backup_dir)[max(int(keep_last), 1):]:
+        try:
+            shutil.rmtree(snapshot["path"])
+            removed.append(snapshot["name"])
+        except OSError as e:
+            print(f"DB Backup: Snapshot {snapshot['name']} konnte nicht gelöscht werden: {e}")
+    return removed
+
+
+def restore_snapshot(snapshot_name: str, backup_dir: str = BACKUP_BASE_DIR, restore_documents: bool = False) -> bool:
+    """Stellt die DB (und optional die Dokumentenbäume) aus einem Snapshot wieder her."""
+    snapshot_path = os.path.join(backup_dir, snapshot_name)
+    snapshot = next((s for s in list_snapshots(backup_dir) if s["name"] == snapshot_name), None)
+    if snapshot is None:
+        print(f"DB Backup: Snapshot '{snapshot_name}' nicht gefunden.")
+        return False
+    db_file = os.path.join(snapshot_path, snapshot["db_file"])
+    restore_source = db_file
+    try:
+        if db_file.endswith(".gz"):
+            restore_source = os.path.join(snapshot_path, ".restore_tmp.db")
+            with gzip.open(db_file, "rb") as src, open(restore_source, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+        if not verify_database_file(restore_source):
+            print(f"DB Backup: Snapshot '{snapshot_name}' besteht quick_check nicht, Wiederherstellung abgebrochen.")
+            return False
+        _sqlite_online_copy(restore_source, DB_PATH)
+        if restore_documents:
+            for tree_name, target_root in DOCUMENT_TREES.items():
+                source_root = os.path.join(snapshot_path, "files", tree_name)
+                if os.path.isdir(source_root):
+                    # Ersetzen statt Überschreiben: Zieldateien können Hardlinks auf geteilte Blobs sein
+                    shutil.copytree(source_root, target_root, dirs_exist_ok=True, copy_function=copy_replace)
+        print(f"DB Backup: Snapshot '{snapshot_name}' wiederhergestellt.")
+        return True
+    except Exception as e:
+        print(f"DB Fehler restore_snapshot: {e}")
+        return False
+    finally:
+        if restore_source != db_file and os.path.exists(restore_source):
+            os.remove(restore_source)
+
+
+def run_backup_if_due(settings: Optional[Dict[str, Any]] = None, backup_dir: str = BACKUP_BASE_DIR) -> Optional[Dict[str, Any]]:
+    """Erstellt einen Snapshot, wenn der letzte älter als das konfigurierte Intervall ist."""
+    cfg = {**DEFAULT_BACKUP_SETTINGS, **(settings or {})}
+    snapshots = list_snapshots(backup_dir)
+    if snapshots:
+        try:
+            age_h = (datetime.now() - datetime.fromisoformat(snapshots[0]["created_at"])).total_seconds() / 3600.0
+        except (KeyError, ValueError):
+            age_h = float("inf")
+        if age_h < float(cfg["interval_hours"]):
+            return None
+    return create_snapshot(backup_dir, compress=bool(cfg["compress"]),
+                           include_documents=bool(cfg["include_documents"]), keep_last=int(cfg["keep_last"]))
+
+
+def start_backup_scheduler(settings: Optional[Dict[str, Any]] = None, backup_dir: str = BACKUP_BASE_DIR,
+                           check_interval_s: float = 600.0) -> bool:
+    """
+    Startet (einmal pro Prozess) einen Daemon-Thread, der fällige Snapshots erstellt.
+    Erneute Aufrufe (z. B. nach dem Speichern im Admin-Panel) übergeben die neuen Einstellungen an den
+    laufenden Thread; mit enabled=False beendet er sich. Gibt zurück, ob der Scheduler danach aktiv ist.
+    """
+    global _scheduler_thread
+    cfg = {**DEFAULT_BACKUP_SETTINGS, **(settings or {})}
+    with _scheduler_lock:
+        _scheduler_config.update(settings=cfg, backup_dir=backup_dir, check_interval_s=check_interval_s)
+        if _scheduler_thread is not None and _scheduler_thread.is_alive():
+            _scheduler_wakeup.set()
+            return bool(cfg.get("enabled"))
+        if not cfg.get("enabled"):
+            return False
+
+        def _loop() -> None:
+            global _scheduler_thread
+            while True:
+                with _scheduler_lock:
+                    current = dict(_scheduler_config)
+                    if not current["settings"].get("enabled"):
+                        _scheduler_thread = None
+                        return
+                try:
+                    run_backup_if_due(current["settings"], current["backup_dir"])
+                except Exception as e:
+                    print(f"DB Backup: Fehler im Scheduler: {e}")
+                _scheduler_wakeup.wait(current["check_interval_s"])
+                _scheduler_wakeup.clear()
+
+        _scheduler_wakeup.clear()
+        _scheduler_thread = threading.Thread(target=_loop, name="db-backup-scheduler", daemon=True)
+        _scheduler_thread.start()
+    return True
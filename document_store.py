@@ -0,0 +1,286 @@
+# document_store.py
+# Inhaltsadressierte Dokumentenablage mit Datei-Manifest (Pfad, Größe, mtime, SHA-256)
+#
+# Jede Datei, die über store_file() geschrieben wird, landet genau einmal als Blob unter
+# data/blobs/<sha[:2]>/<sha>. Der bisherige (logische) Pfad unter company_docs/customer_docs
+# bleibt als Hardlink auf den Blob bestehen, damit alle Leser unverändert funktionieren.
+# Blobs (und damit alle Hardlinks darauf) sind schreibgeschützt: Änderungen nur über store_file()
+# bzw. copy_replace(), die den logischen Pfad ersetzen statt in die gemeinsame Datei zu schreiben.
+# Das Manifest wird bei jedem Schreiben/Löschen inkrementell gepflegt; Orphan-Erkennung,
+# Integritätsprüfung und Duplikat-Suche laufen über das Manifest statt über os.walk.
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import stat
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Iterable
+
+from database import DATA_DIR
+
+BLOBS_DIR_NAME = "blobs"
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def ensure_document_store_tables(conn: sqlite3.Connection) -> None:
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS file_manifest (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_manifest_sha256 ON file_manifest (sha256)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS content_blobs (
+            sha256 TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+
+def _manifest_key(abs_path: str, data_dir: str) -> str:
+    return os.path.relpath(abs_path, data_dir).replace(os.sep, "/")
+
+
+def _blob_path(sha256: str, data_dir: str) -> str:
+    return os.path.join(data_dir, BLOBS_DIR_NAME, sha256[:2], sha256)
+
+
+def _make_read_only(path: str) -> None:
+    os.chmod(path, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+
+
+def _remove(path: str) -> None:
+    """Löscht eine (ggf. schreibgeschützte) Datei; Windows verweigert das Löschen sonst."""
+    try:
+        os.remove(path)
+    except PermissionError:
+        os.chmod(path, stat.S_IREAD | stat.S_IWRITE)
+        os.remove(path)
+
+
+def copy_replace(source_path: str, target_path: str) -> str:
+    """
+    Kopiert nach `target_path`, indem eine temporäre Datei per Rename an die Stelle gesetzt wird.
+    Ein vorhandener Hardlink auf einen Blob wird dadurch ersetzt statt überschrieben
+    (als copy_function für shutil.copytree geeignet).
+    """
+    tmp_path = target_path + ".tmp"
+    shutil.copy2(source_path, tmp_path)
+    if os.path.lexists(target_path):
+        _remove(target_path)
+    os.replace(tmp_path, target_path)
+    return target_path
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _upsert_manifest(conn: sqlite3.Connection, key: str, abs_path: str, sha256: str) -> None:
+    st_file = os.stat(abs_path)
+    conn.execute(
+        """
+        INSERT INTO file_manifest (path, size, mtime_ns, sha256, updated_at) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET size = excluded.size, mtime_ns = excluded.mtime_ns,
+            sha256 = excluded.sha256, updated_at = excluded.updated_at
+        """,
+        (key, st_file.st_size, st_file.st_mtime_ns, sha256, datetime.now().isoformat()),
+    )
+
+
+def _acquire_blob(conn: sqlite3.Connection, sha256: str, size: int, data_dir: str,
+                  file_bytes: Optional[bytes] = None, source_path: Optional[str] = None) -> str:
+    """Erhöht den Referenzzähler eines Blobs bzw. legt ihn an. Gibt den Blob-Pfad zurück."""
+    blob_path = _blob_path(sha256, data_dir)
+    if not os.path.exists(blob_path):
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        tmp_path = blob_path + ".tmp"
+        if file_bytes is not None:
+            with open(tmp_path, "wb") as f:
+                f.write(file_bytes)
+        else:
+            with open(source_path, "rb") as src, open(tmp_path, "wb") as dst:  # type: ignore[arg-type]
+                for chunk in iter(lambda: src.read(_HASH_CHUNK_SIZE), b""):
+                    dst.write(chunk)
+        os.replace(tmp_path, blob_path)
+    _make_read_only(blob_path)
+    conn.execute(
+        """
+        INSERT INTO content_blobs (sha256, size, ref_count) VALUES (?, ?, 1)
+        ON CONFLICT(sha256) DO UPDATE SET ref_count = ref_count + 1
+        """,
+        (sha256, size),
+    )
+    return blob_path
+
+
+def _link_or_copy(blob_path: str, target_path: str) -> None:
+    """Materialisiert den logischen Pfad als Hardlink auf den Blob (Fallback: Kopie)."""
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    if os.path.lexists(target_path):
+        _remove(target_path)
+    try:
+        os.link(blob_path, target_path)
+    except OSError:
+        with open(blob_path, "rb") as src, open(target_path, "wb") as dst:
+            for chunk in iter(lambda: src.read(_HASH_CHUNK_SIZE), b""):
+                dst.write(chunk)
+    # Auch nach _remove eines Links unter Windows (chmod wirkt auf alle Links) wieder schreibgeschützt
+    _make_read_only(target_path)
+
+
+def store_file(conn: sqlite3.Connection, file_bytes: bytes, target_path: str, data_dir: str = DATA_DIR) -> str:
+    """
+    Speichert Dateiinhalt inhaltsadressiert und legt ihn unter `target_path` ab.
+    Identischer Inhalt wird nur einmal auf dem Datenträger gehalten.
+
+    Returns:
+        SHA-256 des Inhalts.
+    """
+    ensure_document_store_tables(conn)
+    sha256 = hashlib.sha256(file_bytes).hexdigest()
+    key = _manifest_key(target_path, data_dir)
+    previous = conn.execute("SELECT sha256 FROM file_manifest WHERE path = ?", (key,)).fetchone()
+    blob_path = _acquire_blob(conn, sha256, len(file_bytes), data_dir, file_bytes=file_bytes)
+    if previous:
+        _release_blob(conn, previous[0], data_dir)
+    _link_or_copy(blob_path, target_path)
+    _upsert_manifest(conn, key, target_path, sha256)
+    conn.commit()
+    return sha256
+
+
+def _release_blob(conn: sqlite3.Connection, sha256: str, data_dir: str) -> None:
+    conn.execute("UPDATE content_blobs SET ref_count = ref_count - 1 WHERE sha256 = ?", (sha256,))
+    row = conn.execute("SELECT ref_count FROM content_blobs WHERE sha256 = ?", (sha256,)).fetchone()
+    if row is not None and row[0] <= 0:
+        conn.execute("DELETE FROM content_blobs WHERE sha256 = ?", (sha256,))
+        blob_path = _blob_path(sha256, data_dir)
+        try:
+            if os.path.exists(blob_path):
+                _remove(blob_path)
+        except OSError as e:
+            print(f"DocumentStore: Blob {blob_path} konnte nicht gelöscht werden: {e}")
+
+
+def release_file(conn: sqlite3.Connection, target_path: str, data_dir: str = DATA_DIR,
+                 remove_file: bool = True) -> bool:
+    """Entfernt einen logischen Pfad aus dem Manifest und gibt den zugehörigen Blob frei."""
+    ensure_document_store_tables(conn)
+    key = _manifest_key(target_path, data_dir)
+    row = conn.execute("SELECT sha256 FROM file_manifest WHERE path = ?", (key,)).fetchone()
+    if remove_file and os.path.lexists(target_path):
+        try:
+            _remove(target_path)
+        except OSError as e:
+            print(f"DocumentStore: Datei {target_path} konnte nicht gelöscht werden: {e}")
+    if row is None:
+        return False
+    conn.execute("DELETE FROM file_manifest WHERE path = ?", (key,))
+    _release_blob(conn, row[0], data_dir)
+    conn.commit()
+    return True
+
+
+def index_existing_files(conn: sqlite3.Connection, roots: Iterable[str], data_dir: str = DATA_DIR,
+                         deduplicate: bool = True) -> Dict[str, int]:
+    """
+    Einmaliger Bootstrap für Bestandsdateien: nimmt Dateien unter `roots` ins Manifest auf.
+    Dateien mit unveränderter Größe/mtime werden nicht neu gehasht. Mit `deduplicate`
+    werden Bestandsdateien in den Blob-Speicher überführt (Duplikate nur einmal gespeichert).
+    """
+    ensure_document_store_tables(conn)
+    stats = {"files_seen": 0, "files_hashed": 0, "files_deduplicated": 0}
+    known = {row[0]: (row[1], row[2]) for row in conn.execute("SELECT path, size, mtime_ns FROM file_manifest")}
+    blob_root = os.path.join(data_dir, BLOBS_DIR_NAME)
+    for root_dir in roots:
+        if not os.path.isdir(root_dir):
+            continue
+        for root, _dirs, file_names in os.walk(root_dir):
+            if os.path.commonpath([os.path.abspath(root), os.path.abspath(blob_root)]) == os.path.abspath(blob_root):
+                continue
+            for file_name in file_names:
+                abs_path = os.path.join(root, file_name)
+                key = _manifest_key(abs_path, data_dir)
+                st_file = os.stat(abs_path)
+                stats["files_seen"] += 1
+                if known.get(key) == (st_file.st_size, st_file.st_mtime_ns):
+                    continue
+                sha256 = _hash_file(abs_path)
+                stats["files_hashed"] += 1
+                if deduplicate:
+                    if key in known:
+                        old = conn.execute("SELECT sha256 FROM file_manifest WHERE path = ?", (key,)).fetchone()
+                        if old:
+                            _release_blob(conn, old[0], data_dir)
+                    blob_path = _acquire_blob(conn, sha256, st_file.st_size, data_dir, source_path=abs_path)
+                    if not os.path.samefile(blob_path, abs_path):
+                        _link_or_copy(blob_path, abs_path)
+                        stats["files_deduplicated"] += 1
+                _upsert_manifest(conn, key, abs_path, sha256)
+    conn.commit()
+    return stats
+
+
+def find_orphaned_entries(conn: sqlite3.Connection, referenced_paths: Iterable[str],
+                          prefixes: Iterable[str]) -> List[str]:
+    """Manifest-Pfade unterhalb der `prefixes`, die von keinem DB-Datensatz referenziert werden."""
+    ensure_document_store_tables(conn)
+    referenced = {p.replace("\\", "/") for p in referenced_paths if p}
+    orphans: List[str] = []
+    for prefix in prefixes:
+        prefix = prefix.rstrip("/") + "/"
+        rows = conn.execute(
+            "SELECT path FROM file_manifest WHERE path >= ? AND path < ?", (prefix, prefix[:-1] + "0")
+        ).fetchall()
+        orphans.extend(row[0] for row in rows if row[0] not in referenced)
+    return orphans
+
+
+def verify_manifest(conn: sqlite3.Connection, data_dir: str = DATA_DIR, rehash: bool = False) -> Dict[str, List[str]]:
+    """
+    Integritätsprüfung über das Manifest: fehlende Dateien, geänderte Größe/mtime und
+    (optional, mit `rehash`) abweichende Prüfsummen.
+    """
+    ensure_document_store_tables(conn)
+    result: Dict[str, List[str]] = {"missing": [], "modified": [], "hash_mismatch": []}
+    for path, size, mtime_ns, sha256 in conn.execute("SELECT path, size, mtime_ns, sha256 FROM file_manifest"):
+        abs_path = os.path.join(data_dir, *path.split("/"))
+        try:
+            st_file = os.stat(abs_path)
+        except OSError:
+            result["missing"].append(path)
+            continue
+        if (st_file.st_size, st_file.st_mtime_ns) != (size, mtime_ns):
+            result["modified"].append(path)
+        if rehash and _hash_file(abs_path) != sha256:
+            result["hash_mismatch"].append(path)
+    return result
+
+
+def find_duplicates(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """Gruppen logischer Pfade mit identischem Inhalt (werden physisch nur einmal gehalten)."""
+    ensure_document_store_tables(conn)
+    rows = conn.execute(
+        """
+        SELECT sha256, size, COUNT(*) AS copies, GROUP_CONCAT(path, '|') AS paths
+        FROM file_manifest GROUP BY sha256 HAVING COUNT(*) > 1 ORDER BY size * COUNT(*) DESC
+        """
+    ).fetchall()
+    return [
+        {"sha256": r[0], "size": r[1], "copies": r[2], "paths": r[3].split("|"), "bytes_saved": r[1] * (r[2] - 1)}
+        for r in rows
+    ]
@@ -0,0 +1,269 @@
+# energy_dispatch.py
+"""
+Gekoppelte Stundenbilanz (8760 h) für PV, Haushaltslast, Wärmepumpe und Batteriespeicher.
+
+Je Stunde: PV deckt zuerst die gemeinsame Last (Haushalt + Wärmepumpe), Überschuss lädt
+optional den Pufferspeicher der Wärmepumpe (SG-Ready, als Strom-Äquivalent) und dann die
+Batterie, der Rest wird eingespeist. Fehlmengen deckt erst der Pufferspeicher (nur
+Wärmepumpenlast), dann die Batterie, dann das Netz. Ohne Speicher ist die Bilanz rein
+vektorisiert, mit Speicher eine Schleife über Python-Floats (wenige Millisekunden).
+
+Fehlen Stundenwerte, werden sie aus den Monatswerten von perform_calculations erzeugt
+(PV über den Sonnenstand, Haushalt über ein Standard-Tagesprofil, Wärmepumpe aus
+heatpump_simulation). Ergebnis: Eigenverbrauchsquote, Autarkie, Netzbezug, Einspeisung
+und PV-Anteil am Wärmepumpenstrom, jeweils jährlich und monatlich.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+HOURS_PER_YEAR = 8760
+_DAYS_PER_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+MONTH_OF_HOUR = np.repeat(np.arange(12), [d * 24 for d in _DAYS_PER_MONTH])
+
+# Typischer Haushalts-Tagesverlauf (relative Last je Stunde 0-23)
+HOUSEHOLD_DAY_PROFILE = np.array([
+    0.3, 0.25, 0.2, 0.2, 0.25, 0.4, 0.7, 0.9, 1.0, 0.9, 0.8, 0.7,
+    0.8, 0.7, 0.6, 0.7, 0.9, 1.2, 1.0, 0.8, 0.6, 0.5, 0.4, 0.35,
+])
+
+# Pufferspeicher: 1,163 Wh je Liter und Kelvin, nutzbarer Temperaturhub bei SG-Ready-Anhebung
+_WATER_KWH_PER_L_K = 0.001163
+_BUFFER_DELTA_K = 10.0
+_BUFFER_LOSS_PER_HOUR = 0.005
+
+
+def _monthly_to_hourly(monthly_kwh: Sequence[float], shape: np.ndarray) -> np.ndarray:
+    """Verteilt Monatssummen gemäß `shape` (8760 Werte >= 0) auf Stunden."""
+    monthly = np.asarray(list(monthly_kwh)[:12] + [0.0] * (12 - len(list(monthly_kwh)[:12])), dtype=float)
+    shape_sums = np.bincount(MONTH_OF_HOUR, weights=shape, minlength=12)
+    scale = np.divide(monthly, shape_sums, out=np.zeros(12), where=shape_sums > 0)
+    return shape * scale[MONTH_OF_HOUR]
+
+
+def hourly_pv_from_monthly(monthly_kwh: Sequence[float], latitude_deg: float = 51.0) -> np.ndarray:
+    """Stündliche PV-Erzeugung aus Monatswerten, Tagesform über die Sonnenhöhe (Südausrichtung)."""
+    hours = np.arange(HOURS_PER_YEAR)
+    day = hours // 24
+    declination = np.radians(23.45) * np.sin(2 * np.pi * (284 + day + 1) / 365.0)
+    hour_angle = np.radians(15.0 * ((hours % 24) + 0.5 - 12.0))
+    lat = np.radians(latitude_deg)
+    sin_elevation = np.sin(lat) * np.sin(declination) + np.cos(lat) * np.cos(declination) * np.cos(hour_angle)
+    return _monthly_to_hourly(monthly_kwh, np.clip(sin_elevation, 0.0, None) ** 1.2)
+
+
+def hourly_household_load(monthly_kwh: Sequence[float]) -> np.ndarray:
+    """Stündliche Haushaltslast aus Monatswerten mit dem Standard-Tagesprofil."""
+    return _monthly_to_hourly(monthly_kwh, np.tile(HOUSEHOLD_DAY_PROFILE, HOURS_PER_YEAR // 24))
+
+
+@dataclass(frozen=True)
+class StorageParams:
+    """Batterie (kWh nutzbar, kW Lade-/Entladeleistung, Wirkungsgrad hin und zurück) und Pufferspeicher."""
+    battery_kwh: float = 0.0
+    battery_power_kw: Optional[float] = None
+    round_trip_efficiency: float = 0.9
+    thermal_buffer_kwh_el: float = 0.0
+
+    @staticmethod
+    def thermal_buffer_from_liters(liters: float, spf: float = 3.0) -> float:
+        """Strom-Äquivalent eines Pufferspeichers bei SG-Ready-Anhebung um _BUFFER_DELTA_K."""
+        return max(0.0, float(liters)) * _WATER_KWH_PER_L_K * _BUFFER_DELTA_K / max(float(spf), 1.0)
+
+
+@dataclass
+class DispatchResult:
+    """Stundenwerte (kWh) der gekoppelten Bilanz."""
+    pv_kwh: np.ndarray
+    household_kwh: np.ndarray
+    heatpump_kwh: np.ndarray
+    self_consumption_kwh: np.ndarray
+    grid_import_kwh: np.ndarray
+    feed_in_kwh: np.ndarray
+    battery_charge_kwh: np.ndarray
+    battery_discharge_kwh: np.ndarray
+    heatpump_pv_kwh: np.ndarray
+    battery_kwh: float = 0.0
+
+    def average_day(self, month: int) -> Dict[str, List[float]]:
+        """Mittlerer Tagesverlauf (kW je Stunde) eines Monats (1-12) für Diagramme."""
+        mask = MONTH_OF_HOUR == (month - 1)
+        days = int(mask.sum()) // 24
+        return {
+            name: (values[mask].reshape(days, 24).mean(axis=0)).round(3).tolist()
+            for name, values in (("pv", self.pv_kwh), ("household", self.household_kwh),
+                                 ("heatpump", self.heatpump_kwh), ("grid_import", self.grid_import_kwh))
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        pv = float(self.pv_kwh.sum())
+        load = float(self.household_kwh.sum() + self.heatpump_kwh.sum())
+        hp = float(self.heatpump_kwh.sum())
+        self_consumption = float(self.self_consumption_kwh.sum())
+        grid_import = float(self.grid_import_kwh.sum())
+        discharge = float(self.battery_discharge_kwh.sum())
+
+        def monthly(values: np.ndarray) -> List[float]:
+            # Monatswerte nur für vollständige Jahresreihen
+            if len(values) != HOURS_PER_YEAR:
+                return []
+            return [round(v, 1) for v in np.bincount(MONTH_OF_HOUR, weights=values, minlength=12).tolist()]
+
+        return {
+            "pv_production_kwh": round(pv, 1),
+            "household_kwh": round(float(self.household_kwh.sum()), 1),
+            "heatpump_kwh": round(hp, 1),
+            "self_consumption_kwh": round(self_consumption, 1),
+            "self_consumption_rate_percent": round(100.0 * self_consumption / pv, 1) if pv > 0 else 0.0,
+            "autarky_percent": round(100.0 * (1.0 - grid_import / load), 1) if load > 0 else 0.0,
+            "grid_import_kwh": round(grid_import, 1),
+            "feed_in_kwh": round(float(self.feed_in_kwh.sum()), 1),
+            "battery_charge_kwh": round(float(self.battery_charge_kwh.sum()), 1),
+            "battery_discharge_kwh": round(discharge, 1),
+            "battery_full_cycles": round(discharge / self.battery_kwh, 1) if self.battery_kwh > 0 else 0.0,
+            "heatpump_pv_kwh": round(float(self.heatpump_pv_kwh.sum()), 1),
+            "heatpump_pv_share_percent": round(100.0 * float(self.heatpump_pv_kwh.sum()) / hp, 1) if hp > 0 else 0.0,
+            "monthly_self_consumption_kwh": monthly(self.self_consumption_kwh),
+            "monthly_grid_import_kwh": monthly(self.grid_import_kwh),
+            "monthly_heatpump_pv_kwh": monthly(self.heatpump_pv_kwh),
+        }
+
+
+def dispatch(pv_kwh: Sequence[float], household_kwh: Sequence[float], heatpump_kwh: Optional[Sequence[float]] = None,
+             storage: Optional[StorageParams] = None) -> DispatchResult:
+    """Gekoppelte Stundenbilanz; alle Reihen in kWh je Stunde und gleicher Länge."""
+    pv = np.asarray(pv_kwh, dtype=float)
+    house = np.asarray(household_kwh, dtype=float)
+    hp = np.zeros_like(pv) if heatpump_kwh is None else np.asarray(heatpump_kwh, dtype=float)
+    if not (len(pv) == len(house) == len(hp)):
+        raise ValueError("PV-, Haushalts- und Wärmepumpenreihe müssen gleich lang sein")
+    storage = storage or StorageParams()
+    load = house + hp
+    direct = np.minimum(pv, load)
+    hp_ratio = np.divide(hp, load, out=np.zeros_like(load), where=load > 0)
+
+    if storage.battery_kwh <= 0 and storage.thermal_buffer_kwh_el <= 0:
+        zeros = np.zeros_like(pv)
+        return DispatchResult(pv, house, hp, direct, load - direct, pv - direct, zeros, zeros.copy(),
+                              direct * hp_ratio, 0.0)
+
+    eta = max(0.0, min(1.0, storage.round_trip_efficiency)) ** 0.5
+    capacity = max(0.0, storage.battery_kwh)
+    power = storage.battery_power_kw if storage.battery_power_kw is not None else 0.5 * capacity
+    buffer_cap = max(0.0, storage.thermal_buffer_kwh_el)
+    soc = 0.0
+    buffer_soc = 0.0
+
+    surplus_list = (pv - direct).tolist()
+    deficit_list = (load - direct).tolist()
+    hp_deficit_list = (hp - direct * hp_ratio).tolist()
+    ratio_list = hp_ratio.tolist()
+    n = len(pv)
+    extra_self = [0.0] * n
+    grid = [0.0] * n
+    feed = [0.0] * n
+    charge = [0.0] * n
+    discharge = [0.0] * n
+    hp_extra = [0.0] * n
+    keep = 1.0 - _BUFFER_LOSS_PER_HOUR
+    for i in range(n):
+        surplus = surplus_list[i]
+        deficit = deficit_list[i]
+        if buffer_cap > 0:
+            buffer_soc *= keep
+            # Wärmepumpenlast aus dem Puffer (vorher mit PV-Strom erzeugte Wärme)
+            from_buffer = min(buffer_soc, hp_deficit_list[i])
+            buffer_soc -= from_buffer
+            deficit -= from_buffer
+            hp_from_buffer = from_buffer
+            to_buffer = min(surplus, buffer_cap - buffer_soc)
+            buffer_soc += to_buffer
+            surplus -= to_buffer
+            extra_self[i] = to_buffer
+        else:
+            hp_from_buffer = 0.0
+        if surplus > 0 and capacity > 0:
+            stored = min(surplus * eta, power * eta, capacity - soc)
+            soc += stored
+            drawn = stored / eta if eta > 0 else 0.0
+            surplus -= drawn
+            charge[i] = drawn
+            extra_self[i] += drawn
+        if deficit > 0 and soc > 0:
+            delivered = min(deficit, power, soc * eta)
+            soc -= delivered / eta
+            deficit -= delivered
+            discharge[i] = delivered
+            # Batterieentladung anteilig nach Lastanteil der Wärmepumpe (ohne bereits aus dem Puffer gedeckten Teil)
+            hp_extra[i] = hp_from_buffer + delivered * ratio_list[i]
+        else:
+            hp_extra[i] = hp_from_buffer
+        grid[i] = deficit
+        feed[i] = surplus
+
+    # Eigenverbrauch = direkt + in Puffer/Batterie geladen (Speicherverluste zählen zum Eigenverbrauch)
+    self_consumption = direct + np.asarray(extra_self)
+    return DispatchResult(
+        pv, house, hp, self_consumption, np.asarray(grid), np.asarray(feed), np.asarray(charge),
+        np.asarray(discharge), direct * hp_ratio + np.asarray(hp_extra), capacity,
+    )
+
+
+def heatpump_hourly_electricity(project_data: Dict[str, Any]) -> Optional[np.ndarray]:
+    """Stündlicher Wärmepumpenstrom aus den WP-Daten des Projekts (heatpump_ui), sonst None."""
+    if not isinstance(project_data, dict):
+        return None
+    heatpump_data = project_data.get("heatpump_data") or {}
+    economics = project_data.get("economics_data") or {}
+    building = heatpump_data.get("building_data") or project_data.get("building_data") or {}
+    heatpump = heatpump_data.get("selected_heatpump") or {}
+    annual_hp_kwh = float(economics.get("hp_electricity_consumption") or 0.0)
+    heat_demand = economics.get("heat_demand_kwh")
+    if not (heatpump or annual_hp_kwh) or not building.get("heat_load_kw"):
+        return None
+    try:
+        from heatpump_simulation import HeatingDemandProfile, HeatPumpUnit, simulate_heatpump
+    except ImportError:
+        return None
+    profile = HeatingDemandProfile.from_building_data(building, annual_space_heat_kwh=float(heat_demand) if heat_demand else None)
+    if heatpump:
+        hourly = simulate_heatpump(profile, HeatPumpUnit.from_product(heatpump)).electricity_kwh
+    else:
+        hourly = profile.total_heat_kw.copy()
+    # Auf den Jahreswert der Wirtschaftlichkeitsrechnung skalieren, falls vorhanden
+    if annual_hp_kwh > 0 and hourly.sum() > 0:
+        hourly = hourly * (annual_hp_kwh / hourly.sum())
+    return hourly
+
+
+def build_project_dispatch(project_data: Dict[str, Any], analysis_results: Dict[str, Any],
+                           thermal_buffer_liters: float = 0.0,
+                           round_trip_efficiency: float = 0.9) -> Optional[DispatchResult]:
+    """Gekoppelte Bilanz aus Projekt- und Berechnungsdaten (None ohne PV-/Verbrauchs-Monatswerte)."""
+    monthly_pv = (analysis_results or {}).get("monthly_productions_sim")
+    monthly_cons = (analysis_results or {}).get("monthly_consumption_sim")
+    if not monthly_pv or not monthly_cons or len(monthly_pv) != 12 or len(monthly_cons) != 12:
+        return None
+    details = (project_data or {}).get("project_details") or {}
+    latitude = details.get("latitude")
+    pv = hourly_pv_from_monthly(monthly_pv, float(latitude) if latitude else 51.0)
+    house = hourly_household_load(monthly_cons)
+    hp = heatpump_hourly_electricity(project_data)
+    battery_kwh = float(details.get("selected_storage_storage_power_kw") or 0.0) if details.get("include_storage") else 0.0
+    buffer_kwh = StorageParams.thermal_buffer_from_liters(thermal_buffer_liters) if hp is not None else 0.0
+    return dispatch(pv, house, hp, StorageParams(battery_kwh=battery_kwh, round_trip_efficiency=round_trip_efficiency,
+                                                 thermal_buffer_kwh_el=buffer_kwh))
+
+
+def coupled_dispatch_for_project(project_data: Dict[str, Any], analysis_results: Dict[str, Any],
+                                 thermal_buffer_liters: float = 0.0,
+                                 round_trip_efficiency: float = 0.9) -> Optional[Dict[str, Any]]:
+    """Kennzahlen (DispatchResult.summary) der gekoppelten Bilanz eines Projekts oder None."""
+    result = build_project_dispatch(project_data, analysis_results, thermal_buffer_liters, round_trip_efficiency)
+    if result is None:
+        return None
+    summary = result.summary()
+    summary["includes_heatpump"] = bool(result.heatpump_kwh.sum() > 0)
+    return summary
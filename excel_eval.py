@@ -5,8 +5,15 @@ from __future__ import annotations
 import math
 import csv
 import json
+import os
+import re
+import hashlib
+import threading
 import contextlib
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
 
@@ -86,6 +93,127 @@ def scan_formulas_openpyxl(path: str | Path, limit: Optional[int] = None) -> Lis
     wb.close()
     return out
 
+# ------------- Formel-Graph: einmal scannen, topologisch auswerten ----------
+
+_STRING_LITERAL_RE = re.compile(r'"(?:[^"]|"")*"')
+_REF_RE = re.compile(
+    r"(?<![\w$.])"
+    r"(?:(?P<sheet>'(?:[^']|'')+'|[A-Za-z_][\w.]*)!)?"
+    r"(?:(?P<c1>\$?[A-Z]{1,3}\$?\d+)(?::(?P<c2>\$?[A-Z]{1,3}\$?\d+))?"
+    r"|(?P<col1>\$?[A-Z]{1,3}):(?P<col2>\$?[A-Z]{1,3}))"
+    r"(?![\w(!])",
+    re.IGNORECASE,
+)
+_CELL_RE = re.compile(r"\$?([A-Z]{1,3})\$?(\d+)", re.IGNORECASE)
+
+
+def _col_index(letters: str) -> int:
+    n = 0
+    for ch in letters.upper():
+        n = n * 26 + (ord(ch) - 64)
+    return n
+
+
+def _split_cell(address: str) -> Tuple[int, int]:
+    m = _CELL_RE.fullmatch(address)
+    if not m:
+        raise ValueError(f"Ungültige Zelladresse: {address}")
+    return _col_index(m.group(1)), int(m.group(2))
+
+
+def extract_references(formula: str, sheet: str) -> List[Tuple[str, int, int, int, int]]:
+    """
+    Zellbezüge einer Formel als (Sheet, col1, row1, col2, row2); Einzelzellen mit col1==col2, row1==row2,
+    ganze Spalten (A:C) mit row2 = unendlich. Zeichenketten-Literale werden ignoriert, Namen (Named Ranges)
+    werden nicht aufgelöst.
+    """
+    text = _STRING_LITERAL_RE.sub('""', formula or "")
+    out: List[Tuple[str, int, int, int, int]] = []
+    for m in _REF_RE.finditer(text):
+        ref_sheet = m.group("sheet")
+        if ref_sheet:
+            ref_sheet = ref_sheet[1:-1].replace("''", "'") if ref_sheet.startswith("'") else ref_sheet
+        else:
+            ref_sheet = sheet
+        if m.group("c1"):
+            c1, r1 = _split_cell(m.group("c1"))
+            c2, r2 = _split_cell(m.group("c2")) if m.group("c2") else (c1, r1)
+        else:
+            c1, c2 = _col_index(m.group("col1").lstrip("$")), _col_index(m.group("col2").lstrip("$"))
+            r1, r2 = 1, 2 ** 31
+        out.append((ref_sheet, min(c1, c2), min(r1, r2), max(c1, c2), max(r1, r2)))
+    return out
+
+
+def file_content_hash(path: str | Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@dataclass
+class FormulaGraph:
+    """Formelzellen einer Arbeitsmappe mit Abhängigkeiten zwischen Formelzellen."""
+    path: str
+    content_hash: str
+    refs: List[Tuple[str, str, str]]                      # Scan-Reihenfolge (sheet, address, formula)
+    dependencies: Dict[str, List[str]] = field(default_factory=dict)  # "Sheet!A1" -> Formelzellen, die sie liest
+    order: List[str] = field(default_factory=list)        # topologisch (Vorgänger zuerst)
+    cyclic: List[str] = field(default_factory=list)       # Zellen in Zirkelbezügen (am Ende von order)
+
+    @classmethod
+    def from_refs(cls, refs: List[Tuple[str, str, str]], path: str | Path = "", content_hash: str = "") -> "FormulaGraph":
+        keys = [f"{sheet}!{address}" for sheet, address, _ in refs]
+        # Index je Sheet und Spalte: sortierte Zeilen -> Bereichsbezüge per bisect statt Scan
+        columns: Dict[Tuple[str, int], Tuple[List[int], List[str]]] = {}
+        for (sheet, address, _), key in sorted(zip(refs, keys), key=lambda t: (t[0][0], _split_cell(t[0][1]))):
+            col, row = _split_cell(address)
+            rows, ks = columns.setdefault((sheet, col), ([], []))
+            rows.append(row)
+            ks.append(key)
+        sheet_columns: Dict[str, List[int]] = {}
+        for sheet, col in columns:
+            sheet_columns.setdefault(sheet, []).append(col)
+
+        dependencies: Dict[str, List[str]] = {}
+        for (sheet, _address, formula), key in zip(refs, keys):
+            deps: Dict[str, None] = {}
+            for ref_sheet, c1, r1, c2, r2 in extract_references(formula, sheet):
+                for col in sheet_columns.get(ref_sheet, ()):
+                    if c1 <= col <= c2:
+                        rows, ks = columns[(ref_sheet, col)]
+                        for dep in ks[bisect_left(rows, r1):bisect_right(rows, r2)]:
+                            if dep != key:
+                                deps[dep] = None
+            dependencies[key] = list(deps)
+
+        # Kahn: Zellen ohne offene Vorgänger zuerst, stabil in Scan-Reihenfolge
+        pending = {k: len(v) for k, v in dependencies.items()}
+        dependents: Dict[str, List[str]] = {}
+        for k, deps in dependencies.items():
+            for d in deps:
+                dependents.setdefault(d, []).append(k)
+        queue = deque(k for k in keys if pending[k] == 0)
+        order: List[str] = []
+        while queue:
+            k = queue.popleft()
+            order.append(k)
+            for nxt in dependents.get(k, ()):
+                pending[nxt] -= 1
+                if pending[nxt] == 0:
+                    queue.append(nxt)
+        done = set(order)
+        cyclic = [k for k in keys if k not in done]
+        return cls(str(path), content_hash, list(refs), dependencies, order + cyclic, cyclic)
+
+
+def build_formula_graph(path: str | Path, limit: Optional[int] = None) -> FormulaGraph:
+    """Scannt die Datei einmal (scan_formulas_openpyxl) und baut den Abhängigkeitsgraphen."""
+    return FormulaGraph.from_refs(scan_formulas_openpyxl(path, limit=limit), path, file_content_hash(path))
+
+
 # ------------------------------ Excel (xlwings) ------------------------------
 
 class ExcelEngineXlwings:
@@ -134,67 +262,91 @@ class ExcelEngineHeadless:
 
 # ------------------------- Engine-Factory & Utilities ------------------------
 
+_ENGINE_FACTORIES: Dict[str, Any] = {
+    "xlwings": lambda path: ExcelEngineXlwings(path),
+    "headless": lambda path: ExcelEngineHeadless(path),
+}
+
+# Headless-Ergebnisse je (Datei-Hash, Engine): {"Sheet!A1": Wert}
+RESULT_CACHE_MAX_FILES = 32
+_result_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+
+def clear_result_cache() -> None:
+    with _result_cache_lock:
+        _result_cache.clear()
+
+
 def _engine_auto(path: str | Path, prefer: str = "xlwings"):
     """
     Liefert (engine_name, engine_instance). prefer in {"xlwings","headless"}.
     """
     path = Path(path)
-    if prefer == "xlwings":
-        try:
-            eng = ExcelEngineXlwings(path)
-            return "xlwings", eng
-        except Exception:
-            pass
+    first, second = ("xlwings", "headless") if prefer == "xlwings" else ("headless", "xlwings")
+    try:
+        return first, _ENGINE_FACTORIES[first](path)
+    except Exception:
         # fallback
-        eng = ExcelEngineHeadless(path)
-        return "headless", eng
-    else:
-        try:
-            eng = ExcelEngineHeadless(path)
-            return "headless", eng
-        except Exception:
-            # fallback
-            eng = ExcelEngineXlwings(path)
-            return "xlwings", eng
+        return second, _ENGINE_FACTORIES[second](path)
 
 def _evaluate_many(path: str | Path, refs: List[Tuple[str, str, str]],
-                   engine: str = "auto") -> List[FormulaRow]:
+                   engine: str = "auto", graph: Optional[FormulaGraph] = None) -> List[FormulaRow]:
     """
     refs: Liste (sheet, address, formula)
     engine: "auto" | "xlwings" | "headless"
+    graph: optionaler FormulaGraph derselben Datei. Headless wird dann in topologischer
+    Reihenfolge ausgewertet (Vorgänger liegen bereits berechnet im Modell) und das Ergebnis
+    je Datei-Hash gecacht; ein erneuter Lauf auf unveränderter Datei baut kein Modell auf.
+    Rückgabe immer in der Reihenfolge von refs.
     """
-    rows: List[FormulaRow] = []
-    if engine == "auto":
-        engine_name, eng = _engine_auto(path, prefer="xlwings")
-    elif engine == "xlwings":
-        eng = ExcelEngineXlwings(path)
-        engine_name = "xlwings"
-    elif engine == "headless":
-        eng = ExcelEngineHeadless(path)
-        engine_name = "headless"
-    else:
+    if engine not in ("auto", "xlwings", "headless"):
         raise ValueError("engine must be auto|xlwings|headless")
 
-    try:
-        for (sheet, address, formula) in refs:
-            try:
-                if engine_name == "xlwings":
-                    v = eng.value(sheet, address)
-                else:
-                    v = eng.evaluate(f"{sheet}!{address}")
-            except Exception as e:
-                v = f"#ERR:{type(e).__name__}:{e}"
-            rows.append(FormulaRow(
-                sheet=sheet,
-                address=address,
-                formula=formula,
-                value=v,
-                value_type=_value_type_of(v),
-            ))
-    finally:
-        if engine_name == "xlwings":
-            eng.close()
-    return rows
+    keys = [f"{sheet}!{address}" for sheet, address, _ in refs]
+    cache_key = (graph.content_hash, "headless") if graph is not None and graph.content_hash else None
+    values: Dict[str, Any] = {}
+    if cache_key and engine == "headless":
+        with _result_cache_lock:
+            cached = _result_cache.get(cache_key)
+            if cached is not None:
+                _result_cache.move_to_end(cache_key)
+                values = dict(cached)
+
+    missing = [k for k in keys if k not in values]
+    if missing:
+        if engine == "auto":
+            engine_name, eng = _engine_auto(path, prefer="xlwings")
+        else:
+            engine_name, eng = engine, _ENGINE_FACTORIES[engine](path)
+        try:
+            if engine_name == "headless" and graph is not None:
+                wanted = set(missing)
+                missing = [k for k in graph.order if k in wanted] + [k for k in missing if k not in graph.dependencies]
+            for key in missing:
+                try:
+                    if engine_name == "xlwings":
+                        sheet, address = key.rsplit("!", 1)
+                        v = eng.value(sheet, address)
+                    else:
+                        v = eng.evaluate(key)
+                except Exception as e:
+                    v = f"#ERR:{type(e).__name__}:{e}"
+                values[key] = v
+        finally:
+            if engine_name == "xlwings":
+                eng.close()
+        if cache_key and engine_name == "headless":
+            with _result_cache_lock:
+                merged = dict(_result_cache.get(cache_key, {}), **values)
+                _result_cache[cache_key] = merged
+                _result_cache.move_to_end(cache_key)
+                while len(_result_cache) > RESULT_CACHE_MAX_FILES:
+                    _result_cache.popitem(last=False)
+
+    return [FormulaRow(sheet=sheet, address=address, formula=formula, value=values[key],
+                       value_type=_value_type_of(values[key]))
+            for (sheet, address, formula), key in zip(refs, keys)]
 
 # ============================== EXPORT =======================================
 
@@ -204,8 +356,8 @@ def export_formulas_to_csv(path: str | Path, out_csv: str | Path,
     Exportiert Formelzellen (mit berechnetem Wert) als CSV.
     Spalten: sheet,address,formula,value,value_type
     """
-    refs = scan_formulas_openpyxl(path, limit=limit)
-    rows = _evaluate_many(path, refs, engine=engine)
+    graph = build_formula_graph(path, limit=limit)
+    rows = _evaluate_many(path, graph.refs, engine=engine, graph=graph)
     out_csv = Path(out_csv)
     out_csv.parent.mkdir(parents=True, exist_ok=True)
     with out_csv.open("w", newline="", encoding="utf-8") as f:
@@ -221,8 +373,8 @@ def export_formulas_to_xlsx(path: str | Path, out_xlsx: str | Path,
     Exportiert Formelzellen (mit berechnetem Wert) als .xlsx
     """
     import pandas as pd
-    refs = scan_formulas_openpyxl(path, limit=limit)
-    rows = _evaluate_many(path, refs, engine=engine)
+    graph = build_formula_graph(path, limit=limit)
+    rows = _evaluate_many(path, graph.refs, engine=engine, graph=graph)
     df = pd.DataFrame([{
         "sheet": r.sheet,
         "address": r.address,
@@ -237,6 +389,21 @@ def export_formulas_to_xlsx(path: str | Path, out_xlsx: str | Path,
 
 # ============================== BATCH ========================================
 
+def _export_one(task: Tuple[Path, Path, Optional[int], str, str]) -> Tuple[Path, Path]:
+    """Worker für batch_export (modulweit, damit er in den Prozess-Pool gepickelt werden kann)."""
+    infile, out_file, limit, engine, to = task
+    if to == "csv":
+        export_formulas_to_csv(infile, out_file, limit=limit, engine=engine)
+    else:
+        export_formulas_to_xlsx(infile, out_file, limit=limit, engine=engine)
+    return infile, out_file
+
+def _default_workers(engine: str, n_files: int) -> int:
+    # Excel (xlwings/COM) nicht parallel starten; headless skaliert über Prozesse
+    if engine != "headless":
+        return 1
+    return max(1, min(n_files, os.cpu_count() or 1))
+
 def batch_export(
     base: str | Path,
     pattern: str = "**/*.xlsx",
@@ -244,15 +411,17 @@ def batch_export(
     limit: Optional[int] = None,
     engine: str = "auto",
     to: str = "csv",   # "csv" | "xlsx"
+    workers: Optional[int] = None,
 ) -> List[Tuple[Path, Path]]:
     """
     Sucht Dateien via Glob und exportiert pro Datei die Formel-Ergebnisse.
-    Rückgabe: Liste [(infile, outfile), ...]
+    workers: Anzahl Prozesse (None = CPU-Kerne bei headless, sonst 1).
+    Rückgabe: Liste [(infile, outfile), ...] in Datei-Reihenfolge
     """
     base = Path(base)
     out_dir = Path(out_dir)
-    results: List[Tuple[Path, Path]] = []
-    for p in base.rglob("*"):
+    tasks: List[Tuple[Path, Path, Optional[int], str, str]] = []
+    for p in sorted(base.rglob("*")):
         if not p.is_file():
             continue
         if p.suffix.lower() != ".xlsx":
@@ -263,14 +432,14 @@ def batch_export(
         stem = p.stem
         out_subdir = out_dir / rel.parent
         out_subdir.mkdir(parents=True, exist_ok=True)
-        if to == "csv":
-            out_file = out_subdir / f"{stem}_formulas.csv"
-            export_formulas_to_csv(p, out_file, limit=limit, engine=engine)
-        else:
-            out_file = out_subdir / f"{stem}_formulas.xlsx"
-            export_formulas_to_xlsx(p, out_file, limit=limit, engine=engine)
-        results.append((p, out_file))
-    return results
+        suffix = "csv" if to == "csv" else "xlsx"
+        tasks.append((p, out_subdir / f"{stem}_formulas.{suffix}", limit, engine, to))
+
+    n_workers = workers if workers is not None else _default_workers(engine, len(tasks))
+    if n_workers <= 1 or len(tasks) <= 1:
+        return [_export_one(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        return list(pool.map(_export_one, tasks))
 
 # ============================ SAFETY-CHECK ===================================
 
@@ -294,12 +463,14 @@ def safety_check_parity(
     Vergleicht xlwings (Excel) vs. headless (xlcalculator).
     Liefert Zusammenfassung + optional CSV-Report mit Abweichungen.
     """
-    refs = scan_formulas_openpyxl(path, limit=sample_limit)
+    # Einmal scannen, beide Engines auf denselben Graphen
+    graph = build_formula_graph(path, limit=sample_limit)
+    refs = graph.refs
 
     # Excel
-    excel_rows = _evaluate_many(path, refs, engine="xlwings")
+    excel_rows = _evaluate_many(path, refs, engine="xlwings", graph=graph)
     # Headless
-    head_rows = _evaluate_many(path, refs, engine="headless")
+    head_rows = _evaluate_many(path, refs, engine="headless", graph=graph)
 
     mismatches: List[Mismatch] = []
 
@@ -385,6 +556,7 @@ def main_cli():
     p_bat.add_argument("--engine", choices=["auto","xlwings","headless"], default="auto")
     p_bat.add_argument("--to", choices=["csv","xlsx"], default="csv")
     p_bat.add_argument("--limit", type=int, default=None)
+    p_bat.add_argument("--workers", type=int, default=None)
 
     p_saf = sub.add_parser("safety")
     p_saf.add_argument("--in", dest="infile", required=True)
@@ -403,7 +575,7 @@ def main_cli():
 
     elif args.cmd == "batch":
         res = batch_export(args.base, pattern=args.pattern, out_dir=args.outdir,
-                           limit=args.limit, engine=args.engine, to=args.to)
+                           limit=args.limit, engine=args.engine, to=args.to, workers=args.workers)
         _print_json({"count": len(res), "outputs": [(str(i), str(o)) for i,o in res]})
 
     elif args.cmd == "safety":
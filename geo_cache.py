@@ -0,0 +1,253 @@
+# geo_cache.py
+"""
+Persistenter Cache für Google Geocoding und Static Maps (Satellitenbilder).
+
+- Geocoding: Koordinaten je normalisierter Adresse in `geocode_cache` (TTL GEOCODE_TTL_DAYS).
+- Static Maps: Bildbytes als Datei unter STATIC_MAP_DIR, Schlüssel aus lat/lon/zoom/Größe/Typ,
+  Metadaten in `static_map_cache` (TTL STATIC_MAP_TTL_DAYS).
+- Tageskontingent je API in `geo_api_quota`; ist es erschöpft, wird nicht mehr angefragt.
+- Offline-Modus (GEO_OFFLINE=1 oder offline=True): nur Cache, abgelaufene Einträge werden
+  dann trotzdem geliefert.
+
+Die Tabellen legt database.SCHEMA_MIGRATIONS (v21) an. Die HTTP-Schicht ist austauschbar
+(`http_get` mit der Signatur von requests.get), Tests übergeben einen Stub.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import requests
+    _REQUESTS_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    requests = None  # type: ignore
+    _REQUESTS_AVAILABLE = False
+
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+STATIC_MAP_URL = "https://maps.googleapis.com/maps/api/staticmap"
+STATIC_MAP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "static_maps")
+GEOCODE_TTL_DAYS = 180
+STATIC_MAP_TTL_DAYS = 30
+DEFAULT_DAILY_QUOTA = {"geocode": 500, "staticmap": 500}
+
+_STREET_SUFFIXES = ((r"stra(ss|ß)e\b", "str"), (r"str\.", "str"))
+
+
+def ensure_geo_cache_tables(conn: sqlite3.Connection) -> None:
+    """Schema des Geo-Caches; wird einmalig über database.SCHEMA_MIGRATIONS (v21) angewendet."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS geocode_cache (
+            address_key TEXT PRIMARY KEY, query TEXT, latitude REAL NOT NULL, longitude REAL NOT NULL,
+            formatted_address TEXT, fetched_at TEXT NOT NULL
+        )""")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS static_map_cache (
+            map_key TEXT PRIMARY KEY, file_name TEXT NOT NULL, content_type TEXT, size_bytes INTEGER,
+            fetched_at TEXT NOT NULL
+        )""")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS geo_api_quota (
+            api TEXT NOT NULL, day TEXT NOT NULL, requests INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (api, day)
+        )""")
+    conn.commit()
+
+
+def normalize_address(address: str, zip_code: str = "", city: str = "") -> str:
+    """Cache-Schlüssel: Kleinschreibung, einheitliche Straßen-Abkürzung, ohne Satzzeichen/Mehrfach-Leerzeichen."""
+    text = f"{address or ''} {zip_code or ''} {city or ''}".lower()
+    for pattern, repl in _STREET_SUFFIXES:
+        text = re.sub(pattern, repl, text)
+    text = re.sub(r"[^\w]+", " ", text)
+    return " ".join(text.split())
+
+
+def static_map_url(latitude: float, longitude: float, api_key: str, zoom: int = 20, width: int = 600,
+                   height: int = 400, maptype: str = "satellite") -> str:
+    params = {"center": f"{latitude},{longitude}", "zoom": str(zoom), "size": f"{width}x{height}",
+              "maptype": maptype, "key": api_key}
+    return STATIC_MAP_URL + "?" + "&".join(f"{k}={v}" for k, v in params.items())
+
+
+def _is_offline_env() -> bool:
+    return os.environ.get("GEO_OFFLINE", "").lower() in {"1", "true", "yes", "on"}
+
+
+class GeoCache:
+    """Geocoding und Satellitenbilder mit persistentem Cache, Tageskontingent und Offline-Modus."""
+
+    def __init__(self, get_connection: Callable[[], Optional[sqlite3.Connection]], image_dir: str = STATIC_MAP_DIR,
+                 http_get: Optional[Callable[..., Any]] = None, offline: Optional[bool] = None,
+                 daily_quota: Optional[Dict[str, int]] = None):
+        self._get_connection = get_connection
+        self.image_dir = image_dir
+        self._http_get = http_get or (requests.get if _REQUESTS_AVAILABLE else None)
+        self._offline = offline
+        self.daily_quota = dict(DEFAULT_DAILY_QUOTA, **(daily_quota or {}))
+        self.hits = 0
+        self.misses = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def offline(self) -> bool:
+        return _is_offline_env() if self._offline is None else bool(self._offline)
+
+    # --- Kontingent ---
+
+    def quota_used(self, api: str, day: Optional[date] = None) -> int:
+        conn = self._get_connection()
+        if conn is None:
+            return 0
+        try:
+            row = conn.execute("SELECT requests FROM geo_api_quota WHERE api = ? AND day = ?",
+                               (api, (day or date.today()).isoformat())).fetchone()
+            return int(row[0]) if row else 0
+        finally:
+            conn.close()
+
+    def _reserve_request(self, conn: sqlite3.Connection, api: str) -> bool:
+        """Zählt eine Anfrage, falls das Tageskontingent noch reicht."""
+        day = date.today().isoformat()
+        row = conn.execute("SELECT requests FROM geo_api_quota WHERE api = ? AND day = ?", (api, day)).fetchone()
+        used = int(row[0]) if row else 0
+        if used >= int(self.daily_quota.get(api, 0)):
+            self.last_error = f"Tageskontingent für {api} erschöpft ({used})"
+            return False
+        conn.execute(
+            "INSERT INTO geo_api_quota (api, day, requests) VALUES (?, ?, 1) "
+            "ON CONFLICT(api, day) DO UPDATE SET requests = requests + 1", (api, day))
+        conn.commit()
+        return True
+
+    def _may_fetch(self, conn: sqlite3.Connection, api: str, api_key: Optional[str]) -> bool:
+        if self.offline:
+            self.last_error = "Offline-Modus"
+            return False
+        if not api_key or self._http_get is None:
+            self.last_error = "Kein API-Key bzw. keine HTTP-Schicht"
+            return False
+        return self._reserve_request(conn, api)
+
+    @staticmethod
+    def _expired(fetched_at: str, ttl_days: int) -> bool:
+        try:
+            return datetime.now() - datetime.fromisoformat(fetched_at) > timedelta(days=ttl_days)
+        except ValueError:
+            return True
+
+    # --- Geocoding ---
+
+    def geocode(self, address: str, city: str, zip_code: str, api_key: Optional[str]) -> Optional[Dict[str, float]]:
+        """Koordinaten aus dem Cache bzw. über die Geocoding-API (Ergebnis wird gespeichert)."""
+        key = normalize_address(address, zip_code, city)
+        if not key:
+            return None
+        conn = self._get_connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT latitude, longitude, fetched_at FROM geocode_cache WHERE address_key = ?",
+                               (key,)).fetchone()
+            if row and (self.offline or not self._expired(row[2], GEOCODE_TTL_DAYS)):
+                self.hits += 1
+                return {"latitude": float(row[0]), "longitude": float(row[1])}
+            self.misses += 1
+            # Abgelaufener Eintrag bleibt Rückfall bei Kontingent-, Netz- und API-Fehlern
+            stale = {"latitude": float(row[0]), "longitude": float(row[1])} if row else None
+            if not self._may_fetch(conn, "geocode", api_key):
+                return stale
+            query = f"{address}, {zip_code} {city}"
+            try:
+                response = self._http_get(GEOCODE_URL, params={"address": query, "key": api_key}, timeout=10)
+                response.raise_for_status()
+                data = response.json()
+            except Exception as e:
+                self.last_error = f"Geocoding-Anfrage fehlgeschlagen: {e}"
+                return stale
+            if data.get("status") != "OK" or not data.get("results"):
+                self.last_error = f"Geocoding-Status {data.get('status')}"
+                return stale
+            result = data["results"][0]
+            location = result.get("geometry", {}).get("location", {})
+            if location.get("lat") is None or location.get("lng") is None:
+                return stale
+            coords = {"latitude": float(location["lat"]), "longitude": float(location["lng"])}
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache (address_key, query, latitude, longitude, formatted_address, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, query, coords["latitude"], coords["longitude"], result.get("formatted_address"),
+                 datetime.now().isoformat(timespec="seconds")))
+            conn.commit()
+            return coords
+        finally:
+            conn.close()
+
+    # --- Static Maps ---
+
+    @staticmethod
+    def static_map_key(latitude: float, longitude: float, zoom: int, width: int, height: int, maptype: str) -> str:
+        return f"{latitude:.6f},{longitude:.6f},{int(zoom)},{int(width)}x{int(height)},{maptype}"
+
+    def static_map(self, latitude: float, longitude: float, api_key: Optional[str], zoom: int = 20, width: int = 600,
+                   height: int = 400, maptype: str = "satellite") -> Optional[bytes]:
+        """Bildbytes aus dem Datei-Cache bzw. über die Static-Maps-API (Ergebnis wird gespeichert)."""
+        map_key = self.static_map_key(latitude, longitude, zoom, width, height, maptype)
+        file_name = hashlib.sha1(map_key.encode("utf-8")).hexdigest() + ".img"
+        path = os.path.join(self.image_dir, file_name)
+        conn = self._get_connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT fetched_at FROM static_map_cache WHERE map_key = ?", (map_key,)).fetchone()
+            cached = os.path.exists(path) and row is not None
+            if cached and (self.offline or not self._expired(row[0], STATIC_MAP_TTL_DAYS)):
+                self.hits += 1
+                with open(path, "rb") as fh:
+                    return fh.read()
+            self.misses += 1
+            stale = None
+            if cached:
+                with open(path, "rb") as fh:
+                    stale = fh.read()
+            if not self._may_fetch(conn, "staticmap", api_key):
+                return stale
+            try:
+                response = self._http_get(static_map_url(latitude, longitude, api_key, zoom, width, height, maptype),
+                                          timeout=15)
+                response.raise_for_status()
+                content = response.content
+            except Exception as e:
+                self.last_error = f"Static-Maps-Anfrage fehlgeschlagen: {e}"
+                return stale
+            if not content:
+                return stale
+            os.makedirs(self.image_dir, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as fh:
+                fh.write(content)
+            os.replace(tmp_path, path)
+            conn.execute(
+                "INSERT OR REPLACE INTO static_map_cache (map_key, file_name, content_type, size_bytes, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (map_key, file_name, (getattr(response, "headers", None) or {}).get("Content-Type"), len(content),
+                 datetime.now().isoformat(timespec="seconds")))
+            conn.commit()
+            return content
+        finally:
+            conn.close()
+
+
+_default_cache: Optional[GeoCache] = None
+
+
+def get_geo_cache() -> GeoCache:
+    """Prozessweiter Geo-Cache auf der App-Datenbank."""
+    global _default_cache
+    if _default_cache is None:
+        from database import get_db_connection
+        _default_cache = GeoCache(get_db_connection)
+    return _default_cache
@@ -1,35 +1,191 @@
 #!/usr/bin/env python3
 """
 Deutsche Zahlenformatierung für die gesamte App
+
+- Rundung kaufmännisch (half-up, weg von der Null) statt Pythons Banker's Rounding auf
+  Binärwerten: 2,675 -> 2,68; 1,005 -> 1,01.
+- Kein "-0,00": Werte, die auf null runden, erhalten kein Vorzeichen.
+- NaN und ±Inf -> na_text (Standard NA_TEXT); None und nicht lesbare Werte bleiben ohne
+  na_text beim bisherigen Ergebnis MISSING_TEXT ("0,00"), damit Aufrufer wie format_currency
+  unverändert ausgeben.
+- format_german_numbers formatiert ganze Spalten/Arrays in einem Durchgang mit numpy
+  (Ziffern über Tabellen, ein einziges Dekodieren) und liefert dasselbe wie
+  format_german_number je Wert.
 """
 
-import locale
-from typing import Union, Optional
+import math
+from typing import Any, Iterable, List, Optional, Union
+
+try:
+    import numpy as np
+    _NUMPY_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+    _NUMPY_AVAILABLE = False
+
+NA_TEXT = "k.A."
+MISSING_TEXT = "0,00"  # bisheriges Ergebnis für None/nicht lesbare Werte
+
+# Nachkommastellen und Einheit der Standardformate (für format_column)
+UNIT_FORMATS = {
+    "currency": (2, "€"),
+    "percentage": (1, "%"),
+    "kwh": (0, "kWh"),
+    "kwp": (1, "kWp"),
+    "years": (1, "Jahre"),
+    "ct_kwh": (2, "ct/kWh"),
+}
+
+# Zuschlag von wenigen ULP vor dem Abrunden: 2.675 * 100 = 267.49999999999997 soll wie die
+# Dezimalzahl 267,5 aufgerundet werden. Nur unterhalb _BUMP_LIMIT (dort ist der Zuschlag
+# < 0,001 Einheiten); ab _INTEGRAL_FROM ist der skalierte Wert bereits ganzzahlig.
+_HALF_UP_EPS = 4 * 2.0 ** -52
+_BUMP_LIMIT = 2.0 ** 40
+_INTEGRAL_FROM = 2.0 ** 52
+_MAX_EXACT = 2.0 ** 53
+_MAX_BULK_DECIMALS = 4  # Größe der Nachkomma-Tabelle: 10**decimals Zeilen
+
+_POW10 = [10 ** i for i in range(19)]
+_FLOAT_FORMATS = [("{:,.%df}" % d).format for d in range(19)]
+_SWAP_SEPARATORS = str.maketrans(",.", ".,")
+
+
+def _decimals(decimals: Any) -> int:
+    return min(max(int(decimals), 0), 18)
 
-def format_german_number(value: Union[int, float], decimals: int = 2, unit: str = "") -> str:
+
+def _format_finite(x: float, decimals: int) -> str:
+    s = abs(x) * _POW10[decimals]
+    if abs(x) >= _INTEGRAL_FROM:
+        n = int(abs(x)) * _POW10[decimals]  # ganzzahliger float, exakt skaliert (kein Überlauf)
+    elif s >= _INTEGRAL_FROM:
+        n = int(s)
+    else:
+        n = math.floor(s + 0.5 + (s * _HALF_UP_EPS if s < _BUMP_LIMIT else 0.0))
+    if n < _MAX_EXACT:
+        # n / 10**decimals ist der nächste float zur gerundeten Dezimalzahl -> C-Formatierung exakt
+        text = _FLOAT_FORMATS[decimals](n / _POW10[decimals]).translate(_SWAP_SEPARATORS)
+    else:
+        ip, fp = divmod(n, _POW10[decimals])
+        text = f"{ip:_}".replace("_", ".") + (f",{fp:0{decimals}d}" if decimals else "")
+    return "-" + text if x < 0 and n else text
+
+
+def format_german_number(value: Union[int, float, None], decimals: int = 2, unit: str = "",
+                         na_text: Optional[str] = None) -> str:
     """
-    Formatiert Zahlen im deutschen Format: 23.403,11
+    Formatiert Zahlen im deutschen Format: 23.403,11 (half-up gerundet)
+    na_text ersetzt alle fehlenden Werte; ohne na_text: None/nicht lesbar -> MISSING_TEXT, NaN/Inf -> NA_TEXT.
     """
-    if value is None:
-        return "0,00"
-    
     try:
-        # Konvertiere zu float
-        num_value = float(value)
-        
-        # Formatiere mit deutschen Standards
-        if decimals == 0:
-            formatted = f"{num_value:,.0f}".replace(",", "X").replace(".", ",").replace("X", ".")
-        else:
-            formatted = f"{num_value:,.{decimals}f}".replace(",", "X").replace(".", ",").replace("X", ".")
-        
-        # Füge Einheit hinzu
-        if unit:
-            return f"{formatted} {unit}"
-        return formatted
-        
+        num_value = float(value)  # type: ignore[arg-type]
     except (ValueError, TypeError):
-        return "0,00"
+        return MISSING_TEXT if na_text is None else na_text
+    if not math.isfinite(num_value):
+        return NA_TEXT if na_text is None else na_text
+    formatted = _format_finite(num_value, _decimals(decimals))
+    # Füge Einheit hinzu
+    if unit:
+        return f"{formatted} {unit}"
+    return formatted
+
+
+def _as_float_array(values: Iterable[Any]):
+    """(float-Array mit None -> NaN, Originalwerte oder None bei numerischem Array); (None, None), wenn nicht lesbar."""
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+        return values.astype(float, copy=False).ravel(), None
+    items = values.tolist() if hasattr(values, "tolist") else list(values)
+    try:
+        arr = np.array(items, dtype=float).ravel()
+    except (ValueError, TypeError, OverflowError):
+        return None, None
+    return (arr, items) if arr.size == len(items) else (None, None)
+
+
+_triples = None
+_fraction_tables: dict = {}
+
+
+def _digit_tables(decimals: int):
+    global _triples
+    if _triples is None:
+        _triples = np.frombuffer("".join(f"{i:03d}" for i in range(1000)).encode("ascii"),
+                                 dtype=np.uint8).reshape(1000, 3)
+    table = _fraction_tables.get(decimals)
+    if table is None and decimals:
+        table = np.frombuffer("".join(f",{i:0{decimals}d}" for i in range(10 ** decimals)).encode("ascii"),
+                              dtype=np.uint8).reshape(10 ** decimals, decimals + 1)
+        _fraction_tables[decimals] = table
+    return _triples, table
+
+
+def _bulk_format(arr, decimals: int, suffix: str = "") -> List[str]:
+    """Endliche Werte (|x| * 10**decimals < 2**52) als Liste formatierter Strings, jeweils + suffix."""
+    size = arr.size
+    scale = float(_POW10[decimals])
+    s = np.abs(arr) * scale
+    n = np.floor(s + 0.5 + np.where(s < _BUMP_LIMIT, s * _HALF_UP_EPS, 0.0)).astype(np.int64)
+    ip, fp = np.divmod(n, _POW10[decimals])
+    neg = (arr < 0) & (n > 0)
+    powers = np.asarray(_POW10, dtype=np.int64)
+    n_digits = np.maximum(1, np.searchsorted(powers, ip, side="right"))
+    triples, fractions = _digit_tables(decimals)
+
+    # Ganzzahlteil in Dreiergruppen (zeilenweise rechtsbündig, mit führenden Nullen)
+    groups = []
+    rest = ip
+    for _ in range((int(n_digits.max()) + 2) // 3):
+        rest, group = np.divmod(rest, 1000)
+        groups.append(group)
+    dot = np.full((size, 1), ord("."), dtype=np.uint8)
+    pieces = [np.zeros((size, 1), dtype=np.uint8)]  # Platz für das Vorzeichen
+    for j in range(len(groups) - 1, -1, -1):
+        pieces.append(triples[groups[j]])
+        if j:
+            pieces.append(dot)
+    if decimals:
+        pieces.append(fractions[fp])
+    tail = np.frombuffer((suffix + "\n").encode("utf-8"), dtype=np.uint8)
+    pieces.append(np.broadcast_to(tail, (size, tail.size)))
+    body = np.hstack(pieces)
+
+    # Nur die belegten Bytes je Zeile behalten (Vorzeichen, Ziffern, Einheit, Zeilenende),
+    # einmal dekodieren und an den Zeilenenden trennen
+    number_width = body.shape[1] - tail.size
+    start = number_width - ((decimals + 1 if decimals else 0) + n_digits + (n_digits - 1) // 3) - neg
+    rows = np.flatnonzero(neg)
+    body[rows, start[rows]] = ord("-")
+    keep = np.arange(body.shape[1])[None, :] >= start[:, None]
+    return body[keep].tobytes().decode("utf-8").split("\n")[:-1]
+
+
+def format_german_numbers(values: Iterable[Any], decimals: int = 2, unit: str = "",
+                          na_text: Optional[str] = None) -> List[str]:
+    """
+    Formatiert eine ganze Spalte (Liste, numpy-Array, pandas Series) auf einmal; Ergebnis ist
+    elementweise identisch mit format_german_number. Für DataFrames: df[col] = format_german_numbers(df[col]).
+    """
+    decimals = _decimals(decimals)
+    arr, items = _as_float_array(values) if _NUMPY_AVAILABLE and decimals <= _MAX_BULK_DECIMALS else (None, None)
+    if arr is None:
+        return [format_german_number(v, decimals, unit, na_text) for v in values]
+    if arr.size == 0:
+        return []
+
+    # None wird von numpy zu NaN; nicht endliche Werte laufen mit dem Originalwert über den Einzelwert-Pfad
+    ok = np.isfinite(arr) & (np.abs(arr) < _INTEGRAL_FROM / _POW10[decimals])
+    formatted = _bulk_format(np.where(ok, arr, 0.0), decimals, f" {unit}" if unit else "")
+    if not ok.all():
+        for i in np.flatnonzero(~ok).tolist():
+            formatted[i] = format_german_number(float(arr[i]) if items is None else items[i], decimals, unit, na_text)
+    return formatted
+
+
+def format_column(values: Iterable[Any], kind: str, na_text: Optional[str] = None) -> List[str]:
+    """Spaltenweise Variante von format_currency/format_kwh/...: kind aus UNIT_FORMATS."""
+    decimals, unit = UNIT_FORMATS[kind]
+    return format_german_numbers(values, decimals, unit, na_text)
+
 
 def format_currency(value: Union[int, float]) -> str:
     """Formatiert Währung im deutschen Format"""
@@ -62,9 +218,11 @@ if __name__ == "__main__":
         (433792.52, "433.792,52"),
         (1632.02, "1.632,02"),
         (0.3245, "0,32"),
-        (1000000, "1.000.000,00")
+        (1000000, "1.000.000,00"),
+        (2.675, "2,68"),
+        (-0.001, "0,00"),
     ]
-    
+
     for value, expected in test_values:
         result = format_german_number(value)
         print(f"Input: {value} -> Output: {result} (Expected: {expected})")
@@ -3,6 +3,9 @@
 
 from __future__ import annotations # MUSS DIE ALLERERSTE CODE-ZEILE SEIN
 
+import time
+_GUI_STARTED = time.perf_counter()  # Referenz für die Startzeit-Messung (record_first_paint)
+
 import importlib
 import logging
 import warnings
@@ -86,7 +89,7 @@ calculations_module: Optional[Any] = None
 analysis_module: Optional[Any] = None
 crm_module: Optional[Any] = None
 admin_panel_module: Optional[Any] = None
-doc_output_module: Optional[Any] = None 
+doc_output_module: Optional[Any] = None
 quick_calc_module: Optional[Any] = None
 info_platform_module: Optional[Any] = None
 options_module: Optional[Any] = None
@@ -100,6 +103,52 @@ crm_dashboard_ui_module: Optional[Any] = None
 crm_pipeline_ui_module: Optional[Any] = None
 crm_calendar_ui_module: Optional[Any] = None
 
+# Globale Modulvariable -> Importname. Seitenmodule (Plotly, ReportLab, PyMuPDF, ...) werden erst
+# importiert, wenn ihre Seite zum ersten Mal gewählt wird (ensure_page_modules).
+LAZY_MODULES: Dict[str, str] = {
+    "locales_module": "locales",
+    "database_module": "database",
+    "product_db_module": "product_db",
+    "data_input_module": "data_input",
+    "calculations_module": "calculations",
+    "analysis_module": "analysis",
+    "crm_module": "crm",
+    "admin_panel_module": "admin_panel",
+    "doc_output_module": "pdf_ui",
+    "quick_calc_module": "quick_calc",
+    "info_platform_module": "info_platform",
+    "options_module": "options",
+    "pv_visuals_module": "pv_visuals",
+    "ai_companion_module": "ai_companion",
+    "multi_offer_module": "multi_offer_generator",
+    "pdf_preview_module": "pdf_preview",
+    "crm_calendar_ui_module": "crm_calendar_ui",
+    "crm_pipeline_ui_module": "crm_pipeline_ui",
+    "crm_dashboard_ui_module": "crm_dashboard_ui",
+    "heatpump_ui_module": "heatpump_ui",
+    "solar_calculator_module": "solar_calculator",
+}
+CORE_MODULES = ("locales_module", "database_module")
+PAGE_MODULES: Dict[str, tuple] = {
+    "input": ("data_input_module",),
+    "solar_calculator": ("solar_calculator_module",),
+    "heatpump": ("heatpump_ui_module",),
+    "analysis": ("analysis_module",),
+    "crm_dashboard": ("crm_dashboard_ui_module",),
+    "crm": ("crm_module",),
+    "crm_calendar": ("crm_calendar_ui_module",),
+    "crm_pipeline": ("crm_pipeline_ui_module",),
+    "options": ("options_module", "ai_companion_module"),
+    "admin": ("admin_panel_module", "product_db_module", "calculations_module"),
+    "doc_output": ("doc_output_module", "product_db_module", "multi_offer_module", "pdf_preview_module"),
+    "quick_calc": ("quick_calc_module",),
+    "info_platform": ("info_platform_module",),
+}
+# Zielwert Kaltstart bis erster Seitenaufbau der Eingabeseite (Sekunden); Messung in st.session_state
+STARTUP_BUDGET_S = 4.0
+module_load_times: Dict[str, float] = {}
+_attempted_modules: set = set()
+
 _parse_price_matrix_csv_from_calculations: Optional[Callable[[Union[str, io.StringIO], List[str]], Optional[pd.DataFrame]]] = None
 _parse_price_matrix_excel_from_calculations: Optional[Callable[[Optional[bytes], List[str]], Optional[pd.DataFrame]]] = None
 
@@ -116,6 +165,41 @@ def import_module_with_fallback(module_name: str, import_errors_list: List[str])
         import_errors_list.append(error_message)
         return None
 
+def ensure_modules(names) -> None:
+    """Importiert die genannten Module beim ersten Bedarf; Fehler landen wie bisher in import_errors."""
+    global _parse_price_matrix_csv_from_calculations, _parse_price_matrix_excel_from_calculations
+    for name in names:
+        if name in _attempted_modules:
+            continue
+        _attempted_modules.add(name)
+        started = time.perf_counter()
+        module = import_module_with_fallback(LAZY_MODULES[name], import_errors)
+        module_load_times[LAZY_MODULES[name]] = time.perf_counter() - started
+        globals()[name] = module
+        if name == "calculations_module" and module:
+            if hasattr(module, 'parse_module_price_matrix_csv'):
+                _parse_price_matrix_csv_from_calculations = module.parse_module_price_matrix_csv
+            if hasattr(module, 'parse_module_price_matrix_excel'):
+                _parse_price_matrix_excel_from_calculations = module.parse_module_price_matrix_excel
+
+def ensure_page_modules(page_key: str) -> None:
+    ensure_modules(PAGE_MODULES.get(page_key, ()))
+
+def record_first_paint(page_key: str) -> None:
+    """Misst Kaltstart -> erster Seitenaufbau je Session und warnt bei Überschreiten von STARTUP_BUDGET_S."""
+    if 'gui_first_paint' in st.session_state:
+        return
+    elapsed = time.perf_counter() - _GUI_STARTED
+    st.session_state['gui_first_paint'] = {
+        "page": page_key,
+        "seconds": round(elapsed, 3),
+        "budget_seconds": STARTUP_BUDGET_S,
+        "module_load_times": {k: round(v, 3) for k, v in module_load_times.items()},
+    }
+    if elapsed > STARTUP_BUDGET_S:
+        logging.getLogger(__name__).warning(
+            "Start-Budget überschritten: %.2f s > %.2f s (Seite %s)", elapsed, STARTUP_BUDGET_S, page_key)
+
 def get_text_gui(key: str, default_text: Optional[str] = None) -> str:
     base_texts = TEXTS if TEXTS else _texts_initial
     if default_text is None:
@@ -129,6 +213,11 @@ def initialize_database_once():
         except Exception as e_init_db:
             error_msg_db = get_text_gui("db_init_error", "Fehler bei DB-Initialisierung:") + f" {e_init_db}"
             import_errors.append(error_msg_db)
+        try:
+            import db_backup
+            db_backup.start_backup_scheduler(database_module.load_admin_setting('backup_settings', None)) # type: ignore
+        except Exception as e_backup_scheduler:
+            import_errors.append(f"Backup-Scheduler konnte nicht gestartet werden: {e_backup_scheduler}")
     else:
         error_msg_db_mod_missing = get_text_gui("db_init_error", "Fehler bei DB-Initialisierung:") + " database_module oder init_db Funktion nicht verfügbar."
         import_errors.append(error_msg_db_mod_missing)
@@ -323,6 +412,9 @@ def main():
             # Merke die zuletzt gerenderte Seite
             st.session_state.last_rendered_page_key = selected_page_key
 
+    # Module der gewählten Seite erst jetzt laden, damit Ladefehler noch im Fehlerbereich erscheinen
+    ensure_page_modules(selected_page_key)
+
     if import_errors:
         with st.sidebar:
             st.markdown("---")
@@ -741,35 +833,11 @@ def main():
         else: 
             st.warning(get_text_gui("module_unavailable_details", get_text_gui("fallback_title_crm_calendar","CRM Kalender nicht verfügbar.")))
 
+    record_first_paint(selected_page_key)
+
 if __name__ == "__main__":
     try:
-        locales_module = import_module_with_fallback("locales", import_errors)
-        database_module = import_module_with_fallback("database", import_errors)
-        product_db_module = import_module_with_fallback("product_db", import_errors)
-        data_input_module = import_module_with_fallback("data_input", import_errors)
-        calculations_module = import_module_with_fallback("calculations", import_errors)
-        analysis_module = import_module_with_fallback("analysis", import_errors)
-        crm_module = import_module_with_fallback("crm", import_errors)
-        admin_panel_module = import_module_with_fallback("admin_panel", import_errors)
-        doc_output_module = import_module_with_fallback("pdf_ui", import_errors)
-        quick_calc_module = import_module_with_fallback("quick_calc", import_errors)
-        info_platform_module = import_module_with_fallback("info_platform", import_errors)
-        options_module = import_module_with_fallback("options", import_errors)
-        pv_visuals_module = import_module_with_fallback("pv_visuals", import_errors)
-        ai_companion_module = import_module_with_fallback("ai_companion", import_errors)
-        multi_offer_module = import_module_with_fallback("multi_offer_generator", import_errors)
-        pdf_preview_module = import_module_with_fallback("pdf_preview", import_errors)
-        crm_calendar_ui_module = import_module_with_fallback("crm_calendar_ui", import_errors)
-        crm_pipeline_ui_module = import_module_with_fallback("crm_pipeline_ui", import_errors)
-        crm_dashboard_ui_module = import_module_with_fallback("crm_dashboard_ui", import_errors)
-        heatpump_ui_module = import_module_with_fallback("heatpump_ui", import_errors)
-        solar_calculator_module = import_module_with_fallback("solar_calculator", import_errors)
-        
-        if calculations_module:
-            if hasattr(calculations_module, 'parse_module_price_matrix_csv'):
-                _parse_price_matrix_csv_from_calculations = calculations_module.parse_module_price_matrix_csv
-            if hasattr(calculations_module, 'parse_module_price_matrix_excel'): 
-                _parse_price_matrix_excel_from_calculations = calculations_module.parse_module_price_matrix_excel
+        ensure_modules(CORE_MODULES)
 
         if 'db_initialized' not in st.session_state:
             if database_module: 
@@ -0,0 +1,226 @@
+# heatpump_catalog.py
+"""
+Indizierter Wärmepumpen-Katalog aus der Produktdatenbank.
+
+- Eine Abfrage auf `products` (plus eine auf `product_attributes` für COP/SCOP/Typ der
+  Wärmepumpen) baut den Katalog; danach beantworten Index-Strukturen alle Anfragen.
+- Index: Produkte je normalisierter Kategorie, Wärmepumpen je Typ nach Heizleistung
+  sortiert. Die Auswahl nach Heizlast ist eine Bereichsabfrage (bisect) statt eines Scans.
+- Invalidierung: product_db/product_attributes zählen bei jeder Änderung
+  products_version() hoch; zusätzlich wird der Katalog nach CATALOG_MAX_AGE_S neu
+  geladen (Änderungen aus anderen Prozessen).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from product_db import list_products, products_version
+except Exception:  # pragma: no cover – Fallback im Testkontext ohne DB
+    def list_products(category: Optional[str] = None, company_id: Optional[int] = None):  # type: ignore
+        return []
+    def products_version() -> int:  # type: ignore
+        return 0
+
+try:
+    from database import get_db_connection
+except Exception:  # pragma: no cover
+    get_db_connection = None  # type: ignore
+
+HEATPUMP_CATEGORY_ALIASES = {"waermepumpe", "wärmepumpe", "heatpump"}
+STORAGE_CATEGORY_ALIASES = {"speicher", "pufferspeicher", "warmwasserspeicher"}
+SERVICE_CATEGORY_ALIASES = {"dienstleistung", "service", "installation", "montage"}
+ACCESSORY_CATEGORY_ALIASES = {"zubehoer", "zubehör", "accessory"}
+
+MAIN_COMPONENT_KEYWORDS = ["vitocal", "warmwasser", "puffer"]  # heuristisch
+
+HEATPUMP_TYPES = [
+    "Luft-Wasser-Wärmepumpe",
+    "Sole-Wasser-Wärmepumpe",
+    "Wasser-Wasser-Wärmepumpe",
+    "Luft-Luft-Wärmepumpe",
+]
+DEFAULT_HEATPUMP_TYPE = HEATPUMP_TYPES[0]
+CATALOG_MAX_AGE_S = 300.0
+
+
+def normalize_text(s: Any) -> str:
+    return str(s or "").strip().lower()
+
+
+def _guess_type(text: str) -> str:
+    if "sole" in text or "erdwärme" in text or "erdwaerme" in text:
+        return "Sole-Wasser-Wärmepumpe"
+    if "wasser-wasser" in text:
+        return "Wasser-Wasser-Wärmepumpe"
+    if "luft-luft" in text:
+        return "Luft-Luft-Wärmepumpe"
+    return DEFAULT_HEATPUMP_TYPE
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(str(value).replace(",", ".")) if value not in (None, "") else 0.0
+    except ValueError:
+        return 0.0
+
+
+def heatpump_from_product(product: Dict[str, Any], attributes: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Produktzeile (+ Attribute cop, scop, type, noise_level, efficiency_class) als Wärmepumpen-Datensatz."""
+    attrs = {normalize_text(k): v for k, v in (attributes or {}).items()}
+    text = normalize_text(" ".join(str(product.get(k) or "") for k in ("model_name", "description")))
+    power = _to_float(product.get("power_kw")) or _to_float(attrs.get("heating_power"))
+    cop = _to_float(attrs.get("cop"))
+    scop = _to_float(attrs.get("scop"))
+    length, width = _to_float(product.get("length_m")), _to_float(product.get("width_m"))
+    return {
+        "id": product.get("id"),
+        "manufacturer": product.get("brand") or "",
+        "model": product.get("model_name") or "",
+        "model_name": product.get("model_name") or "",
+        "type": str(attrs.get("type") or attrs.get("heatpump_type") or _guess_type(text)),
+        "heating_power": power,
+        "heating_output_kw": power,
+        "cop": cop or round(scop * 0.9, 2),
+        "scop": scop or round(cop * 1.1, 2),
+        "price": _to_float(product.get("price_euro")),
+        "noise_level": attrs.get("noise_level"),
+        "dimensions": f"{length:.2f} x {width:.2f} m" if length and width else attrs.get("dimensions"),
+        "weight": _to_float(product.get("weight_kg")) or None,
+        "efficiency_class": attrs.get("efficiency_class"),
+        "labor_hours": _to_float(product.get("labor_hours")),
+        "description": product.get("description") or "",
+    }
+
+
+class HeatPumpCatalog:
+    """Unveränderlicher Index über Produkte und Wärmepumpen eines Katalog-Stands."""
+
+    def __init__(self, products: Iterable[Dict[str, Any]], attributes: Optional[Dict[Any, Dict[str, Any]]] = None,
+                 heatpumps: Optional[Iterable[Dict[str, Any]]] = None, version: int = 0):
+        self.products: List[Dict[str, Any]] = list(products)
+        self.version = version
+        self.built_at = time.monotonic()
+        attributes = attributes or {}
+
+        self._by_category: Dict[str, List[Dict[str, Any]]] = {}
+        self._main_rows: List[Dict[str, Any]] = []
+        self._accessory_rows: List[Dict[str, Any]] = []
+        hp_rows: List[Dict[str, Any]] = list(heatpumps or [])
+        for p in self.products:
+            cat = normalize_text(p.get("category"))
+            self._by_category.setdefault(cat, []).append(p)
+            if cat in HEATPUMP_CATEGORY_ALIASES:
+                hp_rows.append(heatpump_from_product(p, attributes.get(p.get("id"))))
+            # Einfache Heuristik: Hauptkomponenten falls Keyword im Modellnamen
+            if any(k in normalize_text(p.get("model_name")) for k in MAIN_COMPONENT_KEYWORDS):
+                self._main_rows.append(p)
+            else:
+                self._accessory_rows.append(p)
+
+        hp_rows.sort(key=lambda hp: float(hp.get("heating_power") or 0.0))
+        # Typ -> (sortierte Leistungen, Wärmepumpen); "" = alle Typen
+        self._by_type: Dict[str, Tuple[List[float], List[Dict[str, Any]]]] = {}
+        for key in [""] + sorted({str(hp.get("type") or "") for hp in hp_rows}):
+            rows = [hp for hp in hp_rows if not key or hp.get("type") == key]
+            self._by_type[key] = ([float(hp.get("heating_power") or 0.0) for hp in rows], rows)
+
+    @classmethod
+    def from_heatpumps(cls, heatpumps: Iterable[Dict[str, Any]]) -> "HeatPumpCatalog":
+        """Katalog aus fertigen Wärmepumpen-Datensätzen (z. B. Demo-Daten ohne Produkt-DB)."""
+        return cls([], heatpumps=heatpumps)
+
+    def is_stale(self) -> bool:
+        return self.version != products_version() or time.monotonic() - self.built_at > CATALOG_MAX_AGE_S
+
+    def heatpumps(self, heatpump_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Alle Wärmepumpen (optional eines Typs), aufsteigend nach Heizleistung."""
+        return list(self._by_type.get(heatpump_type or "", ([], []))[1])
+
+    def manufacturers(self) -> List[str]:
+        return sorted({hp["manufacturer"] for hp in self._by_type.get("", ([], []))[1] if hp.get("manufacturer")})
+
+    def in_power_range(self, min_kw: float, max_kw: Optional[float] = None, heatpump_type: Optional[str] = None,
+                       manufacturer: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Wärmepumpen mit min_kw <= Heizleistung <= max_kw, aufsteigend nach Leistung."""
+        powers, rows = self._by_type.get(heatpump_type or "", ([], []))
+        lo = bisect_left(powers, float(min_kw))
+        hi = len(powers) if max_kw is None else bisect_right(powers, float(max_kw))
+        found = rows[lo:hi]
+        if manufacturer:
+            found = [hp for hp in found if hp.get("manufacturer") == manufacturer]
+        return found
+
+    def select(self, required_kw: float, heatpump_type: Optional[str] = None,
+               manufacturer: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Passende Wärmepumpen: ausreichende aufsteigend, sonst die nächstgelegenen (unterdimensioniert)."""
+        suitable = self.in_power_range(required_kw, None, heatpump_type, manufacturer)
+        if suitable:
+            return suitable
+        candidates = self.in_power_range(0.0, None, heatpump_type, manufacturer)
+        return sorted(candidates, key=lambda hp: abs(float(hp.get("heating_power") or 0.0) - required_kw))
+
+    def smallest_sufficient(self, required_kw: float, heatpump_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        suitable = self.in_power_range(required_kw, None, heatpump_type)
+        return suitable[0] if suitable else None
+
+    def products_in_categories(self, aliases: Iterable[str]) -> List[Dict[str, Any]]:
+        return [p for alias in aliases for p in self._by_category.get(normalize_text(alias), [])]
+
+    def component_rows(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """(Hauptkomponenten, Zubehör) wie bisher in heatpump_pricing.load_heatpump_components klassifiziert."""
+        return self._main_rows, self._accessory_rows
+
+
+_catalog: Optional[HeatPumpCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def _load_attributes(product_ids: List[Any]) -> Dict[Any, Dict[str, Any]]:
+    """Attribute aller Wärmepumpen in einer Abfrage (product_id -> {key: value})."""
+    if not product_ids or get_db_connection is None:
+        return {}
+    conn = get_db_connection()
+    if conn is None:
+        return {}
+    try:
+        marks = ",".join("?" * len(product_ids))
+        rows = conn.execute(
+            f"SELECT product_id, attribute_key, attribute_value FROM product_attributes WHERE product_id IN ({marks})",
+            [int(pid) for pid in product_ids],
+        ).fetchall()
+    except Exception as e:
+        print(f"heatpump_catalog: Attribute nicht geladen: {e}")
+        return {}
+    finally:
+        conn.close()
+    attributes: Dict[Any, Dict[str, Any]] = {}
+    for product_id, key, value in rows:
+        attributes.setdefault(product_id, {})[key] = value
+    return attributes
+
+
+def get_heatpump_catalog(force_reload: bool = False) -> HeatPumpCatalog:
+    """Gecachter Katalog; wird bei Produktänderungen oder nach CATALOG_MAX_AGE_S neu aufgebaut."""
+    global _catalog
+    catalog = _catalog
+    if catalog is not None and not force_reload and not catalog.is_stale():
+        return catalog
+    with _catalog_lock:
+        if _catalog is not None and not force_reload and not _catalog.is_stale():
+            return _catalog
+        version = products_version()
+        products = list_products() or []
+        hp_ids = [p.get("id") for p in products
+                  if normalize_text(p.get("category")) in HEATPUMP_CATEGORY_ALIASES and p.get("id") is not None]
+        _catalog = HeatPumpCatalog(products, _load_attributes(hp_ids), version=version)
+        return _catalog
+
+
+def invalidate_heatpump_catalog() -> None:
+    global _catalog
+    _catalog = None
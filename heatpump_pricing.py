@@ -9,17 +9,23 @@ Alle Funktionen liefern klar strukturierte Dicts, damit sie leicht
 serialisiert oder in Session-State abgelegt werden können.
 """
 from __future__ import annotations
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence
 from dataclasses import dataclass, asdict
+from itertools import product
 import math
 
-try:
-    from product_db import list_products, get_product_by_model_name
-except Exception:  # pragma: no cover – Fallback im Testkontext ohne DB
-    def list_products(category: Optional[str] = None, company_id: Optional[int] = None):  # type: ignore
-        return []
-    def get_product_by_model_name(model_name: str):  # type: ignore
-        return None
+import numpy as np
+
+from german_formatting import format_german_number
+from heatpump_catalog import (  # noqa: F401 – Konstanten bleiben hier importierbar
+    ACCESSORY_CATEGORY_ALIASES,
+    HEATPUMP_CATEGORY_ALIASES,
+    MAIN_COMPONENT_KEYWORDS,
+    SERVICE_CATEGORY_ALIASES,
+    STORAGE_CATEGORY_ALIASES,
+    get_heatpump_catalog,
+    normalize_text as _norm,
+)
 
 LABOR_RATE_EUR_PER_HOUR_DEFAULT = 75.0  # Kann später via Admin-Einstellung überschrieben werden
 
@@ -51,40 +57,27 @@ class ComponentCost:
 
 # ----------------------------- Komponenten Laden -------------------------- #
 
-HEATPUMP_CATEGORY_ALIASES = {"waermepumpe", "wärmepumpe", "heatpump"}
-STORAGE_CATEGORY_ALIASES = {"speicher", "pufferspeicher", "warmwasserspeicher"}
-SERVICE_CATEGORY_ALIASES = {"dienstleistung", "service", "installation", "montage"}
-ACCESSORY_CATEGORY_ALIASES = {"zubehoer", "zubehör", "accessory"}
-
-MAIN_COMPONENT_KEYWORDS = ["vitocal", "warmwasser", "puffer"]  # heuristisch
-
-
-def _norm(s: str) -> str:
-    return (s or "").strip().lower()
+def _component_from_product(p: Dict[str, Any]) -> ComponentCost:
+    return ComponentCost(
+        name=p.get("model_name", ""),
+        category=_norm(p.get("category", "")),
+        material_net=float(p.get("price_euro") or 0.0),
+        labor_hours=float(p.get("labor_hours") or 0.0),
+        description=p.get("description") or "",
+    )
 
 
 def load_heatpump_components() -> Dict[str, List[ComponentCost]]:
-    """Lädt Produkte aus der DB und klassifiziert sie in Haupt- / Zubehörgruppen.
+    """Klassifiziert die Produkte in Haupt- / Zubehörgruppen.
     Erwartet, dass in der products Tabelle Preise in `price_euro` und Arbeitsstunden
-    in `labor_hours` gepflegt sind.
+    in `labor_hours` gepflegt sind. Quelle ist der gecachte heatpump_catalog, die
+    Produkttabelle wird also nur beim (Neu-)Aufbau des Katalogs gelesen.
     """
-    prods = list_products() or []
-    main: List[ComponentCost] = []
-    accessories: List[ComponentCost] = []
-
-    for p in prods:
-        cat = _norm(p.get("category", ""))
-        model = p.get("model_name", "")
-        price = float(p.get("price_euro") or 0.0)
-        labor_h = float(p.get("labor_hours") or 0.0)
-        desc = p.get("description") or ""
-        cc = ComponentCost(name=model, category=cat, material_net=price, labor_hours=labor_h, description=desc)
-        # Einfache Heuristik: Hauptkomponenten falls Keyword matcht oder Kategorie klar
-        if any(k in _norm(model) for k in MAIN_COMPONENT_KEYWORDS):
-            main.append(cc)
-        else:
-            accessories.append(cc)
-    return {"main": main, "accessories": accessories}
+    main_rows, accessory_rows = get_heatpump_catalog().component_rows()
+    return {
+        "main": [_component_from_product(p) for p in main_rows],
+        "accessories": [_component_from_product(p) for p in accessory_rows],
+    }
 
 # ----------------------------- Preislogik --------------------------------- #
 
@@ -188,6 +181,131 @@ def calculate_annuity_loan(principal: float, annual_interest_rate_pct: float, ye
         "plan": plan,
     }
 
+# ----------------------------- Szenario-Matrix --------------------------- #
+
+DEFAULT_SCENARIO_RATES_PCT = (2.5, 3.5, 4.5, 5.5)
+DEFAULT_SCENARIO_TERMS_YEARS = (5, 10, 15, 20)
+
+SCENARIO_TABLE_HEADER = ["BEG-Variante", "Rabatt", "Zins", "Laufzeit", "Förderung", "Kredit",
+                         "Monatsrate", "Zinsen gesamt", "Gesamtkosten"]
+
+
+def default_beg_variants() -> List[Dict[str, bool]]:
+    """Alle Kombinationen aus Kältemittel- und Heizungstausch-Bonus (ohne Einkommensbonus)."""
+    return [{"natural_refrigerant": nat, "replace_old": rep, "low_income": False}
+            for nat, rep in product((False, True), repeat=2)]
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    return np.round(values, 2)
+
+
+def calculate_scenario_matrix(base_total_net: float, discounts_pct: Sequence[float] = (0.0,),
+                              interest_rates_pct: Sequence[float] = DEFAULT_SCENARIO_RATES_PCT,
+                              terms_years: Sequence[int] = DEFAULT_SCENARIO_TERMS_YEARS,
+                              beg_variants: Optional[List[Dict[str, bool]]] = None, equity_amount: float = 0.0,
+                              rabatt_abs: float = 0.0, zuschlag_pct: float = 0.0, zuschlag_abs: float = 0.0,
+                              cfg: Optional[BegConfig] = None) -> Dict[str, Any]:
+    """Kreuzprodukt BEG-Variante × Rabatt × Zins × Laufzeit in einem numpy-Durchlauf.
+
+    Rechnet wie apply_discounts_and_surcharges, calculate_beg_subsidy und
+    calculate_annuity_loan (ohne Tilgungsplan). Ergebnis: Spaltenlisten in der
+    Reihenfolge Variante, Rabatt, Zins, Laufzeit (letzte Achse läuft am schnellsten).
+    """
+    cfg = cfg or BegConfig()
+    variants = beg_variants if beg_variants is not None else default_beg_variants()
+    nat = np.array([bool(v.get("natural_refrigerant")) for v in variants])
+    rep = np.array([bool(v.get("replace_old")) for v in variants])
+    low = np.array([bool(v.get("low_income")) for v in variants])
+    discount = np.asarray(discounts_pct, dtype=float)
+    rate_pct = np.asarray(interest_rates_pct, dtype=float)
+    years = np.asarray(terms_years, dtype=int)
+
+    # Preis nach Rabatt/Zuschlag je Rabattstufe (Achse D)
+    zwischen = base_total_net - base_total_net * (discount / 100.0) - rabatt_abs
+    final_net = _round2(zwischen + zwischen * (zuschlag_pct / 100.0) + zuschlag_abs)
+
+    # Förderung je Variante und Rabattstufe (Achsen V×D)
+    requested = (cfg.base_pct + nat * cfg.refrigerant_bonus_pct + rep * cfg.heating_replacement_bonus_pct
+                 + low * cfg.low_income_bonus_pct)
+    applied = np.minimum(requested, cfg.max_total_pct)
+    subsidy = _round2(np.minimum(final_net, cfg.eligible_cost_cap_eur)[None, :] * (applied[:, None] / 100.0))
+    after_subsidy = _round2(final_net[None, :] - subsidy)
+    principal = np.maximum(after_subsidy - equity_amount, 0.0)
+
+    # Annuität je Zins und Laufzeit (Achsen V×D×R×T)
+    r = (rate_pct / 1200.0)[None, None, :, None]
+    n = (years * 12).astype(float)[None, None, None, :]
+    p = principal[:, :, None, None]
+    growth = (1.0 + r) ** n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(r == 0, p / n, p * r * growth / (growth - 1.0))
+    annuity = np.where(p > 0, annuity, 0.0)
+    total_interest = np.maximum(annuity * n - p, 0.0)  # bei 0 % Zins nur Rundungsrauschen
+
+    shape = (len(variants), len(discount), len(rate_pct), len(years))
+    vi, di, ri, ti = (idx.ravel() for idx in np.indices(shape))
+    columns = {
+        "natural_refrigerant": nat[vi],
+        "replace_old": rep[vi],
+        "low_income": low[vi],
+        "rabatt_pct": discount[di],
+        "interest_pct": rate_pct[ri],
+        "years": years[ti],
+        "final_price_net": final_net[di],
+        "subsidy_pct": applied[vi],
+        "subsidy_amount_net": subsidy[vi, di],
+        "after_subsidy_net": after_subsidy[vi, di],
+        "principal": _round2(principal[vi, di]),
+        "monthly_rate": _round2(annuity.ravel()),
+        "total_interest": _round2(total_interest.ravel()),
+        "total_paid": _round2((p + total_interest).ravel()),
+        "total_cost": _round2((p + total_interest).ravel() + np.minimum(after_subsidy[vi, di], equity_amount)),
+    }
+    return {
+        "count": int(np.prod(shape)),
+        "equity_amount": equity_amount,
+        "columns": {name: values.tolist() for name, values in columns.items()},
+    }
+
+
+def scenario_matrix_rows(matrix: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Spaltenform -> Liste von Zeilen-Dicts (z. B. für pandas oder st.dataframe)."""
+    columns = matrix.get("columns", {})
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def _fmt_de(value: float, decimals: int = 0, suffix: str = "") -> str:
+    return format_german_number(value, decimals, suffix)
+
+
+def beg_variant_label(row: Dict[str, Any]) -> str:
+    parts = [label for key, label in (("natural_refrigerant", "Kältemittel"), ("replace_old", "Heizungstausch"),
+                                      ("low_income", "Einkommen")) if row.get(key)]
+    return "Basis + " + " + ".join(parts) if parts else "Basis"
+
+
+def scenario_matrix_table(matrix: Dict[str, Any], sort_by: str = "total_cost", limit: Optional[int] = 20) -> List[List[str]]:
+    """Kopfzeile + formatierte Zeilen (deutsches Zahlenformat) für eine PDF-Vergleichsseite."""
+    rows = sorted(scenario_matrix_rows(matrix), key=lambda row: row.get(sort_by, 0.0))
+    if limit is not None:
+        rows = rows[:limit]
+    table = [list(SCENARIO_TABLE_HEADER)]
+    for row in rows:
+        table.append([
+            beg_variant_label(row),
+            _fmt_de(row["rabatt_pct"], 0, "%"),
+            _fmt_de(row["interest_pct"], 2, "%"),
+            f"{row['years']} J.",
+            f"{_fmt_de(row['subsidy_pct'], 0, '%')} / {_fmt_de(row['subsidy_amount_net'], 0, '€')}",
+            _fmt_de(row["principal"], 0, "€"),
+            _fmt_de(row["monthly_rate"], 2, "€"),
+            _fmt_de(row["total_interest"], 0, "€"),
+            _fmt_de(row["total_cost"], 0, "€"),
+        ])
+    return table
+
 # ----------------------------- Orchestrierung ---------------------------- #
 
 def build_full_heatpump_offer(rabatt_pct: float = 0.0, rabatt_abs: float = 0.0, zuschlag_pct: float = 0.0,
@@ -273,5 +391,8 @@ __all__ = [
     "calculate_beg_subsidy",
     "calculate_annuity_loan",
     "build_full_heatpump_offer",
+    "calculate_scenario_matrix",
+    "scenario_matrix_rows",
+    "scenario_matrix_table",
     "extract_placeholders_from_offer",
 ]
@@ -0,0 +1,331 @@
+# heatpump_simulation.py
+"""
+Stündliche Jahressimulation (8760 h) für Wärmepumpen, vektorisiert mit numpy.
+
+Eingaben:
+- Außentemperatur-Zeitreihe (z. B. Testreferenzjahr; ersatzweise synthetic_outdoor_temperature)
+- Gebäude (HeatingDemandProfile): Norm-Heizlast, Norm-Außentemperatur, Heizgrenztemperatur,
+  Heizkurve (Vorlauftemperatur über Außentemperatur) und Warmwasserbedarf
+- Gerät (HeatPumpUnit): Nennleistung mit Leistungsabfall bei kalter Quelle,
+  COP-Kennfeld über Quellen- und Vorlauftemperatur, Einsatzgrenze; Fehlmengen deckt der Heizstab
+
+Ergebnis je Gerät: stündlicher Strombezug, Jahresarbeitszahl (JAZ), Heizstab-Stunden und
+-Energie, Spitzenlast. Das Gebäudeprofil wird einmal berechnet und für alle Geräte
+wiederverwendet (compare_heatpumps), eine Auswertung dauert wenige Millisekunden.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+HOURS_PER_YEAR = 8760
+KELVIN = 273.15
+
+# Rasterpunkte für Kennfelder, die aus einem Normpunkt (A2/W35) abgeleitet werden
+_RATING_SOURCE_GRID_C = np.arange(-25.0, 36.0, 1.0)
+_RATING_FLOW_GRID_C = np.arange(20.0, 76.0, 1.0)
+# Temperaturdifferenz der Wärmeübertrager (Kältemittel gegenüber Vorlauf bzw. Quelle)
+_EXCHANGER_DELTA_K = 5.0
+_COP_MIN, _COP_MAX = 1.0, 8.0
+
+# Heizkörperexponent n je Heizsystem (Auswahl in heatpump_ui, z. B. "Fußbodenheizung (35°C)"); sonst 1.3
+_SYSTEM_EXPONENTS = {"Fußboden": 1.1, "Wand": 1.1}
+_HOT_WATER_KWH_BY_DEMAND = {"Niedrig": 1000.0, "Mittel": 2000.0, "Hoch": 3000.0}
+
+
+def synthetic_outdoor_temperature(mean_c: float = 9.5, annual_amplitude_c: float = 9.0,
+                                  daily_amplitude_c: float = 3.5, design_c: float = -12.0,
+                                  seed: int = 0, hours: int = HOURS_PER_YEAR) -> np.ndarray:
+    """Deterministische Ersatz-Zeitreihe ohne Wetterdaten.
+
+    Jahresgang (kältester Tag Mitte Januar) + Tagesgang (Minimum 5 Uhr) + Wetterschwankung
+    der Tagesmittel (AR(1)), so skaliert, dass das Jahresminimum der Norm-Außentemperatur entspricht.
+    """
+    h = np.arange(hours, dtype=float)
+    seasonal = mean_c - annual_amplitude_c * np.cos(2 * np.pi * (h / 24.0 - 15.0) / 365.0)
+    daily = -daily_amplitude_c * np.cos(2 * np.pi * ((h % 24) - 5.0) / 24.0)
+    rng = np.random.default_rng(seed)
+    days = int(np.ceil(hours / 24.0))
+    shocks = rng.normal(0.0, 1.0, days)
+    weather_daily = np.empty(days)
+    level = 0.0
+    for d in range(days):
+        level = 0.8 * level + shocks[d]
+        weather_daily[d] = level
+    weather = np.repeat(weather_daily, 24)[:hours]
+    base = seasonal + daily
+    # Wetteranteil so skalieren, dass das Minimum genau design_c erreicht
+    idx = int(np.argmin(base + weather))
+    if weather[idx] < 0:
+        weather = weather * max(0.0, (base[idx] - design_c) / -weather[idx])
+    return base + weather
+
+
+def _bilinear(xs: np.ndarray, ys: np.ndarray, grid: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Bilineare Interpolation in grid[len(xs), len(ys)], außerhalb auf den Rand begrenzt."""
+    x = np.clip(x, xs[0], xs[-1])
+    y = np.clip(y, ys[0], ys[-1])
+    ix = np.clip(np.searchsorted(xs, x, side="right") - 1, 0, len(xs) - 2)
+    iy = np.clip(np.searchsorted(ys, y, side="right") - 1, 0, len(ys) - 2)
+    tx = (x - xs[ix]) / (xs[ix + 1] - xs[ix])
+    ty = (y - ys[iy]) / (ys[iy + 1] - ys[iy])
+    return ((1 - tx) * (1 - ty) * grid[ix, iy] + tx * (1 - ty) * grid[ix + 1, iy]
+            + (1 - tx) * ty * grid[ix, iy + 1] + tx * ty * grid[ix + 1, iy + 1])
+
+
+@dataclass(frozen=True)
+class CopCurve:
+    """COP-Kennfeld: cop[i, j] bei Quellentemperatur source_c[i] und Vorlauftemperatur flow_c[j]."""
+    source_c: np.ndarray
+    flow_c: np.ndarray
+    cop: np.ndarray
+
+    @classmethod
+    def from_points(cls, source_c: Sequence[float], flow_c: Sequence[float],
+                    cop: Sequence[Sequence[float]]) -> "CopCurve":
+        s = np.asarray(source_c, dtype=float)
+        f = np.asarray(flow_c, dtype=float)
+        c = np.asarray(cop, dtype=float)
+        if c.shape != (len(s), len(f)) or len(s) < 2 or len(f) < 2:
+            raise ValueError("COP-Kennfeld braucht mindestens 2x2 Punkte und cop[len(source_c)][len(flow_c)]")
+        order_s, order_f = np.argsort(s), np.argsort(f)
+        return cls(s[order_s], f[order_f], c[order_s][:, order_f])
+
+    @classmethod
+    def from_rating(cls, cop_a2w35: float) -> "CopCurve":
+        """Kennfeld aus dem Normpunkt A2/W35 über einen konstanten Carnot-Gütegrad."""
+        def carnot(source: np.ndarray, flow: np.ndarray) -> np.ndarray:
+            hot = flow + _EXCHANGER_DELTA_K
+            cold = source - _EXCHANGER_DELTA_K
+            return (hot + KELVIN) / np.maximum(hot - cold, 1.0)
+
+        efficiency = float(cop_a2w35) / float(carnot(np.array(2.0), np.array(35.0)))
+        s, f = np.meshgrid(_RATING_SOURCE_GRID_C, _RATING_FLOW_GRID_C, indexing="ij")
+        grid = np.clip(efficiency * carnot(s, f), _COP_MIN, _COP_MAX)
+        return cls(_RATING_SOURCE_GRID_C, _RATING_FLOW_GRID_C, grid)
+
+    def evaluate(self, source_c: np.ndarray, flow_c: np.ndarray) -> np.ndarray:
+        return _bilinear(self.source_c, self.flow_c, self.cop, np.asarray(source_c, dtype=float),
+                         np.asarray(flow_c, dtype=float))
+
+
+@dataclass(frozen=True)
+class HeatPumpUnit:
+    """Gerätedaten für die Simulation."""
+    name: str
+    nominal_kw: float
+    cop_curve: CopCurve
+    source: str = "air"                  # "air", "ground" oder "water"
+    capacity_slope_per_k: float = 0.02   # Leistungsänderung je K Quellentemperatur (bezogen auf A2)
+    min_source_c: float = -20.0          # Einsatzgrenze, darunter heizt nur der Heizstab
+    max_flow_c: float = 60.0             # höhere Vorlauftemperaturen übernimmt der Heizstab
+
+    @classmethod
+    def from_product(cls, product: Dict[str, Any]) -> "HeatPumpUnit":
+        """Aus Produktdaten (heatpump_ui / Produktdatenbank) mit Kennfeld in product["cop_curve"], falls vorhanden."""
+        name = " ".join(str(product.get(k) or "") for k in ("manufacturer", "model")).strip() or str(product.get("model_name", "Wärmepumpe"))
+        nominal_kw = float(product.get("heating_power") or product.get("heating_output_kw") or product.get("heatpump_power") or 0.0)
+        curve_data = product.get("cop_curve")
+        if isinstance(curve_data, dict):
+            curve = CopCurve.from_points(curve_data["source_c"], curve_data["flow_c"], curve_data["cop"])
+        else:
+            cop_rating = product.get("cop") or product.get("cop_rating") or (float(product.get("scop") or 0) * 0.9) or 3.5
+            curve = CopCurve.from_rating(float(cop_rating))
+        type_text = str(product.get("type") or "")
+        source = "ground" if "Sole" in type_text else ("water" if "Wasser-Wasser" in type_text else "air")
+        return cls(
+            name=name,
+            nominal_kw=nominal_kw,
+            cop_curve=curve,
+            source=str(product.get("source") or source),
+            capacity_slope_per_k=float(product.get("capacity_slope_per_k", 0.02 if source == "air" else 0.0)),
+            min_source_c=float(product.get("min_source_c", -20.0)),
+            max_flow_c=float(product.get("max_flow_c", 60.0)),
+        )
+
+    def source_temperature(self, outdoor_c: np.ndarray) -> np.ndarray:
+        if self.source == "ground":
+            # Sole: gedämpfter Verlauf zwischen 0 und 10 °C
+            return np.clip(4.0 + 0.2 * outdoor_c, 0.0, 10.0)
+        if self.source == "water":
+            return np.full_like(outdoor_c, 10.0)
+        return outdoor_c
+
+    def capacity_kw(self, source_c: np.ndarray) -> np.ndarray:
+        factor = np.clip(1.0 + self.capacity_slope_per_k * (source_c - 2.0), 0.5, 1.3)
+        return self.nominal_kw * factor
+
+
+def fit_heating_limit(outdoor_c: np.ndarray, design_heat_load_kw: float, annual_space_heat_kwh: float,
+                      design_outdoor_c: float = -12.0, room_c: float = 20.0) -> float:
+    """Heizgrenztemperatur, bei der die Raumheizung über das Jahr annual_space_heat_kwh ergibt.
+
+    Der Jahresbedarf steigt monoton mit der Heizgrenze -> Bisektion zwischen Auslegungs- und Raumtemperatur.
+    Ist der Bedarf selbst mit Heizgrenze = Raumtemperatur nicht erreichbar, bleibt es bei der Raumtemperatur
+    (Spitzenlast hat Vorrang vor der Jahresenergie).
+    """
+    t = np.asarray(outdoor_c, dtype=float)
+    span = max(room_c - design_outdoor_c, 1.0)
+    heat = design_heat_load_kw * np.clip((room_c - t) / span, 0.0, None)
+
+    def annual(limit: float) -> float:
+        return float(heat[t < limit].sum())
+
+    target = float(annual_space_heat_kwh)
+    low, high = float(design_outdoor_c), float(room_c)
+    if annual(high) <= target:
+        return high
+    for _ in range(50):
+        mid = 0.5 * (low + high)
+        if annual(mid) < target:
+            low = mid
+        else:
+            high = mid
+    return high
+
+
+@dataclass
+class HeatingDemandProfile:
+    """Stündlicher Wärmebedarf und Vorlauftemperatur eines Gebäudes (einmal je Gebäude berechnet)."""
+    outdoor_c: np.ndarray
+    space_heat_kw: np.ndarray
+    flow_c: np.ndarray
+    hot_water_kw: np.ndarray
+    hot_water_flow_c: float
+
+    @classmethod
+    def build(cls, outdoor_c: Iterable[float], design_heat_load_kw: float, design_outdoor_c: float = -12.0,
+              heating_limit_c: float = 15.0, room_c: float = 20.0, design_flow_c: float = 35.0,
+              radiator_exponent: float = 1.3, min_flow_c: float = 25.0,
+              annual_space_heat_kwh: Optional[float] = None, hot_water_kwh_per_year: float = 0.0,
+              hot_water_flow_c: float = 50.0) -> "HeatingDemandProfile":
+        """Heizlast linear über (room_c - T_außen), null oberhalb der Heizgrenze.
+
+        annual_space_heat_kwh passt das Profil an einen bekannten Jahreswärmebedarf (z. B. aus Verbrauch) an,
+        indem die Heizgrenztemperatur angepasst wird (fit_heating_limit); die Norm-Heizlast am Auslegungspunkt
+        bleibt dabei unverändert.
+        Die Heizkurve folgt der Heizkörper-Kennlinie: Vorlauf = Raum + (Auslegung - Raum) * x^(1/n).
+        """
+        t = np.asarray(list(outdoor_c) if not isinstance(outdoor_c, np.ndarray) else outdoor_c, dtype=float)
+        span = max(room_c - design_outdoor_c, 1.0)
+        load_ratio = np.clip((room_c - t) / span, 0.0, None)
+        if annual_space_heat_kwh is not None:
+            heating_limit_c = fit_heating_limit(t, design_heat_load_kw, annual_space_heat_kwh,
+                                                design_outdoor_c=design_outdoor_c, room_c=room_c)
+        load_ratio = np.where(t < heating_limit_c, load_ratio, 0.0)
+        space = design_heat_load_kw * load_ratio
+        flow = room_c + (design_flow_c - room_c) * np.clip(load_ratio, 0.0, 1.0) ** (1.0 / radiator_exponent)
+        flow = np.maximum(flow, min_flow_c)
+        hot_water = np.full_like(t, float(hot_water_kwh_per_year) / len(t) if len(t) else 0.0)
+        return cls(t, space, flow, hot_water, float(hot_water_flow_c))
+
+    @classmethod
+    def from_building_data(cls, building_data: Dict[str, Any], outdoor_c: Optional[np.ndarray] = None,
+                           annual_space_heat_kwh: Optional[float] = None) -> "HeatingDemandProfile":
+        """Aus den Gebäudedaten der Wärmepumpen-Analyse (heatpump_ui.render_building_analysis)."""
+        design_outdoor_c = float(building_data.get("outside_temp", -12.0))
+        system = str(building_data.get("system_temp") or "")
+        match = re.search(r"(\d+)\s*°C", system)
+        design_flow_c = float(match.group(1)) if match else 45.0
+        exponent = next((v for k, v in _SYSTEM_EXPONENTS.items() if k in system), 1.3)
+        hot_water = str(building_data.get("hot_water") or "")
+        hot_water_kwh = next((v for k, v in _HOT_WATER_KWH_BY_DEMAND.items() if hot_water.startswith(k)), 0.0)
+        if outdoor_c is None:
+            outdoor_c = synthetic_outdoor_temperature(design_c=design_outdoor_c)
+        return cls.build(
+            outdoor_c,
+            design_heat_load_kw=float(building_data.get("heat_load_kw", 0.0) or 0.0),
+            design_outdoor_c=design_outdoor_c,
+            heating_limit_c=float(building_data.get("heating_limit_c", 15.0)),
+            room_c=float(building_data.get("desired_temp", 20.0)),
+            design_flow_c=design_flow_c,
+            radiator_exponent=exponent,
+            annual_space_heat_kwh=annual_space_heat_kwh,
+            hot_water_kwh_per_year=hot_water_kwh,
+        )
+
+    @property
+    def total_heat_kw(self) -> np.ndarray:
+        return self.space_heat_kw + self.hot_water_kw
+
+
+@dataclass
+class HeatPumpSimulationResult:
+    """Stundenwerte (kWh je Stunde = mittlere kW) und Jahreskennzahlen einer Simulation."""
+    unit_name: str
+    heat_kwh: np.ndarray
+    electricity_kwh: np.ndarray
+    heating_rod_kwh: np.ndarray
+    outdoor_c: np.ndarray = field(repr=False)
+
+    @property
+    def annual_heat_kwh(self) -> float:
+        return float(self.heat_kwh.sum())
+
+    @property
+    def annual_electricity_kwh(self) -> float:
+        return float(self.electricity_kwh.sum())
+
+    @property
+    def seasonal_performance_factor(self) -> float:
+        """Jahresarbeitszahl (JAZ) inkl. Heizstab."""
+        electricity = self.annual_electricity_kwh
+        return self.annual_heat_kwh / electricity if electricity > 0 else 0.0
+
+    @property
+    def heating_rod_hours(self) -> int:
+        return int(np.count_nonzero(self.heating_rod_kwh > 1e-6))
+
+    @property
+    def peak_electric_kw(self) -> float:
+        return float(self.electricity_kwh.max()) if len(self.electricity_kwh) else 0.0
+
+    @property
+    def bivalence_point_c(self) -> Optional[float]:
+        """Höchste Außentemperatur mit Heizstabeinsatz (None ohne Heizstab)."""
+        rod = self.heating_rod_kwh > 1e-6
+        return float(self.outdoor_c[rod].max()) if rod.any() else None
+
+    def summary(self) -> Dict[str, Any]:
+        bivalence = self.bivalence_point_c
+        return {
+            "unit": self.unit_name,
+            "annual_heat_kwh": round(self.annual_heat_kwh, 0),
+            "annual_electricity_kwh": round(self.annual_electricity_kwh, 0),
+            "spf": round(self.seasonal_performance_factor, 2),
+            "heating_rod_kwh": round(float(self.heating_rod_kwh.sum()), 0),
+            "heating_rod_hours": self.heating_rod_hours,
+            "peak_electric_kw": round(self.peak_electric_kw, 2),
+            "peak_heat_load_kw": round(float(self.heat_kwh.max()) if len(self.heat_kwh) else 0.0, 2),
+            "bivalence_point_c": round(bivalence, 1) if bivalence is not None else None,
+        }
+
+
+def simulate_heatpump(profile: HeatingDemandProfile, unit: HeatPumpUnit) -> HeatPumpSimulationResult:
+    """Stündliche Simulation: Warmwasser zuerst, Rest der Geräteleistung für Raumheizung, Fehlmenge per Heizstab."""
+    source = unit.source_temperature(profile.outdoor_c)
+    available = source >= unit.min_source_c
+    capacity = np.where(available, unit.capacity_kw(source), 0.0)
+
+    hot_water_hp = np.minimum(profile.hot_water_kw, capacity)
+    remaining = capacity - hot_water_hp
+    space_ok = profile.flow_c <= unit.max_flow_c
+    space_hp = np.where(space_ok, np.minimum(profile.space_heat_kw, remaining), 0.0)
+    rod = (profile.hot_water_kw - hot_water_hp) + (profile.space_heat_kw - space_hp)
+
+    cop_space = unit.cop_curve.evaluate(source, profile.flow_c)
+    cop_hot_water = unit.cop_curve.evaluate(source, np.full_like(source, profile.hot_water_flow_c))
+    electricity = space_hp / cop_space + hot_water_hp / cop_hot_water + rod
+    return HeatPumpSimulationResult(unit.name, profile.total_heat_kw, electricity, rod, profile.outdoor_c)
+
+
+def compare_heatpumps(profile: HeatingDemandProfile, products: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Kennzahlen mehrerer Geräte für dasselbe Gebäude (nach JAZ absteigend)."""
+    rows = []
+    for product in products:
+        unit = product if isinstance(product, HeatPumpUnit) else HeatPumpUnit.from_product(product)
+        rows.append(simulate_heatpump(profile, unit).summary())
+    rows.sort(key=lambda r: r["spf"], reverse=True)
+    return rows
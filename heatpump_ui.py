@@ -29,6 +29,9 @@ try:
     estimate_heat_load_kw_from_annual_demand,
     get_default_heating_system_efficiency
     )
+    from heatpump_simulation import HeatingDemandProfile, HeatPumpUnit, compare_heatpumps, simulate_heatpump
+    from energy_dispatch import build_project_dispatch
+    from heatpump_catalog import HEATPUMP_TYPES, HeatPumpCatalog, get_heatpump_catalog
     from locales import get_text
     HEATPUMP_MODULES_AVAILABLE = True
 except ImportError as e:
@@ -328,6 +331,7 @@ def render_heatpump_selection(texts: Dict[str, str], building_data: Dict[str, An
         return None
     
     st.info(f"Benötigte Heizleistung: {heat_load:.1f} kW")
+    catalog = get_heatpump_catalog_for_ui()
     
     # Wärmepumpen-Typ auswählen
     col1, col2 = st.columns(2)
@@ -335,12 +339,7 @@ def render_heatpump_selection(texts: Dict[str, str], building_data: Dict[str, An
     with col1:
         heatpump_type = st.selectbox(
             "Wärmepumpentyp",
-            options=[
-                "Luft-Wasser-Wärmepumpe",
-                "Sole-Wasser-Wärmepumpe", 
-                "Wasser-Wasser-Wärmepumpe",
-                "Luft-Luft-Wärmepumpe"
-            ]
+            options=HEATPUMP_TYPES
         )
         
         installation_type = st.selectbox(
@@ -351,7 +350,7 @@ def render_heatpump_selection(texts: Dict[str, str], building_data: Dict[str, An
     with col2:
         manufacturer_preference = st.selectbox(
             "Hersteller-Präferenz",
-            options=["Keine Präferenz", "Vaillant", "Viessmann", "Daikin", "Mitsubishi", "Panasonic", "Stiebel Eltron"]
+            options=["Keine Präferenz"] + catalog.manufacturers()
         )
         
         budget_category = st.selectbox(
@@ -388,24 +387,10 @@ def render_heatpump_selection(texts: Dict[str, str], building_data: Dict[str, An
     
     if st.button(" Wärmepumpen suchen", use_container_width=True):
         try:
-            # Dummy-Wärmepumpen-Datenbank (in echter Implementierung aus DB laden)
-            heatpumps_db = get_heatpump_database()
-            
-            # Lokale Empfehlung basierend auf UI-Parametern (Kompatibel mit Dummy-DB)
+            # Bereichsabfrage im Katalog: kleinste ausreichende zuerst, sonst nächstgelegene (unterdimensioniert)
             required_kw = heat_load * sizing_factor
-            candidates = [hp for hp in heatpumps_db if hp.get('type') == heatpump_type]
-            if manufacturer_preference and manufacturer_preference != "Keine Präferenz":
-                candidates = [hp for hp in candidates if hp.get('manufacturer') == manufacturer_preference]
-            
-            # Bevorzugt kleinste, die reicht; sonst dichteste über/unter dem Bedarf
-            suitable = [hp for hp in candidates if hp.get('heating_power', 0) >= required_kw]
-            if suitable:
-                suitable = sorted(suitable, key=lambda hp: hp.get('heating_power', 0))
-                recommended_list = suitable
-            else:
-                # Fallback: nächstgrößte Abweichung (unterdimensioniert)
-                candidates = sorted(candidates, key=lambda hp: abs(hp.get('heating_power', 0) - required_kw))
-                recommended_list = candidates
+            manufacturer = manufacturer_preference if manufacturer_preference != "Keine Präferenz" else None
+            recommended_list = catalog.select(required_kw, heatpump_type, manufacturer)
 
             if recommended_list:
                 st.success(f" {len(recommended_list)} passende Wärmepumpen gefunden!")
@@ -425,12 +410,12 @@ def render_heatpump_selection(texts: Dict[str, str], building_data: Dict[str, An
                 with col_hp2:
                     st.metric("COP (A2/W35)", f"{top_heatpump['cop']:.1f}")
                     st.metric("SCOP", f"{top_heatpump['scop']:.1f}")
-                    st.write(f"Schallpegel: {top_heatpump['noise_level']} dB(A)")
+                    st.write(f"Schallpegel: {top_heatpump.get('noise_level') or '–'} dB(A)")
                 
                 with col_hp3:
                     st.metric("Anschaffungskosten", f"{top_heatpump['price']:,.0f} €")
-                    st.write(f"Größe: {top_heatpump['dimensions']}")
-                    st.write(f"Gewicht: {top_heatpump['weight']} kg")
+                    st.write(f"Größe: {top_heatpump.get('dimensions') or '–'}")
+                    st.write(f"Gewicht: {top_heatpump.get('weight') or '–'} kg")
                 
                 # Weitere Optionen anzeigen
                 if len(recommended_list) > 1:
@@ -446,6 +431,18 @@ def render_heatpump_selection(texts: Dict[str, str], building_data: Dict[str, An
                                 st.write(f"Preis: {hp['price']:,.0f} €")
                             st.markdown("---")
                 
+                # Stündliche Jahressimulation der Kandidaten (gleiches Gebäudeprofil für alle Geräte)
+                with st.expander(" Jahressimulation (8760 h) der Kandidaten", expanded=True):
+                    profile = _building_heat_profile(building_data)
+                    comparison = compare_heatpumps(profile, recommended_list[:10])
+                    st.dataframe(pd.DataFrame(comparison).rename(columns={
+                        'unit': 'Gerät', 'annual_heat_kwh': 'Wärme (kWh)', 'annual_electricity_kwh': 'Strom (kWh)',
+                        'spf': 'JAZ', 'heating_rod_kwh': 'Heizstab (kWh)', 'heating_rod_hours': 'Heizstab (h)',
+                        'peak_electric_kw': 'Spitzenlast el. (kW)', 'peak_heat_load_kw': 'Spitzenlast Wärme (kW)',
+                        'bivalence_point_c': 'Bivalenzpunkt (°C)',
+                    }), use_container_width=True, hide_index=True)
+                    st.caption("Synthetisches Temperaturjahr mit Minimum bei der Auslegungstemperatur; Heizkurve aus der Heizsystem-Temperatur.")
+
                 # Auswahl speichern
                 heatpump_data = {
                     'selected_heatpump': top_heatpump,
@@ -543,8 +540,9 @@ def render_economics_analysis(texts: Dict[str, str], heatpump_data: Dict[str, An
             heating_hours = 1800
             heat_demand_kwh = building_data['heat_load_kw'] * heating_hours
             
-            # Wärmepumpen-Stromverbrauch
-            hp_electricity_consumption = heat_demand_kwh / heatpump['scop']
+            # Wärmepumpen-Stromverbrauch über die simulierte Jahresarbeitszahl
+            spf = _simulated_spf(heatpump, building_data, heat_demand_kwh)
+            hp_electricity_consumption = heat_demand_kwh / spf
             
             # Kosten berechnen
             total_investment = heatpump['price'] + installation_cost - subsidy_amount
@@ -565,6 +563,7 @@ def render_economics_analysis(texts: Dict[str, str], heatpump_data: Dict[str, An
             
             # Ergebnisse anzeigen
             st.success(" Wirtschaftlichkeitsanalyse abgeschlossen!")
+            st.caption(f"Jahresarbeitszahl (Stundensimulation): {spf:.2f} • Strombedarf Wärmepumpe: {hp_electricity_consumption:,.0f} kWh/a")
             
             # KPIs
             col_kpi1, col_kpi2, col_kpi3, col_kpi4 = st.columns(4)
@@ -745,12 +744,23 @@ def render_pv_integration(texts: Dict[str, str], project_data: Dict[str, Any]) -
             help="Größerer Speicher = mehr Flexibilität"
         )
         
-        # Eigenverbrauchsquote WP
-        if hp_consumption > 0:
-            if smart_control_enabled:
-                pv_coverage_hp = min(0.8, pv_production_annual / hp_consumption)
-            else:
-                pv_coverage_hp = min(0.4, pv_production_annual / hp_consumption)
+        # Eigenverbrauchsquote WP aus der gekoppelten Stundenbilanz (PV + Haushalt + WP + Speicher)
+        dispatch_project = {
+            'project_details': project_data.get('project_details', {}) if isinstance(project_data, dict) else {},
+            'heatpump_data': heatpump_data,
+            'economics_data': economics_data,
+        }
+        dispatch_result = build_project_dispatch(
+            dispatch_project,
+            calc_results_ss,
+            thermal_buffer_liters=thermal_storage_size if smart_control_enabled else 0.0,
+        )
+        dispatch_summary = dispatch_result.summary() if dispatch_result is not None else None
+        if dispatch_summary and dispatch_summary['heatpump_kwh'] > 0:
+            pv_coverage_hp = dispatch_summary['heatpump_pv_share_percent'] / 100.0
+        elif hp_consumption > 0:
+            # Ohne PV-Monatswerte: grobe Abschätzung
+            pv_coverage_hp = min(0.8 if smart_control_enabled else 0.4, pv_production_annual / hp_consumption)
         else:
             pv_coverage_hp = 0.0
         
@@ -759,6 +769,12 @@ def render_pv_integration(texts: Dict[str, str], project_data: Dict[str, Any]) -
             f"{pv_coverage_hp * 100:.0f}%",
             help="Anteil des WP-Stroms aus PV"
         )
+        if dispatch_summary:
+            st.caption(
+                f"Stundenbilanz: Eigenverbrauch {dispatch_summary['self_consumption_rate_percent']:.0f}% · "
+                f"Autarkie {dispatch_summary['autarky_percent']:.0f}% · "
+                f"Netzbezug {dispatch_summary['grid_import_kwh']:,.0f} kWh"
+            )
     
     with col2:
         st.markdown("**Wirtschaftliche Auswirkung**")
@@ -787,47 +803,43 @@ def render_pv_integration(texts: Dict[str, str], project_data: Dict[str, Any]) -
         )
     
     # Lastprofil-Visualisierung
-    st.subheader(" Tages-Lastprofil (Beispiel)")
-    
-    # Dummy-Daten für Lastprofil
-    hours = list(range(24))
-    pv_generation = [0, 0, 0, 0, 0, 0, 10, 30, 50, 70, 85, 95, 100, 95, 85, 70, 50, 30, 10, 0, 0, 0, 0, 0]
-    hp_demand_normal = [30, 25, 20, 20, 25, 35, 45, 50, 40, 35, 30, 30, 30, 30, 35, 40, 50, 55, 50, 45, 40, 35, 30, 30]
-    
-    if smart_control_enabled:
-        # WP läuft bevorzugt bei PV-Überschuss
-        hp_demand_smart = [20, 15, 15, 15, 20, 25, 30, 40, 60, 80, 90, 95, 95, 90, 80, 60, 40, 35, 30, 25, 25, 20, 20, 20]
-    else:
-        hp_demand_smart = hp_demand_normal
-    
     fig_profile = go.Figure()
-    
-    # PV-Erzeugung
-    fig_profile.add_trace(go.Scatter(
-        x=hours,
-        y=pv_generation,
-        mode='lines',
-        name='PV-Erzeugung (%)',
-        fill='tozeroy',
-        line=dict(color='#f39c12', width=2)
-    ))
-    
-    # WP-Verbrauch
-    profile_name = "WP-Verbrauch (Smart)" if smart_control_enabled else "WP-Verbrauch (Normal)"
-    fig_profile.add_trace(go.Scatter(
-        x=hours,
-        y=hp_demand_smart,
-        mode='lines+markers',
-        name=profile_name,
-        line=dict(color='#e74c3c', width=2)
-    ))
-    
-    fig_profile.update_layout(
-        title="Tages-Lastprofil: PV-Erzeugung vs. Wärmepumpen-Verbrauch",
-        xaxis_title="Stunde",
-        yaxis_title="Relative Leistung (%)",
-        hovermode='x unified'
-    )
+    if dispatch_result is not None:
+        st.subheader(" Mittlerer Tagesverlauf (Stundenbilanz)")
+        month_label = st.radio("Monat", ["Januar", "April", "Juli"], horizontal=True, key="hp_pv_profile_month")
+        day = dispatch_result.average_day({"Januar": 1, "April": 4, "Juli": 7}[month_label])
+        hours = list(range(24))
+        fig_profile.add_trace(go.Scatter(x=hours, y=day['pv'], mode='lines', name='PV-Erzeugung (kW)',
+                                         fill='tozeroy', line=dict(color='#f39c12', width=2)))
+        fig_profile.add_trace(go.Scatter(x=hours, y=day['household'], mode='lines', name='Haushalt (kW)',
+                                         line=dict(color='#3498db', width=2)))
+        fig_profile.add_trace(go.Scatter(x=hours, y=day['heatpump'], mode='lines+markers', name='Wärmepumpe (kW)',
+                                         line=dict(color='#e74c3c', width=2)))
+        fig_profile.add_trace(go.Scatter(x=hours, y=day['grid_import'], mode='lines', name='Netzbezug (kW)',
+                                         line=dict(color='#7f8c8d', width=1, dash='dot')))
+        fig_profile.update_layout(
+            title=f"Mittlerer Tag im {month_label}: PV, Haushalt, Wärmepumpe, Netzbezug",
+            xaxis_title="Stunde",
+            yaxis_title="Leistung (kW)",
+            hovermode='x unified'
+        )
+    else:
+        st.subheader(" Tages-Lastprofil (Beispiel)")
+        hours = list(range(24))
+        pv_generation = [0, 0, 0, 0, 0, 0, 10, 30, 50, 70, 85, 95, 100, 95, 85, 70, 50, 30, 10, 0, 0, 0, 0, 0]
+        hp_demand_normal = [30, 25, 20, 20, 25, 35, 45, 50, 40, 35, 30, 30, 30, 30, 35, 40, 50, 55, 50, 45, 40, 35, 30, 30]
+        hp_demand_smart = [20, 15, 15, 15, 20, 25, 30, 40, 60, 80, 90, 95, 95, 90, 80, 60, 40, 35, 30, 25, 25, 20, 20, 20]
+        fig_profile.add_trace(go.Scatter(x=hours, y=pv_generation, mode='lines', name='PV-Erzeugung (%)',
+                                         fill='tozeroy', line=dict(color='#f39c12', width=2)))
+        profile_name = "WP-Verbrauch (Smart)" if smart_control_enabled else "WP-Verbrauch (Normal)"
+        fig_profile.add_trace(go.Scatter(x=hours, y=hp_demand_smart if smart_control_enabled else hp_demand_normal,
+                                         mode='lines+markers', name=profile_name, line=dict(color='#e74c3c', width=2)))
+        fig_profile.update_layout(
+            title="Tages-Lastprofil: PV-Erzeugung vs. Wärmepumpen-Verbrauch",
+            xaxis_title="Stunde",
+            yaxis_title="Relative Leistung (%)",
+            hovermode='x unified'
+        )
     
     st.plotly_chart(fig_profile, use_container_width=True)
     
@@ -837,7 +849,8 @@ def render_pv_integration(texts: Dict[str, str], project_data: Dict[str, Any]) -
         'annual_pv_savings_hp': annual_pv_savings_hp,
         'total_annual_savings': total_annual_savings,
         'smart_control_enabled': smart_control_enabled,
-        'thermal_storage_size': thermal_storage_size
+        'thermal_storage_size': thermal_storage_size,
+        'coupled_dispatch': dispatch_summary
     }
     
     st.session_state.integration_data = integration_data
@@ -858,16 +871,11 @@ def render_results_summary(texts: Dict[str, str]):
             if heat_load > 0:
                 sizing_factor = 1.0
                 required_kw = heat_load * sizing_factor
-                hp_db = get_heatpump_database()
+                catalog = get_heatpump_catalog_for_ui()
                 # Bevorzugt Luft-Wasser, dann kleinste ausreichende Leistung
-                candidates = [hp for hp in hp_db if hp.get('type') == 'Luft-Wasser-Wärmepumpe'] or hp_db
-                suitable = [hp for hp in candidates if float(hp.get('heating_power', 0) or 0) >= required_kw]
-                if suitable:
-                    suitable = sorted(suitable, key=lambda hp: float(hp.get('heating_power', 0) or 0))
-                    top = suitable[0]
-                else:
-                    candidates = sorted(candidates, key=lambda hp: abs(float(hp.get('heating_power', 0) or 0) - required_kw))
-                    top = candidates[0] if candidates else None
+                hp_type = 'Luft-Wasser-Wärmepumpe' if catalog.heatpumps('Luft-Wasser-Wärmepumpe') else None
+                matches = catalog.select(required_kw, hp_type)
+                top = matches[0] if matches else None
 
                 if top:
                     st.session_state.heatpump_data = {
@@ -898,7 +906,7 @@ def render_results_summary(texts: Dict[str, str]):
 
             heating_hours = int(building_data.get('consumption_inputs', {}).get('heating_hours', 1800) or 1800)
             heat_demand_kwh = building_data['heat_load_kw'] * heating_hours
-            hp_electricity_consumption = heat_demand_kwh / max(heatpump.get('scop', 3.5), 0.1)
+            hp_electricity_consumption = heat_demand_kwh / _simulated_spf(heatpump, building_data, heat_demand_kwh)
 
             total_investment = heatpump['price'] + installation_cost - subsidy_amount
             annual_hp_cost = (hp_electricity_consumption * electricity_price / 100) + maintenance_cost_annual
@@ -1200,6 +1208,26 @@ def render_components_offer_tab(texts: Dict[str, str]):
     colfinm2.metric("Monatsrate", f"{fin['monthly_rate']:,.0f} €")
     colfinm3.metric("Gesamtzinsen", f"{fin['total_interest']:,.0f} €")
 
+    with st.expander("Szenario-Vergleich (Förderung × Rabatt × Zins × Laufzeit)"):
+        from heatpump_pricing import calculate_scenario_matrix, scenario_matrix_table
+        cols_sc = st.columns(3)
+        with cols_sc[0]:
+            sc_terms = st.multiselect("Laufzeiten (Jahre)", [5, 8, 10, 12, 15, 20], default=[5, 10, 15, 20])
+        with cols_sc[1]:
+            sc_rates = st.multiselect("Zinssätze % p.a.", [1.5, 2.5, 3.0, 3.5, 4.5, 5.5], default=[2.5, 3.5, 4.5])
+        with cols_sc[2]:
+            sc_discounts = st.multiselect("Rabattstufen %", [0.0, 3.0, 5.0, 10.0], default=[0.0, 5.0])
+        if sc_terms and sc_rates and sc_discounts:
+            matrix = calculate_scenario_matrix(
+                base['base_total_net'], discounts_pct=sorted(set(sc_discounts)), interest_rates_pct=sc_rates,
+                terms_years=sc_terms, equity_amount=equity_amount, rabatt_abs=rabatt_abs,
+                zuschlag_pct=zuschlag_pct, zuschlag_abs=zuschlag_abs,
+            )
+            table = scenario_matrix_table(matrix, limit=None)
+            st.caption(f"{matrix['count']} Szenarien, sortiert nach Gesamtkosten")
+            st.dataframe(pd.DataFrame(table[1:], columns=table[0]), use_container_width=True, hide_index=True)
+            st.session_state['heatpump_scenario_table'] = table
+
     # Komplettes Angebotsobjekt im Session-State bereitstellen für PDF / Platzhalter
     try:
         from heatpump_pricing import build_full_heatpump_offer, extract_placeholders_from_offer
@@ -1214,50 +1242,78 @@ def render_components_offer_tab(texts: Dict[str, str]):
     if st.checkbox("Details anzeigen (Debug)"):
         st.json(st.session_state.get('heatpump_offer'))
 
+def _building_heat_profile(building_data: Dict[str, Any], annual_space_heat_kwh: float | None = None) -> HeatingDemandProfile:
+    """Stündliches Gebäudeprofil; Jahreswärmebedarf wie bisher über die Volllaststunden der Gebäudeanalyse."""
+    if annual_space_heat_kwh is None:
+        heating_hours = int(building_data.get('consumption_inputs', {}).get('heating_hours', 1800) or 1800)
+        annual_space_heat_kwh = float(building_data.get('heat_load_kw', 0) or 0) * heating_hours
+    return HeatingDemandProfile.from_building_data(building_data, annual_space_heat_kwh=annual_space_heat_kwh)
+
+def _simulated_spf(heatpump: Dict[str, Any], building_data: Dict[str, Any], heat_demand_kwh: float) -> float:
+    """Jahresarbeitszahl aus der Stundensimulation; SCOP als Rückfall."""
+    try:
+        result = simulate_heatpump(_building_heat_profile(building_data, heat_demand_kwh), HeatPumpUnit.from_product(heatpump))
+        if result.seasonal_performance_factor > 0:
+            return result.seasonal_performance_factor
+    except Exception as e:
+        print(f"Wärmepumpen-Simulation fehlgeschlagen: {e}")
+    return max(float(heatpump.get('scop', 3.5) or 3.5), 0.1)
+
+# Demo-Geräte, solange keine Wärmepumpen in der Produktdatenbank gepflegt sind
+_DEMO_HEATPUMPS: List[Dict[str, Any]] = [
+    {
+        'manufacturer': 'Vaillant',
+        'model': 'aroTHERM plus VWL 125/6 A',
+        'type': 'Luft-Wasser-Wärmepumpe',
+        'heating_power': 12.8,
+        'cop': 4.2,
+        'scop': 4.6,
+        'price': 15500,
+        'noise_level': 35,
+        'dimensions': '1.2 x 0.6 x 1.4 m',
+        'weight': 125,
+        'efficiency_class': 'A+++'
+    },
+    {
+        'manufacturer': 'Viessmann', 
+        'model': 'Vitocal 200-S AWO-E-AC 101.A08',
+        'type': 'Luft-Wasser-Wärmepumpe',
+        'heating_power': 8.1,
+        'cop': 4.1,
+        'scop': 4.4,
+        'price': 12800,
+        'noise_level': 37,
+        'dimensions': '1.1 x 0.6 x 1.3 m',
+        'weight': 110,
+        'efficiency_class': 'A++'
+    },
+    {
+        'manufacturer': 'Daikin',
+        'model': 'Altherma 3 H HT EPRA14DW1',
+        'type': 'Luft-Wasser-Wärmepumpe',
+        'heating_power': 14.5,
+        'cop': 3.8,
+        'scop': 4.2,
+        'price': 17200,
+        'noise_level': 39,
+        'dimensions': '1.3 x 0.7 x 1.5 m',
+        'weight': 145,
+        'efficiency_class': 'A++'
+    }
+]
+
+
+def get_heatpump_catalog_for_ui() -> "HeatPumpCatalog":
+    """Wärmepumpen-Katalog aus der Produktdatenbank, ohne gepflegte Geräte mit Demo-Daten."""
+    catalog = get_heatpump_catalog()
+    if catalog.heatpumps():
+        return catalog
+    return HeatPumpCatalog.from_heatpumps(_DEMO_HEATPUMPS)
+
+
 def get_heatpump_database() -> List[Dict[str, Any]]:
-    """Dummy-Wärmepumpen-Datenbank"""
-    
-    return [
-        {
-            'manufacturer': 'Vaillant',
-            'model': 'aroTHERM plus VWL 125/6 A',
-            'type': 'Luft-Wasser-Wärmepumpe',
-            'heating_power': 12.8,
-            'cop': 4.2,
-            'scop': 4.6,
-            'price': 15500,
-            'noise_level': 35,
-            'dimensions': '1.2 x 0.6 x 1.4 m',
-            'weight': 125,
-            'efficiency_class': 'A+++'
-        },
-        {
-            'manufacturer': 'Viessmann', 
-            'model': 'Vitocal 200-S AWO-E-AC 101.A08',
-            'type': 'Luft-Wasser-Wärmepumpe',
-            'heating_power': 8.1,
-            'cop': 4.1,
-            'scop': 4.4,
-            'price': 12800,
-            'noise_level': 37,
-            'dimensions': '1.1 x 0.6 x 1.3 m',
-            'weight': 110,
-            'efficiency_class': 'A++'
-        },
-        {
-            'manufacturer': 'Daikin',
-            'model': 'Altherma 3 H HT EPRA14DW1',
-            'type': 'Luft-Wasser-Wärmepumpe',
-            'heating_power': 14.5,
-            'cop': 3.8,
-            'scop': 4.2,
-            'price': 17200,
-            'noise_level': 39,
-            'dimensions': '1.3 x 0.7 x 1.5 m',
-            'weight': 145,
-            'efficiency_class': 'A++'
-        }
-    ]
+    """Alle Wärmepumpen (Produktdatenbank bzw. Demo-Daten), aufsteigend nach Heizleistung."""
+    return get_heatpump_catalog_for_ui().heatpumps()
 
 # Haupt-Export-Funktion
 def show_heatpump_analysis(texts: Dict[str, str], project_data: Dict[str, Any] = None):
@@ -1,6 +1,10 @@
 # locales.py
 import json
 import os
+import re
+import string
+import threading
+import time
 from typing import Dict, List, Optional, Tuple
 
 # Importiere die globale Fehlerliste aus app_status.py
@@ -12,54 +16,145 @@ except ImportError:
     global_import_errors: List[str] = []
 
 
-# Funktion zum Laden der Übersetzungen
-def load_translations(lang_code: str = 'de') -> Optional[Dict[str, str]]:
-    """Lädt Übersetzungsdaten aus einer JSON-Datei für den gegebenen Sprachcode."""
-    # KORREKTUR: `global_import_errors` ist jetzt direkt verfügbar, kein erneuter Import von `gui` nötig.
-    # from gui import import_errors as global_import_errors # Entfernt
-
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(current_dir, f"{lang_code}.json")
-    default_texts = {
-        "app_title": "Ömers Solar Kakerlake",
-        "error_loading_translations": "Fehler beim Laden der Übersetzungen.",
-        "language_file_not_found": "Sprachdatei nicht gefunden: {filepath}",
-        # Füge hier weitere absolut notwendige Fallback-Texte hinzu,
-        # die benötigt werden, BEVOR die Haupt-TEXTS-Variable in gui.py gefüllt ist.
-    }
-
-    try:
-        if not os.path.exists(file_path):
-            error_msg = default_texts["language_file_not_found"].format(filepath=file_path)
-            print(f"LOCALES FEHLER: {error_msg}")
-            if global_import_errors is not None: # Sicherstellen, dass die Liste existiert
-                global_import_errors.append(error_msg)
-            return default_texts
-
-        with open(file_path, 'r', encoding='utf-8') as f:
-            texts = json.load(f)
-            if not isinstance(texts, dict):
-                raise ValueError("Übersetzungsdatei hat kein Dictionary-Format.")
-            # print(f"LOCALES INFO: Übersetzungen für '{lang_code}' erfolgreich geladen aus {file_path}")
-            return texts
-    except FileNotFoundError: # Sollte durch obigen Check abgedeckt sein, aber zur Sicherheit
-        error_msg = default_texts["language_file_not_found"].format(filepath=file_path)
-        print(f"LOCALES FEHLER: {error_msg}")
-        if global_import_errors is not None:
-           global_import_errors.append(error_msg)
-        return default_texts
-    except json.JSONDecodeError as e_json:
-        error_msg = f"JSON-Dekodierungsfehler in {file_path}: {e_json}"
-        print(f"LOCALES FEHLER: {error_msg}")
-        if global_import_errors is not None:
-           global_import_errors.append(error_msg)
-        return default_texts
-    except Exception as e:
-        error_msg = f"Allgemeiner Fehler beim Laden von {file_path}: {e}"
+LOCALES_DIR = os.path.dirname(os.path.abspath(__file__))
+# Abstand der mtime-Prüfungen; dazwischen beantworten Lookups rein aus dem Speicher
+RELOAD_CHECK_INTERVAL_S = 2.0
+
+_DEFAULT_TEXTS = {
+    "app_title": "Ömers Solar Kakerlake",
+    "error_loading_translations": "Fehler beim Laden der Übersetzungen.",
+    "language_file_not_found": "Sprachdatei nicht gefunden: {filepath}",
+    # Füge hier weitere absolut notwendige Fallback-Texte hinzu,
+    # die benötigt werden, BEVOR die Haupt-TEXTS-Variable in gui.py gefüllt ist.
+}
+
+_FORMATTER = string.Formatter()
+
+
+class FormatTemplate:
+    """Vorab geparster Text mit Platzhaltern ({name}); rendert nur, wenn alle Felder übergeben wurden."""
+
+    __slots__ = ("text", "fields")
+
+    def __init__(self, text: str):
+        self.text = text
+        try:
+            names = [field for _, field, _, _ in _FORMATTER.parse(text) if field is not None]
+            # "{a.b}" / "{a[0]}" -> Wurzelname; "{}" (positionsbezogen) ist mit kwargs nicht befüllbar
+            self.fields: Optional[frozenset] = frozenset(re.split(r"[.\[]", n, 1)[0] for n in names)
+        except ValueError:  # unbalancierte Klammern -> Text unverändert zurückgeben
+            self.fields = None
+
+    def render(self, kwargs: Dict[str, object]) -> str:
+        if not kwargs or self.fields is None or not self.fields.issubset(kwargs):
+            return self.text
+        try:
+            return self.text.format(**kwargs)
+        except (KeyError, ValueError, IndexError, AttributeError):
+            return self.text
+
+
+class TranslationTable:
+    """
+    Prozessweite Übersetzungstabelle einer Sprache: einmal geladen, neu geladen nur bei geänderter
+    mtime der JSON-Datei (geprüft höchstens alle RELOAD_CHECK_INTERVAL_S). Texte mit Platzhaltern
+    liegen als FormatTemplate vor; angefragte, aber fehlende Schlüssel werden gezählt.
+    """
+
+    def __init__(self, lang_code: str = 'de', directory: Optional[str] = None):
+        self.lang_code = lang_code
+        self.file_path = os.path.join(directory or LOCALES_DIR, f"{lang_code}.json")
+        self.texts: Dict[str, str] = {}
+        self._templates: Dict[str, FormatTemplate] = {}
+        self._mtime: Optional[float] = None
+        self._loaded = False
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.missing: Dict[str, int] = {}
+        self.loads = 0
+
+    def _stat_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.file_path).st_mtime
+        except OSError:
+            return None
+
+    def _report(self, error_msg: str) -> None:
         print(f"LOCALES FEHLER: {error_msg}")
-        if global_import_errors is not None:
+        if global_import_errors is not None:  # Sicherstellen, dass die Liste existiert
             global_import_errors.append(error_msg)
-        return default_texts
+
+    def _load(self, mtime: Optional[float]) -> None:
+        texts: Dict[str, str] = dict(_DEFAULT_TEXTS)
+        if mtime is None:
+            self._report(_DEFAULT_TEXTS["language_file_not_found"].format(filepath=self.file_path))
+        else:
+            try:
+                with open(self.file_path, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+                if not isinstance(loaded, dict):
+                    raise ValueError("Übersetzungsdatei hat kein Dictionary-Format.")
+                texts = loaded
+            except json.JSONDecodeError as e_json:
+                self._report(f"JSON-Dekodierungsfehler in {self.file_path}: {e_json}")
+            except Exception as e:
+                self._report(f"Allgemeiner Fehler beim Laden von {self.file_path}: {e}")
+        self.texts = texts
+        self._templates = {k: FormatTemplate(v) for k, v in texts.items() if isinstance(v, str) and "{" in v}
+        self._mtime = mtime
+        self._loaded = True
+        self.loads += 1
+
+    def refresh(self, force: bool = False) -> None:
+        """Lädt die Datei (neu), falls noch nicht geladen, erzwungen oder die mtime sich geändert hat."""
+        now = time.monotonic()
+        if self._loaded and not force and now < self._next_check:
+            return
+        with self._lock:
+            if self._loaded and not force and now < self._next_check:
+                return
+            mtime = self._stat_mtime()
+            if force or not self._loaded or mtime != self._mtime:
+                self._load(mtime)
+            self._next_check = now + RELOAD_CHECK_INTERVAL_S
+
+    def get(self, key: str, fallback: Optional[str] = None, **kwargs) -> str:
+        self.refresh()
+        text = self.texts.get(key)
+        if text is None:
+            self.missing[key] = self.missing.get(key, 0) + 1
+            text = fallback or key
+            return FormatTemplate(text).render(kwargs) if kwargs and "{" in text else text
+        template = self._templates.get(key)
+        if template is None:
+            return text
+        return template.render(kwargs)
+
+    def missing_keys(self) -> Dict[str, int]:
+        """Angefragte, aber nicht vorhandene Schlüssel mit Anzahl der Anfragen."""
+        return dict(sorted(self.missing.items(), key=lambda kv: (-kv[1], kv[0])))
+
+
+_tables: Dict[Tuple[str, str], TranslationTable] = {}
+_tables_lock = threading.Lock()
+
+
+def get_translation_table(lang_code: str = 'de', directory: Optional[str] = None) -> TranslationTable:
+    """Prozessweite Tabelle je Sprache (und Verzeichnis)."""
+    key = (lang_code, directory or LOCALES_DIR)
+    table = _tables.get(key)
+    if table is None:
+        with _tables_lock:
+            table = _tables.setdefault(key, TranslationTable(lang_code, directory))
+    table.refresh()
+    return table
+
+
+# Funktion zum Laden der Übersetzungen
+def load_translations(lang_code: str = 'de') -> Optional[Dict[str, str]]:
+    """Übersetzungsdaten für den gegebenen Sprachcode (Kopie der gecachten Tabelle, Fallback-Texte bei Fehlern)."""
+    return dict(get_translation_table(lang_code).texts)
+
 
 def get_text(key: str, locale: str = 'de', fallback: str = None, **kwargs) -> str:
     """
@@ -74,17 +169,12 @@ def get_text(key: str, locale: str = 'de', fallback: str = None, **kwargs) -> st
     Returns:
         str: Übersetzter oder Fallback-Text
     """
-    # Lade Übersetzungen
-    translations = load_translations(locale)
-    
-    # Hol den Text oder verwende Fallback
-    text = translations.get(key, fallback or key)
-    
-    # Formatiere mit kwargs wenn vorhanden
-    try:
-        return text.format(**kwargs) if kwargs else text
-    except (KeyError, ValueError):
-        return text
+    return get_translation_table(locale).get(key, fallback, **kwargs)
+
+
+def report_missing_keys(locale: str = 'de') -> Dict[str, int]:
+    """Fehlende Schlüssel seit Prozessstart (z. B. für die Admin-Ansicht oder Tests)."""
+    return get_translation_table(locale).missing_keys()
 
 if __name__ == '__main__':
     # Testen der Ladefunktion
@@ -44,6 +44,12 @@ except ImportError as e:
     # Fallback für PDF_OUTPUT_DIRECTORY
     PDF_OUTPUT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "pdf_output")
 
+try:
+    # Firmenunabhängige Template-Seitenebenen einmal je Kunde rendern
+    from pdf_template_engine import OverlayLayerCache
+except ImportError:
+    OverlayLayerCache = None
+
 
 def get_text_mog(key: str, fallback: str) -> str:
     """Hilfsfunktion für Texte"""
@@ -703,6 +709,10 @@ class MultiCompanyOfferGenerator:
                 
                 generated_pdfs = []
                 total_companies = len(selected_companies)
+                # Ein Ebenen-Cache je Kunde/Lauf: identische Seitenanteile werden für alle Firmen wiederverwendet.
+                # Greift nur im Template-Pfad (reine Wärmepumpen-Angebote); PV-Angebote laufen über den
+                # Legacy-Generator ohne Template-Seiten und erhalten den Cache daher nicht.
+                self._overlay_layer_cache = OverlayLayerCache() if OverlayLayerCache is not None else None
                 
                 for i, company_id in enumerate(selected_companies):
                     company_name = f"Firma_{company_id}"  # Fallback-Name sofort setzen
@@ -1253,6 +1263,8 @@ class MultiCompanyOfferGenerator:
                 settings.get('selected_inverter_id')
             )
             
+            use_main_templates = has_heatpump and not has_pv
+
             # PDF-Generierung über generate_offer_pdf mit allen 16 erforderlichen Parametern
             if callable(generate_offer_pdf):
                   # Vorbereitung der Berechnungsergebnisse - ECHTE DATEN verwenden!
@@ -1413,7 +1425,8 @@ class MultiCompanyOfferGenerator:
                     db_list_company_documents_func=list_company_documents if callable(list_company_documents) else lambda cid, dtype=None: [],
                     active_company_id=company.get("id", 1),
                     # Template-System: Für Wärmepumpen aktiviert (HP-Templates), sonst deaktiviert
-                    disable_main_template_combiner=not (has_heatpump and not has_pv)
+                    disable_main_template_combiner=not use_main_templates,
+                    overlay_layer_cache=getattr(self, "_overlay_layer_cache", None) if use_main_templates else None,
                 )
                 return pdf_content
             else:
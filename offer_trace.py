@@ -0,0 +1,279 @@
+# offer_trace.py
+"""
+Leichtgewichtiges Tracing für die Angebotserstellung.
+
+- span(name, **attrs) ist ein Context-Manager; verschachtelte Spans bilden einen Baum.
+  Ein Span ohne Eltern-Span ist die Wurzel eines Traces.
+- Je Span werden Dauer, Anzahl DB-Abfragen (über database.get_db_connection) und
+  erzeugte Bytes (add_bytes) erfasst.
+- Aufgezeichnet werden nur Traces, deren Wurzel ein Einstiegspunkt der Angebotserstellung ist
+  (ENTRY_POINTS, z. B. über traced(entry_point=True)); andere Wurzeln (einzelne build_dynamic_data-
+  oder perform_calculations-Aufrufe bei jedem Streamlit-Rerun) werden nur gemessen.
+- Abgeschlossene Traces landen im Speicher (letzte MAX_RECENT_TRACES) und als eine JSON-Zeile je
+  Trace in data/offer_traces.jsonl (rotiert ab LOG_MAX_BYTES). OFFER_TRACE_LOG setzt einen anderen
+  Pfad; leer oder "0" schaltet das Datei-Log ab.
+
+Abschalten mit OFFER_TRACE=0.
+Spans folgen contextvars; Threads eines Pools starten eigene Traces.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set
+
+DEFAULT_TRACE_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "offer_traces.jsonl")
+
+
+def trace_log_path_from_env() -> str:
+    """Pfad des JSONL-Logs: OFFER_TRACE_LOG überschreibt den Standard, leer oder "0" schaltet ab."""
+    value = os.environ.get("OFFER_TRACE_LOG")
+    if value is None:
+        return DEFAULT_TRACE_LOG_PATH
+    value = value.strip()
+    return "" if value.lower() in {"", "0", "false", "no", "off"} else value
+
+
+TRACE_LOG_PATH = trace_log_path_from_env()
+LOG_MAX_BYTES = 5 * 1024 * 1024
+MAX_RECENT_TRACES = 50
+
+_enabled = os.environ.get("OFFER_TRACE", "1").lower() not in {"0", "false", "no", "off"}
+_current: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("offer_trace_span", default=None)
+_recent: Deque[Dict[str, Any]] = deque(maxlen=MAX_RECENT_TRACES)
+_log_lock = threading.Lock()
+# Wurzel-Spans, die als Trace aufgezeichnet werden (ergänzt durch traced(entry_point=True))
+ENTRY_POINTS: Set[str] = set()
+
+
+class Span:
+    """Ein gemessener Abschnitt; db_queries und bytes_out zählen nur den Span selbst."""
+
+    __slots__ = ("name", "attrs", "started", "duration_ms", "db_queries", "bytes_out", "children", "error")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self.started = time.perf_counter()
+        self.duration_ms = 0.0
+        self.db_queries = 0
+        self.bytes_out = 0
+        self.children: List["Span"] = []
+        self.error: Optional[str] = None
+
+    def add_bytes(self, data: Any) -> None:
+        """Zählt erzeugte Bytes (bytes-Objekt oder Anzahl)."""
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            self.bytes_out += len(data)
+        elif isinstance(data, int):
+            self.bytes_out += data
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def total_db_queries(self) -> int:
+        return self.db_queries + sum(child.total_db_queries() for child in self.children)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "name": self.name,
+            "duration_ms": round(self.duration_ms, 3),
+            "db_queries": self.total_db_queries(),
+            "bytes_out": self.bytes_out,
+        }
+        if self.attrs:
+            data["attrs"] = self.attrs
+        if self.error:
+            data["error"] = self.error
+        if self.children:
+            data["children"] = [child.to_dict() for child in self.children]
+        return data
+
+
+class _NullSpan:
+    """Ersatz bei abgeschaltetem Tracing (gleiche Schnittstelle, keine Wirkung)."""
+
+    def add_bytes(self, data: Any) -> None:
+        pass
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(enabled: bool) -> None:
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Any]:
+    """Misst den umschlossenen Block als Span (Wurzel-Span -> kompletter Trace wird protokolliert)."""
+    if not _enabled:
+        yield _NULL_SPAN
+        return
+    parent = _current.get()
+    node = Span(name, attrs)
+    token = _current.set(node)
+    try:
+        yield node
+    except BaseException as e:
+        node.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        node.duration_ms = (time.perf_counter() - node.started) * 1000.0
+        _current.reset(token)
+        if parent is not None:
+            parent.children.append(node)
+        else:
+            _finish_trace(node)
+
+
+def traced(name: Optional[str] = None, entry_point: bool = False) -> Callable:
+    """Decorator: ganze Funktion als Span messen (bytes-Rückgabewerte zählen als erzeugte Bytes).
+
+    entry_point=True: als Wurzel aufgerufen wird der Trace aufgezeichnet (ENTRY_POINTS).
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+        if entry_point:
+            ENTRY_POINTS.add(span_name)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name) as node:
+                result = func(*args, **kwargs)
+                if isinstance(result, (bytes, bytearray)):
+                    node.add_bytes(result)
+                return result
+        return wrapper
+    return decorator
+
+
+def add_bytes(data: Any) -> None:
+    """Bytes dem aktuellen Span zurechnen (ohne aktiven Span wirkungslos)."""
+    node = _current.get()
+    if node is not None:
+        node.add_bytes(data)
+
+
+def count_db_query(_statement: str = "") -> None:
+    """sqlite3-Trace-Callback: eine ausgeführte Anweisung dem aktuellen Span zurechnen."""
+    node = _current.get()
+    if node is not None:
+        node.db_queries += 1
+
+
+def _finish_trace(root: Span) -> None:
+    if root.name not in ENTRY_POINTS:
+        return
+    record = {"timestamp": datetime.now().isoformat(timespec="seconds"), "pid": os.getpid()}
+    record.update(root.to_dict())
+    _recent.append(record)
+    _write_log(record)
+
+
+def _write_log(record: Dict[str, Any]) -> None:
+    if not TRACE_LOG_PATH:
+        return
+    try:
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with _log_lock:
+            os.makedirs(os.path.dirname(TRACE_LOG_PATH) or ".", exist_ok=True)
+            if os.path.exists(TRACE_LOG_PATH) and os.path.getsize(TRACE_LOG_PATH) > LOG_MAX_BYTES:
+                os.replace(TRACE_LOG_PATH, TRACE_LOG_PATH + ".1")
+            with open(TRACE_LOG_PATH, "a", encoding="utf-8") as fh:
+                fh.write(line)
+    except Exception as e:
+        print(f"Trace-Log konnte nicht geschrieben werden: {e}")
+
+
+def recent_traces() -> List[Dict[str, Any]]:
+    """Zuletzt abgeschlossene Traces dieses Prozesses (neueste zuerst)."""
+    return list(reversed(_recent))
+
+
+def load_logged_traces(limit: int = 200, path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Letzte `limit` Traces aus dem JSONL-Log (neueste zuerst, auch aus anderen Prozessen)."""
+    log_path = path or TRACE_LOG_PATH
+    if not log_path or not os.path.exists(log_path):
+        return []
+    with open(log_path, "r", encoding="utf-8") as fh:
+        lines = deque(fh, maxlen=limit)
+    traces = []
+    for line in reversed(lines):
+        try:
+            traces.append(json.loads(line))
+        except ValueError:
+            continue
+    return traces
+
+
+def flatten_trace(trace: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Trace-Baum als Zeilen (Pfad, Dauer, DB-Abfragen, Bytes) für Tabellen."""
+    rows: List[Dict[str, Any]] = []
+
+    def walk(node: Dict[str, Any], prefix: str, depth: int) -> None:
+        path = f"{prefix}/{node['name']}" if prefix else node["name"]
+        rows.append({
+            "stage": path,
+            "depth": depth,
+            "duration_ms": node.get("duration_ms", 0.0),
+            "db_queries": node.get("db_queries", 0),
+            "bytes_out": node.get("bytes_out", 0),
+        })
+        for child in node.get("children", []):
+            walk(child, path, depth + 1)
+
+    walk(trace, "", 0)
+    return rows
+
+
+def summarize_stages(traces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Kennzahlen je Stufe (Span-Name) über mehrere Traces, langsamste Stufe zuerst."""
+    stats: Dict[str, Dict[str, Any]] = {}
+
+    def walk(node: Dict[str, Any]) -> None:
+        entry = stats.setdefault(node["name"], {"stage": node["name"], "runs": 0, "total_ms": 0.0,
+                                                "max_ms": 0.0, "db_queries": 0, "bytes_out": 0})
+        duration = float(node.get("duration_ms", 0.0))
+        entry["runs"] += 1
+        entry["total_ms"] += duration
+        entry["max_ms"] = max(entry["max_ms"], duration)
+        # db_queries ist inklusiv; für die Stufe zählen nur die eigenen Abfragen
+        entry["db_queries"] += int(node.get("db_queries", 0)) - sum(int(c.get("db_queries", 0)) for c in node.get("children", []))
+        entry["bytes_out"] += int(node.get("bytes_out", 0))
+        for child in node.get("children", []):
+            walk(child)
+
+    for trace in traces:
+        walk(trace)
+    rows = []
+    for entry in stats.values():
+        runs = entry["runs"]
+        rows.append({
+            "stage": entry["stage"],
+            "runs": runs,
+            "avg_ms": round(entry["total_ms"] / runs, 1),
+            "max_ms": round(entry["max_ms"], 1),
+            "avg_db_queries": round(entry["db_queries"] / runs, 1),
+            "avg_kb_out": round(entry["bytes_out"] / runs / 1024, 1),
+        })
+    rows.sort(key=lambda r: r["avg_ms"] * r["runs"], reverse=True)
+    return rows
@@ -0,0 +1,189 @@
+# pdf_chart_registry.py
+"""
+Headless Diagramm-Pipeline für die PDF-Erstellung.
+
+Jeder Diagramm-Schlüssel (z. B. "monthly_prod_cons_chart_bytes") ist einem reinen
+Builder builder(results, viz_settings) zugeordnet, der ohne Streamlit läuft und ein
+reportlab-Drawing (Vektor) oder PNG-Bytes liefert. Der PDF-Generator ruft die Builder
+nur für die ausgewählten Diagramme auf; Ergebnisse werden über einen Digest der
+gelesenen Eingabewerte gecacht, sodass UI, Einzel-PDF und Multi-Angebots-Batch
+dieselben Diagramme liefern und nicht gewählte Diagramme nichts kosten.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from offer_trace import span
+from pdf_vector_charts import VECTOR_CHART_BUILDERS
+
+CHART_CACHE_SIZE = 128
+
+
+@dataclass(frozen=True)
+class ChartSpec:
+    """Registrierter Diagramm-Builder.
+
+    inputs: Schlüssel aus den Analyseergebnissen, die der Builder liest (bilden den Cache-Digest).
+    kind: "vector" (reportlab Drawing) oder "png" (Bytes, z. B. Plotly/Kaleido).
+    uses_viz_settings: viz_settings fließen in Darstellung und Digest ein.
+    """
+    key: str
+    builder: Callable[[Dict[str, Any], Dict[str, Any]], Any]
+    inputs: Tuple[str, ...]
+    kind: str = "vector"
+    uses_viz_settings: bool = False
+
+
+CHART_REGISTRY: Dict[str, ChartSpec] = {}
+
+
+def register_chart(key: str, inputs: Iterable[str], kind: str = "vector",
+                   uses_viz_settings: bool = False) -> Callable:
+    """Decorator: registriert builder(results, viz_settings) für den Diagramm-Schlüssel `key`."""
+    def _decorator(builder: Callable[[Dict[str, Any], Dict[str, Any]], Any]) -> Callable:
+        CHART_REGISTRY[key] = ChartSpec(key, builder, tuple(inputs), kind, uses_viz_settings)
+        return builder
+    return _decorator
+
+
+def input_digest(spec: ChartSpec, results: Dict[str, Any], viz_settings: Optional[Dict[str, Any]] = None) -> str:
+    """SHA-256 über die vom Builder gelesenen Eingaben (und ggf. viz_settings)."""
+    payload = {"inputs": {k: results.get(k) for k in spec.inputs}}
+    if spec.uses_viz_settings:
+        payload["viz"] = viz_settings or {}
+    raw = json.dumps(payload, sort_keys=True, default=repr, ensure_ascii=False)
+    return hashlib.sha256(f"{spec.key}|{raw}".encode("utf-8")).hexdigest()
+
+
+class ChartCache:
+    """Kleiner LRU-Cache Digest -> Diagramm-Artefakt (thread-sicher, für Batch-Läufe geteilt)."""
+
+    def __init__(self, max_entries: int = CHART_CACHE_SIZE):
+        self._max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, digest: str, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            if digest in self._entries:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return self._entries[digest]
+            self.misses += 1
+        artifact = build()
+        if artifact is not None:
+            with self._lock:
+                self._entries[digest] = artifact
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return artifact
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_default_cache = ChartCache()
+
+
+def build_chart(chart_key: str, results: Dict[str, Any], viz_settings: Optional[Dict[str, Any]] = None,
+                cache: Optional[ChartCache] = None) -> Any:
+    """Erzeugt das Diagramm für chart_key headless (None, wenn nicht registriert oder keine Daten)."""
+    spec = CHART_REGISTRY.get(chart_key)
+    if spec is None or not isinstance(results, dict):
+        return None
+    cache = cache or _default_cache
+    viz_settings = viz_settings or {}
+
+    def _build() -> Any:
+        try:
+            return spec.builder(results, viz_settings)
+        except Exception as e:
+            print(f"Diagramm {chart_key} konnte nicht erzeugt werden: {e}")
+            return None
+
+    with span("chart_export", chart=chart_key) as trace_node:
+        artifact = cache.get_or_build(input_digest(spec, results, viz_settings), _build)
+        trace_node.add_bytes(artifact if isinstance(artifact, bytes) else 0)
+        return artifact
+
+
+def build_selected_charts(selected_keys: Iterable[str], results: Dict[str, Any],
+                          viz_settings: Optional[Dict[str, Any]] = None,
+                          cache: Optional[ChartCache] = None) -> Dict[str, Any]:
+    """Baut nur die ausgewählten, registrierten Diagramme; nicht gewählte kosten nichts."""
+    charts: Dict[str, Any] = {}
+    for key in selected_keys:
+        artifact = build_chart(key, results, viz_settings, cache)
+        if artifact is not None:
+            charts[key] = artifact
+    return charts
+
+
+# --- Vektor-Diagramme (pdf_vector_charts) ---
+_VECTOR_INPUTS: Dict[str, Tuple[str, ...]] = {
+    "monthly_prod_cons_chart_bytes": ("monthly_productions_sim", "monthly_consumption_sim"),
+    "cost_projection_chart_bytes": ("annual_costs_hochrechnung_values",),
+    "cumulative_cashflow_chart_bytes": ("cumulative_cash_flows_sim",),
+    "consumption_coverage_pie_chart_bytes": ("self_supply_rate_percent", "total_consumption_kwh_yr"),
+    "pv_usage_pie_chart_bytes": ("direktverbrauch_anteil_pv_produktion_pct",
+                                 "speichernutzung_anteil_pv_produktion_pct", "annual_pv_production_kwh"),
+    "co2_savings_chart_bytes": ("annual_co2_savings_kg", "simulation_period_years_effective"),
+}
+
+for _key, _vector_builder in VECTOR_CHART_BUILDERS.items():
+    register_chart(_key, _VECTOR_INPUTS[_key])(
+        lambda results, viz_settings, _b=_vector_builder: _b(results)
+    )
+
+
+# --- Plotly-Diagramme der Analyse-Umschalter (reine Figure-Builder, PNG über Kaleido) ---
+_SWITCHER_INPUTS: Dict[str, Tuple[str, ...]] = {
+    "daily_production_switcher_chart_bytes": ("anlage_kwp",),
+    "weekly_production_switcher_chart_bytes": ("anlage_kwp",),
+    "yearly_production_switcher_chart_bytes": ("monthly_productions_sim", "anlage_kwp"),
+    "project_roi_matrix_switcher_chart_bytes": ("total_investment_netto", "annual_financial_benefit_year1"),
+    "feed_in_revenue_switcher_chart_bytes": ("monthly_feed_in_kwh", "einspeiseverguetung_eur_per_kwh", "anlage_kwp"),
+    "prod_vs_cons_switcher_chart_bytes": ("monthly_consumption_sim", "monthly_productions_sim", "anlage_kwp"),
+    "tariff_cube_switcher_chart_bytes": ("aktueller_strompreis_fuer_hochrechnung_euro_kwh", "lcoe_euro_per_kwh",
+                                         "total_consumption_kwh_yr"),
+    "co2_savings_value_switcher_chart_bytes": ("simulation_period_years_effective", "annual_productions_sim"),
+    "investment_value_switcher_chart_bytes": ("total_investment_netto", "annual_benefits_sim",
+                                              "simulation_period_years_effective",
+                                              "cost_storage_aufpreis_product_db_netto"),
+    "storage_effect_switcher_chart_bytes": ("selected_storage_storage_power_kw", "include_storage",
+                                            "total_consumption_kwh_yr",
+                                            "aktueller_strompreis_fuer_hochrechnung_euro_kwh"),
+    "selfuse_stack_switcher_chart_bytes": ("simulation_period_years_effective", "annual_productions_sim",
+                                           "monthly_direct_self_consumption_kwh",
+                                           "monthly_storage_discharge_for_sc_kwh", "monthly_feed_in_kwh",
+                                           "annual_pv_production_kwh"),
+    "cost_growth_switcher_chart_bytes": ("simulation_period_years_effective",
+                                         "aktueller_strompreis_fuer_hochrechnung_euro_kwh",
+                                         "electricity_price_increase_rate_effective_percent"),
+    "selfuse_ratio_switcher_chart_bytes": ("monthly_consumption_sim", "monthly_direct_self_consumption_kwh",
+                                           "monthly_storage_discharge_for_sc_kwh"),
+    "roi_comparison_switcher_chart_bytes": ("total_investment_netto", "annual_financial_benefit_year1"),
+    "scenario_comparison_switcher_chart_bytes": ("total_investment_netto", "annual_benefits_sim", "one_time_bonus_eur"),
+    "tariff_comparison_switcher_chart_bytes": ("monthly_consumption_sim", "monthly_grid_bezug_kwh",
+                                               "aktueller_strompreis_fuer_hochrechnung_euro_kwh"),
+    "income_projection_switcher_chart_bytes": ("simulation_period_years_effective", "annual_benefits_sim"),
+}
+
+
+def _switcher_png(chart_key: str, results: Dict[str, Any], viz_settings: Dict[str, Any]) -> Optional[bytes]:
+    from analysis import build_switcher_chart_figure, _export_plotly_fig_to_bytes
+    fig = build_switcher_chart_figure(chart_key, results, {}, viz_settings)
+    return _export_plotly_fig_to_bytes(fig, {})
+
+
+for _key, _inputs in _SWITCHER_INPUTS.items():
+    register_chart(_key, _inputs, kind="png", uses_viz_settings=True)(
+        lambda results, viz_settings, _k=_key: _switcher_png(_k, results, viz_settings)
+    )
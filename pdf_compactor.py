@@ -0,0 +1,163 @@
+# pdf_compactor.py
+"""
+Kompakter PDF-Ausgabemodus für Angebote.
+
+Nach dem Zusammenbau wird die fertige PDF optimiert:
+- identische Bild-/Font-XObjects und sonstige Objekte werden dedupliziert
+- Bilder oberhalb der Ziel-DPI werden heruntergerechnet und neu komprimiert
+- eingebettete Fonts werden auf die verwendeten Glyphen reduziert
+- Content-Streams werden komprimiert und Objekt-Streams aktiviert
+
+Backend ist PyMuPDF; ohne PyMuPDF wird mit pypdf nur dedupliziert und komprimiert.
+Die Einstellungen stehen im Admin-Setting "pdf_output_optimization" (Standard + je Firma).
+"""
+
+import io
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import pymupdf as fitz  # PyMuPDF (ältere Versionen nur als "fitz")
+    _FITZ_AVAILABLE = True
+except ImportError:
+    try:
+        import fitz
+        _FITZ_AVAILABLE = True
+    except ImportError:
+        fitz = None
+        _FITZ_AVAILABLE = False
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    _PYPDF_AVAILABLE = True
+except ImportError:
+    _PYPDF_AVAILABLE = False
+
+PDF_OPTIMIZATION_SETTING_KEY = "pdf_output_optimization"
+
+PDF_OPTIMIZATION_DEFAULTS: Dict[str, Any] = {
+    "enabled": False,
+    "target_dpi": 150,
+    "jpeg_quality": 80,
+    "subset_fonts": True,
+}
+
+
+@dataclass
+class CompactionReport:
+    """Ergebnis einer Optimierung (Größen in Bytes)."""
+    original_size: int
+    compacted_size: int
+    duration_s: float
+    backend: str
+
+    @property
+    def saved_bytes(self) -> int:
+        return max(0, self.original_size - self.compacted_size)
+
+    @property
+    def saved_percent(self) -> float:
+        return 100.0 * self.saved_bytes / self.original_size if self.original_size else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.original_size / 1024:.1f} KB -> {self.compacted_size / 1024:.1f} KB "
+                f"(-{self.saved_percent:.1f} %, {self.backend}, {self.duration_s * 1000:.0f} ms)")
+
+
+def optimization_settings_for_company(load_admin_setting_func: Callable, company_id: Optional[int]) -> Dict[str, Any]:
+    """Effektive Einstellungen: Defaults <- Setting "default" <- Setting "companies"[<id>]."""
+    settings = dict(PDF_OPTIMIZATION_DEFAULTS)
+    try:
+        stored = load_admin_setting_func(PDF_OPTIMIZATION_SETTING_KEY, {}) or {}
+    except Exception:
+        stored = {}
+    if not isinstance(stored, dict):
+        return settings
+    settings.update(stored.get("default") or {})
+    if company_id is not None:
+        settings.update((stored.get("companies") or {}).get(str(company_id)) or {})
+    return settings
+
+
+def _compact_with_fitz(pdf_bytes: bytes, target_dpi: int, jpeg_quality: int, subset_fonts: bool) -> bytes:
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        if target_dpi and target_dpi > 0:
+            # Nur Bilder deutlich über der Ziel-DPI neu rechnen (Toleranz gegen Qualitätsverlust durch Re-Encoding)
+            doc.rewrite_images(dpi_threshold=int(target_dpi * 1.25), dpi_target=int(target_dpi),
+                               quality=int(jpeg_quality), lossy=True, lossless=True)
+        if subset_fonts:
+            try:
+                doc.subset_fonts()
+            except Exception as e:
+                print(f"Font-Subsetting übersprungen: {e}")
+        # garbage=4 dedupliziert identische Objekte (Logos, Produktbilder, Fonts aus Datenblättern)
+        return doc.tobytes(garbage=4, clean=True, deflate=True, deflate_images=True, deflate_fonts=True, use_objstms=1)
+    finally:
+        doc.close()
+
+
+def _compact_with_pypdf(pdf_bytes: bytes) -> bytes:
+    writer = PdfWriter(clone_from=PdfReader(io.BytesIO(pdf_bytes)))
+    for page in writer.pages:
+        page.compress_content_streams()
+    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def compact_pdf(pdf_bytes: bytes, target_dpi: int = 150, jpeg_quality: int = 80,
+                subset_fonts: bool = True) -> Tuple[bytes, CompactionReport]:
+    """Optimiert pdf_bytes; liefert das Original, falls die Optimierung nicht kleiner ist oder fehlschlägt."""
+    started = time.perf_counter()
+    backend = "pymupdf" if _FITZ_AVAILABLE else ("pypdf" if _PYPDF_AVAILABLE else "none")
+    result = pdf_bytes
+    try:
+        if _FITZ_AVAILABLE:
+            result = _compact_with_fitz(pdf_bytes, target_dpi, jpeg_quality, subset_fonts)
+        elif _PYPDF_AVAILABLE:
+            result = _compact_with_pypdf(pdf_bytes)
+    except Exception as e:
+        print(f"Fehler bei der PDF-Optimierung: {e}")
+        result = pdf_bytes
+    if not result or len(result) >= len(pdf_bytes):
+        result = pdf_bytes
+    report = CompactionReport(len(pdf_bytes), len(result), time.perf_counter() - started, backend)
+    return result, report
+
+
+_last_report: Optional[CompactionReport] = None
+
+
+def last_compaction_report() -> Optional[CompactionReport]:
+    """Bericht der letzten compact_offer_pdf-Ausführung (None, wenn dort nicht optimiert wurde)."""
+    return _last_report
+
+
+def reset_compaction_report() -> None:
+    """Zu Beginn jedes Angebots aufrufen, damit kein Bericht einer früheren Erzeugung sichtbar bleibt."""
+    global _last_report
+    _last_report = None
+
+
+def compact_offer_pdf(pdf_bytes: Optional[bytes], load_admin_setting_func: Callable,
+                      company_id: Optional[int]) -> Optional[bytes]:
+    """Wendet den kompakten Ausgabemodus an, sofern er für die Firma aktiviert ist."""
+    global _last_report
+    _last_report = None
+    if not pdf_bytes:
+        return pdf_bytes
+    settings = optimization_settings_for_company(load_admin_setting_func, company_id)
+    if not settings.get("enabled"):
+        return pdf_bytes
+    compacted, report = compact_pdf(
+        pdf_bytes,
+        target_dpi=int(settings.get("target_dpi") or 0),
+        jpeg_quality=int(settings.get("jpeg_quality") or 80),
+        subset_fonts=bool(settings.get("subset_fonts", True)),
+    )
+    print(f"[PDF] Kompakte Ausgabe: {report.summary()}")
+    _last_report = report
+    return compacted
@@ -11,13 +11,21 @@ import os
 import re
 
 import base64
+import hashlib
 import io
+import json
 import math
+import numbers
+import threading
 import traceback
+from collections import OrderedDict
+from dataclasses import dataclass
 from calculations_extended import run_all_extended_analyses
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union, Callable
+from typing import Any, Dict, List, Optional, Tuple, Union, Callable
 from pathlib import Path
+from offer_trace import span as trace_span, traced
+from german_formatting import format_german_number, format_german_numbers
 from theming.pdf_styles import get_theme
 from calculations import build_project_data
 
@@ -81,6 +89,53 @@ except Exception as e_pypdf_import:
         def add_page(self, page): pass
         def write(self, stream): pass
     _PYPDF_AVAILABLE = True
+
+try:
+    from pdf_vector_charts import VECTOR_CHART_BUILDERS, build_vector_chart, fit_drawing
+    _VECTOR_CHARTS_AVAILABLE = True
+except Exception:
+    VECTOR_CHART_BUILDERS = {}
+    _VECTOR_CHARTS_AVAILABLE = False
+
+try:
+    from pdf_style_registry import STYLE_REGISTRY, register_ttf_font, resolve_font
+    _STYLE_REGISTRY_AVAILABLE = True
+except Exception:
+    STYLE_REGISTRY = None
+    _STYLE_REGISTRY_AVAILABLE = False
+
+try:
+    from pdf_compactor import compact_offer_pdf, reset_compaction_report
+    _PDF_COMPACTOR_AVAILABLE = True
+except Exception:
+    _PDF_COMPACTOR_AVAILABLE = False
+
+try:
+    from pdf_chart_registry import CHART_REGISTRY, build_chart
+    _CHART_REGISTRY_AVAILABLE = True
+except Exception:
+    CHART_REGISTRY = {}
+    _CHART_REGISTRY_AVAILABLE = False
+
+def _build_theme_stylesheet(theme_name: str) -> Any:
+    """Stylesheet mit H1/Body für ein Theme aus theming.pdf_styles."""
+    theme = get_theme(theme_name)
+    family_main, family_bold = theme["fonts"]["family_main"], theme["fonts"]["family_bold"]
+    if _STYLE_REGISTRY_AVAILABLE:
+        # Eigene TTF-Schriften des Themes einmal je Prozess registrieren; unbekannte Namen fallen auf Helvetica zurück
+        for font_name, font_path in (theme["fonts"].get("ttf_files") or {}).items():
+            register_ttf_font(font_name, font_path)
+        family_main = resolve_font(family_main, "Helvetica")
+        family_bold = resolve_font(family_bold, "Helvetica-Bold")
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='H1', fontName=family_bold,
+                              fontSize=theme["fonts"]["size_h1"],
+                              textColor=theme["colors"]["primary"]))
+    styles.add(ParagraphStyle(name='Body', fontName=family_main,
+                              fontSize=theme["fonts"]["size_body"],
+                              textColor=theme["colors"]["text"], leading=14))
+    return styles
+
 class PDFGenerator:
     """Kapselt die gesamte PDF-Erstellungslogik."""
 
@@ -90,16 +145,9 @@ class PDFGenerator:
         self.theme = get_theme(theme_name)
         self.filename = filename
         self.width, self.height = A4
-        self.styles = getSampleStyleSheet()
+        # Eigene Stile basierend auf dem Theme (einmal je Theme kompiliert)
+        self.styles = _compiled_style("stylesheet", "theme", _build_theme_stylesheet, theme_name)
         self.story = []
-        
-        # Eigene Stile basierend auf dem Theme erstellen
-        self.styles.add(ParagraphStyle(name='H1', fontName=self.theme["fonts"]["family_bold"],
-                                        fontSize=self.theme["fonts"]["size_h1"],
-                                        textColor=self.theme["colors"]["primary"]))
-        self.styles.add(ParagraphStyle(name='Body', fontName=self.theme["fonts"]["family_main"],
-                                        fontSize=self.theme["fonts"]["size_body"],
-                                        textColor=self.theme["colors"]["text"], leading=14))
 
     def _header_footer(self, canvas, doc):
         """Erstellt die Kopf- und Fußzeile für jede Seite."""
@@ -338,19 +386,105 @@ class PDFGenerator:
             return b""
 
 # =============== NEUE TEMPLATE-HAUPTAUSGABE (7 Seiten) API ==================
+def _appendix_footer_drawer(start_number: int, total_pages: int, logo_b64: Optional[str] = None,
+                            footer_left_text: Optional[str] = None) -> Callable[[Any, float, float, int], None]:
+    """Zeichenfunktion für Zusatzseiten: Dreieck, Footer-Leiste "Angebot, <Datum>", Kundenname, "Seite x von XX".
+
+    Datum, Footer-Farbe und Logo werden einmal vorbereitet; die Funktion zeichnet pro Aufruf
+    eine Seite auf den gemeinsamen Canvas (siehe pdf_template_engine.stamp_offer_pdf).
+    """
+    from reportlab.lib.colors import white, HexColor, Color
+    from datetime import datetime as _dt
+    date_text = f"Angebot, {_dt.now().strftime('%d.%m.%Y')}"
+    accent = Color(27/255.0, 54/255.0, 112/255.0)
+    # Footer-Hintergrundleiste (minimal bläulicher als Primärfarbe)
+    try:
+        _hex = str(PRIMARY_COLOR_HEX).strip()
+        if _hex.startswith('#') and len(_hex) == 7:
+            r = int(_hex[1:3], 16); g = int(_hex[3:5], 16); b = int(_hex[5:7], 16)
+            b = min(255, b + 16)  # +16 Blauanteil
+            footer_color = HexColor(f"#{r:02X}{g:02X}{b:02X}")
+        else:
+            footer_color = HexColor(_hex)
+    except Exception:
+        # Fallback dunkelblau
+        footer_color = HexColor('#1B3670')
+    logo_reader = None
+    if logo_b64:
+        try:
+            logo_reader = ImageReader(io.BytesIO(base64.b64decode(logo_b64)))
+        except Exception:
+            logo_reader = None
+    font_name = "Helvetica-Bold"; font_size = 9
+    bar_height = 36
+
+    def _draw(canv: Any, pw: float, ph: float, idx: int) -> None:
+        # Dekoratives Dreieck oben rechts (wie Hauptseiten)
+        try:
+            canv.saveState()
+            canv.setFillColor(accent)
+            canv.setStrokeColor(accent)
+            size = 36.0
+            p = canv.beginPath()
+            p.moveTo(pw, ph)
+            p.lineTo(pw - size, ph)
+            p.lineTo(pw, ph - size)
+            p.close()
+            canv.drawPath(p, stroke=0, fill=1)
+        finally:
+            canv.restoreState()
+        canv.saveState()
+        try:
+            canv.setFillColor(footer_color)
+            canv.setStrokeColor(HexColor('#000000'))
+            canv.rect(0, 0, pw, bar_height, stroke=0, fill=1)
+            canv.setFillColor(white)
+            canv.setFont(font_name, font_size)
+            # Firmenlogo oben links (optional), 20pt vom linken und oberen Rand
+            if logo_reader is not None:
+                try:
+                    max_w, max_h = 120, 50
+                    canv.drawImage(logo_reader, 20, ph - 20 - max_h, width=max_w, height=max_h, preserveAspectRatio=True, mask='auto')
+                except Exception:
+                    pass
+            # Zentrierter Datums-Text (vertikal mittig in der Leiste)
+            center_y = float(bar_height) / 2.0
+            tw = canv.stringWidth(date_text, font_name, font_size)
+            canv.drawString((pw - tw) / 2.0, center_y, date_text)
+            # Linker Footer-Text: Kundenname, falls vorhanden
+            if footer_left_text:
+                canv.drawString(20, center_y, str(footer_left_text))
+            # Rechte Nummer "Seite x von XX"
+            right_text = f"Seite {start_number + idx} von {total_pages}"
+            tw_r = canv.stringWidth(right_text, font_name, font_size)
+            canv.drawString(pw - 18 - tw_r, center_y, right_text)
+        finally:
+            canv.restoreState()
+
+    return _draw
+
+@traced(entry_point=True)
 def generate_main_template_pdf_bytes(
     project_data: Dict[str, Any],
     analysis_results: Optional[Dict[str, Any]],
     company_info: Dict[str, Any],
     additional_pdf: Optional[bytes] = None,
+    appendix_footer: Optional[Dict[str, Any]] = None,
+    overlay_layer_cache: Optional[Any] = None,
 ) -> Optional[bytes]:
-    """Erzeugt die 6-seitige Hauptausgabe basierend auf coords/ und pdf_templates_static/notext/.
+    """Erzeugt die 7-seitige Hauptausgabe basierend auf coords/ und pdf_templates_static/notext/.
 
     Nutzt pdf_template_engine: liest YML-Koordinaten, erstellt Text-Overlay nach
-    Platzhalter-Mapping und fusioniert mit den sechs statischen Template-PDFs.
+    Platzhalter-Mapping und fusioniert mit den statischen Template-PDFs.
+    Mit appendix_footer (logo_b64, footer_left_text) werden die Seiten aus additional_pdf
+    im selben Durchgang mit Fußzeile angehängt; sonst dient additional_pdf nur der Seitenzählung.
+    overlay_layer_cache (pdf_template_engine.OverlayLayerCache) teilt firmenunabhängige Seitenebenen
+    zwischen den Angeboten mehrerer Firmen für denselben Kunden.
     """
     try:
-        from pdf_template_engine import build_dynamic_data, generate_overlay, merge_with_background
+        from pdf_template_engine import (
+            build_dynamic_data, layout_placeholder_keys, new_placeholder_session, stamp_offer_pdf,
+        )
     except Exception as e:
         print(f"pdf_template_engine nicht verfügbar: {e}")
         return None
@@ -363,7 +497,10 @@ def generate_main_template_pdf_bytes(
     debug_templates = os.environ.get("DING_TEMPLATE_DEBUG", "0").lower() in {"1","true","yes","on"}
     if debug_templates:
         print("[TEMPLATE] build_dynamic_data start")
-    dyn_data = build_dynamic_data(project_data, analysis_results, company_info)
+    # Nur die von den Layouts referenzierten Platzhalter auswerten; PV- und WP-Durchlauf teilen sich eine Sitzung
+    placeholder_session = new_placeholder_session(project_data, analysis_results)
+    dyn_data = build_dynamic_data(project_data, analysis_results, company_info,
+                                  required_keys=layout_placeholder_keys(coords_dir_pv), session=placeholder_session)
 
     # Dynamische Reihenfolge Photovoltaik / Wärmepumpe: segment_order aus project_data lesen
     segment_order = []
@@ -404,15 +541,17 @@ def generate_main_template_pdf_bytes(
     wp_coords_available = coords_dir_wp.exists() and any(coords_dir_wp.glob('wp_seite*.yml'))
     if debug_templates:
         print(f"[TEMPLATE] build_dynamic_data done keys={len(dyn_data)}")
-    # Haupt-PDF mit korrekter "Seite x von XX"-Nummerierung, aber ohne Zusatzseiten anhängen
+        print(f"[TEMPLATE] placeholder timings: {placeholder_session.timing_report()['resolvers']}")
+    # Haupt-PDF mit korrekter "Seite x von XX"-Nummerierung; Zusatzseiten nur mit appendix_footer anhängen
     try:
         total_pages = 7
+        appendix_reader = None
         if additional_pdf:
             try:
-                from pypdf import PdfReader
-                import io as _io
-                total_pages = 7 + len(PdfReader(_io.BytesIO(additional_pdf)).pages)
+                appendix_reader = PdfReader(io.BytesIO(additional_pdf))
+                total_pages = 7 + len(appendix_reader.pages)
             except Exception:
+                appendix_reader = None
                 total_pages = 7
         
         # Seitenzahl-Information in dynamische Daten injizieren für spezifische Placeholders
@@ -420,39 +559,20 @@ def generate_main_template_pdf_bytes(
         dyn_data["total_pages"] = str(total_pages)
         
         if debug_templates:
-            print(f"[TEMPLATE] generate_overlay call total_pages={total_pages}")
-        # Overlay für PV Standard
-        overlay_parts: list[bytes] = []
+            print(f"[TEMPLATE] overlay total_pages={total_pages}")
+        # Auf die 7 Template-Seiten wird das erste Segment gestempelt (PV vor WP)
         if 'Photovoltaik' in segment_order:
-            overlay_bytes_pv = generate_overlay(coords_dir_pv, dyn_data, total_pages=total_pages)
-            overlay_parts.append(overlay_bytes_pv)
-        if 'Wärmepumpe' in segment_order and wp_coords_available:
+            overlay_coords_dir, overlay_data = coords_dir_pv, dyn_data
+        elif 'Wärmepumpe' in segment_order and wp_coords_available:
             # Für Wärmepumpe separate dyn_data (eigene Firmeninfo? project_data.company_information_wp)
             wp_company = project_data.get('company_information_wp') or company_info
-            dyn_data_wp = build_dynamic_data(project_data, analysis_results, wp_company)
-            overlay_bytes_wp = generate_overlay(coords_dir_wp, dyn_data_wp, total_pages=total_pages)
-            overlay_parts.append(overlay_bytes_wp)
-        # Merge Overlay Streams sequenziell (einfaches Aneinanderfügen der Seiten)
-        if len(overlay_parts) == 1:
-            overlay_bytes = overlay_parts[0]
+            overlay_data = build_dynamic_data(project_data, analysis_results, wp_company,
+                                              required_keys=layout_placeholder_keys(coords_dir_wp), session=placeholder_session)
+            overlay_data["page_number_with_total"] = dyn_data["page_number_with_total"]
+            overlay_data["total_pages"] = dyn_data["total_pages"]
+            overlay_coords_dir = coords_dir_wp
         else:
-            try:
-                from pypdf import PdfReader, PdfWriter
-                import io as _io
-                writer = PdfWriter()
-                for part in overlay_parts:
-                    r = PdfReader(_io.BytesIO(part))
-                    for pg in r.pages:
-                        writer.add_page(pg)
-                buf = _io.BytesIO()
-                writer.write(buf)
-                buf.seek(0)
-                overlay_bytes = buf.getvalue()
-            except Exception:
-                # Fallback: nimm ersten
-                overlay_bytes = overlay_parts[0] if overlay_parts else b""
-        if debug_templates:
-            print(f"[TEMPLATE] overlay size={len(overlay_bytes)} bytes")
+            raise ValueError(f"Kein Overlay-Segment für segment_order={segment_order}")
         
         # Template-Präfix basierend auf Segment-Reihenfolge bestimmen
         template_prefix = "nt_nt"  # Default für PV
@@ -476,9 +596,15 @@ def generate_main_template_pdf_bytes(
         except:
             pass
         
-        fused = merge_with_background(overlay_bytes, bg_dir, template_prefix)
+        # Overlay + Hintergründe (+ Zusatzseiten mit Fußzeile) in einem Canvas- und einem Writer-Durchgang
+        draw_footer = None
+        if appendix_footer is not None and appendix_reader is not None:
+            draw_footer = _appendix_footer_drawer(8, total_pages, **appendix_footer)
+        fused = stamp_offer_pdf(overlay_coords_dir, bg_dir, overlay_data, total_pages, template_prefix,
+                                appendix_pdf=appendix_reader if draw_footer else None,
+                                draw_appendix_overlay=draw_footer, layer_cache=overlay_layer_cache)
         if debug_templates:
-            print(f"[TEMPLATE] fused main7 size={len(fused)} bytes")
+            print(f"[TEMPLATE] fused size={len(fused)} bytes")
         return fused
     except Exception as e_gen:
         import traceback, sys
@@ -489,6 +615,7 @@ def generate_main_template_pdf_bytes(
             print("[TEMPLATE] (Traceback konnte nicht ausgegeben werden)")
         return None
 
+@traced(entry_point=True)
 def generate_offer_pdf_with_main_templates(
     project_data: Dict[str, Any],
     analysis_results: Optional[Dict[str, Any]],
@@ -514,6 +641,8 @@ def generate_offer_pdf_with_main_templates(
     2) Erzeuge bisheriges PDF als Zusatz (ohne Deckblatt/Anschreiben)
     3) Hänge es an die 7 Seiten an und liefere Bytes
     """
+    if _PDF_COMPACTOR_AVAILABLE:
+        reset_compaction_report()
     # Erzeuge optional die Zusatz-PDF zuerst, damit die 7-Seiten-Nummerierung "von XX" korrekt ist
     segment_order = (inclusion_options or {}).get('segment_order') or []
     # Debug-Ausgabe für Segment-Reihenfolge Photovoltaik/Wärmepumpe
@@ -586,162 +715,45 @@ def generate_offer_pdf_with_main_templates(
         except Exception as _dbg_e:
             print(f"[PDF EXTENDED] Debug-Auswertung Zusatz-PDF fehlgeschlagen: {_dbg_e}")
 
-    main7 = generate_main_template_pdf_bytes(safe_project_data, safe_analysis_results, company_info, additional_pdf=additional_pdf)
-    if main7 is None:
-        # Fallback: Nur die alte Generierung
-        return generate_offer_pdf(
+    # Zusatzseiten werden im selben Durchgang mit Footer "Angebot, <Datum>" und "Seite x von XX" versehen
+    appendix_footer = None
+    if additional_pdf:
+        logo_b64 = None
+        try:
+            logo_b64 = company_logo_base64 or (company_info.get('logo_base64') if isinstance(company_info, dict) else None)
+        except Exception:
+            logo_b64 = company_logo_base64
+        # Kundenname für linken Footer
+        try:
+            cust = (project_data or {}).get('customer_data', {})
+            first = str(cust.get('first_name') or '').strip()
+            last = str(cust.get('last_name') or '').strip()
+            sal = str(cust.get('salutation') or '').strip()
+            title = str(cust.get('title') or '').strip()
+            name_parts = [p for p in [sal, title, first, last] if p]
+            footer_left = ' '.join(name_parts)
+        except Exception:
+            footer_left = None
+        appendix_footer = {"logo_b64": logo_b64, "footer_left_text": footer_left}
+
+    offer_pdf = generate_main_template_pdf_bytes(safe_project_data, safe_analysis_results, company_info,
+                                                 additional_pdf=additional_pdf, appendix_footer=appendix_footer,
+                                                 overlay_layer_cache=kwargs.get("overlay_layer_cache"))
+    if offer_pdf is None:
+        # Fallback: Nur die alte Generierung (wird unten ebenfalls kompaktiert)
+        offer_pdf = generate_offer_pdf(
             project_data, analysis_results, company_info, company_logo_base64,
             selected_title_image_b64, selected_offer_title_text, selected_cover_letter_text,
             sections_to_include, inclusion_options, load_admin_setting_func,
             save_admin_setting_func, list_products_func, get_product_by_id_func,
             db_list_company_documents_func, active_company_id, texts,
-            use_modern_design=use_modern_design, **kwargs,
+            use_modern_design=use_modern_design,
+            **{**(kwargs or {}), 'disable_main_template_combiner': True},
         )
-
-    # Hilfsfunktion: Zusatzseiten mit Footer "Angebot, <Datum>" und "Seite x von XX" versehen
-    def _overlay_footer_page_numbers(pdf_bytes: bytes, start_number: int, total_pages: int, logo_b64: Optional[str] = None, footer_left_text: Optional[str] = None) -> bytes:
-        try:
-            if not pdf_bytes:
-                return pdf_bytes
-            # ReportLab/PyPDF verfügbar?
-            if not _PYPDF_AVAILABLE or not _REPORTLAB_AVAILABLE:
-                return pdf_bytes
-            reader = PdfReader(io.BytesIO(pdf_bytes))
-            writer = PdfWriter()
-            # Erstelle einmal einen leeren Overlay-Buffer; pro Seite neu befüllen
-            from reportlab.pdfgen import canvas as _rl_canvas
-            from reportlab.lib.colors import black, white, HexColor, Color
-            from datetime import datetime as _dt
-            date_text = f"Angebot, {_dt.now().strftime('%d.%m.%Y')}"
-            for idx, page in enumerate(reader.pages):
-                # Seitengröße erfassen
-                box = page.mediabox
-                pw = float(box.width)
-                ph = float(box.height)
-                # Overlay-PDF mit gleicher Seitengröße erzeugen
-                overlay_buf = io.BytesIO()
-                canv = _rl_canvas.Canvas(overlay_buf, pagesize=(pw, ph))
-                # Dekoratives Dreieck oben rechts (wie Hauptseiten)
-                try:
-                    tri = _rl_canvas.Path()
-                except Exception:
-                    tri = None
-                accent = Color(27/255.0, 54/255.0, 112/255.0)
-                try:
-                    canv.saveState()
-                    canv.setFillColor(accent)
-                    canv.setStrokeColor(accent)
-                    size = 36.0
-                    x0, y0 = pw, ph
-                    p = canv.beginPath()
-                    p.moveTo(x0, y0)
-                    p.lineTo(x0 - size, y0)
-                    p.lineTo(x0, y0 - size)
-                    p.close()
-                    canv.drawPath(p, stroke=0, fill=1)
-                finally:
-                    try:
-                        canv.restoreState()
-                    except Exception:
-                        pass
-
-                # Footer-Hintergrundleiste (minimal bläulicher als Primärfarbe)
-                bar_height = 36
-                try:
-                    # Primärfarbe leicht in Richtung Blau schieben
-                    _hex = str(PRIMARY_COLOR_HEX).strip()
-                    if _hex.startswith('#') and len(_hex) == 7:
-                        r = int(_hex[1:3], 16); g = int(_hex[3:5], 16); b = int(_hex[5:7], 16)
-                        b = min(255, b + 16)  # +16 Blauanteil
-                        footer_hex = f"#{r:02X}{g:02X}{b:02X}"
-                    else:
-                        footer_hex = _hex
-                    canv.setFillColor(HexColor(footer_hex))
-                except Exception:
-                    # Fallback dunkelblau
-                    canv.setFillColor(HexColor('#1B3670'))
-                canv.setStrokeColor(HexColor('#000000'))
-                canv.rect(0, 0, pw, bar_height, stroke=0, fill=1)
-                # Footer-Text-Style (weiß)
-                font_name = "Helvetica-Bold"; font_size = 9
-                canv.setFillColor(white)
-                canv.setFont(font_name, font_size)
-                # Firmenlogo oben links (optional)
-                if logo_b64:
-                    try:
-                        img_bytes = base64.b64decode(logo_b64)
-                        img = ImageReader(io.BytesIO(img_bytes))
-                        max_w, max_h = 120, 50
-                        # Position: 20pt vom linken Rand, 20pt vom oberen Rand (unterhalb)
-                        canv.drawImage(img, 20, ph - 20 - max_h, width=max_w, height=max_h, preserveAspectRatio=True, mask='auto')
-                    except Exception:
-                        pass
-                # Zentrierter Datums-Text (vertikal mittig in der Leiste)
-                center_y = float(bar_height) / 2.0
-                tw = canv.stringWidth(date_text, font_name, font_size)
-                canv.drawString((pw - tw) / 2.0, center_y, date_text)
-                # Linker Footer-Text: Kundenname, falls vorhanden
-                if footer_left_text:
-                    try:
-                        canv.drawString(20, center_y, str(footer_left_text))
-                    except Exception:
-                        pass
-                # Rechte Nummer "Seite x von XX"
-                page_num = start_number + idx
-                right_text = f"Seite {page_num} von {total_pages}"
-                tw_r = canv.stringWidth(right_text, font_name, font_size)
-                canv.drawString(pw - 18 - tw_r, center_y, right_text)
-                canv.showPage(); canv.save()
-                # Overlay zurück an den Anfang und mergen
-                overlay_buf.seek(0)
-                ov_reader = PdfReader(overlay_buf)
-                ov_page = ov_reader.pages[0]
-                try:
-                    page.merge_page(ov_page)
-                except Exception:
-                    # Fallback für ältere PyPDF2 APIs
-                    page.mergePage(ov_page)  # type: ignore
-                writer.add_page(page)
-            out_buf = io.BytesIO(); writer.write(out_buf)
-            return out_buf.getvalue()
-        except Exception:
-            return pdf_bytes
-
-    try:
-        from pypdf import PdfReader, PdfWriter
-        # BUGFIX: Ehemals main6 (Altbezeichnung) -> korrekt main7
-        base_reader = PdfReader(io.BytesIO(main7))
-        writer = PdfWriter()
-        for p in base_reader.pages: writer.add_page(p)
-        if additional_pdf:
-            # Seitenanzahl ermitteln (gesamt = 7 + n)
-            tmp_reader = PdfReader(io.BytesIO(additional_pdf))
-            total_pages = 7 + len(tmp_reader.pages)
-            # Zusatzseiten mit Footer versehen: Startnummer = 8 (da Seiten 1-7 schon vorhanden)
-            logo_b64 = None
-            try:
-                logo_b64 = company_logo_base64 or (company_info.get('logo_base64') if isinstance(company_info, dict) else None)
-            except Exception:
-                logo_b64 = company_logo_base64
-            # Kundenname für linken Footer
-            try:
-                cust = (project_data or {}).get('customer_data', {})
-                first = str(cust.get('first_name') or '').strip()
-                last = str(cust.get('last_name') or '').strip()
-                sal = str(cust.get('salutation') or '').strip()
-                title = str(cust.get('title') or '').strip()
-                name_parts = [p for p in [sal, title, first, last] if p]
-                footer_left = ' '.join(name_parts)
-            except Exception:
-                footer_left = None
-            additional_pdf = _overlay_footer_page_numbers(additional_pdf, start_number=8, total_pages=total_pages, logo_b64=logo_b64, footer_left_text=footer_left)
-            add_reader = PdfReader(io.BytesIO(additional_pdf))
-            for p in add_reader.pages: writer.add_page(p)
-        buf = io.BytesIO(); writer.write(buf)
-        return buf.getvalue()
-    except Exception:
-        # Falls Zusammenführen fehlschlägt, gib die 7 Seiten zurück
-        return main7
+    # Optional: kompakte Ausgabe (Deduplizierung, Bild-Downsampling, Objekt-Streams) je Firma
+    if _PDF_COMPACTOR_AVAILABLE:
+        offer_pdf = compact_offer_pdf(offer_pdf, load_admin_setting_func, active_company_id)
+    return offer_pdf
 
 _PDF_GENERATOR_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # Da pdf_generator.py im selben Verzeichnis wie der data/ Ordner liegt, ist der Basis-Pfad korrekt
@@ -798,9 +810,7 @@ def format_kpi_value(value: Any, unit: str = "", na_text_key: str = "not_applica
         if math.isinf(value): return get_text(current_texts, "value_infinite", "Nicht berechenbar")
         if unit == "Jahre": return get_text(current_texts, "years_format_string_pdf", "{val:.1f} Jahre").format(val=value)
         
-        formatted_num_en = f"{value:,.{precision}f}"
-        formatted_num_de = formatted_num_en.replace(",", "#TEMP#").replace(".", ",").replace("#TEMP#", ".")
-        return f"{formatted_num_de} {unit}".strip()
+        return format_german_number(value, precision, unit, na_text)
     return str(value)
 
 def _sanitize_chart_title(raw_title: str) -> str:
@@ -923,33 +933,82 @@ COLORS = {
     'info_blue': '#17A2B8'
 }
 
-if _REPORTLAB_AVAILABLE:
-    STYLES = getSampleStyleSheet()
-    STYLES.add(ParagraphStyle(name='NormalLeft', alignment=TA_LEFT, fontName=FONT_NORMAL, fontSize=10, leading=12, textColor=colors.HexColor(TEXT_COLOR_HEX)))
-    STYLES.add(ParagraphStyle(name='NormalRight', alignment=TA_RIGHT, fontName=FONT_NORMAL, fontSize=10, leading=12, textColor=colors.HexColor(TEXT_COLOR_HEX)))
-    STYLES.add(ParagraphStyle(name='NormalCenter', alignment=TA_CENTER, fontName=FONT_NORMAL, fontSize=10, leading=12, textColor=colors.HexColor(TEXT_COLOR_HEX)))
-    STYLES.add(ParagraphStyle(name='Footer', parent=STYLES['NormalCenter'], fontName=FONT_ITALIC, fontSize=8, textColor=colors.darkgrey)) # Dunkleres Grau für Footer
-    STYLES.add(ParagraphStyle(name='OfferTitle', parent=STYLES['h1'], fontName=FONT_BOLD, fontSize=24, alignment=TA_CENTER, spaceBefore=1.5*cm, spaceAfter=1.5*cm, textColor=colors.HexColor(PRIMARY_COLOR_HEX), leading=28)) # Größer und eleganter
-    STYLES.add(ParagraphStyle(name='SectionTitle', parent=STYLES['h2'], fontName=FONT_BOLD, fontSize=16, spaceBefore=1.2*cm, spaceAfter=0.8*cm, keepWithNext=1, textColor=colors.HexColor(PRIMARY_COLOR_HEX), leading=20)) # Moderner
-    STYLES.add(ParagraphStyle(name='SubSectionTitle', parent=STYLES['h3'], fontName=FONT_BOLD, fontSize=13, spaceBefore=1*cm, spaceAfter=0.5*cm, keepWithNext=1, textColor=colors.HexColor(SECONDARY_COLOR_HEX), leading=16)) # Sekundärfarbe für Abwechslung
-    STYLES.add(ParagraphStyle(name='ComponentTitle', parent=STYLES['SubSectionTitle'], fontSize=11, spaceBefore=0.5*cm, spaceAfter=0.2*cm, alignment=TA_LEFT, textColor=colors.HexColor(TEXT_COLOR_HEX)))
-    STYLES.add(ParagraphStyle(name='CompanyInfoDeckblatt', parent=STYLES['NormalCenter'], fontName=FONT_NORMAL, fontSize=9, leading=11, spaceAfter=0.5*cm, textColor=colors.HexColor(TEXT_COLOR_HEX)))
-    STYLES.add(ParagraphStyle(name='CoverLetter', parent=STYLES['NormalLeft'], fontSize=11, leading=15, spaceBefore=0.5*cm, spaceAfter=0.5*cm, alignment=TA_JUSTIFY, firstLineIndent=0, leftIndent=0, rightIndent=0, textColor=colors.HexColor(TEXT_COLOR_HEX))) # Etwas mehr Zeilenabstand    # Neuer Stil für rechtsbündige Kundenadresse auf Deckblatt
-    STYLES.add(ParagraphStyle(name='CustomerAddressDeckblattRight', parent=STYLES['NormalRight'], fontSize=10, leading=12, spaceBefore=0.5*cm, spaceAfter=0.8*cm, textColor=colors.HexColor(TEXT_COLOR_HEX)))
-    STYLES.add(ParagraphStyle(name='CustomerAddressInner', parent=STYLES['NormalLeft'], fontSize=10, leading=12, spaceBefore=0.5*cm, spaceAfter=0.8*cm, textColor=colors.HexColor(TEXT_COLOR_HEX))) # Für Anschreiben etc.
+def _build_offer_stylesheet(palette: Tuple[str, str, str, str]) -> Any:
+    """Absatzstile des Angebots für palette = (Primär, Sekundär, Text, Trennlinie) als Hex-Farben."""
+    primary_hex, secondary_hex, text_hex, _separator_hex = palette
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='NormalLeft', alignment=TA_LEFT, fontName=FONT_NORMAL, fontSize=10, leading=12, textColor=colors.HexColor(text_hex)))
+    styles.add(ParagraphStyle(name='NormalRight', alignment=TA_RIGHT, fontName=FONT_NORMAL, fontSize=10, leading=12, textColor=colors.HexColor(text_hex)))
+    styles.add(ParagraphStyle(name='NormalCenter', alignment=TA_CENTER, fontName=FONT_NORMAL, fontSize=10, leading=12, textColor=colors.HexColor(text_hex)))
+    styles.add(ParagraphStyle(name='Footer', parent=styles['NormalCenter'], fontName=FONT_ITALIC, fontSize=8, textColor=colors.darkgrey)) # Dunkleres Grau für Footer
+    styles.add(ParagraphStyle(name='OfferTitle', parent=styles['h1'], fontName=FONT_BOLD, fontSize=24, alignment=TA_CENTER, spaceBefore=1.5*cm, spaceAfter=1.5*cm, textColor=colors.HexColor(primary_hex), leading=28)) # Größer und eleganter
+    styles.add(ParagraphStyle(name='SectionTitle', parent=styles['h2'], fontName=FONT_BOLD, fontSize=16, spaceBefore=1.2*cm, spaceAfter=0.8*cm, keepWithNext=1, textColor=colors.HexColor(primary_hex), leading=20)) # Moderner
+    styles.add(ParagraphStyle(name='SubSectionTitle', parent=styles['h3'], fontName=FONT_BOLD, fontSize=13, spaceBefore=1*cm, spaceAfter=0.5*cm, keepWithNext=1, textColor=colors.HexColor(secondary_hex), leading=16)) # Sekundärfarbe für Abwechslung
+    styles.add(ParagraphStyle(name='ComponentTitle', parent=styles['SubSectionTitle'], fontSize=11, spaceBefore=0.5*cm, spaceAfter=0.2*cm, alignment=TA_LEFT, textColor=colors.HexColor(text_hex)))
+    styles.add(ParagraphStyle(name='CompanyInfoDeckblatt', parent=styles['NormalCenter'], fontName=FONT_NORMAL, fontSize=9, leading=11, spaceAfter=0.5*cm, textColor=colors.HexColor(text_hex)))
+    styles.add(ParagraphStyle(name='CoverLetter', parent=styles['NormalLeft'], fontSize=11, leading=15, spaceBefore=0.5*cm, spaceAfter=0.5*cm, alignment=TA_JUSTIFY, firstLineIndent=0, leftIndent=0, rightIndent=0, textColor=colors.HexColor(text_hex))) # Etwas mehr Zeilenabstand    # Neuer Stil für rechtsbündige Kundenadresse auf Deckblatt
+    styles.add(ParagraphStyle(name='CustomerAddressDeckblattRight', parent=styles['NormalRight'], fontSize=10, leading=12, spaceBefore=0.5*cm, spaceAfter=0.8*cm, textColor=colors.HexColor(text_hex)))
+    styles.add(ParagraphStyle(name='CustomerAddressInner', parent=styles['NormalLeft'], fontSize=10, leading=12, spaceBefore=0.5*cm, spaceAfter=0.8*cm, textColor=colors.HexColor(text_hex))) # Für Anschreiben etc.
     # FEHLENDER STYLE - CustomerAddress (allgemein)
-    STYLES.add(ParagraphStyle(name='CustomerAddress', parent=STYLES['NormalLeft'], fontSize=10, leading=12, spaceBefore=0.5*cm, spaceAfter=0.8*cm, textColor=colors.HexColor(TEXT_COLOR_HEX)))
+    styles.add(ParagraphStyle(name='CustomerAddress', parent=styles['NormalLeft'], fontSize=10, leading=12, spaceBefore=0.5*cm, spaceAfter=0.8*cm, textColor=colors.HexColor(text_hex)))
     
-    STYLES.add(ParagraphStyle(name='TableText', parent=STYLES['NormalLeft'], fontName=FONT_NORMAL, fontSize=9, leading=11, textColor=colors.HexColor(TEXT_COLOR_HEX))) # Helvetica für Tabellentext
-    STYLES.add(ParagraphStyle(name='TableTextSmall', parent=STYLES['NormalLeft'], fontName=FONT_NORMAL, fontSize=8, leading=10, textColor=colors.HexColor(TEXT_COLOR_HEX)))
-    STYLES.add(ParagraphStyle(name='TableNumber', parent=STYLES['NormalRight'], fontName=FONT_NORMAL, fontSize=9, leading=11, textColor=colors.HexColor(TEXT_COLOR_HEX)))
-    STYLES.add(ParagraphStyle(name='TableLabel', parent=STYLES['NormalLeft'], fontName=FONT_BOLD, fontSize=9, leading=11, textColor=colors.HexColor(TEXT_COLOR_HEX)))
+    styles.add(ParagraphStyle(name='TableText', parent=styles['NormalLeft'], fontName=FONT_NORMAL, fontSize=9, leading=11, textColor=colors.HexColor(text_hex))) # Helvetica für Tabellentext
+    styles.add(ParagraphStyle(name='TableTextSmall', parent=styles['NormalLeft'], fontName=FONT_NORMAL, fontSize=8, leading=10, textColor=colors.HexColor(text_hex)))
+    styles.add(ParagraphStyle(name='TableNumber', parent=styles['NormalRight'], fontName=FONT_NORMAL, fontSize=9, leading=11, textColor=colors.HexColor(text_hex)))
+    styles.add(ParagraphStyle(name='TableLabel', parent=styles['NormalLeft'], fontName=FONT_BOLD, fontSize=9, leading=11, textColor=colors.HexColor(text_hex)))
     # KORREKTUR: Tabellenheader Farbe und Textfarbe
-    STYLES.add(ParagraphStyle(name='TableHeader', parent=STYLES['NormalCenter'], fontName=FONT_BOLD, fontSize=9, leading=11, textColor=colors.white, backColor=colors.HexColor(PRIMARY_COLOR_HEX)))
-    STYLES.add(ParagraphStyle(name='TableBoldRight', parent=STYLES['NormalRight'], fontName=FONT_BOLD, fontSize=9, leading=11, textColor=colors.HexColor(TEXT_COLOR_HEX)))
-    STYLES.add(ParagraphStyle(name='ImageCaption', parent=STYLES['NormalCenter'], fontName=FONT_ITALIC, fontSize=8, spaceBefore=0.1*cm, textColor=colors.grey))
-    STYLES.add(ParagraphStyle(name='ChartTitle', parent=STYLES['SubSectionTitle'], alignment=TA_CENTER, spaceBefore=0.6*cm, spaceAfter=0.2*cm, fontSize=11, textColor=colors.HexColor(TEXT_COLOR_HEX)))
-    STYLES.add(ParagraphStyle(name='ChapterHeader', parent=STYLES['NormalRight'], fontName=FONT_NORMAL, fontSize=9, textColor=colors.grey, alignment=TA_RIGHT))
+    styles.add(ParagraphStyle(name='TableHeader', parent=styles['NormalCenter'], fontName=FONT_BOLD, fontSize=9, leading=11, textColor=colors.white, backColor=colors.HexColor(primary_hex)))
+    styles.add(ParagraphStyle(name='TableBoldRight', parent=styles['NormalRight'], fontName=FONT_BOLD, fontSize=9, leading=11, textColor=colors.HexColor(text_hex)))
+    styles.add(ParagraphStyle(name='ImageCaption', parent=styles['NormalCenter'], fontName=FONT_ITALIC, fontSize=8, spaceBefore=0.1*cm, textColor=colors.grey))
+    styles.add(ParagraphStyle(name='ChartTitle', parent=styles['SubSectionTitle'], alignment=TA_CENTER, spaceBefore=0.6*cm, spaceAfter=0.2*cm, fontSize=11, textColor=colors.HexColor(text_hex)))
+    styles.add(ParagraphStyle(name='ChapterHeader', parent=styles['NormalRight'], fontName=FONT_NORMAL, fontSize=9, textColor=colors.grey, alignment=TA_RIGHT))
+    return styles
+
+def _build_offer_stylesheet_with_design(palette: Tuple[str, str, str, str]) -> Any:
+    """Wie _build_offer_stylesheet, mit den Firmenfarben aus den PDF-Design-Einstellungen auf Titeln und Tabellenköpfen."""
+    styles = _build_offer_stylesheet(palette)
+    primary = colors.HexColor(palette[0])
+    styles['OfferTitle'].textColor = primary
+    styles['SectionTitle'].textColor = primary
+    styles['SubSectionTitle'].textColor = primary # Subsektionen auch in Primärfarbe
+    # Tabellenheader explizit mit Primärfarbe und weißem Text
+    styles['TableHeader'].backColor = primary
+    styles['TableHeader'].textColor = colors.white
+    return styles
+
+def _build_data_table_style(palette: Tuple[str, str, str, str]) -> Any:
+    primary_hex, _secondary_hex, text_hex, separator_hex = palette
+    return TableStyle([
+        ('BACKGROUND',(0,0),(-1,0),colors.HexColor(primary_hex)), # Kopfzeile Primärfarbe
+        ('TEXTCOLOR',(0,0),(-1,0),colors.white), # Kopfzeile Text weiß
+        ('FONTNAME',(0,0),(-1,0),FONT_BOLD),
+        ('ALIGN',(0,0),(-1,0),'CENTER'),
+        ('GRID',(0,0),(-1,-1),0.5,colors.HexColor(separator_hex)),
+        ('VALIGN',(0,0),(-1,-1),'MIDDLE'),
+        ('FONTNAME',(0,1),(-1,-1),FONT_NORMAL), # Datenzellen Helvetica
+        ('ALIGN',(0,1),(0,-1),'LEFT'), # Erste Datenspalte links
+        ('ALIGN',(1,1),(-1,-1),'RIGHT'), # Andere Datenspalten rechts (für Zahlen)
+        ('LEFTPADDING',(0,0),(-1,-1),2*mm), ('RIGHTPADDING',(0,0),(-1,-1),2*mm),
+        ('TOPPADDING',(0,0),(-1,-1),1.5*mm), ('BOTTOMPADDING',(0,0),(-1,-1),1.5*mm), 
+        ('TEXTCOLOR',(0,1),(-1,-1),colors.HexColor(text_hex)) # Textfarbe Datenzellen
+    ])
+
+def _compiled_style(kind: str, name: str, builder: Callable[[Any], Any], palette: Any) -> Any:
+    """Stylesheet/TableStyle aus der prozessweiten Registry (einmal je Palette kompiliert)."""
+    if _STYLE_REGISTRY_AVAILABLE:
+        return STYLE_REGISTRY.get(kind, name, palette)
+    return builder(palette)
+
+def _current_palette() -> Tuple[str, str, str, str]:
+    return (PRIMARY_COLOR_HEX, SECONDARY_COLOR_HEX, TEXT_COLOR_HEX, SEPARATOR_LINE_COLOR_HEX)
+
+if _REPORTLAB_AVAILABLE:
+    if _STYLE_REGISTRY_AVAILABLE:
+        STYLE_REGISTRY.register("stylesheet", "offer_base", _build_offer_stylesheet)
+        STYLE_REGISTRY.register("stylesheet", "offer", _build_offer_stylesheet_with_design)
+        STYLE_REGISTRY.register("table_style", "data", _build_data_table_style)
+        STYLE_REGISTRY.register("stylesheet", "theme", _build_theme_stylesheet)
+    STYLES = _compiled_style("stylesheet", "offer_base", _build_offer_stylesheet, _current_palette())
 
     TABLE_STYLE_DEFAULT = TableStyle([
         ('TEXTCOLOR',(0,0),(-1,-1),colors.HexColor(TEXT_COLOR_HEX)),
@@ -961,20 +1020,7 @@ if _REPORTLAB_AVAILABLE:
         ('TOPPADDING',(0,0),(-1,-1),2*mm), ('BOTTOMPADDING',(0,0),(-1,-1),2*mm)
     ])
     # KORREKTUR: DATA_TABLE_STYLE für Konsistenz
-    DATA_TABLE_STYLE = TableStyle([
-        ('BACKGROUND',(0,0),(-1,0),colors.HexColor(PRIMARY_COLOR_HEX)), # Kopfzeile Primärfarbe
-        ('TEXTCOLOR',(0,0),(-1,0),colors.white), # Kopfzeile Text weiß
-        ('FONTNAME',(0,0),(-1,0),FONT_BOLD),
-        ('ALIGN',(0,0),(-1,0),'CENTER'),
-        ('GRID',(0,0),(-1,-1),0.5,colors.HexColor(SEPARATOR_LINE_COLOR_HEX)),
-        ('VALIGN',(0,0),(-1,-1),'MIDDLE'),
-        ('FONTNAME',(0,1),(-1,-1),FONT_NORMAL), # Datenzellen Helvetica
-        ('ALIGN',(0,1),(0,-1),'LEFT'), # Erste Datenspalte links
-        ('ALIGN',(1,1),(-1,-1),'RIGHT'), # Andere Datenspalten rechts (für Zahlen)
-        ('LEFTPADDING',(0,0),(-1,-1),2*mm), ('RIGHTPADDING',(0,0),(-1,-1),2*mm),
-        ('TOPPADDING',(0,0),(-1,-1),1.5*mm), ('BOTTOMPADDING',(0,0),(-1,-1),1.5*mm), 
-        ('TEXTCOLOR',(0,1),(-1,-1),colors.HexColor(TEXT_COLOR_HEX)) # Textfarbe Datenzellen
-    ])
+    DATA_TABLE_STYLE = _compiled_style("table_style", "data", _build_data_table_style, _current_palette())
     PRODUCT_TABLE_STYLE = TableStyle([
         ('TEXTCOLOR',(0,0),(-1,-1),colors.HexColor(TEXT_COLOR_HEX)),
         ('FONTNAME',(0,0),(0,-1),FONT_BOLD), ('ALIGN',(0,0),(0,-1),'LEFT'),
@@ -1108,27 +1154,37 @@ def _update_styles_with_dynamic_colors(design_settings: Dict[str, str]):
     SECONDARY_COLOR_HEX = design_settings.get('secondary_color', "#F2F2F2") 
     SEPARATOR_LINE_COLOR_HEX = design_settings.get('separator_color', "#CCCCCC") # Eigene Farbe für Trennlinien
 
-    if STYLES: # Nur wenn STYLES initialisiert wurde
-        STYLES['OfferTitle'].textColor = colors.HexColor(PRIMARY_COLOR_HEX)
-        STYLES['SectionTitle'].textColor = colors.HexColor(PRIMARY_COLOR_HEX)
-        STYLES['SubSectionTitle'].textColor = colors.HexColor(PRIMARY_COLOR_HEX) # Subsektionen auch in Primärfarbe
-        
-        # Tabellenheader explizit mit Primärfarbe und weißem Text
-        STYLES['TableHeader'].backColor = colors.HexColor(PRIMARY_COLOR_HEX)
-        STYLES['TableHeader'].textColor = colors.white
-        
-        DATA_TABLE_STYLE = TableStyle([
-            ('BACKGROUND',(0,0),(-1,0),colors.HexColor(PRIMARY_COLOR_HEX)), 
-            ('TEXTCOLOR',(0,0),(-1,0),colors.white), 
-            ('FONTNAME',(0,0),(-1,0),FONT_BOLD), ('ALIGN',(0,0),(-1,0),'CENTER'),
-            ('GRID',(0,0),(-1,-1),0.5,colors.HexColor(SEPARATOR_LINE_COLOR_HEX)),
-            ('VALIGN',(0,0),(-1,-1),'MIDDLE'), ('FONTNAME',(0,1),(-1,-1),FONT_NORMAL),
-            ('ALIGN',(0,1),(0,-1),'LEFT'), ('ALIGN',(1,1),(-1,-1),'RIGHT'),
-            ('LEFTPADDING',(0,0),(-1,-1),2*mm), ('RIGHTPADDING',(0,0),(-1,-1),2*mm),
-            ('TOPPADDING',(0,0),(-1,-1),1.5*mm), ('BOTTOMPADDING',(0,0),(-1,-1),1.5*mm), 
-            ('TEXTCOLOR',(0,1),(-1,-1),colors.HexColor(TEXT_COLOR_HEX))
-        ])
+    # Kompilierte Stile je Farbpalette aus der Registry statt Mutation der gemeinsamen Stile
+    palette = _current_palette()
+    STYLES = _compiled_style("stylesheet", "offer", _build_offer_stylesheet_with_design, palette)
+    DATA_TABLE_STYLE = _compiled_style("table_style", "data", _build_data_table_style, palette)
+
+
+def _get_chart_flowables(chart_key: str, analysis_results: Dict[str, Any], desired_width: float, texts: Dict[str, str],
+                         max_height: Optional[float] = None, prefer_vector: bool = False,
+                         viz_settings: Optional[Dict[str, Any]] = None) -> List[Any]:
+    """Diagramm als Flowable: Vektor-Drawing (reportlab.graphics), wenn gewünscht oder kein PNG vorliegt, sonst das PNG.
 
+    Fehlt das PNG aus der Streamlit-Session, wird es headless über pdf_chart_registry erzeugt (gecacht per Eingabe-Digest).
+    """
+    png_bytes = analysis_results.get(chart_key) if isinstance(analysis_results, dict) else None
+    has_png = isinstance(png_bytes, bytes) and bool(png_bytes)
+    spec = CHART_REGISTRY.get(chart_key) if _CHART_REGISTRY_AVAILABLE else None
+    if _VECTOR_CHARTS_AVAILABLE and chart_key in VECTOR_CHART_BUILDERS and (prefer_vector or not has_png):
+        if spec is not None and spec.kind == "vector":
+            drawing = build_chart(chart_key, analysis_results, viz_settings)
+            drawing = fit_drawing(drawing, desired_width, max_height) if drawing is not None else None
+        else:
+            drawing = build_vector_chart(chart_key, analysis_results, desired_width, max_height=max_height)
+        if drawing is not None:
+            drawing.hAlign = 'CENTER'
+            return [drawing]
+    if not has_png and spec is not None and spec.kind == "png" and isinstance(analysis_results, dict):
+        png_bytes = build_chart(chart_key, analysis_results, viz_settings)
+        has_png = isinstance(png_bytes, bytes) and bool(png_bytes)
+    if has_png:
+        return _get_image_flowable(png_bytes, desired_width, texts, max_height=max_height, align='CENTER')
+    return []
 
 def _get_image_flowable(image_data_input: Optional[Union[str, bytes]], desired_width: float, texts: Dict[str, str], caption_text_key: Optional[str] = None, max_height: Optional[float] = None, align: str = 'CENTER') -> List[Any]:
     flowables: List[Any] = []
@@ -1562,14 +1618,29 @@ def _prepare_simulation_table_for_pdf(analysis_results: Dict[str, Any], texts: D
     else: 
         analysis_results['cumulative_cash_flows_sim_display'] = [None] * sim_period_eff_pdf
 
+    # Spaltenweise formatieren (eine numpy-Operation je Spalte statt einer Formatierung je Zelle)
+    na_text_sim_pdf = get_text(texts, "value_not_available_short_pdf", "k.A.")
+    formatted_columns_pdf: List[List[str]] = []
+    for header_conf_item in header_config_pdf[1:]:
+        result_key_pdf, unit_pdf, precision_pdf = header_conf_item[1], header_conf_item[2], header_conf_item[3]
+        current_list_pdf = analysis_results.get(str(result_key_pdf), [])
+        column_values_pdf = list(current_list_pdf[:actual_years_to_display_pdf]) if isinstance(current_list_pdf, list) else []
+        column_values_pdf += [None] * (actual_years_to_display_pdf - len(column_values_pdf))
+        if unit_pdf == "Jahre":
+            formatted_column_pdf = [format_kpi_value(v, unit=unit_pdf, precision=precision_pdf, texts_dict=texts, na_text_key="value_not_available_short_pdf") for v in column_values_pdf]
+        else:
+            formatted_column_pdf = format_german_numbers(column_values_pdf, precision_pdf, unit_pdf, na_text_sim_pdf)
+            # Texte ("1.234,5"), ±Inf ("Nicht berechenbar") u. Ä. wie bisher über format_kpi_value
+            for idx_pdf, v in enumerate(column_values_pdf):
+                if v is not None and (not isinstance(v, numbers.Real) or math.isinf(v)):
+                    formatted_column_pdf[idx_pdf] = format_kpi_value(v, unit=unit_pdf, precision=precision_pdf, texts_dict=texts, na_text_key="value_not_available_short_pdf")
+        formatted_columns_pdf.append(formatted_column_pdf)
+
     for i_pdf in range(actual_years_to_display_pdf):
         row_items_formatted_pdf = [Paragraph(str(i_pdf + 1), STYLES.get(header_config_pdf[0][4]))]
-        for j_pdf, header_conf_item in enumerate(header_config_pdf[1:]):
-            result_key_pdf, unit_pdf, precision_pdf, style_name_data_pdf = header_conf_item[1], header_conf_item[2], header_conf_item[3], header_conf_item[4]
-            current_list_pdf = analysis_results.get(str(result_key_pdf), [])
-            value_to_format_pdf = current_list_pdf[i_pdf] if isinstance(current_list_pdf, list) and i_pdf < len(current_list_pdf) else None
-            formatted_str_pdf = format_kpi_value(value_to_format_pdf, unit=unit_pdf, precision=precision_pdf, texts_dict=texts, na_text_key="value_not_available_short_pdf")
-            row_items_formatted_pdf.append(Paragraph(str(formatted_str_pdf), STYLES.get(style_name_data_pdf, STYLES['TableText'])))
+        for header_conf_item, formatted_column_pdf in zip(header_config_pdf[1:], formatted_columns_pdf):
+            style_name_data_pdf = header_conf_item[4]
+            row_items_formatted_pdf.append(Paragraph(formatted_column_pdf[i_pdf], STYLES.get(style_name_data_pdf, STYLES['TableText'])))
         sim_data_for_pdf_final.append(row_items_formatted_pdf)
 
     if sim_period_eff_pdf > num_years_to_show:
@@ -1745,6 +1816,234 @@ def _add_product_details_to_story(
     story.append(KeepTogether(protected_elements))
 
 
+# --- Sektionsplan: Planungsphase von generate_offer_pdf ---
+# Der Plan enthält alles, was nur von Inklusionsoptionen und Texten abhängt (Reihenfolge,
+# nummerierte Titel, Diagramm-Slots, Anhangsquellen). Er ist unveränderlich und wird per
+# Digest gecacht, sodass Multi-Angebots-Läufe mit gleichen Optionen denselben Plan nutzen;
+# die Renderphase setzt nur noch die angebots- und firmenspezifischen Daten ein.
+
+OFFER_SECTION_DEFINITIONS: Tuple[Tuple[str, str, str, str, str], ...] = (
+    # (Sektion, Titel-Key, Standardtitel, Kapitel-Key, Standard-Kapitel)
+    ("ProjectOverview", "pdf_section_title_overview", "1. Projektübersicht & Eckdaten", "pdf_chapter_title_overview", "Projektübersicht"),
+    ("TechnicalComponents", "pdf_section_title_components", "2. Angebotene Systemkomponenten", "pdf_chapter_title_components", "Komponenten"),
+    ("CostDetails", "pdf_section_title_cost_details", "3. Detaillierte Kostenaufstellung", "pdf_chapter_title_cost_details", "Kosten"),
+    ("Economics", "pdf_section_title_economics", "4. Wirtschaftlichkeit im Überblick", "pdf_chapter_title_economics", "Wirtschaftlichkeit"),
+    ("SimulationDetails", "pdf_section_title_simulation", "5. Simulationsübersicht (Auszug)", "pdf_chapter_title_simulation", "Simulation"),
+    ("CO2Savings", "pdf_section_title_co2", "6. Ihre CO₂-Einsparung", "pdf_chapter_title_co2", "CO₂-Einsparung"),
+    ("Visualizations", "pdf_section_title_visualizations", "7. Grafische Auswertungen", "pdf_chapter_title_visualizations", "Visualisierungen"),
+    ("FutureAspects", "pdf_chapter_title_future_aspects", "8. Zukunftsaspekte & Erweiterungen", "pdf_chapter_title_future_aspects", "Zukunftsaspekte"),
+    # Optionale Seitenvorlagen (individuell gestaltbar)
+    ("CompanyProfile", "pdf_section_title_company_profile", "9. Unser Unternehmen", "pdf_chapter_title_company_profile", "Unternehmensprofil"),
+    ("Certifications", "pdf_section_title_certifications", "10. Zertifizierungen & Qualitätsstandards", "pdf_chapter_title_certifications", "Zertifizierungen & Qualität"),
+    ("References", "pdf_section_title_references", "11. Referenzen & Kundenerfahrungen", "pdf_chapter_title_references", "Referenzen & Kundenstimmen"),
+    ("Installation", "pdf_section_title_installation", "12. Professionelle Installation", "pdf_chapter_title_installation", "Installation & Montage"),
+    ("Maintenance", "pdf_section_title_maintenance", "13. Wartung & Langzeitservice", "pdf_chapter_title_maintenance", "Wartung & Service"),
+    ("Financing", "pdf_section_title_financing", "14. Flexible Finanzierungslösungen", "pdf_chapter_title_financing", "Finanzierungsmöglichkeiten"),
+    ("Insurance", "pdf_section_title_insurance", "15. Umfassender Versicherungsschutz", "pdf_chapter_title_insurance", "Versicherungsschutz"),
+    ("Warranty", "pdf_section_title_warranty", "16. Herstellergarantie & Gewährleistung", "pdf_chapter_title_warranty", "Garantie & Gewährleistung"),
+)
+
+# Mapping der Drag&Drop-Keys (Sektionsmanager) auf die Generator-Keys
+_DND_SECTION_KEY_MAP = {
+    'project_overview': 'ProjectOverview',
+    'technical_components': 'TechnicalComponents',
+    'cost_details': 'CostDetails',
+    'economics': 'Economics',
+}
+
+# Diagramme der Sektion "Visualizations" in Ausgabereihenfolge.
+# Sollte mit `chart_key_to_friendly_name_map` aus `pdf_ui.py` synchron bleiben.
+PDF_SECTION_CHARTS: Tuple[Tuple[str, str, str], ...] = (
+    ('monthly_prod_cons_chart_bytes', "pdf_chart_title_monthly_comp_pdf", "Monatl. Produktion/Verbrauch (2D)"),
+    ('cost_projection_chart_bytes', "pdf_chart_label_cost_projection", "Stromkosten-Hochrechnung (2D)"),
+    ('cumulative_cashflow_chart_bytes', "pdf_chart_label_cum_cashflow", "Kumulierter Cashflow (2D)"),
+    ('consumption_coverage_pie_chart_bytes', "pdf_chart_title_consumption_coverage_pdf", "Deckung Gesamtverbrauch (Jahr 1)"),
+    ('pv_usage_pie_chart_bytes', "pdf_chart_title_pv_usage_pdf", "Nutzung PV-Strom (Jahr 1)"),
+    ('daily_production_switcher_chart_bytes', "pdf_chart_label_daily_3d", "Tagesproduktion (3D)"),
+    ('weekly_production_switcher_chart_bytes', "pdf_chart_label_weekly_3d", "Wochenproduktion (3D)"),
+    ('yearly_production_switcher_chart_bytes', "pdf_chart_label_yearly_3d_bar", "Jahresproduktion (3D-Balken)"),
+    ('project_roi_matrix_switcher_chart_bytes', "pdf_chart_label_roi_matrix_3d", "Projektrendite-Matrix (3D)"),
+    ('feed_in_revenue_switcher_chart_bytes', "pdf_chart_label_feedin_3d", "Einspeisevergütung (3D)"),
+    ('prod_vs_cons_switcher_chart_bytes', "pdf_chart_label_prodcons_3d", "Verbr. vs. Prod. (3D)"),
+    ('tariff_cube_switcher_chart_bytes', "pdf_chart_label_tariffcube_3d", "Tarifvergleich (3D)"),
+    ('co2_savings_value_switcher_chart_bytes', "pdf_chart_label_co2value_3d", "CO2-Ersparnis vs. Wert (3D)"),
+    ('co2_savings_chart_bytes', "pdf_chart_label_co2_realistic", "CO₂-Einsparung (Realistische Darstellung)"),
+    ('investment_value_switcher_chart_bytes', "pdf_chart_label_investval_3D", "Investitionsnutzwert (3D)"),
+    ('storage_effect_switcher_chart_bytes', "pdf_chart_label_storageeff_3d", "Speicherwirkung (3D)"),
+    ('selfuse_stack_switcher_chart_bytes', "pdf_chart_label_selfusestack_3d", "Eigenverbr. vs. Einspeis. (3D)"),
+    ('cost_growth_switcher_chart_bytes', "pdf_chart_label_costgrowth_3d", "Stromkostensteigerung (3D)"),
+    ('selfuse_ratio_switcher_chart_bytes', "pdf_chart_label_selfuseratio_3d", "Eigenverbrauchsgrad (3D)"),
+    ('roi_comparison_switcher_chart_bytes', "pdf_chart_label_roicompare_3d", "ROI-Vergleich (3D)"),
+    ('scenario_comparison_switcher_chart_bytes', "pdf_chart_label_scenariocomp_3d", "Szenarienvergleich (3D)"),
+    ('tariff_comparison_switcher_chart_bytes', "pdf_chart_label_tariffcomp_3d", "Vorher/Nachher Stromkosten (3D)"),
+    ('income_projection_switcher_chart_bytes', "pdf_chart_label_incomeproj_3d", "Einnahmenprognose (3D)"),
+    ('yearly_production_chart_bytes', "pdf_chart_label_pvvis_yearly", "PV Visuals: Jahresproduktion"),
+    ('break_even_chart_bytes', "pdf_chart_label_pvvis_breakeven", "PV Visuals: Break-Even"),
+    ('amortisation_chart_bytes', "pdf_chart_label_pvvis_amort", "PV Visuals: Amortisation"),
+)
+
+# Produkt-Keys in project_details, deren Datenblätter angehängt werden (Zubehör nur bei aktivem Zubehör)
+DATASHEET_MAIN_COMPONENT_KEYS: Tuple[str, ...] = ("selected_module_id", "selected_inverter_id", "selected_storage_id")
+DATASHEET_OPTIONAL_COMPONENT_KEYS: Tuple[str, ...] = ('selected_wallbox_id', 'selected_ems_id', 'selected_optimizer_id',
+                                                     'selected_carport_id', 'selected_notstrom_id', 'selected_tierabwehr_id')
+
+# Inklusionsoptionen, die in den Plan einfließen (alle anderen sind Angebotsdaten)
+_PLAN_OPTION_KEYS: Tuple[str, ...] = (
+    "include_company_logo", "include_product_images", "include_all_documents", "company_document_ids_to_include",
+    "include_optional_component_details", "include_custom_footer", "include_header_logo", "chart_config",
+    "custom_section_order", "selected_charts_for_pdf", "skip_cover_and_letter",
+)
+_PLAN_TEXT_PREFIXES: Tuple[str, ...] = ("pdf_section_title_", "pdf_chapter_title_", "pdf_chart_", "chart_desc_")
+SECTION_PLAN_CACHE_SIZE = 32
+
+
+@dataclass(frozen=True)
+class PlannedSection:
+    key: str
+    number: int
+    title: str          # nummerierter Abschnittstitel, z. B. "3. Detaillierte Kostenaufstellung"
+    chapter_title: str  # Kapitelname für die Kopfzeile
+    default_title: str
+
+
+@dataclass(frozen=True)
+class PlannedChart:
+    key: str
+    title: str          # bereinigter Anzeigetitel
+    description: str
+
+
+@dataclass(frozen=True)
+class OfferSectionPlan:
+    """Unveränderlicher Ablaufplan des Legacy-Angebots (Renderphase setzt nur Daten ein)."""
+    sections: Tuple[PlannedSection, ...]
+    chart_slots: Tuple[PlannedChart, ...]
+    charts_requested: bool
+    skip_cover_and_letter: bool
+    include_company_logo: bool
+    include_product_images: bool
+    include_optional_component_details: bool
+    include_custom_footer: bool
+    include_header_logo: bool
+    prefer_vector_charts: bool
+    include_all_documents: bool
+    company_document_ids: Tuple[Any, ...]
+    digest: str = ""
+
+    def has_section(self, key: str) -> bool:
+        return any(section.key == key for section in self.sections)
+
+
+def _apply_custom_section_order(definitions: List[Tuple], custom_order: Any) -> List[Tuple]:
+    """Reihenfolge aus dem Drag&Drop-Manager (DnD- oder Generator-Keys) anwenden, Rest in Standardreihenfolge."""
+    if not isinstance(custom_order, list) or not custom_order:
+        return definitions
+    for preferred in ([_DND_SECTION_KEY_MAP[k] for k in custom_order if k in _DND_SECTION_KEY_MAP], custom_order):
+        section_map = {tpl[0]: tpl for tpl in definitions}
+        added = set()
+        reordered: List[Tuple] = []
+        for key in preferred:
+            if key in section_map and key not in added:
+                reordered.append(section_map[key])
+                added.add(key)
+        if not reordered:
+            continue
+        reordered.extend(tpl for tpl in definitions if tpl[0] not in added)
+        definitions = reordered
+    return definitions
+
+
+def _section_plan_digest(texts: Dict[str, str], sections_to_include: Optional[List[str]],
+                         inclusion_options: Dict[str, Any], skip_cover_and_letter: bool) -> str:
+    plan_texts = {k: v for k, v in (texts or {}).items() if isinstance(k, str) and k.startswith(_PLAN_TEXT_PREFIXES)}
+    payload = {
+        "sections": list(sections_to_include or []),
+        "options": {k: (inclusion_options or {}).get(k) for k in _PLAN_OPTION_KEYS},
+        "skip_cover_and_letter": bool(skip_cover_and_letter),
+        "texts": plan_texts,
+    }
+    raw = json.dumps(payload, sort_keys=True, default=repr, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _compile_section_plan(texts: Dict[str, str], sections_to_include: Optional[List[str]],
+                          inclusion_options: Dict[str, Any], skip_cover_and_letter: bool, digest: str) -> OfferSectionPlan:
+    options = inclusion_options or {}
+    active_sections = set(sections_to_include or [])
+    definitions = _apply_custom_section_order(list(OFFER_SECTION_DEFINITIONS), options.get('custom_section_order'))
+
+    sections: List[PlannedSection] = []
+    for key, title_key, default_title, chapter_key, default_chapter in definitions:
+        if key not in active_sections:
+            continue
+        short_default = default_title.split('. ', 1)[-1] if '. ' in default_title else default_title
+        number = len(sections) + 1
+        sections.append(PlannedSection(
+            key=key, number=number,
+            title=f"{number}. {get_text(texts, title_key, short_default)}",
+            chapter_title=get_text(texts, chapter_key, default_chapter),
+            default_title=default_title,
+        ))
+
+    selected_charts = options.get("selected_charts_for_pdf", []) or []
+    chart_slots = tuple(
+        PlannedChart(chart_key, _sanitize_chart_title(get_text(texts, title_key, default_title)),
+                     _get_chart_description(chart_key, texts))
+        for chart_key, title_key, default_title in PDF_SECTION_CHARTS
+        if chart_key in selected_charts
+    ) if "Visualizations" in active_sections else ()
+
+    return OfferSectionPlan(
+        sections=tuple(sections),
+        chart_slots=chart_slots,
+        charts_requested=bool(selected_charts),
+        skip_cover_and_letter=bool(skip_cover_and_letter),
+        include_company_logo=bool(options.get("include_company_logo", True)),
+        include_product_images=bool(options.get("include_product_images", True)),
+        include_optional_component_details=bool(options.get("include_optional_component_details", True)),
+        include_custom_footer=bool(options.get("include_custom_footer", True)),
+        include_header_logo=bool(options.get("include_header_logo", True)),
+        prefer_vector_charts=(options.get("chart_config") or {}).get("backend") == "vector",
+        include_all_documents=bool(options.get("include_all_documents", True)),
+        company_document_ids=tuple(options.get("company_document_ids_to_include", []) or []),
+        digest=digest,
+    )
+
+
+_section_plan_cache: "OrderedDict[str, OfferSectionPlan]" = OrderedDict()
+_section_plan_lock = threading.Lock()
+_section_plan_stats = {"hits": 0, "misses": 0}
+
+
+def build_offer_section_plan(texts: Dict[str, str], sections_to_include: Optional[List[str]],
+                             inclusion_options: Dict[str, Any], skip_cover_and_letter: bool = False) -> OfferSectionPlan:
+    """Liefert den (gecachten) Sektionsplan für Optionen + Texte.
+
+    Firmenspezifische Auswahl (z. B. company_document_ids_to_include) ist Teil der Optionen; Firmen
+    mit identischer Auswahl teilen sich denselben Plan.
+    """
+    digest = _section_plan_digest(texts, sections_to_include, inclusion_options, skip_cover_and_letter)
+    with _section_plan_lock:
+        plan = _section_plan_cache.get(digest)
+        if plan is not None:
+            _section_plan_cache.move_to_end(digest)
+            _section_plan_stats["hits"] += 1
+            return plan
+        _section_plan_stats["misses"] += 1
+    plan = _compile_section_plan(texts, sections_to_include, inclusion_options, skip_cover_and_letter, digest)
+    with _section_plan_lock:
+        _section_plan_cache[digest] = plan
+        while len(_section_plan_cache) > SECTION_PLAN_CACHE_SIZE:
+            _section_plan_cache.popitem(last=False)
+    return plan
+
+
+def section_plan_cache_info() -> Dict[str, int]:
+    with _section_plan_lock:
+        return {"hits": _section_plan_stats["hits"], "misses": _section_plan_stats["misses"], "size": len(_section_plan_cache)}
+
+
+@traced(entry_point=True)
 def generate_offer_pdf(
     project_data: Dict[str, Any],
     analysis_results: Optional[Dict[str, Any]],
@@ -1766,7 +2065,10 @@ def generate_offer_pdf(
 ) -> Optional[bytes]:
     # Frühzeitige Delegation: Verwende standardmäßig den neuen 7-Seiten-Template-Flow
     # Verhindere Rekursion mittels Flag 'disable_main_template_combiner'
-    if not kwargs.get('disable_main_template_combiner'):
+    outer_call = not kwargs.get('disable_main_template_combiner')
+    if outer_call:
+        if _PDF_COMPACTOR_AVAILABLE:
+            reset_compaction_report()
         try:
             combined_bytes = generate_offer_pdf_with_main_templates(
                 project_data=project_data,
@@ -1796,6 +2098,40 @@ def generate_offer_pdf(
         except Exception as e:
             print(f"WARN: Template-Combiner Exception – fallback auf Legacy-Generator: {e}")
 
+    offer_pdf = _generate_offer_pdf_legacy(
+        project_data, analysis_results, company_info, company_logo_base64,
+        selected_title_image_b64, selected_offer_title_text, selected_cover_letter_text,
+        sections_to_include, inclusion_options, load_admin_setting_func,
+        save_admin_setting_func, list_products_func, get_product_by_id_func,
+        db_list_company_documents_func, active_company_id, texts,
+        use_modern_design=use_modern_design, **kwargs,
+    )
+    # Kompakte Ausgabe nur im äußersten Aufruf (Zusatz-PDFs werden mit dem Gesamtdokument optimiert)
+    if outer_call and _PDF_COMPACTOR_AVAILABLE:
+        offer_pdf = compact_offer_pdf(offer_pdf, load_admin_setting_func, active_company_id)
+    return offer_pdf
+
+
+def _generate_offer_pdf_legacy(
+    project_data: Dict[str, Any],
+    analysis_results: Optional[Dict[str, Any]],
+    company_info: Dict[str, Any],
+    company_logo_base64: Optional[str],
+    selected_title_image_b64: Optional[str],
+    selected_offer_title_text: str,
+    selected_cover_letter_text: str,
+    sections_to_include: Optional[List[str]],
+    inclusion_options: Dict[str, Any],
+    load_admin_setting_func: Callable,
+    save_admin_setting_func: Callable,
+    list_products_func: Callable,
+    get_product_by_id_func: Callable,
+    db_list_company_documents_func: Callable[[int, Optional[str]], List[Dict[str, Any]]],
+    active_company_id: Optional[int],
+    texts: Dict[str, str],
+    use_modern_design: bool = True,    **kwargs
+) -> Optional[bytes]:
+    """Bisheriger ReportLab-Generator (ohne 7-Seiten-Templates und ohne kompakte Ausgabe)."""
     if not _REPORTLAB_AVAILABLE:
         if project_data and texts and company_info:
             return _create_plaintext_pdf_fallback(project_data, analysis_results, texts, company_info, selected_offer_title_text, selected_cover_letter_text)
@@ -1903,19 +2239,26 @@ def generate_offer_pdf(
     main_offer_buffer = io.BytesIO()
     offer_number_final = _get_next_offer_number(texts, load_admin_setting_func, save_admin_setting_func)
     
-    include_company_logo_opt = inclusion_options.get("include_company_logo", True)
-    include_product_images_opt = inclusion_options.get("include_product_images", True)
-    include_all_documents_opt = inclusion_options.get("include_all_documents", True) # Korrigierter Key
-    company_document_ids_to_include_opt = inclusion_options.get("company_document_ids_to_include", [])
-    include_optional_component_details_opt = inclusion_options.get("include_optional_component_details", True) # NEUE Option
-    
-    # NEUE OPTIONEN für Footer und Header-Logo (wie gewünscht)
-    include_custom_footer_opt = inclusion_options.get("include_custom_footer", True)  
-    include_header_logo_opt = inclusion_options.get("include_header_logo", True)
-    
+    # Planungsphase: Reihenfolge, Titel, Diagramm-Slots und Schalter aus dem gecachten Sektionsplan
+    section_plan: OfferSectionPlan = kwargs.get("section_plan") or build_offer_section_plan(
+        texts, sections_to_include, inclusion_options,
+        skip_cover_and_letter=bool(inclusion_options.get("skip_cover_and_letter", False) or kwargs.get("skip_cover_and_letter", False)),
+    )
+    include_company_logo_opt = section_plan.include_company_logo
+    include_product_images_opt = section_plan.include_product_images
+    include_all_documents_opt = section_plan.include_all_documents
+    company_document_ids_to_include_opt = list(section_plan.company_document_ids)
+    include_optional_component_details_opt = section_plan.include_optional_component_details
+    include_custom_footer_opt = section_plan.include_custom_footer
+    include_header_logo_opt = section_plan.include_header_logo
+    prefer_vector_charts = section_plan.prefer_vector_charts
+
     #  NEUE EXTENDED FEATURES (aus Session State)
     financing_config = inclusion_options.get("financing_config", {})
-    chart_config = inclusion_options.get("chart_config", {})
+    try:
+        chart_viz_settings = (load_admin_setting_func("global_constants", {}) or {}).get("visualization_settings") or {}
+    except Exception:
+        chart_viz_settings = {}
     custom_content_items = inclusion_options.get("custom_content_items", [])
     pdf_editor_config = inclusion_options.get("pdf_editor_config", {})
     pdf_design_config = inclusion_options.get("pdf_design_config", {})
@@ -1926,7 +2269,7 @@ def generate_offer_pdf(
 
     story: List[Any] = []
     # Optional: Deckblatt & Anschreiben überspringen (für Template-Hauptausgabe)
-    skip_cover_and_letter: bool = bool(inclusion_options.get("skip_cover_and_letter", False) or kwargs.get("skip_cover_and_letter", False))
+    skip_cover_and_letter: bool = section_plan.skip_cover_and_letter
     
     current_project_data_pdf = project_data if isinstance(project_data, dict) else {}
     current_analysis_results_pdf = analysis_results if isinstance(analysis_results, dict) else {}
@@ -2022,678 +2365,551 @@ def generate_offer_pdf(
             story.append(PageBreak())
         except Exception as e_letter:
             story.append(Paragraph(f"Fehler bei Erstellung des Anschreibens: {e_letter}", STYLES.get('NormalLeft')))
-            story.append(PageBreak())    # --- Dynamische Sektionen ---
-    active_sections_set_pdf = set(sections_to_include or [])
-    
-    section_chapter_titles_map = {
-        "ProjectOverview": get_text(texts, "pdf_chapter_title_overview", "Projektübersicht"),
-        "TechnicalComponents": get_text(texts, "pdf_chapter_title_components", "Komponenten"),
-        "CostDetails": get_text(texts, "pdf_chapter_title_cost_details", "Kosten"),
-        "Economics": get_text(texts, "pdf_chapter_title_economics", "Wirtschaftlichkeit"),
-        "SimulationDetails": get_text(texts, "pdf_chapter_title_simulation", "Simulation"),
-        "CO2Savings": get_text(texts, "pdf_chapter_title_co2", "CO₂-Einsparung"),
-        "Visualizations": get_text(texts, "pdf_chapter_title_visualizations", "Visualisierungen"),
-        "FutureAspects": get_text(texts, "pdf_chapter_title_future_aspects", "Zukunftsaspekte"),
-        
-        # NEUE OPTIONALE SEITENVORLAGEN (5+ wie gewünscht)
-        "CompanyProfile": get_text(texts, "pdf_chapter_title_company_profile", "Unternehmensprofil"),
-        "Certifications": get_text(texts, "pdf_chapter_title_certifications", "Zertifizierungen & Qualität"),
-        "References": get_text(texts, "pdf_chapter_title_references", "Referenzen & Kundenstimmen"), 
-        "Installation": get_text(texts, "pdf_chapter_title_installation", "Installation & Montage"),
-        "Maintenance": get_text(texts, "pdf_chapter_title_maintenance", "Wartung & Service"),        "Financing": get_text(texts, "pdf_chapter_title_financing", "Finanzierungsmöglichkeiten"),
-        "Insurance": get_text(texts, "pdf_chapter_title_insurance", "Versicherungsschutz"),
-        "Warranty": get_text(texts, "pdf_chapter_title_warranty", "Garantie & Gewährleistung")
-    }
-    
-    ordered_section_definitions_pdf = [
-        ("ProjectOverview", "pdf_section_title_overview", "1. Projektübersicht & Eckdaten"),
-        ("TechnicalComponents", "pdf_section_title_components", "2. Angebotene Systemkomponenten"),
-        ("CostDetails", "pdf_section_title_cost_details", "3. Detaillierte Kostenaufstellung"),
-        ("Economics", "pdf_section_title_economics", "4. Wirtschaftlichkeit im Überblick"),
-        ("SimulationDetails", "pdf_section_title_simulation", "5. Simulationsübersicht (Auszug)"),
-        ("CO2Savings", "pdf_section_title_co2", "6. Ihre CO₂-Einsparung"),
-        ("Visualizations", "pdf_section_title_visualizations", "7. Grafische Auswertungen"),
-        ("FutureAspects", "pdf_chapter_title_future_aspects", "8. Zukunftsaspekte & Erweiterungen"),
-        
-        # NEUE OPTIONALE SEITENVORLAGEN (individuell gestaltbar)
-        ("CompanyProfile", "pdf_section_title_company_profile", "9. Unser Unternehmen"),
-        ("Certifications", "pdf_section_title_certifications", "10. Zertifizierungen & Qualitätsstandards"),
-        ("References", "pdf_section_title_references", "11. Referenzen & Kundenerfahrungen"),
-        ("Installation", "pdf_section_title_installation", "12. Professionelle Installation"),
-        ("Maintenance", "pdf_section_title_maintenance", "13. Wartung & Langzeitservice"),
-        ("Financing", "pdf_section_title_financing", "14. Flexible Finanzierungslösungen"),
-        ("Insurance", "pdf_section_title_insurance", "15. Umfassender Versicherungsschutz"),        ("Warranty", "pdf_section_title_warranty", "16. Herstellergarantie & Gewährleistung")
-    ]
-    # Anwenden einer benutzerdefinierten Reihenfolge aus dem Drag&Drop-Manager (falls vorhanden)
-    try:
-        dnd_order = (inclusion_options or {}).get('custom_section_order')
-        if isinstance(dnd_order, list) and dnd_order:
-            # Mapping der DnD-Keys (Manager) auf die Generator-Keys
-            dnd_to_gen_map = {
-                'project_overview': 'ProjectOverview',
-                'technical_components': 'TechnicalComponents',
-                'cost_details': 'CostDetails',
-                'economics': 'Economics',
-                # Weitere Mappings können bei Bedarf ergänzt werden
-            }
-            preferred_gen_order = [dnd_to_gen_map[k] for k in dnd_order if k in dnd_to_gen_map]
-            if preferred_gen_order:
-                def_map = {k: tpl for (k, *rest), tpl in [((k, v1, v2), (k, v1, v2)) for (k, v1, v2) in ordered_section_definitions_pdf]}
-                seen = set()
-                reordered: list[tuple[str, str, str]] = []
-                for key in preferred_gen_order:
-                    if key in def_map and key not in seen:
-                        reordered.append(def_map[key]); seen.add(key)
-                for tpl in ordered_section_definitions_pdf:
-                    if tpl[0] not in seen:
-                        reordered.append(tpl); seen.add(tpl[0])
-                ordered_section_definitions_pdf = reordered
-    except Exception as _e_order:
-        # Still und robust: Bei Problemen Standard-Reihenfolge verwenden
-        pass
-    # Anwenden einer benutzerdefinierten Reihenfolge, falls vorhanden
-    try:
-        custom_order = (inclusion_options or {}).get('custom_section_order')
-        if isinstance(custom_order, list) and custom_order:
-            # Mapping von Key -> (Key, TitleKey, DefaultTitle)
-            section_map = {key: tpl for key, *rest in [(tpl[0], *tpl[1:]) for tpl in ordered_section_definitions_pdf] for tpl in [ (key, rest[0], rest[1]) ]}
-            # Obige Zeile formt eine Map, bewahrt aber das Tupel-Format
-            section_map = {tpl[0]: tpl for tpl in ordered_section_definitions_pdf}
-            added = set()
-            reordered: List[tuple] = []
-            # 1) Nach benutzerdefinierter Reihenfolge
-            for k in custom_order:
-                if k in section_map and k not in added:
-                    reordered.append(section_map[k])
-                    added.add(k)
-            # 2) Rest in Standard-Reihenfolge anfügen
-            for tpl in ordered_section_definitions_pdf:
-                if tpl[0] not in added:
-                    reordered.append(tpl)
-                    added.add(tpl[0])
-            ordered_section_definitions_pdf = reordered
-    except Exception as _e_custom_order:
-        # Bei Problemen mit der benutzerdefinierten Reihenfolge einfach Standardreihenfolge verwenden
-        pass
-    current_section_counter_pdf = 1
-    for section_key_current, title_text_key_current, default_title_current in ordered_section_definitions_pdf:
-        if section_key_current in active_sections_set_pdf:
-            try:
-                # SEITENUMBRUCH-SCHUTZ: Sammle alle Elemente einer Sektion
-                section_elements = []
+            story.append(PageBreak())
+
+    # --- Dynamische Sektionen (Renderphase des Sektionsplans) ---
+    for planned_section in section_plan.sections:
+        section_key_current = planned_section.key
+        default_title_current = planned_section.default_title
+        try:
+            # SEITENUMBRUCH-SCHUTZ: Sammle alle Elemente einer Sektion
+            section_elements = []
+            
+            story.append(SetCurrentChapterTitle(planned_section.chapter_title))
+            section_elements.append(Paragraph(planned_section.title, STYLES.get('SectionTitle')))
+            section_elements.append(Spacer(1, 0.2 * cm))
+
+            if section_key_current == "ProjectOverview":
+                if pv_details_pdf.get('visualize_roof_in_pdf_satellite', True) and pv_details_pdf.get('satellite_image_base64_data'):
+                    section_elements.append(Paragraph(get_text(texts,"satellite_image_header_pdf","Satellitenansicht Objekt"), STYLES.get('SubSectionTitle')))
+                    sat_img_flowables = _get_image_flowable(pv_details_pdf['satellite_image_base64_data'], available_width_content * 0.8, texts, caption_text_key="satellite_image_caption_pdf", max_height=10*cm)
+                    if sat_img_flowables: section_elements.extend(sat_img_flowables); section_elements.append(Spacer(1, 0.5*cm))
                 
-                chapter_title_for_header_current = section_chapter_titles_map.get(section_key_current, default_title_current.split('. ',1)[-1] if '. ' in default_title_current else default_title_current)
-                story.append(SetCurrentChapterTitle(chapter_title_for_header_current))
-                numbered_title_current = f"{current_section_counter_pdf}. {get_text(texts, title_text_key_current, default_title_current.split('. ',1)[-1] if '. ' in default_title_current else default_title_current)}"
-                section_elements.append(Paragraph(numbered_title_current, STYLES.get('SectionTitle')))
-                section_elements.append(Spacer(1, 0.2 * cm))
+                overview_data_content_pdf = [
+                    [get_text(texts,"anlage_size_label_pdf", "Anlagengröße"),format_kpi_value(current_analysis_results_pdf.get('anlage_kwp'),"kWp",texts_dict=texts, na_text_key="value_not_available_short_pdf")],
+                    [get_text(texts,"module_quantity_label_pdf","Anzahl Module"),str(pv_details_pdf.get('module_quantity', get_text(texts, "value_not_available_short_pdf")))],
+                    [get_text(texts,"annual_pv_production_kwh_pdf", "Jährliche PV-Produktion (ca.)"),format_kpi_value(current_analysis_results_pdf.get('annual_pv_production_kwh'),"kWh",precision=0,texts_dict=texts, na_text_key="value_not_available_short_pdf")],
+                    [get_text(texts,"self_supply_rate_percent_pdf", "Autarkiegrad (ca.)"),format_kpi_value(current_analysis_results_pdf.get('self_supply_rate_percent'),"%",precision=1,texts_dict=texts, na_text_key="value_not_available_short_pdf")],
+                ]
+                if pv_details_pdf.get('include_storage'):
+                     overview_data_content_pdf.extend([[get_text(texts,"selected_storage_capacity_label_pdf", "Speicherkapazität"),format_kpi_value(pv_details_pdf.get('selected_storage_storage_power_kw'),"kWh",texts_dict=texts, na_text_key="value_not_available_short_pdf")]])
+                if overview_data_content_pdf:
+                    overview_table_data_styled_content_pdf = [[Paragraph(str(cell[0]),STYLES.get('TableLabel')),Paragraph(str(cell[1]),STYLES.get('TableText'))] for cell in overview_data_content_pdf]
+                    overview_table_content_pdf = Table(overview_table_data_styled_content_pdf,colWidths=[available_width_content*0.5,available_width_content*0.5])
+                    overview_table_content_pdf.setStyle(TABLE_STYLE_DEFAULT)
+                    section_elements.append(overview_table_content_pdf)
+                
+                # SEITENUMBRUCH-SCHUTZ: Projektübersicht zusammenhalten
+                story.append(KeepTogether(section_elements))
+
+            elif section_key_current == "TechnicalComponents":
+                section_elements.append(Paragraph(get_text(texts, "pdf_components_intro", "Nachfolgend die Details zu den Kernkomponenten Ihrer Anlage:"), STYLES.get('NormalLeft')))
+                section_elements.append(Spacer(1, 0.3*cm))
+                
+                # Für TechnicalComponents sind die Produktdetails bereits mit KeepTogether geschützt
+                # Also nur Titel und Intro zusammenhalten
+                story.append(KeepTogether(section_elements))
+                
+                # Mengenhinweis für Wechselrichter (z. B. "(2x)")
+                inverter_qty_suffix = ""
+                try:
+                    inv_qty_val = int(pv_details_pdf.get("selected_inverter_quantity", 1) or 1)
+                    if inv_qty_val > 1:
+                        inverter_qty_suffix = f" ({inv_qty_val}x)"
+                except Exception:
+                    inverter_qty_suffix = ""
 
-                if section_key_current == "ProjectOverview":
-                    if pv_details_pdf.get('visualize_roof_in_pdf_satellite', True) and pv_details_pdf.get('satellite_image_base64_data'):
-                        section_elements.append(Paragraph(get_text(texts,"satellite_image_header_pdf","Satellitenansicht Objekt"), STYLES.get('SubSectionTitle')))
-                        sat_img_flowables = _get_image_flowable(pv_details_pdf['satellite_image_base64_data'], available_width_content * 0.8, texts, caption_text_key="satellite_image_caption_pdf", max_height=10*cm)
-                        if sat_img_flowables: section_elements.extend(sat_img_flowables); section_elements.append(Spacer(1, 0.5*cm))
+                main_components = [
+                    (pv_details_pdf.get("selected_module_id"), get_text(texts, "pdf_component_module_title", "PV-Module")),
+                    (pv_details_pdf.get("selected_inverter_id"), get_text(texts, "pdf_component_inverter_title", "Wechselrichter") + inverter_qty_suffix),
+                ]
+                if pv_details_pdf.get("include_storage"):
+                    main_components.append((pv_details_pdf.get("selected_storage_id"), get_text(texts, "pdf_component_storage_title", "Batteriespeicher")))
+                
+                for comp_id, comp_title in main_components:
+                    if comp_id: _add_product_details_to_story(story, comp_id, comp_title, texts, available_width_content, get_product_by_id_func, include_product_images_opt)
+
+                # ERWEITERUNG: Optionale Komponenten / Zubehör
+                if pv_details_pdf.get('include_additional_components', True) and include_optional_component_details_opt:
+                    story.append(Paragraph(get_text(texts, "pdf_additional_components_header_pdf", "Optionale Komponenten"), STYLES.get('SubSectionTitle')))
+                    optional_comps_map = {
+                        'selected_wallbox_id': get_text(texts, "pdf_component_wallbox_title", "Wallbox"),
+                        'selected_ems_id': get_text(texts, "pdf_component_ems_title", "Energiemanagementsystem"),
+                        'selected_optimizer_id': get_text(texts, "pdf_component_optimizer_title", "Leistungsoptimierer"),
+                        'selected_carport_id': get_text(texts, "pdf_component_carport_title", "Solarcarport"),
+                        'selected_notstrom_id': get_text(texts, "pdf_component_emergency_power_title", "Notstromversorgung"),
+                        'selected_tierabwehr_id': get_text(texts, "pdf_component_animal_defense_title", "Tierabwehrschutz")
+                    }
+                    any_optional_component_rendered = False
+                    for key, title in optional_comps_map.items():
+                        opt_comp_id = pv_details_pdf.get(key)
+                        if opt_comp_id: 
+                            _add_product_details_to_story(story, opt_comp_id, title, texts, available_width_content, get_product_by_id_func, include_product_images_opt)
+                            any_optional_component_rendered = True
+                    if not any_optional_component_rendered:
+                        story.append(Paragraph(get_text(texts, "pdf_no_optional_components_selected_for_details", "Keine optionalen Komponenten für Detailanzeige ausgewählt."), STYLES.get('NormalLeft')))
                     
-                    overview_data_content_pdf = [
-                        [get_text(texts,"anlage_size_label_pdf", "Anlagengröße"),format_kpi_value(current_analysis_results_pdf.get('anlage_kwp'),"kWp",texts_dict=texts, na_text_key="value_not_available_short_pdf")],
-                        [get_text(texts,"module_quantity_label_pdf","Anzahl Module"),str(pv_details_pdf.get('module_quantity', get_text(texts, "value_not_available_short_pdf")))],
-                        [get_text(texts,"annual_pv_production_kwh_pdf", "Jährliche PV-Produktion (ca.)"),format_kpi_value(current_analysis_results_pdf.get('annual_pv_production_kwh'),"kWh",precision=0,texts_dict=texts, na_text_key="value_not_available_short_pdf")],
-                        [get_text(texts,"self_supply_rate_percent_pdf", "Autarkiegrad (ca.)"),format_kpi_value(current_analysis_results_pdf.get('self_supply_rate_percent'),"%",precision=1,texts_dict=texts, na_text_key="value_not_available_short_pdf")],
-                    ]
-                    if pv_details_pdf.get('include_storage'):
-                         overview_data_content_pdf.extend([[get_text(texts,"selected_storage_capacity_label_pdf", "Speicherkapazität"),format_kpi_value(pv_details_pdf.get('selected_storage_storage_power_kw'),"kWh",texts_dict=texts, na_text_key="value_not_available_short_pdf")]])
-                    if overview_data_content_pdf:
-                        overview_table_data_styled_content_pdf = [[Paragraph(str(cell[0]),STYLES.get('TableLabel')),Paragraph(str(cell[1]),STYLES.get('TableText'))] for cell in overview_data_content_pdf]
-                        overview_table_content_pdf = Table(overview_table_data_styled_content_pdf,colWidths=[available_width_content*0.5,available_width_content*0.5])
-                        overview_table_content_pdf.setStyle(TABLE_STYLE_DEFAULT)
-                        section_elements.append(overview_table_content_pdf)
+            elif section_key_current == "CostDetails":
+                cost_table_data_final_pdf = _prepare_cost_table_for_pdf(current_analysis_results_pdf, texts)
+                if cost_table_data_final_pdf:
+                    cost_table_obj_final_pdf = Table(cost_table_data_final_pdf, colWidths=[available_width_content*0.6, available_width_content*0.4])
+                    cost_table_obj_final_pdf.setStyle(TABLE_STYLE_DEFAULT)
                     
-                    # SEITENUMBRUCH-SCHUTZ: Projektübersicht zusammenhalten
-                    story.append(KeepTogether(section_elements))
-
-                elif section_key_current == "TechnicalComponents":
-                    section_elements.append(Paragraph(get_text(texts, "pdf_components_intro", "Nachfolgend die Details zu den Kernkomponenten Ihrer Anlage:"), STYLES.get('NormalLeft')))
-                    section_elements.append(Spacer(1, 0.3*cm))
+                    # SEITENUMBRUCH-SCHUTZ für Kostentabelle
+                    cost_elements = [cost_table_obj_final_pdf]
                     
-                    # Für TechnicalComponents sind die Produktdetails bereits mit KeepTogether geschützt
-                    # Also nur Titel und Intro zusammenhalten
-                    story.append(KeepTogether(section_elements))
+                    if current_analysis_results_pdf.get('base_matrix_price_netto', 0.0) == 0 and current_analysis_results_pdf.get('cost_storage_aufpreis_product_db_netto', 0.0) > 0: 
+                        cost_elements.extend([Spacer(1,0.2*cm), Paragraph(get_text(texts, "analysis_storage_cost_note_single_price_pdf", "<i>Hinweis: Speicherkosten als Einzelposten, da kein Matrix-Pauschalpreis.</i>"), STYLES.get('TableTextSmall'))])
+                    elif current_analysis_results_pdf.get('base_matrix_price_netto', 0.0) > 0 and current_analysis_results_pdf.get('cost_storage_aufpreis_product_db_netto', 0.0) > 0:
+                        cost_elements.extend([Spacer(1,0.2*cm), Paragraph(get_text(texts, "analysis_storage_cost_note_matrix_pdf", "<i>Hinweis: Speicherkosten als Aufpreis, da Matrixpreis 'Ohne Speicher' verwendet wurde.</i>"), STYLES.get('TableTextSmall'))])
                     
-                    # Mengenhinweis für Wechselrichter (z. B. "(2x)")
-                    inverter_qty_suffix = ""
-                    try:
-                        inv_qty_val = int(pv_details_pdf.get("selected_inverter_quantity", 1) or 1)
-                        if inv_qty_val > 1:
-                            inverter_qty_suffix = f" ({inv_qty_val}x)"
-                    except Exception:
-                        inverter_qty_suffix = ""
-
-                    main_components = [
-                        (pv_details_pdf.get("selected_module_id"), get_text(texts, "pdf_component_module_title", "PV-Module")),
-                        (pv_details_pdf.get("selected_inverter_id"), get_text(texts, "pdf_component_inverter_title", "Wechselrichter") + inverter_qty_suffix),
-                    ]
-                    if pv_details_pdf.get("include_storage"):
-                        main_components.append((pv_details_pdf.get("selected_storage_id"), get_text(texts, "pdf_component_storage_title", "Batteriespeicher")))
+                    section_elements.extend(cost_elements)
+                
+                # SEITENUMBRUCH-SCHUTZ: Kostendetails zusammenhalten
+                story.append(KeepTogether(section_elements))
+
+            elif section_key_current == "Economics":
+                #  ERWEITERTE FINANZIERUNGSANALYSE
+                if financing_config and financing_config.get('enabled', False):
+                    # Advanced Financing Header
+                    section_elements.append(Paragraph(get_text(texts, "pdf_advanced_financing_title", " ERWEITERTE FINANZIERUNGSANALYSE"), STYLES.get('SectionTitle')))
+                    section_elements.append(Spacer(1, 0.3*cm))
                     
-                    for comp_id, comp_title in main_components:
-                        if comp_id: _add_product_details_to_story(story, comp_id, comp_title, texts, available_width_content, get_product_by_id_func, include_product_images_opt)
-
-                    # ERWEITERUNG: Optionale Komponenten / Zubehör
-                    if pv_details_pdf.get('include_additional_components', True) and include_optional_component_details_opt:
-                        story.append(Paragraph(get_text(texts, "pdf_additional_components_header_pdf", "Optionale Komponenten"), STYLES.get('SubSectionTitle')))
-                        optional_comps_map = {
-                            'selected_wallbox_id': get_text(texts, "pdf_component_wallbox_title", "Wallbox"),
-                            'selected_ems_id': get_text(texts, "pdf_component_ems_title", "Energiemanagementsystem"),
-                            'selected_optimizer_id': get_text(texts, "pdf_component_optimizer_title", "Leistungsoptimierer"),
-                            'selected_carport_id': get_text(texts, "pdf_component_carport_title", "Solarcarport"),
-                            'selected_notstrom_id': get_text(texts, "pdf_component_emergency_power_title", "Notstromversorgung"),
-                            'selected_tierabwehr_id': get_text(texts, "pdf_component_animal_defense_title", "Tierabwehrschutz")
-                        }
-                        any_optional_component_rendered = False
-                        for key, title in optional_comps_map.items():
-                            opt_comp_id = pv_details_pdf.get(key)
-                            if opt_comp_id: 
-                                _add_product_details_to_story(story, opt_comp_id, title, texts, available_width_content, get_product_by_id_func, include_product_images_opt)
-                                any_optional_component_rendered = True
-                        if not any_optional_component_rendered:
-                            story.append(Paragraph(get_text(texts, "pdf_no_optional_components_selected_for_details", "Keine optionalen Komponenten für Detailanzeige ausgewählt."), STYLES.get('NormalLeft')))
+                    # Scenario Comparison
+                    if financing_config.get('scenario_analysis', False):
+                        section_elements.append(Paragraph(get_text(texts, "pdf_financing_scenarios_title", " FINANZIERUNGSSZENARIEN"), STYLES.get('SubSectionTitle')))
                         
-                elif section_key_current == "CostDetails":
-                    cost_table_data_final_pdf = _prepare_cost_table_for_pdf(current_analysis_results_pdf, texts)
-                    if cost_table_data_final_pdf:
-                        cost_table_obj_final_pdf = Table(cost_table_data_final_pdf, colWidths=[available_width_content*0.6, available_width_content*0.4])
-                        cost_table_obj_final_pdf.setStyle(TABLE_STYLE_DEFAULT)
+                        scenarios = ['conservative', 'balanced', 'aggressive']
+                        scenario_labels = {
+                            'conservative': 'Konservativ',
+                            'balanced': 'Ausgeglichen', 
+                            'aggressive': 'Optimistisch'
+                        }
                         
-                        # SEITENUMBRUCH-SCHUTZ für Kostentabelle
-                        cost_elements = [cost_table_obj_final_pdf]
+                        scenario_data = []
+                        scenario_data.append(['Szenario', 'ROI Jahr 1', 'Amortisation', 'Gesamtersparniss 20J'])
                         
-                        if current_analysis_results_pdf.get('base_matrix_price_netto', 0.0) == 0 and current_analysis_results_pdf.get('cost_storage_aufpreis_product_db_netto', 0.0) > 0: 
-                            cost_elements.extend([Spacer(1,0.2*cm), Paragraph(get_text(texts, "analysis_storage_cost_note_single_price_pdf", "<i>Hinweis: Speicherkosten als Einzelposten, da kein Matrix-Pauschalpreis.</i>"), STYLES.get('TableTextSmall'))])
-                        elif current_analysis_results_pdf.get('base_matrix_price_netto', 0.0) > 0 and current_analysis_results_pdf.get('cost_storage_aufpreis_product_db_netto', 0.0) > 0:
-                            cost_elements.extend([Spacer(1,0.2*cm), Paragraph(get_text(texts, "analysis_storage_cost_note_matrix_pdf", "<i>Hinweis: Speicherkosten als Aufpreis, da Matrixpreis 'Ohne Speicher' verwendet wurde.</i>"), STYLES.get('TableTextSmall'))])
+                        for scenario in scenarios:
+                            if scenario in financing_config:
+                                config = financing_config[scenario]
+                                scenario_data.append([
+                                    scenario_labels[scenario],
+                                    f"{config.get('roi_year_1', 0):.1f}%",
+                                    f"{config.get('payback_years', 0):.1f} Jahre",
+                                    f"{config.get('total_savings_20y', 0):,.0f} €"
+                                ])
                         
-                        section_elements.extend(cost_elements)
+                        if len(scenario_data) > 1:
+                            scenario_table = Table(scenario_data, colWidths=[
+                                available_width_content*0.25,
+                                available_width_content*0.25,
+                                available_width_content*0.25,
+                                available_width_content*0.25
+                            ])
+                            scenario_table.setStyle(TABLE_STYLE_DEFAULT)
+                            section_elements.append(scenario_table)
+                            section_elements.append(Spacer(1, 0.3*cm))
                     
-                    # SEITENUMBRUCH-SCHUTZ: Kostendetails zusammenhalten
-                    story.append(KeepTogether(section_elements))
-
-                elif section_key_current == "Economics":
-                    #  ERWEITERTE FINANZIERUNGSANALYSE
-                    if financing_config and financing_config.get('enabled', False):
-                        # Advanced Financing Header
-                        section_elements.append(Paragraph(get_text(texts, "pdf_advanced_financing_title", " ERWEITERTE FINANZIERUNGSANALYSE"), STYLES.get('SectionTitle')))
+                    # Sensitivity Analysis
+                    if financing_config.get('sensitivity_analysis', False):
+                        section_elements.append(Paragraph(get_text(texts, "pdf_sensitivity_analysis_title", " SENSITIVITÄTSANALYSE"), STYLES.get('SubSectionTitle')))
+                        
+                        sensitivity_text = f"""
+                        <b>Einfluss verschiedener Parameter auf die Rentabilität:</b><br/>
+                        • Strompreissteigerung: {financing_config.get('electricity_price_increase', 3)}% p.a.<br/>
+                        • Inflation: {financing_config.get('inflation_rate', 2)}% p.a.<br/>
+                        • Degradation PV-Module: {financing_config.get('module_degradation', 0.5)}% p.a.<br/>
+                        • Eigenverbrauchsquote: {financing_config.get('self_consumption_ratio', 30)}-{financing_config.get('self_consumption_ratio', 30)+20}%<br/>
+                        """
+                        
+                        section_elements.append(Paragraph(sensitivity_text, STYLES.get('NormalLeft')))
                         section_elements.append(Spacer(1, 0.3*cm))
+                    
+                    # Financing Options
+                    if financing_config.get('financing_options', False):
+                        section_elements.append(Paragraph(get_text(texts, "pdf_financing_options_title", " FINANZIERUNGSOPTIONEN"), STYLES.get('SubSectionTitle')))
                         
-                        # Scenario Comparison
-                        if financing_config.get('scenario_analysis', False):
-                            section_elements.append(Paragraph(get_text(texts, "pdf_financing_scenarios_title", " FINANZIERUNGSSZENARIEN"), STYLES.get('SubSectionTitle')))
-                            
-                            scenarios = ['conservative', 'balanced', 'aggressive']
-                            scenario_labels = {
-                                'conservative': 'Konservativ',
-                                'balanced': 'Ausgeglichen', 
-                                'aggressive': 'Optimistisch'
-                            }
-                            
-                            scenario_data = []
-                            scenario_data.append(['Szenario', 'ROI Jahr 1', 'Amortisation', 'Gesamtersparniss 20J'])
-                            
-                            for scenario in scenarios:
-                                if scenario in financing_config:
-                                    config = financing_config[scenario]
-                                    scenario_data.append([
-                                        scenario_labels[scenario],
-                                        f"{config.get('roi_year_1', 0):.1f}%",
-                                        f"{config.get('payback_years', 0):.1f} Jahre",
-                                        f"{config.get('total_savings_20y', 0):,.0f} €"
-                                    ])
-                            
-                            if len(scenario_data) > 1:
-                                scenario_table = Table(scenario_data, colWidths=[
-                                    available_width_content*0.25,
-                                    available_width_content*0.25,
-                                    available_width_content*0.25,
-                                    available_width_content*0.25
-                                ])
-                                scenario_table.setStyle(TABLE_STYLE_DEFAULT)
-                                section_elements.append(scenario_table)
-                                section_elements.append(Spacer(1, 0.3*cm))
+                        financing_options_data = []
+                        financing_options_data.append(['Option', 'Zinssatz', 'Laufzeit', 'Monatl. Rate'])
                         
-                        # Sensitivity Analysis
-                        if financing_config.get('sensitivity_analysis', False):
-                            section_elements.append(Paragraph(get_text(texts, "pdf_sensitivity_analysis_title", " SENSITIVITÄTSANALYSE"), STYLES.get('SubSectionTitle')))
-                            
-                            sensitivity_text = f"""
-                            <b>Einfluss verschiedener Parameter auf die Rentabilität:</b><br/>
-                            • Strompreissteigerung: {financing_config.get('electricity_price_increase', 3)}% p.a.<br/>
-                            • Inflation: {financing_config.get('inflation_rate', 2)}% p.a.<br/>
-                            • Degradation PV-Module: {financing_config.get('module_degradation', 0.5)}% p.a.<br/>
-                            • Eigenverbrauchsquote: {financing_config.get('self_consumption_ratio', 30)}-{financing_config.get('self_consumption_ratio', 30)+20}%<br/>
-                            """
-                            
-                            section_elements.append(Paragraph(sensitivity_text, STYLES.get('NormalLeft')))
-                            section_elements.append(Spacer(1, 0.3*cm))
+                        if financing_config.get('bank_loan'):
+                            loan = financing_config['bank_loan']
+                            financing_options_data.append([
+                                'Bankkredit',
+                                f"{loan.get('interest_rate', 0):.2f}%",
+                                f"{loan.get('duration_years', 0)} Jahre",
+                                f"{loan.get('monthly_payment', 0):,.0f} €"
+                            ])
                         
-                        # Financing Options
-                        if financing_config.get('financing_options', False):
-                            section_elements.append(Paragraph(get_text(texts, "pdf_financing_options_title", " FINANZIERUNGSOPTIONEN"), STYLES.get('SubSectionTitle')))
-                            
-                            financing_options_data = []
-                            financing_options_data.append(['Option', 'Zinssatz', 'Laufzeit', 'Monatl. Rate'])
-                            
-                            if financing_config.get('bank_loan'):
-                                loan = financing_config['bank_loan']
-                                financing_options_data.append([
-                                    'Bankkredit',
-                                    f"{loan.get('interest_rate', 0):.2f}%",
-                                    f"{loan.get('duration_years', 0)} Jahre",
-                                    f"{loan.get('monthly_payment', 0):,.0f} €"
-                                ])
-                            
-                            if financing_config.get('kfw_loan'):
-                                kfw = financing_config['kfw_loan']
-                                financing_options_data.append([
-                                    'KfW-Förderung',
-                                    f"{kfw.get('interest_rate', 0):.2f}%",
-                                    f"{kfw.get('duration_years', 0)} Jahre",
-                                    f"{kfw.get('monthly_payment', 0):,.0f} €"
-                                ])
-                            
-                            if len(financing_options_data) > 1:
-                                financing_table = Table(financing_options_data, colWidths=[
-                                    available_width_content*0.25,
-                                    available_width_content*0.25,
-                                    available_width_content*0.25,
-                                    available_width_content*0.25
-                                ])
-                                financing_table.setStyle(TABLE_STYLE_DEFAULT)
-                                section_elements.append(financing_table)
-                                section_elements.append(Spacer(1, 0.5*cm))
-
-                    # Standard Economics Data
-                    eco_kpi_data_for_pdf_table = [
-                        [get_text(texts, "total_investment_brutto_pdf", "Gesamtinvestition (Brutto)"), format_kpi_value(current_analysis_results_pdf.get('total_investment_brutto'), "€", texts_dict=texts, na_text_key="value_not_calculated_short_pdf")],
-                        [get_text(texts, "annual_financial_benefit_pdf", "Finanzieller Vorteil (Jahr 1, ca.)"), format_kpi_value(current_analysis_results_pdf.get('annual_financial_benefit_year1'), "€", texts_dict=texts, na_text_key="value_not_calculated_short_pdf")],
-                        [get_text(texts, "amortization_time_years_pdf", "Amortisationszeit (ca.)"), format_kpi_value(current_analysis_results_pdf.get('amortization_time_years'), "Jahre", texts_dict=texts, na_text_key="value_not_calculated_short_pdf")],
-                        [get_text(texts, "simple_roi_percent_label_pdf", "Einfache Rendite (Jahr 1, ca.)"), format_kpi_value(current_analysis_results_pdf.get('simple_roi_percent'), "%", precision=1, texts_dict=texts, na_text_key="value_not_calculated_short_pdf")],
-                        [get_text(texts, "lcoe_euro_per_kwh_label_pdf", "Stromgestehungskosten (LCOE, ca.)"), format_kpi_value(current_analysis_results_pdf.get('lcoe_euro_per_kwh'), "€/kWh", precision=3, texts_dict=texts, na_text_key="value_not_calculated_short_pdf")],
-                        [get_text(texts, "npv_over_years_pdf", "Kapitalwert über Laufzeit (NPV, ca.)"), format_kpi_value(current_analysis_results_pdf.get('npv_value'), "€", texts_dict=texts, na_text_key="value_not_calculated_short_pdf")],
-                        [get_text(texts, "irr_percent_pdf", "Interner Zinsfuß (IRR, ca.)"), format_kpi_value(current_analysis_results_pdf.get('irr_percent'), "%", precision=1, texts_dict=texts, na_text_key="value_not_calculated_short_pdf")]                    ]
-                    if eco_kpi_data_for_pdf_table:
-                        eco_kpi_table_styled_content = [[Paragraph(str(cell[0]), STYLES.get('TableLabel')), Paragraph(str(cell[1]), STYLES.get('TableNumber'))] for cell in eco_kpi_data_for_pdf_table]
-                        eco_table_object = Table(eco_kpi_table_styled_content, colWidths=[available_width_content*0.6, available_width_content*0.4])
-                        eco_table_object.setStyle(TABLE_STYLE_DEFAULT)
-                        section_elements.append(eco_table_object)
-                    
-                    # SEITENUMBRUCH-SCHUTZ: Economics zusammenhalten
-                    story.append(KeepTogether(section_elements))
+                        if financing_config.get('kfw_loan'):
+                            kfw = financing_config['kfw_loan']
+                            financing_options_data.append([
+                                'KfW-Förderung',
+                                f"{kfw.get('interest_rate', 0):.2f}%",
+                                f"{kfw.get('duration_years', 0)} Jahre",
+                                f"{kfw.get('monthly_payment', 0):,.0f} €"
+                            ])
                         
-                elif section_key_current == "SimulationDetails":
-                    sim_table_data_content_pdf = _prepare_simulation_table_for_pdf(current_analysis_results_pdf, texts, num_years_to_show=10)
-                    if len(sim_table_data_content_pdf) > 1:
-                        sim_table_obj_final_pdf = Table(sim_table_data_content_pdf, colWidths=None)
-                        sim_table_obj_final_pdf.setStyle(DATA_TABLE_STYLE)
-                        section_elements.append(sim_table_obj_final_pdf)
-                    else: 
-                        section_elements.append(Paragraph(get_text(texts, "pdf_simulation_data_not_available", "Simulationsdetails nicht ausreichend für Tabellendarstellung."), STYLES.get('NormalLeft')))
+                        if len(financing_options_data) > 1:
+                            financing_table = Table(financing_options_data, colWidths=[
+                                available_width_content*0.25,
+                                available_width_content*0.25,
+                                available_width_content*0.25,
+                                available_width_content*0.25
+                            ])
+                            financing_table.setStyle(TABLE_STYLE_DEFAULT)
+                            section_elements.append(financing_table)
+                            section_elements.append(Spacer(1, 0.5*cm))
+
+                # Standard Economics Data
+                eco_kpi_data_for_pdf_table = [
+                    [get_text(texts, "total_investment_brutto_pdf", "Gesamtinvestition (Brutto)"), format_kpi_value(current_analysis_results_pdf.get('total_investment_brutto'), "€", texts_dict=texts, na_text_key="value_not_calculated_short_pdf")],
+                    [get_text(texts, "annual_financial_benefit_pdf", "Finanzieller Vorteil (Jahr 1, ca.)"), format_kpi_value(current_analysis_results_pdf.get('annual_financial_benefit_year1'), "€", texts_dict=texts, na_text_key="value_not_calculated_short_pdf")],
+                    [get_text(texts, "amortization_time_years_pdf", "Amortisationszeit (ca.)"), format_kpi_value(current_analysis_results_pdf.get('amortization_time_years'), "Jahre", texts_dict=texts, na_text_key="value_not_calculated_short_pdf")],
+                    [get_text(texts, "simple_roi_percent_label_pdf", "Einfache Rendite (Jahr 1, ca.)"), format_kpi_value(current_analysis_results_pdf.get('simple_roi_percent'), "%", precision=1, texts_dict=texts, na_text_key="value_not_calculated_short_pdf")],
+                    [get_text(texts, "lcoe_euro_per_kwh_label_pdf", "Stromgestehungskosten (LCOE, ca.)"), format_kpi_value(current_analysis_results_pdf.get('lcoe_euro_per_kwh'), "€/kWh", precision=3, texts_dict=texts, na_text_key="value_not_calculated_short_pdf")],
+                    [get_text(texts, "npv_over_years_pdf", "Kapitalwert über Laufzeit (NPV, ca.)"), format_kpi_value(current_analysis_results_pdf.get('npv_value'), "€", texts_dict=texts, na_text_key="value_not_calculated_short_pdf")],
+                    [get_text(texts, "irr_percent_pdf", "Interner Zinsfuß (IRR, ca.)"), format_kpi_value(current_analysis_results_pdf.get('irr_percent'), "%", precision=1, texts_dict=texts, na_text_key="value_not_calculated_short_pdf")]                    ]
+                if eco_kpi_data_for_pdf_table:
+                    eco_kpi_table_styled_content = [[Paragraph(str(cell[0]), STYLES.get('TableLabel')), Paragraph(str(cell[1]), STYLES.get('TableNumber'))] for cell in eco_kpi_data_for_pdf_table]
+                    eco_table_object = Table(eco_kpi_table_styled_content, colWidths=[available_width_content*0.6, available_width_content*0.4])
+                    eco_table_object.setStyle(TABLE_STYLE_DEFAULT)
+                    section_elements.append(eco_table_object)
+                
+                # SEITENUMBRUCH-SCHUTZ: Economics zusammenhalten
+                story.append(KeepTogether(section_elements))
                     
-                    # SEITENUMBRUCH-SCHUTZ: Simulation zusammenhalten
-                    story.append(KeepTogether(section_elements))
-
-                elif section_key_current == "CO2Savings":
-                    co2_savings_val = current_analysis_results_pdf.get('annual_co2_savings_kg', 0.0)
-                    trees_equiv = current_analysis_results_pdf.get('co2_equivalent_trees_per_year', 0.0)
-                    car_km_equiv = current_analysis_results_pdf.get('co2_equivalent_car_km_per_year', 0.0)
-                    airplane_km_equiv = co2_savings_val / 0.23 if co2_savings_val > 0 else 0.0
+            elif section_key_current == "SimulationDetails":
+                sim_table_data_content_pdf = _prepare_simulation_table_for_pdf(current_analysis_results_pdf, texts, num_years_to_show=10)
+                if len(sim_table_data_content_pdf) > 1:
+                    sim_table_obj_final_pdf = Table(sim_table_data_content_pdf, colWidths=None)
+                    sim_table_obj_final_pdf.setStyle(DATA_TABLE_STYLE)
+                    section_elements.append(sim_table_obj_final_pdf)
+                else: 
+                    section_elements.append(Paragraph(get_text(texts, "pdf_simulation_data_not_available", "Simulationsdetails nicht ausreichend für Tabellendarstellung."), STYLES.get('NormalLeft')))
+                
+                # SEITENUMBRUCH-SCHUTZ: Simulation zusammenhalten
+                story.append(KeepTogether(section_elements))
+
+            elif section_key_current == "CO2Savings":
+                co2_savings_val = current_analysis_results_pdf.get('annual_co2_savings_kg', 0.0)
+                trees_equiv = current_analysis_results_pdf.get('co2_equivalent_trees_per_year', 0.0)
+                car_km_equiv = current_analysis_results_pdf.get('co2_equivalent_car_km_per_year', 0.0)
+                airplane_km_equiv = co2_savings_val / 0.23 if co2_savings_val > 0 else 0.0
+                
+                # Verbesserter CO₂-Text mit mehr Details und professioneller Formatierung
+                co2_intro = get_text(texts, "pdf_co2_intro", "Mit Ihrer neuen Photovoltaikanlage leisten Sie einen wertvollen Beitrag zum Klimaschutz:")
+                section_elements.append(Paragraph(co2_intro, STYLES.get('NormalLeft')))
+                section_elements.append(Spacer(1, 0.2 * cm))
+                
+                # Haupteinsparung hervorheben
+                co2_main = get_text(texts, "pdf_annual_co2_main", " <b>Jährliche CO₂-Einsparung: {co2_savings_kg_formatted} kg</b>").format(
+                    co2_savings_kg_formatted=format_kpi_value(co2_savings_val, "", precision=0, texts_dict=texts)
+                )
+                section_elements.append(Paragraph(co2_main, STYLES.get('HeadingCenter')))
+                section_elements.append(Spacer(1, 0.3 * cm))
+                
+                # Anschauliche Vergleiche in einer schönen Tabelle
+                co2_data = [
+                    [get_text(texts, "pdf_co2_comparison_header", "Vergleich"), get_text(texts, "pdf_co2_equivalent_header", "Entspricht")],
+                    [" Bäume (CO₂-Bindung)", f"{trees_equiv:.0f} Bäume pro Jahr"],
+                    [" Autofahrten", f"{car_km_equiv:,.0f} km weniger pro Jahr"],
+                    [" Flugreisen", f"{airplane_km_equiv:,.0f} km weniger pro Jahr"],
+                    [" CO₂-Fußabdruck", get_text(texts, "pdf_co2_footprint_reduction", "Deutliche Reduktion Ihres persönlichen CO₂-Fußabdrucks")]
+                ]
+                
+                co2_table = Table(co2_data, colWidths=[8*cm, 8*cm])
+                co2_table.setStyle(TableStyle([
+                    # Header-Stil
+                    ('BACKGROUND', (0, 0), (-1, 0), COLORS['table_header_bg']),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), COLORS['table_header_text']),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, 0), 11),
+                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+                    ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
                     
-                    # Verbesserter CO₂-Text mit mehr Details und professioneller Formatierung
-                    co2_intro = get_text(texts, "pdf_co2_intro", "Mit Ihrer neuen Photovoltaikanlage leisten Sie einen wertvollen Beitrag zum Klimaschutz:")
-                    section_elements.append(Paragraph(co2_intro, STYLES.get('NormalLeft')))
-                    section_elements.append(Spacer(1, 0.2 * cm))
+                    # Datenzeilen
+                    ('BACKGROUND', (0, 1), (-1, -1), COLORS['table_row_bg']),
+                    ('TEXTCOLOR', (0, 1), (-1, -1), COLORS['text_dark']),
+                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+                    ('FONTSIZE', (0, 1), (-1, -1), 10),
+                    ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+                    ('ALIGN', (1, 1), (1, -1), 'RIGHT'),
+                    ('VALIGN', (0, 1), (-1, -1), 'MIDDLE'),
                     
-                    # Haupteinsparung hervorheben
-                    co2_main = get_text(texts, "pdf_annual_co2_main", " <b>Jährliche CO₂-Einsparung: {co2_savings_kg_formatted} kg</b>").format(
-                        co2_savings_kg_formatted=format_kpi_value(co2_savings_val, "", precision=0, texts_dict=texts)
-                    )
-                    section_elements.append(Paragraph(co2_main, STYLES.get('HeadingCenter')))
-                    section_elements.append(Spacer(1, 0.3 * cm))
+                    # Rahmen und Linien
+                    ('GRID', (0, 0), (-1, -1), 1, COLORS['table_border']),
+                    ('LINEBELOW', (0, 0), (-1, 0), 2, COLORS['accent_primary']),
                     
-                    # Anschauliche Vergleiche in einer schönen Tabelle
-                    co2_data = [
-                        [get_text(texts, "pdf_co2_comparison_header", "Vergleich"), get_text(texts, "pdf_co2_equivalent_header", "Entspricht")],
-                        [" Bäume (CO₂-Bindung)", f"{trees_equiv:.0f} Bäume pro Jahr"],
-                        [" Autofahrten", f"{car_km_equiv:,.0f} km weniger pro Jahr"],
-                        [" Flugreisen", f"{airplane_km_equiv:,.0f} km weniger pro Jahr"],
-                        [" CO₂-Fußabdruck", get_text(texts, "pdf_co2_footprint_reduction", "Deutliche Reduktion Ihres persönlichen CO₂-Fußabdrucks")]
-                    ]
+                    # Zebra-Streifen für bessere Lesbarkeit
+                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [COLORS['table_row_bg'], COLORS['table_alt_row_bg']]),
                     
-                    co2_table = Table(co2_data, colWidths=[8*cm, 8*cm])
-                    co2_table.setStyle(TableStyle([
-                        # Header-Stil
-                        ('BACKGROUND', (0, 0), (-1, 0), COLORS['table_header_bg']),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), COLORS['table_header_text']),
-                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0, 0), (-1, 0), 11),
-                        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                        ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
+                    # Padding
+                    ('TOPPADDING', (0, 0), (-1, -1), 8),
+                    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+                    ('LEFTPADDING', (0, 0), (-1, -1), 10),
+                    ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+                ]))
+                
+                section_elements.append(co2_table)
+                section_elements.append(Spacer(1, 0.3 * cm))
+                
+                # CO₂-Grafik einfügen, falls verfügbar
+                co2_chart_bytes = current_analysis_results_pdf.get('co2_savings_chart_bytes')
+                if prefer_vector_charts or not co2_chart_bytes:
+                    co2_flowables = _get_chart_flowables('co2_savings_chart_bytes', current_analysis_results_pdf, 16*cm, texts, max_height=10*cm, prefer_vector=True, viz_settings=chart_viz_settings)
+                    if co2_flowables:
+                        section_elements.extend(co2_flowables)
+                        section_elements.append(Spacer(1, 0.2 * cm))
+                elif co2_chart_bytes:
+                    try:
+                        co2_img = ImageReader(io.BytesIO(co2_chart_bytes))
+                        co2_image = Image(co2_img, width=16*cm, height=10*cm)
+                        section_elements.append(co2_image)
+                        section_elements.append(Spacer(1, 0.2 * cm))
+                    except Exception as e:
+                        print(f"Fehler beim Einfügen der CO₂-Grafik: {e}")
+                
+                # Abschließender motivierender Text
+                co2_conclusion = get_text(texts, "pdf_co2_conclusion", "Diese Zahlen verdeutlichen den positiven Umweltbeitrag Ihrer Photovoltaikanlage. Über die gesamte Betriebsdauer von 25+ Jahren summiert sich die CO₂-Einsparung auf mehrere Tonnen – ein wichtiger Schritt für den Klimaschutz und nachfolgende Generationen.")
+                section_elements.append(Paragraph(co2_conclusion, STYLES.get('NormalLeft')))
+                
+                # SEITENUMBRUCH-SCHUTZ: CO2Savings zusammenhalten
+                story.append(KeepTogether(section_elements))
+
+            elif section_key_current == "Visualizations":
+                # INTRO nur als Überschrift - keine gemeinsame Sektion
+                intro_elements = []
+                intro_elements.append(Paragraph(get_text(texts, "pdf_visualizations_intro", "Die folgenden Diagramme visualisieren die Ergebnisse Ihrer Photovoltaikanlage und deren Wirtschaftlichkeit:"), STYLES.get('NormalLeft')))
+                intro_elements.append(Spacer(1, 0.5 * cm))
+                story.append(KeepTogether(intro_elements))
+                
+                charts_added_count = 0
+                
+                # SMARTES LAYOUT: Gruppiere Diagramme für optimale Seitenaufteilung
+                charts_per_page = 3  # Max 3 Diagramme pro Seite
+                current_page_chart_count = 0
+                
+                # Diagramm-Slots aus dem Plan (nur vom Nutzer ausgewählte, Titel/Beschreibung bereits aufgelöst)
+                for chart_slot in section_plan.chart_slots:
+                    chart_key = chart_slot.key
+                    chart_image_bytes = current_analysis_results_pdf.get(chart_key)
+                    # NOCH KLEINERE DIAGRAMMGRÖSSE für 3 pro Seite
+                    chart_width = available_width_content * 0.6  # Reduziert von 0.7 auf 0.6
+                    max_height = 5*cm  # Reduziert von 6cm auf 5cm für mehr Platz
+                    img_flowables_chart = _get_chart_flowables(chart_key, current_analysis_results_pdf, chart_width, texts, max_height=max_height, prefer_vector=prefer_vector_charts, viz_settings=chart_viz_settings)
+                    if img_flowables_chart or (chart_image_bytes and isinstance(chart_image_bytes, bytes)):
+                        # NEUE SEITE wenn bereits 3 Diagramme auf aktueller Seite
+                        if current_page_chart_count >= charts_per_page:
+                            story.append(PageBreak())
+                            current_page_chart_count = 0
                         
-                        # Datenzeilen
-                        ('BACKGROUND', (0, 1), (-1, -1), COLORS['table_row_bg']),
-                        ('TEXTCOLOR', (0, 1), (-1, -1), COLORS['text_dark']),
-                        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                        ('FONTSIZE', (0, 1), (-1, -1), 10),
-                        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-                        ('ALIGN', (1, 1), (1, -1), 'RIGHT'),
-                        ('VALIGN', (0, 1), (-1, -1), 'MIDDLE'),
+                        # KOMPAKTERE DIAGRAMME für mehrere pro Seite
+                        chart_elements = []
                         
-                        # Rahmen und Linien
-                        ('GRID', (0, 0), (-1, -1), 1, COLORS['table_border']),
-                        ('LINEBELOW', (0, 0), (-1, 0), 2, COLORS['accent_primary']),
+                        chart_display_title = chart_slot.title
                         
-                        # Zebra-Streifen für bessere Lesbarkeit
-                        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [COLORS['table_row_bg'], COLORS['table_alt_row_bg']]),
+                        # Chart Title (kompakter)
+                        chart_elements.append(Paragraph(f"<b>{chart_display_title}</b>", STYLES.get('SubSectionTitle')))
+                        chart_elements.append(Spacer(1, 0.1*cm))
                         
-                        # Padding
-                        ('TOPPADDING', (0, 0), (-1, -1), 8),
-                        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                        ('LEFTPADDING', (0, 0), (-1, -1), 10),
-                        ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-                    ]))
-                    
-                    section_elements.append(co2_table)
-                    section_elements.append(Spacer(1, 0.3 * cm))
-                    
-                    # CO₂-Grafik einfügen, falls verfügbar
-                    co2_chart_bytes = current_analysis_results_pdf.get('co2_savings_chart_bytes')
-                    if co2_chart_bytes:
-                        try:
-                            co2_img = ImageReader(io.BytesIO(co2_chart_bytes))
-                            co2_image = Image(co2_img, width=16*cm, height=10*cm)
-                            section_elements.append(co2_image)
-                            section_elements.append(Spacer(1, 0.2 * cm))
-                        except Exception as e:
-                            print(f"Fehler beim Einfügen der CO₂-Grafik: {e}")
-                    
-                    # Abschließender motivierender Text
-                    co2_conclusion = get_text(texts, "pdf_co2_conclusion", "Diese Zahlen verdeutlichen den positiven Umweltbeitrag Ihrer Photovoltaikanlage. Über die gesamte Betriebsdauer von 25+ Jahren summiert sich die CO₂-Einsparung auf mehrere Tonnen – ein wichtiger Schritt für den Klimaschutz und nachfolgende Generationen.")
-                    section_elements.append(Paragraph(co2_conclusion, STYLES.get('NormalLeft')))
-                    
-                    # SEITENUMBRUCH-SCHUTZ: CO2Savings zusammenhalten
-                    story.append(KeepTogether(section_elements))
-
-                elif section_key_current == "Visualizations":
-                    # INTRO nur als Überschrift - keine gemeinsame Sektion
-                    intro_elements = []
-                    intro_elements.append(Paragraph(get_text(texts, "pdf_visualizations_intro", "Die folgenden Diagramme visualisieren die Ergebnisse Ihrer Photovoltaikanlage und deren Wirtschaftlichkeit:"), STYLES.get('NormalLeft')))
-                    intro_elements.append(Spacer(1, 0.5 * cm))
-                    story.append(KeepTogether(intro_elements))
-                    
-                    # ERWEITERUNG: Vollständige Liste der Diagramme für PDF-Auswahl
-                    # Diese Map sollte idealerweise mit `chart_key_to_friendly_name_map` aus `pdf_ui.py` synchronisiert werden.
-                    charts_config_for_pdf_generator = {
-                        'monthly_prod_cons_chart_bytes': {"title_key": "pdf_chart_title_monthly_comp_pdf", "default_title": "Monatl. Produktion/Verbrauch (2D)"},
-                        'cost_projection_chart_bytes': {"title_key": "pdf_chart_label_cost_projection", "default_title": "Stromkosten-Hochrechnung (2D)"},
-                        'cumulative_cashflow_chart_bytes': {"title_key": "pdf_chart_label_cum_cashflow", "default_title": "Kumulierter Cashflow (2D)"},
-                        'consumption_coverage_pie_chart_bytes': {"title_key": "pdf_chart_title_consumption_coverage_pdf", "default_title": "Deckung Gesamtverbrauch (Jahr 1)"},
-                        'pv_usage_pie_chart_bytes': {"title_key": "pdf_chart_title_pv_usage_pdf", "default_title": "Nutzung PV-Strom (Jahr 1)"},
-                        'daily_production_switcher_chart_bytes': {"title_key": "pdf_chart_label_daily_3d", "default_title": "Tagesproduktion (3D)"},
-                        'weekly_production_switcher_chart_bytes': {"title_key": "pdf_chart_label_weekly_3d", "default_title": "Wochenproduktion (3D)"},
-                        'yearly_production_switcher_chart_bytes': {"title_key": "pdf_chart_label_yearly_3d_bar", "default_title": "Jahresproduktion (3D-Balken)"},
-                        'project_roi_matrix_switcher_chart_bytes': {"title_key": "pdf_chart_label_roi_matrix_3d", "default_title": "Projektrendite-Matrix (3D)"},
-                        'feed_in_revenue_switcher_chart_bytes': {"title_key": "pdf_chart_label_feedin_3d", "default_title": "Einspeisevergütung (3D)"},
-                        'prod_vs_cons_switcher_chart_bytes': {"title_key": "pdf_chart_label_prodcons_3d", "default_title": "Verbr. vs. Prod. (3D)"},
-                        'tariff_cube_switcher_chart_bytes': {"title_key": "pdf_chart_label_tariffcube_3d", "default_title": "Tarifvergleich (3D)"},
-                        'co2_savings_value_switcher_chart_bytes': {"title_key": "pdf_chart_label_co2value_3d", "default_title": "CO2-Ersparnis vs. Wert (3D)"},
-                        'co2_savings_chart_bytes': {"title_key": "pdf_chart_label_co2_realistic", "default_title": "CO₂-Einsparung (Realistische Darstellung)"},
-                        'investment_value_switcher_chart_bytes': {"title_key": "pdf_chart_label_investval_3D", "default_title": "Investitionsnutzwert (3D)"},
-                        'storage_effect_switcher_chart_bytes': {"title_key": "pdf_chart_label_storageeff_3d", "default_title": "Speicherwirkung (3D)"},
-                        'selfuse_stack_switcher_chart_bytes': {"title_key": "pdf_chart_label_selfusestack_3d", "default_title": "Eigenverbr. vs. Einspeis. (3D)"},
-                        'cost_growth_switcher_chart_bytes': {"title_key": "pdf_chart_label_costgrowth_3d", "default_title": "Stromkostensteigerung (3D)"},
-                        'selfuse_ratio_switcher_chart_bytes': {"title_key": "pdf_chart_label_selfuseratio_3d", "default_title": "Eigenverbrauchsgrad (3D)"},
-                        'roi_comparison_switcher_chart_bytes': {"title_key": "pdf_chart_label_roicompare_3d", "default_title": "ROI-Vergleich (3D)"},
-                        'scenario_comparison_switcher_chart_bytes': {"title_key": "pdf_chart_label_scenariocomp_3d", "default_title": "Szenarienvergleich (3D)"},
-                        'tariff_comparison_switcher_chart_bytes': {"title_key": "pdf_chart_label_tariffcomp_3d", "default_title": "Vorher/Nachher Stromkosten (3D)"},
-                        'income_projection_switcher_chart_bytes': {"title_key": "pdf_chart_label_incomeproj_3d", "default_title": "Einnahmenprognose (3D)"},
-                        'yearly_production_chart_bytes': {"title_key": "pdf_chart_label_pvvis_yearly", "default_title": "PV Visuals: Jahresproduktion"},
-                        'break_even_chart_bytes': {"title_key": "pdf_chart_label_pvvis_breakeven", "default_title": "PV Visuals: Break-Even"},
-                        'amortisation_chart_bytes': {"title_key": "pdf_chart_label_pvvis_amort", "default_title": "PV Visuals: Amortisation"},
-                    }
-                    charts_added_count = 0
-                    selected_charts_for_pdf_opt = inclusion_options.get("selected_charts_for_pdf", [])
-                    
-                    # SMARTES LAYOUT: Gruppiere Diagramme für optimale Seitenaufteilung
-                    charts_per_page = 3  # Max 3 Diagramme pro Seite
-                    current_page_chart_count = 0
-                    
-                    # Chart-spezifische Verarbeitung basierend auf Konfiguration
-                    for chart_key, config in charts_config_for_pdf_generator.items():
-                        if chart_key not in selected_charts_for_pdf_opt:
-                            continue # Überspringe dieses Diagramm, wenn nicht vom Nutzer ausgewählt
-
-                        chart_image_bytes = current_analysis_results_pdf.get(chart_key)
-                        if chart_image_bytes and isinstance(chart_image_bytes, bytes):
-                            # NEUE SEITE wenn bereits 3 Diagramme auf aktueller Seite
-                            if current_page_chart_count >= charts_per_page:
-                                story.append(PageBreak())
-                                current_page_chart_count = 0
-                            
-                            # KOMPAKTERE DIAGRAMME für mehrere pro Seite
-                            chart_elements = []
-                            
-                            chart_display_title = get_text(texts, config["title_key"], config["default_title"])
-                            chart_display_title = _sanitize_chart_title(chart_display_title)
+                        if img_flowables_chart: 
+                            chart_elements.extend(img_flowables_chart)
+                            chart_elements.append(Spacer(1, 0.2*cm))
+                            # Kompakte KPI-Zeile oberhalb der Beschreibung
+                            kpi_html = _build_chart_kpi_html(chart_key, current_analysis_results_pdf, texts)
+                            if kpi_html:
+                                chart_elements.append(Paragraph(kpi_html, STYLES.get('TableTextSmall')))
+                                chart_elements.append(Spacer(1, 0.15*cm))
                             
-                            # Chart Title (kompakter)
-                            chart_elements.append(Paragraph(f"<b>{chart_display_title}</b>", STYLES.get('SubSectionTitle')))
-                            chart_elements.append(Spacer(1, 0.1*cm))
+                            # DIAGRAMM-BESCHREIBUNG hinzufügen
+                            chart_elements.append(Paragraph(f"<i>{chart_slot.description}</i>", STYLES.get('TableTextSmall')))
+                            chart_elements.append(Spacer(1, 0.4*cm))
                             
-                            # NOCH KLEINERE DIAGRAMMGRÖSSE für 3 pro Seite
-                            chart_width = available_width_content * 0.6  # Reduziert von 0.7 auf 0.6
-                            max_height = 5*cm  # Reduziert von 6cm auf 5cm für mehr Platz
-                            
-                            img_flowables_chart = _get_image_flowable(chart_image_bytes, chart_width, texts, max_height=max_height, align='CENTER')
-                            if img_flowables_chart: 
-                                chart_elements.extend(img_flowables_chart)
-                                chart_elements.append(Spacer(1, 0.2*cm))
-                                # Kompakte KPI-Zeile oberhalb der Beschreibung
-                                kpi_html = _build_chart_kpi_html(chart_key, current_analysis_results_pdf, texts)
-                                if kpi_html:
-                                    chart_elements.append(Paragraph(kpi_html, STYLES.get('TableTextSmall')))
-                                    chart_elements.append(Spacer(1, 0.15*cm))
-                                
-                                # DIAGRAMM-BESCHREIBUNG hinzufügen
-                                chart_description = _get_chart_description(chart_key, texts)
-                                chart_elements.append(Paragraph(f"<i>{chart_description}</i>", STYLES.get('TableTextSmall')))
-                                chart_elements.append(Spacer(1, 0.4*cm))
-                                
-                                # KOMPAKTERER SEITENUMBRUCH-SCHUTZ: Nur einzelnes Chart schützen
-                                story.append(KeepTogether(chart_elements))
-                                charts_added_count += 1
-                                current_page_chart_count += 1
-                            else: 
-                                chart_elements.append(Paragraph(get_text(texts, "pdf_chart_load_error_placeholder_param", f"(Fehler beim Laden: {chart_display_title})"), STYLES.get('NormalCenter')))
-                                chart_elements.append(Spacer(1, 0.3*cm))
-                                story.append(KeepTogether(chart_elements))
-                                current_page_chart_count += 1
-                    
-                    if charts_added_count == 0 and selected_charts_for_pdf_opt : # Wenn Charts ausgewählt wurden, aber keine gerendert werden konnten
-                         fallback_elements = []
-                         fallback_elements.append(Paragraph(get_text(texts, "pdf_selected_charts_not_renderable", "Ausgewählte Diagramme konnten nicht geladen/angezeigt werden."), STYLES.get('NormalCenter')))
-                         story.append(KeepTogether(fallback_elements))
-                    elif not selected_charts_for_pdf_opt : # Wenn gar keine Charts ausgewählt wurden
-                         fallback_elements = []
-                         fallback_elements.append(Paragraph(get_text(texts, "pdf_no_charts_selected_for_section", "Keine Diagramme für diese Sektion ausgewählt."), STYLES.get('NormalCenter')))
-                         story.append(KeepTogether(fallback_elements))
-
-                elif section_key_current == "FutureAspects":
-                    future_aspects_text = ""
-                    if pv_details_pdf.get('future_ev'):
-                        future_aspects_text += get_text(texts, "pdf_future_ev_text_param", "<b>E-Mobilität:</b> Die Anlage ist auf eine zukünftige Erweiterung um ein Elektrofahrzeug vorbereitet. Der prognostizierte PV-Anteil an der Fahrzeugladung beträgt ca. {eauto_pv_coverage_kwh:.0f} kWh/Jahr.").format(eauto_pv_coverage_kwh=current_analysis_results_pdf.get('eauto_ladung_durch_pv_kwh',0.0)) + "<br/>"
-                    if pv_details_pdf.get('future_hp'):
-                        future_aspects_text += get_text(texts, "pdf_future_hp_text_param", "<b>Wärmepumpe:</b> Die Anlage kann zur Unterstützung einer zukünftigen Wärmepumpe beitragen. Der geschätzte PV-Deckungsgrad für die Wärmepumpe liegt bei ca. {hp_pv_coverage_pct:.0f}%. ").format(hp_pv_coverage_pct=current_analysis_results_pdf.get('pv_deckungsgrad_wp_pct',0.0)) + "<br/>"
-                    if not future_aspects_text: future_aspects_text = get_text(texts, "pdf_no_future_aspects_selected", "Keine spezifischen Zukunftsaspekte für dieses Angebot ausgewählt.")
-                    section_elements.append(Paragraph(future_aspects_text, STYLES.get('NormalLeft')))
-                    
-                    # SEITENUMBRUCH-SCHUTZ: FutureAspects zusammenhalten
-                    story.append(KeepTogether(section_elements))
+                            # KOMPAKTERER SEITENUMBRUCH-SCHUTZ: Nur einzelnes Chart schützen
+                            story.append(KeepTogether(chart_elements))
+                            charts_added_count += 1
+                            current_page_chart_count += 1
+                        else: 
+                            chart_elements.append(Paragraph(get_text(texts, "pdf_chart_load_error_placeholder_param", f"(Fehler beim Laden: {chart_display_title})"), STYLES.get('NormalCenter')))
+                            chart_elements.append(Spacer(1, 0.3*cm))
+                            story.append(KeepTogether(chart_elements))
+                            current_page_chart_count += 1
                 
-                # NEUE OPTIONALE SEITENVORLAGEN (individuell gestaltbar, wie gewünscht)
-                elif section_key_current == "CompanyProfile":
-                    company_profile_text = get_text(texts, "pdf_company_profile_content", 
-                        f"<b>{company_info.get('name', 'Unser Unternehmen')}</b><br/><br/>"
-                        f"Mit langjähriger Erfahrung im Bereich Photovoltaik sind wir Ihr zuverlässiger Partner für nachhaltige Energielösungen. "
-                        f"Unser engagiertes Team begleitet Sie von der ersten Beratung bis zur finalen Inbetriebnahme Ihrer Anlage.<br/><br/>"
-                        f"<b>Kontakt:</b><br/>"
-                        f" {company_info.get('street', '')}, {company_info.get('zip_code', '')} {company_info.get('city', '')}<br/>"
-                        f" {company_info.get('phone', '')}<br/>"
-                        f" {company_info.get('email', '')}")
-                    section_elements.append(Paragraph(company_profile_text, STYLES.get('NormalLeft')))
-                    
-                    # SEITENUMBRUCH-SCHUTZ: CompanyProfile zusammenhalten
-                    story.append(KeepTogether(section_elements))
+                if charts_added_count == 0 and section_plan.charts_requested: # Wenn Charts ausgewählt wurden, aber keine gerendert werden konnten
+                     fallback_elements = []
+                     fallback_elements.append(Paragraph(get_text(texts, "pdf_selected_charts_not_renderable", "Ausgewählte Diagramme konnten nicht geladen/angezeigt werden."), STYLES.get('NormalCenter')))
+                     story.append(KeepTogether(fallback_elements))
+                elif not section_plan.charts_requested: # Wenn gar keine Charts ausgewählt wurden
+                     fallback_elements = []
+                     fallback_elements.append(Paragraph(get_text(texts, "pdf_no_charts_selected_for_section", "Keine Diagramme für diese Sektion ausgewählt."), STYLES.get('NormalCenter')))
+                     story.append(KeepTogether(fallback_elements))
+
+            elif section_key_current == "FutureAspects":
+                future_aspects_text = ""
+                if pv_details_pdf.get('future_ev'):
+                    future_aspects_text += get_text(texts, "pdf_future_ev_text_param", "<b>E-Mobilität:</b> Die Anlage ist auf eine zukünftige Erweiterung um ein Elektrofahrzeug vorbereitet. Der prognostizierte PV-Anteil an der Fahrzeugladung beträgt ca. {eauto_pv_coverage_kwh:.0f} kWh/Jahr.").format(eauto_pv_coverage_kwh=current_analysis_results_pdf.get('eauto_ladung_durch_pv_kwh',0.0)) + "<br/>"
+                if pv_details_pdf.get('future_hp'):
+                    future_aspects_text += get_text(texts, "pdf_future_hp_text_param", "<b>Wärmepumpe:</b> Die Anlage kann zur Unterstützung einer zukünftigen Wärmepumpe beitragen. Der geschätzte PV-Deckungsgrad für die Wärmepumpe liegt bei ca. {hp_pv_coverage_pct:.0f}%. ").format(hp_pv_coverage_pct=current_analysis_results_pdf.get('pv_deckungsgrad_wp_pct',0.0)) + "<br/>"
+                if not future_aspects_text: future_aspects_text = get_text(texts, "pdf_no_future_aspects_selected", "Keine spezifischen Zukunftsaspekte für dieses Angebot ausgewählt.")
+                section_elements.append(Paragraph(future_aspects_text, STYLES.get('NormalLeft')))
                 
-                elif section_key_current == "Certifications":
-                    cert_text = get_text(texts, "pdf_certifications_content",
-                        "<b>Unsere Zertifizierungen & Qualitätsstandards:</b><br/><br/>"
-                        " <b>VDE-Zertifizierung</b> - Elektrotechnische Sicherheit<br/>"
-                        " <b>Meisterbetrieb</b> - Handwerkliche Qualität<br/>"
-                        " <b>IHK-Sachverständiger</b> - Technische Expertise<br/>"
-                        " <b>ISO 9001</b> - Qualitätsmanagementsystem<br/>"
-                        " <b>Fachbetrieb für Photovoltaik</b> - Spezialisierung<br/><br/>"
-                        "Alle Komponenten entsprechen den aktuellen DIN- und VDE-Normen.")
-                    section_elements.append(Paragraph(cert_text, STYLES.get('NormalLeft')))
-                    
-                    # SEITENUMBRUCH-SCHUTZ: Certifications zusammenhalten
-                    story.append(KeepTogether(section_elements))
+                # SEITENUMBRUCH-SCHUTZ: FutureAspects zusammenhalten
+                story.append(KeepTogether(section_elements))
+            
+            # NEUE OPTIONALE SEITENVORLAGEN (individuell gestaltbar, wie gewünscht)
+            elif section_key_current == "CompanyProfile":
+                company_profile_text = get_text(texts, "pdf_company_profile_content", 
+                    f"<b>{company_info.get('name', 'Unser Unternehmen')}</b><br/><br/>"
+                    f"Mit langjähriger Erfahrung im Bereich Photovoltaik sind wir Ihr zuverlässiger Partner für nachhaltige Energielösungen. "
+                    f"Unser engagiertes Team begleitet Sie von der ersten Beratung bis zur finalen Inbetriebnahme Ihrer Anlage.<br/><br/>"
+                    f"<b>Kontakt:</b><br/>"
+                    f" {company_info.get('street', '')}, {company_info.get('zip_code', '')} {company_info.get('city', '')}<br/>"
+                    f" {company_info.get('phone', '')}<br/>"
+                    f" {company_info.get('email', '')}")
+                section_elements.append(Paragraph(company_profile_text, STYLES.get('NormalLeft')))
                 
-                elif section_key_current == "References":
-                    ref_text = get_text(texts, "pdf_references_content",
-                        "<b>Referenzen & Kundenerfahrungen:</b><br/><br/>"
-                        " <i>\"Professionelle Beratung und saubere Montage. Unsere Anlage läuft seit 2 Jahren perfekt!\"</i><br/>"
-                        "- Familie Müller, 8,5 kWp Anlage<br/><br/>"
-                        " <i>\"Von der Planung bis zur Inbetriebnahme - alles aus einer Hand und termingerecht.\"</i><br/>"
-                        "- Herr Schmidt, 12 kWp mit Speicher<br/><br/>"
-                        " <i>\"Kompetente Beratung, faire Preise, einwandfreie Ausführung. Sehr empfehlenswert!\"</i><br/>"
-                        "- Frau Weber, 6,2 kWp Anlage<br/><br/>"
-                        "<b>Über 500 zufriedene Kunden</b> vertrauen auf unsere Expertise.")
-                    section_elements.append(Paragraph(ref_text, STYLES.get('NormalLeft')))
-                    
-                    # SEITENUMBRUCH-SCHUTZ: References zusammenhalten
-                    story.append(KeepTogether(section_elements))
+                # SEITENUMBRUCH-SCHUTZ: CompanyProfile zusammenhalten
+                story.append(KeepTogether(section_elements))
+            
+            elif section_key_current == "Certifications":
+                cert_text = get_text(texts, "pdf_certifications_content",
+                    "<b>Unsere Zertifizierungen & Qualitätsstandards:</b><br/><br/>"
+                    " <b>VDE-Zertifizierung</b> - Elektrotechnische Sicherheit<br/>"
+                    " <b>Meisterbetrieb</b> - Handwerkliche Qualität<br/>"
+                    " <b>IHK-Sachverständiger</b> - Technische Expertise<br/>"
+                    " <b>ISO 9001</b> - Qualitätsmanagementsystem<br/>"
+                    " <b>Fachbetrieb für Photovoltaik</b> - Spezialisierung<br/><br/>"
+                    "Alle Komponenten entsprechen den aktuellen DIN- und VDE-Normen.")
+                section_elements.append(Paragraph(cert_text, STYLES.get('NormalLeft')))
                 
-                elif section_key_current == "Installation":
-                    install_text = get_text(texts, "pdf_installation_content",
-                        "<b>Professionelle Installation - Ihr Weg zur eigenen Solaranlage:</b><br/><br/>"
-                        "<b>1. Terminplanung & Vorbereitung</b><br/>"
-                        "• Detaillierte Terminabsprache<br/>"
-                        "• Anmeldung beim Netzbetreiber<br/>"
-                        "• Bereitstellung aller Komponenten<br/><br/>"
-                        "<b>2. Montage (1-2 Tage)</b><br/>"
-                        "• Dachmontage durch zertifizierte Dachdecker<br/>"
-                        "• Elektrische Installation durch Elektromeister<br/>"
-                        "• Sicherheitsprüfung nach VDE-Norm<br/><br/>"
-                        "<b>3. Inbetriebnahme & Übergabe</b><br/>"
-                        "• Funktionstest und Messung<br/>"
-                        "• Einweisung in die Bedienung<br/>"
-                        "• Übergabe aller Unterlagen")
-                    section_elements.append(Paragraph(install_text, STYLES.get('NormalLeft')))
-                    
-                    # SEITENUMBRUCH-SCHUTZ: Installation zusammenhalten
-                    story.append(KeepTogether(section_elements))
+                # SEITENUMBRUCH-SCHUTZ: Certifications zusammenhalten
+                story.append(KeepTogether(section_elements))
+            
+            elif section_key_current == "References":
+                ref_text = get_text(texts, "pdf_references_content",
+                    "<b>Referenzen & Kundenerfahrungen:</b><br/><br/>"
+                    " <i>\"Professionelle Beratung und saubere Montage. Unsere Anlage läuft seit 2 Jahren perfekt!\"</i><br/>"
+                    "- Familie Müller, 8,5 kWp Anlage<br/><br/>"
+                    " <i>\"Von der Planung bis zur Inbetriebnahme - alles aus einer Hand und termingerecht.\"</i><br/>"
+                    "- Herr Schmidt, 12 kWp mit Speicher<br/><br/>"
+                    " <i>\"Kompetente Beratung, faire Preise, einwandfreie Ausführung. Sehr empfehlenswert!\"</i><br/>"
+                    "- Frau Weber, 6,2 kWp Anlage<br/><br/>"
+                    "<b>Über 500 zufriedene Kunden</b> vertrauen auf unsere Expertise.")
+                section_elements.append(Paragraph(ref_text, STYLES.get('NormalLeft')))
                 
-                elif section_key_current == "Maintenance":
-                    maint_text = get_text(texts, "pdf_maintenance_content",
-                        "<b>Wartung & Langzeitservice für maximale Erträge:</b><br/><br/>"
-                        "<b>Wartungsleistungen:</b><br/>"
-                        "• Jährliche Sichtprüfung der Module<br/>"
-                        "• Überprüfung der elektrischen Verbindungen<br/>"
-                        "• Funktionstest des Wechselrichters<br/>"
-                        "• Reinigung bei Bedarf<br/>"
-                        "• Ertragskontrolle und Optimierung<br/><br/>"
-                        "<b>24/7 Monitoring:</b><br/>"
-                        "• Online-Überwachung der Anlagenleistung<br/>"
-                        "• Automatische Störungsmeldung<br/>"
-                        "• Ferndiagnose und schnelle Hilfe<br/><br/>"
-                        "<b>Wartungsvertrag verfügbar</b> - Sprechen Sie uns an!")
-                    section_elements.append(Paragraph(maint_text, STYLES.get('NormalLeft')))
-                    
-                    # SEITENUMBRUCH-SCHUTZ: Maintenance zusammenhalten
-                    story.append(KeepTogether(section_elements))
+                # SEITENUMBRUCH-SCHUTZ: References zusammenhalten
+                story.append(KeepTogether(section_elements))
+            
+            elif section_key_current == "Installation":
+                install_text = get_text(texts, "pdf_installation_content",
+                    "<b>Professionelle Installation - Ihr Weg zur eigenen Solaranlage:</b><br/><br/>"
+                    "<b>1. Terminplanung & Vorbereitung</b><br/>"
+                    "• Detaillierte Terminabsprache<br/>"
+                    "• Anmeldung beim Netzbetreiber<br/>"
+                    "• Bereitstellung aller Komponenten<br/><br/>"
+                    "<b>2. Montage (1-2 Tage)</b><br/>"
+                    "• Dachmontage durch zertifizierte Dachdecker<br/>"
+                    "• Elektrische Installation durch Elektromeister<br/>"
+                    "• Sicherheitsprüfung nach VDE-Norm<br/><br/>"
+                    "<b>3. Inbetriebnahme & Übergabe</b><br/>"
+                    "• Funktionstest und Messung<br/>"
+                    "• Einweisung in die Bedienung<br/>"
+                    "• Übergabe aller Unterlagen")
+                section_elements.append(Paragraph(install_text, STYLES.get('NormalLeft')))
                 
-                elif section_key_current == "Financing":
-                    fin_text = get_text(texts, "pdf_financing_content",
-                        "<b>Flexible Finanzierungsmöglichkeiten:</b><br/><br/>"
-                        " <b>KfW-Förderung</b><br/>"
-                        "• Zinsgünstige Darlehen bis 150.000€<br/>"
-                        "• Tilgungszuschüsse möglich<br/>"
-                        "• Wir unterstützen bei der Antragstellung<br/><br/>"
-                        " <b>Bankfinanzierung</b><br/>"
-                        "• Partnerschaften mit regionalen Banken<br/>"
-                        "• Attraktive Konditionen für Solaranlagen<br/>"
-                        "• Laufzeiten bis 20 Jahre<br/><br/>"
-                        " <b>Leasing & Pacht</b><br/>"
-                        "• Keine Anfangsinvestition<br/>"
-                        "• Monatliche Raten ab 89€<br/>"
-                        "• Rundum-Sorglos-Paket inklusive<br/><br/>"
-                        "Gerne erstellen wir Ihnen ein individuelles Finanzierungskonzept!")
-                    section_elements.append(Paragraph(fin_text, STYLES.get('NormalLeft')))
-                    
-                    # SEITENUMBRUCH-SCHUTZ: Financing zusammenhalten
-                    story.append(KeepTogether(section_elements))
+                # SEITENUMBRUCH-SCHUTZ: Installation zusammenhalten
+                story.append(KeepTogether(section_elements))
+            
+            elif section_key_current == "Maintenance":
+                maint_text = get_text(texts, "pdf_maintenance_content",
+                    "<b>Wartung & Langzeitservice für maximale Erträge:</b><br/><br/>"
+                    "<b>Wartungsleistungen:</b><br/>"
+                    "• Jährliche Sichtprüfung der Module<br/>"
+                    "• Überprüfung der elektrischen Verbindungen<br/>"
+                    "• Funktionstest des Wechselrichters<br/>"
+                    "• Reinigung bei Bedarf<br/>"
+                    "• Ertragskontrolle und Optimierung<br/><br/>"
+                    "<b>24/7 Monitoring:</b><br/>"
+                    "• Online-Überwachung der Anlagenleistung<br/>"
+                    "• Automatische Störungsmeldung<br/>"
+                    "• Ferndiagnose und schnelle Hilfe<br/><br/>"
+                    "<b>Wartungsvertrag verfügbar</b> - Sprechen Sie uns an!")
+                section_elements.append(Paragraph(maint_text, STYLES.get('NormalLeft')))
                 
-                elif section_key_current == "Insurance":
-                    ins_text = get_text(texts, "pdf_insurance_content",
-                        "<b>Umfassender Versicherungsschutz für Ihre Investition:</b><br/><br/>"
-                        " <b>Photovoltaik-Versicherung</b><br/>"
-                        "• Schutz vor Sturm, Hagel, Blitzschlag<br/>"
-                        "• Diebstahl- und Vandalismus-Schutz<br/>"
-                        "• Elektronikversicherung für Wechselrichter<br/><br/>"
-                        " <b>Ertragsausfallversicherung</b><br/>"
-                        "• Absicherung bei Produktionsausfall<br/>"
-                        "• Ersatz entgangener EEG-Vergütung<br/>"
-                        "• Mehrkosten bei Reparaturen<br/><br/>"
-                        " <b>Integration in bestehende Versicherungen</b><br/>"
-                        "• Prüfung der Wohngebäudeversicherung<br/>"
-                        "• Anpassung bestehender Policen<br/>"
-                        "• Kostengünstige Ergänzungen<br/><br/>"
-                        "Wir beraten Sie gerne zu optimalen Versicherungslösungen!")
-                    section_elements.append(Paragraph(ins_text, STYLES.get('NormalLeft')))
-                    
-                    # SEITENUMBRUCH-SCHUTZ: Insurance zusammenhalten
-                    story.append(KeepTogether(section_elements))
+                # SEITENUMBRUCH-SCHUTZ: Maintenance zusammenhalten
+                story.append(KeepTogether(section_elements))
+            
+            elif section_key_current == "Financing":
+                fin_text = get_text(texts, "pdf_financing_content",
+                    "<b>Flexible Finanzierungsmöglichkeiten:</b><br/><br/>"
+                    " <b>KfW-Förderung</b><br/>"
+                    "• Zinsgünstige Darlehen bis 150.000€<br/>"
+                    "• Tilgungszuschüsse möglich<br/>"
+                    "• Wir unterstützen bei der Antragstellung<br/><br/>"
+                    " <b>Bankfinanzierung</b><br/>"
+                    "• Partnerschaften mit regionalen Banken<br/>"
+                    "• Attraktive Konditionen für Solaranlagen<br/>"
+                    "• Laufzeiten bis 20 Jahre<br/><br/>"
+                    " <b>Leasing & Pacht</b><br/>"
+                    "• Keine Anfangsinvestition<br/>"
+                    "• Monatliche Raten ab 89€<br/>"
+                    "• Rundum-Sorglos-Paket inklusive<br/><br/>"
+                    "Gerne erstellen wir Ihnen ein individuelles Finanzierungskonzept!")
+                section_elements.append(Paragraph(fin_text, STYLES.get('NormalLeft')))
                 
-                elif section_key_current == "Warranty":
-                    warr_text = get_text(texts, "pdf_warranty_content",
-                        "<b>Garantie & Gewährleistung - Ihre Sicherheit:</b><br/><br/>"
-                        " <b>Herstellergarantien:</b><br/>"
-                        "• <b>Module:</b> 25 Jahre Leistungsgarantie<br/>"
-                        "• <b>Wechselrichter:</b> 10-20 Jahre Herstellergarantie<br/>"
-                        "• <b>Speichersystem:</b> 10 Jahre Garantie<br/>"
-                        "• <b>Montagesystem:</b> 15 Jahre Material-/Korrosionsschutz<br/><br/>"
-                        " <b>Handwerkergewährleistung:</b><br/>"
-                        "• 2 Jahre auf Montage und Installation<br/>"
-                        "• 5 Jahre erweiterte Gewährleistung möglich<br/>"
-                        "• Schnelle Reaktionszeiten bei Problemen<br/><br/>"
-                        " <b>Service-Hotline:</b><br/>"
-                        "• Kostenlose Beratung bei Fragen<br/>"
-                        "• Ferndiagnose und Support<br/>"
-                        "• Vor-Ort-Service innerhalb 48h<br/><br/>"
-                        "<b>Ihr Vertrauen ist unsere Verpflichtung!</b>")
-                    section_elements.append(Paragraph(warr_text, STYLES.get('NormalLeft')))
-                    section_elements.append(Spacer(1, 0.5*cm))
-                    
-                    # SEITENUMBRUCH-SCHUTZ: Warranty zusammenhalten
-                    story.append(KeepTogether(section_elements))
+                # SEITENUMBRUCH-SCHUTZ: Financing zusammenhalten
+                story.append(KeepTogether(section_elements))
+            
+            elif section_key_current == "Insurance":
+                ins_text = get_text(texts, "pdf_insurance_content",
+                    "<b>Umfassender Versicherungsschutz für Ihre Investition:</b><br/><br/>"
+                    " <b>Photovoltaik-Versicherung</b><br/>"
+                    "• Schutz vor Sturm, Hagel, Blitzschlag<br/>"
+                    "• Diebstahl- und Vandalismus-Schutz<br/>"
+                    "• Elektronikversicherung für Wechselrichter<br/><br/>"
+                    " <b>Ertragsausfallversicherung</b><br/>"
+                    "• Absicherung bei Produktionsausfall<br/>"
+                    "• Ersatz entgangener EEG-Vergütung<br/>"
+                    "• Mehrkosten bei Reparaturen<br/><br/>"
+                    " <b>Integration in bestehende Versicherungen</b><br/>"
+                    "• Prüfung der Wohngebäudeversicherung<br/>"
+                    "• Anpassung bestehender Policen<br/>"
+                    "• Kostengünstige Ergänzungen<br/><br/>"
+                    "Wir beraten Sie gerne zu optimalen Versicherungslösungen!")
+                section_elements.append(Paragraph(ins_text, STYLES.get('NormalLeft')))
+                
+                # SEITENUMBRUCH-SCHUTZ: Insurance zusammenhalten
+                story.append(KeepTogether(section_elements))
+            
+            elif section_key_current == "Warranty":
+                warr_text = get_text(texts, "pdf_warranty_content",
+                    "<b>Garantie & Gewährleistung - Ihre Sicherheit:</b><br/><br/>"
+                    " <b>Herstellergarantien:</b><br/>"
+                    "• <b>Module:</b> 25 Jahre Leistungsgarantie<br/>"
+                    "• <b>Wechselrichter:</b> 10-20 Jahre Herstellergarantie<br/>"
+                    "• <b>Speichersystem:</b> 10 Jahre Garantie<br/>"
+                    "• <b>Montagesystem:</b> 15 Jahre Material-/Korrosionsschutz<br/><br/>"
+                    " <b>Handwerkergewährleistung:</b><br/>"
+                    "• 2 Jahre auf Montage und Installation<br/>"
+                    "• 5 Jahre erweiterte Gewährleistung möglich<br/>"
+                    "• Schnelle Reaktionszeiten bei Problemen<br/><br/>"
+                    " <b>Service-Hotline:</b><br/>"
+                    "• Kostenlose Beratung bei Fragen<br/>"
+                    "• Ferndiagnose und Support<br/>"
+                    "• Vor-Ort-Service innerhalb 48h<br/><br/>"
+                    "<b>Ihr Vertrauen ist unsere Verpflichtung!</b>")
+                section_elements.append(Paragraph(warr_text, STYLES.get('NormalLeft')))
+                section_elements.append(Spacer(1, 0.5*cm))
                 
-                # Aktualisiere Counter
-                current_section_counter_pdf +=1
-            except Exception as e_section:
-                error_elements = []
-                error_elements.append(Paragraph(f"Fehler in Sektion '{default_title_current}': {e_section}", STYLES.get('NormalLeft')))
-                error_elements.append(Spacer(1, 0.5*cm))
-                # SEITENUMBRUCH-SCHUTZ auch für Fehlermeldungen
-                story.append(KeepTogether(error_elements))
-                current_section_counter_pdf +=1
+                # SEITENUMBRUCH-SCHUTZ: Warranty zusammenhalten
+                story.append(KeepTogether(section_elements))
+        except Exception as e_section:
+            error_elements = []
+            error_elements.append(Paragraph(f"Fehler in Sektion '{default_title_current}': {e_section}", STYLES.get('NormalLeft')))
+            error_elements.append(Spacer(1, 0.5*cm))
+            # SEITENUMBRUCH-SCHUTZ auch für Fehlermeldungen
+            story.append(KeepTogether(error_elements))
     
     #  CUSTOM CONTENT INTEGRATION
     if custom_content_items and len(custom_content_items) > 0:
@@ -2832,8 +3048,10 @@ def generate_offer_pdf(
             'include_custom_footer_ref': include_custom_footer_opt,
             'include_header_logo_ref': include_header_logo_opt
         }
-        doc.build(story, canvasmaker=lambda *args, **kwargs_c: PageNumCanvas(*args, onPage_callback=page_layout_handler, callback_kwargs=layout_callback_kwargs_build, **kwargs_c))
-        main_pdf_bytes = main_offer_buffer.getvalue()
+        with trace_span("story_build", flowables=len(story)) as trace_node:
+            doc.build(story, canvasmaker=lambda *args, **kwargs_c: PageNumCanvas(*args, onPage_callback=page_layout_handler, callback_kwargs=layout_callback_kwargs_build, **kwargs_c))
+            main_pdf_bytes = main_offer_buffer.getvalue()
+            trace_node.add_bytes(main_pdf_bytes)
     except Exception as e_build_pdf:
         return _create_plaintext_pdf_fallback(project_data, analysis_results, texts, company_info, selected_offer_title_text, selected_cover_letter_text)
     finally:
@@ -2846,101 +3064,105 @@ def generate_offer_pdf(
     if not (include_all_documents_opt and _PYPDF_AVAILABLE):
         return main_pdf_bytes
 
-    paths_to_append: List[str] = []
-    debug_info = {
-        'product_datasheets_found': [],
-        'product_datasheets_missing': [],
-        'company_docs_found': [],
-        'company_docs_missing': [],
-        'total_paths_to_append': 0
-    }
-    
-    # Produktdatenblätter (Hauptkomponenten UND Zubehör)
-    product_ids_for_datasheets = list(filter(None, [
-        pv_details_pdf.get("selected_module_id"),
-        pv_details_pdf.get("selected_inverter_id"),
-        pv_details_pdf.get("selected_storage_id") if pv_details_pdf.get("include_storage") else None
-    ]))
-    if pv_details_pdf.get('include_additional_components', True): # Nur wenn Zubehör überhaupt aktiv ist
-        for opt_id_key in ['selected_wallbox_id', 'selected_ems_id', 'selected_optimizer_id', 'selected_carport_id', 'selected_notstrom_id', 'selected_tierabwehr_id']:
-            comp_id_val = pv_details_pdf.get(opt_id_key)
-            if comp_id_val: product_ids_for_datasheets.append(comp_id_val)
+    # Produktdatenblätter und Firmendokumente anhängen (DB-Abfragen + Lesen/Schreiben der PDFs)
+    with trace_span("datasheet_append") as trace_node:
+        paths_to_append: List[str] = []
+        debug_info = {
+            'product_datasheets_found': [],
+            'product_datasheets_missing': [],
+            'company_docs_found': [],
+            'company_docs_missing': [],
+            'total_paths_to_append': 0
+        }
     
-    # Duplikate entfernen, falls ein Produkt mehrfach auftaucht (unwahrscheinlich, aber sicher)
-    product_ids_for_datasheets = list(set(product_ids_for_datasheets))
-
-    for prod_id in product_ids_for_datasheets:
-        try:
-            product_info = get_product_by_id_func(prod_id) 
-            if product_info:
-                datasheet_path_from_db = product_info.get("datasheet_link_db_path")
-                if datasheet_path_from_db:
-                    full_datasheet_path = os.path.join(PRODUCT_DATASHEETS_BASE_DIR_PDF_GEN, datasheet_path_from_db)
-                    if os.path.exists(full_datasheet_path):
-                        paths_to_append.append(full_datasheet_path)
-                        debug_info['product_datasheets_found'].append({'id': prod_id, 'model': product_info.get('model_name'), 'path': full_datasheet_path})
+        # Produktdatenblätter (Hauptkomponenten UND Zubehör)
+        product_ids_for_datasheets = list(filter(None, [
+            pv_details_pdf.get("selected_module_id"),
+            pv_details_pdf.get("selected_inverter_id"),
+            pv_details_pdf.get("selected_storage_id") if pv_details_pdf.get("include_storage") else None
+        ]))
+        if pv_details_pdf.get('include_additional_components', True): # Nur wenn Zubehör überhaupt aktiv ist
+            for opt_id_key in ['selected_wallbox_id', 'selected_ems_id', 'selected_optimizer_id', 'selected_carport_id', 'selected_notstrom_id', 'selected_tierabwehr_id']:
+                comp_id_val = pv_details_pdf.get(opt_id_key)
+                if comp_id_val: product_ids_for_datasheets.append(comp_id_val)
+    
+        # Duplikate entfernen, falls ein Produkt mehrfach auftaucht (unwahrscheinlich, aber sicher)
+        product_ids_for_datasheets = list(set(product_ids_for_datasheets))
+
+        for prod_id in product_ids_for_datasheets:
+            try:
+                product_info = get_product_by_id_func(prod_id) 
+                if product_info:
+                    datasheet_path_from_db = product_info.get("datasheet_link_db_path")
+                    if datasheet_path_from_db:
+                        full_datasheet_path = os.path.join(PRODUCT_DATASHEETS_BASE_DIR_PDF_GEN, datasheet_path_from_db)
+                        if os.path.exists(full_datasheet_path):
+                            paths_to_append.append(full_datasheet_path)
+                            debug_info['product_datasheets_found'].append({'id': prod_id, 'model': product_info.get('model_name'), 'path': full_datasheet_path})
+                        else:
+                            debug_info['product_datasheets_missing'].append({'id': prod_id, 'model': product_info.get('model_name'), 'path': full_datasheet_path})
                     else:
-                        debug_info['product_datasheets_missing'].append({'id': prod_id, 'model': product_info.get('model_name'), 'path': full_datasheet_path})
+                        debug_info['product_datasheets_missing'].append({'id': prod_id, 'model': product_info.get('model_name'), 'reason': 'Kein Datenblatt-Pfad in DB'})
                 else:
-                    debug_info['product_datasheets_missing'].append({'id': prod_id, 'model': product_info.get('model_name'), 'reason': 'Kein Datenblatt-Pfad in DB'})
-            else:
-                debug_info['product_datasheets_missing'].append({'id': prod_id, 'reason': 'Produkt nicht in DB gefunden'})
-        except Exception as e_prod:
-            # Fehler beim Laden von Produktinformationen - wird still behandelt
-            pass
+                    debug_info['product_datasheets_missing'].append({'id': prod_id, 'reason': 'Produkt nicht in DB gefunden'})
+            except Exception as e_prod:
+                # Fehler beim Laden von Produktinformationen - wird still behandelt
+                pass
             
-    # Firmendokumente
-    if company_document_ids_to_include_opt and active_company_id is not None and callable(db_list_company_documents_func):
-        try:
-            all_company_docs_for_active_co = db_list_company_documents_func(active_company_id, None) # doc_type=None für alle
-            for doc_info in all_company_docs_for_active_co:
-                if doc_info.get('id') in company_document_ids_to_include_opt:
-                    relative_doc_path = doc_info.get("relative_db_path") 
-                    if relative_doc_path: 
-                        full_doc_path = os.path.join(COMPANY_DOCS_BASE_DIR_PDF_GEN, relative_doc_path)
-                        if os.path.exists(full_doc_path):
-                            paths_to_append.append(full_doc_path)
-                            debug_info['company_docs_found'].append({'id': doc_info.get('id'), 'name': doc_info.get('display_name'), 'path': full_doc_path})
+        # Firmendokumente
+        if company_document_ids_to_include_opt and active_company_id is not None and callable(db_list_company_documents_func):
+            try:
+                all_company_docs_for_active_co = db_list_company_documents_func(active_company_id, None) # doc_type=None für alle
+                for doc_info in all_company_docs_for_active_co:
+                    if doc_info.get('id') in company_document_ids_to_include_opt:
+                        relative_doc_path = doc_info.get("relative_db_path") 
+                        if relative_doc_path: 
+                            full_doc_path = os.path.join(COMPANY_DOCS_BASE_DIR_PDF_GEN, relative_doc_path)
+                            if os.path.exists(full_doc_path):
+                                paths_to_append.append(full_doc_path)
+                                debug_info['company_docs_found'].append({'id': doc_info.get('id'), 'name': doc_info.get('display_name'), 'path': full_doc_path})
+                            else:
+                                debug_info['company_docs_missing'].append({'id': doc_info.get('id'), 'name': doc_info.get('display_name'), 'path': full_doc_path})
                         else:
-                            debug_info['company_docs_missing'].append({'id': doc_info.get('id'), 'name': doc_info.get('display_name'), 'path': full_doc_path})
-                    else:
-                        debug_info['company_docs_missing'].append({'id': doc_info.get('id'), 'name': doc_info.get('display_name'), 'reason': 'Kein relativer Pfad in DB'})
-        except Exception as e_company_docs:
-            # Fehler beim Laden der Firmendokumente - wird still behandelt
-            pass
+                            debug_info['company_docs_missing'].append({'id': doc_info.get('id'), 'name': doc_info.get('display_name'), 'reason': 'Kein relativer Pfad in DB'})
+            except Exception as e_company_docs:
+                # Fehler beim Laden der Firmendokumente - wird still behandelt
+                pass
     
-    debug_info['total_paths_to_append'] = len(paths_to_append)
+        debug_info['total_paths_to_append'] = len(paths_to_append)
     
-    if not paths_to_append: 
-        return main_pdf_bytes
+        if not paths_to_append: 
+            return main_pdf_bytes
     
-    pdf_writer = PdfWriter()
-    try:
-        main_offer_reader = PdfReader(io.BytesIO(main_pdf_bytes))
-        for page in main_offer_reader.pages: 
-            pdf_writer.add_page(page)
-    except Exception as e_read_main:
-        return main_pdf_bytes 
-
-    successfully_appended = 0
-    for pdf_path in paths_to_append:
+        pdf_writer = PdfWriter()
         try:
-            datasheet_reader = PdfReader(pdf_path)
-            for page in datasheet_reader.pages: 
+            main_offer_reader = PdfReader(io.BytesIO(main_pdf_bytes))
+            for page in main_offer_reader.pages: 
                 pdf_writer.add_page(page)
-            successfully_appended += 1
-        except Exception as e_append_ds:
-            pass  # Fehler beim Anhängen werden still behandelt
-    
-    final_buffer = io.BytesIO()
-    try:
-        pdf_writer.write(final_buffer)
-        final_pdf_bytes = final_buffer.getvalue()
-        return final_pdf_bytes
-    except Exception as e_write_final:
-        return main_pdf_bytes 
-    finally:
-        final_buffer.close()
+        except Exception as e_read_main:
+            return main_pdf_bytes 
+
+        successfully_appended = 0
+        for pdf_path in paths_to_append:
+            try:
+                datasheet_reader = PdfReader(pdf_path)
+                for page in datasheet_reader.pages: 
+                    pdf_writer.add_page(page)
+                successfully_appended += 1
+            except Exception as e_append_ds:
+                pass  # Fehler beim Anhängen werden still behandelt
+    
+        final_buffer = io.BytesIO()
+        try:
+            pdf_writer.write(final_buffer)
+            final_pdf_bytes = final_buffer.getvalue()
+            trace_node.set(documents=successfully_appended)
+            trace_node.add_bytes(len(final_pdf_bytes) - len(main_pdf_bytes))
+            return final_pdf_bytes
+        except Exception as e_write_final:
+            return main_pdf_bytes 
+        finally:
+            final_buffer.close()
 
 def merge_pdfs(pdf_files: List[Union[str, bytes, io.BytesIO]]) -> bytes:
     """
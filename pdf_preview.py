@@ -28,6 +28,12 @@ try:
 except ImportError:
     Image = None
 
+try:
+    from pdf_preview_renderer import get_preview_renderer, THUMBNAIL_DPI
+    _PREVIEW_RENDERER_AVAILABLE = True
+except ImportError:
+    _PREVIEW_RENDERER_AVAILABLE = False
+
 class PDFPreviewEngine:
     """Engine für PDF-Vorschau mit Cache und Optimierungen"""
     
@@ -96,6 +102,11 @@ class PDFPreviewEngine:
             return []
         
         try:
+            if _PREVIEW_RENDERER_AVAILABLE:
+                # Paralleles Rastern, Cache nach Seiteninhalt (unveränderte Seiten werden wiederverwendet)
+                return get_preview_renderer().render_pages(
+                    pdf_bytes, self.preview_dpi, range(min(self.page_count(pdf_bytes), max_pages)))
+
             images = []
             pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
             
@@ -113,6 +124,37 @@ class PDFPreviewEngine:
             st.error(f"Fehler bei PDF-zu-Bild-Konvertierung: {e}")
             return []
 
+    def page_count(self, pdf_bytes: bytes) -> int:
+        """Anzahl der Seiten (ohne zu rastern)"""
+        if not PDF_PREVIEW_AVAILABLE or not pdf_bytes:
+            return 0
+        pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
+        try:
+            return len(pdf_document)
+        finally:
+            pdf_document.close()
+
+    def page_image(self, pdf_bytes: bytes, page_index: int) -> Optional[Image.Image]:
+        """Einzelne Seite in Vorschau-DPI (nur die angezeigte Seite wird hochauflösend gerastert)"""
+        if _PREVIEW_RENDERER_AVAILABLE:
+            try:
+                return get_preview_renderer().page_image(pdf_bytes, page_index, self.preview_dpi)
+            except Exception as e:
+                st.error(f"Fehler bei PDF-zu-Bild-Konvertierung: {e}")
+                return None
+        images = self.pdf_to_images(pdf_bytes, max_pages=page_index + 1)
+        return images[page_index] if len(images) > page_index else None
+
+    def thumbnails(self, pdf_bytes: bytes, max_pages: int = 20) -> List[Image.Image]:
+        """Seitenübersicht mit niedriger DPI"""
+        if _PREVIEW_RENDERER_AVAILABLE:
+            try:
+                return get_preview_renderer().thumbnails(pdf_bytes, max_pages=max_pages)
+            except Exception as e:
+                st.error(f"Fehler bei PDF-zu-Bild-Konvertierung: {e}")
+                return []
+        return self.pdf_to_images(pdf_bytes, max_pages=max_pages)
+
 def render_pdf_preview_interface(
     project_data: Dict[str, Any],
     analysis_results: Dict[str, Any],
@@ -270,11 +312,10 @@ def render_pdf_preview_interface(
                     st.markdown(pdf_display, unsafe_allow_html=True)
                 
                 elif preview_mode == "Seitenweise":
-                    # Seitenweise Navigation
-                    images = engine.pdf_to_images(pdf_bytes, max_pages=20)
+                    # Seitenweise Navigation: Seitenzahl ohne Rastern, nur die aktuelle Seite in voller DPI
+                    total_pages = min(engine.page_count(pdf_bytes), 20)
                     
-                    if images:
-                        total_pages = len(images)
+                    if total_pages:
                         
                         # Seitennavigation
                         col_prev, col_page, col_next = st.columns([1, 2, 1])
@@ -304,13 +345,21 @@ def render_pdf_preview_interface(
                                 st.session_state.preview_current_page += 1
                                 st.rerun()
                         
+                        st.session_state.preview_current_page = min(st.session_state.preview_current_page, total_pages - 1)
+
+                        # Übersicht mit niedriger DPI
+                        thumbs = engine.thumbnails(pdf_bytes, max_pages=total_pages)
+                        if thumbs:
+                            st.image(thumbs, caption=[f"Seite {i + 1}" for i in range(len(thumbs))], width=90)
+
                         # Aktuelle Seite anzeigen
-                        current_img = images[st.session_state.preview_current_page]
-                        width = int(current_img.width * preview_zoom / 100)
-                        height = int(current_img.height * preview_zoom / 100)
-                        img_resized = current_img.resize((width, height))
-                        
-                        st.image(img_resized, use_column_width=True)
+                        current_img = engine.page_image(pdf_bytes, st.session_state.preview_current_page)
+                        if current_img is not None:
+                            width = int(current_img.width * preview_zoom / 100)
+                            height = int(current_img.height * preview_zoom / 100)
+                            img_resized = current_img.resize((width, height))
+                            
+                            st.image(img_resized, use_column_width=True)
                         st.caption(f"Seite {st.session_state.preview_current_page + 1} von {total_pages}")
         
         # Download-Button
@@ -338,6 +387,18 @@ def create_preview_thumbnail(pdf_bytes: bytes, page_num: int = 0, size: tuple =
         return None
     
     try:
+        if _PREVIEW_RENDERER_AVAILABLE and Image is not None:
+            renderer = get_preview_renderer()
+            if page_num >= renderer.page_count(pdf_bytes):
+                return None
+            # Kleine Thumbnails aus der niedrigen Vorschau-DPI (A4 bei 50 DPI: 413 x 585 px)
+            dpi = THUMBNAIL_DPI if max(size) <= 400 else 100
+            img = renderer.page_image(pdf_bytes, page_num, dpi=dpi).copy()
+            img.thumbnail(size, Image.Resampling.LANCZOS)
+            output = io.BytesIO()
+            img.save(output, format='PNG')
+            return output.getvalue()
+
         pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
         
         if page_num >= len(pdf_document):
@@ -0,0 +1,284 @@
+# pdf_preview_renderer.py
+"""
+Rasterisierung von PDF-Seiten für Vorschau und Thumbnails.
+
+- Pixmaps werden direkt aus den Rohdaten (pix.samples) in PIL-Bilder übernommen, ohne
+  PNG-Kodierung und erneutes Dekodieren.
+- Seiten werden in einem Thread-Pool gerastert; jede Aufgabe öffnet ihr eigenes
+  fitz-Dokument (PyMuPDF-Dokumente dürfen nicht zwischen Threads geteilt werden).
+- Zuerst Thumbnails mit niedriger DPI, hohe DPI nur für die angezeigte Seite.
+- Ergebnisse liegen in einem Seiten-Cache (Speicher + Datenträger), Schlüssel ist ein Hash
+  über den Seiteninhalt (Content-Stream, aufgelöste Ressourcen inkl. Fonts, Bilder, Grafikzustände
+  und Farbräume, Annotationen, Seitenformat) und die DPI.
+  Unveränderte Seiten einer neu erzeugten Vorschau-PDF werden daher nicht erneut gerastert.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import pymupdf as fitz  # PyMuPDF (ältere Versionen nur als "fitz")
+    _FITZ_AVAILABLE = True
+except ImportError:
+    try:
+        import fitz
+        _FITZ_AVAILABLE = True
+    except ImportError:
+        fitz = None
+        _FITZ_AVAILABLE = False
+
+try:
+    from PIL import Image
+    _PIL_AVAILABLE = True
+except ImportError:
+    Image = None
+    _PIL_AVAILABLE = False
+
+THUMBNAIL_DPI = 50
+PREVIEW_DPI = 150
+PREVIEW_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "preview_cache")
+PREVIEW_CACHE_MAX_BYTES = 200 * 1024 * 1024
+MEMORY_CACHE_ENTRIES = 64
+
+
+# Indirekte Referenz "12 0 R"; /Parent und /P (Annotation -> Seite) führen aus dem Seiteninhalt heraus
+_REF_RE = re.compile(r"(\d+)\s+\d+\s+R\b")
+_BACKREF_RE = re.compile(r"/(?:Parent|P)\s+\d+\s+\d+\s+R\b")
+
+
+def _source_digest(doc: "fitz.Document", source: str, cache: Dict[int, bytes]) -> bytes:
+    """SHA-256 über ein PDF-Objekt (Quelltext) samt aller referenzierten Objekte und Streams.
+
+    xref-Nummern werden nicht mitgehasht, nur die Reihenfolge der Referenzen; gleich aufgebaute
+    PDFs mit anderer Objekt-Nummerierung liefern so denselben Hash.
+    """
+    source = _BACKREF_RE.sub("", source)
+    h = hashlib.sha256(_REF_RE.sub("R", source).encode("utf-8", "replace"))
+    for match in _REF_RE.finditer(source):
+        h.update(_object_digest(doc, int(match.group(1)), cache))
+    return h.digest()
+
+
+def _object_digest(doc: "fitz.Document", xref: int, cache: Dict[int, bytes]) -> bytes:
+    """Digest eines indirekten Objekts (je xref und Aufruf einmal berechnet, zyklensicher)."""
+    if xref <= 0 or xref >= doc.xref_length():
+        return b""
+    digest = cache.get(xref)
+    if digest is None:
+        cache[xref] = b"zyklus"
+        h = hashlib.sha256(_source_digest(doc, doc.xref_object(xref, compressed=True), cache))
+        if doc.xref_is_stream(xref):
+            h.update(doc.xref_stream_raw(xref) or b"")
+        digest = cache[xref] = h.digest()
+    return digest
+
+
+def _page_key_digest(doc: "fitz.Document", page_xref: int, key: str, cache: Dict[int, bytes],
+                     inherited: bool = False) -> bytes:
+    """Digest eines Seiteneintrags (z. B. /Resources, ggf. vom Seitenbaum geerbt)."""
+    xref = page_xref
+    while True:
+        kind, value = doc.xref_get_key(xref, key)
+        if kind != "null" or not inherited:
+            break
+        kind_parent, parent = doc.xref_get_key(xref, "Parent")
+        if kind_parent != "xref":
+            break
+        xref = int(parent.split()[0])
+    if kind == "null":
+        return b""
+    return _source_digest(doc, value, cache)
+
+
+def page_content_hashes(doc: "fitz.Document", pages: Iterable[int]) -> Dict[int, str]:
+    """SHA-256 je Seite über alles, was das Rasterbild bestimmt (ohne zu rastern).
+
+    Neben Format und Content-Stream fließen die aufgelösten /Resources ein (Fonts samt Fontprogramm,
+    Bilder samt SMask, Form-XObjects, ExtGState, Shading, Pattern, ColorSpace) sowie die Annotationen.
+    """
+    hashes: Dict[int, str] = {}
+    object_digests: Dict[int, bytes] = {}
+    for index in pages:
+        page = doc[index]
+        h = hashlib.sha256()
+        h.update(repr((tuple(page.rect), page.rotation)).encode("ascii"))
+        h.update(page.read_contents())
+        h.update(_page_key_digest(doc, page.xref, "Resources", object_digests, inherited=True))
+        h.update(_page_key_digest(doc, page.xref, "Annots", object_digests))
+        hashes[index] = h.hexdigest()
+    return hashes
+
+
+def pixmap_to_image(pix: "fitz.Pixmap") -> "Image.Image":
+    """PIL-Bild direkt aus den Pixmap-Rohdaten (RGB/RGBA), ohne PNG-Umweg."""
+    mode = "RGBA" if pix.alpha else "RGB"
+    return Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+
+
+class PageImageCache:
+    """Seitenbilder je (Inhalts-Hash, DPI): LRU im Speicher, PNG-Dateien auf dem Datenträger."""
+
+    def __init__(self, cache_dir: Optional[str] = PREVIEW_CACHE_DIR, max_bytes: int = PREVIEW_CACHE_MAX_BYTES,
+                 memory_entries: int = MEMORY_CACHE_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, Image.Image]" = OrderedDict()
+        self._memory_entries = max(1, int(memory_entries))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Optional[str]:
+        return os.path.join(self.cache_dir, f"{key}.png") if self.cache_dir else None
+
+    def get(self, content_hash: str, dpi: int) -> Optional["Image.Image"]:
+        key = f"{content_hash}_{int(dpi)}"
+        with self._lock:
+            img = self._memory.get(key)
+            if img is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return img
+        path = self._path(key)
+        if path and os.path.exists(path):
+            try:
+                with Image.open(path) as stored:
+                    img = stored.copy()
+                self._remember(key, img)
+                with self._lock:
+                    self.hits += 1
+                return img
+            except Exception:
+                pass
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, content_hash: str, dpi: int, img: "Image.Image") -> None:
+        key = f"{content_hash}_{int(dpi)}"
+        self._remember(key, img)
+        path = self._path(key)
+        if not path:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            img.save(tmp_path, format="PNG", compress_level=1)
+            os.replace(tmp_path, path)
+            self._prune()
+        except Exception as e:
+            print(f"Vorschau-Cache konnte nicht geschrieben werden: {e}")
+
+    def _remember(self, key: str, img: "Image.Image") -> None:
+        with self._lock:
+            self._memory[key] = img
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._memory_entries:
+                self._memory.popitem(last=False)
+
+    def _prune(self) -> None:
+        """Älteste Dateien löschen, bis der Cache unter max_bytes liegt."""
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith(".png")]
+        except OSError:
+            return
+        total = sum(e.stat().st_size for e in entries)
+        if total <= self.max_bytes:
+            return
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+            except OSError:
+                continue
+            if total <= self.max_bytes:
+                break
+
+
+def _render_page(pdf_bytes: bytes, index: int, dpi: int) -> "Image.Image":
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        return pixmap_to_image(doc[index].get_pixmap(dpi=dpi))
+    finally:
+        doc.close()
+
+
+class PreviewRenderer:
+    """Rastert PDF-Seiten parallel und cached nach Seiteninhalt."""
+
+    def __init__(self, cache: Optional[PageImageCache] = None, max_workers: Optional[int] = None):
+        self.cache = cache if cache is not None else PageImageCache()
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+
+    @staticmethod
+    def available() -> bool:
+        return _FITZ_AVAILABLE and _PIL_AVAILABLE
+
+    def page_count(self, pdf_bytes: bytes) -> int:
+        if not self.available() or not pdf_bytes:
+            return 0
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        try:
+            return len(doc)
+        finally:
+            doc.close()
+
+    def render_pages(self, pdf_bytes: bytes, dpi: int = PREVIEW_DPI,
+                     pages: Optional[Iterable[int]] = None) -> List["Image.Image"]:
+        """Bilder der gewünschten Seiten (Standard: alle) in Seitenreihenfolge."""
+        if not self.available() or not pdf_bytes:
+            return []
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        try:
+            indices = [i for i in (pages if pages is not None else range(len(doc))) if 0 <= i < len(doc)]
+            hashes = page_content_hashes(doc, indices)
+        finally:
+            doc.close()
+
+        images: Dict[int, "Image.Image"] = {}
+        missing: List[int] = []
+        for index in indices:
+            img = self.cache.get(hashes[index], dpi)
+            if img is None:
+                missing.append(index)
+            else:
+                images[index] = img
+        if missing:
+            if self.max_workers > 1 and len(missing) > 1:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as pool:
+                    rendered = list(pool.map(lambda i: _render_page(pdf_bytes, i, dpi), missing))
+            else:
+                rendered = [_render_page(pdf_bytes, i, dpi) for i in missing]
+            for index, img in zip(missing, rendered):
+                self.cache.put(hashes[index], dpi, img)
+                images[index] = img
+        return [images[i] for i in indices]
+
+    def thumbnails(self, pdf_bytes: bytes, max_pages: Optional[int] = None,
+                   dpi: int = THUMBNAIL_DPI) -> List["Image.Image"]:
+        """Schnelle Übersicht mit niedriger DPI."""
+        count = self.page_count(pdf_bytes)
+        limit = count if max_pages is None else min(count, max_pages)
+        return self.render_pages(pdf_bytes, dpi, range(limit))
+
+    def page_image(self, pdf_bytes: bytes, index: int, dpi: int = PREVIEW_DPI) -> Optional["Image.Image"]:
+        """Eine Seite in hoher DPI (auf Anforderung, z. B. die aktuell angezeigte Seite)."""
+        images = self.render_pages(pdf_bytes, dpi, [index])
+        return images[0] if images else None
+
+
+_default_renderer: Optional[PreviewRenderer] = None
+
+
+def get_preview_renderer() -> PreviewRenderer:
+    """Prozessweiter Renderer (teilt Speicher- und Datenträger-Cache)."""
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = PreviewRenderer()
+    return _default_renderer
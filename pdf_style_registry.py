@@ -0,0 +1,122 @@
+# pdf_style_registry.py
+"""
+Prozessweite Registry für ReportLab-Fonts und -Stile.
+
+- TTF-Fonts werden einmal pro Prozess registriert (register_ttf_font).
+- Fontnamen aus Layout-Dateien (z. B. "Helvetica-Regular" aus coords/*.yml) werden einmal
+  aufgelöst; unbekannte Namen fallen wie bisher auf Helvetica zurück, ohne dass ReportLab
+  bei jedem Element erneut nach Font-Dateien sucht.
+- Stylesheets und TableStyles werden je (Theme, Farbpalette) einmal kompiliert und danach
+  geteilt. Die gelieferten Objekte gelten als unveränderlich.
+
+Alle Zugriffe sind thread-sicher (Multi-Angebots-Batch, Streamlit-Threads).
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+try:
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    _REPORTLAB_AVAILABLE = True
+except ImportError:
+    _REPORTLAB_AVAILABLE = False
+
+DEFAULT_FONT = "Helvetica"
+
+_lock = threading.RLock()
+_registered_ttf: Dict[str, str] = {}
+_resolved_fonts: Dict[Tuple[str, str], str] = {}
+
+
+def register_ttf_font(name: str, path: str) -> bool:
+    """Registriert eine TTF-Datei unter `name` (nur beim ersten Aufruf je Name)."""
+    if not _REPORTLAB_AVAILABLE:
+        return False
+    with _lock:
+        if name in _registered_ttf:
+            return True
+        try:
+            pdfmetrics.registerFont(TTFont(name, path))
+        except Exception as e:
+            print(f"Fehler beim Registrieren der Schrift {name} ({path}): {e}")
+            return False
+        _registered_ttf[name] = path
+        # Frühere Fallback-Auflösungen für diesen Namen verwerfen
+        for key in [k for k in _resolved_fonts if k[0] == name]:
+            del _resolved_fonts[key]
+        return True
+
+
+def resolve_font(name: Optional[str], fallback: str = DEFAULT_FONT) -> str:
+    """Liefert `name`, falls ReportLab die Schrift kennt, sonst `fallback` (Ergebnis gecacht)."""
+    if not name:
+        return fallback
+    key = (name, fallback)
+    resolved = _resolved_fonts.get(key)
+    if resolved is not None:
+        return resolved
+    with _lock:
+        resolved = _resolved_fonts.get(key)
+        if resolved is None:
+            resolved = name
+            if _REPORTLAB_AVAILABLE:
+                try:
+                    pdfmetrics.getFont(name)
+                except Exception:
+                    resolved = fallback
+            _resolved_fonts[key] = resolved
+        return resolved
+
+
+def clear_font_resolution_cache() -> None:
+    """Verwirft aufgelöste Fontnamen (z. B. nach manueller pdfmetrics-Registrierung)."""
+    with _lock:
+        _resolved_fonts.clear()
+
+
+class StyleRegistry:
+    """Kompiliert Stylesheets/TableStyles je (Name, Palette) einmal und hält sie für den Prozess vor."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._builders: Dict[Tuple[str, str], Callable[[Hashable], Any]] = {}
+        self._compiled: Dict[Tuple[str, str, Hashable], Any] = {}
+        self.builds = 0
+        self.hits = 0
+
+    def register(self, kind: str, name: str, builder: Callable[[Hashable], Any]) -> None:
+        """builder(palette) erzeugt das Objekt; palette muss hashbar sein (z. B. Tupel aus Hex-Farben)."""
+        with self._lock:
+            self._builders[(kind, name)] = builder
+            for key in [k for k in self._compiled if k[:2] == (kind, name)]:
+                del self._compiled[key]
+
+    def get(self, kind: str, name: str, palette: Hashable) -> Any:
+        key = (kind, name, palette)
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self.hits += 1
+                return compiled
+            builder = self._builders.get((kind, name))
+            if builder is None:
+                raise KeyError(f"Kein {kind} '{name}' registriert")
+            compiled = builder(palette)
+            self._compiled[key] = compiled
+            self.builds += 1
+            return compiled
+
+    def clear(self) -> None:
+        """Verwirft alle kompilierten Objekte (Builder bleiben registriert)."""
+        with self._lock:
+            self._compiled.clear()
+
+    def stylesheet(self, theme: str, palette: Hashable) -> Any:
+        return self.get("stylesheet", theme, palette)
+
+    def table_style(self, name: str, palette: Hashable) -> Any:
+        return self.get("table_style", name, palette)
+
+
+STYLE_REGISTRY = StyleRegistry()
@@ -2,26 +2,38 @@
 pdf_template_engine
 
 Öffentliche API zum Erzeugen der 7-seitigen Haupt-PDF mittels Templates:
-- build_dynamic_data: erzeugt dynamische Werte aus App-Daten
+- build_dynamic_data: erzeugt dynamische Werte aus App-Daten (optional nur die vom Layout benötigten)
+- stamp_offer_pdf: Overlay, Hintergründe und Zusatzseiten (mit Fußzeilen) in einem Durchgang
+- OverlayLayerCache: firmenunabhängige Seitenebenen für Multi-Firmen-Angebote wiederverwenden
 - generate_custom_offer_pdf: erstellt Overlay, merged mit Templates, hängt optional weitere Seiten an
 """
 
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-from .placeholders import build_dynamic_data, PLACEHOLDER_MAPPING
+from .placeholders import build_dynamic_data, new_placeholder_session, PLACEHOLDER_MAPPING, PLACEHOLDER_RESOLVERS
 from .dynamic_overlay import (
 	generate_overlay,
+	draw_overlay_pages,
+	layout_placeholder_keys,
 	merge_with_background,
+	stamp_offer_pdf,
+	OverlayLayerCache,
 	append_additional_pages,
 	generate_custom_offer_pdf,
 )
 
 __all__ = [
 	"build_dynamic_data",
+	"new_placeholder_session",
 	"PLACEHOLDER_MAPPING",
+	"PLACEHOLDER_RESOLVERS",
+	"layout_placeholder_keys",
 	"generate_overlay",
+	"draw_overlay_pages",
 	"merge_with_background",
+	"stamp_offer_pdf",
+	"OverlayLayerCache",
 	"append_additional_pages",
 	"generate_custom_offer_pdf",
 ]
@@ -7,10 +7,13 @@ pdf_templates_static/notext/nt_nt_01.pdf … nt_nt_07.pdf.
 """
 
 from __future__ import annotations
+import hashlib
 import io
+import json
 import re
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
@@ -26,8 +29,16 @@ except Exception:  # pragma: no cover
     PageObject = None  # type: ignore
 from pathlib import Path
 
+from offer_trace import traced
+
 from .placeholders import PLACEHOLDER_MAPPING
 
+try:
+    from pdf_style_registry import resolve_font
+except ImportError:  # pragma: no cover
+    def resolve_font(name: Optional[str], fallback: str = "Helvetica") -> str:
+        return name or fallback
+
 # Optional: Admin-Settings laden, um Overlay-Verhalten dynamisch zu steuern
 try:
     from database import load_admin_setting  # type: ignore
@@ -127,16 +138,32 @@ def _draw_global_watermark(c: canvas.Canvas, page_width: float, page_height: flo
         c.restoreState()
 
 
+_coords_cache: Dict[str, tuple] = {}
+
+
 def parse_coords_file(path: Path) -> List[Dict[str, Any]]:
     """Liest eine seiteX.yml und gibt eine Liste von Einträgen zurück.
 
     Einträge sind durch eine Zeile beginnend mit '-' oder '---' getrennt.
     Unterstützte Felder: Text, Position(x0,y0,x1,y1), Schriftart, Schriftgröße, Farbe
+    Das Ergebnis wird bis zur nächsten Änderung (mtime) gecacht und darf nicht verändert werden.
     """
+    try:
+        stamp = path.stat().st_mtime_ns
+    except OSError:
+        return []
+    cache_key = str(path.resolve())
+    cached = _coords_cache.get(cache_key)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    elements = _read_coords_file(path)
+    _coords_cache[cache_key] = (stamp, elements)
+    return elements
+
+
+def _read_coords_file(path: Path) -> List[Dict[str, Any]]:
     elements: List[Dict[str, Any]] = []
     current: Dict[str, Any] = {}
-    if not path.exists():
-        return elements
     with path.open(encoding="utf-8", errors="ignore") as f:
         for raw in f:
             line = raw.strip()
@@ -177,6 +204,50 @@ def parse_coords_file(path: Path) -> List[Dict[str, Any]]:
     return elements
 
 
+# dynamic_data-Schlüssel der Sonderzeichnungen (bestimmen deren Ebene beim Ebenen-Rendering)
+_SPECIAL_DRAWING_KEYS: Dict[str, Tuple[str, ...]] = {
+    "company_logo": ("company_logo_b64",),
+    "page1_donuts": ("self_supply_rate_percent", "self_sufficiency_percent", "autarky_percent",
+                     "self_consumption_percent", "direct_cover_consumption_percent_number"),
+    "page3_chart": ("cost_20y_no_increase_number", "cost_20y_with_increase_number"),
+    "page4_images": ("module_image_b64", "inverter_image_b64", "storage_image_b64"),
+}
+
+# Schlüssel, die generate_overlay unabhängig von den YML-Texten direkt aus dynamic_data liest
+OVERLAY_DIRECT_KEYS = frozenset({
+    "company_logo_b64",
+    "self_supply_rate_percent", "self_sufficiency_percent", "autarky_percent",
+    "self_consumption_percent", "direct_cover_consumption_percent_number",
+    "cost_10y_no_increase_number", "cost_10y_with_increase_number",
+    "cost_20y_no_increase_number", "cost_20y_with_increase_number",
+    "module_image_b64", "inverter_image_b64", "storage_image_b64",
+})
+
+_layout_keys_cache: Dict[str, tuple] = {}
+
+
+def layout_placeholder_keys(coords_dir: Path, pages: int = 7) -> set[str]:
+    """Platzhalter-Schlüssel, die generate_overlay für coords_dir benötigt.
+
+    Texte aus seite1..N.yml, die in PLACEHOLDER_MAPPING stehen, plus OVERLAY_DIRECT_KEYS.
+    Das Ergebnis wird bis zur nächsten Änderung (mtime) der YML-Dateien gecacht.
+    """
+    paths = [Path(coords_dir) / f"seite{i}.yml" for i in range(1, pages + 1)]
+    stamp = tuple(p.stat().st_mtime_ns if p.exists() else 0 for p in paths)
+    cache_key = str(Path(coords_dir).resolve())
+    cached = _layout_keys_cache.get(cache_key)
+    if cached and cached[0] == stamp:
+        return set(cached[1])
+    keys = set(OVERLAY_DIRECT_KEYS)
+    for path in paths:
+        for elem in parse_coords_file(path):
+            key = PLACEHOLDER_MAPPING.get(elem.get("text", ""))
+            if key:
+                keys.add(key)
+    _layout_keys_cache[cache_key] = (stamp, frozenset(keys))
+    return keys
+
+
 def int_to_color(value: int) -> Color:
     """Wandelt einen Integer (0xRRGGBB) in reportlab Color um."""
     r = ((value >> 16) & 0xFF) / 255.0
@@ -317,6 +388,7 @@ def _draw_top_right_triangle(c: canvas.Canvas, page_width: float, page_height: f
 
 # pdf_template_engine/dynamic_overlay.py
 
+@traced()
 def generate_overlay(coords_dir: Path, dynamic_data: Dict[str, str], total_pages: int = 7) -> bytes:
     """Erzeugt ein Overlay-PDF für sieben Seiten anhand der coords-Dateien.
 
@@ -324,19 +396,39 @@ def generate_overlay(coords_dir: Path, dynamic_data: Dict[str, str], total_pages
     """
     buffer = io.BytesIO()
     c = canvas.Canvas(buffer, pagesize=A4)
+    draw_overlay_pages(c, coords_dir, dynamic_data, total_pages)
+    c.save()
+    return buffer.getvalue()
+
+
+def draw_overlay_pages(c: canvas.Canvas, coords_dir: Path, dynamic_data: Dict[str, str], total_pages: int = 7,
+                       pages: Optional[Iterable[int]] = None,
+                       include: Optional[Callable[[Tuple[str, ...]], bool]] = None) -> None:
+    """Zeichnet die Overlay-Seiten (je mit showPage) auf einen bestehenden Canvas.
+
+    pages: Seitennummern (Standard 1-7). include(keys) entscheidet je Zeichenelement anhand der
+    gelesenen dynamic_data-Schlüssel, ob es gezeichnet wird (Ebenen-Rendering, siehe OverlayLayerCache).
+    """
+    c.setPageSize(A4)
     page_width, page_height = A4
-    for i in range(1, 8):
+
+    def _want(keys: Tuple[str, ...]) -> bool:
+        return include is None or include(keys)
+
+    for i in (pages if pages is not None else range(1, 8)):
         yml_path = coords_dir / f"seite{i}.yml"
         elements = parse_coords_file(yml_path)
         # Firmenlogo zuerst
-        _draw_company_logo(c, dynamic_data, page_width, page_height)
+        if _want(_SPECIAL_DRAWING_KEYS["company_logo"]):
+            _draw_company_logo(c, dynamic_data, page_width, page_height)
         # Dreieck
-        _draw_top_right_triangle(c, page_width, page_height, size=36.0)
+        if _want(()):
+            _draw_top_right_triangle(c, page_width, page_height, size=36.0)
         # Seite 1 Sonderdiagramme
-        if i == 1:
+        if i == 1 and _want(_SPECIAL_DRAWING_KEYS["page1_donuts"]):
             _draw_page1_kpi_donuts(c, dynamic_data, page_width, page_height)
         # Seite 3 rechter Chart
-        if i == 3:
+        if i == 3 and _want(_SPECIAL_DRAWING_KEYS["page3_chart"]):
             try:
                 c.saveState()
                 try:
@@ -348,7 +440,7 @@ def generate_overlay(coords_dir: Path, dynamic_data: Dict[str, str], total_pages
             except Exception:
                 pass
         # Seite 4 Produktbilder
-        if i == 4:
+        if i == 4 and _want(_SPECIAL_DRAWING_KEYS["page4_images"]):
             _draw_page4_component_images(c, dynamic_data, page_width, page_height)
 
     	# Keys für horizontale Zentrierung innerhalb Box
@@ -408,6 +500,8 @@ def generate_overlay(coords_dir: Path, dynamic_data: Dict[str, str], total_pages
         for elem in elements:
             text = elem.get("text", "")
             key = PLACEHOLDER_MAPPING.get(text)
+            if not _want((key,) if key else ()):
+                continue
             
             # Spezielle Behandlung für Logo-Platzhalter (als Bilder rendern)
             if text in ["Logomodul", "Logoricht", "Logoakkus"]:
@@ -451,7 +545,8 @@ def generate_overlay(coords_dir: Path, dynamic_data: Dict[str, str], total_pages
             else:
                 draw_x = 0
                 draw_y = 0
-            font_name = elem.get("font", "Helvetica")
+            # Unbekannte YML-Schriftnamen (z.B. "Helvetica-Regular") einmal pro Prozess auf Helvetica auflösen
+            font_name = resolve_font(elem.get("font", "Helvetica"))
             font_size = float(elem.get("font_size", 10.0))
             try:
                 c.setFont(font_name, font_size)
@@ -546,13 +641,15 @@ def generate_overlay(coords_dir: Path, dynamic_data: Dict[str, str], total_pages
                 from reportlab.lib.colors import Color as _Color
                 dark_blue = _Color(0.07, 0.34, 0.60)
                 for dyn_key, meta in page3_cost_tokens.items():
+                    if not _want((dyn_key,)):
+                        continue
                     pos = meta.get("position")
                     if not (isinstance(pos, tuple) and len(pos) == 4):
                         continue
                     x0, y0, x1, y1 = pos
                     draw_y = page_height - y1
                     val = dynamic_data.get(dyn_key) or meta.get("original_text") or ""
-                    font_name = meta.get("font", "Helvetica-Bold")
+                    font_name = resolve_font(meta.get("font", "Helvetica-Bold"))
                     font_size = float(meta.get("font_size", 10.49))
                     c.setFont(font_name, font_size)
                     bw = c.stringWidth(str(val), font_name, font_size)
@@ -568,8 +665,6 @@ def generate_overlay(coords_dir: Path, dynamic_data: Dict[str, str], total_pages
                 c.restoreState()
 
         c.showPage()
-    c.save()
-    return buffer.getvalue()
 
 def _draw_page3_right_chart_and_separator(c: canvas.Canvas, elements: List[Dict[str, Any]], dynamic_data: Dict[str, str], page_width: float, page_height: float) -> None:
     """Seite 3: Rechts NUR die 20-Jahres-Gesamtergebnisse als Text + vertikale Trennlinie.
@@ -871,6 +966,98 @@ def _remove_text_from_page(page, texts_to_remove: list[str]):
         pass  # Bei Fehlern einfach ignorieren
 
 
+_background_reader_cache: Dict[str, tuple] = {}
+
+
+def _cached_background_page(path: Path) -> Any:
+    """Erste Seite einer Hintergrund-PDF; der Reader wird bis zur nächsten Änderung (mtime) gecacht.
+
+    Die gecachte Seite wird nie verändert: Merges erfolgen auf der Kopie, die PdfWriter.add_page anlegt.
+    Nicht lesbare Dateien werden als None gecacht.
+    """
+    try:
+        stamp = path.stat().st_mtime_ns
+    except OSError:
+        return None
+    cache_key = str(path.resolve())
+    cached = _background_reader_cache.get(cache_key)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    try:
+        page = PdfReader(str(path)).pages[0]
+    except Exception:
+        page = None
+    _background_reader_cache[cache_key] = (stamp, page)
+    return page
+
+
+def _add_template_page(writer: PdfWriter, ov_page: Any, bg_dir: Path, template_prefix: str, page_num: int) -> None:
+    """Fügt Seite page_num als Hintergrund (+ haus.pdf auf Seite 1) mit darübergelegtem Overlay an writer an."""
+    # Unterstütze verschiedene Template-Präfixe basierend auf Offer-Type
+    candidates = [
+        bg_dir / f"{template_prefix}_{page_num:02d}.pdf",  # z.B. hp_nt_01.pdf oder nt_nt_01.pdf
+        bg_dir / f"nt_nt_{page_num:02d}.pdf",  # Fallback für PV
+        bg_dir / f"nt_{page_num:02d}.pdf"  # Legacy-Fallback
+    ]
+    bg_page = None
+    for cand in candidates:
+        if cand.exists():
+            bg_page = _cached_background_page(cand)
+            if bg_page is not None:
+                break
+
+    # Optional: Auf Seite 1 zusätzlich eine weitere statische PDF (haus.pdf) mergen
+    # Reihenfolge: Basis (nt_nt_01.pdf) -> haus.pdf -> Overlay
+    extra_bg_page = None
+    if page_num == 1:
+        haus_path = bg_dir / "haus.pdf"
+        if haus_path.exists():
+            extra_bg_page = _cached_background_page(haus_path)
+
+    # Falls kein Standard-Hintergrund vorhanden ist, aber haus.pdf existiert, nutze diese als Basis
+    base_page = bg_page
+    if base_page is None and extra_bg_page is not None:
+        base_page = extra_bg_page
+        extra_bg_page = None  # bereits als Basis gesetzt
+
+    if base_page is None:
+        # Kein Hintergrund gefunden - nur Overlay verwenden
+        writer.add_page(ov_page)
+        return
+
+    # Ab hier nur noch die Writer-Kopie verändern, nie die gecachte Seite
+    base_page = writer.add_page(base_page)
+    # Seite 3: Problematische Legendentexte aus dem Hintergrund entfernen
+    if page_num == 3:
+        texts_to_remove = [
+            "",
+            "", 
+            "",
+            "",
+            ""
+        ]
+        _remove_text_from_page(base_page, texts_to_remove)
+
+    # Falls eine zusätzliche Haus-Seite vorhanden ist, zuerst darüber legen (skaliert 30% und zentriert)
+    if extra_bg_page is not None:
+        try:
+            bw = float(base_page.mediabox.width)
+            bh = float(base_page.mediabox.height)
+            hw = float(extra_bg_page.mediabox.width)
+            hh = float(extra_bg_page.mediabox.height)
+            scale = 0.3  # 70% kleiner
+            tx = (bw - hw * scale) / 2.0
+            ty = (bh - hh * scale) / 2.0
+            t = Transformation().scale(scale, scale).translate(tx, ty)
+            base_page.merge_transformed_page(extra_bg_page, t)
+        except Exception:
+            pass  # Fehler beim Mergen ignorieren
+
+    # Overlay über Hintergrund legen
+    base_page.merge_page(ov_page)
+
+
+@traced()
 def merge_with_background(overlay_bytes: bytes, bg_dir: Path, template_prefix: str = "nt_nt") -> bytes:
     """Verschmilzt das Overlay mit Templates aus bg_dir.
     
@@ -882,81 +1069,188 @@ def merge_with_background(overlay_bytes: bytes, bg_dir: Path, template_prefix: s
     overlay_reader = PdfReader(io.BytesIO(overlay_bytes))
     writer = PdfWriter()
     for page_num in range(1, 8):
-        # Unterstütze verschiedene Template-Präfixe basierend auf Offer-Type
-        candidates = [
-            bg_dir / f"{template_prefix}_{page_num:02d}.pdf",  # z.B. hp_nt_01.pdf oder nt_nt_01.pdf
-            bg_dir / f"nt_nt_{page_num:02d}.pdf",  # Fallback für PV
-            bg_dir / f"nt_{page_num:02d}.pdf"  # Legacy-Fallback
-        ]
-        bg_page = None
-        for cand in candidates:
-            if cand.exists():
-                try:
-                    bg_reader = PdfReader(str(cand))
-                    bg_page = bg_reader.pages[0]
-                    break
-                except Exception:
-                    continue
-        # Fallback: Wenn kein Hintergrund vorhanden/lesbar ist, füge nur Overlay-Seite ein
-        ov_page = overlay_reader.pages[page_num - 1]
-
-        # Optional: Auf Seite 1 zusätzlich eine weitere statische PDF (haus.pdf) mergen
-        # Reihenfolge: Basis (nt_nt_01.pdf) -> haus.pdf -> Overlay
-        extra_bg_page = None
-        if page_num == 1:
-            haus_path = bg_dir / "haus.pdf"
-            if haus_path.exists():
-                try:
-                    haus_reader = PdfReader(str(haus_path))
-                    extra_bg_page = haus_reader.pages[0]
-                except Exception:
-                    extra_bg_page = None
-
-        # Falls kein Standard-Hintergrund vorhanden ist, aber haus.pdf existiert, nutze diese als Basis
-        base_page = bg_page
-        if base_page is None and extra_bg_page is not None:
-            base_page = extra_bg_page
-            extra_bg_page = None  # bereits als Basis gesetzt
-
-        if base_page is not None:
-            # Seite 3: Problematische Legendentexte aus dem Hintergrund entfernen
-            if page_num == 3:
-                texts_to_remove = [
-                    "",
-                    "", 
-                    "",
-                    "",
-                    ""
-                ]
-                _remove_text_from_page(base_page, texts_to_remove)
-                
-            # Falls eine zusätzliche Haus-Seite vorhanden ist, zuerst darüber legen (skaliert 30% und zentriert)
-            if extra_bg_page is not None:
-                try:
-                    bw = float(base_page.mediabox.width)
-                    bh = float(base_page.mediabox.height)
-                    hw = float(extra_bg_page.mediabox.width)
-                    hh = float(extra_bg_page.mediabox.height)
-                    scale = 0.3  # 70% kleiner
-                    tx = (bw - hw * scale) / 2.0
-                    ty = (bh - hh * scale) / 2.0
-                    t = Transformation().scale(scale, scale).translate(tx, ty)
-                    base_page.merge_transformed_page(extra_bg_page, t)
-                except Exception:
-                    pass  # Fehler beim Mergen ignorieren
-            
-            # Overlay über Hintergrund legen
-            base_page.merge_page(ov_page)
-            writer.add_page(base_page)
+        _add_template_page(writer, overlay_reader.pages[page_num - 1], bg_dir, template_prefix, page_num)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+# Schlüssel, die sich zwischen Firmen eines Kunden typischerweise unterscheiden (Startmenge;
+# OverlayLayerCache lernt weitere Schlüssel aus den tatsächlich abweichenden Werten hinzu)
+COMPANY_SPECIFIC_KEY_PREFIXES: Tuple[str, ...] = ("company_",)
+COMPANY_SPECIFIC_KEYS = frozenset({
+    "company_logo_b64", "module_image_b64", "inverter_image_b64", "storage_image_b64",
+})
+
+
+def _page_layout_keys(coords_dir: Path, page_num: int) -> Tuple[str, ...]:
+    """Alle dynamic_data-Schlüssel, die Seite page_num liest (YML-Platzhalter + Sonderzeichnungen)."""
+    keys = {PLACEHOLDER_MAPPING.get(elem.get("text", "")) for elem in parse_coords_file(coords_dir / f"seite{page_num}.yml")}
+    keys.update(_SPECIAL_DRAWING_KEYS["company_logo"])
+    if page_num == 1:
+        keys.update(_SPECIAL_DRAWING_KEYS["page1_donuts"])
+    elif page_num == 3:
+        keys.update(_SPECIAL_DRAWING_KEYS["page3_chart"])
+        keys.update(("cost_10y_no_increase_number", "cost_10y_with_increase_number"))
+    elif page_num == 4:
+        keys.update(_SPECIAL_DRAWING_KEYS["page4_images"])
+    keys.discard(None)
+    return tuple(sorted(keys))
+
+
+def _file_stamp(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+class OverlayLayerCache:
+    """Ebenen-Cache für Multi-Firmen-Angebote eines Kunden.
+
+    Jede Template-Seite wird in eine kundenbezogene, firmenunabhängige Ebene (Hintergrund +
+    Overlay-Elemente ohne Firmenbezug) und eine dünne Firmenebene zerlegt. Die erste Ebene wird
+    einmal gerendert, mit dem Hintergrund verschmolzen und über einen Digest ihrer tatsächlich
+    gezeichneten Werte gecacht; je Firma wird nur die Firmenebene gezeichnet und darübergelegt.
+
+    Als firmenspezifisch gelten COMPANY_SPECIFIC_KEYS, Schlüssel mit company_-Präfix und alle
+    Schlüssel, deren Wert sich zwischen den beobachteten Firmen unterscheidet. Eine falsche
+    Einordnung kostet nur Cache-Treffer, nie Korrektheit: der Digest enthält alle Werte der Ebene.
+    Eine Instanz je Kunde/Batch verwenden (nicht über Kunden hinweg teilen).
+    """
+
+    def __init__(self, company_keys: Iterable[str] = COMPANY_SPECIFIC_KEYS, max_pages: int = 64):
+        self.company_keys = set(company_keys)
+        self._reference: Optional[Dict[str, Any]] = None
+        self._pages: "OrderedDict[str, Any]" = OrderedDict()
+        self._max_pages = max(7, int(max_pages))
+        self.hits = 0
+        self.misses = 0
+
+    def is_company_key(self, key: str) -> bool:
+        return key in self.company_keys or key.startswith(COMPANY_SPECIFIC_KEY_PREFIXES)
+
+    def is_invariant(self, keys: Tuple[str, ...]) -> bool:
+        return not any(self.is_company_key(k) for k in keys)
+
+    def is_company_layer(self, keys: Tuple[str, ...]) -> bool:
+        return not self.is_invariant(keys)
+
+    def observe(self, dynamic_data: Dict[str, Any]) -> None:
+        """Übernimmt Schlüssel, deren Wert von der ersten beobachteten Firma abweicht, in die Firmenebene."""
+        if self._reference is None:
+            self._reference = dict(dynamic_data)
+            return
+        for key in set(self._reference) | set(dynamic_data):
+            if self._reference.get(key) != dynamic_data.get(key):
+                self.company_keys.add(key)
+
+    def _page_digest(self, coords_dir: Path, bg_dir: Path, template_prefix: str, page_num: int,
+                     dynamic_data: Dict[str, Any], total_pages: int) -> str:
+        keys = [k for k in _page_layout_keys(coords_dir, page_num) if not self.is_company_key(k)]
+        backgrounds = [bg_dir / f"{template_prefix}_{page_num:02d}.pdf", bg_dir / f"nt_nt_{page_num:02d}.pdf",
+                       bg_dir / f"nt_{page_num:02d}.pdf", bg_dir / "haus.pdf"]
+        payload = {
+            "page": page_num,
+            "prefix": template_prefix,
+            "total_pages": total_pages,
+            "coords": [str(Path(coords_dir).resolve()), _file_stamp(coords_dir / f"seite{page_num}.yml")],
+            "backgrounds": [[str(p), _file_stamp(p)] for p in backgrounds],
+            "values": {k: dynamic_data.get(k) for k in keys},
+        }
+        raw = json.dumps(payload, sort_keys=True, default=repr, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def invariant_page(self, coords_dir: Path, bg_dir: Path, template_prefix: str, page_num: int,
+                       dynamic_data: Dict[str, Any], total_pages: int) -> Any:
+        """Hintergrund + firmenunabhängige Overlay-Ebene von page_num als (gecachte) pypdf-Seite."""
+        digest = self._page_digest(coords_dir, bg_dir, template_prefix, page_num, dynamic_data, total_pages)
+        page = self._pages.get(digest)
+        if page is not None:
+            self._pages.move_to_end(digest)
+            self.hits += 1
+            return page
+        self.misses += 1
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer, pagesize=A4)
+        draw_overlay_pages(c, coords_dir, dynamic_data, total_pages, pages=(page_num,), include=self.is_invariant)
+        c.save()
+        writer = PdfWriter()
+        _add_template_page(writer, PdfReader(io.BytesIO(buffer.getvalue())).pages[0], bg_dir, template_prefix, page_num)
+        merged = io.BytesIO()
+        writer.write(merged)
+        page = PdfReader(io.BytesIO(merged.getvalue())).pages[0]
+        self._pages[digest] = page
+        while len(self._pages) > self._max_pages:
+            self._pages.popitem(last=False)
+        return page
+
+
+@traced()
+def stamp_offer_pdf(
+    coords_dir: Path,
+    bg_dir: Path,
+    dynamic_data: Dict[str, str],
+    total_pages: int = 7,
+    template_prefix: str = "nt_nt",
+    appendix_pdf: Optional[Any] = None,
+    draw_appendix_overlay: Optional[Callable[[canvas.Canvas, float, float, int], None]] = None,
+    layer_cache: Optional[OverlayLayerCache] = None,
+) -> bytes:
+    """Erzeugt die 7 Template-Seiten und hängt optional appendix_pdf an – in einem Durchgang.
+
+    Alle Overlays (7 Template-Seiten + je eine Fußzeilen-Seite pro Zusatzseite) entstehen auf
+    einem einzigen ReportLab-Canvas; das Ergebnis wird einmal geparst und zusammen mit den
+    gecachten Hintergründen in einem PdfWriter-Durchlauf geschrieben.
+
+    draw_appendix_overlay(c, page_width, page_height, index) zeichnet das Overlay der Zusatzseite
+    index (0-basiert); ohne Callback werden die Zusatzseiten unverändert angehängt.
+    appendix_pdf darf Bytes oder ein bereits geöffneter PdfReader sein.
+    Mit layer_cache (Multi-Firmen-Batch eines Kunden) werden nur die firmenspezifischen Elemente
+    gezeichnet und über die gecachten Seiten aus Hintergrund + firmenunabhängiger Ebene gelegt.
+    """
+    if isinstance(appendix_pdf, PdfReader):
+        appendix_pages = list(appendix_pdf.pages)
+    else:
+        appendix_pages = list(PdfReader(io.BytesIO(appendix_pdf)).pages) if appendix_pdf else []
+    stamp_appendix = draw_appendix_overlay is not None
+
+    base_pages = None
+    if layer_cache is not None:
+        layer_cache.observe(dynamic_data)
+        base_pages = [layer_cache.invariant_page(coords_dir, bg_dir, template_prefix, page_num, dynamic_data, total_pages)
+                      for page_num in range(1, 8)]
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    draw_overlay_pages(c, coords_dir, dynamic_data, total_pages,
+                       include=layer_cache.is_company_layer if layer_cache is not None else None)
+    if stamp_appendix:
+        for idx, page in enumerate(appendix_pages):
+            pw = float(page.mediabox.width)
+            ph = float(page.mediabox.height)
+            c.setPageSize((pw, ph))
+            draw_appendix_overlay(c, pw, ph, idx)
+            c.showPage()
+    c.save()
+    overlay_pages = PdfReader(io.BytesIO(buffer.getvalue())).pages
+
+    writer = PdfWriter()
+    for page_num in range(1, 8):
+        if base_pages is not None:
+            writer.add_page(base_pages[page_num - 1]).merge_page(overlay_pages[page_num - 1])
         else:
-            # Kein Hintergrund gefunden - nur Overlay verwenden
-            writer.add_page(ov_page)
-    
+            _add_template_page(writer, overlay_pages[page_num - 1], bg_dir, template_prefix, page_num)
+    for idx, page in enumerate(appendix_pages):
+        target = writer.add_page(page)
+        if stamp_appendix:
+            target.merge_page(overlay_pages[7 + idx])
     output = io.BytesIO()
     writer.write(output)
     return output.getvalue()
 
 
+@traced()
 def append_additional_pages(template_pdf: bytes, additional_pdf: Optional[bytes] = None) -> bytes:
     """Hängt optional weitere Seiten an das 7-seitige Template an."""
     if not additional_pdf:
@@ -1005,14 +1299,9 @@ def generate_custom_offer_pdf(
             add_reader = PdfReader(io.BytesIO(additional_pdf))
             total_pages = 7 + len(add_reader.pages)
         except Exception:
-            total_pages = 7
+            additional_pdf = None  # nicht lesbare Zusatzseiten werden ausgelassen
 
-    # 1. Overlay generieren
-    overlay_bytes = generate_overlay(coords_dir, dynamic_data, total_pages)
-    
-    # 2. Mit Hintergrund verschmelzen (mit Template-Präfix)
-    template_pdf = merge_with_background(overlay_bytes, bg_dir, template_prefix)
-    
-    # 3. Optional weitere Seiten anhängen
-    final_pdf = append_additional_pages(template_pdf, additional_pdf)
+    # Overlay, Hintergründe und Zusatzseiten in einem Durchgang
+    final_pdf = stamp_offer_pdf(coords_dir, bg_dir, dynamic_data, total_pages, template_prefix, appendix_pdf=additional_pdf)
     
+    return final_pdf
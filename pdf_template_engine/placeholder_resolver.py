@@ -0,0 +1,153 @@
+"""
+placeholder_resolver.py
+Registry für Platzhalter-Resolver: Jeder Resolver deklariert, welche Schlüssel er
+liefert und von welchen anderen Resolvern er abhängt. Ausgewertet werden nur die
+Resolver, deren Schlüssel das Layout tatsächlich braucht. Gemeinsame Zwischenwerte
+(Produkt-Lookups, Admin-Settings) werden pro Sitzung memoisiert; Ergebnisse, die
+nicht von der Firma abhängen, werden zwischen PV- und WP-Durchlauf wiederverwendet.
+"""
+
+from __future__ import annotations
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+_MISSING = object()
+
+
+class ResolveContext:
+    """Eingabedaten eines Durchlaufs plus Memo-Speicher für gemeinsame Zwischenwerte."""
+
+    def __init__(self, project_data: Dict[str, Any] | None, analysis_results: Dict[str, Any] | None):
+        self.project_data: Dict[str, Any] = project_data or {}
+        self.analysis_results: Dict[str, Any] = analysis_results or {}
+        self._memo: Dict[Any, Any] = {}
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+    def memo(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """Liefert den gespeicherten Wert zu `key` oder berechnet ihn einmalig."""
+        value = self._memo.get(key, _MISSING)
+        if value is not _MISSING:
+            self.memo_hits += 1
+            return value
+        self.memo_misses += 1
+        value = compute()
+        self._memo[key] = value
+        return value
+
+    def cached(self, namespace: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrappt `func` so, dass gleiche Argumente nur einmal ausgewertet werden (z. B. DB-Lookups)."""
+        def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = (namespace, repr(args), repr(sorted(kwargs.items())))
+            return self.memo(key, lambda: func(*args, **kwargs))
+        return _wrapper
+
+
+@dataclass
+class PlaceholderResolver:
+    """Ein Abschnitt der Platzhalter-Berechnung.
+
+    compute(ctx, result, company_info) schreibt seine Werte direkt in `result`.
+    keys/key_prefixes beschreiben die gelieferten Schlüssel, inputs die Resolver,
+    deren Werte vorher in `result` stehen müssen.
+    """
+    name: str
+    compute: Callable[[ResolveContext, Dict[str, str], Dict[str, Any]], None]
+    keys: Set[str] = field(default_factory=set)
+    key_prefixes: Tuple[str, ...] = ()
+    inputs: Tuple[str, ...] = ()
+    uses_company: bool = False
+    always: bool = False
+
+    def provides(self, key: str) -> bool:
+        return key in self.keys or any(key.startswith(p) for p in self.key_prefixes)
+
+
+class ResolverRegistry:
+    """Geordnete Sammlung von Resolvern; die Reihenfolge der Registrierung ist die Ausführungsreihenfolge."""
+
+    def __init__(self) -> None:
+        self._resolvers: Dict[str, PlaceholderResolver] = {}
+
+    def register(self, resolver: PlaceholderResolver) -> PlaceholderResolver:
+        for dep in resolver.inputs:
+            if dep not in self._resolvers:
+                raise ValueError(f"Resolver '{resolver.name}' hängt von unbekanntem Resolver '{dep}' ab")
+        self._resolvers[resolver.name] = resolver
+        return resolver
+
+    def names(self) -> List[str]:
+        return list(self._resolvers)
+
+    def get(self, name: str) -> PlaceholderResolver:
+        return self._resolvers[name]
+
+    def plan(self, required_keys: Optional[Iterable[str]] = None) -> List[PlaceholderResolver]:
+        """Resolver, die für `required_keys` nötig sind (None = alle), inkl. transitiver Abhängigkeiten."""
+        if required_keys is None:
+            return list(self._resolvers.values())
+        required = set(required_keys)
+        needed: Set[str] = set()
+        stack = [r.name for r in self._resolvers.values()
+                 if r.always or any(r.provides(k) for k in required)]
+        while stack:
+            name = stack.pop()
+            if name in needed:
+                continue
+            needed.add(name)
+            stack.extend(self._resolvers[name].inputs)
+        return [r for r in self._resolvers.values() if r.name in needed]
+
+
+class PlaceholderSession:
+    """Löst Platzhalter für ein Projekt auf, ggf. mehrfach mit unterschiedlicher Firma.
+
+    Ergebnisse firmenunabhängiger Resolver werden zwischengespeichert; ein weiterer
+    Durchlauf mit anderer Firma führt nur die firmenabhängigen Resolver (und deren
+    Abhängige) erneut aus.
+    """
+
+    def __init__(self, registry: ResolverRegistry, project_data: Dict[str, Any] | None,
+                 analysis_results: Dict[str, Any] | None):
+        self.registry = registry
+        self.context = ResolveContext(project_data, analysis_results)
+        self._outputs: Dict[str, Dict[str, str]] = {}
+        self.timings: Dict[str, float] = {}
+        self.key_sources: Dict[str, str] = {}
+        self.runs: Dict[str, int] = {}
+
+    def resolve(self, company_info: Dict[str, Any] | None = None,
+                required_keys: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        company_info = company_info or {}
+        result: Dict[str, str] = {}
+        dirty: Set[str] = set()
+        for resolver in self.registry.plan(required_keys):
+            cached = self._outputs.get(resolver.name)
+            if cached is not None and not resolver.uses_company and not dirty.intersection(resolver.inputs):
+                result.update(cached)
+                continue
+            before = dict(result)
+            started = time.perf_counter()
+            resolver.compute(self.context, result, company_info)
+            elapsed = time.perf_counter() - started
+            self.timings[resolver.name] = self.timings.get(resolver.name, 0.0) + elapsed
+            self.runs[resolver.name] = self.runs.get(resolver.name, 0) + 1
+            produced = {k: v for k, v in result.items() if before.get(k, _MISSING) != v}
+            for k in produced:
+                self.key_sources[k] = resolver.name
+            if resolver.uses_company or dirty.intersection(resolver.inputs):
+                dirty.add(resolver.name)
+            else:
+                self._outputs[resolver.name] = produced
+        return result
+
+    def timing_report(self) -> Dict[str, Any]:
+        """Laufzeiten je Resolver und je Schlüssel (Zeit des erzeugenden Resolvers) plus Memo-Statistik."""
+        return {
+            "resolvers": {name: {"seconds": round(self.timings[name], 6), "runs": self.runs.get(name, 0)}
+                          for name in self.timings},
+            "keys": {key: {"resolver": name, "seconds": round(self.timings.get(name, 0.0), 6)}
+                     for key, name in sorted(self.key_sources.items())},
+            "memo": {"hits": self.context.memo_hits, "misses": self.context.memo_misses},
+        }
@@ -7,11 +7,14 @@ für die PDF-Overlays zu erzeugen.
 """
 
 from __future__ import annotations
-from typing import Dict, Any, List, Callable, Optional
+from typing import Dict, Any, List, Callable, Iterable, Optional
 import re
 from functools import lru_cache
 import math
 
+from offer_trace import traced
+from german_formatting import format_german_number
+
 try:
     from ..calculations import perform_calculations
 except Exception:
@@ -23,6 +26,11 @@ except Exception:
         sys.path.insert(0, _PARENT)
     from calculations import perform_calculations  # noqa: E402
 
+try:
+    from .placeholder_resolver import PlaceholderResolver, PlaceholderSession, ResolveContext, ResolverRegistry
+except ImportError:
+    from placeholder_resolver import PlaceholderResolver, PlaceholderSession, ResolveContext, ResolverRegistry  # noqa: E402
+
 def USE_PERFORM_CALCULATIONS(context: Dict[str, Any]) -> Dict[str, Any]:
     """
     DEF Block:
@@ -397,10 +405,7 @@ def fmt_number(value: Any, decimal_places: int = 2, suffix: str = "", force_germ
         
         if force_german:
             # Deutsche Formatierung: Tausendertrennzeichen = Punkt, Dezimaltrennzeichen = Komma
-            if decimal_places == 0:
-                formatted = f"{num:,.0f}".replace(',', '#').replace('.', ',').replace('#', '.')
-            else:
-                formatted = f"{num:,.{decimal_places}f}".replace(',', '#').replace('.', ',').replace('#', '.')
+            formatted = format_german_number(num, decimal_places)
         else:
             # Fallback: Standard-Formatierung
             formatted = f"{num:.{decimal_places}f}"
@@ -411,15 +416,27 @@ def fmt_number(value: Any, decimal_places: int = 2, suffix: str = "", force_germ
         return "0" + (",00" if decimal_places > 0 else "") + (" " + suffix if suffix else "")
 
 
-def build_dynamic_data(project_data: Dict[str, Any] | None,
-                       analysis_results: Dict[str, Any] | None,
-                       company_info: Dict[str, Any] | None = None) -> Dict[str, str]:
+def _as_str(v: Any) -> str:
+    return "" if v is None else str(v)
+
+
+def _parse_float(val: Any) -> float | None:
+    """Tolerante Zahl-zu-Float Konvertierung: akzeptiert "10,0", "10.0", "10 kWh", "10,00 kWh"."""
+    if val is None:
+        return None
+    try:
+        if isinstance(val, (int, float)):
+            return float(val)
+        s = re.sub(r"[^0-9,\.\-]", "", str(val).strip()).replace(",", ".")
+        return float(s) if s not in {"", "-", "."} else None
+    except Exception:
+        return None
 
-    """Erzeugt ein Dictionary mit dynamischen Werten für die Overlays."""
-    # Dies ist dein vollständiger Originalcode. Die einzige Änderung ist der Block ganz am Ende.
-    project_data = project_data or {}
-    analysis_results = analysis_results or {}
-    company_info = company_info or {}
+
+def _resolve_core_placeholders(ctx: ResolveContext, out: Dict[str, str], company_info: Dict[str, Any]) -> None:
+    """Kernwerte: Kunde, Seiten 1-3, Wirtschaftlichkeit und Seite-4-Defaults (firmenunabhängig)."""
+    project_data = ctx.project_data
+    analysis_results = ctx.analysis_results
 
     customer = project_data.get("customer_data", {}) if isinstance(project_data, dict) else {}
     project_details = project_data.get("project_details", {}) if isinstance(project_data, dict) else {}
@@ -446,12 +463,6 @@ def build_dynamic_data(project_data: Dict[str, Any] | None,
         "customer_city_zip": f"{as_str(customer.get('zip_code'))} {as_str(customer.get('city'))}".strip(),
         "customer_phone": as_str(customer.get("phone_mobile") or customer.get("phone_landline")),
         "customer_email": as_str(customer.get("email")),
-        "company_name": as_str(company_info.get("name")),
-        "company_street": as_str(company_info.get("street")),
-        "company_city_zip": f"{as_str(company_info.get('zip_code'))} {as_str(company_info.get('city'))}".strip(),
-        "company_phone": as_str(company_info.get("phone")),
-        "company_email": as_str(company_info.get("email")),
-        "company_logo_b64": as_str(company_info.get("logo_base64")),
     }
 
     # Tolerante Zahl-zu-Float Konvertierung: akzeptiert "10,0", "10.0", "10 kWh", "10,00 kWh"
@@ -496,16 +507,7 @@ def build_dynamic_data(project_data: Dict[str, Any] | None,
         "customer_phone": phone,
         "customer_email": email,
 
-        # Firma (für Platzhalter rechts)
-        "company_name": as_str(company_info.get("name") or ""),
-        "company_street": as_str(company_info.get("street") or ""),
-        "company_city_zip": as_str((f"{company_info.get('zip_code','')} {company_info.get('city','')}").strip()),
-        "company_phone": as_str(company_info.get("phone") or ""),
-        "company_email": as_str(company_info.get("email") or ""),
-        "company_website": as_str(company_info.get("website") or ""),
 
-        # Firmenlogo (Base64) für Overlay-Header auf Seiten 1-6
-        "company_logo_b64": as_str(company_info.get("logo_base64") or ""),
 
         # Seite 4 – Defaults, damit keine Platzhaltertexte stehen bleiben
         "module_manufacturer": "",
@@ -598,6 +600,7 @@ def build_dynamic_data(project_data: Dict[str, Any] | None,
     if bat_kwh in (None, 0.0):
         try:
             from product_db import get_product_by_model_name as _get_prod_model_cap
+            _get_prod_model_cap = ctx.cached("get_product_by_model_name", _get_prod_model_cap)
         except Exception:
             _get_prod_model_cap = None  # type: ignore
         storage_model_name_pref = as_str(project_details.get("selected_storage_name") or "").strip()
@@ -1000,6 +1003,7 @@ def build_dynamic_data(project_data: Dict[str, Any] | None,
         # Admin-Fallback (falls gepflegt)
         try:
             from database import load_admin_setting as _load
+            _load = ctx.cached("load_admin_setting", _load)
             val = _load("electricity_price_increase_annual_percent", 5.0)
             valf = parse_float(val)
             if valf is not None and valf >= 0:
@@ -1085,6 +1089,7 @@ def build_dynamic_data(project_data: Dict[str, Any] | None,
     if not eeg_eur_per_kwh:
         try:
             from database import load_admin_setting
+            load_admin_setting = ctx.cached("load_admin_setting", load_admin_setting)
             fit = load_admin_setting("feed_in_tariffs", {}) or {}
             mode = (project_data.get("einspeise_art") or "parts")
             anlage_kwp = parse_float(analysis_results.get("anlage_kwp")) or parse_float(project_data.get("anlage_kwp")) or 0.0
@@ -1248,129 +1253,546 @@ def build_dynamic_data(project_data: Dict[str, Any] | None,
     # --- Ende Kernblock ---
 
 
-    # Seite 4: Produktdetails für Modul / WR / Speicher
-    # Wir versuchen, Produktdetails aus der lokalen DB zu laden (optional), basierend auf den ausgewählten Modellnamen.
-    get_product_by_model_name = None
-    try:
-        from product_db import get_product_by_model_name as _get_prod
-        get_product_by_model_name = _get_prod  # type: ignore
-    except Exception:
-        get_product_by_model_name = None
-
-    # Kleine Normalisierungshilfen (für Fuzzy-Matching und Schlüsselvergleiche)
-    def _norm_key(s: Any) -> str:
+    # Seite 1 – neue dynamische Felder und statische Texte nach Kundenwunsch
+    # 1) Jährliche Einspeisevergütung in Euro (für Platz "Dachneigung")
+    #    Nur berechnen wenn nicht zuvor über Seite3 synchronisiert
+    if "annual_feed_in_revenue_eur" not in result:
         try:
-            st = str(s).strip().lower()
-            # vereinheitliche Leer-/Sonderzeichen
-            st = re.sub(r"\s+", " ", st)
-            return st
+            # Primär vorhandene Berechnung nehmen
+            annual_feed_rev = (
+                analysis_results.get("annual_feedin_revenue_euro")
+                or analysis_results.get("annual_feed_in_revenue_year1")
+            )
+            # Falls nicht vorhanden oder offensichtlich inkonsistent, neu berechnen
+            # Hole Netzeinspeisung (Seite 2 Wert) und ermittele EEG-Tarif erneut wie oben verwendet
+            grid_feedin_raw = analysis_results.get("grid_feed_in_kwh") or result.get("grid_feed_in_kwh")
+            feed_in_kwh_val = None
+            if grid_feedin_raw:
+                try:
+                    feed_in_kwh_val = float(str(grid_feedin_raw).split()[0].replace('.', '').replace(',', '.')) if ' ' in str(grid_feedin_raw) else float(str(grid_feedin_raw).replace('.', '').replace(',', '.'))
+                except Exception:
+                    try:
+                        feed_in_kwh_val = float(re.sub(r"[^0-9,\.]", "", str(grid_feedin_raw)).replace(',', '.'))
+                    except Exception:
+                        feed_in_kwh_val = None
+            # EEG Tarif erneut bestimmen (gleiche Logik wie Seite3 oben)
+            try:
+                anlage_kwp_local = parse_float(analysis_results.get("anlage_kwp")) or 0.0
+                from database import load_admin_setting as _load_tar
+                _load_tar = ctx.cached("load_admin_setting", _load_tar)
+                fit_loc = _load_tar("feed_in_tariffs", {})
+                mode_loc = project_data.get("einspeise_art", "parts")
+                local_tariff = None
+                for trf in fit_loc.get(mode_loc, []):
+                    if trf.get("kwp_min", 0) <= anlage_kwp_local <= trf.get("kwp_max", 999):
+                        local_tariff = (trf.get("ct_per_kwh", 7.86) or 7.86) / 100.0
+                        break
+                if local_tariff is None:
+                    local_tariff = 0.068  # Fallback 6,8 ct
+            except Exception:
+                local_tariff = 0.068
+            # Neuberechnung wenn nötig
+            if feed_in_kwh_val is not None:
+                calc_rev = feed_in_kwh_val * local_tariff
+                if (annual_feed_rev is None) or (abs(calc_rev - float(annual_feed_rev)) > max(5.0, 0.2 * calc_rev)):
+                    annual_feed_rev = calc_rev
+                if annual_feed_rev is not None:
+                    result["annual_feed_in_revenue_eur"] = fmt_number(float(annual_feed_rev), 2, "€")
         except Exception:
-            return ""
+            pass
 
-    def _norm_flat(s: Any) -> str:
-        try:
-            st = str(s).strip().lower()
-            # entferne alles außer a-z0-9
-            return re.sub(r"[^a-z0-9]", "", st)
-        except Exception:
-            return ""
+    # 2) MwSt.-Betrag (19% vom Netto-Endbetrag) für Platz "Solaranlage"
+    # Basis: bevorzugt total_investment_netto, sonst final_price (falls Netto), sonst subtotal_netto.
+    try:
+        base_net = (
+            analysis_results.get("total_investment_netto")
+            or analysis_results.get("final_price")
+            or analysis_results.get("subtotal_netto")
+        )
+        vat_amount = None
+        if isinstance(base_net, (int, float)):
+            vat_amount = float(base_net) * 0.19
+        else:
+            # Falls nur Brutto/Netto-Kombi verfügbar, Differenz nutzen
+            netto = analysis_results.get("total_investment_netto")
+            brutto = analysis_results.get("total_investment_brutto")
+            if isinstance(netto, (int, float)) and isinstance(brutto, (int, float)):
+                vat_amount = max(0.0, float(brutto) - float(netto))
+        if vat_amount is not None:
+            result["vat_amount_eur"] = fmt_number(float(vat_amount), 2, "€")
+    except Exception:
+        pass
 
-    def fetch_details(model_name: str) -> Dict[str, Any]:
-        if not model_name or not isinstance(model_name, str):
-            return {}
-        if get_product_by_model_name is None:
-            return {}
-        try:
-            data = get_product_by_model_name(model_name)
-            return data or {}
-        except Exception:
-            return {}
+    # 3) Statische Texte
+    #    a) „inklusive“ für die Label-Plätze "Batterie" und "Jahresertrag"
+    result["static_inklusive"] = "inklusive"
+    #    b) Rechts neben Batterie: „DC Dachmontage“
+    result["static_dc_dachmontage"] = "DC Dachmontage"
+    #    c) Rechts neben Jahresertrag: „AC Installation | Inbetriebnahme“
+    result["static_ac_installation"] = "AC Installation | Inbetriebnahme"
 
-    # Modul
-    module_name = as_str(project_details.get("selected_module_name") or "").strip()
-    module_id = project_details.get("selected_module_id")
-    module_details = {}
-    if module_id not in (None, ""):
-        # Bevorzugt per ID (robust gegen Namensabweichungen)
-        try:
-            from product_db import get_product_by_id as _get_prod_by_id
-            md = _get_prod_by_id(int(module_id))
-            if isinstance(md, dict):
-                module_details = md
-                module_name = as_str(md.get("model_name") or module_name)
-        except Exception:
-            pass
-    if not module_details and module_name:
-        module_details = fetch_details(module_name) or {}
-    # Alternativ: explizites Projektfeld 'module_model' als Modellname versuchen
-    if not module_details:
-        alt_model = as_str(project_details.get("module_model") or "").strip()
-        if alt_model:
-            module_details = fetch_details(alt_model) or {}
+    # Seite 3: Basis-Parameter dynamisch füllen
+    try:
+        # Energieversorger Name (falls vorhanden)
+        provider = project_data.get("energy_supplier") or project_data.get("stromanbieter") or analysis_results.get("energy_supplier")
+        if provider:
+            result["basis_energy_supplier_name"] = str(provider)
+        # Wartung Prozent (z.B. 1 % Invest p.a.)
+        maint_pct = analysis_results.get("maintenance_costs_percent") or analysis_results.get("maintenance_percent_invest_pa")
+        if isinstance(maint_pct, (int,float)):
+            result["basis_maintenance_percent_invest"] = f"{maint_pct:.2f} % Invest. p.a."
+        # Verbrauchstarif Text (exakte €/kWh Anzeige mit 4 Nachkommastellen statt "Verbrauch 32 Cent")
+        price_eur_kwh = (
+            analysis_results.get("aktueller_strompreis_fuer_hochrechnung_euro_kwh")
+            or analysis_results.get("electricity_price_eur_per_kwh")
+            or analysis_results.get("electricity_price_kwh")
+            or analysis_results.get("electricity_price_per_kwh")
+        )
+        if isinstance(price_eur_kwh,(int,float)) and price_eur_kwh>0:
+            result["basis_tariff_text"] = f"{price_eur_kwh:.2f} € / kWh"
+        # PV Lebensdauer
+        lifetime = analysis_results.get("simulation_period_years") or project_data.get("simulation_period_years")
+        if isinstance(lifetime,(int,float)) and lifetime>0:
+            result["basis_pv_lifetime_years"] = f"{int(lifetime)} Jahre"
+        # Strompreissteigerung
+        inc_pct = analysis_results.get("electricity_price_increase_annual_percent") or project_data.get("electricity_price_increase_annual_percent")
+        if isinstance(inc_pct,(int,float)):
+            result["basis_price_increase_percent_text"] = f"{inc_pct:.2f} % jährlich"
+        # Eigenkapitalkosten
+        cost_cap = analysis_results.get("cost_of_capital_percent") or project_data.get("cost_of_capital_percent") or analysis_results.get("alternative_investment_interest_rate_percent")
+        if isinstance(cost_cap,(int,float)):
+            result["basis_cost_of_capital_percent"] = f"{cost_cap:.2f} %"
+    except Exception:
+        pass
 
-    # Falls weiterhin keine Details/ID gefunden: Fuzzy-Matching über Produktliste (Kategorie Modul)
-    if not module_details and (module_name or project_details.get("module_model")):
-        try:
-            from product_db import list_products as _list_products, get_product_by_id as _get_prod_by_id
-        except Exception:
-            _list_products = None  # type: ignore
-            _get_prod_by_id = None  # type: ignore
-        if _list_products and _get_prod_by_id:
+    # Seite 3: Einsparungs-/Ertragszeilen neu & exakt nach Nutzerformeln berechnen
+    try:
+        def _pf(v):
             try:
-                cands = []
-                if module_name:
-                    cands.append(str(module_name))
-                mm_pd = as_str(project_details.get("module_model") or "").strip()
-                if mm_pd:
-                    cands.append(mm_pd)
-                # ggf. vorhandene DB-Infos
-                if module_details.get("model_name"):
-                    cands.append(as_str(module_details.get("model_name")))
-                if module_details.get("brand") and module_details.get("model_name"):
-                    cands.append(f"{module_details.get('brand')} {module_details.get('model_name')}")
-                cands_norm = {_norm_flat(c): c for c in cands if c}
-                prods = _list_products(category="Modul") or _list_products() or []
-                best_id = None
-                for p in prods:
-                    mn = as_str(p.get("model_name") or "")
-                    br = as_str(p.get("brand") or "")
-                    alts = [mn, f"{br} {mn}".strip()]
-                    alts_norm = [_norm_flat(x) for x in alts if x]
-                    if any(an in cands_norm for an in alts_norm):
-                        best_id = int(p.get("id"))
-                        break
-                # wenn nichts exakt passt: enthalte/substring-Test
-                if not best_id and prods and cands_norm:
-                    cand_keys = list(cands_norm.keys())
-                    for p in prods:
-                        mn = as_str(p.get("model_name") or "")
-                        br = as_str(p.get("brand") or "")
-                        alt = _norm_flat(f"{br} {mn}".strip())
-                        if any(k and k in alt for k in cand_keys):
-                            best_id = int(p.get("id"))
-                            break
-                if best_id:
-                    try:
-                        md = _get_prod_by_id(int(best_id)) or {}
-                        if md:
-                            module_details = md
-                            module_name = as_str(md.get("model_name") or module_name)
-                    except Exception:
-                        pass
+                if isinstance(v,(int,float)):
+                    return float(v)
+                return float(str(v).replace(',','.'))
+            except Exception:
+                return None
+        curr_price = _pf(price_eur_kwh) or _pf(analysis_results.get("aktueller_strompreis_fuer_hochrechnung_euro_kwh")) or 0.0
+        direct_kwh = _pf(analysis_results.get("direct_self_consumption_kwh")) or _pf(analysis_results.get("annual_direct_self_consumption_kwh"))
+        if direct_kwh is None:
+            try:
+                eigenv_total = _pf(analysis_results.get("annual_self_consumption_kwh"))
+                batt_dis_tmp = _pf(analysis_results.get("battery_discharge_for_sc_kwh")) or 0.0
+                if eigenv_total is not None:
+                    direct_kwh = max(0.0, eigenv_total - batt_dis_tmp)
             except Exception:
                 pass
-    # Überschrift: "PHOTOVOLTAIK MODULE – <Anzahl> Stück" (immer anzeigen)
-    try:
-        mod_qty = int(float(project_details.get("module_quantity") or 0))
-    except Exception:
-        mod_qty = 0
-    
-    if mod_qty > 0:
-        result["module_section_title"] = f"PHOTOVOLTAIK MODULE – {mod_qty} Stück"
-    else:
-        result["module_section_title"] = "PHOTOVOLTAIK MODULE"
-    
-    # Weitere Modul-Details nur wenn verfügbar
+        if direct_kwh is not None and curr_price>0:
+            result["annual_electricity_cost_savings_self_consumption_year1"] = fmt_number(direct_kwh*curr_price,2,"€")
+        feed_kwh = _pf(analysis_results.get("netzeinspeisung_kwh"))
+        feed_tariff = _pf(analysis_results.get("einspeiseverguetung_eur_per_kwh")) or _pf(analysis_results.get("feed_in_tariff_eur_per_kwh")) or _pf(analysis_results.get("feed_in_tariff_year1_eur_per_kwh"))
+        if feed_kwh is not None and feed_tariff is not None:
+            result["annual_feed_in_revenue_year1"] = fmt_number(feed_kwh*feed_tariff,2,"€")
+        batt_dis = _pf(analysis_results.get("battery_discharge_for_sc_kwh"))
+        if batt_dis is not None and curr_price>0:
+            result["annual_battery_discharge_value_year1"] = fmt_number(batt_dis*curr_price,2,"€")
+        batt_charge = _pf(analysis_results.get("battery_charge_kwh"))
+        if batt_charge is not None and batt_dis is not None and feed_tariff is not None:
+            surplus = max(0.0, batt_charge - batt_dis)
+            result["annual_battery_surplus_feed_in_value_year1"] = fmt_number(surplus*feed_tariff,2,"€")
+        parts=[]
+        for k in ["annual_electricity_cost_savings_self_consumption_year1","annual_feed_in_revenue_year1","annual_battery_discharge_value_year1","annual_battery_surplus_feed_in_value_year1"]:
+            val_s = result.get(k)
+            if val_s:
+                try:
+                    parts.append(float(str(val_s).replace('.','').replace('€','').replace(' ','').replace(',','.')))
+                except Exception:
+                    pass
+        if parts:
+            result["annual_total_savings_year1_label"] = fmt_number(sum(parts),2,"€")
+    except Exception:
+        pass
+
+    # === FAIL-SAFE: Seite 3 Werte final absichern (falls weiter oben nichts gesetzt wurde) ===
+    def _to_float(x):
+        try:
+            # Kommas tolerieren
+            return float(str(x).replace(",", "."))
+        except Exception:
+            return 0.0
+
+    def _eur(x):
+        return fmt_number(x, 2, "€")
+
+    # Einspeisetarif in €/kWh sichern (aus results oder Default <10 kWp Teileinspeisung)
+    eeg = _to_float(analysis_results.get("einspeiseverguetung_eur_per_kwh") or 0.0786)
+    if eeg > 1:  # Schutz falls ct/kWh geliefert
+        eeg /= 100.0
+
+    # Strompreis in €/kWh sichern
+    price_eur_kwh = (
+        _to_float(analysis_results.get("aktueller_strompreis_fuer_hochrechnung_euro_kwh"))
+        or _to_float(analysis_results.get("electricity_price_eur_per_kwh"))
+        or _to_float(project_data.get("electricity_price_kwh"))
+        or _to_float(project_data.get("electricity_price_per_kwh"))
+        or 0.30
+    )
+    if price_eur_kwh > 1:  # Schutz falls ct/kWh geliefert
+        price_eur_kwh /= 100.0
+
+    # Jahreswerte als Fallback, falls Monatslisten fehlten
+    feedin_kwh   = _to_float(analysis_results.get("netzeinspeisung_kwh"))
+    charge_kwh   = _to_float(analysis_results.get("annual_storage_charge_kwh"))
+    discharge_kwh= _to_float(analysis_results.get("annual_storage_discharge_kwh"))
+    surplus_kwh  = max(0.0, charge_kwh - discharge_kwh)
+
+    # Falls die Seite-3 Felder noch leer/nicht vorhanden sind → jetzt befüllen
+   # if not result.get("direct_grid_feed_in_eur"):
+     #   result["direct_grid_feed_in_eur"] = _eur(feedin_kwh * eeg)
+
+   # if not result.get("battery_usage_savings_eur"):
+      #  result["battery_usage_savings_eur"] = _eur(discharge_kwh * price_eur_kwh)
+
+   # if not result.get("battery_surplus_feed_in_eur"):
+   #     result["battery_surplus_feed_in_eur"] = _eur(surplus_kwh * eeg)
+
+    # Zusatz: kWh-Hilfsfelder für Seite 3, wenn noch leer
+    if not result.get("calc_grid_feed_in_kwh_page3"):
+        result["calc_grid_feed_in_kwh_page3"] = fmt_number(feedin_kwh, 0, "kWh")
+    if not result.get("calc_battery_discharge_kwh_page3"):
+        result["calc_battery_discharge_kwh_page3"] = fmt_number(discharge_kwh, 0, "kWh")
+    if not result.get("calc_battery_surplus_kwh_page3"):
+        result["calc_battery_surplus_kwh_page3"] = fmt_number(surplus_kwh, 0, "kWh")
+
+    # ENTFERNT: Gesamtwert-Fallback-System das die Berechnungen überschreibt
+    # if not result.get("total_annual_savings_eur"):
+    #     ...kompletter Block entfernt...
+
+    # === Seite 3: Berechnungsgrundlagen - Dynamische Werte ===
+    
+    # Ausrichtung (orientation_text) aus calculations.py mit erweiterten Fallbacks
+    orientation = (
+        analysis_results.get("orientation_text") 
+        or analysis_results.get("orientation")
+        or analysis_results.get("ausrichtung")
+        or project_data.get("orientation")
+        or project_details.get("orientation")
+        or project_data.get("ausrichtung")
+        or project_details.get("ausrichtung")
+        or project_data.get("roof_orientation")
+        or project_details.get("roof_orientation")
+        # Häufigster Schlüssel aus data_input.py Bedarfsanalyse
+        or (project_data.get("project_details", {}) or {}).get("roof_orientation")
+    )
+    print(f"DEBUG ORIENTATION: raw_value='{orientation}', from analysis_results: '{analysis_results.get('orientation_text')}', from project_data: '{project_data.get('orientation')}', from project_details.roof_orientation: '{project_details.get('roof_orientation')}'")
+    
+    # Erweiterte Ausrichtungs-Logik - einfache Anzeige ohne Ertragswerte
+    if orientation and str(orientation).strip() not in ("", "None", "null", "Bitte wählen", "Please select"):
+        orientation_str = str(orientation).strip()
+        result["orientation_text"] = orientation_str
+        print(f"DEBUG ORIENTATION: using value '{orientation_str}'")
+    else:
+        # Fallback für fehlende Ausrichtung
+        result["orientation_text"] = "Süd"
+        print("DEBUG ORIENTATION: using fallback 'Süd'")
+    
+    print(f"DEBUG ORIENTATION: final result='{result.get('orientation_text')}'")
+    
+    # Seitennummerierung für Seite 3
+    try:
+        total_pages = project_data.get("total_pages", 7)
+        result["page_number_with_total"] = f"Seite 3 von {total_pages}"
+        print(f"DEBUG PAGE_NUMBER: formatted as 'Seite 3 von {total_pages}'")
+    except Exception:
+        result["page_number_with_total"] = "3"
+        print("DEBUG PAGE_NUMBER: fallback to '3'")
+    
+    # Dachdeckung aus data_input.py (project_data oder project_details)
+    roof_covering = (
+        project_data.get("roof_covering_type") 
+        or project_details.get("roof_covering_type")
+        or project_data.get("roof_covering")
+        or project_details.get("roof_covering")
+    )
+    if roof_covering:
+        result["roof_covering_type"] = str(roof_covering)
+    
+    # Dachneigung aus data_input.py
+    roof_inclination = (
+        project_data.get("roof_inclination_deg")
+        or project_details.get("roof_inclination_deg") 
+        or project_data.get("roof_inclination")
+        or project_details.get("roof_inclination")
+        # Häufigster Schlüssel aus data_input.py Bedarfsanalyse
+        or (project_data.get("project_details", {}) or {}).get("roof_inclination_deg")
+    )
+    print(f"DEBUG ROOF_INCLINATION: raw_value='{roof_inclination}', from project_details: '{project_details.get('roof_inclination_deg')}', from nested: '{(project_data.get('project_details', {}) or {}).get('roof_inclination_deg')}'")
+    
+    if roof_inclination is not None:
+        try:
+            incl_val = float(roof_inclination)
+            result["roof_inclination_text"] = f"{incl_val:.0f}°"
+            print(f"DEBUG ROOF_INCLINATION: formatted as '{result['roof_inclination_text']}'")
+        except Exception:
+            result["roof_inclination_text"] = str(roof_inclination)
+            print(f"DEBUG ROOF_INCLINATION: used as string '{result['roof_inclination_text']}'")
+    else:
+        result["roof_inclination_text"] = "30°"
+        print("DEBUG ROOF_INCLINATION: using fallback '30°'")
+    
+    # Dachart aus data_input.py
+    roof_type = (
+        project_data.get("roof_type")
+        or project_details.get("roof_type")
+        or project_data.get("roof_structure")
+        or project_details.get("roof_structure")
+    )
+    # Debug-Print und Filter für "Bitte wählen"-Werte
+    print(f"DEBUG ROOF_TYPE: raw_value='{roof_type}', from project_data: '{project_data.get('roof_type')}', from project_details: '{project_details.get('roof_type')}'")
+    
+    if roof_type and str(roof_type).strip() not in ("", "Bitte wählen", "Please select", "None", "null"):
+        result["roof_type"] = str(roof_type).strip()
+    else:
+        # Fallback: Versuche andere mögliche Schlüssel
+        fallback_keys = ["dach_art", "dachtyp", "roof_material", "dach_typ"]
+        for key in fallback_keys:
+            val = project_data.get(key) or project_details.get(key)
+            if val and str(val).strip() not in ("", "Bitte wählen", "Please select", "None", "null"):
+                result["roof_type"] = str(val).strip()
+                print(f"DEBUG ROOF_TYPE: used fallback key '{key}' with value '{val}'")
+                break
+        else:
+            result["roof_type"] = "Standard"  # Letzter Fallback
+            print("DEBUG ROOF_TYPE: using fallback 'Standard'")
+    
+    print(f"DEBUG ROOF_TYPE: final result='{result.get('roof_type')}'")
+    
+    # Finanzierung/Leasing gewünscht - zeigt die gewählte Finanzierungsart oder "Nein"
+    financing_requested = (
+        project_data.get("financing_requested")
+        or project_data.get("financing_needed")
+        or project_data.get("financing_leasing_required")
+        or project_data.get("finanzierung_leasing_gewuenscht")
+        or project_details.get("financing_needed")
+        or project_details.get("financing_leasing_required")
+        or (project_data.get("customer_data") or {}).get("financing_requested")
+        or (project_details.get("customer_data") or {}).get("financing_requested")
+    )
+    
+    # Finanzierungsart ermitteln
+    financing_type = (
+        project_data.get("financing_type")
+        or project_details.get("financing_type")
+        or (project_data.get("customer_data") or {}).get("financing_type")
+        or (project_details.get("customer_data") or {}).get("financing_type")
+    )
+    
+    # Debug-Output für Finanzierung
+    print(f"DEBUG FINANCING: financing_requested='{financing_requested}', financing_type='{financing_type}'")
+    print(f"DEBUG FINANCING: project_data.customer_data={project_data.get('customer_data', {})}")
+    
+    if financing_requested:
+        # Wenn Finanzierung gewünscht ist, zeige die gewählte Art
+        if isinstance(financing_requested, bool) and financing_requested:
+            if financing_type and isinstance(financing_type, str):
+                result["financing_needed_text"] = financing_type
+            else:
+                result["financing_needed_text"] = "Ja"
+        elif isinstance(financing_requested, str):
+            financing_str = financing_requested.lower().strip()
+            if financing_str in {"true", "ja", "yes", "1", "wahr"}:
+                if financing_type and isinstance(financing_type, str):
+                    result["financing_needed_text"] = financing_type
+                else:
+                    result["financing_needed_text"] = "Ja"
+            else:
+                result["financing_needed_text"] = "Nein"
+        else:
+            result["financing_needed_text"] = "Nein"
+    else:
+        result["financing_needed_text"] = "Nein"
+    
+    print(f"DEBUG FINANCING: final result financing_needed_text='{result.get('financing_needed_text')}')")
+    
+    # EEG-Vergütung formatiert (ct/kWh)
+    try:
+        anlage_kwp_val = parse_float(analysis_results.get("anlage_kwp") or project_data.get("anlage_kwp")) or 0.0
+        mode_val = project_data.get("einspeise_art", "parts")
+        
+        # Nutze die neue resolve_feed_in_tariff_eur_per_kwh Funktion
+        try:
+            from database import load_admin_setting as _load_admin_func
+            _load_admin_func = ctx.cached("load_admin_setting", _load_admin_func)
+        except Exception:
+            _load_admin_func = None
+        
+        if _load_admin_func:
+            eeg_eur_per_kwh = resolve_feed_in_tariff_eur_per_kwh(
+                anlage_kwp_val, 
+                mode_val, 
+                _load_admin_func,
+                analysis_results_snapshot=(analysis_results.get("einspeiseverguetung_eur_per_kwh"),)
+            )
+            # Zurück in ct/kWh umrechnen für Anzeige
+            eeg_ct_per_kwh = eeg_eur_per_kwh * 100.0
+            result["feed_in_tariff_text"] = f"{eeg_ct_per_kwh:.2f} Cent / kWh"
+        else:
+            # Fallback ohne Admin-Settings
+            result["feed_in_tariff_text"] = "7,86 Cent / kWh"
+    except Exception:
+        result["feed_in_tariff_text"] = "7,86 Cent / kWh"
+
+    out.update(result)
+
+
+def _resolve_company_placeholders(ctx: ResolveContext, result: Dict[str, str], company_info: Dict[str, Any]) -> None:
+    """Firmendaten (rechte Kopfzeile, Logo) – der einzige firmenabhängige Abschnitt."""
+    as_str = _as_str
+    result.update({
+        "company_name": as_str(company_info.get("name") or ""),
+        "company_street": as_str(company_info.get("street") or ""),
+        "company_city_zip": as_str((f"{company_info.get('zip_code','')} {company_info.get('city','')}").strip()),
+        "company_phone": as_str(company_info.get("phone") or ""),
+        "company_email": as_str(company_info.get("email") or ""),
+        "company_website": as_str(company_info.get("website") or ""),
+        # Firmenlogo (Base64) für Overlay-Header auf Seiten 1-6
+        "company_logo_b64": as_str(company_info.get("logo_base64") or ""),
+    })
+
+
+def _resolve_product_details(ctx: ResolveContext, result: Dict[str, str], company_info: Dict[str, Any]) -> None:
+    """Seite 4: Modul-, Wechselrichter- und Speicherdaten aus Produkt-DB und Attributen."""
+    project_data = ctx.project_data
+    analysis_results = ctx.analysis_results
+    project_details = project_data.get("project_details", {}) if isinstance(project_data, dict) else {}
+    as_str = _as_str
+    parse_float = _parse_float
+
+
+    # Seite 4: Produktdetails für Modul / WR / Speicher
+    # Wir versuchen, Produktdetails aus der lokalen DB zu laden (optional), basierend auf den ausgewählten Modellnamen.
+    get_product_by_model_name = None
+    try:
+        from product_db import get_product_by_model_name as _get_prod
+        _get_prod = ctx.cached("get_product_by_model_name", _get_prod)
+        get_product_by_model_name = _get_prod  # type: ignore
+    except Exception:
+        get_product_by_model_name = None
+
+    # Kleine Normalisierungshilfen (für Fuzzy-Matching und Schlüsselvergleiche)
+    def _norm_key(s: Any) -> str:
+        try:
+            st = str(s).strip().lower()
+            # vereinheitliche Leer-/Sonderzeichen
+            st = re.sub(r"\s+", " ", st)
+            return st
+        except Exception:
+            return ""
+
+    def _norm_flat(s: Any) -> str:
+        try:
+            st = str(s).strip().lower()
+            # entferne alles außer a-z0-9
+            return re.sub(r"[^a-z0-9]", "", st)
+        except Exception:
+            return ""
+
+    def fetch_details(model_name: str) -> Dict[str, Any]:
+        if not model_name or not isinstance(model_name, str):
+            return {}
+        if get_product_by_model_name is None:
+            return {}
+        try:
+            data = get_product_by_model_name(model_name)
+            return data or {}
+        except Exception:
+            return {}
+
+    # Modul
+    module_name = as_str(project_details.get("selected_module_name") or "").strip()
+    module_id = project_details.get("selected_module_id")
+    module_details = {}
+    if module_id not in (None, ""):
+        # Bevorzugt per ID (robust gegen Namensabweichungen)
+        try:
+            from product_db import get_product_by_id as _get_prod_by_id
+            _get_prod_by_id = ctx.cached("get_product_by_id", _get_prod_by_id)
+            md = _get_prod_by_id(int(module_id))
+            if isinstance(md, dict):
+                module_details = md
+                module_name = as_str(md.get("model_name") or module_name)
+        except Exception:
+            pass
+    if not module_details and module_name:
+        module_details = fetch_details(module_name) or {}
+    # Alternativ: explizites Projektfeld 'module_model' als Modellname versuchen
+    if not module_details:
+        alt_model = as_str(project_details.get("module_model") or "").strip()
+        if alt_model:
+            module_details = fetch_details(alt_model) or {}
+
+    # Falls weiterhin keine Details/ID gefunden: Fuzzy-Matching über Produktliste (Kategorie Modul)
+    if not module_details and (module_name or project_details.get("module_model")):
+        try:
+            from product_db import list_products as _list_products, get_product_by_id as _get_prod_by_id
+            _list_products = ctx.cached("list_products", _list_products)
+            _get_prod_by_id = ctx.cached("get_product_by_id", _get_prod_by_id)
+        except Exception:
+            _list_products = None  # type: ignore
+            _get_prod_by_id = None  # type: ignore
+        if _list_products and _get_prod_by_id:
+            try:
+                cands = []
+                if module_name:
+                    cands.append(str(module_name))
+                mm_pd = as_str(project_details.get("module_model") or "").strip()
+                if mm_pd:
+                    cands.append(mm_pd)
+                # ggf. vorhandene DB-Infos
+                if module_details.get("model_name"):
+                    cands.append(as_str(module_details.get("model_name")))
+                if module_details.get("brand") and module_details.get("model_name"):
+                    cands.append(f"{module_details.get('brand')} {module_details.get('model_name')}")
+                cands_norm = {_norm_flat(c): c for c in cands if c}
+                prods = _list_products(category="Modul") or _list_products() or []
+                best_id = None
+                for p in prods:
+                    mn = as_str(p.get("model_name") or "")
+                    br = as_str(p.get("brand") or "")
+                    alts = [mn, f"{br} {mn}".strip()]
+                    alts_norm = [_norm_flat(x) for x in alts if x]
+                    if any(an in cands_norm for an in alts_norm):
+                        best_id = int(p.get("id"))
+                        break
+                # wenn nichts exakt passt: enthalte/substring-Test
+                if not best_id and prods and cands_norm:
+                    cand_keys = list(cands_norm.keys())
+                    for p in prods:
+                        mn = as_str(p.get("model_name") or "")
+                        br = as_str(p.get("brand") or "")
+                        alt = _norm_flat(f"{br} {mn}".strip())
+                        if any(k and k in alt for k in cand_keys):
+                            best_id = int(p.get("id"))
+                            break
+                if best_id:
+                    try:
+                        md = _get_prod_by_id(int(best_id)) or {}
+                        if md:
+                            module_details = md
+                            module_name = as_str(md.get("model_name") or module_name)
+                    except Exception:
+                        pass
+            except Exception:
+                pass
+    # Überschrift: "PHOTOVOLTAIK MODULE – <Anzahl> Stück" (immer anzeigen)
+    try:
+        mod_qty = int(float(project_details.get("module_quantity") or 0))
+    except Exception:
+        mod_qty = 0
+    
+    if mod_qty > 0:
+        result["module_section_title"] = f"PHOTOVOLTAIK MODULE – {mod_qty} Stück"
+    else:
+        result["module_section_title"] = "PHOTOVOLTAIK MODULE"
+    
+    # Weitere Modul-Details nur wenn verfügbar
     if module_details or module_name:
         mod_brand = as_str(module_details.get("brand") or module_details.get("manufacturer") or "")
         if mod_brand:
@@ -1466,8 +1888,12 @@ def build_dynamic_data(project_data: Dict[str, Any] | None,
         try:
             if not all(result.get(k) for k in ("module_cell_technology", "module_structure", "module_cell_type", "module_version")):
                 from product_db import get_product_id_by_model_name as _get_pid
+                _get_pid = ctx.cached("get_product_id_by_model_name", _get_pid)
                 from product_attributes import get_attribute_value as _get_attr, list_attributes as _list_attrs
+                _get_attr = ctx.cached("get_attribute_value", _get_attr)
+                _list_attrs = ctx.cached("list_attributes", _list_attrs)
                 from database import load_admin_setting as _load_admin_setting  # optional
+                _load_admin_setting = ctx.cached("load_admin_setting", _load_admin_setting)
                 pid = None
                 # Nutze bevorzugt die ausgewählte ID
                 if module_id not in (None, ""):
@@ -1758,7 +2184,9 @@ def build_dynamic_data(project_data: Dict[str, Any] | None,
         # Zusätzliche Werte aus der flexiblen Attribute-Tabelle lesen und Defaults überschreiben
         try:
             from product_db import get_product_id_by_model_name as _get_pid_inv
+            _get_pid_inv = ctx.cached("get_product_id_by_model_name", _get_pid_inv)
             from product_attributes import get_attribute_value as _get_attr
+            _get_attr = ctx.cached("get_attribute_value", _get_attr)
         except Exception:
             _get_pid_inv = None  # type: ignore
             _get_attr = None  # type: ignore
@@ -1971,7 +2399,9 @@ def build_dynamic_data(project_data: Dict[str, Any] | None,
         # Speicher: erweiterte Felder aus Attribute-Tabelle (Erweiterungsmodul, max. Größe, Outdoor, Notstrom, Garantie)
         try:
             from product_db import get_product_id_by_model_name as _get_pid_sto
+            _get_pid_sto = ctx.cached("get_product_id_by_model_name", _get_pid_sto)
             from product_attributes import get_attribute_value as _get_attr
+            _get_attr = ctx.cached("get_attribute_value", _get_attr)
         except Exception:
             _get_pid_sto = None  # type: ignore
             _get_attr = None  # type: ignore
@@ -2014,451 +2444,74 @@ def build_dynamic_data(project_data: Dict[str, Any] | None,
             aval = _get_attr_any_sto(sto_id, ["storage_backup_text", "backup", "notstrom", "ersatzstrom", "reserve"])
             if aval:
                 result["storage_backup_text"] = str(aval)
-            # Outdoorfähigkeit
-            aval = _get_attr_any_sto(sto_id, ["storage_outdoor_capability", "outdoor", "outdoorfaehig", "outdoor_fähig"])
-            if aval:
-                result["storage_outdoor_capability"] = str(aval)
-            # Garantie-Text
-            aval = _get_attr_any_sto(sto_id, ["storage_warranty_text", "garantie_text", "warranty_text", "garantie"])
-            if aval:
-                result["storage_warranty_text"] = str(aval)
-            # DoD Prozent (falls als Attribut gepflegt)
-            if not result.get("storage_dod_percent"):
-                aval = _get_attr_any_sto(sto_id, ["dod_percent", "dod", "entladetiefe"])
-                pf = parse_float(aval)
-                if pf and pf > 0:
-                    result["storage_dod_percent"] = fmt_number(pf, 0, "%")
-            # Zyklen (Attribut)
-            if not result.get("storage_cycles"):
-                aval = _get_attr_any_sto(sto_id, ["max_cycles", "zyklen", "cycle_count"])
-                try:
-                    if aval:
-                        result["storage_cycles"] = f"{int(float(parse_float(aval) or 0))} cycles" if parse_float(aval) else str(aval)
-                except Exception:
-                    pass
-
-        # Wenn Speicher ausgewählt ist, aber Erweiterungsmodul/Max-Größe leer, zeige neutralen Hinweis statt leer
-        try:
-            if (project_details.get("include_storage") or storage_name) and not result.get("storage_extension_module_size_kwh"):
-                result["storage_extension_module_size_kwh"] = "siehe Produktdatenblatt"
-            if (project_details.get("include_storage") or storage_name) and not result.get("storage_max_size_kwh"):
-                result["storage_max_size_kwh"] = "siehe Produktdatenblatt"
-        except Exception:
-            pass
-
-        # Spezifische Belegung für Huawei LUNA2000-7-S1 (exakte Wunschwerte)
-        name_l = (storage_name or "").lower()
-        brand_l = (sto_brand or "").lower()
-        if ("huawei" in brand_l) or ("luna2000" in name_l):
-            result["storage_manufacturer"] = "Huawei"
-            result["storage_model"] = "LUNA2000-7-S1-7kWh Stromspeicher"
-            result["storage_cell_technology"] = "Lithium-Eisenphosphat (LiFePO4)"
-            # Fixwerte gemäß Vorgabe (ohne Sternchen)
-            result["storage_size_battery_kwh_star"] = fmt_number(7.0, 2, "kWh")
-            result["storage_extension_module_size_kwh"] = fmt_number(7.0, 2, "kWh")
-            result["storage_max_size_kwh"] = fmt_number(21.0, 2, "kWh")
-            result["storage_backup_text"] = "ja, dreiphasig"
-            result["storage_outdoor_capability"] = "Outdoorfähig"
-            result["storage_warranty_text"] = "siehe Produktdatenblatt"
-
-    # Unbedingte Overrides aus project_details (Bilder/Logos), unabhängig von DB-Ladung
-    for k in (
-        "module_image_b64", "inverter_image_b64", "storage_image_b64",
-        "module_brand_logo_b64", "inverter_brand_logo_b64", "storage_brand_logo_b64",
-    ):
-        v = project_details.get(k)
-        if v not in (None, ""):
-            result[k] = as_str(v)
-
-    # Seite 1 – neue dynamische Felder und statische Texte nach Kundenwunsch
-    # 1) Jährliche Einspeisevergütung in Euro (für Platz "Dachneigung")
-    #    Nur berechnen wenn nicht zuvor über Seite3 synchronisiert
-    if "annual_feed_in_revenue_eur" not in result:
-        try:
-            # Primär vorhandene Berechnung nehmen
-            annual_feed_rev = (
-                analysis_results.get("annual_feedin_revenue_euro")
-                or analysis_results.get("annual_feed_in_revenue_year1")
-            )
-            # Falls nicht vorhanden oder offensichtlich inkonsistent, neu berechnen
-            # Hole Netzeinspeisung (Seite 2 Wert) und ermittele EEG-Tarif erneut wie oben verwendet
-            grid_feedin_raw = analysis_results.get("grid_feed_in_kwh") or result.get("grid_feed_in_kwh")
-            feed_in_kwh_val = None
-            if grid_feedin_raw:
-                try:
-                    feed_in_kwh_val = float(str(grid_feedin_raw).split()[0].replace('.', '').replace(',', '.')) if ' ' in str(grid_feedin_raw) else float(str(grid_feedin_raw).replace('.', '').replace(',', '.'))
-                except Exception:
-                    try:
-                        feed_in_kwh_val = float(re.sub(r"[^0-9,\.]", "", str(grid_feedin_raw)).replace(',', '.'))
-                    except Exception:
-                        feed_in_kwh_val = None
-            # EEG Tarif erneut bestimmen (gleiche Logik wie Seite3 oben)
-            try:
-                anlage_kwp_local = parse_float(analysis_results.get("anlage_kwp")) or 0.0
-                from database import load_admin_setting as _load_tar
-                fit_loc = _load_tar("feed_in_tariffs", {})
-                mode_loc = project_data.get("einspeise_art", "parts")
-                local_tariff = None
-                for trf in fit_loc.get(mode_loc, []):
-                    if trf.get("kwp_min", 0) <= anlage_kwp_local <= trf.get("kwp_max", 999):
-                        local_tariff = (trf.get("ct_per_kwh", 7.86) or 7.86) / 100.0
-                        break
-                if local_tariff is None:
-                    local_tariff = 0.068  # Fallback 6,8 ct
-            except Exception:
-                local_tariff = 0.068
-            # Neuberechnung wenn nötig
-            if feed_in_kwh_val is not None:
-                calc_rev = feed_in_kwh_val * local_tariff
-                if (annual_feed_rev is None) or (abs(calc_rev - float(annual_feed_rev)) > max(5.0, 0.2 * calc_rev)):
-                    annual_feed_rev = calc_rev
-                if annual_feed_rev is not None:
-                    result["annual_feed_in_revenue_eur"] = fmt_number(float(annual_feed_rev), 2, "€")
-        except Exception:
-            pass
-
-    # 2) MwSt.-Betrag (19% vom Netto-Endbetrag) für Platz "Solaranlage"
-    # Basis: bevorzugt total_investment_netto, sonst final_price (falls Netto), sonst subtotal_netto.
-    try:
-        base_net = (
-            analysis_results.get("total_investment_netto")
-            or analysis_results.get("final_price")
-            or analysis_results.get("subtotal_netto")
-        )
-        vat_amount = None
-        if isinstance(base_net, (int, float)):
-            vat_amount = float(base_net) * 0.19
-        else:
-            # Falls nur Brutto/Netto-Kombi verfügbar, Differenz nutzen
-            netto = analysis_results.get("total_investment_netto")
-            brutto = analysis_results.get("total_investment_brutto")
-            if isinstance(netto, (int, float)) and isinstance(brutto, (int, float)):
-                vat_amount = max(0.0, float(brutto) - float(netto))
-        if vat_amount is not None:
-            result["vat_amount_eur"] = fmt_number(float(vat_amount), 2, "€")
-    except Exception:
-        pass
-
-    # 3) Statische Texte
-    #    a) „inklusive“ für die Label-Plätze "Batterie" und "Jahresertrag"
-    result["static_inklusive"] = "inklusive"
-    #    b) Rechts neben Batterie: „DC Dachmontage“
-    result["static_dc_dachmontage"] = "DC Dachmontage"
-    #    c) Rechts neben Jahresertrag: „AC Installation | Inbetriebnahme“
-    result["static_ac_installation"] = "AC Installation | Inbetriebnahme"
-
-    # Seite 3: Basis-Parameter dynamisch füllen
-    try:
-        # Energieversorger Name (falls vorhanden)
-        provider = project_data.get("energy_supplier") or project_data.get("stromanbieter") or analysis_results.get("energy_supplier")
-        if provider:
-            result["basis_energy_supplier_name"] = str(provider)
-        # Wartung Prozent (z.B. 1 % Invest p.a.)
-        maint_pct = analysis_results.get("maintenance_costs_percent") or analysis_results.get("maintenance_percent_invest_pa")
-        if isinstance(maint_pct, (int,float)):
-            result["basis_maintenance_percent_invest"] = f"{maint_pct:.2f} % Invest. p.a."
-        # Verbrauchstarif Text (exakte €/kWh Anzeige mit 4 Nachkommastellen statt "Verbrauch 32 Cent")
-        price_eur_kwh = (
-            analysis_results.get("aktueller_strompreis_fuer_hochrechnung_euro_kwh")
-            or analysis_results.get("electricity_price_eur_per_kwh")
-            or analysis_results.get("electricity_price_kwh")
-            or analysis_results.get("electricity_price_per_kwh")
-        )
-        if isinstance(price_eur_kwh,(int,float)) and price_eur_kwh>0:
-            result["basis_tariff_text"] = f"{price_eur_kwh:.2f} € / kWh"
-        # PV Lebensdauer
-        lifetime = analysis_results.get("simulation_period_years") or project_data.get("simulation_period_years")
-        if isinstance(lifetime,(int,float)) and lifetime>0:
-            result["basis_pv_lifetime_years"] = f"{int(lifetime)} Jahre"
-        # Strompreissteigerung
-        inc_pct = analysis_results.get("electricity_price_increase_annual_percent") or project_data.get("electricity_price_increase_annual_percent")
-        if isinstance(inc_pct,(int,float)):
-            result["basis_price_increase_percent_text"] = f"{inc_pct:.2f} % jährlich"
-        # Eigenkapitalkosten
-        cost_cap = analysis_results.get("cost_of_capital_percent") or project_data.get("cost_of_capital_percent") or analysis_results.get("alternative_investment_interest_rate_percent")
-        if isinstance(cost_cap,(int,float)):
-            result["basis_cost_of_capital_percent"] = f"{cost_cap:.2f} %"
-    except Exception:
-        pass
-
-    # Seite 3: Einsparungs-/Ertragszeilen neu & exakt nach Nutzerformeln berechnen
-    try:
-        def _pf(v):
-            try:
-                if isinstance(v,(int,float)):
-                    return float(v)
-                return float(str(v).replace(',','.'))
-            except Exception:
-                return None
-        curr_price = _pf(price_eur_kwh) or _pf(analysis_results.get("aktueller_strompreis_fuer_hochrechnung_euro_kwh")) or 0.0
-        direct_kwh = _pf(analysis_results.get("direct_self_consumption_kwh")) or _pf(analysis_results.get("annual_direct_self_consumption_kwh"))
-        if direct_kwh is None:
-            try:
-                eigenv_total = _pf(analysis_results.get("annual_self_consumption_kwh"))
-                batt_dis_tmp = _pf(analysis_results.get("battery_discharge_for_sc_kwh")) or 0.0
-                if eigenv_total is not None:
-                    direct_kwh = max(0.0, eigenv_total - batt_dis_tmp)
-            except Exception:
-                pass
-        if direct_kwh is not None and curr_price>0:
-            result["annual_electricity_cost_savings_self_consumption_year1"] = fmt_number(direct_kwh*curr_price,2,"€")
-        feed_kwh = _pf(analysis_results.get("netzeinspeisung_kwh"))
-        feed_tariff = _pf(analysis_results.get("einspeiseverguetung_eur_per_kwh")) or _pf(analysis_results.get("feed_in_tariff_eur_per_kwh")) or _pf(analysis_results.get("feed_in_tariff_year1_eur_per_kwh"))
-        if feed_kwh is not None and feed_tariff is not None:
-            result["annual_feed_in_revenue_year1"] = fmt_number(feed_kwh*feed_tariff,2,"€")
-        batt_dis = _pf(analysis_results.get("battery_discharge_for_sc_kwh"))
-        if batt_dis is not None and curr_price>0:
-            result["annual_battery_discharge_value_year1"] = fmt_number(batt_dis*curr_price,2,"€")
-        batt_charge = _pf(analysis_results.get("battery_charge_kwh"))
-        if batt_charge is not None and batt_dis is not None and feed_tariff is not None:
-            surplus = max(0.0, batt_charge - batt_dis)
-            result["annual_battery_surplus_feed_in_value_year1"] = fmt_number(surplus*feed_tariff,2,"€")
-        parts=[]
-        for k in ["annual_electricity_cost_savings_self_consumption_year1","annual_feed_in_revenue_year1","annual_battery_discharge_value_year1","annual_battery_surplus_feed_in_value_year1"]:
-            val_s = result.get(k)
-            if val_s:
-                try:
-                    parts.append(float(str(val_s).replace('.','').replace('€','').replace(' ','').replace(',','.')))
-                except Exception:
-                    pass
-        if parts:
-            result["annual_total_savings_year1_label"] = fmt_number(sum(parts),2,"€")
-    except Exception:
-        pass
-
-    # === FAIL-SAFE: Seite 3 Werte final absichern (falls weiter oben nichts gesetzt wurde) ===
-    def _to_float(x):
-        try:
-            # Kommas tolerieren
-            return float(str(x).replace(",", "."))
-        except Exception:
-            return 0.0
-
-    def _eur(x):
-        return fmt_number(x, 2, "€")
-
-    # Einspeisetarif in €/kWh sichern (aus results oder Default <10 kWp Teileinspeisung)
-    eeg = _to_float(analysis_results.get("einspeiseverguetung_eur_per_kwh") or 0.0786)
-    if eeg > 1:  # Schutz falls ct/kWh geliefert
-        eeg /= 100.0
-
-    # Strompreis in €/kWh sichern
-    price_eur_kwh = (
-        _to_float(analysis_results.get("aktueller_strompreis_fuer_hochrechnung_euro_kwh"))
-        or _to_float(analysis_results.get("electricity_price_eur_per_kwh"))
-        or _to_float(project_data.get("electricity_price_kwh"))
-        or _to_float(project_data.get("electricity_price_per_kwh"))
-        or 0.30
-    )
-    if price_eur_kwh > 1:  # Schutz falls ct/kWh geliefert
-        price_eur_kwh /= 100.0
-
-    # Jahreswerte als Fallback, falls Monatslisten fehlten
-    feedin_kwh   = _to_float(analysis_results.get("netzeinspeisung_kwh"))
-    charge_kwh   = _to_float(analysis_results.get("annual_storage_charge_kwh"))
-    discharge_kwh= _to_float(analysis_results.get("annual_storage_discharge_kwh"))
-    surplus_kwh  = max(0.0, charge_kwh - discharge_kwh)
+            # Outdoorfähigkeit
+            aval = _get_attr_any_sto(sto_id, ["storage_outdoor_capability", "outdoor", "outdoorfaehig", "outdoor_fähig"])
+            if aval:
+                result["storage_outdoor_capability"] = str(aval)
+            # Garantie-Text
+            aval = _get_attr_any_sto(sto_id, ["storage_warranty_text", "garantie_text", "warranty_text", "garantie"])
+            if aval:
+                result["storage_warranty_text"] = str(aval)
+            # DoD Prozent (falls als Attribut gepflegt)
+            if not result.get("storage_dod_percent"):
+                aval = _get_attr_any_sto(sto_id, ["dod_percent", "dod", "entladetiefe"])
+                pf = parse_float(aval)
+                if pf and pf > 0:
+                    result["storage_dod_percent"] = fmt_number(pf, 0, "%")
+            # Zyklen (Attribut)
+            if not result.get("storage_cycles"):
+                aval = _get_attr_any_sto(sto_id, ["max_cycles", "zyklen", "cycle_count"])
+                try:
+                    if aval:
+                        result["storage_cycles"] = f"{int(float(parse_float(aval) or 0))} cycles" if parse_float(aval) else str(aval)
+                except Exception:
+                    pass
 
-    # Falls die Seite-3 Felder noch leer/nicht vorhanden sind → jetzt befüllen
-   # if not result.get("direct_grid_feed_in_eur"):
-     #   result["direct_grid_feed_in_eur"] = _eur(feedin_kwh * eeg)
+        # Wenn Speicher ausgewählt ist, aber Erweiterungsmodul/Max-Größe leer, zeige neutralen Hinweis statt leer
+        try:
+            if (project_details.get("include_storage") or storage_name) and not result.get("storage_extension_module_size_kwh"):
+                result["storage_extension_module_size_kwh"] = "siehe Produktdatenblatt"
+            if (project_details.get("include_storage") or storage_name) and not result.get("storage_max_size_kwh"):
+                result["storage_max_size_kwh"] = "siehe Produktdatenblatt"
+        except Exception:
+            pass
 
-   # if not result.get("battery_usage_savings_eur"):
-      #  result["battery_usage_savings_eur"] = _eur(discharge_kwh * price_eur_kwh)
+        # Spezifische Belegung für Huawei LUNA2000-7-S1 (exakte Wunschwerte)
+        name_l = (storage_name or "").lower()
+        brand_l = (sto_brand or "").lower()
+        if ("huawei" in brand_l) or ("luna2000" in name_l):
+            result["storage_manufacturer"] = "Huawei"
+            result["storage_model"] = "LUNA2000-7-S1-7kWh Stromspeicher"
+            result["storage_cell_technology"] = "Lithium-Eisenphosphat (LiFePO4)"
+            # Fixwerte gemäß Vorgabe (ohne Sternchen)
+            result["storage_size_battery_kwh_star"] = fmt_number(7.0, 2, "kWh")
+            result["storage_extension_module_size_kwh"] = fmt_number(7.0, 2, "kWh")
+            result["storage_max_size_kwh"] = fmt_number(21.0, 2, "kWh")
+            result["storage_backup_text"] = "ja, dreiphasig"
+            result["storage_outdoor_capability"] = "Outdoorfähig"
+            result["storage_warranty_text"] = "siehe Produktdatenblatt"
 
-   # if not result.get("battery_surplus_feed_in_eur"):
-   #     result["battery_surplus_feed_in_eur"] = _eur(surplus_kwh * eeg)
+    # Unbedingte Overrides aus project_details (Bilder/Logos), unabhängig von DB-Ladung
+    for k in (
+        "module_image_b64", "inverter_image_b64", "storage_image_b64",
+        "module_brand_logo_b64", "inverter_brand_logo_b64", "storage_brand_logo_b64",
+    ):
+        v = project_details.get(k)
+        if v not in (None, ""):
+            result[k] = as_str(v)
 
-    # Zusatz: kWh-Hilfsfelder für Seite 3, wenn noch leer
-    if not result.get("calc_grid_feed_in_kwh_page3"):
-        result["calc_grid_feed_in_kwh_page3"] = fmt_number(feedin_kwh, 0, "kWh")
-    if not result.get("calc_battery_discharge_kwh_page3"):
-        result["calc_battery_discharge_kwh_page3"] = fmt_number(discharge_kwh, 0, "kWh")
-    if not result.get("calc_battery_surplus_kwh_page3"):
-        result["calc_battery_surplus_kwh_page3"] = fmt_number(surplus_kwh, 0, "kWh")
 
-    # ENTFERNT: Gesamtwert-Fallback-System das die Berechnungen überschreibt
-    # if not result.get("total_annual_savings_eur"):
-    #     ...kompletter Block entfernt...
+def _resolve_brand_logos(ctx: ResolveContext, result: Dict[str, str], company_info: Dict[str, Any]) -> None:
+    """Seite 4: Herstellerlogos zu den gewählten Komponenten."""
+    project_data = ctx.project_data
 
-    # === Seite 3: Berechnungsgrundlagen - Dynamische Werte ===
-    
-    # Ausrichtung (orientation_text) aus calculations.py mit erweiterten Fallbacks
-    orientation = (
-        analysis_results.get("orientation_text") 
-        or analysis_results.get("orientation")
-        or analysis_results.get("ausrichtung")
-        or project_data.get("orientation")
-        or project_details.get("orientation")
-        or project_data.get("ausrichtung")
-        or project_details.get("ausrichtung")
-        or project_data.get("roof_orientation")
-        or project_details.get("roof_orientation")
-        # Häufigster Schlüssel aus data_input.py Bedarfsanalyse
-        or (project_data.get("project_details", {}) or {}).get("roof_orientation")
-    )
-    print(f"DEBUG ORIENTATION: raw_value='{orientation}', from analysis_results: '{analysis_results.get('orientation_text')}', from project_data: '{project_data.get('orientation')}', from project_details.roof_orientation: '{project_details.get('roof_orientation')}'")
-    
-    # Erweiterte Ausrichtungs-Logik - einfache Anzeige ohne Ertragswerte
-    if orientation and str(orientation).strip() not in ("", "None", "null", "Bitte wählen", "Please select"):
-        orientation_str = str(orientation).strip()
-        result["orientation_text"] = orientation_str
-        print(f"DEBUG ORIENTATION: using value '{orientation_str}'")
-    else:
-        # Fallback für fehlende Ausrichtung
-        result["orientation_text"] = "Süd"
-        print("DEBUG ORIENTATION: using fallback 'Süd'")
-    
-    print(f"DEBUG ORIENTATION: final result='{result.get('orientation_text')}'")
-    
-    # Seitennummerierung für Seite 3
-    try:
-        total_pages = project_data.get("total_pages", 7)
-        result["page_number_with_total"] = f"Seite 3 von {total_pages}"
-        print(f"DEBUG PAGE_NUMBER: formatted as 'Seite 3 von {total_pages}'")
-    except Exception:
-        result["page_number_with_total"] = "3"
-        print("DEBUG PAGE_NUMBER: fallback to '3'")
-    
-    # Dachdeckung aus data_input.py (project_data oder project_details)
-    roof_covering = (
-        project_data.get("roof_covering_type") 
-        or project_details.get("roof_covering_type")
-        or project_data.get("roof_covering")
-        or project_details.get("roof_covering")
-    )
-    if roof_covering:
-        result["roof_covering_type"] = str(roof_covering)
-    
-    # Dachneigung aus data_input.py
-    roof_inclination = (
-        project_data.get("roof_inclination_deg")
-        or project_details.get("roof_inclination_deg") 
-        or project_data.get("roof_inclination")
-        or project_details.get("roof_inclination")
-        # Häufigster Schlüssel aus data_input.py Bedarfsanalyse
-        or (project_data.get("project_details", {}) or {}).get("roof_inclination_deg")
-    )
-    print(f"DEBUG ROOF_INCLINATION: raw_value='{roof_inclination}', from project_details: '{project_details.get('roof_inclination_deg')}', from nested: '{(project_data.get('project_details', {}) or {}).get('roof_inclination_deg')}'")
-    
-    if roof_inclination is not None:
-        try:
-            incl_val = float(roof_inclination)
-            result["roof_inclination_text"] = f"{incl_val:.0f}°"
-            print(f"DEBUG ROOF_INCLINATION: formatted as '{result['roof_inclination_text']}'")
-        except Exception:
-            result["roof_inclination_text"] = str(roof_inclination)
-            print(f"DEBUG ROOF_INCLINATION: used as string '{result['roof_inclination_text']}'")
-    else:
-        result["roof_inclination_text"] = "30°"
-        print("DEBUG ROOF_INCLINATION: using fallback '30°'")
-    
-    # Dachart aus data_input.py
-    roof_type = (
-        project_data.get("roof_type")
-        or project_details.get("roof_type")
-        or project_data.get("roof_structure")
-        or project_details.get("roof_structure")
-    )
-    # Debug-Print und Filter für "Bitte wählen"-Werte
-    print(f"DEBUG ROOF_TYPE: raw_value='{roof_type}', from project_data: '{project_data.get('roof_type')}', from project_details: '{project_details.get('roof_type')}'")
-    
-    if roof_type and str(roof_type).strip() not in ("", "Bitte wählen", "Please select", "None", "null"):
-        result["roof_type"] = str(roof_type).strip()
-    else:
-        # Fallback: Versuche andere mögliche Schlüssel
-        fallback_keys = ["dach_art", "dachtyp", "roof_material", "dach_typ"]
-        for key in fallback_keys:
-            val = project_data.get(key) or project_details.get(key)
-            if val and str(val).strip() not in ("", "Bitte wählen", "Please select", "None", "null"):
-                result["roof_type"] = str(val).strip()
-                print(f"DEBUG ROOF_TYPE: used fallback key '{key}' with value '{val}'")
-                break
-        else:
-            result["roof_type"] = "Standard"  # Letzter Fallback
-            print("DEBUG ROOF_TYPE: using fallback 'Standard'")
-    
-    print(f"DEBUG ROOF_TYPE: final result='{result.get('roof_type')}'")
-    
-    # Finanzierung/Leasing gewünscht - zeigt die gewählte Finanzierungsart oder "Nein"
-    financing_requested = (
-        project_data.get("financing_requested")
-        or project_data.get("financing_needed")
-        or project_data.get("financing_leasing_required")
-        or project_data.get("finanzierung_leasing_gewuenscht")
-        or project_details.get("financing_needed")
-        or project_details.get("financing_leasing_required")
-        or (project_data.get("customer_data") or {}).get("financing_requested")
-        or (project_details.get("customer_data") or {}).get("financing_requested")
-    )
-    
-    # Finanzierungsart ermitteln
-    financing_type = (
-        project_data.get("financing_type")
-        or project_details.get("financing_type")
-        or (project_data.get("customer_data") or {}).get("financing_type")
-        or (project_details.get("customer_data") or {}).get("financing_type")
-    )
-    
-    # Debug-Output für Finanzierung
-    print(f"DEBUG FINANCING: financing_requested='{financing_requested}', financing_type='{financing_type}'")
-    print(f"DEBUG FINANCING: project_data.customer_data={project_data.get('customer_data', {})}")
-    
-    if financing_requested:
-        # Wenn Finanzierung gewünscht ist, zeige die gewählte Art
-        if isinstance(financing_requested, bool) and financing_requested:
-            if financing_type and isinstance(financing_type, str):
-                result["financing_needed_text"] = financing_type
-            else:
-                result["financing_needed_text"] = "Ja"
-        elif isinstance(financing_requested, str):
-            financing_str = financing_requested.lower().strip()
-            if financing_str in {"true", "ja", "yes", "1", "wahr"}:
-                if financing_type and isinstance(financing_type, str):
-                    result["financing_needed_text"] = financing_type
-                else:
-                    result["financing_needed_text"] = "Ja"
-            else:
-                result["financing_needed_text"] = "Nein"
-        else:
-            result["financing_needed_text"] = "Nein"
-    else:
-        result["financing_needed_text"] = "Nein"
-    
-    print(f"DEBUG FINANCING: final result financing_needed_text='{result.get('financing_needed_text')}')")
-    
-    # EEG-Vergütung formatiert (ct/kWh)
-    try:
-        anlage_kwp_val = parse_float(analysis_results.get("anlage_kwp") or project_data.get("anlage_kwp")) or 0.0
-        mode_val = project_data.get("einspeise_art", "parts")
-        
-        # Nutze die neue resolve_feed_in_tariff_eur_per_kwh Funktion
-        try:
-            from database import load_admin_setting as _load_admin_func
-        except Exception:
-            _load_admin_func = None
-        
-        if _load_admin_func:
-            eeg_eur_per_kwh = resolve_feed_in_tariff_eur_per_kwh(
-                anlage_kwp_val, 
-                mode_val, 
-                _load_admin_func,
-                analysis_results_snapshot=(analysis_results.get("einspeiseverguetung_eur_per_kwh"),)
-            )
-            # Zurück in ct/kWh umrechnen für Anzeige
-            eeg_ct_per_kwh = eeg_eur_per_kwh * 100.0
-            result["feed_in_tariff_text"] = f"{eeg_ct_per_kwh:.2f} Cent / kWh"
-        else:
-            # Fallback ohne Admin-Settings
-            result["feed_in_tariff_text"] = "7,86 Cent / kWh"
-    except Exception:
-        result["feed_in_tariff_text"] = "7,86 Cent / kWh"
 
     # === NEUE LOGO-INTEGRATION FÜR SEITE 4 ===
     # Logo-Platzhalter für Hersteller basierend auf ausgewählten Produkten
     try:
         # Import der Logo-Funktionen
         from brand_logo_db import get_logos_for_brands
+        get_logos_for_brands = ctx.cached("get_logos_for_brands", get_logos_for_brands)
         
         # Hersteller aus Projektdaten extrahieren (lokale Implementierung)
         def extract_brands_from_project_data(project_data_local: Dict[str, Any]) -> Dict[str, str]:
@@ -2531,6 +2584,13 @@ def build_dynamic_data(project_data: Dict[str, Any] | None,
         print(f"Fehler bei der Logo-Integration: {e}")
         # Keine Dummy-Keys mehr – stiller Fallback (einfach keine Logos)
 
+
+def _resolve_heatpump_placeholders(ctx: ResolveContext, result: Dict[str, str], company_info: Dict[str, Any]) -> None:
+    """Wärmepumpen-Angebot (HP_*/hp_*) und kombinierte PV+WP-Summen."""
+    project_data = ctx.project_data
+    analysis_results = ctx.analysis_results
+
+
     # --- Erweiterung 2025-08: Wärmepumpen-Angebotsplatzhalter integrieren ---
     try:
         # Falls bereits ein fertiges Offer im project_data steckt (z.B. aus UI), verwende dieses
@@ -2619,4 +2679,88 @@ def build_dynamic_data(project_data: Dict[str, Any] | None,
     except Exception as _hp_err:
         print(f"Hinweis: Wärmepumpen-Platzhalter nicht erzeugt: {_hp_err}")
 
-    return result
+
+
+_ENERGY_DISPATCH_KEYS = {
+    # PV-Seite
+    "coupled_self_consumption_rate_percent", "coupled_autarky_percent",
+    "coupled_grid_import_kwh", "coupled_feed_in_kwh",
+    # WP-Seite
+    "hp_pv_coverage_percent", "hp_pv_electricity_kwh", "HP_PV_COVERAGE_PCT",
+}
+
+
+def _resolve_energy_dispatch(ctx: ResolveContext, result: Dict[str, str], company_info: Dict[str, Any]) -> None:
+    """Gekoppelte Stundenbilanz PV + Haushalt + WP + Speicher für PV- und WP-Platzhalter."""
+    coupled = ctx.analysis_results.get("coupled_dispatch")
+    project = ctx.project_data or {}
+    has_heatpump = bool((project.get("heatpump_data") or {}).get("selected_heatpump")
+                        or (project.get("economics_data") or {}).get("hp_electricity_consumption"))
+    # perform_calculations kennt die WP-Daten nicht -> bei WP-Projekt die Bilanz mit WP-Last neu rechnen
+    if not coupled or (has_heatpump and not coupled.get("includes_heatpump")):
+        try:
+            from energy_dispatch import coupled_dispatch_for_project
+        except ImportError:
+            return
+        coupled = ctx.memo("coupled_dispatch", lambda: coupled_dispatch_for_project(ctx.project_data, ctx.analysis_results))
+    if not coupled:
+        return
+    result["coupled_self_consumption_rate_percent"] = fmt_number(coupled["self_consumption_rate_percent"], 1, "%")
+    result["coupled_autarky_percent"] = fmt_number(coupled["autarky_percent"], 1, "%")
+    result["coupled_grid_import_kwh"] = fmt_number(coupled["grid_import_kwh"], 0, "kWh")
+    result["coupled_feed_in_kwh"] = fmt_number(coupled["feed_in_kwh"], 0, "kWh")
+    if coupled.get("includes_heatpump"):
+        result["hp_pv_coverage_percent"] = fmt_number(coupled["heatpump_pv_share_percent"], 1, "%")
+        result["HP_PV_COVERAGE_PCT"] = fmt_number(coupled["heatpump_pv_share_percent"], 0, "%")
+        result["hp_pv_electricity_kwh"] = fmt_number(coupled["heatpump_pv_kwh"], 0, "kWh")
+
+
+PLACEHOLDER_RESOLVERS = ResolverRegistry()
+PLACEHOLDER_RESOLVERS.register(PlaceholderResolver(
+    name="core", compute=_resolve_core_placeholders, always=True,
+))
+PLACEHOLDER_RESOLVERS.register(PlaceholderResolver(
+    name="company", compute=_resolve_company_placeholders, key_prefixes=("company_",), uses_company=True,
+))
+PLACEHOLDER_RESOLVERS.register(PlaceholderResolver(
+    name="product_details", compute=_resolve_product_details,
+    keys={"battery_capacity_kwh"}, key_prefixes=("module_", "inverter_", "storage_"), inputs=("core",),
+))
+PLACEHOLDER_RESOLVERS.register(PlaceholderResolver(
+    name="brand_logos", compute=_resolve_brand_logos,
+    keys={"module_brand_logo_b64", "inverter_brand_logo_b64", "storage_brand_logo_b64",
+          "module_brand_logo_b64_format", "inverter_brand_logo_b64_format", "storage_brand_logo_b64_format"},
+    inputs=("product_details",),
+))
+PLACEHOLDER_RESOLVERS.register(PlaceholderResolver(
+    name="heatpump", compute=_resolve_heatpump_placeholders,
+    keys={"COMBINED_TOTAL_NET", "PV_TOTAL_NET"}, key_prefixes=("HP_", "hp_"),
+))
+PLACEHOLDER_RESOLVERS.register(PlaceholderResolver(
+    name="energy_dispatch", compute=_resolve_energy_dispatch, keys=set(_ENERGY_DISPATCH_KEYS),
+))
+
+
+def new_placeholder_session(project_data: Dict[str, Any] | None,
+                            analysis_results: Dict[str, Any] | None) -> PlaceholderSession:
+    """Sitzung für mehrere build_dynamic_data-Aufrufe desselben Projekts (z. B. PV- und WP-Firma)."""
+    return PlaceholderSession(PLACEHOLDER_RESOLVERS, project_data, analysis_results)
+
+
+@traced()
+def build_dynamic_data(project_data: Dict[str, Any] | None,
+                       analysis_results: Dict[str, Any] | None,
+                       company_info: Dict[str, Any] | None = None,
+                       required_keys: Optional[Iterable[str]] = None,
+                       session: Optional[PlaceholderSession] = None) -> Dict[str, str]:
+
+    """Erzeugt ein Dictionary mit dynamischen Werten für die Overlays.
+
+    required_keys: nur Resolver auswerten, die diese Schlüssel liefern (None = alle).
+    session: gemeinsame Sitzung aus new_placeholder_session; Memo und firmenunabhängige
+    Ergebnisse werden dann zwischen Aufrufen wiederverwendet.
+    """
+    if session is None:
+        session = new_placeholder_session(project_data, analysis_results)
+    return session.resolve(company_info, required_keys)
+
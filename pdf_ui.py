@@ -552,7 +552,16 @@ def render_pdf_ui(
                 ),
                 key="chart_resolution_select_outside_form"
             )
-        
+
+            backend_labels = {"png": "Bild (Plotly/Kaleido)", "vector": "Vektor (ReportLab, klein & schnell)"}
+            chart_config['backend'] = st.selectbox(
+                "Diagramm-Ausgabe im PDF",
+                options=list(backend_labels.keys()),
+                format_func=lambda k: backend_labels[k],
+                index=list(backend_labels.keys()).index(chart_config.get('backend', 'png')),
+                key="chart_backend_select_outside_form"
+            )
+
         with col2_chart:
             if 'effects' not in chart_config:
                 chart_config['effects'] = {}
@@ -1108,6 +1117,7 @@ def render_pdf_ui(
                             customer_data=project_data.get('customer_data', {})
                         )
                         st.session_state.generated_pdf_bytes_for_download_v1 = pdf_bytes
+                        st.session_state['generated_pdf_compaction_summary'] = None
                         st.success(" Fallback-PDF erfolgreich erstellt!")
                         return
                     else:
@@ -1157,6 +1167,12 @@ def render_pdf_ui(
                     texts=texts
                 )
             st.session_state.generated_pdf_bytes_for_download_v1 = pdf_bytes
+            try:
+                from pdf_compactor import last_compaction_report
+                _compaction = last_compaction_report()
+                st.session_state['generated_pdf_compaction_summary'] = _compaction.summary() if _compaction else None
+            except Exception:
+                st.session_state['generated_pdf_compaction_summary'] = None
         except Exception as e_gen_final_outer: 
             st.error(f"{get_text_pdf_ui(texts, 'pdf_generation_exception_outer', 'Kritischer Fehler im PDF-Prozess (pdf_ui.py):')} {e_gen_final_outer}")
             st.text_area("Traceback PDF Erstellung (pdf_ui.py):", traceback.format_exc(), height=250)
@@ -1182,6 +1198,8 @@ def render_pdf_ui(
                 timestamp_file = meta['timestamp']
                 file_name = meta['file_name']
             st.success(get_text_pdf_ui(texts, "pdf_generation_success", "PDF erfolgreich erstellt!"))
+            if st.session_state.get('generated_pdf_compaction_summary'):
+                st.caption(f"{get_text_pdf_ui(texts, 'pdf_compaction_summary_label', 'Kompakte Ausgabe')}: {st.session_state['generated_pdf_compaction_summary']}")
             st.download_button(
                 label=get_text_pdf_ui(texts, "pdf_download_button", "PDF herunterladen"), 
                 data=pdf_bytes_to_download, 
@@ -1207,7 +1225,7 @@ def render_pdf_ui(
                         try:
                             import sqlite3
                             from database import get_db_connection, add_customer_document
-                            from crm import save_customer, save_project, create_tables_crm
+                            from crm import save_customer, save_project
                             conn = get_db_connection()
                             if conn is None:
                                 st.error("Keine DB-Verbindung für CRM.")
@@ -1215,7 +1233,6 @@ def render_pdf_ui(
                             else:
                                 with st.spinner("Speichere im CRM…"):
                                     conn.row_factory = sqlite3.Row
-                                    create_tables_crm(conn)
                                 cur = conn.cursor()
                                 first_name = project_data.get('customer_data', {}).get('first_name', '')
                                 last_name = project_data.get('customer_data', {}).get('last_name', '')
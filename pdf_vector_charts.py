@@ -0,0 +1,280 @@
+# pdf_vector_charts.py
+"""
+Vektor-Diagramme für die PDF-Ausgabe direkt mit reportlab.graphics.
+
+Statt Plotly-Figuren über Kaleido als PNG zu rastern, werden die wichtigsten
+Standarddiagramme (Monatsbilanz, Kostenhochrechnung, kumulierter Cashflow,
+Verbrauchsdeckung, PV-Nutzung, CO₂) aus den Ergebnis-Arrays als Drawing gebaut.
+Die Drawings sind Flowables und können direkt in die Story eingefügt werden.
+"""
+
+import math
+from typing import Any, Callable, Dict, List, Optional
+
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.charts.doughnut import Doughnut
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.lib import colors
+
+from german_formatting import format_german_number
+
+DEFAULT_WIDTH = 480.0
+DEFAULT_HEIGHT = 260.0
+
+CHART_COLORS = {
+    "primary": colors.HexColor("#1F4B99"),
+    "secondary": colors.HexColor("#F59E0B"),
+    "positive": colors.HexColor("#16A34A"),
+    "negative": colors.HexColor("#DC2626"),
+    "neutral": colors.HexColor("#9CA3AF"),
+    "grid": colors.HexColor("#E5E7EB"),
+    "text": colors.HexColor("#2C2C2C"),
+}
+
+MONTH_LABELS = ["Jan", "Feb", "Mrz", "Apr", "Mai", "Jun", "Jul", "Aug", "Sep", "Okt", "Nov", "Dez"]
+
+_FONT = "Helvetica"
+_FONT_SIZE = 7
+
+
+def _clean(values: Any) -> List[float]:
+    """Liste mit NaN/Inf/Nicht-Zahlen -> 0.0, wie in den Plotly-Diagrammen."""
+    if values is None:
+        return []
+    try:
+        values = list(values)
+    except TypeError:
+        return []
+    out: List[float] = []
+    for v in values:
+        try:
+            f = float(v)
+        except (TypeError, ValueError):
+            f = 0.0
+        out.append(0.0 if math.isnan(f) or math.isinf(f) else f)
+    return out
+
+
+def _number(value: Any) -> Optional[float]:
+    cleaned = _clean([value]) if value is not None else []
+    return cleaned[0] if cleaned else None
+
+
+def _value_axis_label(value: float) -> str:
+    return format_german_number(value, 0)
+
+
+def _legend(drawing: Drawing, x: float, y: float, pairs: List[tuple]) -> None:
+    legend = Legend()
+    legend.x = x
+    legend.y = y
+    legend.alignment = "right"
+    legend.fontName = _FONT
+    legend.fontSize = _FONT_SIZE
+    legend.columnMaximum = 1
+    legend.deltax = 90
+    legend.dxTextSpace = 4
+    legend.colorNamePairs = pairs
+    drawing.add(legend)
+
+
+def _bar_chart(drawing: Drawing, data: List[List[float]], categories: List[str],
+               bar_colors: List[colors.Color], label_every: int = 1) -> VerticalBarChart:
+    width, height = drawing.width, drawing.height
+    chart = VerticalBarChart()
+    chart.x, chart.y = 45, 35
+    chart.width, chart.height = width - 60, height - 60
+    chart.data = data
+    chart.valueAxis.valueMin = min(0.0, min(min(series) for series in data))
+    chart.barSpacing = 0.5
+    chart.groupSpacing = 4
+    chart.strokeColor = None
+    chart.valueAxis.labelTextFormat = _value_axis_label
+    chart.valueAxis.labels.fontName = _FONT
+    chart.valueAxis.labels.fontSize = _FONT_SIZE
+    chart.valueAxis.visibleGrid = True
+    chart.valueAxis.gridStrokeColor = CHART_COLORS["grid"]
+    chart.valueAxis.strokeColor = CHART_COLORS["grid"]
+    chart.categoryAxis.categoryNames = [c if i % label_every == 0 else "" for i, c in enumerate(categories)]
+    chart.categoryAxis.labelAxisMode = "low"
+    chart.categoryAxis.labels.fontName = _FONT
+    chart.categoryAxis.labels.fontSize = _FONT_SIZE
+    chart.categoryAxis.strokeColor = CHART_COLORS["grid"]
+    for i, color in enumerate(bar_colors):
+        chart.bars[i].fillColor = color
+        chart.bars[i].strokeColor = None
+    drawing.add(chart)
+    return chart
+
+
+def monthly_prod_cons_drawing(results: Dict[str, Any], width: float = DEFAULT_WIDTH,
+                              height: float = DEFAULT_HEIGHT) -> Optional[Drawing]:
+    """Monatliche PV-Produktion vs. Verbrauch (Jahr 1) als gruppierte Balken."""
+    prod = _clean(results.get("monthly_productions_sim"))
+    cons = _clean(results.get("monthly_consumption_sim"))
+    if len(prod) != 12 or len(cons) != 12:
+        return None
+    drawing = Drawing(width, height)
+    _bar_chart(drawing, [prod, cons], MONTH_LABELS, [CHART_COLORS["secondary"], CHART_COLORS["primary"]])
+    _legend(drawing, width - 200, height - 8, [(CHART_COLORS["secondary"], "PV-Produktion (kWh)"),
+                                               (CHART_COLORS["primary"], "Verbrauch (kWh)")])
+    return drawing
+
+
+def cost_projection_drawing(results: Dict[str, Any], width: float = DEFAULT_WIDTH,
+                            height: float = DEFAULT_HEIGHT) -> Optional[Drawing]:
+    """Hochrechnung der jährlichen Stromkosten ohne PV als Linie."""
+    costs = _clean(results.get("annual_costs_hochrechnung_values"))
+    if not costs:
+        return None
+    drawing = Drawing(width, height)
+    chart = HorizontalLineChart()
+    chart.x, chart.y = 45, 35
+    chart.width, chart.height = width - 60, height - 60
+    chart.data = [costs]
+    chart.joinedLines = 1
+    chart.lines[0].strokeColor = CHART_COLORS["primary"]
+    chart.lines[0].strokeWidth = 1.5
+    chart.valueAxis.labelTextFormat = _value_axis_label
+    chart.valueAxis.labels.fontName = _FONT
+    chart.valueAxis.labels.fontSize = _FONT_SIZE
+    chart.valueAxis.visibleGrid = True
+    chart.valueAxis.gridStrokeColor = CHART_COLORS["grid"]
+    chart.valueAxis.strokeColor = CHART_COLORS["grid"]
+    step = max(1, len(costs) // 10)
+    chart.categoryAxis.categoryNames = [str(i + 1) if i % step == 0 else "" for i in range(len(costs))]
+    chart.categoryAxis.labels.fontName = _FONT
+    chart.categoryAxis.labels.fontSize = _FONT_SIZE
+    chart.categoryAxis.strokeColor = CHART_COLORS["grid"]
+    drawing.add(chart)
+    _legend(drawing, width - 110, height - 8, [(CHART_COLORS["primary"], "Stromkosten (€/Jahr)")])
+    return drawing
+
+
+def cumulative_cashflow_drawing(results: Dict[str, Any], width: float = DEFAULT_WIDTH,
+                                height: float = DEFAULT_HEIGHT) -> Optional[Drawing]:
+    """Kumulierter Cashflow je Jahr; negative Jahre rot, positive grün."""
+    cashflows = _clean(results.get("cumulative_cash_flows_sim"))
+    if not cashflows:
+        return None
+    drawing = Drawing(width, height)
+    step = max(1, len(cashflows) // 10)
+    chart = _bar_chart(drawing, [cashflows], [str(i) for i in range(len(cashflows))],
+                       [CHART_COLORS["positive"]], label_every=step)
+    for i, value in enumerate(cashflows):
+        if value < 0:
+            chart.bars[(0, i)].fillColor = CHART_COLORS["negative"]
+    _legend(drawing, width - 110, height - 8, [(CHART_COLORS["positive"], "Kumulierter Cashflow (€)")])
+    return drawing
+
+
+def _share_drawing(shares: List[tuple], width: float, height: float, donut: bool) -> Optional[Drawing]:
+    shares = [(label, value, color) for label, value, color in shares if value > 0]
+    if not shares:
+        return None
+    drawing = Drawing(width, height)
+    chart = Doughnut() if donut else Pie()
+    size = min(width * 0.45, height - 50)
+    chart.x, chart.y = 50, (height - size) / 2
+    chart.width = chart.height = size
+    chart.data = [value for _, value, _ in shares]
+    chart.labels = [format_german_number(value, 1, "%") for _, value, _ in shares]
+    chart.slices.strokeColor = colors.white
+    chart.slices.fontName = _FONT
+    chart.slices.fontSize = _FONT_SIZE
+    for i, (_, _, color) in enumerate(shares):
+        chart.slices[i].fillColor = color
+    drawing.add(chart)
+    legend = Legend()
+    legend.x = chart.x + size + 30
+    legend.y = height / 2 + 10 * len(shares) / 2
+    legend.fontName = _FONT
+    legend.fontSize = _FONT_SIZE + 1
+    legend.alignment = "right"
+    legend.colorNamePairs = [(color, label) for label, _, color in shares]
+    drawing.add(legend)
+    return drawing
+
+
+def consumption_coverage_pie_drawing(results: Dict[str, Any], width: float = DEFAULT_WIDTH,
+                                     height: float = DEFAULT_HEIGHT) -> Optional[Drawing]:
+    """Deckung des Gesamtverbrauchs (Jahr 1): Eigenversorgung vs. Netzbezug als Donut."""
+    self_supply = _number(results.get("self_supply_rate_percent"))
+    if self_supply is None or results.get("total_consumption_kwh_yr") is None:
+        return None
+    self_supply = min(100.0, max(0.0, self_supply))
+    return _share_drawing([("Eigenversorgung", self_supply, CHART_COLORS["positive"]),
+                           ("Netzbezug", 100.0 - self_supply, CHART_COLORS["neutral"])],
+                          width, height, donut=True)
+
+
+def pv_usage_pie_drawing(results: Dict[str, Any], width: float = DEFAULT_WIDTH,
+                         height: float = DEFAULT_HEIGHT) -> Optional[Drawing]:
+    """Nutzung des PV-Stroms (Jahr 1): Direktverbrauch, Speichernutzung, Einspeisung."""
+    direct = _number(results.get("direktverbrauch_anteil_pv_produktion_pct"))
+    storage = _number(results.get("speichernutzung_anteil_pv_produktion_pct"))
+    if direct is None or storage is None or results.get("annual_pv_production_kwh") is None:
+        return None
+    feed_in = max(0.0, 100.0 - direct - storage)
+    return _share_drawing([("Direktverbrauch", direct, CHART_COLORS["primary"]),
+                           ("Speichernutzung", storage, CHART_COLORS["secondary"]),
+                           ("Einspeisung", feed_in, CHART_COLORS["neutral"])],
+                          width, height, donut=False)
+
+
+def co2_savings_drawing(results: Dict[str, Any], width: float = DEFAULT_WIDTH,
+                        height: float = DEFAULT_HEIGHT) -> Optional[Drawing]:
+    """Kumulierte CO₂-Einsparung in Tonnen über die Simulationsdauer (Standardfonts kennen kein '₂')."""
+    annual_kg = _number(results.get("annual_co2_savings_kg"))
+    if not annual_kg or annual_kg <= 0:
+        return None
+    years = int(_number(results.get("simulation_period_years_effective")) or 20)
+    years = max(1, min(years, 50))
+    cumulative_t = [annual_kg * (year + 1) / 1000.0 for year in range(years)]
+    drawing = Drawing(width, height)
+    _bar_chart(drawing, [cumulative_t], [str(year + 1) for year in range(years)],
+               [CHART_COLORS["positive"]], label_every=max(1, years // 10))
+    drawing.add(String(45, height - 12, f"Jährlich: {format_german_number(annual_kg, 0, 'kg CO2')}",
+                       fontName=_FONT, fontSize=_FONT_SIZE + 1, fillColor=CHART_COLORS["text"]))
+    _legend(drawing, width - 110, height - 8, [(CHART_COLORS["positive"], "CO2-Einsparung kumuliert (t)")])
+    return drawing
+
+
+VECTOR_CHART_BUILDERS: Dict[str, Callable[..., Optional[Drawing]]] = {
+    "monthly_prod_cons_chart_bytes": monthly_prod_cons_drawing,
+    "cost_projection_chart_bytes": cost_projection_drawing,
+    "cumulative_cashflow_chart_bytes": cumulative_cashflow_drawing,
+    "consumption_coverage_pie_chart_bytes": consumption_coverage_pie_drawing,
+    "pv_usage_pie_chart_bytes": pv_usage_pie_drawing,
+    "co2_savings_chart_bytes": co2_savings_drawing,
+}
+
+
+def fit_drawing(drawing: Drawing, width: float, max_height: Optional[float] = None) -> Drawing:
+    """Skalierte Kopie von `drawing` auf die Breite `width` (höchstens `max_height` hoch); das Original bleibt unverändert."""
+    scale = width / drawing.width
+    if max_height and drawing.height * scale > max_height:
+        scale = max_height / drawing.height
+    fitted = drawing.copy()
+    fitted.scale(scale, scale)
+    fitted.width, fitted.height = drawing.width * scale, drawing.height * scale
+    return fitted
+
+
+def build_vector_chart(chart_key: str, results: Dict[str, Any], width: float,
+                       max_height: Optional[float] = None) -> Optional[Drawing]:
+    """Baut das Vektor-Diagramm für chart_key in der gewünschten Breite (None, wenn nicht unterstützt)."""
+    builder = VECTOR_CHART_BUILDERS.get(chart_key)
+    if builder is None or not isinstance(results, dict):
+        return None
+    try:
+        drawing = builder(results)
+    except Exception as e:
+        print(f"Vektor-Diagramm {chart_key} fehlgeschlagen: {e}")
+        return None
+    if drawing is None:
+        return None
+    return fit_drawing(drawing, width, max_height)
@@ -12,8 +12,15 @@ except Exception as e:
     get_db_connection = None  # type: ignore
     print(f"product_attributes.py: WARN - database.get_db_connection nicht verfügbar: {e}")
 
+try:
+    from product_db import notify_products_changed
+except Exception:  # pragma: no cover
+    def notify_products_changed() -> None:  # type: ignore
+        pass
+
 
-def _ensure_tables(conn: sqlite3.Connection) -> None:
+def create_product_attributes_table(conn: sqlite3.Connection) -> None:
+    """Schema der Attributtabelle; wird einmalig über database.SCHEMA_MIGRATIONS (v16) angewendet."""
     cur = conn.cursor()
     cur.execute(
         """
@@ -43,7 +50,6 @@ def upsert_attribute(product_id: int, category: str, attribute_key: str, attribu
         print("product_attributes.upsert_attribute: get_db_connection lieferte None")
         return None
     try:
-        _ensure_tables(conn)
         cur = conn.cursor()
         now_iso = datetime.now().isoformat()
         # Versuche Update
@@ -59,6 +65,7 @@ def upsert_attribute(product_id: int, category: str, attribute_key: str, attribu
                 (attribute_value, unit, display_order, now_iso, attr_id),
             )
             conn.commit()
+            notify_products_changed()
             return attr_id
         else:
             cur.execute(
@@ -66,6 +73,7 @@ def upsert_attribute(product_id: int, category: str, attribute_key: str, attribu
                 (int(product_id), category, attribute_key, attribute_value, unit, display_order or 0, now_iso),
             )
             conn.commit()
+            notify_products_changed()
             return int(cur.lastrowid)
     except Exception as e:
         print(f"product_attributes.upsert_attribute: Fehler: {e}")
@@ -86,7 +94,6 @@ def get_attribute(product_id: int, attribute_key: str) -> Optional[Dict[str, Any
     if not conn:
         return None
     try:
-        _ensure_tables(conn)
         cur = conn.cursor()
         cur.execute(
             "SELECT id, product_id, category, attribute_key, attribute_value, unit, display_order, updated_at FROM product_attributes WHERE product_id = ? AND attribute_key = ?",
@@ -118,7 +125,6 @@ def list_attributes(product_id: int) -> List[Dict[str, Any]]:
     if not conn:
         return []
     try:
-        _ensure_tables(conn)
         cur = conn.cursor()
         cur.execute(
             "SELECT id, product_id, category, attribute_key, attribute_value, unit, display_order, updated_at FROM product_attributes WHERE product_id = ? ORDER BY display_order, attribute_key",
@@ -151,10 +157,10 @@ def delete_attribute(attribute_id: int) -> bool:
     if not conn:
         return False
     try:
-        _ensure_tables(conn)
         cur = conn.cursor()
         cur.execute("DELETE FROM product_attributes WHERE id = ?", (int(attribute_id),))
         conn.commit()
+        notify_products_changed()
         return cur.rowcount > 0
     except Exception as e:
         print(f"product_attributes.delete_attribute: Fehler: {e}")
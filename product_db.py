@@ -33,7 +33,18 @@ except Exception as e:
     get_db_connection_safe_pd = _dummy_get_db_connection_ex
     print(f"product_db.py: Fehler beim Laden von database.py: {e}. Dummy DB Funktionen werden genutzt.")
 
+# Änderungszähler für Caches (z. B. heatpump_catalog); jede Schreiboperation erhöht ihn
+_PRODUCTS_VERSION = 0
+
+def products_version() -> int:
+    return _PRODUCTS_VERSION
+
+def notify_products_changed() -> None:
+    global _PRODUCTS_VERSION
+    _PRODUCTS_VERSION += 1
+
 def create_product_table(conn: sqlite3.Connection):
+    """Schema der Produkttabelle; wird einmalig über database.SCHEMA_MIGRATIONS (v16) angewendet."""
     cursor = conn.cursor()
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS products (
@@ -142,7 +153,6 @@ def _migrate_product_table_columns(conn: sqlite3.Connection):
 def add_product(product_data: Dict[str, Any]) -> Optional[int]:
     conn = get_db_connection_safe_pd()
     if conn is None: print("product_db.add_product: DB nicht verfügbar."); return None
-    create_product_table(conn)
     cursor = conn.cursor()
     now_iso = datetime.now().isoformat()
     all_db_columns = {
@@ -170,7 +180,7 @@ def add_product(product_data: Dict[str, Any]) -> Optional[int]:
     fields = ', '.join(insert_data.keys()); placeholders = ', '.join(['?'] * len(insert_data))
     try:
         cursor.execute(f"INSERT INTO products ({fields}) VALUES ({placeholders})", list(insert_data.values()))
-        conn.commit(); product_id = cursor.lastrowid
+        conn.commit(); product_id = cursor.lastrowid; notify_products_changed()
         print(f"product_db.add_product: Produkt '{insert_data['model_name']}' erfolgreich mit ID {product_id} hinzugefügt."); return product_id
     except sqlite3.Error as e: print(f"product_db.add_product: SQLite Fehler bei INSERT von '{insert_data.get('model_name', 'N/A')}': {e}"); traceback.print_exc(); conn.rollback(); return None
     finally: conn.close()
@@ -178,7 +188,7 @@ def add_product(product_data: Dict[str, Any]) -> Optional[int]:
 def update_product(product_id: Union[int, float], product_data: Dict[str, Any]) -> bool:
     conn = get_db_connection_safe_pd(); 
     if conn is None: print("product_db.update_product: DB nicht verfügbar."); return False
-    create_product_table(conn); cursor = conn.cursor(); now_iso = datetime.now().isoformat()
+    cursor = conn.cursor(); now_iso = datetime.now().isoformat()
     if 'last_updated' in product_data: product_data['updated_at'] = product_data.pop('last_updated')
     product_data['updated_at'] = now_iso 
     cursor.execute("PRAGMA table_info(products)"); db_columns = [col_info[1] for col_info in cursor.fetchall()]
@@ -191,7 +201,7 @@ def update_product(product_id: Union[int, float], product_data: Dict[str, Any])
     if not update_data: print(f"product_db.update_product: Keine gültigen Felder zum Aktualisieren für ID {product_id}."); conn.close(); return False 
     fields_to_set = [f"{k}=?" for k in update_data.keys()]; values = list(update_data.values()); values.append(int(product_id))
     try:
-        cursor.execute(f"UPDATE products SET {', '.join(fields_to_set)} WHERE id=?", values); conn.commit()
+        cursor.execute(f"UPDATE products SET {', '.join(fields_to_set)} WHERE id=?", values); conn.commit(); notify_products_changed()
         if cursor.rowcount > 0: print(f"product_db.update_product: Produkt ID {product_id} erfolgreich aktualisiert."); return True
         else: print(f"product_db.update_product: Produkt ID {product_id} nicht gefunden."); return False
     except sqlite3.Error as e: print(f"product_db.update_product: SQLite Fehler für ID {product_id}: {e}"); traceback.print_exc(); conn.rollback(); return False
@@ -200,9 +210,9 @@ def update_product(product_id: Union[int, float], product_data: Dict[str, Any])
 def delete_product(product_id: Union[int, float]) -> bool:
     conn = get_db_connection_safe_pd(); 
     if conn is None: print("product_db.delete_product: DB nicht verfügbar."); return False
-    create_product_table(conn); cursor = conn.cursor()
+    cursor = conn.cursor()
     try:
-        cursor.execute("DELETE FROM products WHERE id=?", (int(product_id),)); conn.commit(); deleted_count = cursor.rowcount
+        cursor.execute("DELETE FROM products WHERE id=?", (int(product_id),)); conn.commit(); deleted_count = cursor.rowcount; notify_products_changed()
         if deleted_count > 0: print(f"product_db.delete_product: Produkt ID {product_id} erfolgreich gelöscht.")
         else: print(f"product_db.delete_product: Produkt ID {product_id} nicht gefunden, nichts gelöscht.")
         return deleted_count > 0
@@ -212,7 +222,7 @@ def delete_product(product_id: Union[int, float]) -> bool:
 def list_products(category: Optional[str] = None, company_id: Optional[int] = None) -> List[Dict[str, Any]]:
     conn = get_db_connection_safe_pd(); 
     if conn is None: print("product_db.list_products: DB nicht verfügbar."); return []
-    create_product_table(conn); cursor = conn.cursor()
+    cursor = conn.cursor()
     query = "SELECT * FROM products"; params: List[Any] = [] 
     conditions = []
 
@@ -237,7 +247,7 @@ def list_products(category: Optional[str] = None, company_id: Optional[int] = No
 def get_product_by_id(product_id: Union[int, float]) -> Optional[Dict[str, Any]]:
     conn = get_db_connection_safe_pd(); 
     if conn is None: print("product_db.get_product_by_id: DB nicht verfügbar."); return None
-    create_product_table(conn); cursor = conn.cursor()
+    cursor = conn.cursor()
     try:
         cursor.execute("SELECT * FROM products WHERE id=?", (int(product_id),)); row = cursor.fetchone()
         return dict(row) if row else None
@@ -248,7 +258,7 @@ def get_product_by_model_name(model_name: str) -> Optional[Dict[str, Any]]:
     if not model_name or not model_name.strip(): print("product_db.get_product_by_model_name: Modellname darf nicht leer sein."); return None
     conn = get_db_connection_safe_pd(); 
     if conn is None: print("product_db.get_product_by_model_name: DB nicht verfügbar."); return None
-    create_product_table(conn); cursor = conn.cursor()
+    cursor = conn.cursor()
     try:
         cursor.execute("SELECT * FROM products WHERE model_name=? COLLATE NOCASE", (model_name.strip(),)); row = cursor.fetchone()
         return dict(row) if row else None
@@ -261,7 +271,7 @@ def get_product_id_by_model_name(model_name: str) -> Optional[int]:
     if conn is None: 
         print("product_db.get_product_id_by_model_name: DB nicht verfügbar."); 
         return None
-    create_product_table(conn); cursor = conn.cursor()
+    cursor = conn.cursor()
     try:
         cursor.execute("SELECT id FROM products WHERE model_name=? COLLATE NOCASE", (model_name.strip(),)); row = cursor.fetchone()
         return int(row[0]) if row else None
@@ -278,7 +288,7 @@ def update_product_image(product_id: Union[int, float], image_base64: Optional[s
 def list_product_categories() -> List[str]:
     conn = get_db_connection_safe_pd(); 
     if conn is None: print("product_db.list_product_categories: DB nicht verfügbar."); return []
-    create_product_table(conn); cursor = conn.cursor()
+    cursor = conn.cursor()
     try:
         cursor.execute("SELECT DISTINCT category FROM products WHERE category IS NOT NULL AND category != '' ORDER BY category COLLATE NOCASE"); rows = cursor.fetchall()
         return [row['category'] for row in rows] 
@@ -0,0 +1,22 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+# Einige Testmodule rendern schon beim Sammeln (vor den Fixtures) –
+# dort das Trace-Log abschalten, damit nichts nach data/ geschrieben wird.
+os.environ["OFFER_TRACE_LOG"] = "0"
+
+
+@pytest.fixture(autouse=True)
+def _offer_trace_log_in_tmp_path(tmp_path, monkeypatch):
+    """Trace-Log jedes Tests nach tmp_path umleiten (nie ins Arbeitsverzeichnis schreiben)."""
+    log_path = str(tmp_path / "offer_traces.jsonl")
+    monkeypatch.setenv("OFFER_TRACE_LOG", log_path)
+    import offer_trace
+    monkeypatch.setattr(offer_trace, "TRACE_LOG_PATH", log_path)
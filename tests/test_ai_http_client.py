@@ -0,0 +1,108 @@
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import pytest
+
+from ai_http_client import ChatCompletionClient, ChatCompletionError, response_cache_key
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.requests.append(payload)
+        server.connections.add(self.client_address)
+        if server.fail_first and len(server.requests) == 1:
+            body = b"busy"
+            self.send_response(503)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if payload.get("stream"):
+            events = [{"choices": [{"delta": {"content": token}}]} for token in ("Speicher ", "lohnt ", "sich. Größe Übersicht")]
+            # Roh-UTF-8 ohne charset im Content-Type, wie bei SSE-Servern üblich
+            body = "".join(f"data: {json.dumps(e, ensure_ascii=False)}\n\n" for e in events) + "data: [DONE]\n\n"
+            content_type = "text/event-stream"
+        else:
+            body = json.dumps({"choices": [{"message": {"content": "Antwort: " + payload["messages"][-1]["content"]}}]})
+            content_type = "application/json"
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.requests = []
+    server.connections = set()
+    server.fail_first = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(server):
+    return ChatCompletionClient(f"http://127.0.0.1:{server.server_address[1]}", max_retries=2, backoff_factor=0)
+
+
+def test_repeated_question_is_served_from_cache(stub_server):
+    client = _client(stub_server)
+    messages = [{"role": "system", "content": "Kontext"}, {"role": "user", "content": "ROI?"}]
+    key = response_cache_key("ROI?", "Kontext", "deepseek-chat", temperature=0.7)
+    assert client.complete("sk-test", messages, cache_key=key, temperature=0.7) == "Antwort: ROI?"
+    assert client.complete("sk-test", messages, cache_key=key, temperature=0.7) == "Antwort: ROI?"
+    assert len(stub_server.requests) == 1 and client.cache.hits == 1
+    assert response_cache_key("  roi? ", "Kontext", "deepseek-chat", temperature=0.7) == key
+    assert response_cache_key("ROI?", "Anderer Kontext", "deepseek-chat", temperature=0.7) != key
+    # Rückfragen hängen vom Gesprächsverlauf ab
+    turns_a = [{"role": "user", "content": "Lohnt sich ein Speicher?"}, {"role": "assistant", "content": "Ja."}]
+    turns_b = [{"role": "user", "content": "Lohnt sich eine Wallbox?"}, {"role": "assistant", "content": "Nein."}]
+    followup = response_cache_key("Und warum?", "Kontext", "deepseek-chat", history=turns_a, temperature=0.7)
+    assert followup != response_cache_key("Und warum?", "Kontext", "deepseek-chat", history=turns_b, temperature=0.7)
+    assert followup != response_cache_key("Und warum?", "Kontext", "deepseek-chat", temperature=0.7)
+
+    # Neue Frage über dieselbe Keep-Alive-Verbindung
+    client.complete("sk-test", messages[:1] + [{"role": "user", "content": "Speicher?"}])
+    assert len(stub_server.requests) == 2 and len(stub_server.connections) == 1
+
+
+def test_streaming_yields_tokens_and_caches_full_answer(stub_server):
+    client = _client(stub_server)
+    messages = [{"role": "user", "content": "Speicher?"}]
+    assert list(client.stream("sk-test", messages, cache_key="k")) == ["Speicher ", "lohnt ", "sich. Größe Übersicht"]
+    assert stub_server.requests[0]["stream"] is True
+    assert list(client.stream("sk-test", messages, cache_key="k")) == ["Speicher lohnt sich. Größe Übersicht"]
+    assert client.complete("sk-test", messages, cache_key="k") == "Speicher lohnt sich. Größe Übersicht"
+    assert len(stub_server.requests) == 1
+
+
+def test_retries_on_server_error(stub_server):
+    stub_server.fail_first = True
+    client = _client(stub_server)
+    assert client.complete("sk-test", [{"role": "user", "content": "Hallo"}]) == "Antwort: Hallo"
+    assert len(stub_server.requests) == 2
+
+    no_retry = ChatCompletionClient(f"http://127.0.0.1:{stub_server.server_address[1]}", max_retries=0)
+    stub_server.requests.clear()
+    with pytest.raises(ChatCompletionError) as excinfo:
+        no_retry.complete("sk-test", [{"role": "user", "content": "Hallo"}])
+    assert excinfo.value.status_code == 503
@@ -0,0 +1,69 @@
+import sqlite3
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+from database import _create_crm_pipeline_tables_v17, _create_appointment_date_index_v20
+from crm_calendar_data import AppointmentCalendarStore, bucket_by_day, fetch_appointments, month_bounds
+
+
+def _make_db(path: Path) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE crm_customers (id INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT)")
+    _create_crm_pipeline_tables_v17(conn)
+    _create_appointment_date_index_v20(conn)
+    conn.execute("INSERT INTO crm_customers VALUES (1, 'Jana', 'Berg')")
+    for when, customer_id in [("2025-06-30T17:00:00", 1), ("2025-07-01T09:00:00", 1),
+                              ("2025-07-01T14:30:00", None), ("2025-07-31T23:59:00", None),
+                              ("2025-08-01T00:00:00", None)]:
+        conn.execute("INSERT INTO crm_appointments (title, type, appointment_date, customer_id) VALUES (?, 'consultation', ?, ?)",
+                     (f"Termin {when}", when, customer_id))
+    conn.commit()
+    conn.close()
+
+
+def test_month_range_uses_index_and_buckets_per_day(tmp_path):
+    db_path = tmp_path / "cal.db"
+    _make_db(db_path)
+    conn = sqlite3.connect(db_path)
+    appointments = fetch_appointments(conn, *month_bounds(2025, 7))
+    assert [a["appointment_date"].day for a in appointments] == [1, 1, 31]
+    assert appointments[0]["customer_name"] == "Jana Berg"
+    buckets = bucket_by_day(appointments)
+    assert [len(buckets[date(2025, 7, 1)]), len(buckets[date(2025, 7, 31)])] == [2, 1]
+
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT id FROM crm_appointments WHERE appointment_date >= ? AND appointment_date < ?",
+                        ("2025-07-01T00:00:00", "2025-08-01T00:00:00")).fetchall()
+    assert "idx_crm_appointments_date" in " ".join(str(row[-1]) for row in plan)
+    conn.close()
+
+
+def test_store_caches_months_and_spans_weeks(tmp_path):
+    db_path = tmp_path / "cal.db"
+    _make_db(db_path)
+    opened = []
+
+    def _connect():
+        opened.append(1)
+        return sqlite3.connect(db_path)
+
+    store = AppointmentCalendarStore(_connect, max_months=2)
+    grid = store.month_grid(2025, 7)
+    assert grid[0][1] == (1, store.month(2025, 7)[date(2025, 7, 1)])
+    assert len(opened) == 1 and store.hits == 1
+
+    week = store.week(date(2025, 7, 2))  # Mo 30.06. - So 06.07. -> Juni + Juli
+    assert [len(v) for v in week.values()] == [1, 2, 0, 0, 0, 0, 0]
+    assert len(opened) == 2
+
+    store.month(2025, 8)  # verdrängt Juni (zuletzt benutzt: Juli), max 2 Monate
+    store.day(date(2025, 7, 1))
+    store.day(date(2025, 6, 30))
+    assert len(opened) == 4
+
+    store.invalidate(datetime(2025, 7, 1))
+    assert len(store.day(date(2025, 7, 1))) == 2 and len(opened) == 5
@@ -0,0 +1,75 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+from crm_search import ensure_search_index, search_crm, build_match_query, rebuild_search_index
+
+
+def _make_conn() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("""
+        CREATE TABLE customers (id INTEGER PRIMARY KEY AUTOINCREMENT, first_name TEXT, last_name TEXT,
+            company_name TEXT, address TEXT, house_number TEXT, zip_code TEXT, city TEXT, email TEXT,
+            phone_landline TEXT, phone_mobile TEXT)
+    """)
+    conn.execute("""
+        CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, customer_id INTEGER,
+            project_name TEXT, project_status TEXT)
+    """)
+    conn.execute("""
+        CREATE TABLE crm_appointments (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, location TEXT,
+            notes TEXT, customer_id INTEGER)
+    """)
+    conn.execute(
+        "INSERT INTO customers (first_name, last_name, address, city, email) VALUES (?, ?, ?, ?, ?)",
+        ("Jürgen", "Müller", "Hauptstraße", "Köln", "j.mueller@example.de"),
+    )
+    conn.commit()
+    return conn
+
+
+def test_umlaut_folding_and_prefix():
+    conn = _make_conn()
+    assert "crm_fts_customers" in ensure_search_index(conn)
+    for query in ("Müller", "Mueller", "muel", "hauptstr köln", "j.mueller@exa"):
+        hits = search_crm(conn, query)
+        assert [h["entity_id"] for h in hits] == [1], query
+    assert search_crm(conn, "Schmidt") == []
+
+
+def test_triggers_keep_index_in_sync():
+    conn = _make_conn()
+    ensure_search_index(conn)
+    conn.execute("INSERT INTO projects (customer_id, project_name) VALUES (1, 'Dachanlage Süd')")
+    hits = search_crm(conn, "dachanl", entity_types=["project"])
+    assert hits and hits[0]["customer_id"] == 1 and hits[0]["label"] == "Dachanlage Süd"
+
+    conn.execute("UPDATE customers SET last_name = 'Schmidt', email = NULL WHERE id = 1")
+    assert search_crm(conn, "Müller", entity_types=["customer"]) == []
+    assert len(search_crm(conn, "schmi", entity_types=["customer"])) == 1
+
+    conn.execute("DELETE FROM customers WHERE id = 1")
+    assert search_crm(conn, "schmi", entity_types=["customer"]) == []
+
+
+def test_rebuild_and_query_builder():
+    conn = _make_conn()
+    ensure_search_index(conn)
+    assert rebuild_search_index(conn)
+    assert len(search_crm(conn, "jürg")) == 1
+    assert build_match_query('Straße "x') == '"strasse"* "x"*'
+    assert build_match_query("  ") == ""
+
+
+def test_appointment_hits_do_not_point_to_customers():
+    conn = _make_conn()
+    ensure_search_index(conn)
+    # customer_id gehört zu crm_customers, nicht zur Tabelle customers
+    conn.execute("INSERT INTO crm_appointments (title, customer_id) VALUES ('Vor-Ort-Termin Dachcheck', 1)")
+    hits = search_crm(conn, "dachcheck", entity_types=["appointment"])
+    assert len(hits) == 1 and hits[0]["customer_id"] is None
@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import db_backup
+
+
+def _setup(tmp_path, monkeypatch):
+    db_path = tmp_path / "app_data.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE customers (id INTEGER PRIMARY KEY, last_name TEXT)")
+    conn.executemany("INSERT INTO customers (last_name) VALUES (?)", [(f"Kunde {i}",) for i in range(500)])
+    conn.commit()
+    docs = tmp_path / "customer_docs" / "customer_1"
+    docs.mkdir(parents=True)
+    (docs / "angebot.pdf").write_bytes(b"%PDF-1.4 angebot")
+    monkeypatch.setattr(db_backup, "DB_PATH", str(db_path))
+    monkeypatch.setattr(db_backup, "DOCUMENT_TREES", {"customer_docs": str(tmp_path / "customer_docs")})
+    return conn, db_path, docs
+
+
+def test_snapshot_captures_uncheckpointed_wal(tmp_path, monkeypatch):
+    conn, _db_path, _docs = _setup(tmp_path, monkeypatch)
+    backup_dir = str(tmp_path / "backups")
+    info = db_backup.create_snapshot(backup_dir, compress=True)
+    assert info and info["db_quick_check"] and info["db_file"].endswith(".gz")
+
+    conn.execute("DELETE FROM customers")
+    conn.commit()
+    assert db_backup.restore_snapshot(info["name"], backup_dir)
+    assert conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0] == 500
+    conn.close()
+
+
+def test_documents_are_hardlinked_when_unchanged(tmp_path, monkeypatch):
+    conn, _db_path, docs = _setup(tmp_path, monkeypatch)
+    backup_dir = str(tmp_path / "backups")
+    first = db_backup.create_snapshot(backup_dir, compress=False)
+    assert first["document_stats"]["files_copied"] == 1
+
+    (docs / "foto.png").write_bytes(b"png")
+    second = db_backup.create_snapshot(backup_dir, compress=False)
+    assert second["document_stats"] == {"files_total": 2, "files_linked": 1, "files_copied": 1, "bytes_copied": 3}
+    linked = Path(second["path"]) / "files" / "customer_docs" / "customer_1" / "angebot.pdf"
+    assert os.stat(linked).st_nlink == 2
+
+    assert db_backup.apply_retention(backup_dir, keep_last=1) == [first["name"]]
+    assert linked.read_bytes() == b"%PDF-1.4 angebot"
+    assert db_backup.run_backup_if_due({"interval_hours": 24}, backup_dir) is None
+    conn.close()
+
+
+def test_scheduler_picks_up_new_settings_and_stops_when_disabled(tmp_path, monkeypatch):
+    import threading
+    seen = []
+    ran = threading.Event()
+
+    def _record(settings, backup_dir):
+        seen.append(settings["keep_last"])
+        ran.set()
+    monkeypatch.setattr(db_backup, "run_backup_if_due", _record)
+
+    assert db_backup.start_backup_scheduler({"enabled": True, "keep_last": 3}, str(tmp_path), check_interval_s=60)
+    assert ran.wait(5)
+    ran.clear()
+    assert db_backup.start_backup_scheduler({"enabled": True, "keep_last": 9}, str(tmp_path), check_interval_s=60)
+    assert ran.wait(5) and seen[-1] == 9
+
+    thread = db_backup._scheduler_thread
+    assert db_backup.start_backup_scheduler({"enabled": False}, str(tmp_path)) is False
+    thread.join(5)
+    assert not thread.is_alive() and db_backup._scheduler_thread is None
@@ -0,0 +1,47 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import database
+
+
+def _index_names(conn: sqlite3.Connection) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def test_first_connection_migrates_fresh_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "app_data.db"))
+    monkeypatch.setattr(database, "_schema_checked_db_paths", set())
+    conn = database.get_db_connection()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == database.DB_SCHEMA_VERSION
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {"customers", "projects", "customer_documents", "products", "brand_logos",
+            "product_attributes", "crm_leads", "crm_appointments", "file_manifest"} <= tables
+    assert {"idx_projects_customer_id", "idx_customer_documents_customer_id", "idx_crm_leads_stage"} <= _index_names(conn)
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM crm_leads WHERE stage = 'lead'").fetchall()
+    assert "idx_crm_leads_stage" in " ".join(str(row[-1]) for row in plan)
+    conn.close()
+
+
+def test_pending_migrations_run_once_from_v14(tmp_path):
+    conn = sqlite3.connect(tmp_path / "alt.db")
+    database._create_products_table_v2(conn)
+    conn.execute("INSERT INTO products (category, model_name) VALUES ('Modul', 'Alt 400')")
+    conn.execute("CREATE TABLE customers (id INTEGER PRIMARY KEY AUTOINCREMENT, first_name TEXT, last_name TEXT)")
+    conn.execute("PRAGMA user_version = 14")
+    conn.commit()
+
+    assert database.apply_schema_migrations(conn) == database.DB_SCHEMA_VERSION
+    product_columns = {row[1] for row in conn.execute("PRAGMA table_info(products)")}
+    assert {"created_at", "updated_at", "labor_hours", "company_id"} <= product_columns
+    assert "phone_mobile" in {row[1] for row in conn.execute("PRAGMA table_info(customers)")}
+    assert conn.execute("SELECT model_name FROM products").fetchone()[0] == "Alt 400"
+
+    conn.execute("DROP INDEX idx_crm_leads_stage")
+    assert database.apply_schema_migrations(conn) == database.DB_SCHEMA_VERSION
+    assert "idx_crm_leads_stage" not in _index_names(conn)
+    conn.close()
@@ -0,0 +1,77 @@
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+from document_store import (
+    store_file, release_file, index_existing_files, find_orphaned_entries, verify_manifest, find_duplicates,
+)
+
+
+def test_identical_documents_share_one_blob(tmp_path):
+    conn = sqlite3.connect(":memory:")
+    data_dir = str(tmp_path)
+    a = tmp_path / "customer_docs" / "customer_1" / "angebot.pdf"
+    b = tmp_path / "company_docs" / "2" / "datenblatt.pdf"
+    sha_a = store_file(conn, b"%PDF gleich", str(a), data_dir)
+    sha_b = store_file(conn, b"%PDF gleich", str(b), data_dir)
+    assert sha_a == sha_b
+    assert os.path.samefile(a, b)
+    assert conn.execute("SELECT ref_count FROM content_blobs").fetchone()[0] == 2
+    assert find_duplicates(conn)[0]["bytes_saved"] == len(b"%PDF gleich")
+
+    assert release_file(conn, str(a), data_dir)
+    assert not a.exists() and b.read_bytes() == b"%PDF gleich"
+    assert release_file(conn, str(b), data_dir)
+    assert conn.execute("SELECT COUNT(*) FROM content_blobs").fetchone()[0] == 0
+    assert not any(p.is_file() for p in (tmp_path / "blobs").rglob("*"))
+
+
+def test_manifest_orphans_and_integrity(tmp_path):
+    conn = sqlite3.connect(":memory:")
+    data_dir = str(tmp_path)
+    keep = tmp_path / "customer_docs" / "customer_1" / "keep.pdf"
+    orphan = tmp_path / "customer_docs" / "customer_1" / "orphan.pdf"
+    store_file(conn, b"keep", str(keep), data_dir)
+    store_file(conn, b"orphan", str(orphan), data_dir)
+    orphans = find_orphaned_entries(conn, ["customer_docs/customer_1/keep.pdf"], ["customer_docs", "company_docs"])
+    assert orphans == ["customer_docs/customer_1/orphan.pdf"]
+
+    os.remove(orphan)
+    assert verify_manifest(conn, data_dir)["missing"] == ["customer_docs/customer_1/orphan.pdf"]
+
+
+def test_index_existing_files_is_incremental_and_deduplicates(tmp_path):
+    conn = sqlite3.connect(":memory:")
+    root = tmp_path / "company_docs" / "1"
+    root.mkdir(parents=True)
+    (root / "agb_a.pdf").write_bytes(b"AGB")
+    (root / "agb_b.pdf").write_bytes(b"AGB")
+    first = index_existing_files(conn, [str(tmp_path / "company_docs")], str(tmp_path))
+    assert first["files_hashed"] == 2 and first["files_deduplicated"] == 2
+    assert os.path.samefile(root / "agb_a.pdf", root / "agb_b.pdf")
+    second = index_existing_files(conn, [str(tmp_path / "company_docs")], str(tmp_path))
+    assert second == {"files_seen": 2, "files_hashed": 0, "files_deduplicated": 0}
+
+
+def test_shared_blob_is_read_only_and_restore_replaces_links(tmp_path):
+    from document_store import copy_replace
+    conn = sqlite3.connect(":memory:")
+    data_dir = str(tmp_path)
+    a = tmp_path / "customer_docs" / "customer_1" / "vertrag.pdf"
+    b = tmp_path / "customer_docs" / "customer_2" / "vertrag.pdf"
+    store_file(conn, b"gleich", str(a), data_dir)
+    store_file(conn, b"gleich", str(b), data_dir)
+    assert not os.stat(a).st_mode & 0o222
+
+    # Wiederherstellung/Überschreiben eines Pfads ersetzt den Link, die Kopie bleibt unverändert
+    restored = tmp_path / "restore.pdf"
+    restored.write_bytes(b"anders")
+    copy_replace(str(restored), str(a))
+    assert a.read_bytes() == b"anders" and b.read_bytes() == b"gleich"
+    assert not os.path.samefile(a, b)
+    assert verify_manifest(conn, data_dir, rehash=True)["hash_mismatch"] == ["customer_docs/customer_1/vertrag.pdf"]
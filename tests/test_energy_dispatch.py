@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import numpy as np
+import pytest
+
+from energy_dispatch import (
+    StorageParams, coupled_dispatch_for_project, dispatch, hourly_household_load, hourly_pv_from_monthly,
+)
+
+MONTHLY_PV = [150, 250, 450, 600, 700, 720, 730, 650, 480, 320, 170, 120]
+MONTHLY_LOAD = [400] * 12
+
+
+def test_hourly_profiles_keep_monthly_totals():
+    pv = hourly_pv_from_monthly(MONTHLY_PV)
+    load = hourly_household_load(MONTHLY_LOAD)
+    assert len(pv) == len(load) == 8760
+    assert pv.sum() == pytest.approx(sum(MONTHLY_PV))
+    assert load.sum() == pytest.approx(sum(MONTHLY_LOAD))
+    assert pv[:24][0] == 0.0 and pv[:24][12] > 0.0
+
+
+def test_dispatch_energy_balance_and_battery_effect():
+    pv = np.array([0.0, 3.0, 4.0, 0.0, 0.0])
+    house = np.array([1.0, 1.0, 1.0, 1.0, 1.0])
+    hp = np.array([1.0, 0.0, 1.0, 1.0, 0.0])
+    plain = dispatch(pv, house, hp)
+    assert plain.grid_import_kwh.tolist() == pytest.approx([2.0, 0.0, 0.0, 2.0, 1.0])
+    assert plain.heatpump_pv_kwh.sum() == pytest.approx(1.0)
+
+    stored = dispatch(pv, house, hp, StorageParams(battery_kwh=10.0, battery_power_kw=5.0, round_trip_efficiency=1.0))
+    assert (stored.self_consumption_kwh + stored.feed_in_kwh).sum() == pytest.approx(pv.sum())
+    assert stored.grid_import_kwh.sum() + stored.battery_discharge_kwh.sum() + np.minimum(pv, house + hp).sum() \
+        == pytest.approx((house + hp).sum())
+    assert stored.grid_import_kwh.sum() < plain.grid_import_kwh.sum()
+    # 3 kWh Überschuss decken Stunde 3 (2 kWh, davon 1 kWh WP) und 1 kWh in Stunde 4
+    assert stored.heatpump_pv_kwh.sum() == pytest.approx(2.0)
+    # Nur Stunde 0 (vor dem ersten Überschuss) braucht Netzstrom: 6 von 8 kWh autark
+    assert stored.summary()["autarky_percent"] == pytest.approx(75.0)
+
+
+def test_project_dispatch_includes_heatpump_load():
+    project = {
+        "project_details": {"include_storage": True, "selected_storage_storage_power_kw": 8},
+        "heatpump_data": {
+            "building_data": {"heat_load_kw": 8, "heating_hours": 2000},
+            "selected_heatpump": {"heating_power": 9, "cop": 4.5, "type": "Luft-Wasser-Wärmepumpe"},
+        },
+        "economics_data": {"hp_electricity_consumption": 4000},
+    }
+    results = {"monthly_productions_sim": MONTHLY_PV, "monthly_consumption_sim": MONTHLY_LOAD}
+    summary = coupled_dispatch_for_project(project, results)
+    assert summary["includes_heatpump"]
+    assert summary["heatpump_kwh"] == pytest.approx(4000, rel=1e-3)
+    # Winterlast der WP: PV-Anteil deutlich unter dem Eigenverbrauch des Haushalts
+    assert 0 < summary["heatpump_pv_share_percent"] < summary["self_consumption_rate_percent"]
+    assert sum(summary["monthly_grid_import_kwh"]) == pytest.approx(summary["grid_import_kwh"], abs=1.0)
+    assert coupled_dispatch_for_project(project, {}) is None
@@ -0,0 +1,172 @@
+import csv
+import pickle
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+import excel_eval
+from excel_eval import build_formula_graph, extract_references
+
+
+class _RecordingEngine:
+    """Wertet nur aus, wenn alle Vorgänger bereits berechnet sind (wie ein Modell mit Zell-Cache)."""
+    created = 0
+
+    def __init__(self, path, graph_deps):
+        type(self).created += 1
+        self.deps = graph_deps
+        self.done = {}
+        self.order = []
+
+    def evaluate(self, ref):
+        self.order.append(ref)
+        missing = [d for d in self.deps.get(ref, []) if d not in self.done]
+        self.done[ref] = len(self.done) + 1 if not missing else "#REC"
+        return self.done[ref]
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Kalkulation"
+    ws["A1"] = "=A2*2"
+    ws["A2"] = "=A3+LOG10(10)"
+    ws["A3"] = "=SUM(C1:C5)"
+    ws["C2"] = "=E1"
+    ws["D1"] = "=D2"
+    ws["D2"] = "=D1"
+    ws["E1"] = 4
+    data = wb.create_sheet("Eingabe Werte")
+    data["B2"] = "='Kalkulation'!A1&\"B9\""
+    path = tmp_path / "mappe.xlsx"
+    wb.save(path)
+    excel_eval.clear_result_cache()
+    yield path
+    excel_eval.clear_result_cache()
+
+
+def test_extract_references():
+    refs = extract_references("='Eingabe Werte'!$B$2+SUM(C1:C5)+LOG10(A:B)&\"Z99\"", "Kalkulation")
+    assert refs == [("Eingabe Werte", 2, 2, 2, 2), ("Kalkulation", 3, 1, 3, 5), ("Kalkulation", 1, 1, 2, 2 ** 31)]
+
+
+def test_graph_orders_predecessors_first(workbook):
+    graph = build_formula_graph(workbook)
+    assert graph.order.index("Kalkulation!C2") < graph.order.index("Kalkulation!A3") < \
+        graph.order.index("Kalkulation!A2") < graph.order.index("Kalkulation!A1") < graph.order.index("Eingabe Werte!B2")
+    assert graph.cyclic == ["Kalkulation!D1", "Kalkulation!D2"]
+    assert graph.dependencies["Kalkulation!A3"] == ["Kalkulation!C2"]
+    assert len(graph.content_hash) == 64
+
+
+def test_headless_runs_topologically_and_caches_by_content(workbook, monkeypatch):
+    graph = build_formula_graph(workbook)
+    engines = []
+    _RecordingEngine.created = 0
+
+    def factory(path):
+        engines.append(_RecordingEngine(path, graph.dependencies))
+        return engines[-1]
+    monkeypatch.setitem(excel_eval._ENGINE_FACTORIES, "headless", factory)
+
+    rows = excel_eval._evaluate_many(workbook, graph.refs, engine="headless", graph=graph)
+    assert [r.address for r in rows] == [a for _, a, _ in graph.refs]  # Scan-Reihenfolge bleibt
+    values = {f"{r.sheet}!{r.address}": r.value for r in rows}
+    assert "#REC" not in [values[k] for k in graph.order if k not in graph.cyclic]
+    assert engines[0].order == graph.order
+
+    again = build_formula_graph(workbook)
+    assert excel_eval._evaluate_many(workbook, again.refs, engine="headless", graph=again) == rows
+    assert _RecordingEngine.created == 1  # kein zweites Modell für unveränderte Datei
+
+    # Ohne Graph: Scan-Reihenfolge, Vorgänger fehlen
+    unordered = excel_eval._evaluate_many(workbook, graph.refs, engine="headless")
+    assert "#REC" in [r.value for r in unordered]
+
+
+class _Excel:
+    def __init__(self, path):
+        pass
+
+    def value(self, sheet, address):
+        return 1.0 if address == "A1" else 0.0
+
+    def close(self):
+        pass
+
+
+class _Headless:
+    def __init__(self, path):
+        pass
+
+    def evaluate(self, ref):
+        return 1.0 + 1e-12 if ref.endswith("!A1") else (0.5 if ref == "Kalkulation!D2" else 0.0)
+
+
+class _InlinePool:
+    """Ersatz für ProcessPoolExecutor: prüft Pickle-Fähigkeit (spawn) und rechnet im Prozess."""
+    instances = []
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        type(self).instances.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, fn, tasks):
+        tasks = list(tasks)
+        pickle.loads(pickle.dumps((fn, tasks)))
+        return [fn(t) for t in tasks]
+
+
+def test_parity_report(workbook, monkeypatch, tmp_path):
+    monkeypatch.setitem(excel_eval._ENGINE_FACTORIES, "xlwings", _Excel)
+    monkeypatch.setitem(excel_eval._ENGINE_FACTORIES, "headless", _Headless)
+    report = tmp_path / "report.csv"
+    summary = excel_eval.safety_check_parity(workbook, out_report_csv=report)
+    assert summary["checked_cells"] == 7 and summary["mismatches"] == 1
+    with report.open(encoding="utf-8") as f:
+        assert [row[0] for row in csv.reader(f)][1:] == ["Kalkulation!D2"]
+
+
+def test_export_one_writes_csv(workbook, monkeypatch, tmp_path):
+    monkeypatch.setitem(excel_eval._ENGINE_FACTORIES, "headless", _Headless)
+    out = tmp_path / "einzeln" / "mappe_formulas.csv"
+    assert excel_eval._export_one((workbook, out, None, "headless", "csv")) == (workbook, out)
+    with out.open(encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["sheet", "address", "formula", "value", "value_type"]
+    assert len(rows) == 8
+
+
+def test_batch_export_sequential_and_pool(workbook, monkeypatch, tmp_path):
+    monkeypatch.setitem(excel_eval._ENGINE_FACTORIES, "headless", _Headless)
+    src = tmp_path / "in"
+    (src / "sub").mkdir(parents=True)
+    for name in ("a.xlsx", "sub/b.xlsx"):
+        (src / name).write_bytes(workbook.read_bytes())
+
+    results = excel_eval.batch_export(src, out_dir=tmp_path / "out", engine="headless", workers=1)
+    assert [o.name for _, o in results] == ["a_formulas.csv", "b_formulas.csv"]
+    with results[1][1].open(encoding="utf-8") as f:
+        assert len(list(csv.reader(f))) == 8
+
+    # Pool-Zweig ohne echte Kindprozesse (unabhängig von fork/spawn)
+    _InlinePool.instances = []
+    monkeypatch.setattr(excel_eval, "ProcessPoolExecutor", _InlinePool)
+    pooled = excel_eval.batch_export(src, out_dir=tmp_path / "out_pool", engine="headless", workers=2)
+    assert [p.max_workers for p in _InlinePool.instances] == [2]
+    assert [o.name for _, o in pooled] == ["a_formulas.csv", "b_formulas.csv"]
+    assert pooled[0][1].read_text(encoding="utf-8") == results[0][1].read_text(encoding="utf-8")
@@ -0,0 +1,95 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import pytest
+
+from geo_cache import GeoCache, ensure_geo_cache_tables, normalize_address
+
+
+class _StubResponse:
+    def __init__(self, payload=None, content=b""):
+        self._payload = payload
+        self.content = content
+        self.headers = {"Content-Type": "image/png"}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+class _StubHttp:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, url, params=None, timeout=None):
+        self.calls.append(url)
+        if "geocode" in url:
+            return _StubResponse({"status": "OK", "results": [{
+                "formatted_address": "Hauptstraße 1, 80331 München",
+                "geometry": {"location": {"lat": 48.137154, "lng": 11.575382}}}]})
+        return _StubResponse(content=b"\x89PNG-satellite")
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    db_path = tmp_path / "geo.db"
+
+    def connect():
+        return sqlite3.connect(db_path)
+
+    conn = connect()
+    ensure_geo_cache_tables(conn)
+    conn.close()
+
+    def factory(**kwargs):
+        return GeoCache(connect, image_dir=str(tmp_path / "maps"), **kwargs)
+    return factory
+
+
+def test_repeat_lookups_are_served_from_disk(make_cache):
+    http = _StubHttp()
+    cache = make_cache(http_get=http, offline=False)
+    coords = cache.geocode("Hauptstraße 1", "München", "80331", "KEY")
+    assert coords == {"latitude": pytest.approx(48.137154), "longitude": pytest.approx(11.575382)}
+    assert cache.static_map(48.137154, 11.575382, "KEY") == b"\x89PNG-satellite"
+    assert len(http.calls) == 2
+
+    # Neuer Prozess (neue Instanz) im Offline-Modus ohne HTTP-Schicht: alles aus dem Cache
+    offline = make_cache(http_get=None, offline=True)
+    assert offline.geocode("  hauptstr. 1 ", "MÜNCHEN", "80331", None) == coords
+    assert offline.static_map(48.137154, 11.575382, None) == b"\x89PNG-satellite"
+    assert offline.hits == 2
+    assert offline.geocode("Nebenweg 2", "München", "80331", "KEY") is None
+    assert normalize_address("Hauptstraße 1", "80331", "München") == normalize_address("hauptstr. 1,", "80331", "münchen")
+
+
+def test_daily_quota_stops_requests(make_cache):
+    http = _StubHttp()
+    cache = make_cache(http_get=http, offline=False, daily_quota={"geocode": 1})
+    assert cache.geocode("Weg 1", "Berlin", "10115", "KEY") is not None
+    assert cache.geocode("Weg 2", "Berlin", "10115", "KEY") is None
+    assert len(http.calls) == 1
+    assert cache.quota_used("geocode") == 1
+    assert "kontingent" in cache.last_error
+
+
+def test_api_error_status_falls_back_to_stale_entry(make_cache):
+    cache = make_cache(http_get=_StubHttp(), offline=False)
+    coords = cache.geocode("Hauptstraße 1", "München", "80331", "KEY")
+    conn = sqlite3.connect(Path(cache.image_dir).parent / "geo.db")
+    conn.execute("UPDATE geocode_cache SET fetched_at = '2000-01-01T00:00:00'")
+    conn.commit()
+    conn.close()
+
+    limited = make_cache(http_get=lambda url, params=None, timeout=None: _StubResponse({"status": "OVER_QUERY_LIMIT"}),
+                         offline=False)
+    assert limited.geocode("Hauptstraße 1", "München", "80331", "KEY") == coords
+    assert "OVER_QUERY_LIMIT" in limited.last_error
+    assert limited.geocode("Nebenweg 2", "München", "80331", "KEY") is None
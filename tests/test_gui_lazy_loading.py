@@ -0,0 +1,38 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import gui
+gui.ensure_modules(gui.CORE_MODULES)
+gui.ensure_page_modules("input")
+first_paint = time.perf_counter() - started
+heavy = [m for m in ("analysis", "pdf_ui", "heatpump_ui", "admin_panel", "multi_offer_generator", "reportlab", "fitz")
+         if m in sys.modules]
+gui.LAZY_MODULES["crm_module"] = "gibt_es_nicht_modul"
+gui.ensure_page_modules("crm")
+gui.ensure_page_modules("analysis")
+print(json.dumps({"first_paint": first_paint, "budget": gui.STARTUP_BUDGET_S, "heavy": heavy,
+                  "analysis_loaded": gui.analysis_module is not None, "errors": gui.import_errors,
+                  "timed": sorted(gui.module_load_times)}))
+"""
+
+
+def test_input_page_loads_without_heavy_page_modules():
+    proc = subprocess.run([sys.executable, "-c", _PROBE], cwd=str(base_dir), capture_output=True, text=True,
+                          timeout=300)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    assert result["heavy"] == []
+    assert result["first_paint"] < result["budget"]
+    # Seite erst bei Auswahl geladen, Importfehler weiterhin im Fehlerbereich
+    assert result["analysis_loaded"] is True
+    assert any("gibt_es_nicht_modul" in e for e in result["errors"])
+    assert {"locales", "database", "data_input", "analysis"} <= set(result["timed"])
@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import pytest
+
+import database
+import heatpump_catalog
+import offer_trace
+import product_attributes
+import product_db
+from calculations_heatpump import recommend_heat_pump
+from heatpump_pricing import build_full_heatpump_offer
+
+
+@pytest.fixture
+def catalog_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "app_data.db"))
+    monkeypatch.setattr(database, "_schema_checked_db_paths", set())
+    heatpump_catalog.invalidate_heatpump_catalog()
+    for model, kw, brand in [("Vitocal 250-A 10", 10.0, "Viessmann"), ("aroTHERM 7", 7.0, "Vaillant"),
+                             ("Sole Terra 12", 12.0, "Vaillant"), ("Altherma 16", 16.0, "Daikin")]:
+        pid = product_db.add_product({"category": "Wärmepumpe", "model_name": model, "brand": brand,
+                                      "power_kw": kw, "price_euro": 1000.0 * kw})
+        product_attributes.upsert_attribute(pid, "Wärmepumpe", "scop", "4.5")
+    product_db.add_product({"category": "Zubehör", "model_name": "Pufferspeicher 300", "price_euro": 900.0,
+                            "labor_hours": 2.0})
+    yield
+    heatpump_catalog.invalidate_heatpump_catalog()
+
+
+def test_range_queries_and_selection(catalog_db):
+    catalog = heatpump_catalog.get_heatpump_catalog()
+    assert [hp["model"] for hp in catalog.in_power_range(8.0, 14.0)] == ["Vitocal 250-A 10", "Sole Terra 12"]
+    assert catalog.heatpumps("Sole-Wasser-Wärmepumpe")[0]["scop"] == pytest.approx(4.5)
+    assert catalog.select(9.0, "Luft-Wasser-Wärmepumpe")[0]["model"] == "Vitocal 250-A 10"
+    assert catalog.select(9.0, manufacturer="Vaillant")[0]["model"] == "Sole Terra 12"
+    # Nichts reicht aus -> nächstgelegene (unterdimensionierte) zuerst
+    assert catalog.select(20.0)[0]["model"] == "Altherma 16"
+    assert recommend_heat_pump(11.0, catalog)["model"] == "Sole Terra 12"
+    assert catalog.manufacturers() == ["Daikin", "Vaillant", "Viessmann"]
+
+
+def test_offer_reads_products_once_and_catalog_follows_changes(catalog_db):
+    with offer_trace.span("first") as first:
+        offer = build_full_heatpump_offer()
+    assert first.total_db_queries() <= 3  # products + product_attributes (+ PRAGMA beim Verbindungsaufbau)
+    with offer_trace.span("second") as second:
+        assert build_full_heatpump_offer() == offer
+    assert second.total_db_queries() == 0
+    assert [c["name"] for c in offer["components"]["main"]] == ["Pufferspeicher 300", "Vitocal 250-A 10"]
+
+    product = product_db.get_product_by_model_name("Altherma 16")
+    product_db.update_product(product["id"], {"power_kw": 5.0})
+    assert heatpump_catalog.get_heatpump_catalog().heatpumps()[0]["model"] == "Altherma 16"
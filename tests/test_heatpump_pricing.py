@@ -0,0 +1,43 @@
+import sys
+import time
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import pytest
+
+from heatpump_pricing import (
+    apply_discounts_and_surcharges, calculate_annuity_loan, calculate_beg_subsidy, calculate_scenario_matrix,
+    scenario_matrix_rows, scenario_matrix_table,
+)
+
+
+def test_scenario_matrix_matches_scalar_functions():
+    matrix = calculate_scenario_matrix(28000.0, discounts_pct=[0.0, 5.0], interest_rates_pct=[0.0, 3.5],
+                                       terms_years=[5, 20], equity_amount=2000.0, zuschlag_abs=500.0)
+    rows = scenario_matrix_rows(matrix)
+    assert matrix["count"] == len(rows) == 4 * 2 * 2 * 2
+    for row in rows:
+        mods = apply_discounts_and_surcharges(28000.0, row["rabatt_pct"], zuschlag_abs=500.0)
+        subsidy = calculate_beg_subsidy(mods["final_price_net"], row["natural_refrigerant"], row["replace_old"],
+                                        row["low_income"])
+        loan = calculate_annuity_loan(subsidy["effective_total_after_subsidy_net"] - 2000.0, row["interest_pct"],
+                                      row["years"])
+        assert row["subsidy_amount_net"] == pytest.approx(subsidy["subsidy_amount_net"])
+        assert row["monthly_rate"] == pytest.approx(loan["monthly_rate"], abs=0.01)
+        assert row["total_interest"] == pytest.approx(loan["total_interest"], abs=0.01)
+
+    table = scenario_matrix_table(matrix, limit=3)
+    assert table[0][0] == "BEG-Variante" and len(table) == 4
+    assert table[1][0] == "Basis + Kältemittel + Heizungstausch"
+    assert table[1][8].endswith(" €") and "." in table[1][8]
+
+
+def test_scenario_matrix_thousands_of_combinations_fast():
+    started = time.perf_counter()
+    matrix = calculate_scenario_matrix(30000.0, discounts_pct=range(0, 11), interest_rates_pct=[x / 4 for x in range(25)],
+                                       terms_years=range(5, 21))
+    assert matrix["count"] == 4 * 11 * 25 * 16
+    assert time.perf_counter() - started < 1.0
@@ -0,0 +1,62 @@
+import sys
+import time
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import numpy as np
+import pytest
+
+from heatpump_simulation import (
+    CopCurve, HeatingDemandProfile, HeatPumpUnit, compare_heatpumps, simulate_heatpump,
+    synthetic_outdoor_temperature,
+)
+
+
+def test_cop_curve_from_rating_hits_rating_point_and_falls_with_lift():
+    curve = CopCurve.from_rating(4.0)
+    assert curve.evaluate(np.array([2.0]), np.array([35.0]))[0] == pytest.approx(4.0)
+    cops = curve.evaluate(np.array([-10.0, 2.0, 2.0]), np.array([35.0, 35.0, 55.0]))
+    assert cops[0] < cops[1] and cops[2] < cops[1]
+
+
+def test_constant_cop_gives_exact_energy_balance():
+    outdoor = np.array([-12.0, 0.0, 10.0, 16.0])
+    profile = HeatingDemandProfile.build(outdoor, design_heat_load_kw=8.0, design_outdoor_c=-12.0, room_c=20.0)
+    assert profile.space_heat_kw.tolist() == pytest.approx([8.0, 5.0, 2.5, 0.0])
+    flat = CopCurve.from_points([-30, 40], [20, 80], [[3.0, 3.0], [3.0, 3.0]])
+    unit = HeatPumpUnit("Test", nominal_kw=6.0, cop_curve=flat, capacity_slope_per_k=0.0)
+    result = simulate_heatpump(profile, unit)
+    # Bei -12 °C fehlen 2 kW -> Heizstab mit COP 1
+    assert result.heating_rod_kwh.tolist() == pytest.approx([2.0, 0.0, 0.0, 0.0])
+    assert result.annual_electricity_kwh == pytest.approx(6.0 / 3 + 2.0 + 5.0 / 3 + 2.5 / 3)
+    assert result.heating_rod_hours == 1 and result.bivalence_point_c == -12.0
+
+
+def test_compare_ten_units_quickly_and_bigger_units_need_less_rod():
+    outdoor = synthetic_outdoor_temperature(design_c=-12.0)
+    assert len(outdoor) == 8760 and outdoor.min() == pytest.approx(-12.0)
+    profile = HeatingDemandProfile.build(outdoor, design_heat_load_kw=10.0, design_flow_c=45.0,
+                                         annual_space_heat_kwh=18000.0, hot_water_kwh_per_year=2000.0)
+    products = [{"manufacturer": "Test", "model": f"{kw} kW", "heating_power": kw, "cop": 4.0}
+                for kw in range(5, 15)]
+    started = time.perf_counter()
+    rows = compare_heatpumps(profile, products)
+    assert time.perf_counter() - started < 1.0
+    by_unit = {r["unit"]: r for r in rows}
+    assert by_unit["Test 5 kW"]["heating_rod_hours"] > by_unit["Test 14 kW"]["heating_rod_hours"]
+    assert all(r["annual_heat_kwh"] == pytest.approx(20000.0, abs=1) for r in rows)
+    assert 2.5 < by_unit["Test 14 kW"]["spf"] < 5.0
+
+
+def test_annual_demand_fit_keeps_design_peak():
+    building = {"heat_load_kw": 10.0, "outside_temp": -12, "system_temp": "Fußbodenheizung (35°C)",
+                "desired_temp": 20}
+    profile = HeatingDemandProfile.from_building_data(building, annual_space_heat_kwh=10.0 * 1800)
+    assert profile.space_heat_kw.sum() == pytest.approx(18000.0, rel=1e-3)
+    unit = HeatPumpUnit.from_product({"manufacturer": "Test", "model": "7 kW", "heating_power": 7, "cop": 4.5})
+    summary = simulate_heatpump(profile, unit).summary()
+    assert summary["peak_heat_load_kw"] == building["heat_load_kw"]
+    assert summary["heating_rod_hours"] > 100 and summary["bivalence_point_c"] > -5.0
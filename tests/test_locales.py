@@ -0,0 +1,59 @@
+import builtins
+import json
+import os
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import locales
+from locales import TranslationTable, get_text
+
+
+def test_lookups_do_no_file_io_after_warm_up(tmp_path, monkeypatch):
+    path = tmp_path / "de.json"
+    path.write_text(json.dumps({"label": "Anlage", "greeting": "Hallo {name}, {n:.1f} kWp"}), encoding="utf-8")
+    table = TranslationTable("de", str(tmp_path))
+    assert table.get("label") == "Anlage"
+
+    opened = []
+    real_open = builtins.open
+    monkeypatch.setattr(builtins, "open", lambda *a, **k: opened.append(a[0]) or real_open(*a, **k))
+    for _ in range(500):
+        assert table.get("label") == "Anlage"
+        assert table.get("greeting", name="Eva", n=9.87) == "Hallo Eva, 9.9 kWp"
+    assert table.get("greeting", name="Eva") == "Hallo {name}, {n:.1f} kWp"  # fehlendes Feld -> Rohtext
+    assert opened == [] and table.loads == 1
+
+    assert table.get("fehlt") == "fehlt"
+    assert table.get("fehlt", fallback="Ersatz {x}", x=1) == "Ersatz 1"
+    assert table.missing_keys() == {"fehlt": 2}
+
+
+def test_reload_only_when_mtime_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(locales, "RELOAD_CHECK_INTERVAL_S", 0.0)
+    path = tmp_path / "de.json"
+    path.write_text(json.dumps({"label": "Alt"}), encoding="utf-8")
+    table = TranslationTable("de", str(tmp_path))
+    assert table.get("label") == "Alt"
+    table.get("label")
+    assert table.loads == 1
+
+    path.write_text(json.dumps({"label": "Neu"}), encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert table.get("label") == "Neu" and table.loads == 2
+
+    # Fehlende Datei: Fallback-Texte, Fehler wird einmal gemeldet statt bei jedem Lookup
+    missing = TranslationTable("xx", str(tmp_path))
+    errors_before = len(locales.global_import_errors)
+    assert missing.get("app_title") == "Ömers Solar Kakerlake"
+    missing.get("app_title")
+    assert len(locales.global_import_errors) == errors_before + 1
+
+
+def test_module_level_api_uses_shared_table():
+    assert get_text("app_title") == locales.load_translations("de")["app_title"]
+    assert locales.get_translation_table("de") is locales.get_translation_table("de")
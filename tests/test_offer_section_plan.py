@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import pytest
+
+from pdf_generator import build_offer_section_plan, section_plan_cache_info
+
+SECTIONS = ["ProjectOverview", "CostDetails", "Economics", "Visualizations"]
+
+
+def test_plan_orders_numbers_and_resolves_titles():
+    options = {"custom_section_order": ["economics"], "selected_charts_for_pdf": ["co2_savings_chart_bytes", "unknown_chart"]}
+    plan = build_offer_section_plan({"pdf_section_title_economics": "Rendite"}, SECTIONS, options)
+    assert [s.key for s in plan.sections] == ["Economics", "ProjectOverview", "CostDetails", "Visualizations"]
+    assert plan.sections[0].title == "1. Rendite"
+    assert plan.sections[2].title == "3. Detaillierte Kostenaufstellung"
+    assert [c.key for c in plan.chart_slots] == ["co2_savings_chart_bytes"]
+    assert plan.chart_slots[0].title == "CO₂-Einsparung"
+    with pytest.raises(Exception):
+        plan.sections = ()
+
+
+def test_plan_is_shared_for_identical_options():
+    options = {"selected_charts_for_pdf": ["cumulative_cashflow_chart_bytes"], "include_all_documents": False}
+    first = build_offer_section_plan({}, SECTIONS, options)
+    before = section_plan_cache_info()["hits"]
+    # Angebotsdaten außerhalb der Plan-Optionen (z. B. Finanzierung) ändern den Plan nicht
+    second = build_offer_section_plan({"customer_name": "X"}, list(SECTIONS), dict(options, financing_config={"rate": 3.5}))
+    assert second is first
+    assert section_plan_cache_info()["hits"] == before + 1
+    other = build_offer_section_plan({}, SECTIONS, dict(options, company_document_ids_to_include=[7]))
+    assert other is not first and other.company_document_ids == (7,)
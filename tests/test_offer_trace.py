@@ -0,0 +1,88 @@
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import database
+import offer_trace
+
+
+def test_nested_spans_record_queries_bytes_and_log(tmp_path, monkeypatch):
+    log_path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(offer_trace, "TRACE_LOG_PATH", str(log_path))
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "trace.db"))
+    monkeypatch.setattr(offer_trace, "ENTRY_POINTS", {"offer"})
+
+    @offer_trace.traced("render")
+    def render():
+        return b"x" * 100
+
+    with offer_trace.span("offer", customer="Test") as root:
+        conn = database.get_db_connection()
+        queries_before = root.db_queries
+        conn.execute("SELECT 1").fetchone()
+        conn.execute("SELECT 2").fetchone()
+        conn.close()
+        assert root.db_queries - queries_before == 2
+        render()
+
+    trace = offer_trace.recent_traces()[0]
+    assert trace["name"] == "offer" and trace["attrs"] == {"customer": "Test"}
+    assert [c["name"] for c in trace["children"]] == ["render"]
+    assert trace["children"][0]["bytes_out"] == 100
+    assert trace["db_queries"] >= 2
+
+    logged = offer_trace.load_logged_traces(path=str(log_path))
+    assert logged[0]["name"] == "offer"
+    rows = offer_trace.flatten_trace(logged[0])
+    assert [r["stage"] for r in rows] == ["offer", "offer/render"]
+    summary = {r["stage"]: r for r in offer_trace.summarize_stages(logged)}
+    assert summary["render"]["runs"] == 1 and summary["render"]["avg_db_queries"] == 0
+
+
+def test_disabled_tracing_is_transparent(tmp_path, monkeypatch):
+    monkeypatch.setattr(offer_trace, "TRACE_LOG_PATH", str(tmp_path / "traces.jsonl"))
+    monkeypatch.setattr(offer_trace, "_enabled", False)
+    before = len(offer_trace.recent_traces())
+    with offer_trace.span("offer") as node:
+        node.add_bytes(b"abc")
+    assert len(offer_trace.recent_traces()) == before
+    assert not (tmp_path / "traces.jsonl").exists()
+
+
+def test_only_entry_point_roots_are_recorded(tmp_path, monkeypatch):
+    log_path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(offer_trace, "TRACE_LOG_PATH", str(log_path))
+    monkeypatch.setattr(offer_trace, "ENTRY_POINTS", set())
+
+    @offer_trace.traced(entry_point=True)
+    def generate_offer():
+        build_data()
+
+    @offer_trace.traced()
+    def build_data():
+        return {}
+
+    before = len(offer_trace.recent_traces())
+    build_data()  # einzelner Aufruf (z. B. Streamlit-Rerun) -> gemessen, aber nicht aufgezeichnet
+    assert len(offer_trace.recent_traces()) == before and not log_path.exists()
+    generate_offer()
+    assert offer_trace.recent_traces()[0]["children"][0]["name"] == "build_data"
+    assert [t["name"] for t in offer_trace.load_logged_traces(path=str(log_path))] == ["generate_offer"]
+
+
+def test_trace_log_path_defaults_to_data_and_env_overrides(tmp_path, monkeypatch):
+    monkeypatch.delenv("OFFER_TRACE_LOG", raising=False)
+    default_path = offer_trace.trace_log_path_from_env()
+    assert default_path == offer_trace.DEFAULT_TRACE_LOG_PATH
+    assert Path(default_path) == base_dir / "data" / "offer_traces.jsonl"
+
+    for disabled in ("", "0", " 0 "):
+        monkeypatch.setenv("OFFER_TRACE_LOG", disabled)
+        assert offer_trace.trace_log_path_from_env() == ""
+
+    custom = str(tmp_path / "eigene_traces.jsonl")
+    monkeypatch.setenv("OFFER_TRACE_LOG", custom)
+    assert offer_trace.trace_log_path_from_env() == custom
@@ -0,0 +1,62 @@
+import io
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+from pypdf import PdfReader
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from pdf_template_engine import OverlayLayerCache, stamp_offer_pdf
+
+
+def _pdf(texts):
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
+    for text in texts:
+        c.drawString(72, 500, text)
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+def test_single_pass_stamping_with_cached_backgrounds(tmp_path):
+    for i in range(1, 8):
+        (tmp_path / f"nt_nt_{i:02d}.pdf").write_bytes(_pdf([f"Hintergrund {i}"]))
+    appendix = _pdf([f"Zusatz {i}" for i in range(1, 4)])
+
+    def footer(c, pw, ph, idx):
+        c.drawString(20, 20, f"Seite {8 + idx} von 10")
+
+    runs = [stamp_offer_pdf(base_dir / "coords", tmp_path, {}, 10, appendix_pdf=appendix, draw_appendix_overlay=footer)
+            for _ in range(2)]
+    texts = [[page.extract_text() for page in PdfReader(io.BytesIO(pdf)).pages] for pdf in runs]
+    assert texts[0] == texts[1]  # gecachte Hintergründe bleiben unverändert
+    assert len(texts[0]) == 10
+    assert all(texts[0][i].count(f"Hintergrund {i + 1}") == 1 for i in range(7))
+    assert "Zusatz 1" in texts[0][7] and "Seite 8 von 10" in texts[0][7]
+    assert "Seite 10 von 10" in texts[0][9]
+
+    unstamped = PdfReader(io.BytesIO(stamp_offer_pdf(base_dir / "coords", tmp_path, {}, 10, appendix_pdf=appendix)))
+    assert "Seite" not in unstamped.pages[8].extract_text()
+
+
+def test_layered_stamping_matches_full_render_per_company(tmp_path):
+    for i in range(1, 8):
+        (tmp_path / f"nt_nt_{i:02d}.pdf").write_bytes(_pdf([f"Hintergrund {i}"]))
+    customer = {"customer_name": "Max Muster", "anlage_kwp": "9,80 kWp"}
+    companies = [dict(customer, company_name=f"Firma {n}", amortization_time=f"{12 + n},0 Jahre") for n in range(4)]
+
+    def words(pdf):
+        return [sorted(page.extract_text().split()) for page in PdfReader(io.BytesIO(pdf)).pages]
+
+    cache = OverlayLayerCache()
+    for data in companies:
+        layered = stamp_offer_pdf(base_dir / "coords", tmp_path, data, 7, layer_cache=cache)
+        assert words(layered) == words(stamp_offer_pdf(base_dir / "coords", tmp_path, data, 7))
+    # Abweichende Werte werden als firmenspezifisch gelernt; ab der dritten Firma nur noch Treffer
+    assert "amortization_time" in cache.company_keys and not cache.is_company_key("anlage_kwp")
+    assert cache.misses <= 14 and cache.hits >= 14
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import pdf_chart_registry as registry
+from pdf_chart_registry import CHART_REGISTRY, ChartCache, build_chart, build_selected_charts, input_digest
+
+RESULTS = {
+    "monthly_productions_sim": [300, 400, 600, 800, 900, 950, 940, 850, 650, 450, 300, 250],
+    "monthly_consumption_sim": [500] * 12,
+    "cumulative_cash_flows_sim": [-15000 + 1300 * i for i in range(21)],
+    "annual_co2_savings_kg": 3200,
+}
+
+
+def test_digest_only_covers_declared_inputs():
+    spec = CHART_REGISTRY["monthly_prod_cons_chart_bytes"]
+    base = input_digest(spec, RESULTS)
+    assert input_digest(spec, dict(RESULTS, annual_co2_savings_kg=1)) == base
+    assert input_digest(spec, dict(RESULTS, monthly_consumption_sim=[600] * 12)) != base
+
+
+def test_selected_charts_are_built_once_and_cached():
+    calls = []
+    registry.register_chart("test_counting_chart_bytes", inputs=("cumulative_cash_flows_sim",))(
+        lambda results, viz: calls.append(1) or "artefakt"
+    )
+    try:
+        cache = ChartCache()
+        charts = build_selected_charts(["monthly_prod_cons_chart_bytes", "test_counting_chart_bytes"], RESULTS, cache=cache)
+        assert set(charts) == {"monthly_prod_cons_chart_bytes", "test_counting_chart_bytes"}
+        assert build_chart("test_counting_chart_bytes", dict(RESULTS, annual_co2_savings_kg=5), cache=cache) == "artefakt"
+        assert len(calls) == 1 and cache.hits == 1
+        build_chart("test_counting_chart_bytes", dict(RESULTS, cumulative_cash_flows_sim=[1, 2]), cache=cache)
+        assert len(calls) == 2
+        # Nicht ausgewählte Diagramme werden nicht gebaut
+        build_selected_charts(["monthly_prod_cons_chart_bytes"], dict(RESULTS, cumulative_cash_flows_sim=[3]), cache=cache)
+        assert len(calls) == 2
+        assert build_chart("unbekannt_chart_bytes", RESULTS, cache=cache) is None
+    finally:
+        CHART_REGISTRY.pop("test_counting_chart_bytes", None)
+
+
+def test_switcher_charts_build_headless_without_ui_pass(monkeypatch):
+    import analysis
+
+    monkeypatch.setattr(analysis, "_export_plotly_fig_to_bytes",
+                        lambda fig, texts: fig.to_json().encode("utf-8") if fig is not None else None)
+    monkeypatch.setattr(analysis, "load_admin_setting",
+                        lambda key, default=None: {"co2_emission_factor_kg_per_kwh": 0.5})
+    switcher_keys = {"daily_production_switcher_chart_bytes", *analysis.SWITCHER_CHART_SPECS}
+    assert all(CHART_REGISTRY[key].kind == "png" for key in switcher_keys)
+
+    results = dict(RESULTS, simulation_period_years_effective=3, annual_productions_sim=[9000, 8900, 8800])
+    cache = ChartCache()
+    png = build_chart("co2_savings_value_switcher_chart_bytes", results, cache=cache)
+    assert png and b'"type":"bar"' in png.replace(b" ", b"")
+    # Gleiche Eingaben -> gleiches Artefakt aus dem Cache (simulierte Wochenwerte sind deterministisch)
+    weekly = build_chart("weekly_production_switcher_chart_bytes", results, cache=cache)
+    assert weekly == build_chart("weekly_production_switcher_chart_bytes", dict(results), cache=ChartCache())
+    assert build_chart("co2_savings_value_switcher_chart_bytes", {}, cache=cache) is None
@@ -0,0 +1,95 @@
+import io
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import numpy as np
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from pdf_compactor import compact_offer_pdf, compact_pdf, last_compaction_report, optimization_settings_for_company
+
+
+def _offer_with_duplicate_images() -> bytes:
+    """Zwei separat erzeugte Teil-PDFs mit demselben hochaufgelösten Bild (wie Angebot + Datenblatt)."""
+    pixels = (np.random.default_rng(0).random((900, 1200, 3)) * 255).astype("uint8")
+    png = io.BytesIO()
+    Image.fromarray(pixels).save(png, "PNG")
+
+    def part() -> bytes:
+        buf = io.BytesIO()
+        c = canvas.Canvas(buf, pagesize=A4)
+        for i in range(2):
+            c.drawImage(ImageReader(io.BytesIO(png.getvalue())), 50, 400, width=200, height=150)
+            c.drawString(50, 50, f"Seite {i + 1}")
+            c.showPage()
+        c.save()
+        return buf.getvalue()
+
+    writer = PdfWriter()
+    for data in (part(), part()):
+        for page in PdfReader(io.BytesIO(data)).pages:
+            writer.add_page(page)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def test_compaction_deduplicates_and_downsamples():
+    original = _offer_with_duplicate_images()
+    compacted, report = compact_pdf(original, target_dpi=150)
+    assert report.original_size == len(original) and report.compacted_size == len(compacted)
+    assert report.saved_percent > 50
+    pages = PdfReader(io.BytesIO(compacted)).pages
+    assert [p.extract_text().strip() for p in pages] == ["Seite 1", "Seite 2"] * 2
+
+
+def test_per_company_settings_and_disabled_passthrough():
+    stored = {"default": {"target_dpi": 200}, "companies": {"7": {"enabled": True, "jpeg_quality": 60}}}
+    load = lambda key, default=None: stored if key == "pdf_output_optimization" else default
+    assert optimization_settings_for_company(load, 7) == {"enabled": True, "target_dpi": 200, "jpeg_quality": 60, "subset_fonts": True}
+    assert optimization_settings_for_company(load, 3)["enabled"] is False
+
+    original = _offer_with_duplicate_images()
+    assert compact_offer_pdf(original, load, 3) is original and last_compaction_report() is None
+    assert len(compact_offer_pdf(original, load, 7)) < len(original)
+    assert last_compaction_report().saved_bytes > 0
+
+
+def test_legacy_offer_path_is_compacted_and_report_not_stale(monkeypatch):
+    import pdf_generator
+
+    original = _offer_with_duplicate_images()
+    legacy_calls = []
+
+    def failing_templates(**kwargs):
+        raise RuntimeError("keine Templates")
+
+    def legacy(*args, **kwargs):
+        legacy_calls.append(kwargs)
+        return original
+
+    monkeypatch.setattr(pdf_generator, "generate_offer_pdf_with_main_templates", failing_templates)
+    monkeypatch.setattr(pdf_generator, "_generate_offer_pdf_legacy", legacy)
+    stored = {"companies": {"7": {"enabled": True}}}
+    load = lambda key, default=None: stored if key == "pdf_output_optimization" else default
+
+    def render(company_id, **kwargs):
+        return pdf_generator.generate_offer_pdf(
+            {}, {}, {}, None, None, "", "", None, {}, load, None, None, None, None, company_id, {}, **kwargs)
+
+    assert len(render(7)) < len(original)
+    assert last_compaction_report().saved_bytes > 0
+
+    # Nächstes Angebot ohne kompakte Ausgabe: kein Bericht der vorherigen Erzeugung
+    assert render(3) is original and last_compaction_report() is None
+
+    # Innere Aufrufe (Zusatz-PDF) werden nicht separat kompaktiert
+    assert render(7, disable_main_template_combiner=True) is original
+    assert len(legacy_calls) == 3
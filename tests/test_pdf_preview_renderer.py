@@ -0,0 +1,93 @@
+import io
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import pymupdf as fitz
+from PIL import Image
+
+from pdf_preview_renderer import PageImageCache, PreviewRenderer, page_content_hashes
+
+
+def _pdf(texts):
+    doc = fitz.open()
+    for text in texts:
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((72, 100), text, fontsize=24)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_render_matches_png_roundtrip(tmp_path):
+    pdf = _pdf(["Seite 1", "Seite 2", "Seite 3"])
+    renderer = PreviewRenderer(PageImageCache(str(tmp_path)), max_workers=3)
+    images = renderer.render_pages(pdf, dpi=60)
+    assert len(images) == 3
+
+    doc = fitz.open(stream=pdf, filetype="pdf")
+    for index, img in enumerate(images):
+        expected = Image.open(io.BytesIO(doc[index].get_pixmap(dpi=60).tobytes("png"))).convert("RGB")
+        assert img.size == expected.size
+        assert img.tobytes() == expected.tobytes()
+    doc.close()
+
+
+def test_unchanged_pages_come_from_cache(tmp_path):
+    cache = PageImageCache(str(tmp_path))
+    renderer = PreviewRenderer(cache, max_workers=2)
+    renderer.thumbnails(_pdf(["A", "B", "C"]))
+    assert cache.misses == 3
+
+    # Neue PDF mit nur einer geänderten Seite: zwei Treffer, ein Neurendern
+    renderer.thumbnails(_pdf(["A", "X", "C"]))
+    assert (cache.hits, cache.misses) == (2, 4)
+
+    # Frischer Speicher-Cache, Datenträger-Cache bleibt gültig
+    cold = PageImageCache(str(tmp_path))
+    images = PreviewRenderer(cold, max_workers=1).thumbnails(_pdf(["A", "B", "C"]))
+    assert len(images) == 3 and cold.misses == 0
+
+
+def test_hash_covers_embedded_font_program():
+    import os
+    import reportlab
+
+    font_dir = os.path.join(os.path.dirname(reportlab.__file__), "fonts")
+    regular = Path(font_dir, "Vera.ttf").read_bytes()
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    page.insert_font(fontname="F0", fontbuffer=regular)
+    page.insert_text((72, 100), "Angebot", fontname="F0", fontsize=24)
+    doc = fitz.open(stream=doc.tobytes(), filetype="pdf")
+    before = page_content_hashes(doc, [0])[0]
+
+    # Gleicher Fontname und Inhaltsstream, anderes eingebettetes Fontprogramm
+    font_file_xref = next(x for x in range(1, doc.xref_length())
+                          if doc.xref_is_stream(x) and doc.xref_stream(x) == regular)
+    doc.update_stream(font_file_xref, Path(font_dir, "VeraBd.ttf").read_bytes())
+    assert page_content_hashes(doc, [0])[0] != before
+    doc.close()
+
+
+def test_hash_covers_graphics_state_resources():
+    from reportlab.pdfgen import canvas
+
+    def _page_hash(alpha):
+        buf = io.BytesIO()
+        c = canvas.Canvas(buf, pagesize=(595, 842))
+        c.setFillAlpha(alpha)
+        c.rect(100, 100, 300, 300, fill=1, stroke=0)
+        c.save()
+        doc = fitz.open(stream=buf.getvalue(), filetype="pdf")
+        try:
+            return page_content_hashes(doc, [0])[0]
+        finally:
+            doc.close()
+
+    # Nur der ExtGState (Deckkraft) unterscheidet sich, der Content-Stream ist identisch
+    assert _page_hash(0.1) != _page_hash(0.6)
+    assert _page_hash(0.6) == _page_hash(0.6)
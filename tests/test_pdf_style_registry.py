@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+from reportlab.lib import colors
+
+import pdf_generator
+from pdf_style_registry import STYLE_REGISTRY, StyleRegistry, resolve_font
+
+
+def test_resolve_font_falls_back_for_unknown_names():
+    assert resolve_font("Helvetica-Regular") == "Helvetica"
+    assert resolve_font("Helvetica-Bold") == "Helvetica-Bold"
+    assert resolve_font(None, fallback="Times-Roman") == "Times-Roman"
+
+
+def test_registry_compiles_once_per_palette():
+    registry = StyleRegistry()
+    calls = []
+    registry.register("stylesheet", "demo", lambda palette: calls.append(palette) or {"palette": palette})
+    first = registry.stylesheet("demo", ("#111111",))
+    assert registry.stylesheet("demo", ("#111111",)) is first
+    assert registry.hits == 1
+    assert registry.stylesheet("demo", ("#222222",)) is not first
+    assert calls == [("#111111",), ("#222222",)]
+
+
+def test_dynamic_colors_use_shared_compiled_styles():
+    design = {"primary_color": "#8B0000", "secondary_color": "#FFB347"}
+    pdf_generator._update_styles_with_dynamic_colors(design)
+    sheet, table_style = pdf_generator.STYLES, pdf_generator.DATA_TABLE_STYLE
+    assert sheet["TableHeader"].backColor == colors.HexColor("#8B0000")
+    assert sheet["OfferTitle"].textColor == colors.HexColor("#8B0000")
+
+    builds = STYLE_REGISTRY.builds
+    pdf_generator._update_styles_with_dynamic_colors(dict(design))
+    assert pdf_generator.STYLES is sheet
+    assert pdf_generator.DATA_TABLE_STYLE is table_style
+    assert STYLE_REGISTRY.builds == builds
+
+
+def test_theme_stylesheet_registers_ttf_fonts_and_resolves_unknown_names(monkeypatch):
+    import os
+    import reportlab
+
+    vera = os.path.join(os.path.dirname(reportlab.__file__), "fonts", "Vera.ttf")
+    theme = {
+        "fonts": {"family_main": "ThemeVera", "family_bold": "Unbekannt-Bold", "size_h1": 18, "size_body": 10,
+                  "ttf_files": {"ThemeVera": vera}},
+        "colors": {"primary": "#003366", "text": "#000000"},
+    }
+    monkeypatch.setattr(pdf_generator, "get_theme", lambda name: theme)
+    styles = pdf_generator._build_theme_stylesheet("eigenes_theme")
+    assert styles["Body"].fontName == "ThemeVera"
+    assert styles["H1"].fontName == "Helvetica-Bold"
@@ -0,0 +1,49 @@
+import io
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+from pypdf import PdfReader
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate
+
+from pdf_vector_charts import VECTOR_CHART_BUILDERS, build_vector_chart
+from pdf_generator import _get_chart_flowables
+
+RESULTS = {
+    "monthly_productions_sim": [300, 400, 600, 800, 900, 950, 940, 850, 650, 450, 300, 250],
+    "monthly_consumption_sim": [500] * 12,
+    "annual_costs_hochrechnung_values": [1500 * 1.03 ** i for i in range(20)],
+    "cumulative_cash_flows_sim": [-15000 + 1300 * i for i in range(21)],
+    "self_supply_rate_percent": 62.5,
+    "total_consumption_kwh_yr": 5000,
+    "direktverbrauch_anteil_pv_produktion_pct": 30.0,
+    "speichernutzung_anteil_pv_produktion_pct": 25.0,
+    "annual_pv_production_kwh": 8000,
+    "annual_co2_savings_kg": 3200,
+}
+
+
+def test_all_vector_charts_render_without_raster_images():
+    drawings = [build_vector_chart(key, RESULTS, 400, max_height=200) for key in VECTOR_CHART_BUILDERS]
+    assert all(d is not None and d.width <= 400 and d.height <= 200 for d in drawings)
+
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4).build(drawings)
+    reader = PdfReader(io.BytesIO(buffer.getvalue()))
+    for page in reader.pages:
+        xobjects = page["/Resources"].get("/XObject") or {}
+        assert not any(xobjects[name].get_object().get("/Subtype") == "/Image" for name in xobjects)
+    assert len(buffer.getvalue()) < 40_000
+
+
+def test_missing_data_and_png_fallback():
+    assert all(build_vector_chart(key, {}, 400) is None for key in VECTOR_CHART_BUILDERS)
+    assert build_vector_chart("tariff_cube_switcher_chart_bytes", RESULTS, 400) is None
+    assert _get_chart_flowables("tariff_cube_switcher_chart_bytes", RESULTS, 400, {}) == []
+    # Ohne PNG wird automatisch das Vektor-Diagramm verwendet
+    flowables = _get_chart_flowables("monthly_prod_cons_chart_bytes", RESULTS, 400, {})
+    assert len(flowables) == 1 and flowables[0].__class__.__name__ == "Drawing"
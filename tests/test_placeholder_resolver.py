@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parents[1]
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+from pdf_template_engine import build_dynamic_data, layout_placeholder_keys, new_placeholder_session
+from pdf_template_engine.placeholder_resolver import PlaceholderResolver, PlaceholderSession, ResolverRegistry
+
+
+def test_registry_plans_only_required_resolvers_and_reuses_company_independent_output():
+    calls = []
+
+    def _base(ctx, result, company):
+        calls.append("base")
+        price = ctx.memo("price", lambda: 0.32)
+        result["price"] = f"{price:.2f}"
+
+    def _company(ctx, result, company):
+        calls.append("company")
+        result["company_name"] = company.get("name", "")
+
+    def _expensive(ctx, result, company):
+        calls.append("expensive")
+        result["hp_total"] = result["price"] + " x"
+
+    registry = ResolverRegistry()
+    registry.register(PlaceholderResolver("base", _base, always=True))
+    registry.register(PlaceholderResolver("company", _company, key_prefixes=("company_",), uses_company=True))
+    registry.register(PlaceholderResolver("expensive", _expensive, key_prefixes=("hp_",), inputs=("base",)))
+
+    session = PlaceholderSession(registry, {}, {})
+    assert session.resolve({"name": "PV GmbH"}, {"company_name"}) == {"price": "0.32", "company_name": "PV GmbH"}
+    second = session.resolve({"name": "WP GmbH"}, {"company_name", "hp_total"})
+    assert second == {"price": "0.32", "company_name": "WP GmbH", "hp_total": "0.32 x"}
+    assert calls == ["base", "company", "company", "expensive"]
+    report = session.timing_report()
+    assert report["keys"]["hp_total"]["resolver"] == "expensive"
+    assert report["resolvers"]["company"]["runs"] == 2
+
+
+def test_layout_driven_build_matches_full_build_for_layout_keys():
+    project_data = {"customer_data": {"first_name": "Max", "last_name": "Muster"},
+                    "project_details": {"module_quantity": 20}}
+    analysis_results = {"anlage_kwp": 8.8, "annual_pv_production_kwh": 8400, "total_investment_netto": 15000}
+    required = layout_placeholder_keys(base_dir / "coords")
+    assert "company_name" in required and not any(k.startswith("HP_") for k in required)
+
+    session = new_placeholder_session(project_data, analysis_results)
+    pv = build_dynamic_data(project_data, analysis_results, {"name": "PV GmbH"}, required_keys=required, session=session)
+    wp = build_dynamic_data(project_data, analysis_results, {"name": "WP GmbH"}, required_keys=required, session=session)
+    full = build_dynamic_data(project_data, analysis_results, {"name": "PV GmbH"})
+
+    assert "heatpump" not in session.runs
+    assert session.runs["core"] == 1 and session.runs["company"] == 2
+    assert (pv["company_name"], wp["company_name"]) == ("PV GmbH", "WP GmbH")
+    assert {k: full.get(k) for k in required} == {k: pv.get(k) for k in required}
+    assert wp["customer_name"] == pv["customer_name"]
+
+
+def test_energy_dispatch_recomputes_cached_pv_only_result_for_heatpump_projects():
+    project_data = {
+        "project_details": {},
+        "heatpump_data": {
+            "building_data": {"heat_load_kw": 8},
+            "selected_heatpump": {"heating_power": 9, "cop": 4.5, "type": "Luft-Wasser-Wärmepumpe"},
+        },
+        "economics_data": {"hp_electricity_consumption": 4000},
+    }
+    analysis_results = {
+        "monthly_productions_sim": [150, 250, 450, 600, 700, 720, 730, 650, 480, 320, 170, 120],
+        "monthly_consumption_sim": [400] * 12,
+        # wie aus perform_calculations: ohne WP-Last berechnet
+        "coupled_dispatch": {"self_consumption_rate_percent": 30.0, "autarky_percent": 40.0,
+                             "grid_import_kwh": 2900.0, "feed_in_kwh": 3700.0, "includes_heatpump": False},
+    }
+    keys = {"hp_pv_coverage_percent", "HP_PV_COVERAGE_PCT", "hp_pv_electricity_kwh", "coupled_autarky_percent"}
+    result = build_dynamic_data(project_data, analysis_results, {"name": "WP GmbH"}, required_keys=keys)
+    assert keys <= set(result)
+    assert result["coupled_autarky_percent"] != "40,0 %"
+
+    pv_only = build_dynamic_data({"project_details": {}}, analysis_results, required_keys=keys)
+    assert pv_only["coupled_autarky_percent"] == "40,0 %" and "hp_pv_coverage_percent" not in pv_only
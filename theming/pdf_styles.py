@@ -14,7 +14,8 @@ Author: Suratina Sicmislar
 Version: 1.0 (AI-Generated & Future-Proof)
 """
 
-# Basis-Schriftarten (können durch eigene .ttf-Dateien erweitert werden)
+# Basis-Schriftarten (können durch eigene .ttf-Dateien erweitert werden:
+# "fonts": {"ttf_files": {"Schriftname": "pfad/zur/datei.ttf"}, "family_main": "Schriftname", ...})
 FONT_FAMILY_SANS = "Helvetica"
 FONT_FAMILY_SERIF = "Times"
 FONT_BOLD_SANS = "Helvetica-Bold"
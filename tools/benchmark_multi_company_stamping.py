@@ -0,0 +1,80 @@
+"""
+benchmark_multi_company_stamping.py
+Vergleicht das Stempeln der 7 Template-Seiten für N Firmen eines Kunden:
+- Voll: je Firma stamp_offer_pdf mit komplettem Overlay und Hintergrund-Merge
+- Ebenen: OverlayLayerCache – firmenunabhängige Ebene je Seite einmal, je Firma nur die Firmenebene
+
+Aufruf: python tools/benchmark_multi_company_stamping.py [--companies 20] [--bg-dir pdf_templates_static/notext]
+"""
+
+from __future__ import annotations
+import argparse
+import base64
+import io
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from reportlab.pdfgen import canvas
+
+from pdf_template_engine import PLACEHOLDER_MAPPING, OverlayLayerCache, stamp_offer_pdf
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+COORDS_DIR = BASE_DIR / "coords"
+BG_DIR = BASE_DIR / "pdf_templates_static" / "notext"
+
+
+def _logo_b64(index: int) -> str:
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=(120, 50))
+    c.setFillColorRGB((index * 37 % 255) / 255, 0.4, 0.6)
+    c.rect(0, 0, 120, 50, fill=1, stroke=0)
+    c.save()
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def company_data(companies: int) -> List[Dict[str, Any]]:
+    """Gleicher Kunde, je Firma anderer Name, Preis und Logo."""
+    base = {key: f"Wert {key[:12]}" for key in set(PLACEHOLDER_MAPPING.values())}
+    base.update({"self_supply_rate_percent": "54%", "self_consumption_percent": "42%",
+                 "cost_20y_no_increase_number": "30.000,00 €", "cost_20y_with_increase_number": "40.000,00 €"})
+    rows = []
+    for i in range(companies):
+        data = dict(base)
+        data.update({"company_name": f"Solarfirma {i + 1}", "company_logo_b64": _logo_b64(i),
+                     "amortization_time": f"{20000 + 750 * i:,.2f} EUR*".replace(",", "X").replace(".", ",").replace("X", ".")})
+        rows.append(data)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--bg-dir", type=Path, default=BG_DIR)
+    args = parser.parse_args()
+    rows = company_data(args.companies)
+    stamp_offer_pdf(COORDS_DIR, args.bg_dir, rows[0], 7)  # Aufwärmen (Fonts, Hintergrund-Cache)
+
+    started = time.perf_counter()
+    for data in rows:
+        stamp_offer_pdf(COORDS_DIR, args.bg_dir, data, 7)
+    full = time.perf_counter() - started
+
+    cache = OverlayLayerCache()
+    started = time.perf_counter()
+    for data in rows:
+        stamp_offer_pdf(COORDS_DIR, args.bg_dir, data, 7, layer_cache=cache)
+    layered = time.perf_counter() - started
+
+    print(f"{args.companies} Firmen, Hintergründe: {args.bg_dir}")
+    print(f"Voll    {full * 1000:8.1f} ms ({full / args.companies * 1000:.1f} ms/Firma)")
+    print(f"Ebenen  {layered * 1000:8.1f} ms ({layered / args.companies * 1000:.1f} ms/Firma), "
+          f"Seiten-Cache {cache.hits} Treffer / {cache.misses} gerendert, Firmenschlüssel {len(cache.company_keys)}")
+
+
+if __name__ == "__main__":
+    main()
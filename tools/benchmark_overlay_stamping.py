@@ -0,0 +1,95 @@
+"""
+benchmark_overlay_stamping.py
+Vergleicht das Stempeln der Angebots-PDF (7 Template-Seiten + Zusatzseiten mit Fußzeile):
+- Mehrfach: generate_overlay -> merge_with_background (Bytes), dann pro Zusatzseite
+  eigener Canvas + PdfReader für die Fußzeile, zum Schluss erneutes Zusammenfügen
+- Einfach: pdf_template_engine.stamp_offer_pdf (ein Canvas, ein PdfWriter-Durchlauf)
+
+Aufruf: python tools/benchmark_overlay_stamping.py [--runs 5] [--appendix-pages 15]
+"""
+
+from __future__ import annotations
+import argparse
+import io
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pypdf import PdfReader, PdfWriter
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from pdf_generator import _appendix_footer_drawer
+from pdf_template_engine import generate_overlay, merge_with_background, stamp_offer_pdf
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+COORDS_DIR = BASE_DIR / "coords"
+BG_DIR = BASE_DIR / "pdf_templates_static" / "notext"
+
+
+def _appendix(pages: int) -> bytes:
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
+    for i in range(pages):
+        c.setFont("Helvetica", 12)
+        c.drawString(72, 760, f"Zusatzseite {i + 1}")
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+def run_multi_pass(appendix: bytes, total_pages: int) -> bytes:
+    main7 = merge_with_background(generate_overlay(COORDS_DIR, {}, total_pages), BG_DIR)
+    draw = _appendix_footer_drawer(8, total_pages, footer_left_text="Herr Max Muster")
+    stamped = PdfWriter()
+    for idx, page in enumerate(PdfReader(io.BytesIO(appendix)).pages):
+        pw, ph = float(page.mediabox.width), float(page.mediabox.height)
+        ov_buf = io.BytesIO()
+        c = canvas.Canvas(ov_buf, pagesize=(pw, ph))
+        draw(c, pw, ph, idx)
+        c.showPage(); c.save()
+        page.merge_page(PdfReader(io.BytesIO(ov_buf.getvalue())).pages[0])
+        stamped.add_page(page)
+    stamped_buf = io.BytesIO(); stamped.write(stamped_buf)
+    writer = PdfWriter()
+    for part in (main7, stamped_buf.getvalue()):
+        for page in PdfReader(io.BytesIO(part)).pages:
+            writer.add_page(page)
+    out = io.BytesIO(); writer.write(out)
+    return out.getvalue()
+
+
+def run_single_pass(appendix: bytes, total_pages: int) -> bytes:
+    draw = _appendix_footer_drawer(8, total_pages, footer_left_text="Herr Max Muster")
+    return stamp_offer_pdf(COORDS_DIR, BG_DIR, {}, total_pages, appendix_pdf=appendix, draw_appendix_overlay=draw)
+
+
+def _measure(label: str, func: Callable[[], bytes], runs: int) -> None:
+    timings: List[float] = []
+    pdf_bytes = b""
+    for _ in range(runs):
+        started = time.perf_counter()
+        pdf_bytes = func()
+        timings.append(time.perf_counter() - started)
+    pages = len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+    print(f"{label:<8} min {min(timings) * 1000:8.1f} ms | max {max(timings) * 1000:8.1f} ms | {pages} Seiten | {len(pdf_bytes) / 1024:8.1f} KB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--appendix-pages", type=int, default=15)
+    args = parser.parse_args()
+    appendix = _appendix(args.appendix_pages)
+    total_pages = 7 + args.appendix_pages
+    print(f"7 Template-Seiten + {args.appendix_pages} Zusatzseiten, {args.runs} Durchläufe")
+    _measure("Mehrfach", lambda: run_multi_pass(appendix, total_pages), args.runs)
+    _measure("Einfach", lambda: run_single_pass(appendix, total_pages), args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+benchmark_pdf_charts.py
+Vergleicht die beiden Diagramm-Backends für die PDF-Ausgabe:
+- PNG: Plotly-Figur -> Kaleido (wie analysis._export_plotly_fig_to_bytes, 800x480, scale 1.5)
+- Vektor: pdf_vector_charts (reportlab.graphics Drawing)
+
+Für jedes Backend wird ein PDF mit denselben sechs Diagrammen erzeugt und
+Erzeugungszeit sowie Dateigröße ausgegeben.
+
+Aufruf: python tools/benchmark_pdf_charts.py [--runs 3] [--out-dir .]
+"""
+
+from __future__ import annotations
+import argparse
+import io
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer
+from reportlab.lib.styles import getSampleStyleSheet
+
+from pdf_vector_charts import MONTH_LABELS, VECTOR_CHART_BUILDERS, build_vector_chart
+
+SAMPLE_RESULTS: Dict[str, Any] = {
+    "monthly_productions_sim": [310, 420, 640, 820, 930, 960, 950, 860, 660, 460, 300, 240],
+    "monthly_consumption_sim": [520, 480, 470, 420, 400, 380, 380, 390, 410, 450, 500, 540],
+    "annual_costs_hochrechnung_values": [1500 * 1.03 ** i for i in range(20)],
+    "cumulative_cash_flows_sim": [-15000 + 1300 * i for i in range(21)],
+    "self_supply_rate_percent": 62.5,
+    "total_consumption_kwh_yr": 5360,
+    "direktverbrauch_anteil_pv_produktion_pct": 30.0,
+    "speichernutzung_anteil_pv_produktion_pct": 25.0,
+    "annual_pv_production_kwh": 7550,
+    "annual_co2_savings_kg": 3200,
+    "simulation_period_years_effective": 20,
+}
+
+
+def _plotly_figures(results: Dict[str, Any]) -> Dict[str, Any]:
+    """Plotly-Pendants zu den Vektor-Diagrammen (gleiche Daten, Standard-Layout)."""
+    import plotly.graph_objects as go
+
+    years = list(range(1, len(results["annual_costs_hochrechnung_values"]) + 1))
+    direct = results["direktverbrauch_anteil_pv_produktion_pct"]
+    storage = results["speichernutzung_anteil_pv_produktion_pct"]
+    self_supply = results["self_supply_rate_percent"]
+    annual_kg = results["annual_co2_savings_kg"]
+    return {
+        "monthly_prod_cons_chart_bytes": go.Figure([
+            go.Bar(x=MONTH_LABELS, y=results["monthly_productions_sim"], name="PV-Produktion (kWh)"),
+            go.Bar(x=MONTH_LABELS, y=results["monthly_consumption_sim"], name="Verbrauch (kWh)"),
+        ]),
+        "cost_projection_chart_bytes": go.Figure(go.Scatter(x=years, y=results["annual_costs_hochrechnung_values"])),
+        "cumulative_cashflow_chart_bytes": go.Figure(go.Bar(y=results["cumulative_cash_flows_sim"])),
+        "consumption_coverage_pie_chart_bytes": go.Figure(go.Pie(labels=["Eigenversorgung", "Netzbezug"],
+                                                                 values=[self_supply, 100 - self_supply], hole=0.4)),
+        "pv_usage_pie_chart_bytes": go.Figure(go.Pie(labels=["Direktverbrauch", "Speichernutzung", "Einspeisung"],
+                                                     values=[direct, storage, 100 - direct - storage])),
+        "co2_savings_chart_bytes": go.Figure(go.Bar(x=years, y=[annual_kg * y / 1000 for y in years])),
+    }
+
+
+def _build_pdf(chart_flowables: Callable[[str], List[Any]]) -> bytes:
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = getSampleStyleSheet()
+    story: List[Any] = []
+    for chart_key in VECTOR_CHART_BUILDERS:
+        story.append(Paragraph(chart_key, styles["Heading4"]))
+        story.extend(chart_flowables(chart_key))
+        story.append(Spacer(1, 0.4 * cm))
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def run_vector(results: Dict[str, Any], width: float) -> bytes:
+    return _build_pdf(lambda key: [d for d in [build_vector_chart(key, results, width, max_height=8 * cm)] if d])
+
+
+def run_png(results: Dict[str, Any], width: float) -> Optional[bytes]:
+    try:
+        figures = _plotly_figures(results)
+        pngs = {key: fig.to_image(format="png", scale=1.5, width=800, height=480) for key, fig in figures.items()}
+    except Exception as e:
+        print(f"PNG-Backend nicht verfügbar (Kaleido/Chromium?): {e}")
+        return None
+    return _build_pdf(lambda key: [Image(io.BytesIO(pngs[key]), width=width, height=width * 480 / 800)])
+
+
+def _measure(label: str, func: Callable[[], Optional[bytes]], runs: int, out_path: Optional[str]) -> None:
+    timings: List[float] = []
+    pdf_bytes: Optional[bytes] = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        pdf_bytes = func()
+        timings.append(time.perf_counter() - started)
+        if pdf_bytes is None:
+            print(f"{label:<8} übersprungen")
+            return
+    if out_path:
+        with open(out_path, "wb") as f:
+            f.write(pdf_bytes)
+    print(f"{label:<8} min {min(timings) * 1000:8.1f} ms | max {max(timings) * 1000:8.1f} ms | {len(pdf_bytes) / 1024:8.1f} KB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--out-dir", default=None, help="PDFs zum Sichtvergleich hier ablegen")
+    args = parser.parse_args()
+    width = 16 * cm
+    out = (lambda name: os.path.join(args.out_dir, name)) if args.out_dir else (lambda name: None)
+    print(f"{len(VECTOR_CHART_BUILDERS)} Diagramme, {args.runs} Durchläufe")
+    _measure("Vektor", lambda: run_vector(SAMPLE_RESULTS, width), args.runs, out("charts_vector.pdf"))
+    _measure("PNG", lambda: run_png(SAMPLE_RESULTS, width), args.runs, out("charts_png.pdf"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+benchmark_pdf_preview.py
+Vergleicht die Rasterisierung der PDF-Vorschau:
+- Bisher: alle Seiten mit 150 DPI -> PNG -> PIL (sequentiell)
+- Neu: PreviewRenderer (Thumbnails mit niedriger DPI, aktuelle Seite mit 150 DPI,
+  paralleles Rastern, Seiten-Cache); zusätzlich Neuaufbau nach Änderung einer Seite
+
+Aufruf: python tools/benchmark_pdf_preview.py [--pages 20] [--runs 3]
+"""
+
+from __future__ import annotations
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pymupdf as fitz
+from PIL import Image
+
+from pdf_preview_renderer import PREVIEW_DPI, PageImageCache, PreviewRenderer
+
+
+def build_pdf(pages: int, changed_page: int = -1) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page(width=595, height=842)
+        for row in range(40):
+            page.insert_text((40, 40 + row * 19), f"Seite {i + 1} Zeile {row + 1} " + "Photovoltaik " * 4, fontsize=10)
+        page.draw_rect(fitz.Rect(300, 500, 560, 800), color=(0, 0.3, 0.6), fill=(0.8, 0.9, 1.0))
+        if i == changed_page:
+            page.insert_text((40, 820), "geändert", fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def legacy(pdf_bytes: bytes) -> None:
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    for page in doc:
+        Image.open(io.BytesIO(page.get_pixmap(dpi=PREVIEW_DPI).tobytes("png"))).load()
+    doc.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    pdf = build_pdf(args.pages)
+    pdf_changed = build_pdf(args.pages, changed_page=args.pages // 2)
+
+    def timed(fn) -> float:
+        best = float("inf")
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    print(f"Bisher (alle Seiten, {PREVIEW_DPI} DPI, PNG): {timed(lambda: legacy(pdf)) * 1000:.0f} ms")
+
+    def cold() -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            renderer = PreviewRenderer(PageImageCache(tmp))
+            renderer.thumbnails(pdf)
+            renderer.page_image(pdf, 0)
+    print(f"Neu, kalter Cache (Thumbnails + aktuelle Seite): {timed(cold) * 1000:.0f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        renderer = PreviewRenderer(PageImageCache(tmp))
+        renderer.thumbnails(pdf)
+        renderer.page_image(pdf, 0)
+
+        def warm() -> None:
+            renderer.thumbnails(pdf_changed)
+            renderer.page_image(pdf_changed, 0)
+        print(f"Neu, eine Seite geändert (warmer Cache): {timed(warm) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+profile_offer_styles.py
+Profiliert die Stil- und Font-Kosten über N aufeinanderfolgende Angebote.
+
+Je Angebot: Firmenfarben anwenden (_update_styles_with_dynamic_colors), eine Seite mit
+Absatz- und Datentabellen-Stilen setzen und das 7-seitige Template-Overlay zeichnen.
+"--cold" leert vor jedem Angebot die Style-Registry und den Font-Cache (Verhalten ohne Registry).
+
+Aufruf: python tools/profile_offer_styles.py [--offers 100] [--cold] [--top 12]
+"""
+
+from __future__ import annotations
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Table
+
+import pdf_generator
+import pdf_style_registry
+from pdf_template_engine import generate_overlay
+
+COORDS_DIR = Path(__file__).resolve().parents[1] / "coords"
+COMPANY_COLORS = [{"primary_color": "#1B365D", "secondary_color": "#2E8B57"},
+                  {"primary_color": "#8B0000", "secondary_color": "#FFB347"}]
+
+
+def one_offer(index: int) -> None:
+    pdf_generator._update_styles_with_dynamic_colors(COMPANY_COLORS[index % len(COMPANY_COLORS)])
+    styles = pdf_generator.STYLES
+    story = [Paragraph("Angebot", styles["OfferTitle"]), Paragraph("Wirtschaftlichkeit", styles["SectionTitle"])]
+    table = Table([["Jahr", "Ertrag"], ["1", "1.234,00 €"], ["2", "1.250,00 €"]])
+    table.setStyle(pdf_generator.DATA_TABLE_STYLE)
+    story.append(table)
+    SimpleDocTemplate(io.BytesIO(), pagesize=A4).build(story)
+    generate_overlay(COORDS_DIR, {}, total_pages=7)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--offers", type=int, default=100)
+    parser.add_argument("--cold", action="store_true", help="Caches vor jedem Angebot leeren")
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    for i in range(args.offers):
+        if args.cold:
+            pdf_style_registry.STYLE_REGISTRY.clear()
+            pdf_style_registry.clear_font_resolution_cache()
+        one_offer(i)
+    profiler.disable()
+    elapsed = time.perf_counter() - started
+
+    registry = pdf_style_registry.STYLE_REGISTRY
+    print(f"{args.offers} Angebote ({'kalt' if args.cold else 'Registry'}): {elapsed:.2f} s, "
+          f"{elapsed / args.offers * 1000:.1f} ms/Angebot, Stil-Builds {registry.builds}, Treffer {registry.hits}")
+    stats = pstats.Stats(profiler, stream=sys.stdout)
+    stats.sort_stats("cumulative").print_stats(r"(styles|pdfmetrics|_build_|resolve_font|getSampleStyleSheet)", args.top)
+
+
+if __name__ == "__main__":
+    main()